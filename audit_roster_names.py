@@ -35,6 +35,7 @@ engine = create_engine(DATABASE_URL)
 Session = sessionmaker(bind=engine)
 
 from ipl_rosters import IPL_2026_ROSTERS
+from services.player_aliases import refresh_alias_map
 
 
 def check_alias(db, name: str) -> dict:
@@ -358,9 +359,11 @@ def main():
                 print(f"    [{team}] {name} ({role})")
 
         if fix_mode and fixes_applied:
+            version = refresh_alias_map(db)
             db.commit()
             print(f"\n  {'='*90}")
             print(f"  FIX MODE: {len(fixes_applied)} alias(es) inserted and committed")
+            print(f"  Refreshed player_alias_map (version {version})")
             print(f"  {'='*90}")
             for team, name, msg in fixes_applied:
                 print(f"    [{team}] {name}: {msg}")
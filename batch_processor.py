@@ -5,27 +5,44 @@ Core framework for weekly batch processing that transforms expensive
 real-time calculations into fast database lookups.
 """
 
-from typing import Dict, List, Optional, Any, Callable
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
 from datetime import date, datetime
-from precomputed_models import ComputationRun, TeamPhaseStat, PlayerBaseline
+from precomputed_models import ComputationRun, TeamPhaseStat, PlayerBaseline, PrecomputePartition
+from precomputed_partials import INCREMENTAL_SPECS, PARTITION_FINGERPRINT_SQL
 from database import get_session
 import logging
+import multiprocessing
+import os
+import time
 
 logger = logging.getLogger(__name__)
 
+# Parallel rebuild sizing. Every worker process holds one dedicated connection.
+PRECOMPUTE_WORKERS = int(os.getenv("PRECOMPUTE_WORKERS", str(os.cpu_count() or 1)))
+PRECOMPUTE_SHARDS = int(os.getenv("PRECOMPUTE_SHARDS", str(PRECOMPUTE_WORKERS)))
+
+# Every pre-computed table is keyed by venue first, so hashing the venue splits a step into
+# disjoint shards whose outputs can simply be concatenated. NULL venues land in shard of ''.
+VENUE_SHARD_SQL = "(hashtext(COALESCE(m.venue, '')) & 2147483647) % :shard_count = :shard_index"
+
 
 class PrecomputationPipeline:
     """
     Weekly batch processing pipeline for pre-computing analytics tables.
     
-    Executes in dependency order to ensure data consistency.
+    Executes in dependency order to ensure data consistency, either serially
+    (execute_weekly_rebuild) or as a DAG of venue-sharded steps across worker
+    processes (execute_parallel_rebuild).
     """
     
     def __init__(self):
         self.session: Optional[Session] = None
         self.pipeline_start_time = None
+        self._current_run_id: Optional[int] = None
         
         # Define processing order based on dependencies
         self.pipeline_steps = [
@@ -34,6 +51,18 @@ class PrecomputationPipeline:
             ("venue_resources", self._rebuild_venue_resources),
             ("wpa_outcomes", self._rebuild_wpa_outcomes)
         ]
+
+        # Step -> steps it reads from. All current steps read only raw match data, so they are
+        # independent; a step that consumes another pre-computed table must list it here.
+        self.step_dependencies: Dict[str, Tuple[str, ...]] = {
+            "team_phase_stats": (),
+            "player_baselines": (),
+            "venue_resources": (),
+            "wpa_outcomes": ()
+        }
+
+        # (shard_index, shard_count) when running one venue shard inside a worker process
+        self._shard: Optional[Tuple[int, int]] = None
     
     def execute_weekly_rebuild(self, through_date: date, session: Session = None) -> Dict[str, Any]:
         """
@@ -96,20 +125,12 @@ class PrecomputationPipeline:
                 self.session.close()
     
     def _execute_with_monitoring(self, table_name: str, rebuild_func: Callable, 
-                                through_date: date) -> Dict[str, Any]:
+                                through_date: date,
+                                computation_type: str = "full_rebuild") -> Dict[str, Any]:
         """Execute a rebuild function with monitoring and error handling."""
-        step_start_time = datetime.utcnow()
-        
         # Create computation run record
-        run_record = ComputationRun(
-            table_name=table_name,
-            computation_type="full_rebuild",
-            start_time=step_start_time,
-            status="running",
-            data_through_date=through_date
-        )
-        self.session.add(run_record)
-        self.session.commit()
+        run_record = self._start_run_record(table_name, through_date, computation_type)
+        step_start_time = run_record.start_time
         
         step_result = {
             "start_time": step_start_time.isoformat(),
@@ -122,6 +143,7 @@ class PrecomputationPipeline:
         
         try:
             # Execute the rebuild function
+            self._current_run_id = run_record.id
             result = rebuild_func(through_date)
             
             # Update step result
@@ -156,16 +178,390 @@ class PrecomputationPipeline:
         
         return step_result
     
+    def execute_parallel_rebuild(self, through_date: date, session: Session = None,
+                                 max_workers: Optional[int] = None,
+                                 shard_count: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Full rebuild with independent steps and venue shards running in a process pool.
+
+        Steps are scheduled from ``step_dependencies``: a step starts as soon as everything it
+        depends on has completed. Each step is split into ``shard_count`` venue shards, and each
+        shard runs in a worker process on its own connection. Wall time approaches the slowest
+        shard rather than the sum of all steps.
+
+        Args:
+            through_date: Process all matches up to this date (exclusive)
+            session: Optional database session (used for bookkeeping and table clears only)
+            max_workers: Worker processes (default PRECOMPUTE_WORKERS)
+            shard_count: Venue shards per step (default PRECOMPUTE_SHARDS)
+
+        Returns:
+            Dictionary with execution results and statistics, including per-shard timings
+        """
+        max_workers = max(1, max_workers or PRECOMPUTE_WORKERS)
+        shard_count = max(1, shard_count or PRECOMPUTE_SHARDS)
+        execution_order = resolve_step_order(self.step_dependencies)
+        logger.info(
+            f"Starting parallel precomputation rebuild through {through_date} "
+            f"({max_workers} workers, {shard_count} shards per step)"
+        )
+
+        if session:
+            self.session = session
+        else:
+            session_gen = get_session()
+            self.session = next(session_gen)
+
+        self.pipeline_start_time = datetime.utcnow()
+        execution_results = {
+            "start_time": self.pipeline_start_time.isoformat(),
+            "through_date": through_date.isoformat(),
+            "mode": "parallel",
+            "workers": max_workers,
+            "shard_count": shard_count,
+            "steps": {},
+            "total_records_processed": 0,
+            "total_duration_seconds": 0,
+            "status": "running"
+        }
+
+        runs: Dict[str, ComputationRun] = {}
+        shard_results: Dict[str, List[Dict[str, Any]]] = {}
+        finished: Dict[str, str] = {}  # step -> 'completed' | 'failed' | 'skipped'
+
+        try:
+            # spawn, not fork: the parent already holds pooled connections from database.engine
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+                in_flight = {}
+
+                def launch_ready_steps():
+                    for step in execution_order:
+                        if step in runs or step in finished:
+                            continue
+                        deps = self.step_dependencies[step]
+                        if any(finished.get(dep) in ("failed", "skipped") for dep in deps):
+                            finished[step] = "skipped"
+                            execution_results["steps"][step] = {
+                                "table_name": step,
+                                "status": "skipped",
+                                "error": "upstream step did not complete"
+                            }
+                            continue
+                        if not all(finished.get(dep) == "completed" for dep in deps):
+                            continue
+                        runs[step] = self._start_run_record(step, through_date)
+                        shard_results[step] = []
+                        self._clear_table(step)
+                        for shard_index in range(shard_count):
+                            future = pool.submit(run_step_shard, step, through_date, shard_index, shard_count)
+                            in_flight[future] = (step, shard_index)
+
+                launch_ready_steps()
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        step, shard_index = in_flight.pop(future)
+                        try:
+                            shard_results[step].append(future.result())
+                        except Exception as e:
+                            logger.error(f"Shard {shard_index} of {step} failed: {str(e)}")
+                            shard_results[step].append({
+                                "shard_index": shard_index,
+                                "status": "failed",
+                                "error": str(e)
+                            })
+                        if len(shard_results[step]) == shard_count:
+                            step_result = self._finish_run_record(runs[step], shard_results[step])
+                            finished[step] = step_result["status"]
+                            execution_results["steps"][step] = step_result
+                            execution_results["total_records_processed"] += step_result.get("records_processed", 0)
+                    launch_ready_steps()
+
+            end_time = datetime.utcnow()
+            execution_results["end_time"] = end_time.isoformat()
+            execution_results["total_duration_seconds"] = (end_time - self.pipeline_start_time).total_seconds()
+            failed = [step for step, status in finished.items() if status != "completed"]
+            execution_results["status"] = "failed" if failed else "completed"
+
+            logger.info(f"Parallel rebuild finished in {execution_results['total_duration_seconds']:.2f} seconds")
+
+            return execution_results
+
+        except Exception as e:
+            logger.error(f"Parallel pipeline execution failed: {str(e)}")
+            for step, run_record in runs.items():
+                if step not in finished:
+                    run_record.end_time = datetime.utcnow()
+                    run_record.status = "failed"
+                    run_record.error_message = str(e)
+            self.session.commit()
+            execution_results["status"] = "failed"
+            execution_results["error"] = str(e)
+            return execution_results
+
+        finally:
+            if not session and self.session:
+                self.session.close()
+
+    def _start_run_record(self, table_name: str, through_date: date,
+                          computation_type: str = "full_rebuild") -> ComputationRun:
+        run_record = ComputationRun(
+            table_name=table_name,
+            computation_type=computation_type,
+            start_time=datetime.utcnow(),
+            status="running",
+            data_through_date=through_date
+        )
+        self.session.add(run_record)
+        self.session.commit()
+        return run_record
+
+    def _finish_run_record(self, run_record: ComputationRun,
+                           shards: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fold shard results into the step's computation run and step result."""
+        shards = sorted(shards, key=lambda shard: shard["shard_index"])
+        errors = [f"shard {shard['shard_index']}: {shard['error']}" for shard in shards if shard.get("status") == "failed"]
+        records_processed = sum(shard.get("records_processed", 0) for shard in shards)
+        records_inserted = sum(shard.get("records_inserted", 0) for shard in shards)
+
+        run_record.end_time = datetime.utcnow()
+        run_record.status = "failed" if errors else "completed"
+        run_record.records_processed = records_processed
+        run_record.records_inserted = records_inserted
+        run_record.error_message = "; ".join(errors) or None
+        run_record.execution_details = {
+            "shard_count": len(shards),
+            "shards": shards,
+            "slowest_shard_seconds": max((shard.get("duration_seconds", 0) for shard in shards), default=0)
+        }
+        self.session.commit()
+
+        duration = (run_record.end_time - run_record.start_time).total_seconds()
+        logger.info(f"Completed {run_record.table_name}: {records_inserted} records in {duration:.2f}s")
+
+        step_result = {
+            "start_time": run_record.start_time.isoformat(),
+            "table_name": run_record.table_name,
+            "status": run_record.status,
+            "records_processed": records_processed,
+            "records_inserted": records_inserted,
+            "computation_run_id": run_record.id,
+            "duration_seconds": duration,
+            "shards": shards
+        }
+        if errors:
+            step_result["error"] = run_record.error_message
+        return step_result
+
+    def _venue_shard_filter(self) -> str:
+        """Extra WHERE predicate restricting a rebuild query to the current venue shard."""
+        return f" AND {VENUE_SHARD_SQL}" if self._shard else ""
+
+    def _query_params(self, through_date: date) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"through_date": through_date}
+        if self._shard:
+            params["shard_index"], params["shard_count"] = self._shard
+        return params
+
+    def _clear_table(self, table_name: str) -> None:
+        # Shards only append; the coordinator clears the table once before fanning out.
+        if self._shard:
+            return
+        self.session.execute(text(f"TRUNCATE TABLE {table_name}"))
+        self.session.commit()
+
+    def execute_incremental_rebuild(self, through_date: date, session: Session = None,
+                                    recompute_from: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Incremental rebuild of all pre-computed tables.
+
+        Instead of re-aggregating all history, each table keeps additive sums/counts per
+        calendar month of match date (the ``*_partials`` tables). Only partitions whose matches
+        changed since they were last folded in are recomputed; the published table is then
+        re-derived from the partials in one transaction.
+
+        A partition counts as changed when its match fingerprint (ids + winners, as of
+        ``through_date``) differs from the one recorded in ``precompute_partitions`` by the last
+        successful run. On the first run every partition is dirty, so the first incremental run
+        costs about the same as a full rebuild.
+
+        Args:
+            through_date: Process all matches up to this date (exclusive)
+            session: Optional database session
+            recompute_from: Force every partition from this date's month onward to be
+                recomputed. Use after stats for already-loaded matches were rewritten (e.g.
+                scripts/backfill_recompute_stats.py), which the fingerprint cannot see.
+
+        Returns:
+            Dictionary with execution results and statistics
+        """
+        logger.info(f"Starting incremental precomputation rebuild through {through_date}")
+
+        if session:
+            self.session = session
+        else:
+            session_gen = get_session()
+            self.session = next(session_gen)
+
+        self.pipeline_start_time = datetime.utcnow()
+        execution_results = {
+            "start_time": self.pipeline_start_time.isoformat(),
+            "through_date": through_date.isoformat(),
+            "mode": "incremental",
+            "steps": {},
+            "total_records_processed": 0,
+            "total_duration_seconds": 0,
+            "status": "running"
+        }
+
+        try:
+            self._ensure_partial_tables()
+            fingerprints = self._current_partition_fingerprints(through_date)
+            forced_from = recompute_from.replace(day=1) if recompute_from else None
+
+            for table_name, _ in self.pipeline_steps:
+                logger.info(f"Processing incremental step: {table_name}")
+
+                def _step(step_through_date: date, table_name: str = table_name) -> Dict[str, Any]:
+                    return self._incremental_refresh(table_name, step_through_date, fingerprints, forced_from)
+
+                step_result = self._execute_with_monitoring(
+                    table_name, _step, through_date, computation_type="incremental"
+                )
+                execution_results["steps"][table_name] = step_result
+                execution_results["total_records_processed"] += step_result.get("records_processed", 0)
+
+            end_time = datetime.utcnow()
+            execution_results["end_time"] = end_time.isoformat()
+            execution_results["total_duration_seconds"] = (end_time - self.pipeline_start_time).total_seconds()
+            failed = [name for name, step in execution_results["steps"].items() if step.get("status") == "failed"]
+            execution_results["status"] = "failed" if failed else "completed"
+
+            logger.info(f"Incremental rebuild finished in {execution_results['total_duration_seconds']:.2f} seconds")
+
+            return execution_results
+
+        except Exception as e:
+            logger.error(f"Incremental pipeline execution failed: {str(e)}")
+            execution_results["status"] = "failed"
+            execution_results["error"] = str(e)
+            return execution_results
+
+        finally:
+            if not session and self.session:
+                self.session.close()
+
+    def _ensure_partial_tables(self) -> None:
+        """Create the partials and manifest tables on first use."""
+        tables = [spec["partials_model"].__table__ for spec in INCREMENTAL_SPECS.values()]
+        tables.append(PrecomputePartition.__table__)
+        PrecomputePartition.metadata.create_all(bind=self.session.get_bind(), tables=tables, checkfirst=True)
+
+    def _current_partition_fingerprints(self, through_date: date) -> Dict[date, Dict[str, Any]]:
+        rows = self.session.execute(text(PARTITION_FINGERPRINT_SQL), {"through_date": through_date}).fetchall()
+        return {
+            row.partition_month: {"match_count": row.match_count, "fingerprint": row.fingerprint}
+            for row in rows
+        }
+
+    def _incremental_refresh(self, table_name: str, through_date: date,
+                             fingerprints: Dict[date, Dict[str, Any]],
+                             forced_from: Optional[date]) -> Dict[str, Any]:
+        """Recompute dirty partitions of one table's partials, then republish it."""
+        spec = INCREMENTAL_SPECS[table_name]
+        partials_table = spec["partials_model"].__tablename__
+
+        recorded = {
+            row.partition_month: row.fingerprint
+            for row in self.session.query(PrecomputePartition).filter(
+                PrecomputePartition.table_name == table_name
+            )
+        }
+        dirty = sorted(
+            month for month, current in fingerprints.items()
+            if recorded.get(month) != current["fingerprint"]
+            or (forced_from is not None and month >= forced_from)
+        )
+        # Partitions that no longer have matches before through_date (deleted matches, or
+        # through_date moved backwards) must stop contributing.
+        vanished = sorted(month for month in recorded if month not in fingerprints)
+        logger.info(
+            f"{table_name}: {len(dirty)} dirty and {len(vanished)} vanished of "
+            f"{len(fingerprints)} partitions"
+        )
+
+        partial_rows = 0
+        stale_months = dirty + vanished
+        if stale_months:
+            self.session.execute(
+                text(f"DELETE FROM {partials_table} WHERE partition_month = ANY(:months)"),
+                {"months": stale_months},
+            )
+            self.session.query(PrecomputePartition).filter(
+                PrecomputePartition.table_name == table_name,
+                PrecomputePartition.partition_month.in_(stale_months),
+            ).delete(synchronize_session=False)
+
+        if dirty:
+            params = {
+                "through_date": through_date,
+                "months": dirty,
+                "range_start": dirty[0],
+                "range_end": self._next_month(dirty[-1]),
+            }
+            for fill_sql in spec["fill"]:
+                partial_rows += self.session.execute(text(fill_sql), params).rowcount or 0
+            self.session.bulk_insert_mappings(PrecomputePartition, [
+                {
+                    "table_name": table_name,
+                    "partition_month": month,
+                    "match_count": fingerprints[month]["match_count"],
+                    "fingerprint": fingerprints[month]["fingerprint"],
+                    "data_through_date": through_date,
+                    "computation_run_id": self._current_run_id,
+                    "computed_date": datetime.utcnow(),
+                }
+                for month in dirty
+            ])
+        # Partials and manifest commit together, so a failure before this point leaves the
+        # affected partitions dirty for the next run rather than half-counted.
+        self.session.commit()
+
+        # Publish: swap the table contents inside one transaction so readers never see it empty.
+        self.session.execute(text(f"DELETE FROM {table_name}"))
+        published = self.session.execute(
+            text(spec["publish"]),
+            {"through_date": through_date, "computed_date": datetime.utcnow()},
+        ).rowcount or 0
+        self.session.commit()
+
+        logger.info(f"{table_name}: {partial_rows} partial rows refreshed, {published} rows published")
+
+        return {
+            "records_processed": partial_rows,
+            "records_inserted": published,
+            "partitions_total": len(fingerprints),
+            "partitions_recomputed": [month.isoformat() for month in dirty],
+            "partitions_removed": [month.isoformat() for month in vanished],
+        }
+
+    @staticmethod
+    def _next_month(month_start: date) -> date:
+        if month_start.month == 12:
+            return date(month_start.year + 1, 1, 1)
+        return date(month_start.year, month_start.month + 1, 1)
+
     # Placeholder methods - we'll implement these one by one
     def _rebuild_team_stats(self, through_date: date) -> Dict[str, Any]:
         """Rebuild team phase statistics table."""
         logger.info("Rebuilding team phase statistics table...")
+        shard_filter = self._venue_shard_filter()
         
         # Clear existing data
-        self.session.execute(text("TRUNCATE TABLE team_phase_stats"))
-        self.session.commit()
+        self._clear_table("team_phase_stats")
 
-        team_query = text("""
+        team_query = text(f"""
             SELECT 
                 team_stats.batting_team as team,
                 team_stats.venue as venue,
@@ -193,7 +589,7 @@ class PrecomputationPipeline:
                     bs.match_id
                 FROM batting_stats bs
                 JOIN matches m ON bs.match_id = m.id
-                WHERE m.date < :through_date AND bs.pp_balls > 0
+                WHERE m.date < :through_date{shard_filter} AND bs.pp_balls > 0
                 GROUP BY bs.batting_team, m.venue, bs.innings, bs.match_id
                 UNION ALL
                 SELECT 
@@ -210,7 +606,7 @@ class PrecomputationPipeline:
                     bs.match_id
                 FROM batting_stats bs
                 JOIN matches m ON bs.match_id = m.id
-                WHERE m.date < :through_date AND bs.middle_balls > 0
+                WHERE m.date < :through_date{shard_filter} AND bs.middle_balls > 0
                 GROUP BY bs.batting_team, m.venue, bs.innings, bs.match_id
                 UNION ALL
                 SELECT 
@@ -227,7 +623,7 @@ class PrecomputationPipeline:
                     bs.match_id
                 FROM batting_stats bs
                 JOIN matches m ON bs.match_id = m.id
-                WHERE m.date < :through_date AND bs.death_balls > 0
+                WHERE m.date < :through_date{shard_filter} AND bs.death_balls > 0
                 GROUP BY bs.batting_team, m.venue, bs.innings, bs.match_id
                 UNION ALL
                 SELECT 
@@ -244,14 +640,14 @@ class PrecomputationPipeline:
                     bs.match_id
                 FROM batting_stats bs
                 JOIN matches m ON bs.match_id = m.id
-                WHERE m.date < :through_date AND bs.balls_faced > 0
+                WHERE m.date < :through_date{shard_filter} AND bs.balls_faced > 0
                 GROUP BY bs.batting_team, m.venue, bs.innings, bs.match_id
             ) as team_stats
             GROUP BY team_stats.batting_team, team_stats.venue, team_stats.phase, team_stats.innings
             HAVING COUNT(DISTINCT team_stats.match_id) >= 5
         """)
 
-        teams = self.session.execute(team_query, {"through_date": through_date}).fetchall()
+        teams = self.session.execute(team_query, self._query_params(through_date)).fetchall()
         logger.info(f"Processing {len(teams)} teams")
 
         # Prepare team records for bulk insert
@@ -292,15 +688,15 @@ class PrecomputationPipeline:
     def _rebuild_player_baselines(self, through_date: date) -> Dict[str, Any]:
         """Rebuild player baselines table with performance metrics for RAR calculations."""
         logger.info("Rebuilding player baselines table...")
+        shard_filter = self._venue_shard_filter()
     
         # Clear existing data
-        self.session.execute(text("TRUNCATE TABLE player_baselines"))
-        self.session.commit()
+        self._clear_table("player_baselines")
         
         records_inserted = 0
         
         # Process batting baselines with phase-specific data
-        batting_query = text("""
+        batting_query = text(f"""
             SELECT 
                 player_stats.striker as player_name,
                 player_stats.venue as venue,
@@ -324,7 +720,7 @@ class PrecomputationPipeline:
                     bs.match_id
                 FROM batting_stats bs
                 JOIN matches m ON bs.match_id = m.id
-                WHERE m.date < :through_date AND bs.pp_balls > 0
+                WHERE m.date < :through_date{shard_filter} AND bs.pp_balls > 0
                 UNION ALL
                 SELECT 
                     bs.striker,
@@ -338,7 +734,7 @@ class PrecomputationPipeline:
                     bs.match_id
                 FROM batting_stats bs
                 JOIN matches m ON bs.match_id = m.id
-                WHERE m.date < :through_date AND bs.middle_balls > 0
+                WHERE m.date < :through_date{shard_filter} AND bs.middle_balls > 0
                 UNION ALL
                 SELECT 
                     bs.striker,
@@ -352,7 +748,7 @@ class PrecomputationPipeline:
                     bs.match_id
                 FROM batting_stats bs
                 JOIN matches m ON bs.match_id = m.id
-                WHERE m.date < :through_date AND bs.death_balls > 0
+                WHERE m.date < :through_date{shard_filter} AND bs.death_balls > 0
                 UNION ALL
                 SELECT 
                     bs.striker,
@@ -366,13 +762,13 @@ class PrecomputationPipeline:
                     bs.match_id
                 FROM batting_stats bs
                 JOIN matches m ON bs.match_id = m.id
-                WHERE m.date < :through_date AND bs.balls_faced > 0
+                WHERE m.date < :through_date{shard_filter} AND bs.balls_faced > 0
             ) as player_stats
             GROUP BY player_stats.striker, player_stats.venue, player_stats.phase
             HAVING COUNT(DISTINCT player_stats.match_id) >= 5
         """)
         
-        batting_players = self.session.execute(batting_query, {"through_date": through_date}).fetchall()
+        batting_players = self.session.execute(batting_query, self._query_params(through_date)).fetchall()
         logger.info(f"Processing {len(batting_players)} batting player/venue/phase combinations")
         
         # Prepare batting records
@@ -401,7 +797,7 @@ class PrecomputationPipeline:
             self.session.commit()
         
         # Process bowling baselines with phase-specific data
-        bowling_query = text("""
+        bowling_query = text(f"""
             SELECT 
                 player_stats.bowler as player_name,
                 player_stats.venue as venue,
@@ -427,7 +823,7 @@ class PrecomputationPipeline:
                     bw.match_id
                 FROM bowling_stats bw
                 JOIN matches m ON bw.match_id = m.id
-                WHERE m.date < :through_date AND bw.pp_overs > 0
+                WHERE m.date < :through_date{shard_filter} AND bw.pp_overs > 0
                 UNION ALL
                 SELECT 
                     bw.bowler,
@@ -442,7 +838,7 @@ class PrecomputationPipeline:
                     bw.match_id
                 FROM bowling_stats bw
                 JOIN matches m ON bw.match_id = m.id
-                WHERE m.date < :through_date AND bw.middle_overs > 0
+                WHERE m.date < :through_date{shard_filter} AND bw.middle_overs > 0
                 UNION ALL
                 SELECT 
                     bw.bowler,
@@ -457,7 +853,7 @@ class PrecomputationPipeline:
                     bw.match_id
                 FROM bowling_stats bw
                 JOIN matches m ON bw.match_id = m.id
-                WHERE m.date < :through_date AND bw.death_overs > 0
+                WHERE m.date < :through_date{shard_filter} AND bw.death_overs > 0
                 UNION ALL
                 SELECT 
                     bw.bowler,
@@ -472,13 +868,13 @@ class PrecomputationPipeline:
                     bw.match_id
                 FROM bowling_stats bw
                 JOIN matches m ON bw.match_id = m.id
-                WHERE m.date < :through_date AND bw.overs > 0
+                WHERE m.date < :through_date{shard_filter} AND bw.overs > 0
             ) as player_stats
             GROUP BY player_stats.bowler, player_stats.venue, player_stats.phase
             HAVING COUNT(DISTINCT player_stats.match_id) >= 5
         """)
         
-        bowling_players = self.session.execute(bowling_query, {"through_date": through_date}).fetchall()
+        bowling_players = self.session.execute(bowling_query, self._query_params(through_date)).fetchall()
         logger.info(f"Processing {len(bowling_players)} bowling player/venue/phase combinations")
         
         # Prepare bowling records
@@ -519,15 +915,15 @@ class PrecomputationPipeline:
     def _rebuild_venue_resources(self, through_date: date) -> Dict[str, Any]:
         """Rebuild venue resource tables with DLS-style resource percentages."""
         logger.info("Rebuilding venue resources table...")
+        shard_filter = self._venue_shard_filter()
         
         # Clear existing data
-        self.session.execute(text("TRUNCATE TABLE venue_resources"))
-        self.session.commit()
+        self._clear_table("venue_resources")
         
         # Build venue-specific resource tables using ball-by-ball data
         # This creates DLS-style resource percentages based on historical outcomes
         
-        resources_query = text("""
+        resources_query = text(f"""
             WITH ball_states AS (
                 -- Extract all ball-by-ball states with cumulative runs and wickets
                 SELECT 
@@ -549,7 +945,7 @@ class PrecomputationPipeline:
                     ) as final_score
                 FROM deliveries d
                 JOIN matches m ON d.match_id = m.id
-                WHERE m.date < :through_date
+                WHERE m.date < :through_date{shard_filter}
                     AND d.over < 20  -- T20 format
             ),
             venue_state_averages AS (
@@ -607,7 +1003,7 @@ class PrecomputationPipeline:
             ORDER BY venue, innings, over_num, wickets_lost
         """)
         
-        resources = self.session.execute(resources_query, {"through_date": through_date}).fetchall()
+        resources = self.session.execute(resources_query, self._query_params(through_date)).fetchall()
         logger.info(f"Processing {len(resources)} venue/innings/over/wickets combinations")
         
         # Prepare resource records for bulk insert
@@ -646,15 +1042,15 @@ class PrecomputationPipeline:
     def _rebuild_wpa_outcomes(self, through_date: date) -> Dict[str, Any]:
         """Rebuild WPA outcomes table with chase success probabilities."""
         logger.info("Rebuilding WPA outcomes table...")
+        shard_filter = self._venue_shard_filter()
         
         # Clear existing data
-        self.session.execute(text("TRUNCATE TABLE wpa_outcomes"))
-        self.session.commit()
+        self._clear_table("wpa_outcomes")
         
         # Build WPA outcomes using second innings chase data
         # This creates win probability lookup tables based on historical outcomes
         
-        wpa_query = text("""
+        wpa_query = text(f"""
             WITH chase_data AS (
                 -- Extract second innings chase scenarios with ball-by-ball states
                 SELECT 
@@ -679,15 +1075,19 @@ class PrecomputationPipeline:
                 FROM deliveries d
                 JOIN matches m ON d.match_id = m.id
                 JOIN (
-                    -- Get first innings totals for target calculation
+                    -- Get first innings totals for target calculation, restricted to this
+                    -- shard's matches so shards don't each re-aggregate every innings
                     SELECT 
                         match_id,
                         SUM(runs_off_bat + extras) as total_runs
                     FROM deliveries 
                     WHERE innings = 1
+                        AND match_id IN (
+                            SELECT m.id FROM matches m WHERE m.date < :through_date{shard_filter}
+                        )
                     GROUP BY match_id
                 ) first_innings ON d.match_id = first_innings.match_id
-                WHERE m.date < :through_date
+                WHERE m.date < :through_date{shard_filter}
                     AND d.innings = 2  -- Only second innings (chases)
                     AND d.over < 20    -- T20 format
                     AND m.winner IS NOT NULL  -- Only completed matches
@@ -758,7 +1158,7 @@ class PrecomputationPipeline:
             ORDER BY venue, target_bucket, over_bucket, wickets_lost, runs_range_min
         """)
         
-        outcomes = self.session.execute(wpa_query, {"through_date": through_date}).fetchall()
+        outcomes = self.session.execute(wpa_query, self._query_params(through_date)).fetchall()
         logger.info(f"Processing {len(outcomes)} WPA outcome combinations")
         
         # Prepare WPA outcome records for bulk insert
@@ -795,3 +1195,59 @@ class PrecomputationPipeline:
             "records_inserted": records_inserted,
             "wpa_combinations": len(outcomes)
         }
+
+
+def resolve_step_order(dependencies: Dict[str, Tuple[str, ...]]) -> List[str]:
+    """Topologically order pipeline steps, rejecting unknown dependencies and cycles."""
+    order: List[str] = []
+    state: Dict[str, str] = {}
+
+    def visit(step: str, path: Tuple[str, ...]) -> None:
+        if step not in dependencies:
+            raise ValueError(f"Unknown pipeline step dependency: {step}")
+        if state.get(step) == "done":
+            return
+        if state.get(step) == "visiting":
+            raise ValueError(f"Pipeline dependency cycle: {' -> '.join(path + (step,))}")
+        state[step] = "visiting"
+        for dep in dependencies[step]:
+            visit(dep, path + (step,))
+        state[step] = "done"
+        order.append(step)
+
+    for step in dependencies:
+        visit(step, ())
+    return order
+
+
+def run_step_shard(step_name: str, through_date: date, shard_index: int, shard_count: int) -> Dict[str, Any]:
+    """
+    Worker-process entry point: rebuild one venue shard of one step on a private connection.
+
+    Returns the step's result dict plus shard timing, which the coordinator stores in
+    computation_runs.execution_details.
+    """
+    from database import DATABASE_URL
+
+    engine = create_engine(DATABASE_URL, poolclass=NullPool)
+    session = sessionmaker(bind=engine)()
+    started_at = datetime.utcnow()
+    started = time.perf_counter()
+    try:
+        pipeline = PrecomputationPipeline()
+        pipeline.session = session
+        pipeline._shard = (shard_index, shard_count)
+        rebuild_func = dict(pipeline.pipeline_steps)[step_name]
+        result = rebuild_func(through_date)
+    finally:
+        session.close()
+        engine.dispose()
+
+    return {
+        "shard_index": shard_index,
+        "status": "completed",
+        "pid": os.getpid(),
+        "start_time": started_at.isoformat(),
+        "duration_seconds": round(time.perf_counter() - started, 3),
+        **result
+    }
@@ -208,68 +208,39 @@ def get_all_matches_chronological(session: Session):
     return session.query(Match).order_by(Match.date, Match.id).all()
 
 
-def calculate_historical_elos(dry_run: bool = False, batch_size: int = 1000):
+def calculate_historical_elos(dry_run: bool = False, batch_size: int = 10000):
     """
     Calculate ELO ratings for all historical matches
     
     Args:
         dry_run: If True, don't update database, just print progress
-        batch_size: Number of matches to process before committing to database
+        batch_size: Number of matches written back per UPDATE statement
     """
+    from elo_replay import EloReplay, stream_matches, write_elo_ratings
+
     session = next(get_session())
     calculator = ELOCalculator()
     
     try:
         logger.info("Starting ELO calculation for all historical matches...")
         
-        # Get all matches in chronological order
-        logger.info("Fetching all matches from database...")
-        matches = get_all_matches_chronological(session)
-        total_matches = len(matches)
-        logger.info(f"Found {total_matches} matches to process")
-        
         if dry_run:
             logger.info("DRY RUN MODE - No database updates will be made")
         
-        # Process matches in batches
-        processed_count = 0
-        updates_to_commit = []
-        
-        for i, match in enumerate(matches):
-            # Calculate ELO ratings before this match
-            team1_old, team2_old, team1_new, team2_new = calculator.update_ratings(
-                match.team1, match.team2, match.winner, match.match_type
-            )
-            
-            # Prepare database update
-            if not dry_run:
-                updates_to_commit.append({
-                    'match_id': match.id,
-                    'team1_elo': team1_old,
-                    'team2_elo': team2_old
-                })
-            
-            processed_count += 1
-            
-            # Log progress every 1000 matches
-            if processed_count % 1000 == 0:
-                logger.info(f"Processed {processed_count}/{total_matches} matches ({processed_count/total_matches*100:.1f}%)")
-                logger.info(f"Sample: {match.team1} ({team1_old}→{team1_new}) vs {match.team2} ({team2_old}→{team2_new})")
-            
-            # Commit batch to database
-            if not dry_run and len(updates_to_commit) >= batch_size:
-                commit_elo_updates(session, updates_to_commit)
-                updates_to_commit = []
-                logger.info(f"Committed batch of {batch_size} updates to database")
+        # Stream all matches in chronological order through the vectorised replay
+        engine = EloReplay(k_factor=calculator.k_factor)
+        result = engine.replay(stream_matches(session))
+        logger.info(f"Replayed {len(result)} matches")
         
-        # Commit remaining updates
-        if not dry_run and updates_to_commit:
-            commit_elo_updates(session, updates_to_commit)
-            logger.info(f"Committed final batch of {len(updates_to_commit)} updates")
+        if not dry_run and len(result):
+            updated = write_elo_ratings(session, result.match_ids, result.team1_elo, result.team2_elo,
+                                        chunk_size=batch_size)
+            logger.info(f"Wrote ELO ratings for {updated} changed matches")
         
-        logger.info(f"ELO calculation complete! Processed {processed_count} matches")
+        logger.info(f"ELO calculation complete! Processed {len(result)} matches")
         
         # Display final ratings for top teams
+        calculator.team_ratings = engine.team_ratings
         display_final_ratings(calculator)
         
     except Exception as e:
@@ -281,19 +252,15 @@ def calculate_historical_elos(dry_run: bool = False, batch_size: int = 1000):
 
 
 def commit_elo_updates(session: Session, updates: list):
-    """Commit ELO updates to database using bulk update"""
-    try:
-        # Use bulk update for performance
-        for update in updates:
-            session.execute(
-                text("UPDATE matches SET team1_elo = :team1_elo, team2_elo = :team2_elo WHERE id = :match_id"),
-                update
-            )
-        session.commit()
-    except Exception as e:
-        session.rollback()
-        logger.error(f"Error committing ELO updates: {e}")
-        raise
+    """Commit ELO updates to database using one set-based UPDATE"""
+    from elo_replay import write_elo_ratings
+
+    write_elo_ratings(
+        session,
+        [u['match_id'] for u in updates],
+        [u['team1_elo'] for u in updates],
+        [u['team2_elo'] for u in updates],
+    )
 
 
 def display_final_ratings(calculator: ELOCalculator, top_n: int = 20):
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Vectorised ELO replay engine
+
+Replays matches through the same rating rules as ``ELOCalculator.update_ratings`` without a
+Python method call per match:
+
+1. Matches are streamed in (date, id) order and team names are interned to integer ids
+   (after ``normalize_team_name``), with every result encoded as team1's actual score.
+2. Each match is assigned to the earliest "round" after both teams' previous matches. No
+   team plays twice in a round and a team's rounds follow its own chronology, so every
+   round can be rated at once with NumPy over a ratings array, giving exactly the
+   sequential result.
+3. Pre-match ratings are written back with one ``UPDATE ... FROM unnest(...)`` per chunk,
+   skipping rows whose stored ratings are already correct.
+
+``replay_elos_from`` recomputes only matches on or after a date, seeding the ratings from
+the stored pre-match ELOs of each team's last earlier match, so a late-arriving result
+costs a replay of the matches after it rather than of the whole history.
+"""
+
+import logging
+from datetime import date as date_type
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from elo_calculator import get_starting_elo, normalize_team_name
+from services.elo_timeline import ensure_elo_timeline, stale_timeline_matches, sync_elo_timeline
+
+logger = logging.getLogger(__name__)
+
+# Rows per round trip when streaming matches and per UPDATE when writing ratings back
+STREAM_CHUNK_SIZE = 5000
+WRITE_CHUNK_SIZE = 10000
+
+# (match_id, team1, team2, winner, match_type)
+MatchRow = Tuple[str, str, str, Optional[str], str]
+
+
+def actual_score(winner: Optional[str], team: str, opponent: str,
+                 norm: Callable[[str], str] = normalize_team_name) -> float:
+    """
+    ``team``'s actual score, with the same outcomes as ``ELOCalculator.get_actual_score``:
+    no winner, or a winner matching neither team, counts as a tie.
+    """
+    if winner is None:
+        return 0.5
+    winner = norm(winner)
+    if winner == norm(team):
+        return 1.0
+    if winner == norm(opponent):
+        return 0.0
+    return 0.5
+
+
+class ReplayResult:
+    """Pre-match ratings for every replayed match, in replay order."""
+
+    def __init__(self, match_ids: List[str], team1_elo: np.ndarray, team2_elo: np.ndarray,
+                 team1_new: np.ndarray, team2_new: np.ndarray):
+        self.match_ids = match_ids
+        self.team1_elo = team1_elo
+        self.team2_elo = team2_elo
+        self.team1_new = team1_new
+        self.team2_new = team2_new
+
+    def __len__(self) -> int:
+        return len(self.match_ids)
+
+    def updates(self) -> List[Dict]:
+        """The replay as ``{'match_id', 'team1_elo', 'team2_elo'}`` dicts."""
+        return [
+            {'match_id': mid, 'team1_elo': int(t1), 'team2_elo': int(t2)}
+            for mid, t1, t2 in zip(self.match_ids, self.team1_elo, self.team2_elo)
+        ]
+
+
+class EloReplay:
+    """Ratings held in a NumPy array indexed by interned team id."""
+
+    def __init__(self, k_factor: int = 32, ratings: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            k_factor: How much ratings change per match (default: 32)
+            ratings: Current ratings keyed by normalized team name, to continue from
+        """
+        self.k_factor = k_factor
+        self._team_ids: Dict[str, int] = {}
+        self._ratings = np.zeros(max(64, len(ratings or {})), dtype=np.int64)
+        for team, rating in (ratings or {}).items():
+            self._ratings[self._intern(team)] = rating
+
+    def _intern(self, normalized_name: str) -> int:
+        team_id = self._team_ids.get(normalized_name)
+        if team_id is None:
+            team_id = len(self._team_ids)
+            self._team_ids[normalized_name] = team_id
+            if team_id >= len(self._ratings):
+                self._ratings = np.concatenate([self._ratings, np.zeros(len(self._ratings), dtype=np.int64)])
+        return team_id
+
+    @property
+    def team_ratings(self) -> Dict[str, int]:
+        """Current ratings keyed by normalized team name."""
+        return {team: int(self._ratings[team_id]) for team, team_id in self._team_ids.items()}
+
+    def _encode(self, matches: Iterable[MatchRow]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Intern teams and encode results; new teams get their tiered starting rating."""
+        match_ids: List[str] = []
+        team1_ids: List[int] = []
+        team2_ids: List[int] = []
+        scores: List[float] = []
+        normalized: Dict[str, str] = {}
+
+        def norm(name: str) -> str:
+            value = normalized.get(name)
+            if value is None:
+                value = normalized[name] = normalize_team_name(name)
+            return value
+
+        for match_id, team1, team2, winner, match_type in matches:
+            ids = []
+            for team in (team1, team2):
+                name = norm(team)
+                if name not in self._team_ids:
+                    team_id = self._intern(name)
+                    self._ratings[team_id] = get_starting_elo(team, match_type == 'international')
+                ids.append(self._team_ids[name])
+
+            score = actual_score(winner, team1, team2, norm)
+
+            match_ids.append(match_id)
+            team1_ids.append(ids[0])
+            team2_ids.append(ids[1])
+            scores.append(score)
+
+        return (match_ids, np.asarray(team1_ids, dtype=np.int64),
+                np.asarray(team2_ids, dtype=np.int64), np.asarray(scores, dtype=np.float64))
+
+    @staticmethod
+    def _rounds(team1_ids: np.ndarray, team2_ids: np.ndarray, n_teams: int) -> np.ndarray:
+        """Earliest round for each match after both teams' previous rounds."""
+        last = [-1] * n_teams
+        rounds = [0] * len(team1_ids)
+        for i, (a, b) in enumerate(zip(team1_ids.tolist(), team2_ids.tolist())):
+            r = max(last[a], last[b]) + 1
+            rounds[i] = last[a] = last[b] = r
+        return np.asarray(rounds, dtype=np.int64)
+
+    def replay(self, matches: Iterable[MatchRow]) -> ReplayResult:
+        """
+        Rate matches given in chronological order, continuing from the current ratings.
+
+        Args:
+            matches: (match_id, team1, team2, winner, match_type) rows in (date, id) order
+
+        Returns:
+            ReplayResult with pre- and post-match ratings per match
+        """
+        match_ids, t1, t2, score1 = self._encode(matches)
+        n = len(match_ids)
+        pre1 = np.zeros(n, dtype=np.int64)
+        pre2 = np.zeros(n, dtype=np.int64)
+        post1 = np.zeros(n, dtype=np.int64)
+        post2 = np.zeros(n, dtype=np.int64)
+        if n == 0:
+            return ReplayResult(match_ids, pre1, pre2, post1, post2)
+
+        rounds = self._rounds(t1, t2, len(self._team_ids))
+        order = np.argsort(rounds, kind='stable')
+        bounds = np.flatnonzero(np.diff(rounds[order])) + 1
+        ratings = self._ratings
+        for idx in np.split(order, bounds):
+            a, b = t1[idx], t2[idx]
+            r1, r2 = ratings[a], ratings[b]
+            expected1 = 1 / (1 + np.power(10.0, (r2 - r1) / 400))
+            expected2 = 1 - expected1
+            change1 = np.round(self.k_factor * (score1[idx] - expected1)).astype(np.int64)
+            change2 = np.round(self.k_factor * ((1 - score1[idx]) - expected2)).astype(np.int64)
+            pre1[idx], pre2[idx] = r1, r2
+            ratings[a] = r1 + change1
+            ratings[b] = r2 + change2
+            post1[idx], post2[idx] = ratings[a], ratings[b]
+
+        return ReplayResult(match_ids, pre1, pre2, post1, post2)
+
+
+def _scope_sql(fmt: Optional[str]) -> str:
+    return "AND format = :fmt AND gender = :gender" if fmt is not None else ""
+
+
+def stream_matches(session: Session, from_date: Optional[date_type] = None,
+                   fmt: Optional[str] = None, gender: str = 'male',
+                   chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[MatchRow]:
+    """Yield (id, team1, team2, winner, match_type) in (date, id) order, chunk by chunk."""
+    result = session.execute(
+        text(f"""
+            SELECT id, team1, team2, winner, match_type
+            FROM matches
+            WHERE (CAST(:from_date AS DATE) IS NULL OR date >= :from_date)
+            {_scope_sql(fmt)}
+            ORDER BY date, id
+        """).execution_options(stream_results=True),
+        {'from_date': from_date, 'fmt': fmt, 'gender': gender},
+    )
+    while True:
+        rows = result.fetchmany(chunk_size)
+        if not rows:
+            break
+        for row in rows:
+            yield tuple(row)
+
+
+def load_ratings_before(session: Session, before_date: date_type, k_factor: int = 32,
+                        fmt: Optional[str] = None, gender: str = 'male') -> Dict[str, int]:
+    """
+    Ratings each team carried into ``before_date``: the stored pre-match ELO of its last
+    earlier match, plus that match's rating change.
+
+    Returns:
+        Ratings keyed by normalized team name
+    """
+    rows = session.execute(text(f"""
+        WITH appearances AS (
+            SELECT team1 AS team, team2 AS opponent, date, id,
+                   team1_elo AS team_elo, team2_elo AS opponent_elo, winner
+            FROM matches
+            WHERE date < :before_date AND team1_elo IS NOT NULL AND team2_elo IS NOT NULL
+            {_scope_sql(fmt)}
+            UNION ALL
+            SELECT team2 AS team, team1 AS opponent, date, id,
+                   team2_elo AS team_elo, team1_elo AS opponent_elo, winner
+            FROM matches
+            WHERE date < :before_date AND team1_elo IS NOT NULL AND team2_elo IS NOT NULL
+            {_scope_sql(fmt)}
+        )
+        SELECT team, opponent, date, team_elo, opponent_elo, winner
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY team ORDER BY date DESC, id DESC) AS rn
+            FROM appearances
+        ) ranked
+        WHERE rn = 1
+        ORDER BY date, team
+    """), {'before_date': before_date, 'fmt': fmt, 'gender': gender}).fetchall()
+    if not rows:
+        return {}
+
+    team_elo = np.asarray([row.team_elo for row in rows], dtype=np.int64)
+    opponent_elo = np.asarray([row.opponent_elo for row in rows], dtype=np.int64)
+    actual = np.asarray([actual_score(row.winner, row.team, row.opponent) for row in rows])
+    expected = 1 / (1 + np.power(10.0, (opponent_elo - team_elo) / 400))
+    post = team_elo + np.round(k_factor * (actual - expected)).astype(np.int64)
+
+    # Raw names that normalize together keep the most recent appearance (rows are date-ordered)
+    return {normalize_team_name(row.team): int(rating) for row, rating in zip(rows, post)}
+
+
+def write_elo_ratings(session: Session, match_ids: Sequence[str], team1_elo: Sequence[int],
+                      team2_elo: Sequence[int], chunk_size: int = WRITE_CHUNK_SIZE) -> int:
+    """
+    Store pre-match ratings with one set-based UPDATE per chunk and commit.
+
+    Rows whose stored ratings already match are not rewritten. The team_elo_timeline rows
+    of the written matches that are out of date (a changed rating, winner or result) are
+    re-derived in the same transaction.
+
+    Returns:
+        Number of matches whose ratings changed
+    """
+    updated = 0
+    statement = text("""
+        UPDATE matches m
+        SET team1_elo = v.team1_elo, team2_elo = v.team2_elo
+        FROM unnest(CAST(:ids AS VARCHAR[]), CAST(:t1 AS INTEGER[]), CAST(:t2 AS INTEGER[]))
+            AS v(id, team1_elo, team2_elo)
+        WHERE m.id = v.id
+        AND (m.team1_elo IS DISTINCT FROM v.team1_elo OR m.team2_elo IS DISTINCT FROM v.team2_elo)
+        RETURNING m.id
+    """)
+    try:
+        ensure_elo_timeline(session)
+        for start in range(0, len(match_ids), chunk_size):
+            end = start + chunk_size
+            ids = list(match_ids[start:end])
+            result = session.execute(statement, {
+                'ids': ids,
+                't1': [int(v) for v in team1_elo[start:end]],
+                't2': [int(v) for v in team2_elo[start:end]],
+            })
+            updated += len(result.fetchall())
+            sync_elo_timeline(session, stale_timeline_matches(session, ids))
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error writing ELO ratings: {e}")
+        raise
+    return updated
+
+
+def rating_streams(session: Session, from_date: Optional[date_type] = None) -> List[Tuple[str, str]]:
+    """(format, gender) of every rating stream with matches on or after ``from_date``."""
+    rows = session.execute(text("""
+        SELECT DISTINCT format, gender FROM matches
+        WHERE format IS NOT NULL
+        AND (CAST(:from_date AS DATE) IS NULL OR date >= :from_date)
+        ORDER BY format, gender
+    """), {'from_date': from_date}).fetchall()
+    return [(row[0], row[1]) for row in rows]
+
+
+def replay_elos_from(session: Session, from_date: Optional[date_type] = None, k_factor: int = 32,
+                     fmt: Optional[str] = None, gender: str = 'male',
+                     dry_run: bool = False) -> Tuple[EloReplay, Dict[str, int]]:
+    """
+    Recompute stored ELOs for matches on or after ``from_date`` (all matches if None).
+
+    Each (format, gender) is an independent rating stream: ratings are keyed by team name
+    alone, so replaying formats together would let an ODI result move a T20 rating. Without
+    ``fmt`` every stream with matches in range is replayed on its own, in turn.
+
+    Args:
+        session: Database session
+        from_date: Date of the earliest changed match
+        k_factor: ELO K-factor
+        fmt, gender: Replay only this rating stream (default: every stream, separately)
+        dry_run: Replay without writing
+
+    Returns:
+        (engine holding the final ratings of the last stream replayed,
+         {'processed', 'updated', 'errors'} summed over the streams)
+    """
+    if fmt is None:
+        engine = EloReplay(k_factor=k_factor)
+        totals = {'processed': 0, 'updated': 0, 'errors': 0}
+        for stream_format, stream_gender in rating_streams(session, from_date):
+            logger.info(f"--- ELO replay for {stream_format}/{stream_gender} ---")
+            engine, stats = replay_elos_from(session, from_date, k_factor, stream_format, stream_gender, dry_run)
+            for key in totals:
+                totals[key] += stats[key]
+        return engine, totals
+
+    seed = load_ratings_before(session, from_date, k_factor, fmt, gender) if from_date else {}
+    engine = EloReplay(k_factor=k_factor, ratings=seed)
+    result = engine.replay(stream_matches(session, from_date, fmt, gender))
+    logger.info(f"Replayed {len(result)} {fmt}/{gender} matches from {from_date or 'the beginning'} "
+                f"({len(seed)} teams seeded)")
+
+    updated = 0
+    if not dry_run and len(result):
+        updated = write_elo_ratings(session, result.match_ids, result.team1_elo, result.team2_elo)
+    return engine, {'processed': len(result), 'updated': updated, 'errors': 0}
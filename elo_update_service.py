@@ -27,7 +27,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text, and_, or_
 from database import get_session
 from models import Match
-from elo_calculator import ELOCalculator, normalize_team_name, teams_are_same
+from elo_calculator import ELOCalculator, teams_are_same
+from elo_replay import EloReplay, load_ratings_before, replay_elos_from, write_elo_ratings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -146,49 +147,19 @@ class ELOUpdateService:
         logger.info(f"Calculating ELO for {len(matches)} matches...")
         logger.info(f"Date range: {matches[0].date} to {matches[-1].date}")
         
-        stats = {'processed': 0, 'updated': 0, 'errors': 0}
-        updates_to_commit = []
-        
         # If not starting fresh, we need to load existing team ratings up to the start date
         if not start_fresh and matches:
             self._load_existing_team_ratings(session, matches[0].date)
         
-        for match in matches:
-            try:
-                # Calculate ELO ratings before this match
-                team1_old, team2_old, team1_new, team2_new = self.elo_calculator.update_ratings(
-                    match.team1, match.team2, match.winner, match.match_type
-                )
-                
-                # Prepare database update (store pre-match ratings)
-                updates_to_commit.append({
-                    'match_id': match.id,
-                    'team1_elo': team1_old,
-                    'team2_elo': team2_old
-                })
-                
-                stats['processed'] += 1
-                
-                # Log progress every 500 matches
-                if stats['processed'] % 500 == 0:
-                    logger.info(f"Processed {stats['processed']}/{len(matches)} matches")
-                    logger.info(f"Sample: {match.team1} ({team1_old}→{team1_new}) vs {match.team2} ({team2_old}→{team2_new})")
-                
-                # Commit in batches for performance
-                if len(updates_to_commit) >= 1000:
-                    batch_updated = self._commit_elo_updates(session, updates_to_commit)
-                    stats['updated'] += batch_updated
-                    updates_to_commit = []
-                    
-            except Exception as e:
-                logger.error(f"Error processing match {match.id}: {e}")
-                stats['errors'] += 1
-                continue
+        engine = EloReplay(k_factor=self.k_factor, ratings=self.elo_calculator.team_ratings)
+        result = engine.replay(
+            (match.id, match.team1, match.team2, match.winner, match.match_type) for match in matches
+        )
+        self.elo_calculator.team_ratings = engine.team_ratings
         
-        # Commit remaining updates
-        if updates_to_commit:
-            batch_updated = self._commit_elo_updates(session, updates_to_commit)
-            stats['updated'] += batch_updated
+        # Store pre-match ratings
+        stats = {'processed': len(result), 'updated': 0, 'errors': 0}
+        stats['updated'] = self._commit_elo_updates(session, result.updates())
         
         logger.info(f"ELO calculation complete - Processed: {stats['processed']}, Updated: {stats['updated']}, Errors: {stats['errors']}")
         return stats
@@ -205,134 +176,37 @@ class ELOUpdateService:
         """
         logger.info(f"Loading existing team ratings before {before_date}...")
 
-        # Single query to get the latest match for each team with ELO data
-        # Uses window functions to find the most recent match per team
-        latest_matches_query = text("""
-            WITH team_matches AS (
-                -- Get all team appearances with their ELO data
-                SELECT
-                    team1 as team,
-                    date,
-                    team1_elo as team_elo,
-                    team2_elo as opponent_elo,
-                    winner,
-                    ROW_NUMBER() OVER (PARTITION BY team1 ORDER BY date DESC, id DESC) as rn
-                FROM matches
-                WHERE date < :before_date
-                AND team1_elo IS NOT NULL AND team2_elo IS NOT NULL
-                AND (:fmt IS NULL OR (format = :fmt AND gender = :gender))
-
-                UNION ALL
-
-                SELECT
-                    team2 as team,
-                    date,
-                    team2_elo as team_elo,
-                    team1_elo as opponent_elo,
-                    winner,
-                    ROW_NUMBER() OVER (PARTITION BY team2 ORDER BY date DESC, id DESC) as rn
-                FROM matches
-                WHERE date < :before_date
-                AND team1_elo IS NOT NULL AND team2_elo IS NOT NULL
-                AND (:fmt IS NULL OR (format = :fmt AND gender = :gender))
-            ),
-            latest_per_team AS (
-                SELECT team, date, team_elo, opponent_elo, winner,
-                       ROW_NUMBER() OVER (PARTITION BY team ORDER BY date DESC) as final_rn
-                FROM team_matches
-                WHERE rn = 1
-            )
-            SELECT team, date, team_elo, opponent_elo, winner
-            FROM latest_per_team
-            WHERE final_rn = 1
-        """)
-
-        results = session.execute(
-            latest_matches_query,
-            {'before_date': before_date, 'fmt': fmt, 'gender': gender},
-        ).fetchall()
-        logger.info(f"Found {len(results)} teams with ELO history before {before_date}")
-
-        loaded_count = 0
-        for row in results:
-            team, match_date, pre_match_elo, opponent_elo, winner = row
+        ratings = load_ratings_before(session, before_date, self.k_factor, fmt, gender)
+        logger.info(f"Found {len(ratings)} teams with ELO history before {before_date}")
+        self.elo_calculator.team_ratings.update(ratings)
 
-            # Calculate the post-match ELO (what we want to start with)
-            expected_score = 1 / (1 + 10**((opponent_elo - pre_match_elo) / 400))
+        for team, post_match_elo in list(ratings.items())[:10]:
+            logger.info(f"Loaded: {team} -> {post_match_elo}")
 
-            if winner == team:
-                actual_score = 1.0
-            elif winner is None or winner == '-':
-                actual_score = 0.5
-            else:
-                actual_score = 0.0
-
-            elo_change = round(32 * (actual_score - expected_score))
-            post_match_elo = pre_match_elo + elo_change
-
-            # Store in calculator using normalized name
-            normalized_name = normalize_team_name(team)
-            self.elo_calculator.team_ratings[normalized_name] = post_match_elo
-            loaded_count += 1
-
-            if loaded_count <= 10:
-                logger.info(f"Loaded: {team} -> {post_match_elo} (from {match_date})")
-
-        logger.info(f"Successfully loaded {loaded_count} existing team ratings")
-        if loaded_count > 10:
+        logger.info(f"Successfully loaded {len(ratings)} existing team ratings")
+        if len(ratings) > 10:
             logger.info("... (showing first 10 for brevity)")
         
     def _commit_elo_updates(self, session: Session, updates: List[Dict]) -> int:
         """
-        Commit ELO updates to database using batch update with temp table.
+        Commit ELO updates to database with set-based UPDATEs (see elo_replay.write_elo_ratings).
 
         Args:
             session: Database session
             updates: List of update dictionaries
 
         Returns:
-            Number of rows updated
+            Number of rows whose ratings changed
         """
         if not updates:
             return 0
 
-        try:
-            # Create temp table for batch update
-            session.execute(text("""
-                CREATE TEMP TABLE IF NOT EXISTS tmp_elo_updates (
-                    match_id VARCHAR PRIMARY KEY,
-                    team1_elo INTEGER,
-                    team2_elo INTEGER
-                )
-            """))
-            session.execute(text("TRUNCATE tmp_elo_updates"))
-
-            # Batch insert into temp table (chunks of 500)
-            batch_size = 500
-            for i in range(0, len(updates), batch_size):
-                batch = updates[i:i+batch_size]
-                values = ", ".join([f"(:mid{j}, :t1e{j}, :t2e{j})" for j in range(len(batch))])
-                params = {}
-                for j, u in enumerate(batch):
-                    params[f'mid{j}'] = u['match_id']
-                    params[f't1e{j}'] = u['team1_elo']
-                    params[f't2e{j}'] = u['team2_elo']
-                session.execute(text(f"INSERT INTO tmp_elo_updates VALUES {values}"), params)
-
-            # Single UPDATE using JOIN
-            result = session.execute(text("""
-                UPDATE matches m
-                SET team1_elo = t.team1_elo, team2_elo = t.team2_elo
-                FROM tmp_elo_updates t
-                WHERE m.id = t.match_id
-            """))
-
-            session.commit()
-            return result.rowcount
-        except Exception as e:
-            session.rollback()
-            logger.error(f"Error committing ELO updates: {e}")
-            raise
+        return write_elo_ratings(
+            session,
+            [u['match_id'] for u in updates],
+            [u['team1_elo'] for u in updates],
+            [u['team2_elo'] for u in updates],
+        )
     
     def calculate_missing_elo_ratings(self, batch_size: int = 1000,
                                     max_matches: Optional[int] = None,
@@ -451,17 +325,10 @@ class ELOUpdateService:
             earliest_new_date = min(match.date for match in new_matches)
             logger.info(f"Earliest new match date: {earliest_new_date}")
             
-            # Get all matches from that date forward to maintain chronological order
-            all_matches_from_date = session.query(Match).filter(
-                Match.date >= earliest_new_date
-            ).order_by(Match.date, Match.id).all()
-            
-            logger.info(f"Need to process {len(all_matches_from_date)} matches to maintain chronological order")
-            
-            # Calculate ELO ratings
-            stats = self.calculate_elo_for_chronological_matches(
-                all_matches_from_date, session, start_fresh=False
-            )
+            # Replay every match from that date forward to maintain chronological order, one
+            # (format, gender) rating stream at a time
+            engine, stats = replay_elos_from(session, earliest_new_date, self.k_factor)
+            self.elo_calculator.team_ratings = engine.team_ratings
             
             return stats
             
@@ -471,6 +338,36 @@ class ELOUpdateService:
         finally:
             session.close()
     
+    def replay_from_date(self, from_date: datetime, fmt: Optional[str] = None,
+                         gender: str = 'male') -> Dict[str, int]:
+        """
+        Recompute ELO ratings for every match on or after a date
+        
+        Use after a late-arriving or corrected result: only matches from the earliest
+        changed match onwards are replayed, seeded from the stored ratings before it.
+        
+        Args:
+            from_date: Date of the earliest changed match
+            fmt: Restrict to one format's rating stream (default: every (format, gender)
+                stream, each replayed on its own)
+            gender: Gender of the rating stream when fmt is given
+            
+        Returns:
+            Dictionary with processing statistics
+        """
+        session = next(get_session())
+        
+        try:
+            engine, stats = replay_elos_from(session, from_date, self.k_factor, fmt, gender)
+            self.elo_calculator.team_ratings = engine.team_ratings
+            logger.info(f"Replay complete - Processed: {stats['processed']}, Updated: {stats['updated']}")
+            return stats
+        except Exception as e:
+            logger.error(f"Error replaying ELO from {from_date}: {e}")
+            raise
+        finally:
+            session.close()
+    
     def calculate_elo_for_match_batch(self, match_ids: List[str], 
                                     optimize_for_recent: bool = True) -> Dict[str, int]:
         """
@@ -602,6 +499,12 @@ def main():
                        help='Verify ELO data quality')
     parser.add_argument('--match-ids', nargs='+',
                        help='Calculate ELO for specific match IDs')
+    parser.add_argument('--replay-from', type=str,
+                       help='Recompute ELO for every match on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--format', dest='fmt', type=str,
+                       help='Restrict --replay-from to one format (e.g. T20); default: every format')
+    parser.add_argument('--gender', type=str, default='male', choices=['male', 'female'],
+                       help='Gender of the --format rating stream (default: male)')
     parser.add_argument('--batch-size', type=int, default=1000,
                        help='Batch size for processing (default: 1000)')
     parser.add_argument('--max-matches', type=int,
@@ -650,6 +553,15 @@ def main():
             print(f"  Updated: {stats['updated']} database records")
             print(f"  Errors: {stats['errors']}")
         
+        elif args.replay_from:
+            from_date = datetime.strptime(args.replay_from, '%Y-%m-%d').date()
+            logger.info(f"🚀 Replaying ELO from {from_date}...")
+            stats = service.replay_from_date(from_date, fmt=args.fmt, gender=args.gender)
+            
+            print(f"\n✅ ELO Replay Complete!")
+            print(f"  Processed: {stats['processed']} matches")
+            print(f"  Updated: {stats['updated']} database records")
+        
         elif args.match_ids:
             logger.info(f"🚀 Calculating ELO for {len(args.match_ids)} specific matches...")
             stats = service.calculate_elo_for_new_matches(args.match_ids)
@@ -660,7 +572,7 @@ def main():
             print(f"  Errors: {stats['errors']}")
         
         else:
-            print("Please specify an action: --calculate-missing, --verify, or --match-ids")
+            print("Please specify an action: --calculate-missing, --verify, --replay-from, or --match-ids")
             parser.print_help()
     
     except Exception as e:
@@ -20,19 +20,30 @@ Usage:
     python enhanced_loadMatches.py /path/to/json/files/ --batch-size 50 --calculate-elo
     python enhanced_loadMatches.py /path/to/json/files/ --bulk-insert --calculate-elo
     python enhanced_loadMatches.py /path/to/json/files/ --calculate-elo --no-elo-optimization
+    python enhanced_loadMatches.py /path/to/json/files/ --workers 8
+
+Directories are loaded as a pipeline: a process pool parses and enriches match files into
+columnar buffers, and the parent process is the single writer that COPYs each batch of
+matches and deliveries in one transaction.
 """
 
+import csv
+import io
 import json
+import multiprocessing
 import os
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from tqdm import tqdm
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from models import Match, Delivery, Player, Base
 from database import get_database_connection
-from player_discovery import PlayerDiscoveryService, PlayerInfo
+from player_discovery import PlayerDiscoveryService, PlayerInfo, discover_match_players
 from elo_update_service import ELOUpdateService
 from services.day_night_classifier import classify_day_night, SUPPORTED_COMPETITIONS
 import logging
@@ -41,12 +52,258 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+UNKNOWN_PLAYER = {'batter_type': 'unknown', 'bowler_type': 'unknown'}
+
+# Column order of the COPY buffers (matches.format/gender and deliveries.id use their defaults)
+MATCH_COPY_COLUMNS = (
+    'id', 'date', 'venue', 'city', 'event_name', 'event_match_number', 'team1', 'team2',
+    'toss_winner', 'toss_decision', 'winner', 'outcome', 'player_of_match', 'overs',
+    'balls_per_over', 'match_type', 'competition', 'win_toss_win_match', 'bat_first',
+    'bowl_first', 'won_batting_first', 'won_fielding_first',
+)
+DELIVERY_COPY_COLUMNS = (
+    'match_id', 'innings', 'over', 'ball', 'batter', 'non_striker', 'bowler',
+    'runs_off_bat', 'extras', 'wides', 'noballs', 'byes', 'legbyes', 'penalty',
+    'wicket_type', 'player_dismissed', 'fielder', 'batting_team', 'bowling_team',
+    'striker_batter_type', 'non_striker_batter_type', 'bowler_type', 'crease_combo',
+    'ball_direction',
+)
+
+# Parsed files the pool may run ahead of the writer, per worker
+PARSE_PREFETCH_PER_WORKER = 4
+
+
+def calculate_crease_combo(striker_type: str, non_striker_type: str) -> str:
+    """Calculate crease combination"""
+    if striker_type == 'unknown' or non_striker_type == 'unknown':
+        return 'unknown'
+    elif striker_type == 'RHB' and non_striker_type == 'RHB':
+        return 'rhb_rhb'
+    elif striker_type == 'LHB' and non_striker_type == 'LHB':
+        return 'lhb_lhb'
+    elif (striker_type == 'LHB' and non_striker_type == 'RHB') or \
+         (striker_type == 'RHB' and non_striker_type == 'LHB'):
+        return 'lhb_rhb'
+    else:
+        return 'unknown'
+
+
+def calculate_ball_direction(striker_type: str, bowler_type: str) -> str:
+    """Calculate ball direction"""
+    if striker_type == 'unknown' or bowler_type == 'unknown':
+        return 'unknown'
+    elif (striker_type == 'RHB' and bowler_type in ('RO', 'LC')) or \
+         (striker_type == 'LHB' and bowler_type in ('RL', 'LO')):
+        return 'intoBatter'
+    elif (striker_type == 'LHB' and bowler_type in ('RO', 'LC')) or \
+         (striker_type == 'RHB' and bowler_type in ('RL', 'LO')):
+        return 'awayFromBatter'
+    else:
+        return 'unknown'
+
+
+def build_match_record(match_id: str, info: dict) -> Dict[str, Any]:
+    """Column values for one matches row, including the derived toss/result fields"""
+    is_international = info.get('team_type') == 'international'
+    match_type = 'international' if is_international else 'league'
+    competition = 'T20I' if is_international else info.get('event', {}).get('name')
+
+    record = {
+        'id': match_id,
+        'date': datetime.strptime(info['dates'][0], '%Y-%m-%d'),
+        'venue': info.get('venue'),
+        'city': info.get('city'),
+        'event_name': info.get('event', {}).get('name'),
+        'event_match_number': info.get('event', {}).get('match_number'),
+        'team1': info['teams'][0],
+        'team2': info['teams'][1],
+        'toss_winner': info.get('toss', {}).get('winner'),
+        'toss_decision': info.get('toss', {}).get('decision'),
+        'winner': info.get('outcome', {}).get('winner'),
+        'outcome': info.get('outcome', {}),
+        'player_of_match': info.get('player_of_match', [None])[0] if info.get('player_of_match') else None,
+        'overs': info.get('overs'),
+        'balls_per_over': info.get('balls_per_over'),
+        'match_type': match_type,
+        'competition': competition
+    }
+
+    # Calculate derived fields
+    if record['toss_winner']:
+        if record['toss_decision'] == 'bat':
+            record['bat_first'] = record['toss_winner']
+            record['bowl_first'] = record['team2'] if record['toss_winner'] == record['team1'] else record['team1']
+        else:
+            record['bowl_first'] = record['toss_winner']
+            record['bat_first'] = record['team2'] if record['toss_winner'] == record['team1'] else record['team1']
+
+        record['win_toss_win_match'] = record['toss_winner'] == record['winner']
+        if record['winner']:
+            record['won_batting_first'] = record['bat_first'] == record['winner']
+            record['won_fielding_first'] = record['bowl_first'] == record['winner']
+
+    return record
+
+
+def build_delivery_record(ball_data: dict, match_context: dict,
+                          player_cache: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """Column values for one deliveries row, with all enhancement columns populated"""
+    striker_info = player_cache.get(ball_data['batter'], UNKNOWN_PLAYER)
+    non_striker_info = player_cache.get(ball_data['non_striker'], UNKNOWN_PLAYER)
+    bowler_info = player_cache.get(ball_data['bowler'], UNKNOWN_PLAYER)
+    extras = ball_data.get('extras', {})
+
+    record = {
+        'match_id': match_context['match_id'],
+        'innings': match_context['innings'],
+        'over': match_context['over'],
+        'ball': match_context['ball'],
+        'batter': ball_data['batter'],
+        'non_striker': ball_data['non_striker'],
+        'bowler': ball_data['bowler'],
+        'runs_off_bat': ball_data['runs']['batter'],
+        'extras': ball_data['runs'].get('extras', 0),
+        'wides': extras.get('wides', 0),
+        'noballs': extras.get('noballs', 0),
+        'byes': extras.get('byes', 0),
+        'legbyes': extras.get('legbyes', 0),
+        'penalty': extras.get('penalty', 0),
+        'wicket_type': None,
+        'player_dismissed': None,
+        'fielder': None,
+        'batting_team': match_context['batting_team'],
+        'bowling_team': match_context['bowling_team'],
+        # Enhancement columns
+        'striker_batter_type': striker_info['batter_type'],
+        'non_striker_batter_type': non_striker_info['batter_type'],
+        'bowler_type': bowler_info['bowler_type'],
+        'crease_combo': calculate_crease_combo(striker_info['batter_type'], non_striker_info['batter_type']),
+        'ball_direction': calculate_ball_direction(striker_info['batter_type'], bowler_info['bowler_type']),
+    }
+
+    # Handle wickets
+    if 'wickets' in ball_data:
+        wicket = ball_data['wickets'][0]
+        record['wicket_type'] = wicket['kind']
+        record['player_dismissed'] = wicket['player_out']
+        if 'fielders' in wicket and wicket['fielders']:
+            record['fielder'] = wicket['fielders'][0].get('name')
+
+    return record
+
+
+def iter_delivery_records(match_id: str, data: dict,
+                          player_cache: Dict[str, Dict[str, str]]) -> Iterator[Dict[str, Any]]:
+    """Delivery records of a parsed match, in innings/over/ball order"""
+    teams = data['info']['teams']
+    for innings_num, innings in enumerate(data['innings'], 1):
+        batting_team = innings['team']
+        bowling_team = teams[0] if batting_team == teams[1] else teams[1]
+
+        for over in innings['overs']:
+            for ball_num, ball in enumerate(over['deliveries'], 1):
+                match_context = {
+                    'match_id': match_id,
+                    'innings': innings_num,
+                    'over': over['over'],
+                    'ball': ball_num,
+                    'batting_team': batting_team,
+                    'bowling_team': bowling_team
+                }
+                yield build_delivery_record(ball, match_context, player_cache)
+
+
+def parse_match_file(json_file: str, player_cache: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Parse and enrich one match file into write-ready buffers
+
+    Returns:
+        Dictionary with the file path, the match record, the deliveries as
+        columnar lists keyed by DELIVERY_COPY_COLUMNS, and the players seen
+    """
+    with open(json_file) as f:
+        data = json.load(f)
+
+    match_id = Path(json_file).stem
+    deliveries: Dict[str, List[Any]] = {column: [] for column in DELIVERY_COPY_COLUMNS}
+    for record in iter_delivery_records(match_id, data, player_cache):
+        for column in DELIVERY_COPY_COLUMNS:
+            deliveries[column].append(record[column])
+
+    return {
+        'file': str(json_file),
+        'match': build_match_record(match_id, data['info']),
+        'deliveries': deliveries,
+        'players': discover_match_players(data),
+    }
+
+
+_WORKER_PLAYER_CACHE: Dict[str, Dict[str, str]] = {}
+
+
+def _init_parse_worker(player_cache: Dict[str, Dict[str, str]]) -> None:
+    """Hand each parse worker the player cache once, instead of pickling it per file."""
+    global _WORKER_PLAYER_CACHE
+    _WORKER_PLAYER_CACHE = player_cache
+
+
+def _parse_match_worker(json_file: str,
+                        player_cache: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, Any]:
+    try:
+        return parse_match_file(json_file, _WORKER_PLAYER_CACHE if player_cache is None else player_cache)
+    except Exception as e:
+        return {'file': json_file, 'error': f"{type(e).__name__}: {e}"}
+
+
+def _copy_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return value
+
+
+def _column_list(columns: Iterable[str]) -> str:
+    return ', '.join(f'"{column}"' for column in columns)
+
+
+def copy_parsed_matches(cursor, parsed: List[Dict[str, Any]]) -> int:
+    """
+    COPY parsed matches and their deliveries through a DB-API cursor (no commit)
+
+    Matches are written first so the deliveries' foreign key is satisfied within
+    the same transaction. Returns the number of deliveries written.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for item in parsed:
+        match = item['match']
+        writer.writerow([_copy_value(match.get(column)) for column in MATCH_COPY_COLUMNS])
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY matches ({_column_list(MATCH_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rows = 0
+    for item in parsed:
+        columns = item['deliveries']
+        writer.writerows(zip(*(columns[column] for column in DELIVERY_COPY_COLUMNS)))
+        rows += len(columns['match_id'])
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY deliveries ({_column_list(DELIVERY_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+    )
+    return rows
+
 
 class EnhancedMatchLoader:
     """Enhanced match loader with player discovery and column population"""
     
     def __init__(self, auto_create_players: bool = True, batch_size: int = 100, 
-                 calculate_elo: bool = False, elo_batch_optimization: bool = True):
+                 calculate_elo: bool = False, elo_batch_optimization: bool = True,
+                 workers: int = 1):
         """
         Initialize the enhanced loader
         
@@ -55,9 +312,11 @@ class EnhancedMatchLoader:
             batch_size: Number of matches to process in each batch
             calculate_elo: Whether to calculate ELO ratings for new matches
             elo_batch_optimization: Whether to optimize ELO calculation for batches
+            workers: Processes parsing match files for directory loads (1 parses in-process)
         """
         self.auto_create_players = auto_create_players
         self.batch_size = batch_size
+        self.workers = max(1, workers)
         self.calculate_elo = calculate_elo
         self.elo_batch_optimization = elo_batch_optimization
         self.engine, self.SessionLocal = get_database_connection()
@@ -100,37 +359,15 @@ class EnhancedMatchLoader:
     
     def _get_player_info(self, player_name: str) -> Dict[str, str]:
         """Get player info from cache"""
-        return self.player_cache.get(player_name, {
-            'batter_type': 'unknown',
-            'bowler_type': 'unknown'
-        })
+        return self.player_cache.get(player_name, UNKNOWN_PLAYER)
     
     def _calculate_crease_combo(self, striker_type: str, non_striker_type: str) -> str:
         """Calculate crease combination"""
-        if striker_type == 'unknown' or non_striker_type == 'unknown':
-            return 'unknown'
-        elif striker_type == 'RHB' and non_striker_type == 'RHB':
-            return 'rhb_rhb'
-        elif striker_type == 'LHB' and non_striker_type == 'LHB':
-            return 'lhb_lhb'
-        elif (striker_type == 'LHB' and non_striker_type == 'RHB') or \
-             (striker_type == 'RHB' and non_striker_type == 'LHB'):
-            return 'lhb_rhb'
-        else:
-            return 'unknown'
+        return calculate_crease_combo(striker_type, non_striker_type)
     
     def _calculate_ball_direction(self, striker_type: str, bowler_type: str) -> str:
         """Calculate ball direction"""
-        if striker_type == 'unknown' or bowler_type == 'unknown':
-            return 'unknown'
-        elif (striker_type == 'RHB' and bowler_type in ('RO', 'LC')) or \
-             (striker_type == 'LHB' and bowler_type in ('RL', 'LO')):
-            return 'intoBatter'
-        elif (striker_type == 'LHB' and bowler_type in ('RO', 'LC')) or \
-             (striker_type == 'RHB' and bowler_type in ('RL', 'LO')):
-            return 'awayFromBatter'
-        else:
-            return 'unknown'
+        return calculate_ball_direction(striker_type, bowler_type)
     
     def ensure_players_exist(self, json_file: str, session: Session) -> int:
         """
@@ -178,54 +415,7 @@ class EnhancedMatchLoader:
         Returns:
             Delivery object with all columns populated
         """
-        # Get player information
-        striker_info = self._get_player_info(ball_data['batter'])
-        non_striker_info = self._get_player_info(ball_data['non_striker'])
-        bowler_info = self._get_player_info(ball_data['bowler'])
-        
-        # Create basic delivery
-        delivery = Delivery(
-            match_id=match_context['match_id'],
-            innings=match_context['innings'],
-            over=match_context['over'],
-            ball=match_context['ball'],
-            batter=ball_data['batter'],
-            non_striker=ball_data['non_striker'],
-            bowler=ball_data['bowler'],
-            runs_off_bat=ball_data['runs']['batter'],
-            extras=ball_data['runs'].get('extras', 0),
-            wides=ball_data.get('extras', {}).get('wides', 0),
-            noballs=ball_data.get('extras', {}).get('noballs', 0),
-            byes=ball_data.get('extras', {}).get('byes', 0),
-            legbyes=ball_data.get('extras', {}).get('legbyes', 0),
-            penalty=ball_data.get('extras', {}).get('penalty', 0),
-            batting_team=match_context['batting_team'],
-            bowling_team=match_context['bowling_team'],
-            # Populate enhancement columns during creation
-            striker_batter_type=striker_info['batter_type'],
-            non_striker_batter_type=non_striker_info['batter_type'],
-            bowler_type=bowler_info['bowler_type']
-        )
-        
-        # Calculate derived columns
-        delivery.crease_combo = self._calculate_crease_combo(
-            delivery.striker_batter_type, 
-            delivery.non_striker_batter_type
-        )
-        delivery.ball_direction = self._calculate_ball_direction(
-            delivery.striker_batter_type,
-            delivery.bowler_type
-        )
-        
-        # Handle wickets
-        if 'wickets' in ball_data:
-            wicket = ball_data['wickets'][0]
-            delivery.wicket_type = wicket['kind']
-            delivery.player_dismissed = wicket['player_out']
-            if 'fielders' in wicket and wicket['fielders']:
-                delivery.fielder = wicket['fielders'][0].get('name')
-        
-        return delivery
+        return Delivery(**build_delivery_record(ball_data, match_context, self.player_cache))
     
     def load_match_with_enhanced_columns(self, json_file: str, session: Session) -> bool:
         """
@@ -258,68 +448,18 @@ class EnhancedMatchLoader:
                 self._load_player_cache(session)
             
             # Create match record
-            info = data['info']
-            is_international = info.get('team_type') == 'international'
-            match_type = 'international' if is_international else 'league'
-            competition = 'T20I' if is_international else info.get('event', {}).get('name')
-            
-            match = Match(
-                id=match_id,
-                date=datetime.strptime(info['dates'][0], '%Y-%m-%d'),
-                venue=info.get('venue'),
-                city=info.get('city'),
-                event_name=info.get('event', {}).get('name'),
-                event_match_number=info.get('event', {}).get('match_number'),
-                team1=info['teams'][0],
-                team2=info['teams'][1],
-                toss_winner=info.get('toss', {}).get('winner'),
-                toss_decision=info.get('toss', {}).get('decision'),
-                winner=info.get('outcome', {}).get('winner'),
-                outcome=info.get('outcome', {}),
-                player_of_match=info.get('player_of_match', [None])[0] if info.get('player_of_match') else None,
-                overs=info.get('overs'),
-                balls_per_over=info.get('balls_per_over'),
-                match_type=match_type,
-                competition=competition
-            )
-            
-            # Calculate derived match fields
-            if match.toss_winner:
-                if match.toss_decision == 'bat':
-                    match.bat_first = match.toss_winner
-                    match.bowl_first = match.team2 if match.toss_winner == match.team1 else match.team1
-                else:
-                    match.bowl_first = match.toss_winner
-                    match.bat_first = match.team2 if match.toss_winner == match.team1 else match.team1
-                
-                match.win_toss_win_match = match.toss_winner == match.winner
-                if match.winner:
-                    match.won_batting_first = match.bat_first == match.winner
-                    match.won_fielding_first = match.bowl_first == match.winner
+            match = Match(**build_match_record(match_id, data['info']))
+            competition = match.competition
             
             # Insert match record first
             session.add(match)
             session.flush()  # Get the ID but don't commit yet
             
             # Process deliveries with enhancement columns
-            deliveries = []
-            for innings_num, innings in enumerate(data['innings'], 1):
-                batting_team = innings['team']
-                bowling_team = info['teams'][0] if batting_team == info['teams'][1] else info['teams'][1]
-                
-                for over in innings['overs']:
-                    for ball_num, ball in enumerate(over['deliveries'], 1):
-                        match_context = {
-                            'match_id': match_id,
-                            'innings': innings_num,
-                            'over': over['over'],
-                            'ball': ball_num,
-                            'batting_team': batting_team,
-                            'bowling_team': bowling_team
-                        }
-                        
-                        delivery = self.create_enhanced_delivery(ball, match_context)
-                        deliveries.append(delivery)
+            deliveries = [
+                Delivery(**record)
+                for record in iter_delivery_records(match_id, data, self.player_cache)
+            ]
             
             # Bulk insert deliveries
             session.bulk_save_objects(deliveries)
@@ -371,6 +511,138 @@ class EnhancedMatchLoader:
         
         return errors
     
+    def iter_parsed_files(self, json_files: List[Path]) -> Iterator[Dict[str, Any]]:
+        """
+        Parsed match buffers in file order (see parse_match_file)
+        
+        With more than one worker, files are parsed in a spawned process pool that
+        receives the player cache once per worker and runs at most
+        PARSE_PREFETCH_PER_WORKER files per worker ahead of the consumer.
+        Files that fail to parse come back as {'file', 'error'} entries.
+        """
+        paths = [str(json_file) for json_file in json_files]
+        if self.workers == 1 or len(paths) <= 1:
+            for path in paths:
+                yield _parse_match_worker(path, self.player_cache)
+            return
+        
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(paths)),
+            mp_context=context,
+            initializer=_init_parse_worker,
+            initargs=(self.player_cache,),
+        ) as pool:
+            remaining = iter(paths)
+            pending = deque(
+                pool.submit(_parse_match_worker, path)
+                for path in islice(remaining, self.workers * PARSE_PREFETCH_PER_WORKER)
+            )
+            while pending:
+                result = pending.popleft().result()
+                next_path = next(remaining, None)
+                if next_path is not None:
+                    pending.append(pool.submit(_parse_match_worker, next_path))
+                yield result
+    
+    def _create_players_for_batch(self, parsed: List[Dict[str, Any]]) -> int:
+        """Create placeholder players seen in this batch but not in the player cache"""
+        if not self.auto_create_players:
+            return 0
+        
+        missing_players: Dict[str, PlayerInfo] = {}
+        for item in parsed:
+            for player_name, info in item['players'].items():
+                if player_name in self.player_cache:
+                    continue
+                if player_name in missing_players:
+                    seen = missing_players[player_name]
+                    seen.team_countries |= info.team_countries
+                    seen.likely_nationality = seen.likely_nationality or info.likely_nationality
+                else:
+                    missing_players[player_name] = info
+        
+        if not missing_players:
+            return 0
+        
+        created_count = self.player_discovery.create_placeholder_players(missing_players)
+        for player_name in missing_players:
+            self.player_cache[player_name] = dict(UNKNOWN_PLAYER)
+        return created_count
+    
+    def write_parsed_batch(self, parsed: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+        """
+        Write one batch of parsed matches with COPY in a single transaction
+        
+        If the batch is rejected, it is rolled back and its files are loaded one at
+        a time through the ORM path so a single bad file only fails itself.
+        
+        Returns:
+            List of (filename, error) tuples for failed matches
+        """
+        if not parsed:
+            return []
+        
+        raw = self.engine.raw_connection()
+        try:
+            copy_parsed_matches(raw.cursor(), parsed)
+            raw.commit()
+            copied = True
+        except Exception as e:
+            raw.rollback()
+            copied = False
+            logger.warning(f"Batch COPY failed ({e}); loading its {len(parsed)} matches one by one")
+        finally:
+            raw.close()
+        
+        if not copied:
+            session = self.SessionLocal()
+            try:
+                return self.process_matches_batch([Path(item['file']) for item in parsed], session)
+            finally:
+                session.close()
+        
+        for item in parsed:
+            match = item['match']
+            if self.calculate_elo:
+                self.newly_loaded_matches.append(match['id'])
+            if match['competition'] in SUPPORTED_COMPETITIONS:
+                self.newly_loaded_groups.add((match['date'], match['competition']))
+        return []
+    
+    def load_files_pipelined(self, json_files: List[Path], stats: Dict[str, int]) -> List[Tuple[str, str]]:
+        """
+        Parse files in the worker pool and COPY them in batches of batch_size
+        
+        Returns:
+            List of (filename, error) tuples for failed matches
+        """
+        all_errors: List[Tuple[str, str]] = []
+        batch: List[Dict[str, Any]] = []
+        
+        def flush(parsed: List[Dict[str, Any]]) -> None:
+            stats['new_players_created'] = stats.get('new_players_created', 0) + self._create_players_for_batch(parsed)
+            batch_errors = self.write_parsed_batch(parsed)
+            all_errors.extend(batch_errors)
+            stats['processed'] += len(parsed) - len(batch_errors)
+            stats['errors'] += len(batch_errors)
+        
+        logger.info(f"Parsing with {self.workers} worker(s), writing batches of {self.batch_size}")
+        for parsed in tqdm(self.iter_parsed_files(json_files), total=len(json_files), desc="Loading matches"):
+            if 'error' in parsed:
+                logger.error(f"Error parsing {parsed['file']}: {parsed['error']}")
+                all_errors.append((parsed['file'], parsed['error']))
+                stats['errors'] += 1
+                continue
+            batch.append(parsed)
+            if len(batch) >= self.batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        
+        return all_errors
+    
     def calculate_elo_for_loaded_matches(self) -> Dict[str, int]:
         """
         Calculate ELO ratings for newly loaded matches
@@ -538,22 +810,8 @@ class EnhancedMatchLoader:
                     logger.info("No new matches to process!")
                     return stats
                 
-                # Process in batches
-                all_errors = []
-                for i in range(0, len(files_to_process), self.batch_size):
-                    batch = files_to_process[i:i + self.batch_size]
-                    batch_num = i // self.batch_size + 1
-                    total_batches = (len(files_to_process) + self.batch_size - 1) // self.batch_size
-                    
-                    logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch)} matches)")
-                    
-                    batch_errors = self.process_matches_batch(batch, session)
-                    all_errors.extend(batch_errors)
-                    
-                    # Update stats
-                    batch_processed = len(batch) - len(batch_errors)
-                    stats['processed'] += batch_processed
-                    stats['errors'] += len(batch_errors)
+                # Parse in the worker pool, COPY in batches from this process
+                all_errors = self.load_files_pipelined(files_to_process, stats)
                 
                 # Report errors
                 if all_errors:
@@ -666,102 +924,9 @@ class EnhancedMatchLoader:
                     
                     files_processed.append(json_file)
                     
-                    # Prepare match record
-                    info = data['info']
-                    is_international = info.get('team_type') == 'international'
-                    match_type = 'international' if is_international else 'league'
-                    competition = 'T20I' if is_international else info.get('event', {}).get('name')
-                    
-                    match_dict = {
-                        'id': match_id,
-                        'date': datetime.strptime(info['dates'][0], '%Y-%m-%d'),
-                        'venue': info.get('venue'),
-                        'city': info.get('city'),
-                        'event_name': info.get('event', {}).get('name'),
-                        'event_match_number': info.get('event', {}).get('match_number'),
-                        'team1': info['teams'][0],
-                        'team2': info['teams'][1],
-                        'toss_winner': info.get('toss', {}).get('winner'),
-                        'toss_decision': info.get('toss', {}).get('decision'),
-                        'winner': info.get('outcome', {}).get('winner'),
-                        'outcome': info.get('outcome', {}),
-                        'player_of_match': info.get('player_of_match', [None])[0] if info.get('player_of_match') else None,
-                        'overs': info.get('overs'),
-                        'balls_per_over': info.get('balls_per_over'),
-                        'match_type': match_type,
-                        'competition': competition
-                    }
-                    
-                    # Calculate derived fields
-                    if match_dict['toss_winner']:
-                        if match_dict['toss_decision'] == 'bat':
-                            match_dict['bat_first'] = match_dict['toss_winner']
-                            match_dict['bowl_first'] = match_dict['team2'] if match_dict['toss_winner'] == match_dict['team1'] else match_dict['team1']
-                        else:
-                            match_dict['bowl_first'] = match_dict['toss_winner']
-                            match_dict['bat_first'] = match_dict['team2'] if match_dict['toss_winner'] == match_dict['team1'] else match_dict['team1']
-                        
-                        match_dict['win_toss_win_match'] = match_dict['toss_winner'] == match_dict['winner']
-                        if match_dict['winner']:
-                            match_dict['won_batting_first'] = match_dict['bat_first'] == match_dict['winner']
-                            match_dict['won_fielding_first'] = match_dict['bowl_first'] == match_dict['winner']
-                    
-                    matches_to_insert.append(match_dict)
-                    
-                    # Prepare delivery records with enhancement columns
-                    for innings_num, innings in enumerate(data['innings'], 1):
-                        batting_team = innings['team']
-                        bowling_team = info['teams'][0] if batting_team == info['teams'][1] else info['teams'][1]
-                        
-                        for over in innings['overs']:
-                            for ball_num, ball in enumerate(over['deliveries'], 1):
-                                # Get player info for enhancement columns
-                                striker_info = self._get_player_info(ball['batter'])
-                                non_striker_info = self._get_player_info(ball['non_striker'])
-                                bowler_info = self._get_player_info(ball['bowler'])
-                                
-                                delivery_dict = {
-                                    'match_id': match_id,
-                                    'innings': innings_num,
-                                    'over': over['over'],
-                                    'ball': ball_num,
-                                    'batter': ball['batter'],
-                                    'non_striker': ball['non_striker'],
-                                    'bowler': ball['bowler'],
-                                    'runs_off_bat': ball['runs']['batter'],
-                                    'extras': ball['runs'].get('extras', 0),
-                                    'wides': ball.get('extras', {}).get('wides', 0),
-                                    'noballs': ball.get('extras', {}).get('noballs', 0),
-                                    'byes': ball.get('extras', {}).get('byes', 0),
-                                    'legbyes': ball.get('extras', {}).get('legbyes', 0),
-                                    'penalty': ball.get('extras', {}).get('penalty', 0),
-                                    'batting_team': batting_team,
-                                    'bowling_team': bowling_team,
-                                    # Enhancement columns
-                                    'striker_batter_type': striker_info['batter_type'],
-                                    'non_striker_batter_type': non_striker_info['batter_type'],
-                                    'bowler_type': bowler_info['bowler_type']
-                                }
-                                
-                                # Calculate derived columns
-                                delivery_dict['crease_combo'] = self._calculate_crease_combo(
-                                    striker_info['batter_type'], 
-                                    non_striker_info['batter_type']
-                                )
-                                delivery_dict['ball_direction'] = self._calculate_ball_direction(
-                                    striker_info['batter_type'],
-                                    bowler_info['bowler_type']
-                                )
-                                
-                                # Handle wickets
-                                if 'wickets' in ball:
-                                    wicket = ball['wickets'][0]
-                                    delivery_dict['wicket_type'] = wicket['kind']
-                                    delivery_dict['player_dismissed'] = wicket['player_out']
-                                    if 'fielders' in wicket and wicket['fielders']:
-                                        delivery_dict['fielder'] = wicket['fielders'][0].get('name')
-                                
-                                deliveries_to_insert.append(delivery_dict)
+                    # Prepare match and delivery records with enhancement columns
+                    matches_to_insert.append(build_match_record(match_id, data['info']))
+                    deliveries_to_insert.extend(iter_delivery_records(match_id, data, self.player_cache))
                 
                 except Exception as e:
                     logger.error(f"Error preparing {json_file}: {e}")
@@ -835,6 +1000,8 @@ def main():
                        help='Calculate ELO ratings for newly loaded matches')
     parser.add_argument('--no-elo-optimization', action='store_true',
                        help='Disable ELO batch optimization (slower but more accurate)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help='Processes parsing match files for directory loads (default: CPU count)')
     
     args = parser.parse_args()
     
@@ -843,7 +1010,8 @@ def main():
         auto_create_players=not args.no_auto_create_players,
         batch_size=args.batch_size,
         calculate_elo=args.calculate_elo,
-        elo_batch_optimization=not args.no_elo_optimization
+        elo_batch_optimization=not args.no_elo_optimization,
+        workers=args.workers
     )
     
     try:
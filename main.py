@@ -8,7 +8,7 @@ from sqlalchemy import func, desc, and_, or_
 from pydantic import BaseModel
 from collections import defaultdict
 from statistics import mean
-from database import database, get_session, initialize_database
+from database import database, engine, get_session, initialize_database
 from models import Match, Delivery, Player, BattingStats, BowlingStats
 # main.py (add to existing FastAPI app)
 from fastapi import FastAPI, Depends, HTTPException
@@ -20,6 +20,8 @@ from pydantic import BaseModel
 from datetime import date
 import logging
 from models import teams_mapping
+from services.player_aliases import ensure_alias_map
+from services.duckdb_backend import log_backend_status as log_duckdb_backend_status
 from typing import List, Dict, Optional
 from datetime import date, datetime
 from models import teams_mapping
@@ -57,6 +59,7 @@ from services.delivery_data_service import (
 )
 from services.bowler_types import BOWLER_CATEGORY_SQL
 from services.player_aliases import get_player_names
+from services.cache import cache_stats
 import math
 
 from dotenv import load_dotenv
@@ -148,6 +151,13 @@ async def db_error_middleware(request, call_next):
 @app.on_event("startup")
 def startup():
     initialize_database()
+    # Alias-joined queries read the player_alias_map views; create them on a fresh deploy.
+    try:
+        with engine.begin() as conn:
+            ensure_alias_map(conn)
+    except Exception as e:
+        logging.warning(f"Could not ensure player alias map views: {e}")
+    log_duckdb_backend_status()
     logging.info("Application startup complete")
 
 
@@ -159,6 +169,12 @@ def read_root():
             "version": "1.0"}
 
 
+@app.get("/cache/stats", include_in_schema=False)
+def get_cache_stats():
+    """Hit/miss/eviction counters and usage for every shared cache namespace in this worker."""
+    return cache_stats()
+
+
 def _build_ipl_predictions_dashboard_html() -> str:
     return """<!doctype html>
 <html lang="en">
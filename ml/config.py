@@ -6,6 +6,22 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 ML_ROOT = PROJECT_ROOT / "ml"
 MODEL_DIR = ML_ROOT / "models"
+# Parallel training-frame extraction (FeatureEngineer.build_match_training_frame).
+# Workers fork from the trainer, so 1 keeps everything in-process.
+FEATURE_WORKERS = 1
+FEATURE_CHUNK_SIZE = 50
+# Leagues trained concurrently by `train_model --train-all-leagues`; CPUs are split between jobs.
+LEAGUE_JOBS = 1
+# Content-addressed fits keyed on training frames + hyperparameters (ml/train_model.py).
+# Least recently used fits beyond ARTIFACT_CACHE_MAX_ENTRIES are deleted. Bump the version when
+# feature extraction changes: fits are also looked up by source-data marker before extraction.
+ARTIFACT_CACHE_DIR = ML_ROOT / "artifact_cache"
+ARTIFACT_CACHE_VERSION = 1
+ARTIFACT_CACHE_MAX_ENTRIES = 32
+# Persisted as-of aggregates for delivery_details features (ml/feature_store.py).
+FEATURE_STORE_DIR = ML_ROOT / "feature_store"
+# How often the resident model registry (ml/model_registry.py) looks for a newer promoted version.
+MODEL_REGISTRY_RECHECK_SECONDS = 60.0
 
 MODEL_VERSION_PREFIX = "v"
 RECENCY_HALF_LIFE_DAYS = 240.0
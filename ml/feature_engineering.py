@@ -7,8 +7,11 @@ available before each match date (temporal-safe feature construction).
 from __future__ import annotations
 
 import math
+import multiprocessing
+import os
 import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import date
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
@@ -19,6 +22,7 @@ from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
 from ml import config
+from ml.feature_store import FeatureStore, LEAGUE_SCOPE, VENUE_SCOPE, delivery_fingerprint
 
 
 def _safe_float(value: Any) -> Optional[float]:
@@ -44,10 +48,66 @@ def _row_to_dict(row: Any) -> Dict[str, Any]:
     return dict(row)
 
 
-def _normalize_style(style: Optional[str]) -> Optional[str]:
-    if not style:
-        return None
-    return "".join(ch for ch in style.upper() if ch.isalnum())
+def _prepare_delivery_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the derived columns the feature store aggregates (runs, phase, flags, bowl group)."""
+    # Pre-compute derived columns used by multiple feature methods.
+    # Force numeric types for columns that may come back as TEXT from SQLite.
+    for _num_col in ["score", "noball", "wide", "byes", "legbyes", "over", "wagon_zone", "control"]:
+        if _num_col in df.columns:
+            df[_num_col] = pd.to_numeric(df[_num_col], errors="coerce")
+
+    df["ball_runs"] = (
+        df["score"].fillna(0)
+        + df["noball"].fillna(0)
+        + df["wide"].fillna(0)
+        + df["byes"].fillna(0)
+        + df["legbyes"].fillna(0)
+    )
+    df["phase"] = pd.cut(
+        df["over"].fillna(0),
+        bins=[-1, 5, 14, 50],
+        labels=["pp", "middle", "death"],
+    )
+    df["is_dot"] = (df["ball_runs"] == 0).astype(int)
+    df["is_boundary"] = df["score"].fillna(0).isin([4, 6]).astype(int)
+    out_col = df["out"].astype(str).str.lower().fillna("")
+    df["is_wicket"] = out_col.isin(["1", "true", "t", "yes", "y"]).astype(int)
+    # Normalize bowl_kind into pace/spin/other — values are like "pace bowler", "spin bowler"
+    bk = df["bowl_kind"].fillna("").str.lower()
+    df["bowl_group"] = np.where(
+        bk.str.contains("pace|medium|fast", regex=True), "pace",
+        np.where(bk.str.contains("spin|orthodox|wrist", regex=True), "spin", "other")
+    )
+
+    # Parsed match date, used to key the feature store by day.
+    df["_match_date_dt"] = pd.to_datetime(df["match_date"], errors="coerce")
+    df = df.sort_values("_match_date_dt").reset_index(drop=True)
+    return df
+
+
+# Engineer shared with forked training-frame workers. Set in the parent just before the pool
+# forks, so the preloaded feature store and caches are inherited copy-on-write, not pickled.
+_WORKER_ENGINEER: Optional["FeatureEngineer"] = None
+
+
+def _init_feature_worker() -> None:
+    """Give a forked worker its own DB connection; the parent's pooled ones must not be reused."""
+    engineer = _WORKER_ENGINEER
+    bind = engineer.db.get_bind()
+    bind.dispose(close=False)
+    engineer.db = Session(bind=bind)
+
+
+def _extract_feature_chunk(
+    chunk_index: int,
+    matches: List[Dict[str, Any]],
+    feature_cols: Sequence[str],
+) -> Tuple[int, List[Dict[str, Any]], int, float]:
+    engineer = _WORKER_ENGINEER
+    started = time.time()
+    engineer._ping_db()
+    rows = [engineer._match_training_row(match, feature_cols) for match in matches]
+    return chunk_index, rows, os.getpid(), time.time() - started
 
 
 class FeatureEngineer:
@@ -67,8 +127,11 @@ class FeatureEngineer:
         # Batch caches — populated by _preload_batch_caches() before the match loop.
         self._team_phase_cache: Optional[Dict[tuple, Dict[str, Any]]] = None
         self._player_baseline_cache: Optional[Dict[str, Dict[str, Any]]] = None
-        # In-memory delivery_details cache (all competitions for cross-league venue features).
+        # In-memory delivery_details frame; only loaded to (re)build the feature store.
         self._dd_df: Optional[pd.DataFrame] = None
+        self._dd_league_df: Optional[pd.DataFrame] = None
+        # As-of aggregates behind the delivery_details features (see ml/feature_store.py).
+        self._feature_store: Optional[FeatureStore] = None
         # Competition filter used during training (for league-specific team features).
         self._league_competitions: Optional[Sequence[str]] = None
 
@@ -136,19 +199,16 @@ class FeatureEngineer:
     # Batch preloading for SQL optimization
     # ---------------------------------------------------------------------
     def _preload_batch_caches(self, competitions: Optional[Sequence[str]] = None) -> None:
-        """Preload team_phase_stats, player_baselines, and delivery_details to avoid per-match queries.
+        """Preload team_phase_stats, player_baselines, and the delivery_details feature store.
 
-        delivery_details are loaded WITHOUT competition filter so that venue
-        features can use cross-league data.  The ``competitions`` argument is
-        stored so that team-specific feature methods can filter in-memory via
-        ``_dd_before_league()``.
+        Venue-scoped features use every competition (cross-league data); the
+        ``competitions`` argument scopes the team-specific (league) features.
         """
         self._league_competitions = list(competitions) if competitions else None
         self._preload_team_phase_stats()
         self._preload_player_baselines()
         if not self.fast_mode:
-            # Load ALL delivery_details (cross-league) for venue features.
-            self._preload_delivery_details(competitions=None)
+            self._preload_feature_store()
 
     def _preload_team_phase_stats(self) -> None:
         if not self._table_columns("team_phase_stats"):
@@ -173,7 +233,7 @@ class FeatureEngineer:
         self._team_phase_cache = dict(cache)
 
     def _preload_delivery_details(self, competitions: Optional[Sequence[str]] = None) -> None:
-        """Preload delivery_details into memory for fast in-memory aggregation."""
+        """Load delivery_details into memory as the source frame for FeatureStore.build."""
         if not self._table_columns("delivery_details"):
             self._dd_df = pd.DataFrame()
             return
@@ -202,44 +262,12 @@ class FeatureEngineer:
             {where}
         """
         self._dd_df = pd.read_sql(text(sql), self.db.bind, params=params)
-        # Pre-compute derived columns used by multiple feature methods.
-        # Force numeric types for columns that may come back as TEXT from SQLite.
-        for _num_col in ["score", "noball", "wide", "byes", "legbyes", "over", "wagon_zone", "control"]:
-            if _num_col in self._dd_df.columns:
-                self._dd_df[_num_col] = pd.to_numeric(self._dd_df[_num_col], errors="coerce")
-
-        self._dd_df["ball_runs"] = (
-            self._dd_df["score"].fillna(0)
-            + self._dd_df["noball"].fillna(0)
-            + self._dd_df["wide"].fillna(0)
-            + self._dd_df["byes"].fillna(0)
-            + self._dd_df["legbyes"].fillna(0)
-        )
-        self._dd_df["phase"] = pd.cut(
-            self._dd_df["over"].fillna(0),
-            bins=[-1, 5, 14, 50],
-            labels=["pp", "middle", "death"],
-        )
-        self._dd_df["is_dot"] = (self._dd_df["ball_runs"] == 0).astype(int)
-        self._dd_df["is_boundary"] = self._dd_df["score"].fillna(0).isin([4, 6]).astype(int)
-        out_col = self._dd_df["out"].astype(str).str.lower().fillna("")
-        self._dd_df["is_wicket"] = out_col.isin(["1", "true", "t", "yes", "y"]).astype(int)
-        # Normalize bowl_kind into pace/spin/other — values are like "pace bowler", "spin bowler"
-        bk = self._dd_df["bowl_kind"].fillna("").str.lower()
-        self._dd_df["bowl_group"] = np.where(
-            bk.str.contains("pace|medium|fast", regex=True), "pace",
-            np.where(bk.str.contains("spin|orthodox|wrist", regex=True), "spin", "other")
-        )
-
-        # --- Performance optimization: sort by match_date for fast temporal filtering ---
-        # Convert match_date to datetime for fast comparisons and sort.
-        self._dd_df["_match_date_dt"] = pd.to_datetime(self._dd_df["match_date"], errors="coerce")
-        self._dd_df = self._dd_df.sort_values("_match_date_dt").reset_index(drop=True)
+        self._dd_df = _prepare_delivery_frame(self._dd_df)
 
         # Pre-build league-filtered subset for team features.
         if self._league_competitions:
             comp_set = set(self._league_competitions)
-            self._dd_league_df: Optional[pd.DataFrame] = self._dd_df[
+            self._dd_league_df = self._dd_df[
                 self._dd_df["competition"].isin(comp_set)
             ].copy()
             print(f"[feature_engineering] League-filtered DD: {len(self._dd_league_df)} rows")
@@ -248,28 +276,33 @@ class FeatureEngineer:
 
         print(f"[feature_engineering] Preloaded {len(self._dd_df)} delivery_details rows into memory")
 
-    def _dd_before(self, match_date: str) -> pd.DataFrame:
-        """Return delivery_details rows before the given match date (ALL competitions).
+    def _preload_feature_store(self) -> None:
+        """Load the persisted as-of feature store, rebuilding any scope that is stale.
 
-        Uses sorted datetime index with searchsorted for O(log n) cutoff.
+        Only a rebuild reads delivery_details into memory; the frame is dropped again
+        once the store has been built and saved.
         """
-        if self._dd_df is None or self._dd_df.empty:
-            return pd.DataFrame()
-        cutoff = pd.Timestamp(match_date)
-        idx = self._dd_df["_match_date_dt"].searchsorted(cutoff, side="left")
-        return self._dd_df.iloc[:idx]
-
-    def _dd_before_league(self, match_date: str) -> pd.DataFrame:
-        """Return league-filtered delivery_details rows before the given match date.
+        if not self._table_columns("delivery_details"):
+            self._feature_store = FeatureStore()
+            return
+        fingerprint = delivery_fingerprint(self.db)
+        store = FeatureStore.load(config.FEATURE_STORE_DIR, self._league_competitions, fingerprint)
+        missing = {VENUE_SCOPE, LEAGUE_SCOPE} - store.scopes
+        if missing:
+            print(f"[feature_engineering] Building feature store scopes: {', '.join(sorted(missing))}")
+            self._preload_delivery_details(competitions=None)
+            built = FeatureStore.build(self._dd_df, self._dd_league_df, scopes=missing)
+            built.save(config.FEATURE_STORE_DIR, self._league_competitions, fingerprint)
+            store = store.merged(built)
+            self._dd_df = None
+            self._dd_league_df = None
+        self._feature_store = store
 
-        Uses pre-built league subset with sorted datetime index for fast cutoff.
-        """
-        source = self._dd_league_df if self._dd_league_df is not None else self._dd_df
-        if source is None or source.empty:
-            return self._dd_df.iloc[:0] if self._dd_df is not None else pd.DataFrame()
-        cutoff = pd.Timestamp(match_date)
-        idx = source["_match_date_dt"].searchsorted(cutoff, side="left")
-        return source.iloc[:idx]
+    def _as_of(self, family: str, key: Any, match_date: Any) -> pd.DataFrame:
+        """``family`` aggregates for ``key`` over deliveries before ``match_date``."""
+        if self._feature_store is None or not key:
+            return pd.DataFrame()
+        return self._feature_store.as_of(family, key, match_date)
 
     def _preload_player_baselines(self) -> None:
         if not self._table_columns("player_baselines"):
@@ -357,7 +390,14 @@ class FeatureEngineer:
         end_date: Optional[date] = None,
         competitions: Optional[Sequence[str]] = None,
         verbose: bool = True,
+        workers: Optional[int] = None,
     ) -> pd.DataFrame:
+        """One feature row per completed match.
+
+        With ``workers`` > 1 the matches are split into date-ordered chunks and extracted by a
+        forked worker pool (see ``_extract_rows_parallel``); the result is identical to the
+        serial build.
+        """
         matches_df = self.list_completed_matches(
             limit=limit,
             start_date=start_date,
@@ -374,37 +414,22 @@ class FeatureEngineer:
 
         feature_cols = config.FAST_MODE_FEATURES if self.fast_mode else config.MATCH_FEATURE_COLUMNS
 
-        rows: List[Dict[str, Any]] = []
-        total = len(matches_df)
-
-        for idx, match in enumerate(matches_df.to_dict(orient="records"), start=1):
-            # Periodically ping DB to keep connection alive on long runs.
-            if idx % 100 == 1:
-                self._ping_db()
-
-            features = self._extract_with_retry(match)
-            score_1, score_2 = self._get_match_scores(match["id"])
-
-            row: Dict[str, Any] = {
-                "match_id": match["id"],
-                "match_date": match["date"],
-                "team1": match["team1"],
-                "team2": match["team2"],
-                "actual_winner": match["winner"],
-                "winner_label": 1 if match["winner"] == match["team1"] else 0,
-                "score_1st_actual": score_1,
-                "score_2nd_actual": score_2,
-            }
-            row.update(features)
-
-            # Keep stable column availability for downstream training.
-            for feature_name in feature_cols:
-                row.setdefault(feature_name, None)
+        matches = matches_df.to_dict(orient="records")
+        workers = config.FEATURE_WORKERS if workers is None else workers
+        if workers > 1 and len(matches) > config.FEATURE_CHUNK_SIZE:
+            rows = self._extract_rows_parallel(matches, feature_cols, workers, verbose)
+        else:
+            rows = []
+            total = len(matches)
+            for idx, match in enumerate(matches, start=1):
+                # Periodically ping DB to keep connection alive on long runs.
+                if idx % 100 == 1:
+                    self._ping_db()
 
-            rows.append(row)
+                rows.append(self._match_training_row(match, feature_cols))
 
-            if verbose and idx % 200 == 0:
-                print(f"[feature_engineering] processed matches: {idx}/{total}")
+                if verbose and idx % 200 == 0:
+                    print(f"[feature_engineering] processed matches: {idx}/{total}")
 
         out = pd.DataFrame(rows)
         if out.empty:
@@ -415,6 +440,85 @@ class FeatureEngineer:
         out = out.sort_values(["match_date", "match_id"]).reset_index(drop=True)
         return out
 
+    def _match_training_row(self, match: Dict[str, Any], feature_cols: Sequence[str]) -> Dict[str, Any]:
+        features = self._extract_with_retry(match)
+        score_1, score_2 = self._get_match_scores(match["id"])
+
+        row: Dict[str, Any] = {
+            "match_id": match["id"],
+            "match_date": match["date"],
+            "team1": match["team1"],
+            "team2": match["team2"],
+            "actual_winner": match["winner"],
+            "winner_label": 1 if match["winner"] == match["team1"] else 0,
+            "score_1st_actual": score_1,
+            "score_2nd_actual": score_2,
+        }
+        row.update(features)
+
+        # Keep stable column availability for downstream training.
+        for feature_name in feature_cols:
+            row.setdefault(feature_name, None)
+        return row
+
+    def _extract_rows_parallel(
+        self,
+        matches: List[Dict[str, Any]],
+        feature_cols: Sequence[str],
+        workers: int,
+        verbose: bool,
+    ) -> List[Dict[str, Any]]:
+        """Extract training rows across a forked worker pool, merged back in match order.
+
+        Workers inherit this engineer (feature store, team-phase and baseline caches) through
+        fork's copy-on-write pages and open their own DB connection. Falls back to serial
+        extraction where fork is unavailable.
+        """
+        global _WORKER_ENGINEER
+        if "fork" not in multiprocessing.get_all_start_methods():
+            print("[feature_engineering] fork unavailable; extracting features serially")
+            return [self._match_training_row(match, feature_cols) for match in matches]
+
+        size = config.FEATURE_CHUNK_SIZE
+        chunks = [matches[i:i + size] for i in range(0, len(matches), size)]
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        worker_stats: Dict[int, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        done = 0
+        started = time.time()
+
+        _WORKER_ENGINEER = self
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(chunks)),
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_feature_worker,
+            ) as pool:
+                futures = [
+                    pool.submit(_extract_feature_chunk, idx, chunk, list(feature_cols))
+                    for idx, chunk in enumerate(chunks)
+                ]
+                for future in as_completed(futures):
+                    chunk_index, rows, pid, elapsed = future.result()
+                    results[chunk_index] = rows
+                    worker_stats[pid]["chunks"] += 1
+                    worker_stats[pid]["matches"] += len(rows)
+                    worker_stats[pid]["seconds"] += elapsed
+                    done += len(rows)
+                    if verbose:
+                        print(f"[feature_engineering] processed matches: {done}/{len(matches)} "
+                              f"(chunk {chunk_index + 1}/{len(chunks)}, {elapsed:.1f}s)")
+        finally:
+            _WORKER_ENGINEER = None
+
+        if verbose:
+            print(f"[feature_engineering] {len(matches)} matches in {time.time() - started:.1f}s "
+                  f"across {len(worker_stats)} workers")
+            for pid, stats in sorted(worker_stats.items()):
+                print(f"[feature_engineering]   worker {pid}: {int(stats['matches'])} matches, "
+                      f"{int(stats['chunks'])} chunks, {stats['seconds']:.1f}s")
+
+        return [row for idx in range(len(chunks)) for row in results[idx]]
+
     def build_player_training_frame(self, match_training_frame: pd.DataFrame) -> pd.DataFrame:
         """Build player-level regression frame for fantasy/xPoints learning."""
         if match_training_frame.empty:
@@ -1179,9 +1283,8 @@ class FeatureEngineer:
         if not venue:
             return {}
 
-        dd = self._dd_before(match_date)
-        dd = dd[dd["ground"] == venue]
-        if dd.empty:
+        agg = self._as_of("venue_pace_spin", venue, match_date)
+        if agg.empty:
             return {}
 
         grouped: Dict[str, Dict[str, float]] = {
@@ -1190,16 +1293,6 @@ class FeatureEngineer:
         }
         phase_econ: Dict[Tuple[str, str], Optional[float]] = {}
 
-        # Aggregate using pandas groupby
-        agg = dd.groupby(["bowl_group", "phase"], observed=True).agg(
-            balls=("ball_runs", "size"),
-            matches=("match_id", "nunique"),
-            runs=("ball_runs", "sum"),
-            dots=("is_dot", "sum"),
-            boundaries=("is_boundary", "sum"),
-            wickets=("is_wicket", "sum"),
-        ).reset_index()
-
         for _, rec in agg.iterrows():
             bowl_group = rec["bowl_group"]
             phase = str(rec["phase"])
@@ -1252,21 +1345,10 @@ class FeatureEngineer:
         if not competition:
             return {}
 
-        dd = self._dd_before_league(match_date)
-        dd = dd[(dd["competition"] == competition) & dd["bowl_style"].notna()]
-        if dd.empty:
+        agg = self._as_of("bowler_style", competition, match_date)
+        if agg.empty:
             return {}
 
-        dd_local = dd.copy()
-        dd_local["norm_style"] = dd_local["bowl_style"].fillna("").str.upper().apply(_normalize_style)
-
-        agg = dd_local.groupby(["norm_style", "phase"], observed=True).agg(
-            balls=("ball_runs", "size"),
-            matches=("match_id", "nunique"),
-            runs=("ball_runs", "sum"),
-            wickets=("is_wicket", "sum"),
-        ).reset_index()
-
         accum: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
         phase_accum: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
 
@@ -1310,34 +1392,15 @@ class FeatureEngineer:
         if not venue:
             return {}
 
-        dd = self._dd_before(match_date)
-        dd = dd[dd["ground"] == venue]
-        if dd.empty:
+        agg = self._as_of("venue_handedness", venue, match_date)
+        if agg.empty:
             return {}
 
-        # Derive hand and combo columns
-        bh = dd["bat_hand"].fillna("").str.upper()
-        hand = np.where(bh.str.contains("L"), "LHB", np.where(bh.str.contains("R"), "RHB", "UNK"))
-        combo = dd["crease_combo"].fillna("UNK").str.upper()
-        runs_bat = dd["score"].fillna(0)
-        boundary = dd["is_boundary"]
-
-        # Build aggregation in one pass using a temp frame
-        tmp = pd.DataFrame({
-            "hand": hand, "bowl_group": dd["bowl_group"].values,
-            "phase": dd["phase"].values, "combo": combo.values,
-            "runs": runs_bat.values, "boundary": boundary.values,
-        })
-
         hand_totals: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
         hand_bowl: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
         combo_totals: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
         combo_phase_spin: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
 
-        agg = tmp.groupby(["hand", "bowl_group", "phase", "combo"], observed=True).agg(
-            balls=("runs", "size"), runs=("runs", "sum"), boundaries=("boundary", "sum")
-        ).reset_index()
-
         for _, rec in agg.iterrows():
             h = str(rec["hand"])
             bg = str(rec["bowl_group"])
@@ -1407,23 +1470,10 @@ class FeatureEngineer:
         if not venue:
             return {}
 
-        dd = self._dd_before(match_date)
-        dd = dd[dd["ground"] == venue]
-        if dd.empty:
+        agg = self._as_of("venue_line_length", venue, match_date)
+        if agg.empty:
             return {}
 
-        length_key = dd["length"].fillna("").str.lower()
-        tmp = pd.DataFrame({
-            "length_key": length_key.values, "bowl_group": dd["bowl_group"].values,
-            "ball_runs": dd["ball_runs"].values, "is_dot": dd["is_dot"].values,
-            "is_boundary": dd["is_boundary"].values,
-        })
-
-        agg = tmp.groupby(["length_key", "bowl_group"]).agg(
-            balls=("ball_runs", "size"), runs=("ball_runs", "sum"),
-            dots=("is_dot", "sum"), boundaries=("is_boundary", "sum"),
-        ).reset_index()
-
         total_runs = 0.0
         by_length: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
         by_length_bowl: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
@@ -1504,22 +1554,15 @@ class FeatureEngineer:
         if not venue:
             return {}
 
-        dd = self._dd_before(match_date)
-        dd = dd[(dd["ground"] == venue) & dd["wagon_zone"].between(0, 8)]
-        if dd.empty:
+        agg = self._as_of("venue_wagon_zone", venue, match_date)
+        if agg.empty:
             return {}
 
-        # Aggregate venue-level and team-level from the in-memory DataFrame.
+        # Aggregate venue-level and team-level from the per-(zone, team) cells.
         zone_map: Dict[int, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
         team_zone_runs: Dict[str, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
         total_runs = 0.0
 
-        agg = dd.groupby(["wagon_zone", "batting_team"]).agg(
-            balls=("score", "size"),
-            runs=("score", lambda x: x.fillna(0).sum()),
-            boundaries=("is_boundary", "sum"),
-        ).reset_index()
-
         for _, rec in agg.iterrows():
             zone = int(rec["wagon_zone"])
             team = rec["batting_team"]
@@ -1563,9 +1606,8 @@ class FeatureEngineer:
         return out
 
     def _compute_team_bowling_attack_features(self, team: str, match_date) -> Dict[str, Any]:
-        dd = self._dd_before_league(match_date)
-        dd = dd[dd["bowling_team"] == team]
-        if dd.empty:
+        agg = self._as_of("team_bowling_attack", team, match_date)
+        if agg.empty:
             return {
                 "pace_overs_pct": None,
                 "spin_overs_pct": None,
@@ -1574,10 +1616,6 @@ class FeatureEngineer:
                 "spin_attack_vs_venue_delta": None,
             }
 
-        agg = dd.groupby("bowl_group").agg(
-            balls=("ball_runs", "size"), runs=("ball_runs", "sum"),
-        ).reset_index()
-
         accum = defaultdict(lambda: defaultdict(float))
         total_balls = 0.0
         for _, rec in agg.iterrows():
@@ -1598,28 +1636,22 @@ class FeatureEngineer:
         }
 
     def _compute_team_hand_combo_features(self, team: str, match_date) -> Dict[str, Any]:
-        dd = self._dd_before_league(match_date)
-        dd = dd[dd["batting_team"] == team]
-        if dd.empty:
+        batters = self._as_of("team_batters", team, match_date)
+        combos = self._as_of("team_crease_combo", team, match_date)
+        if batters.empty and combos.empty:
             return {
                 "lhb_count": None,
                 "rhb_count": None,
                 "crease_combo_diversity": None,
             }
 
-        # Hand classification
-        bh = dd["bat_hand"].fillna("").str.upper()
-        dd_local = dd.copy()
-        dd_local["hand"] = np.where(bh.str.contains("L"), "LHB", np.where(bh.str.contains("R"), "RHB", "UNK"))
-
-        # Count distinct batters per hand
-        hand_agg = dd_local[dd_local["batter"].notna()].groupby("hand")["batter"].nunique().to_dict()
+        # Distinct batters per hand
+        hand_agg = dict(zip(batters["hand"], batters["batters"])) if not batters.empty else {}
         lhb_count = float(hand_agg.get("LHB", 0))
         rhb_count = float(hand_agg.get("RHB", 0))
 
         # Crease combo diversity
-        cc = dd[dd["crease_combo"].notna()]["crease_combo"].str.upper()
-        combo_counts = cc.value_counts()
+        combo_counts = combos["balls"][combos["balls"] > 0] if not combos.empty else pd.Series(dtype=float)
         total_combo_balls = float(combo_counts.sum())
         diversity = None
         if total_combo_balls > 0 and len(combo_counts) > 1:
@@ -1647,19 +1679,19 @@ class FeatureEngineer:
                 "dot_pct_at_venue": None,
             }
 
-        dd = self._dd_before(match_date)
-        dd = dd[(dd["batting_team"] == team) & (dd["ground"] == venue)]
-        if dd.empty:
+        agg = self._as_of("team_venue", venue, match_date)
+        rec = agg[agg["batting_team"] == team] if not agg.empty else agg
+        if rec.empty:
             return {
                 "control_pct_at_venue": None,
                 "boundary_pct_at_venue": None,
                 "dot_pct_at_venue": None,
             }
 
-        control_vals = pd.to_numeric(dd["control"], errors="coerce")
-        control_pct = _safe_float(control_vals.mean()) if control_vals.notna().any() else None
-        boundary_pct = _safe_float(dd["is_boundary"].mean())
-        dot_pct = _safe_float(dd["is_dot"].mean())
+        rec = rec.iloc[0]
+        control_pct = _safe_div(rec["control_sum"], rec["control_count"])
+        boundary_pct = _safe_div(rec["boundaries"], rec["balls"])
+        dot_pct = _safe_div(rec["dots"], rec["balls"])
 
         return {
             "control_pct_at_venue": control_pct,
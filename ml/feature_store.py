@@ -0,0 +1,368 @@
+"""Point-in-time (as-of) feature store for delivery_details-derived match features.
+
+FeatureEngineer used to keep all of delivery_details in one DataFrame and, for every match,
+slice everything before the match date and re-aggregate it per venue/team. Building a training
+frame therefore cost O(matches x deliveries).
+
+The store keeps, per feature family, the cumulative sums of that family's aggregates for each
+(key, dims..., day) cell. "State before date D" is then one binary search per dims cell
+(a prefix-sum lookup), and it returns the same rows the old groupby produced.
+
+Families come in two scopes:
+
+- ``venue``: built over every competition, keyed by ground (cross-league venue features)
+- ``league``: built over the training/prediction competitions, keyed by team or competition
+
+Player-level features are not stored here: the player models read rolling form from
+batting_stats / bowling_stats (``build_player_training_frame``), not from delivery_details.
+
+Each scope is persisted under ``config.FEATURE_STORE_DIR``. It is rebuilt when the
+delivery_details fingerprint changes, so ``build_match_training_frame`` and
+``ml/predict.predict_match`` read the same precomputed state. The fingerprint combines row
+count, MAX(id) and latest match_date with the data_versions write counter, so in-place
+corrections and same-date replacements also invalidate it (see services.data_versions).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from services.data_versions import data_versions
+
+# Bump when a family's definition changes so persisted stores are rebuilt.
+FEATURE_STORE_VERSION = 1
+
+VENUE_SCOPE = "venue"
+LEAGUE_SCOPE = "league"
+
+DAY = "_day"
+# Days since epoch stay well below this, so (group, day) packs into one sortable int64.
+_DAY_SPAN = 1 << 17
+
+
+def _normalize_style(style: Optional[str]) -> Optional[str]:
+    if not style:
+        return None
+    return "".join(ch for ch in style.upper() if ch.isalnum())
+
+
+def _bat_hand(dd: pd.DataFrame) -> np.ndarray:
+    bh = dd["bat_hand"].fillna("").str.upper()
+    return np.where(bh.str.contains("L"), "LHB", np.where(bh.str.contains("R"), "RHB", "UNK"))
+
+
+# ---------------------------------------------------------------------------
+# Family cell builders: daily, additive aggregates from the prepared delivery frame
+# ---------------------------------------------------------------------------
+def _venue_pace_spin_cells(dd: pd.DataFrame) -> pd.DataFrame:
+    return dd.groupby(["ground", DAY, "bowl_group", "phase"], observed=True).agg(
+        balls=("ball_runs", "size"),
+        # A match is played on one day, so per-day distinct matches sum to the running distinct count.
+        matches=("match_id", "nunique"),
+        runs=("ball_runs", "sum"),
+        dots=("is_dot", "sum"),
+        boundaries=("is_boundary", "sum"),
+        wickets=("is_wicket", "sum"),
+    ).reset_index()
+
+
+def _bowler_style_cells(dd: pd.DataFrame) -> pd.DataFrame:
+    dd = dd[dd["bowl_style"].notna()].copy()
+    dd["norm_style"] = dd["bowl_style"].fillna("").str.upper().apply(_normalize_style)
+    return dd.groupby(["competition", DAY, "norm_style", "phase"], observed=True).agg(
+        balls=("ball_runs", "size"),
+        matches=("match_id", "nunique"),
+        runs=("ball_runs", "sum"),
+        wickets=("is_wicket", "sum"),
+    ).reset_index()
+
+
+def _venue_handedness_cells(dd: pd.DataFrame) -> pd.DataFrame:
+    tmp = pd.DataFrame({
+        "ground": dd["ground"].values, DAY: dd[DAY].values,
+        "hand": _bat_hand(dd), "bowl_group": dd["bowl_group"].values,
+        "phase": dd["phase"].values, "combo": dd["crease_combo"].fillna("UNK").str.upper().values,
+        "runs": dd["score"].fillna(0).values, "boundary": dd["is_boundary"].values,
+    })
+    return tmp.groupby(["ground", DAY, "hand", "bowl_group", "phase", "combo"], observed=True).agg(
+        balls=("runs", "size"), runs=("runs", "sum"), boundaries=("boundary", "sum"),
+    ).reset_index()
+
+
+def _venue_line_length_cells(dd: pd.DataFrame) -> pd.DataFrame:
+    tmp = pd.DataFrame({
+        "ground": dd["ground"].values, DAY: dd[DAY].values,
+        "length_key": dd["length"].fillna("").str.lower().values, "bowl_group": dd["bowl_group"].values,
+        "ball_runs": dd["ball_runs"].values, "is_dot": dd["is_dot"].values,
+        "is_boundary": dd["is_boundary"].values,
+    })
+    return tmp.groupby(["ground", DAY, "length_key", "bowl_group"]).agg(
+        balls=("ball_runs", "size"), runs=("ball_runs", "sum"),
+        dots=("is_dot", "sum"), boundaries=("is_boundary", "sum"),
+    ).reset_index()
+
+
+def _venue_wagon_zone_cells(dd: pd.DataFrame) -> pd.DataFrame:
+    dd = dd[dd["wagon_zone"].between(0, 8)].assign(zone_runs=lambda d: d["score"].fillna(0))
+    return dd.groupby(["ground", DAY, "wagon_zone", "batting_team"]).agg(
+        balls=("score", "size"), runs=("zone_runs", "sum"), boundaries=("is_boundary", "sum"),
+    ).reset_index()
+
+
+def _team_venue_cells(dd: pd.DataFrame) -> pd.DataFrame:
+    control = pd.to_numeric(dd["control"], errors="coerce")
+    tmp = pd.DataFrame({
+        "ground": dd["ground"].values, DAY: dd[DAY].values, "batting_team": dd["batting_team"].values,
+        "is_boundary": dd["is_boundary"].values, "is_dot": dd["is_dot"].values,
+        "control": control.values, "has_control": control.notna().astype(int).values,
+    })
+    return tmp.groupby(["ground", DAY, "batting_team"]).agg(
+        balls=("is_dot", "size"), boundaries=("is_boundary", "sum"), dots=("is_dot", "sum"),
+        control_sum=("control", "sum"), control_count=("has_control", "sum"),
+    ).reset_index()
+
+
+def _team_bowling_attack_cells(dd: pd.DataFrame) -> pd.DataFrame:
+    return dd.groupby(["bowling_team", DAY, "bowl_group"]).agg(
+        balls=("ball_runs", "size"), runs=("ball_runs", "sum"),
+    ).reset_index()
+
+
+def _team_batters_cells(dd: pd.DataFrame) -> pd.DataFrame:
+    # Distinct batters per hand is not additive; count each (team, hand, batter) on its first day.
+    tmp = pd.DataFrame({
+        "batting_team": dd["batting_team"].values, DAY: dd[DAY].values,
+        "hand": _bat_hand(dd), "batter": dd["batter"].values,
+    })
+    tmp = tmp[tmp["batter"].notna()].sort_values(DAY, kind="stable")
+    first = tmp.drop_duplicates(["batting_team", "hand", "batter"])
+    return first.groupby(["batting_team", DAY, "hand"]).size().rename("batters").reset_index()
+
+
+def _team_crease_combo_cells(dd: pd.DataFrame) -> pd.DataFrame:
+    dd = dd[dd["crease_combo"].notna()]
+    tmp = pd.DataFrame({
+        "batting_team": dd["batting_team"].values, DAY: dd[DAY].values,
+        "combo": dd["crease_combo"].str.upper().values,
+    })
+    return tmp.groupby(["batting_team", DAY, "combo"]).size().rename("balls").reset_index()
+
+
+# family -> (scope, key column, dims, cell builder)
+FAMILIES: Dict[str, Tuple[str, str, Tuple[str, ...], Callable[[pd.DataFrame], pd.DataFrame]]] = {
+    "venue_pace_spin": (VENUE_SCOPE, "ground", ("bowl_group", "phase"), _venue_pace_spin_cells),
+    "venue_handedness": (VENUE_SCOPE, "ground", ("hand", "bowl_group", "phase", "combo"), _venue_handedness_cells),
+    "venue_line_length": (VENUE_SCOPE, "ground", ("length_key", "bowl_group"), _venue_line_length_cells),
+    "venue_wagon_zone": (VENUE_SCOPE, "ground", ("wagon_zone", "batting_team"), _venue_wagon_zone_cells),
+    "team_venue": (VENUE_SCOPE, "ground", ("batting_team",), _team_venue_cells),
+    "bowler_style": (LEAGUE_SCOPE, "competition", ("norm_style", "phase"), _bowler_style_cells),
+    "team_bowling_attack": (LEAGUE_SCOPE, "bowling_team", ("bowl_group",), _team_bowling_attack_cells),
+    "team_batters": (LEAGUE_SCOPE, "batting_team", ("hand",), _team_batters_cells),
+    "team_crease_combo": (LEAGUE_SCOPE, "batting_team", ("combo",), _team_crease_combo_cells),
+}
+
+
+def _to_day(value: Any) -> int:
+    return int(np.datetime64(pd.Timestamp(value), "D").astype(np.int64))
+
+
+class AsOfTable:
+    """Cumulative per-(key, dims) sums over days for one feature family."""
+
+    def __init__(self, frame: pd.DataFrame, key: str, dims: Sequence[str]):
+        self.key = key
+        self.dims = list(dims)
+        self.frame = frame.reset_index(drop=True)
+        self.measures = [c for c in self.frame.columns if c not in (key, DAY, *self.dims)]
+        self._empty = pd.DataFrame(columns=self.dims + self.measures)
+        self._key_groups: Dict[Any, Tuple[int, int]] = {}
+
+        if self.frame.empty:
+            self._combined = np.empty(0, dtype=np.int64)
+            self._group_start = np.empty(0, dtype=np.int64)
+            return
+
+        # Rows are sorted by (key, dims, day), so group ids increase along the frame.
+        gid = self.frame.groupby([key, *self.dims], sort=False, observed=True).ngroup().to_numpy(np.int64)
+        starts = np.flatnonzero(np.r_[True, gid[1:] != gid[:-1]])
+        self._group_start = starts
+        self._combined = gid * _DAY_SPAN + self.frame[DAY].to_numpy(np.int64)
+
+        keys = self.frame[key].to_numpy()[starts]
+        key_starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        key_ends = np.r_[key_starts[1:], len(starts)]
+        for first, end in zip(key_starts, key_ends):
+            self._key_groups[keys[first]] = (int(first), int(end))
+
+    @classmethod
+    def from_cells(cls, cells: pd.DataFrame, key: str, dims: Sequence[str]) -> "AsOfTable":
+        """Turn daily additive cells into running totals per (key, dims)."""
+        if cells.empty:
+            return cls(cells, key, dims)
+        cells = cells.copy()
+        for col in dims:
+            if isinstance(cells[col].dtype, pd.CategoricalDtype):
+                cells[col] = cells[col].astype(str)
+        cells = cells.sort_values([key, *dims, DAY], kind="stable").reset_index(drop=True)
+        measures = [c for c in cells.columns if c not in (key, DAY, *dims)]
+        cells[measures] = cells.groupby([key, *dims], sort=False)[measures].cumsum()
+        return cls(cells, key, dims)
+
+    def as_of(self, key_value: Any, cutoff_day: int) -> pd.DataFrame:
+        """dims + measures for every cell of ``key_value``, summed over days before ``cutoff_day``."""
+        span = self._key_groups.get(key_value)
+        if span is None:
+            return self._empty
+        gids = np.arange(*span, dtype=np.int64)
+        idx = np.searchsorted(self._combined, gids * _DAY_SPAN + cutoff_day, side="left") - 1
+        idx = idx[idx >= self._group_start[gids]]
+        if idx.size == 0:
+            return self._empty
+        return self.frame.iloc[idx][self.dims + self.measures].reset_index(drop=True)
+
+
+def _scope_file(directory: Path, scope: str, competitions: Optional[Sequence[str]]) -> Path:
+    if scope == VENUE_SCOPE:
+        return directory / "venue.pkl"
+    if not competitions:
+        return directory / "league_all.pkl"
+    digest = hashlib.sha1(",".join(sorted(competitions)).encode("utf-8")).hexdigest()[:12]
+    return directory / f"league_{digest}.pkl"
+
+
+def _local_cache_refresh(db: Session) -> Optional[str]:
+    """Last refresh of the local SQLite cache (ml/cache_manager.py), or None if unrecorded."""
+    try:
+        row = db.execute(
+            text("SELECT value FROM _cache_metadata WHERE key = 'last_refresh_timestamp'")
+        ).fetchone()
+    except Exception:
+        return None
+    return row[0] if row and row[0] else None
+
+
+def delivery_fingerprint(db: Session) -> Dict[str, Any]:
+    """Cheap change marker for delivery_details, stored alongside each persisted scope."""
+    row = db.execute(text("SELECT COUNT(*), MAX(match_date), MAX(id) FROM delivery_details")).fetchone()
+    fingerprint = {
+        "version": FEATURE_STORE_VERSION,
+        "rows": int(row[0] or 0) if row else 0,
+        "max_match_date": str(row[1]) if row and row[1] is not None else None,
+        "max_id": int(row[2] or 0) if row else 0,
+    }
+    bind = getattr(db, "bind", None)
+    if bind is not None and bind.dialect.name == "sqlite":
+        # The local cache has no data_versions table (nor to_regclass); a cache refresh is the
+        # only way its rows change, so its refresh marker stands in for the write counter
+        fingerprint["local_cache_refresh"] = _local_cache_refresh(db)
+    else:
+        fingerprint["data_version"] = data_versions(db, ("delivery_details",))["delivery_details"]
+    return fingerprint
+
+
+class FeatureStore:
+    """As-of tables for every feature family, looked up by family, key and match date."""
+
+    def __init__(self, tables: Optional[Dict[str, AsOfTable]] = None):
+        self.tables: Dict[str, AsOfTable] = dict(tables or {})
+
+    @property
+    def scopes(self) -> Set[str]:
+        return {FAMILIES[name][0] for name in self.tables}
+
+    def as_of(self, family: str, key_value: Any, match_date: Any) -> pd.DataFrame:
+        """Aggregates of ``family`` for ``key_value`` over deliveries strictly before ``match_date``."""
+        table = self.tables.get(family)
+        if table is None or key_value is None:
+            return pd.DataFrame()
+        return table.as_of(key_value, _to_day(match_date))
+
+    def merged(self, other: "FeatureStore") -> "FeatureStore":
+        return FeatureStore({**self.tables, **other.tables})
+
+    @classmethod
+    def build(
+        cls,
+        dd: Optional[pd.DataFrame],
+        league_dd: Optional[pd.DataFrame] = None,
+        scopes: Optional[Set[str]] = None,
+    ) -> "FeatureStore":
+        """Build from FeatureEngineer's prepared delivery frame(s).
+
+        ``league_dd`` is the competition-filtered frame for league-scoped families (defaults
+        to ``dd``, i.e. every competition).
+        """
+        scopes = scopes or {VENUE_SCOPE, LEAGUE_SCOPE}
+        sources = {VENUE_SCOPE: dd, LEAGUE_SCOPE: dd if league_dd is None else league_dd}
+        prepared: Dict[str, pd.DataFrame] = {}
+        tables: Dict[str, AsOfTable] = {}
+        for name, (scope, key, dims, build_cells) in FAMILIES.items():
+            if scope not in scopes:
+                continue
+            if scope not in prepared:
+                source = sources[scope]
+                if source is None or source.empty:
+                    prepared[scope] = pd.DataFrame()
+                else:
+                    dates = source["_match_date_dt"]
+                    source = source[dates.notna()]
+                    prepared[scope] = source.assign(
+                        **{DAY: source["_match_date_dt"].to_numpy("datetime64[D]").astype(np.int64)}
+                    )
+            frame = prepared[scope]
+            cells = build_cells(frame) if not frame.empty else pd.DataFrame(columns=[key, DAY, *dims])
+            tables[name] = AsOfTable.from_cells(cells, key, dims)
+        return cls(tables)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, directory: Path, competitions: Optional[Sequence[str]], fingerprint: Dict[str, Any]) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for scope in self.scopes:
+            payload = {
+                "fingerprint": fingerprint,
+                "competitions": sorted(competitions) if competitions else None,
+                "tables": {
+                    name: table.frame for name, table in self.tables.items() if FAMILIES[name][0] == scope
+                },
+            }
+            path = _scope_file(directory, scope, competitions)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            pd.to_pickle(payload, tmp_path)
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(
+        cls,
+        directory: Path,
+        competitions: Optional[Sequence[str]],
+        fingerprint: Dict[str, Any],
+    ) -> "FeatureStore":
+        """Load every persisted scope that matches ``fingerprint``; stale or missing scopes are skipped."""
+        tables: Dict[str, AsOfTable] = {}
+        for scope in (VENUE_SCOPE, LEAGUE_SCOPE):
+            path = _scope_file(Path(directory), scope, competitions)
+            if not path.exists():
+                continue
+            try:
+                payload = pd.read_pickle(path)
+            except Exception as e:
+                print(f"[feature_store] Ignoring unreadable {path.name}: {e}")
+                continue
+            if payload.get("fingerprint") != fingerprint:
+                continue
+            for name, frame in payload["tables"].items():
+                if name in FAMILIES:
+                    _, key, dims, _ = FAMILIES[name]
+                    tables[name] = AsOfTable(frame, key, dims)
+        return cls(tables)
@@ -0,0 +1,158 @@
+"""Resident per-league model registry for pre-match predictions.
+
+Loading a league's models means three joblib artifacts plus the training metadata JSON,
+which costs far more than scoring a fixture. The registry keeps the latest promoted
+version of each league in memory:
+
+    registry = get_model_registry()
+    registry.preload(["IPL", "BBL"])       # warm at startup
+    models = registry.get("IPL")           # {"winner", "score_1st", "score_2nd", "metadata", "version"}
+
+Every ``MODEL_REGISTRY_RECHECK_SECONDS`` a ``get`` looks at the league directory again; when
+``train_model`` has promoted a newer version, it is loaded off to the side and swapped in
+as a whole. Callers holding the previous dict keep a consistent set of models.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import joblib
+
+from ml import config
+
+
+def find_latest_model_version(league_dir: Path) -> Optional[str]:
+    """Find the latest promoted model version in a league directory."""
+    metadata_files = sorted(league_dir.glob("training_metadata_v*.json"), reverse=True)
+    for mf in metadata_files:
+        version = mf.stem.replace("training_metadata_", "")
+        # Check that all 3 model artifacts exist
+        winner = league_dir / f"match_winner_{version}.joblib"
+        score1 = league_dir / f"score_1st_innings_{version}.joblib"
+        score2 = league_dir / f"score_2nd_innings_{version}.joblib"
+        if winner.exists() and score1.exists() and score2.exists():
+            return version
+    return None
+
+
+def load_models(league_dir: Path, version: str) -> Dict[str, Any]:
+    """Load the 3 model artifacts + metadata for a given version."""
+    winner = joblib.load(league_dir / f"match_winner_{version}.joblib")
+    score1 = joblib.load(league_dir / f"score_1st_innings_{version}.joblib")
+    score2 = joblib.load(league_dir / f"score_2nd_innings_{version}.joblib")
+
+    metadata_path = league_dir / f"training_metadata_{version}.json"
+    metadata = {}
+    if metadata_path.exists():
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+
+    return {
+        "winner": winner,
+        "score_1st": score1,
+        "score_2nd": score2,
+        "metadata": metadata,
+        "version": version,
+    }
+
+
+def league_model_dir(competition: str, model_dir: Optional[Path] = None) -> Path:
+    """Model directory for a competition name or alias (e.g. "IPL")."""
+    from ml.train_model import _league_slug, _resolve_competitions
+
+    competitions = _resolve_competitions([competition])
+    slug = _league_slug(competitions[0] if competitions else competition)
+    return Path(model_dir or config.MODEL_DIR) / slug
+
+
+class _LeagueEntry:
+    __slots__ = ("models", "checked_at")
+
+    def __init__(self, models: Optional[Dict[str, Any]], checked_at: float):
+        self.models = models
+        self.checked_at = checked_at
+
+
+class ModelRegistry:
+    """Latest promoted models per league directory, reloaded when a newer version appears."""
+
+    def __init__(self, model_dir: Optional[Path] = None,
+                 recheck_seconds: float = config.MODEL_REGISTRY_RECHECK_SECONDS):
+        self.model_dir = Path(model_dir or config.MODEL_DIR)
+        self.recheck_seconds = recheck_seconds
+        self._entries: Dict[Path, _LeagueEntry] = {}
+        self._lock = threading.Lock()
+
+    def preload(self, competitions: Optional[Iterable[str]] = None) -> List[str]:
+        """Load the latest version for each competition (default: every league directory).
+
+        Returns the versions loaded, one "<league>/<version>" per league with models.
+        """
+        if competitions is None:
+            league_dirs = sorted(p for p in self.model_dir.iterdir() if p.is_dir()) if self.model_dir.exists() else []
+        else:
+            league_dirs = [league_model_dir(comp, self.model_dir) for comp in competitions]
+
+        loaded = []
+        for league_dir in league_dirs:
+            models = self.get_dir(league_dir)
+            if models is not None:
+                loaded.append(f"{league_dir.name}/{models['version']}")
+        print(f"[model_registry] Preloaded {len(loaded)} league(s): {', '.join(loaded) or 'none'}")
+        return loaded
+
+    def get(self, competition: str) -> Optional[Dict[str, Any]]:
+        """Models for a competition name or alias, or None if nothing has been promoted."""
+        return self.get_dir(league_model_dir(competition, self.model_dir))
+
+    def get_dir(self, league_dir: Path) -> Optional[Dict[str, Any]]:
+        """Models for a league directory, or None if it holds no complete version."""
+        league_dir = Path(league_dir)
+        entry = self._entries.get(league_dir)
+        if entry is not None and time.monotonic() - entry.checked_at < self.recheck_seconds:
+            return entry.models
+
+        with self._lock:
+            entry = self._entries.get(league_dir)
+            if entry is not None and time.monotonic() - entry.checked_at < self.recheck_seconds:
+                return entry.models
+
+            current = entry.models if entry is not None else None
+            version = find_latest_model_version(league_dir) if league_dir.exists() else None
+            if version is None:
+                models = None
+            elif current is not None and current["version"] == version:
+                models = current
+            else:
+                try:
+                    models = load_models(league_dir, version)
+                    print(f"[model_registry] Loaded {league_dir.name} models: {version}")
+                except Exception as e:
+                    # A half-written promotion: keep serving what we had, retry next interval
+                    print(f"[model_registry] Could not load {league_dir.name} {version}: {e}")
+                    models = current
+            self._entries[league_dir] = _LeagueEntry(models, time.monotonic())
+            return models
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """The process-wide registry over config.MODEL_DIR."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
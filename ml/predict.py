@@ -15,24 +15,33 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import sys
 from datetime import date, datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-import joblib
 import numpy as np
 import pandas as pd
 
+try:
+    import xgboost as xgb
+except ImportError:  # pragma: no cover - explanations fall back to model importances
+    xgb = None
+
 # Ensure repo root import path.
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from ml import config
 from ml.feature_engineering import FeatureEngineer
-from ml.train_model import _prepare_features, _resolve_competitions, _league_slug
+from ml.model_registry import get_model_registry, league_model_dir
+from ml.train_model import _prepare_features, _resolve_competitions
+from services.cache import get_cache
+
+# Top-feature explanations keyed by (model version + feature vector hash, N)
+_explanation_cache = get_cache("prediction_explanations", ttl_seconds=7 * 24 * 3600, max_entries=4096)
 
 
 # Human-readable labels for raw feature names.
@@ -266,41 +275,6 @@ def _infer_team(feature_name: str) -> Optional[str]:
     return None
 
 
-def _find_latest_model_version(league_dir: Path) -> Optional[str]:
-    """Find the latest promoted model version in a league directory."""
-    metadata_files = sorted(league_dir.glob("training_metadata_v*.json"), reverse=True)
-    for mf in metadata_files:
-        version = mf.stem.replace("training_metadata_", "")
-        # Check that all 3 model artifacts exist
-        winner = league_dir / f"match_winner_{version}.joblib"
-        score1 = league_dir / f"score_1st_innings_{version}.joblib"
-        score2 = league_dir / f"score_2nd_innings_{version}.joblib"
-        if winner.exists() and score1.exists() and score2.exists():
-            return version
-    return None
-
-
-def _load_models(league_dir: Path, version: str) -> Dict[str, Any]:
-    """Load the 3 model artifacts + metadata for a given version."""
-    winner = joblib.load(league_dir / f"match_winner_{version}.joblib")
-    score1 = joblib.load(league_dir / f"score_1st_innings_{version}.joblib")
-    score2 = joblib.load(league_dir / f"score_2nd_innings_{version}.joblib")
-
-    metadata_path = league_dir / f"training_metadata_{version}.json"
-    metadata = {}
-    if metadata_path.exists():
-        with open(metadata_path) as f:
-            metadata = json.load(f)
-
-    return {
-        "winner": winner,
-        "score_1st": score1,
-        "score_2nd": score2,
-        "metadata": metadata,
-        "version": version,
-    }
-
-
 def _compute_top_features(
     model_dict: Dict[str, Any],
     feature_values: pd.DataFrame,
@@ -351,6 +325,79 @@ def _compute_top_features(
     return results
 
 
+def _tree_boosters(model_obj: Any) -> List[Any]:
+    """XGBoost boosters behind a model, unwrapping CalibratedClassifierCV (one per fold)."""
+    if hasattr(model_obj, "get_booster"):
+        return [model_obj.get_booster()]
+    boosters = []
+    for cc in getattr(model_obj, "calibrated_classifiers_", []):
+        base = getattr(cc, "estimator", None) or getattr(cc, "base_estimator", None)
+        if base is not None and hasattr(base, "get_booster"):
+            boosters.append(base.get_booster())
+    return boosters
+
+
+def _feature_row_key(league: str, version: str, feature_cols: List[str], row: np.ndarray) -> str:
+    digest = hashlib.sha1("\x1f".join(feature_cols).encode())
+    digest.update(np.ascontiguousarray(row, dtype=np.float64).tobytes())
+    return f"{league}:{version}:{digest.hexdigest()}"
+
+
+def explain_fixtures(
+    model_dict: Dict[str, Any],
+    X: pd.DataFrame,
+    version: str,
+    league: str,
+    n: int = 10,
+) -> List[List[Dict[str, Any]]]:
+    """Top-N feature attributions for every row of an aligned winner-model matrix.
+
+    XGBoost models are explained with the booster's native ``pred_contribs`` (exact tree
+    SHAP values in log-odds of team1 winning), computed for all uncached rows in one call;
+    calibrated models average the contributions of their fold boosters. Explanations are
+    cached per (league, model version, feature vector) -- leagues trained in the same run
+    share a version -- so re-running predictions for an unchanged fixture list costs a hash
+    per fixture. Other models fall back to ``_compute_top_features``.
+    """
+    if X.empty:
+        return []
+    feature_cols = list(model_dict["feature_columns"])
+    boosters = _tree_boosters(model_dict["model"]) if xgb is not None else []
+    if not boosters:
+        return [_compute_top_features(model_dict, X.iloc[[i]], n=n) for i in range(len(X))]
+
+    values = X[feature_cols].to_numpy(dtype=np.float64)
+    keys = [_feature_row_key(league, version, feature_cols, row) for row in values]
+    explanations: List[Optional[List[Dict[str, Any]]]] = [_explanation_cache.get((key, n)) for key in keys]
+    missing = [i for i, cached in enumerate(explanations) if cached is None]
+    if not missing:
+        return explanations
+
+    matrix = xgb.DMatrix(X.iloc[missing][feature_cols])
+    # (rows, features + bias); the bias column is dropped
+    contribs = np.mean([booster.predict(matrix, pred_contribs=True) for booster in boosters], axis=0)[:, :-1]
+    for pos, i in enumerate(missing):
+        row_contribs = contribs[pos]
+        top_indices = np.argsort(np.abs(row_contribs))[::-1][:n]
+        results = []
+        for idx in top_indices:
+            fname = feature_cols[idx]
+            contribution = float(row_contribs[idx])
+            results.append({
+                "feature": _humanize_feature(fname),
+                "raw_feature": fname,
+                "team": _infer_team(fname),
+                # Positive contributions push towards team1 winning
+                "direction": "positive" if contribution > 0 else "negative",
+                "importance": round(abs(contribution), 6),
+                "value": round(float(values[i, idx]), 4),
+                "contribution": round(contribution, 6),
+            })
+        explanations[i] = results
+        _explanation_cache.set((keys[i], n), results)
+    return explanations
+
+
 def _generate_match_id(venue: str, team1: str, team2: str, match_date: str) -> str:
     """Generate a deterministic match ID for prediction storage."""
     # Normalize: lowercase, replace spaces with underscores
@@ -361,73 +408,37 @@ def _generate_match_id(venue: str, team1: str, team2: str, match_date: str) -> s
     return f"pred_{t1}_{t2}_{d}_{v}"
 
 
-def predict_match(
-    venue: str,
-    team1: str,
-    team2: str,
-    match_date: str,
-    competition: str,
-    cache_session,
-    rds_session,
-    models: Optional[Dict[str, Any]] = None,
-    league_dir: Optional[Path] = None,
-) -> Dict[str, Any]:
-    """Generate a prediction for a single match and store it in RDS.
+_DROP_COLS = ["match_id", "team1", "team2", "winner", "target_team1_won",
+              "score_team1", "score_team2", "match_date", "date",
+              "sample_weight", "venue", "toss_winner", "toss_decision"]
 
-    Args:
-        venue: Venue name
-        team1: Team 1 full name
-        team2: Team 2 full name
-        match_date: Date string (YYYY-MM-DD)
-        competition: Competition name (e.g., "IPL")
-        cache_session: SQLAlchemy session for the local SQLite cache (feature extraction)
-        rds_session: SQLAlchemy session for RDS (storing predictions)
-        models: Pre-loaded model dict (optional, will auto-load if not provided)
-        league_dir: Path to league model directory (required if models not provided)
 
-    Returns:
-        Dict with prediction results.
-    """
-    from sqlalchemy import text
+def _align_features(X_df: pd.DataFrame, model_cols: List[str]) -> pd.DataFrame:
+    """Ensure X has exactly the columns the model expects, in the right order."""
+    aligned = pd.DataFrame(0.0, index=X_df.index, columns=model_cols)
+    for col in model_cols:
+        if col in X_df.columns:
+            aligned[col] = X_df[col].values
+    return aligned
 
-    # Resolve competitions for feature extraction
-    competitions = _resolve_competitions([competition])
 
-    # Load models if not provided
+def _resolve_models(competition: str, models: Optional[Dict[str, Any]],
+                    league_dir: Optional[Path]) -> Dict[str, Any]:
+    """Models passed in, else the resident registry's latest version for the league."""
+    if models is not None:
+        return models
+    if league_dir is None:
+        league_dir = league_model_dir(competition)
+    models = get_model_registry().get_dir(league_dir)
     if models is None:
-        if league_dir is None:
-            slug = _league_slug(competitions[0] if competitions else competition)
-            league_dir = config.MODEL_DIR / slug
-        version = _find_latest_model_version(league_dir)
-        if version is None:
-            raise ValueError(f"No trained models found in {league_dir}")
-        models = _load_models(league_dir, version)
+        raise ValueError(f"No trained models found in {league_dir}")
+    return models
 
-    version = models["version"]
-    metadata = models["metadata"]
-    gates_info = metadata.get("promotion_gates", {})
-    gates_passed = f"{gates_info.get('passes', '?')}/{len(gates_info.get('gates', []))}"
 
-    # Extract features using local cache
-    engineer = FeatureEngineer(cache_session, fast_mode=False)
-    engineer._league_competitions = competitions
-    # Preload batch caches (delivery_details DataFrame, team phase stats, etc.)
-    engineer._preload_batch_caches(competitions=competitions)
+def _lookup_elo(cache_session, team1: str, team2: str) -> Tuple[Optional[float], Optional[float]]:
+    """Latest Elo pair for the fixture from the cache, oriented as (team1, team2)."""
+    from sqlalchemy import text
 
-    match_row = {
-        "date": match_date,
-        "team1": team1,
-        "team2": team2,
-        "venue": venue,
-        "competition": competitions[0] if competitions else competition,
-        # No toss info for pre-match predictions
-        "toss_winner": None,
-        "toss_decision": None,
-        "team1_elo": None,
-        "team2_elo": None,
-    }
-
-    # Try to get Elo ratings from the cache
     try:
         elo_query = text("""
             SELECT team1, team2, team1_elo, team2_elo
@@ -436,72 +447,71 @@ def predict_match(
             ORDER BY date DESC LIMIT 1
         """)
         elo_row = cache_session.execute(elo_query, {"t1": team1, "t2": team2}).fetchone()
-        if elo_row:
-            if elo_row[0] == team1:
-                match_row["team1_elo"] = elo_row[2]
-                match_row["team2_elo"] = elo_row[3]
-            else:
-                match_row["team1_elo"] = elo_row[3]
-                match_row["team2_elo"] = elo_row[2]
     except Exception:
-        pass  # Elo columns may not exist in cache
-
-    print(f"[predict] Extracting features for {team1} vs {team2} at {venue}...")
-    features = engineer.extract_match_features(match_row)
+        return None, None  # Elo columns may not exist in cache
+    if not elo_row:
+        return None, None
+    if elo_row[0] == team1:
+        return elo_row[2], elo_row[3]
+    return elo_row[3], elo_row[2]
 
-    # Prepare feature DataFrame using the same pipeline as training
-    feature_df = pd.DataFrame([features])
-    candidate_features = models["winner"]["feature_columns"]
 
-    # Use _prepare_features to match training pipeline exactly
-    drop_cols = ["match_id", "team1", "team2", "winner", "target_team1_won",
-                 "score_team1", "score_team2", "match_date", "date",
-                 "sample_weight", "venue", "toss_winner", "toss_decision"]
+def score_fixtures(models: Dict[str, Any], feature_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Score many fixtures' extracted features with one call per model.
 
-    X, final_cols, _ = _prepare_features(feature_df, candidate_features, drop_cols)
+    Each row is prepared on its own (exactly as a single prediction would be, so batch
+    and single results agree), then the aligned rows are stacked so the winner model
+    runs one ``predict_proba`` and each score model one ``predict`` for the whole batch.
 
-    # Align columns with each model's expected features
-    def _align_features(X_df: pd.DataFrame, model_cols: List[str]) -> pd.DataFrame:
-        """Ensure X has exactly the columns the model expects, in the right order."""
-        aligned = pd.DataFrame(0.0, index=X_df.index, columns=model_cols)
-        for col in model_cols:
-            if col in X_df.columns:
-                aligned[col] = X_df[col].values
-        return aligned
+    Returns one dict per row with team1/team2 win probabilities, both innings scores and
+    the winner-model input row (for ``explain_fixtures``).
+    """
+    if not feature_rows:
+        return []
 
-    # --- Winner prediction ---
     winner_model = models["winner"]
-    X_winner = _align_features(X, winner_model["feature_columns"])
-    win_prob = winner_model["model"].predict_proba(X_winner)[0]
-    # The classifier predicts P(team1 wins) — class 1
-    if len(win_prob) == 2:
-        team1_win_prob = float(win_prob[1])
-    else:
-        team1_win_prob = float(win_prob[0])
-    team2_win_prob = 1.0 - team1_win_prob
-    predicted_winner = team1 if team1_win_prob > 0.5 else team2
-
-    # --- Score predictions ---
     score1_model = models["score_1st"]
-    X_score1 = _align_features(X, score1_model["feature_columns"])
-    predicted_1st = float(score1_model["model"].predict(X_score1)[0])
-
     score2_model = models["score_2nd"]
-    X_score2 = _align_features(X, score2_model["feature_columns"])
-    predicted_2nd = float(score2_model["model"].predict(X_score2)[0])
+    candidate_features = winner_model["feature_columns"]
 
-    # --- Top contributing features ---
-    top_features = _compute_top_features(winner_model, X_winner, n=10)
+    prepared = [
+        _prepare_features(pd.DataFrame([features]), candidate_features, _DROP_COLS)[0]
+        for features in feature_rows
+    ]
 
-    # --- Generate narrative insights ---
-    feature_snapshot_raw = {k: (float(v) if isinstance(v, (int, float, np.floating, np.integer)) else v)
-                            for k, v in features.items() if v is not None}
-    narrative_insights = _generate_narrative_insights(
-        team1=team1, team2=team2, venue=venue,
-        team1_win_prob=team1_win_prob, team2_win_prob=team2_win_prob,
-        predicted_1st=predicted_1st, predicted_2nd=predicted_2nd,
-        top_features=top_features, feature_snapshot=feature_snapshot_raw,
-    )
+    def _stack(model_cols: List[str]) -> pd.DataFrame:
+        # Align before stacking: rows can carry different one-hot columns
+        return pd.concat([_align_features(X, model_cols) for X in prepared], ignore_index=True)
+
+    X_winner = _stack(winner_model["feature_columns"])
+    win_probs = winner_model["model"].predict_proba(X_winner)
+    # The classifier predicts P(team1 wins) — class 1
+    team1_probs = win_probs[:, 1] if win_probs.shape[1] == 2 else win_probs[:, 0]
+
+    predicted_1st = score1_model["model"].predict(_stack(score1_model["feature_columns"]))
+    predicted_2nd = score2_model["model"].predict(_stack(score2_model["feature_columns"]))
+
+    return [
+        {
+            "team1_win_prob": float(team1_probs[i]),
+            "team2_win_prob": 1.0 - float(team1_probs[i]),
+            "predicted_1st": float(predicted_1st[i]),
+            "predicted_2nd": float(predicted_2nd[i]),
+            "X_winner": X_winner.iloc[[i]],
+        }
+        for i in range(len(feature_rows))
+    ]
+
+
+def _store_prediction(rds_session, competition: str, version: str, gates_passed: str,
+                      fixture: Dict[str, Any], scored: Dict[str, Any],
+                      top_features: List[Dict[str, Any]], feature_snapshot: Dict[str, Any],
+                      narrative_insights: Any) -> Tuple[str, Any]:
+    """Upsert one prediction into match_predictions; returns (match_id, prediction id)."""
+    from sqlalchemy import text
+
+    venue, team1, team2, match_date = fixture["venue"], fixture["team1"], fixture["team2"], fixture["date"]
+    team1_win_prob, team2_win_prob = scored["team1_win_prob"], scored["team2_win_prob"]
 
     # --- Look up match_id from matches table (if exists) ---
     match_id = None
@@ -524,9 +534,6 @@ def predict_match(
     if match_id is None:
         match_id = _generate_match_id(venue, team1, team2, match_date)
 
-    # --- Store in RDS ---
-    feature_snapshot = feature_snapshot_raw
-
     upsert_sql = text("""
         INSERT INTO match_predictions (
             match_id, model_version, league,
@@ -562,14 +569,14 @@ def predict_match(
         "match_id": match_id,
         "model_version": version,
         "league": competition,
-        "predicted_winner": predicted_winner,
+        "predicted_winner": team1 if team1_win_prob > 0.5 else team2,
         "win_probability": max(team1_win_prob, team2_win_prob),
         "team1": team1,
         "team2": team2,
         "team1_win_prob": round(team1_win_prob, 4),
         "team2_win_prob": round(team2_win_prob, 4),
-        "predicted_1st": round(predicted_1st, 1),
-        "predicted_2nd": round(predicted_2nd, 1),
+        "predicted_1st": round(scored["predicted_1st"], 1),
+        "predicted_2nd": round(scored["predicted_2nd"], 1),
         "top_features": json.dumps(top_features),
         "feature_snapshot": json.dumps(feature_snapshot),
         "gates_passed": gates_passed,
@@ -582,33 +589,161 @@ def predict_match(
         text("SELECT id FROM match_predictions WHERE match_id = :mid AND model_version = :v"),
         {"mid": match_id, "v": version},
     ).fetchone()
-    pred_id = pred_id_row[0] if pred_id_row else "?"
+    return match_id, (pred_id_row[0] if pred_id_row else "?")
 
-    result = {
-        "match_id": match_id,
-        "prediction_id": pred_id,
-        "team1": team1,
-        "team2": team2,
-        "team1_win_prob": round(team1_win_prob, 4),
-        "team2_win_prob": round(team2_win_prob, 4),
-        "predicted_winner": predicted_winner,
-        "predicted_1st_innings_score": round(predicted_1st, 1),
-        "predicted_2nd_innings_score": round(predicted_2nd, 1),
-        "top_features": top_features,
-        "narrative_insights": narrative_insights,
-        "model_version": version,
-        "gates_passed": gates_passed,
-    }
-
-    t1_abbr = team1[:3].upper()
-    t2_abbr = team2[:3].upper()
-    print(
-        f"[predict] {t1_abbr} {team1_win_prob*100:.1f}% vs {t2_abbr} {team2_win_prob*100:.1f}% "
-        f"| 1st: {predicted_1st:.0f} | 2nd: {predicted_2nd:.0f} "
-        f"| Stored as prediction #{pred_id}"
+
+def predict_fixtures(
+    fixtures: List[Dict[str, Any]],
+    competition: str,
+    cache_session,
+    rds_session,
+    models: Optional[Dict[str, Any]] = None,
+    league_dir: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """Predict many fixtures of one league, scoring them in a single batch, and store them.
+
+    Args:
+        fixtures: Dicts with venue, team1, team2 and date (YYYY-MM-DD)
+        competition: Competition name (e.g., "IPL")
+        cache_session: SQLAlchemy session for the local SQLite cache (feature extraction)
+        rds_session: SQLAlchemy session for RDS (storing predictions)
+        models: Pre-loaded model dict (optional, defaults to the resident model registry)
+        league_dir: Path to league model directory (optional, derived from competition)
+
+    Returns:
+        One result dict per fixture whose features could be extracted, in input order.
+    """
+    competitions = _resolve_competitions([competition])
+    models = _resolve_models(competition, models, league_dir)
+
+    version = models["version"]
+    metadata = models["metadata"]
+    gates_info = metadata.get("promotion_gates", {})
+    gates_passed = f"{gates_info.get('passes', '?')}/{len(gates_info.get('gates', []))}"
+
+    # Extract features using local cache; the batch caches are loaded once for all fixtures
+    engineer = FeatureEngineer(cache_session, fast_mode=False)
+    engineer._league_competitions = competitions
+    # Preload batch caches (as-of feature store shared with training, team phase stats, etc.)
+    engineer._preload_batch_caches(competitions=competitions)
+
+    extracted: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+    for fixture in fixtures:
+        team1, team2, venue = fixture["team1"], fixture["team2"], fixture["venue"]
+        team1_elo, team2_elo = _lookup_elo(cache_session, team1, team2)
+        match_row = {
+            "date": fixture["date"],
+            "team1": team1,
+            "team2": team2,
+            "venue": venue,
+            "competition": competitions[0] if competitions else competition,
+            # No toss info for pre-match predictions
+            "toss_winner": None,
+            "toss_decision": None,
+            "team1_elo": team1_elo,
+            "team2_elo": team2_elo,
+        }
+        print(f"[predict] Extracting features for {team1} vs {team2} at {venue}...")
+        try:
+            extracted.append((fixture, engineer.extract_match_features(match_row)))
+        except Exception as e:
+            if len(fixtures) == 1:
+                raise
+            print(f"[predict] Error extracting features for {team1} vs {team2}: {e}")
+
+    scored_rows = score_fixtures(models, [features for _, features in extracted])
+    explanations = explain_fixtures(
+        models["winner"], pd.concat([s["X_winner"] for s in scored_rows]) if scored_rows else pd.DataFrame(),
+        version, competition, n=10,
     )
 
-    return result
+    results = []
+    for (fixture, features), scored, top_features in zip(extracted, scored_rows, explanations):
+        team1, team2, venue = fixture["team1"], fixture["team2"], fixture["venue"]
+        team1_win_prob, team2_win_prob = scored["team1_win_prob"], scored["team2_win_prob"]
+        predicted_1st, predicted_2nd = scored["predicted_1st"], scored["predicted_2nd"]
+        predicted_winner = team1 if team1_win_prob > 0.5 else team2
+
+        # --- Generate narrative insights ---
+        feature_snapshot = {k: (float(v) if isinstance(v, (int, float, np.floating, np.integer)) else v)
+                            for k, v in features.items() if v is not None}
+        narrative_insights = _generate_narrative_insights(
+            team1=team1, team2=team2, venue=venue,
+            team1_win_prob=team1_win_prob, team2_win_prob=team2_win_prob,
+            predicted_1st=predicted_1st, predicted_2nd=predicted_2nd,
+            top_features=top_features, feature_snapshot=feature_snapshot,
+        )
+
+        # --- Store in RDS ---
+        try:
+            match_id, pred_id = _store_prediction(
+                rds_session, competition, version, gates_passed, fixture, scored,
+                top_features, feature_snapshot, narrative_insights,
+            )
+        except Exception as e:
+            if len(fixtures) == 1:
+                raise
+            rds_session.rollback()
+            print(f"[predict] Error storing {team1} vs {team2}: {e}")
+            continue
+
+        results.append({
+            "match_id": match_id,
+            "prediction_id": pred_id,
+            "team1": team1,
+            "team2": team2,
+            "team1_win_prob": round(team1_win_prob, 4),
+            "team2_win_prob": round(team2_win_prob, 4),
+            "predicted_winner": predicted_winner,
+            "predicted_1st_innings_score": round(predicted_1st, 1),
+            "predicted_2nd_innings_score": round(predicted_2nd, 1),
+            "top_features": top_features,
+            "narrative_insights": narrative_insights,
+            "model_version": version,
+            "gates_passed": gates_passed,
+        })
+
+        t1_abbr = team1[:3].upper()
+        t2_abbr = team2[:3].upper()
+        print(
+            f"[predict] {t1_abbr} {team1_win_prob*100:.1f}% vs {t2_abbr} {team2_win_prob*100:.1f}% "
+            f"| 1st: {predicted_1st:.0f} | 2nd: {predicted_2nd:.0f} "
+            f"| Stored as prediction #{pred_id}"
+        )
+
+    return results
+
+
+def predict_match(
+    venue: str,
+    team1: str,
+    team2: str,
+    match_date: str,
+    competition: str,
+    cache_session,
+    rds_session,
+    models: Optional[Dict[str, Any]] = None,
+    league_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Generate a prediction for a single match and store it in RDS.
+
+    Args:
+        venue: Venue name
+        team1: Team 1 full name
+        team2: Team 2 full name
+        match_date: Date string (YYYY-MM-DD)
+        competition: Competition name (e.g., "IPL")
+        cache_session: SQLAlchemy session for the local SQLite cache (feature extraction)
+        rds_session: SQLAlchemy session for RDS (storing predictions)
+        models: Pre-loaded model dict (optional, defaults to the resident model registry)
+        league_dir: Path to league model directory (optional, derived from competition)
+
+    Returns:
+        Dict with prediction results.
+    """
+    fixture = {"venue": venue, "team1": team1, "team2": team2, "date": match_date}
+    return predict_fixtures([fixture], competition, cache_session, rds_session,
+                            models=models, league_dir=league_dir)[0]
 
 
 def main():
@@ -642,6 +777,7 @@ def main():
     # --- Set up RDS session (for storing predictions) ---
     from database import SessionLocal
     rds_session = SessionLocal()
+    registry = get_model_registry()
 
     try:
         if args.upcoming:
@@ -670,55 +806,44 @@ def main():
 
             print(f"[predict] Found {len(upcoming)} upcoming matches.")
 
-            # Group by competition and load models once per league
+            # Group by competition, warm the registry, then score each league in one batch
             from collections import defaultdict
             by_league: Dict[str, List] = defaultdict(list)
             for m in upcoming:
                 by_league[m["competition"] or "IPL"].append(m)
+            registry.preload(by_league.keys())
 
             for comp, matches in by_league.items():
-                competitions = _resolve_competitions([comp])
-                slug = _league_slug(competitions[0] if competitions else comp)
-                league_dir = config.MODEL_DIR / slug
-                version = _find_latest_model_version(league_dir)
-                if version is None:
+                league_dir = league_model_dir(comp)
+                models = registry.get_dir(league_dir)
+                if models is None:
                     print(f"[predict] No models for {comp} (checked {league_dir}). Skipping {len(matches)} matches.")
                     continue
 
-                models = _load_models(league_dir, version)
-                print(f"[predict] Loaded {comp} models: {version}")
-
-                for m in matches:
-                    try:
-                        predict_match(
-                            venue=m["venue"],
-                            team1=m["team1"],
-                            team2=m["team2"],
-                            match_date=m["date"],
-                            competition=comp,
-                            cache_session=cache_session,
-                            rds_session=rds_session,
-                            models=models,
-                            league_dir=league_dir,
-                        )
-                    except Exception as e:
-                        print(f"[predict] Error predicting {m['team1']} vs {m['team2']}: {e}")
+                try:
+                    predict_fixtures(
+                        matches,
+                        competition=comp,
+                        cache_session=cache_session,
+                        rds_session=rds_session,
+                        models=models,
+                        league_dir=league_dir,
+                    )
+                except Exception as e:
+                    print(f"[predict] Error predicting {len(matches)} {comp} matches: {e}")
 
         else:
             # Single match prediction
             if not all([args.venue, args.team1, args.team2, args.date]):
                 parser.error("--venue, --team1, --team2, and --date are required for single-match prediction")
 
-            competitions = _resolve_competitions([args.competition])
-            slug = _league_slug(competitions[0] if competitions else args.competition)
-            league_dir = config.MODEL_DIR / slug
-            version = _find_latest_model_version(league_dir)
-            if version is None:
+            league_dir = league_model_dir(args.competition)
+            models = registry.get_dir(league_dir)
+            if models is None:
                 print(f"[predict] No trained models found in {league_dir}")
                 sys.exit(1)
 
-            models = _load_models(league_dir, version)
-            print(f"[predict] Loaded models: {version} from {league_dir}")
+            print(f"[predict] Loaded models: {models['version']} from {league_dir}")
 
             result = predict_match(
                 venue=args.venue,
@@ -10,7 +10,11 @@ Trains three models:
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import date, datetime
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
@@ -36,9 +40,14 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
 from database import SessionLocal
 from ml import config
 from ml.feature_engineering import FeatureEngineer
+from ml.feature_store import FEATURE_STORE_VERSION
+from services.data_versions import TRACKED_TABLES, data_versions
 
 
 def _parse_date(value: Optional[str]) -> Optional[date]:
@@ -642,6 +651,211 @@ def _resolve_competitions(competitions: Optional[List[str]]) -> Optional[List[st
     return resolved
 
 
+def _hyperparameter_fingerprint(mode: str) -> Dict[str, Any]:
+    """Everything besides the training frames that determines a fit (thread counts excluded)."""
+    def _without_threads(params: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in params.items() if k != "n_jobs"}
+
+    return {
+        "cache_version": config.ARTIFACT_CACHE_VERSION,
+        "mode": mode,
+        "match_winner": _without_threads(config.MATCH_WINNER_PARAMS),
+        "score": _without_threads(config.SCORE_REGRESSOR_PARAMS),
+        "player": _without_threads(config.PLAYER_REGRESSOR_PARAMS),
+        "time_series_splits": config.TIME_SERIES_SPLITS,
+        "min_match_rows": config.MIN_MATCH_ROWS,
+        "min_player_rows": config.MIN_PLAYER_ROWS,
+    }
+
+
+def _artifact_cache_key(
+    match_df: pd.DataFrame,
+    player_df: Optional[pd.DataFrame],
+    hyperparameters: Dict[str, Any],
+) -> str:
+    """Content hash of the training frames plus hyperparameters."""
+    digest = hashlib.sha256()
+    for frame in (match_df, player_df):
+        if frame is None:
+            digest.update(b"<none>")
+            continue
+        digest.update(json.dumps([str(c) for c in frame.columns]).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    digest.update(json.dumps(hyperparameters, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _precomputed_markers(session: Session) -> Dict[str, Optional[List[Any]]]:
+    """
+    Row count and latest computed_date of the precomputed tables the features read.
+
+    batch_processor rebuilds team_phase_stats and player_baselines wholesale, stamping every
+    row's computed_date; they carry no data_versions trigger, so this stands in for one.
+    """
+    markers: Dict[str, Optional[List[Any]]] = {}
+    for table in ("team_phase_stats", "player_baselines"):
+        exists = session.execute(
+            text("SELECT to_regclass(CAST(:table AS TEXT)) IS NOT NULL"), {"table": table}
+        ).scalar()
+        if not exists:
+            markers[table] = None
+            continue
+        row = session.execute(text(f"SELECT COUNT(*), MAX(computed_date) FROM {table}")).fetchone()
+        markers[table] = [int(row[0] or 0), str(row[1]) if row[1] is not None else None]
+    return markers
+
+
+def _source_data_marker(session: Optional[Session]) -> Optional[Dict[str, Any]]:
+    """
+    Marker that changes whenever the tables the training frames are built from do: the local
+    cache's last refresh (which re-dumps team_phase_stats and player_baselines whole), or the
+    data_versions write counters plus the precomputed tables' markers. None when there is no
+    such marker (counters not installed), in which case fits are only looked up by frame hash.
+    """
+    bind = getattr(session, "bind", None)
+    if bind is None:
+        return None
+    if bind.dialect.name == "sqlite":
+        try:
+            row = session.execute(
+                text("SELECT value FROM _cache_metadata WHERE key = 'last_refresh_timestamp'")
+            ).fetchone()
+        except Exception:
+            return None
+        return {"local_cache_refresh": row[0]} if row and row[0] else None
+    versions = data_versions(session, TRACKED_TABLES)
+    if not any(versions.values()):
+        return None
+    return {"data_versions": versions, "precomputed": _precomputed_markers(session)}
+
+
+def _training_input_key(marker: Dict[str, Any], hyperparameters: Dict[str, Any], **inputs: Any) -> str:
+    """Hash of everything the training frames are built from, plus hyperparameters."""
+    payload = {
+        "marker": marker,
+        "feature_store_version": FEATURE_STORE_VERSION,
+        "hyperparameters": hyperparameters,
+        "inputs": inputs,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _evict_least_recent(directory: Path, pattern: str, keep: int) -> int:
+    """Delete all but the ``keep`` most recently used files matching ``pattern``; returns how many."""
+    entries = []
+    for path in directory.glob(pattern):
+        try:
+            entries.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue
+    entries.sort(key=lambda entry: entry[0], reverse=True)
+    removed = 0
+    for _, path in entries[keep:]:
+        try:
+            path.unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _touch(path: Path) -> None:
+    """Mark a cache entry as used, so eviction keeps it."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _load_cached_fit(cache_key: str) -> Optional[Dict[str, Any]]:
+    path = config.ARTIFACT_CACHE_DIR / f"{cache_key}.joblib"
+    if not path.exists():
+        return None
+    try:
+        fitted = joblib.load(path)
+    except Exception as e:
+        print(f"[train_model] Ignoring unreadable cached fit {path.name}: {e}")
+        return None
+    _touch(path)
+    return fitted
+
+
+def _store_cached_fit(cache_key: str, fitted: Dict[str, Any]) -> None:
+    config.ARTIFACT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = config.ARTIFACT_CACHE_DIR / f"{cache_key}.joblib"
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    joblib.dump(fitted, tmp_path)
+    os.replace(tmp_path, path)
+    _evict_least_recent(config.ARTIFACT_CACHE_DIR, "*.joblib", config.ARTIFACT_CACHE_MAX_ENTRIES)
+
+
+def _load_input_entry(input_key: str) -> Optional[Dict[str, Any]]:
+    """{"cache_key", "match_rows"} recorded for these training inputs, if any."""
+    path = config.ARTIFACT_CACHE_DIR / "inputs" / f"{input_key}.json"
+    try:
+        with path.open("r", encoding="utf-8") as fp:
+            entry = json.load(fp)
+    except (OSError, ValueError):
+        return None
+    _touch(path)
+    return entry
+
+
+def _store_input_entry(input_key: str, cache_key: str, match_rows: int) -> None:
+    directory = config.ARTIFACT_CACHE_DIR / "inputs"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{input_key}.json"
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as fp:
+        json.dump({"cache_key": cache_key, "match_rows": int(match_rows)}, fp)
+    os.replace(tmp_path, path)
+    _evict_least_recent(directory, "*.json", config.ARTIFACT_CACHE_MAX_ENTRIES)
+
+
+def _fit_league_models(
+    match_df: pd.DataFrame,
+    player_df: Optional[pd.DataFrame],
+    fast_mode: bool,
+) -> Dict[str, Any]:
+    """Fit the winner, score and player models and evaluate promotion gates."""
+    print("[train_model] Training match winner model...")
+    winner_model, winner_meta, winner_features, _ = _train_match_winner(match_df, fast_mode=fast_mode)
+
+    print("[train_model] Training score models...")
+    score_results, _ = _train_score_models(match_df, fast_mode=fast_mode)
+
+    gates, passes = _compute_promotion_gates(
+        winner_meta.get("cv", {}),
+        score_results["score_1st"].get("cv", {}),
+        score_results["score_2nd"].get("cv", {}),
+    )
+
+    player = None
+    if player_df is not None and not player_df.empty:
+        print("[train_model] Training player performance model...")
+        player_model, player_meta, player_features, _ = _train_player_model(player_df)
+        player = {"model": player_model, "meta": player_meta, "features": player_features}
+
+    return {
+        "winner": {"model": winner_model, "meta": winner_meta, "features": winner_features},
+        "score_1st": score_results["score_1st"],
+        "score_2nd": score_results["score_2nd"],
+        "gates": gates,
+        "passes": passes,
+        "player": player,
+    }
+
+
+def _open_session(local_cache: Optional[str]) -> Session:
+    if local_cache:
+        from sqlalchemy import create_engine as _ce
+        from sqlalchemy.orm import sessionmaker as _sm
+        _local_engine = _ce(f"sqlite:///{local_cache}")
+        _LocalSession = _sm(autocommit=False, autoflush=False, bind=_local_engine)
+        return _LocalSession()
+    return SessionLocal()
+
+
 def _train_single_league(
     session: Session,
     competitions: Optional[List[str]],
@@ -655,6 +869,8 @@ def _train_single_league(
     start_date: Optional[date],
     end_date: Optional[date],
     output_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+    use_artifact_cache: bool = True,
 ) -> Dict[str, Any]:
     """Train models for a single league (or all competitions if competitions is None).
 
@@ -670,45 +886,87 @@ def _train_single_league(
     print(f"TRAINING: {league_label}")
     print(f"{'='*72}")
 
-    engineer = FeatureEngineer(session, fast_mode=fast_mode)
-
-    print("[train_model] Building match-level dataset...")
-    match_df = engineer.build_match_training_frame(
-        limit=limit_matches,
-        start_date=start_date,
-        end_date=end_date,
-        competitions=competitions,
-        verbose=True,
-    )
-
-    if match_df.empty:
-        print(f"[train_model] No match rows for {league_label}. Skipping.")
-        return {"league": league_label, "matches": 0, "gates": "N/A", "passes": 0, "status": "SKIPPED (no data)"}
+    hyperparameters = _hyperparameter_fingerprint(mode)
+
+    # Unchanged source data and arguments reproduce the same training frames, so a fit recorded
+    # for them is reused without extracting features at all.
+    input_key = None
+    fitted = None
+    marker = _source_data_marker(session) if use_artifact_cache else None
+    if marker is not None:
+        input_key = _training_input_key(
+            marker, hyperparameters,
+            competitions=sorted(competitions) if competitions else None,
+            limit_matches=limit_matches, start_date=start_date, end_date=end_date,
+            fast_mode=fast_mode, skip_player_model=skip_player_model,
+        )
+        entry = _load_input_entry(input_key)
+        if entry is not None:
+            fitted = _load_cached_fit(entry["cache_key"])
+            if fitted is not None:
+                cache_key, match_rows = entry["cache_key"], int(entry["match_rows"])
+                print(f"[train_model] Source data unchanged; reusing cached fit {cache_key[:12]}.")
+
+    from_cache = fitted is not None
+    if not from_cache:
+        engineer = FeatureEngineer(session, fast_mode=fast_mode)
+
+        print("[train_model] Building match-level dataset...")
+        match_df = engineer.build_match_training_frame(
+            limit=limit_matches,
+            start_date=start_date,
+            end_date=end_date,
+            competitions=competitions,
+            verbose=True,
+            workers=workers,
+        )
 
-    if len(match_df) < config.MIN_LEAGUE_MATCHES:
-        print(f"[train_model] Only {len(match_df)} matches for {league_label} (min: {config.MIN_LEAGUE_MATCHES}). Skipping.")
-        return {"league": league_label, "matches": len(match_df), "gates": "N/A", "passes": 0, "status": "SKIPPED (too few)"}
+        if match_df.empty:
+            print(f"[train_model] No match rows for {league_label}. Skipping.")
+            return {"league": league_label, "matches": 0, "gates": "N/A", "passes": 0, "status": "SKIPPED (no data)"}
+
+        match_rows = int(len(match_df))
+        if match_rows < config.MIN_LEAGUE_MATCHES:
+            print(f"[train_model] Only {match_rows} matches for {league_label} (min: {config.MIN_LEAGUE_MATCHES}). Skipping.")
+            return {"league": league_label, "matches": match_rows, "gates": "N/A", "passes": 0, "status": "SKIPPED (too few)"}
+
+        player_df: Optional[pd.DataFrame] = None
+        if not skip_player_model:
+            print("[train_model] Building player-level dataset...")
+            player_df = engineer.build_player_training_frame(match_df)
+
+        # Identical training frames and hyperparameters reproduce the same fits, so reuse them.
+        cache_key = _artifact_cache_key(match_df, player_df, hyperparameters)
+        fitted = _load_cached_fit(cache_key) if use_artifact_cache else None
+        from_cache = fitted is not None
+        if from_cache:
+            print(f"[train_model] Training frame unchanged; reusing cached fit {cache_key[:12]}.")
+        else:
+            fitted = _fit_league_models(match_df, player_df, fast_mode=fast_mode)
+            if use_artifact_cache:
+                _store_cached_fit(cache_key, fitted)
+        if input_key is not None:
+            _store_input_entry(input_key, cache_key, match_rows)
+
+    winner_model = fitted["winner"]["model"]
+    winner_meta = fitted["winner"]["meta"]
+    winner_features = fitted["winner"]["features"]
+    score_1st_info = fitted["score_1st"]
+    score_2nd_info = fitted["score_2nd"]
 
     artifacts: Dict[str, Any] = {
         "model_version": model_version,
         "generated_at_utc": datetime.utcnow().isoformat(),
         "mode": mode,
         "competitions": competitions,
-        "match_rows_total": int(len(match_df)),
+        "match_rows_total": match_rows,
+        "artifact_cache_key": cache_key,
+        "artifact_cache_hit": from_cache,
     }
 
-    # --- Match winner model ---
-    print("[train_model] Training match winner model...")
-    winner_model, winner_meta, winner_features, _ = _train_match_winner(match_df, fast_mode=fast_mode)
     winner_fi_path = out_dir / f"match_winner_feature_importance_{model_version}.csv"
     winner_top = _save_feature_importance(winner_model, winner_features, winner_fi_path)
 
-    # --- Score models ---
-    print("[train_model] Training score models...")
-    score_results, _ = _train_score_models(match_df, fast_mode=fast_mode)
-    score_1st_info = score_results["score_1st"]
-    score_2nd_info = score_results["score_2nd"]
-
     score_1st_fi_path = out_dir / f"score_1st_feature_importance_{model_version}.csv"
     score_2nd_fi_path = out_dir / f"score_2nd_feature_importance_{model_version}.csv"
     score_1st_top = _save_feature_importance(score_1st_info["model"], score_1st_info["feature_columns"], score_1st_fi_path)
@@ -737,11 +995,7 @@ def _train_single_league(
     }
 
     # --- Promotion gates ---
-    winner_cv = winner_meta.get("cv", {})
-    score_1st_cv = score_1st_info.get("cv", {})
-    score_2nd_cv = score_2nd_info.get("cv", {})
-
-    gates, passes = _compute_promotion_gates(winner_cv, score_1st_cv, score_2nd_cv)
+    gates, passes = fitted["gates"], fitted["passes"]
     _print_promotion_gates(gates, passes, gate_threshold)
 
     artifacts["promotion_gates"] = {
@@ -781,35 +1035,33 @@ def _train_single_league(
         print("[train_model] Model artifacts NOT saved (gates failed).")
 
     # --- Player model ---
-    if not skip_player_model:
-        print("[train_model] Building player-level dataset...")
-        player_df = engineer.build_player_training_frame(match_df)
-        if player_df.empty:
-            print("[train_model] Player frame empty. Skipping player model.")
-            artifacts["player_performance"] = {"skipped": True, "reason": "no_player_rows"}
-        else:
-            print("[train_model] Training player performance model...")
-            player_model, player_meta, player_features, _ = _train_player_model(player_df)
-
-            if should_save:
-                player_model_path = out_dir / f"player_performance_{model_version}.joblib"
-                joblib.dump(
-                    {"model": player_model, "feature_columns": player_features, "version": model_version},
-                    player_model_path,
-                )
-                player_fi_path = out_dir / f"player_performance_feature_importance_{model_version}.csv"
-                player_top = _save_feature_importance(player_model, player_features, player_fi_path)
-
-                artifacts["player_performance"] = {
-                    **player_meta,
-                    "artifact": str(player_model_path),
-                    "feature_importance_csv": str(player_fi_path),
-                    "top_feature_importance": player_top,
-                }
-            else:
-                artifacts["player_performance"] = {**player_meta, "saved": False}
-    else:
+    if skip_player_model:
         artifacts["player_performance"] = {"skipped": True, "reason": "flag_skip_player_model"}
+    elif fitted["player"] is None:
+        print("[train_model] Player frame empty. Skipping player model.")
+        artifacts["player_performance"] = {"skipped": True, "reason": "no_player_rows"}
+    else:
+        player_model = fitted["player"]["model"]
+        player_meta = fitted["player"]["meta"]
+        player_features = fitted["player"]["features"]
+
+        if should_save:
+            player_model_path = out_dir / f"player_performance_{model_version}.joblib"
+            joblib.dump(
+                {"model": player_model, "feature_columns": player_features, "version": model_version},
+                player_model_path,
+            )
+            player_fi_path = out_dir / f"player_performance_feature_importance_{model_version}.csv"
+            player_top = _save_feature_importance(player_model, player_features, player_fi_path)
+
+            artifacts["player_performance"] = {
+                **player_meta,
+                "artifact": str(player_model_path),
+                "feature_importance_csv": str(player_fi_path),
+                "top_feature_importance": player_top,
+            }
+        else:
+            artifacts["player_performance"] = {**player_meta, "saved": False}
 
     metadata_path = out_dir / f"training_metadata_{model_version}.json"
     with metadata_path.open("w", encoding="utf-8") as fp:
@@ -818,22 +1070,70 @@ def _train_single_league(
     status = "PROMOTED" if should_save else "REJECTED"
     return {
         "league": league_label,
-        "matches": int(len(match_df)),
+        "matches": match_rows,
         "gates": f"{passes}/6",
         "passes": passes,
         "status": status,
+        "cached": from_cache,
     }
 
 
+def _train_league_job(local_cache: Optional[str], threads: int, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Train one league in a worker process, with its own session and a capped XGBoost thread count."""
+    for params in (config.MATCH_WINNER_PARAMS, config.SCORE_REGRESSOR_PARAMS, config.PLAYER_REGRESSOR_PARAMS):
+        params["n_jobs"] = threads
+    session = _open_session(local_cache)
+    try:
+        return _train_single_league(session=session, **kwargs)
+    finally:
+        session.close()
+
+
+def _train_leagues_parallel(
+    leagues: List[str],
+    local_cache: Optional[str],
+    league_jobs: int,
+    common_kwargs: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """Train leagues concurrently; CPUs are split evenly so jobs do not oversubscribe."""
+    jobs = min(league_jobs, len(leagues))
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+    print(f"[train_model] Training {len(leagues)} leagues across {jobs} jobs ({threads} threads each)")
+
+    results: Dict[int, Dict[str, Any]] = {}
+    # spawn, not fork: the parent holds an open DB session
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+        futures = {}
+        for idx, league in enumerate(leagues):
+            kwargs = {
+                **common_kwargs,
+                "competitions": [league],
+                "output_dir": config.MODEL_DIR / _league_slug(league),
+                # League jobs already fill the CPUs; extract features in-process.
+                "workers": 1,
+            }
+            futures[pool.submit(_train_league_job, local_cache, threads, kwargs)] = idx
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                results[idx] = future.result()
+            except Exception as e:
+                print(f"[train_model] League {leagues[idx]} failed: {e}")
+                results[idx] = {"league": leagues[idx], "matches": 0, "gates": "N/A", "passes": 0, "status": "FAILED"}
+    return [results[idx] for idx in range(len(leagues))]
+
+
 def _print_league_summary(results: List[Dict[str, Any]]) -> None:
     """Print a summary table of per-league training results."""
     print("\n" + "=" * 72)
     print("PER-LEAGUE TRAINING SUMMARY")
     print("=" * 72)
-    print(f"{'League':<35} {'Matches':>8} {'Gates':>8} {'Status':>12}")
+    print(f"{'League':<35} {'Matches':>8} {'Gates':>8} {'Status':>12} {'Fit':>6}")
     print("-" * 72)
     for r in results:
-        print(f"{r['league']:<35} {r['matches']:>8} {str(r['gates']):>8} {r['status']:>12}")
+        fit = "cached" if r.get("cached") else ""
+        print(f"{r['league']:<35} {r['matches']:>8} {str(r['gates']):>8} {r['status']:>12} {fit:>6}")
     print("=" * 72)
 
     promoted = sum(1 for r in results if r["status"] == "PROMOTED")
@@ -886,6 +1186,23 @@ def main() -> None:
         default=None,
         help=f"Number of gates to pass for auto-save (default: {config.PROMOTION_GATE_THRESHOLD}).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"Worker processes for match feature extraction (default: {config.FEATURE_WORKERS}).",
+    )
+    parser.add_argument(
+        "--league-jobs",
+        type=int,
+        default=None,
+        help=f"Leagues trained concurrently with --train-all-leagues (default: {config.LEAGUE_JOBS}).",
+    )
+    parser.add_argument(
+        "--no-artifact-cache",
+        action="store_true",
+        help="Retrain even when an identical training frame already has a cached fit.",
+    )
     parser.add_argument(
         "--local-cache",
         type=str,
@@ -937,15 +1254,9 @@ def main() -> None:
                 remote_session.close()
 
     # --- Create session ---
+    session = _open_session(args.local_cache)
     if args.local_cache:
-        from sqlalchemy import create_engine as _ce
-        from sqlalchemy.orm import sessionmaker as _sm
-        _local_engine = _ce(f"sqlite:///{args.local_cache}")
-        _LocalSession = _sm(autocommit=False, autoflush=False, bind=_local_engine)
-        session = _LocalSession()
         print(f"[train_model] Using local cache: {args.local_cache}")
-    else:
-        session = SessionLocal()
 
     try:
         if args.train_all_leagues:
@@ -965,24 +1276,33 @@ def main() -> None:
 
             print(f"[train_model] Discovered {len(all_leagues)} leagues: {', '.join(all_leagues)}")
 
+            common_kwargs: Dict[str, Any] = {
+                "model_version": model_version,
+                "mode": args.mode,
+                "fast_mode": fast_mode,
+                "gate_threshold": gate_threshold,
+                "force_save": args.force_save,
+                "skip_player_model": args.skip_player_model,
+                "limit_matches": args.limit_matches,
+                "start_date": start_date,
+                "end_date": end_date,
+                "use_artifact_cache": not args.no_artifact_cache,
+            }
+            league_jobs = args.league_jobs or config.LEAGUE_JOBS
             results: List[Dict[str, Any]] = []
-            for league in all_leagues:
-                league_dir = config.MODEL_DIR / _league_slug(league)
-                result = _train_single_league(
-                    session=session,
-                    competitions=[league],
-                    model_version=model_version,
-                    mode=args.mode,
-                    fast_mode=fast_mode,
-                    gate_threshold=gate_threshold,
-                    force_save=args.force_save,
-                    skip_player_model=args.skip_player_model,
-                    limit_matches=args.limit_matches,
-                    start_date=start_date,
-                    end_date=end_date,
-                    output_dir=league_dir,
-                )
-                results.append(result)
+            if league_jobs > 1 and len(all_leagues) > 1:
+                results = _train_leagues_parallel(all_leagues, args.local_cache, league_jobs, common_kwargs)
+            else:
+                for league in all_leagues:
+                    league_dir = config.MODEL_DIR / _league_slug(league)
+                    result = _train_single_league(
+                        session=session,
+                        competitions=[league],
+                        output_dir=league_dir,
+                        workers=args.workers,
+                        **common_kwargs,
+                    )
+                    results.append(result)
 
             _print_league_summary(results)
 
@@ -1010,6 +1330,8 @@ def main() -> None:
                 start_date=start_date,
                 end_date=end_date,
                 output_dir=out_dir,
+                workers=args.workers,
+                use_artifact_cache=not args.no_artifact_cache,
             )
 
             print(f"\n[train_model] Training complete. Version: {model_version}")
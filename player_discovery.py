@@ -32,6 +32,92 @@ class PlayerInfo:
     ball_count: int
     likely_nationality: Optional[str] = None
 
+
+def scan_match_players(data: dict, discovered_players: defaultdict) -> None:
+    """Update discovered_players from one already-parsed match JSON document"""
+    # Get team information
+    teams = data['info']['teams']
+
+    # Track players by role in this match
+    match_batters = set()
+    match_bowlers = set()
+    ball_count = 0
+
+    # Scan all deliveries
+    for innings in data['innings']:
+        batting_team = innings['team']
+        bowling_team = teams[0] if batting_team == teams[1] else teams[1]
+
+        for over in innings['overs']:
+            for ball in over['deliveries']:
+                ball_count += 1
+
+                # Extract players from delivery
+                batter = ball['batter']
+                non_striker = ball['non_striker'] 
+                bowler = ball['bowler']
+
+                # Update player info
+                match_batters.update([batter, non_striker])
+                match_bowlers.add(bowler)
+
+                # Track team associations
+                discovered_players[batter].team_countries.add(batting_team)
+                discovered_players[non_striker].team_countries.add(batting_team)
+                discovered_players[bowler].team_countries.add(bowling_team)
+
+                # Update ball counts
+                discovered_players[batter].ball_count += 1
+                discovered_players[non_striker].ball_count += 1
+                discovered_players[bowler].ball_count += 1
+
+    # Update match counts and roles
+    for player in match_batters:
+        discovered_players[player].match_count += 1
+        if 'batter' not in discovered_players[player].appears_as:
+            discovered_players[player].appears_as.append('batter')
+
+    for player in match_bowlers:
+        discovered_players[player].match_count += 1
+        if 'bowler' not in discovered_players[player].appears_as:
+            discovered_players[player].appears_as.append('bowler')
+
+    # Mark players who both bat and bowl
+    for player in match_batters.intersection(match_bowlers):
+        if 'both' not in discovered_players[player].appears_as:
+            discovered_players[player].appears_as.append('both')
+
+
+def infer_nationality(team_countries: Set[str]) -> Optional[str]:
+    """Infer player nationality based on teams they've played for (international teams only)"""
+    if not team_countries:
+        return None
+
+    # Check for international teams only (highest confidence)
+    for team in team_countries:
+        if team in INTERNATIONAL_TEAMS_RANKED:
+            return team
+
+    # No international team found - return None rather than guessing from league teams
+    return None
+
+
+def discover_match_players(data: dict) -> Dict[str, PlayerInfo]:
+    """Players found in one already-parsed match JSON document, with nationality inferred"""
+    discovered_players = defaultdict(lambda: PlayerInfo(
+        name="", appears_as=[], team_countries=set(), 
+        match_count=0, ball_count=0
+    ))
+    scan_match_players(data, discovered_players)
+
+    result = {}
+    for player_name, info in discovered_players.items():
+        info.name = player_name
+        info.likely_nationality = infer_nationality(info.team_countries)
+        result[player_name] = info
+    return result
+
+
 class PlayerDiscoveryService:
     """Service to discover and create missing player entries"""
     
@@ -98,75 +184,14 @@ class PlayerDiscoveryService:
         try:
             with open(json_file, 'r') as f:
                 data = json.load(f)
-                
-            # Get team information
-            teams = data['info']['teams']
-            
-            # Track players by role in this match
-            match_batters = set()
-            match_bowlers = set()
-            ball_count = 0
-            
-            # Scan all deliveries
-            for innings in data['innings']:
-                batting_team = innings['team']
-                bowling_team = teams[0] if batting_team == teams[1] else teams[1]
-                
-                for over in innings['overs']:
-                    for ball in over['deliveries']:
-                        ball_count += 1
-                        
-                        # Extract players from delivery
-                        batter = ball['batter']
-                        non_striker = ball['non_striker'] 
-                        bowler = ball['bowler']
-                        
-                        # Update player info
-                        match_batters.update([batter, non_striker])
-                        match_bowlers.add(bowler)
-                        
-                        # Track team associations
-                        discovered_players[batter].team_countries.add(batting_team)
-                        discovered_players[non_striker].team_countries.add(batting_team)
-                        discovered_players[bowler].team_countries.add(bowling_team)
-                        
-                        # Update ball counts
-                        discovered_players[batter].ball_count += 1
-                        discovered_players[non_striker].ball_count += 1
-                        discovered_players[bowler].ball_count += 1
-            
-            # Update match counts and roles
-            for player in match_batters:
-                discovered_players[player].match_count += 1
-                if 'batter' not in discovered_players[player].appears_as:
-                    discovered_players[player].appears_as.append('batter')
-                    
-            for player in match_bowlers:
-                discovered_players[player].match_count += 1
-                if 'bowler' not in discovered_players[player].appears_as:
-                    discovered_players[player].appears_as.append('bowler')
-                    
-            # Mark players who both bat and bowl
-            for player in match_batters.intersection(match_bowlers):
-                if 'both' not in discovered_players[player].appears_as:
-                    discovered_players[player].appears_as.append('both')
-                    
+            scan_match_players(data, discovered_players)
         except Exception as e:
             logger.error(f"Error processing {json_file}: {e}")
             raise
     
     def _infer_nationality(self, team_countries: Set[str]) -> Optional[str]:
         """Infer player nationality based on teams they've played for (international teams only)"""
-        if not team_countries:
-            return None
-            
-        # Check for international teams only (highest confidence)
-        for team in team_countries:
-            if team in INTERNATIONAL_TEAMS_RANKED:
-                return team
-                
-        # No international team found - return None rather than guessing from league teams
-        return None
+        return infer_nationality(team_countries)
     
     def find_missing_players(self, discovered_players: Dict[str, PlayerInfo]) -> Dict[str, PlayerInfo]:
         """
@@ -298,21 +323,9 @@ class PlayerDiscoveryService:
         Returns:
             Dictionary of players found in the file
         """
-        discovered_players = defaultdict(lambda: PlayerInfo(
-            name="", appears_as=[], team_countries=set(), 
-            match_count=0, ball_count=0
-        ))
-        
-        self._scan_single_file(Path(json_file), discovered_players)
-        
-        # Convert to regular dict and infer nationalities
-        result = {}
-        for player_name, info in discovered_players.items():
-            info.name = player_name
-            info.likely_nationality = self._infer_nationality(info.team_countries)
-            result[player_name] = info
-            
-        return result
+        with open(json_file, 'r') as f:
+            data = json.load(f)
+        return discover_match_players(data)
     
     def validate_player_completeness(self) -> Dict[str, int]:
         """
@@ -353,3 +353,153 @@ class DataQualityCheck(Base):
             'computed_date': self.computed_date.isoformat() if self.computed_date else None,
             'data_through_date': self.data_through_date.isoformat() if self.data_through_date else None
         }
+
+
+# ---------------------------------------------------------------------------
+# Incremental rebuild support
+#
+# Each published table above is an average over matches. Averages do not merge, but the sums
+# and counts behind them do, so the incremental pipeline keeps those per calendar-month
+# partition of match date and re-derives the published rows from them. A match lives in exactly
+# one partition, which is what keeps COUNT(DISTINCT match_id) additive across partitions.
+# ---------------------------------------------------------------------------
+
+
+class TeamPhaseStatPartial(Base):
+    """Additive per-month sums behind team_phase_stats."""
+    __tablename__ = 'team_phase_stats_partials'
+
+    id = Column(Integer, primary_key=True)
+    partition_month = Column(Date, nullable=False)
+    team = Column(String(255), nullable=False)
+    venue = Column(String(255))
+    phase = Column(String(20), nullable=False)
+    innings = Column(Integer, nullable=False)
+    matches = Column(Integer, nullable=False)
+    sum_runs = Column(DECIMAL(14, 4))
+    sum_wickets = Column(DECIMAL(14, 4))
+    sum_balls = Column(DECIMAL(14, 4))
+    sum_boundaries = Column(DECIMAL(14, 4))
+    sum_dots = Column(DECIMAL(14, 4))
+
+    __table_args__ = (
+        Index('idx_tps_partials_partition', 'partition_month'),
+        Index('idx_tps_partials_key', 'team', 'venue', 'phase', 'innings'),
+    )
+
+
+class PlayerBaselinePartial(Base):
+    """Additive per-month sums behind player_baselines (one row per player/venue/phase/role)."""
+    __tablename__ = 'player_baselines_partials'
+
+    id = Column(Integer, primary_key=True)
+    partition_month = Column(Date, nullable=False)
+    player_name = Column(String(255), nullable=False)
+    venue = Column(String(255))
+    phase = Column(String(20), nullable=False)
+    role = Column(String(20), nullable=False)
+    n_rows = Column(Integer, nullable=False)        # innings rows averaged over
+    matches = Column(Integer, nullable=False)       # distinct matches in this partition
+
+    # Batting sums
+    sum_runs = Column(DECIMAL(14, 4))
+    sum_strike_rate = Column(DECIMAL(14, 4))
+    sum_balls_faced = Column(DECIMAL(14, 4))
+    sum_boundary_pct = Column(DECIMAL(14, 4))
+    sum_dot_pct = Column(DECIMAL(14, 4))
+
+    # Bowling sums (economy can be NULL, so it carries its own count)
+    sum_economy = Column(DECIMAL(14, 4))
+    n_economy = Column(Integer)
+    sum_wickets = Column(DECIMAL(14, 4))
+    sum_dot_ball_pct = Column(DECIMAL(14, 4))
+    sum_overs = Column(DECIMAL(14, 4))
+    sum_bowling_strike_rate = Column(DECIMAL(14, 4))
+    sum_average = Column(DECIMAL(14, 4))
+
+    __table_args__ = (
+        Index('idx_pb_partials_partition', 'partition_month'),
+        Index('idx_pb_partials_key', 'player_name', 'venue', 'phase', 'role'),
+    )
+
+
+class VenueResourcePartial(Base):
+    """Additive per-month ball-state sums behind venue_resources."""
+    __tablename__ = 'venue_resources_partials'
+
+    id = Column(Integer, primary_key=True)
+    partition_month = Column(Date, nullable=False)
+    venue = Column(String(255))
+    innings = Column(Integer, nullable=False)
+    over_num = Column(Integer, nullable=False)
+    wickets_lost = Column(Integer, nullable=False)
+    n_balls = Column(Integer, nullable=False)
+    matches = Column(Integer, nullable=False)
+    sum_runs_remaining = Column(DECIMAL(16, 4))
+    sum_final_score = Column(DECIMAL(16, 4))
+    sum_runs_at_state = Column(DECIMAL(16, 4))
+
+    __table_args__ = (
+        Index('idx_vr_partials_partition', 'partition_month'),
+        Index('idx_vr_partials_key', 'venue', 'innings', 'over_num', 'wickets_lost'),
+    )
+
+
+class WPAOutcomePartial(Base):
+    """Additive per-month chase outcome counts behind wpa_outcomes."""
+    __tablename__ = 'wpa_outcomes_partials'
+
+    id = Column(Integer, primary_key=True)
+    partition_month = Column(Date, nullable=False)
+    venue = Column(String(255))
+    league = Column(String(100))
+    target_bucket = Column(Integer, nullable=False)
+    over_bucket = Column(Integer, nullable=False)
+    wickets_lost = Column(Integer, nullable=False)
+    runs_range_min = Column(Integer, nullable=False)
+    runs_range_max = Column(Integer, nullable=False)
+    total_outcomes = Column(Integer, nullable=False)
+    successful_chases = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index('idx_wpa_partials_partition', 'partition_month'),
+        Index('idx_wpa_partials_key', 'venue', 'league', 'target_bucket', 'over_bucket', 'wickets_lost'),
+    )
+
+
+class PrecomputePartition(Base):
+    """
+    Manifest of which match-date partitions each partials table was built from.
+
+    The fingerprint is a hash over the partition's match ids and winners as of
+    ``data_through_date``. A partition is recomputed when the current fingerprint differs,
+    which covers newly loaded matches, late results and deletions without relying on load
+    timestamps the matches table does not have.
+    """
+    __tablename__ = 'precompute_partitions'
+
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(100), nullable=False)
+    partition_month = Column(Date, nullable=False)
+    match_count = Column(Integer, nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    data_through_date = Column(Date, nullable=False)
+    computation_run_id = Column(Integer)
+    computed_date = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_precompute_partitions_key', 'table_name', 'partition_month', unique=True),
+    )
+
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'id': self.id,
+            'table_name': self.table_name,
+            'partition_month': self.partition_month.isoformat() if self.partition_month else None,
+            'match_count': self.match_count,
+            'fingerprint': self.fingerprint,
+            'data_through_date': self.data_through_date.isoformat() if self.data_through_date else None,
+            'computation_run_id': self.computation_run_id,
+            'computed_date': self.computed_date.isoformat() if self.computed_date else None
+        }
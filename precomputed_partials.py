@@ -0,0 +1,415 @@
+"""
+Partition SQL for the incremental precomputation rebuild.
+
+For each published precomputed table this module holds two statements:
+
+- ``fill``: aggregate the matches of the given month partitions into additive sums/counts
+  and insert them into the table's ``*_partials`` table
+- ``publish``: re-derive the published rows from all partials (a GROUP BY over a table that
+  is orders of magnitude smaller than the raw deliveries) using the same formulas and
+  thresholds as the corresponding full-rebuild query in batch_processor.py
+
+Keep the two in lockstep with the full-rebuild queries: the incremental and full modes are
+expected to publish the same rows for the same ``through_date``.
+"""
+
+from typing import Dict
+
+from precomputed_models import (
+    PlayerBaselinePartial,
+    TeamPhaseStatPartial,
+    VenueResourcePartial,
+    WPAOutcomePartial,
+)
+
+
+PARTITION_EXPR = "date_trunc('month', m.date)::date"
+
+# Bound parameters: :through_date, :range_start, :range_end, :months (list of month starts).
+# The range bounds are redundant with :months but let Postgres use the matches(date) index.
+PARTITION_FILTER = f"""
+    m.date < :through_date
+    AND m.date >= :range_start
+    AND m.date < :range_end
+    AND {PARTITION_EXPR} = ANY(:months)
+"""
+
+PARTITION_FINGERPRINT_SQL = f"""
+    SELECT
+        {PARTITION_EXPR} AS partition_month,
+        COUNT(*) AS match_count,
+        md5(string_agg(m.id || ':' || COALESCE(m.winner, ''), ',' ORDER BY m.id)) AS fingerprint
+    FROM matches m
+    WHERE m.date < :through_date
+    GROUP BY 1
+"""
+
+
+def _team_phase_select(phase: str, prefix: str, balls: str, boundaries: str) -> str:
+    return f"""
+        SELECT
+            {PARTITION_EXPR} AS partition_month,
+            bs.batting_team,
+            m.venue,
+            '{phase}' AS phase,
+            bs.innings,
+            SUM(bs.{prefix}runs) AS team_runs,
+            SUM(bs.{prefix}wickets) AS team_wickets,
+            SUM(bs.{balls}) AS team_balls_faced,
+            SUM({boundaries}) AS team_boundaries,
+            SUM(bs.{prefix}dots) AS team_dots,
+            bs.match_id
+        FROM batting_stats bs
+        JOIN matches m ON bs.match_id = m.id
+        WHERE {PARTITION_FILTER} AND bs.{balls} > 0
+        GROUP BY 1, bs.batting_team, m.venue, bs.innings, bs.match_id
+    """
+
+
+TEAM_PHASE_FILL_SQL = f"""
+    INSERT INTO team_phase_stats_partials
+        (partition_month, team, venue, phase, innings, matches,
+         sum_runs, sum_wickets, sum_balls, sum_boundaries, sum_dots)
+    SELECT
+        partition_month, batting_team, venue, phase, innings,
+        COUNT(*),
+        SUM(team_runs), SUM(team_wickets), SUM(team_balls_faced), SUM(team_boundaries), SUM(team_dots)
+    FROM (
+        {_team_phase_select('powerplay', 'pp_', 'pp_balls', 'bs.pp_boundaries')}
+        UNION ALL
+        {_team_phase_select('middle', 'middle_', 'middle_balls', 'bs.middle_boundaries')}
+        UNION ALL
+        {_team_phase_select('death', 'death_', 'death_balls', 'bs.death_boundaries')}
+        UNION ALL
+        {_team_phase_select('overall', '', 'balls_faced', 'bs.fours + bs.sixes')}
+    ) per_match
+    GROUP BY partition_month, batting_team, venue, phase, innings
+"""
+
+TEAM_PHASE_PUBLISH_SQL = """
+    INSERT INTO team_phase_stats
+        (team, venue_type, venue_identifier, league, phase, innings,
+         avg_runs, avg_wickets, avg_run_rate, avg_balls_faced, boundary_rate, dot_rate,
+         matches_played, computed_date, data_through_date)
+    SELECT
+        team, 'global', venue, NULL, phase, innings,
+        ROUND(COALESCE(SUM(sum_runs) / SUM(matches), 0), 2),
+        ROUND(COALESCE(SUM(sum_wickets) / SUM(matches), 0), 2),
+        ROUND(COALESCE(SUM(sum_runs) * 6.0 / NULLIF(SUM(sum_balls), 0), 0), 2),
+        FLOOR(COALESCE(SUM(sum_balls) / SUM(matches), 0))::INTEGER,
+        ROUND(COALESCE(SUM(sum_boundaries) * 100.0 / NULLIF(SUM(sum_balls), 0), 0), 2),
+        ROUND(COALESCE(SUM(sum_dots) * 100.0 / NULLIF(SUM(sum_balls), 0), 0), 2),
+        SUM(matches),
+        :computed_date,
+        :through_date
+    FROM team_phase_stats_partials
+    GROUP BY team, venue, phase, innings
+    HAVING SUM(matches) >= 5
+"""
+
+
+def _batting_baseline_select(phase: str, runs: str, balls: str, boundaries: str, dots: str) -> str:
+    return f"""
+        SELECT
+            {PARTITION_EXPR} AS partition_month,
+            bs.striker,
+            m.venue,
+            '{phase}' AS phase,
+            {runs} AS runs,
+            CASE WHEN {balls} > 0 THEN ({runs} * 100.0 / {balls}) ELSE 0 END AS strike_rate,
+            {balls} AS balls_faced,
+            CASE WHEN {balls} > 0 THEN LEAST(100.0, {boundaries} * 100.0 / {balls}) ELSE 0 END AS boundary_percentage,
+            CASE WHEN {balls} > 0 THEN LEAST(100.0, {dots} * 100.0 / {balls}) ELSE 0 END AS dot_percentage,
+            bs.match_id
+        FROM batting_stats bs
+        JOIN matches m ON bs.match_id = m.id
+        WHERE {PARTITION_FILTER} AND {balls} > 0
+    """
+
+
+def _bowling_baseline_select(phase: str, prefix: str, runs: str, economy: str) -> str:
+    overs = f"bw.{prefix}overs"
+    wickets = f"bw.{prefix}wickets"
+    return f"""
+        SELECT
+            {PARTITION_EXPR} AS partition_month,
+            bw.bowler,
+            m.venue,
+            '{phase}' AS phase,
+            {economy} AS economy,
+            {wickets} AS wickets,
+            CASE WHEN {overs} > 0 THEN (bw.{prefix}dots * 100.0 / ({overs} * 6)) ELSE 0 END AS dot_ball_percentage,
+            {overs} AS overs,
+            CASE WHEN {wickets} > 0 THEN (({overs} * 6) / {wickets}) ELSE 0 END AS strike_rate,
+            CASE WHEN {wickets} > 0 THEN ({runs} / {wickets}) ELSE 0 END AS average,
+            bw.match_id
+        FROM bowling_stats bw
+        JOIN matches m ON bw.match_id = m.id
+        WHERE {PARTITION_FILTER} AND {overs} > 0
+    """
+
+
+PLAYER_BASELINE_BATTING_FILL_SQL = f"""
+    INSERT INTO player_baselines_partials
+        (partition_month, player_name, venue, phase, role, n_rows, matches,
+         sum_runs, sum_strike_rate, sum_balls_faced, sum_boundary_pct, sum_dot_pct)
+    SELECT
+        partition_month, striker, venue, phase, 'batting',
+        COUNT(*), COUNT(DISTINCT match_id),
+        SUM(runs), SUM(strike_rate), SUM(balls_faced), SUM(boundary_percentage), SUM(dot_percentage)
+    FROM (
+        {_batting_baseline_select('powerplay', 'bs.pp_runs', 'bs.pp_balls', 'bs.pp_boundaries', 'bs.pp_dots')}
+        UNION ALL
+        {_batting_baseline_select('middle', 'bs.middle_runs', 'bs.middle_balls', 'bs.middle_boundaries', 'bs.middle_dots')}
+        UNION ALL
+        {_batting_baseline_select('death', 'bs.death_runs', 'bs.death_balls', 'bs.death_boundaries', 'bs.death_dots')}
+        UNION ALL
+        {_batting_baseline_select('overall', 'bs.runs', 'bs.balls_faced', '(bs.fours + bs.sixes)', 'bs.dots')}
+    ) player_stats
+    GROUP BY partition_month, striker, venue, phase
+"""
+
+PLAYER_BASELINE_BOWLING_FILL_SQL = f"""
+    INSERT INTO player_baselines_partials
+        (partition_month, player_name, venue, phase, role, n_rows, matches,
+         sum_economy, n_economy, sum_wickets, sum_dot_ball_pct, sum_overs,
+         sum_bowling_strike_rate, sum_average)
+    SELECT
+        partition_month, bowler, venue, phase, 'bowling',
+        COUNT(*), COUNT(DISTINCT match_id),
+        SUM(economy), COUNT(economy), SUM(wickets), SUM(dot_ball_percentage), SUM(overs),
+        SUM(strike_rate), SUM(average)
+    FROM (
+        {_bowling_baseline_select('powerplay', 'pp_', 'bw.pp_runs', 'bw.pp_economy')}
+        UNION ALL
+        {_bowling_baseline_select('middle', 'middle_', 'bw.middle_runs', 'bw.middle_economy')}
+        UNION ALL
+        {_bowling_baseline_select('death', 'death_', 'bw.death_runs', 'bw.death_economy')}
+        UNION ALL
+        {_bowling_baseline_select('overall', '', 'bw.runs_conceded', 'bw.economy')}
+    ) player_stats
+    GROUP BY partition_month, bowler, venue, phase
+"""
+
+PLAYER_BASELINE_PUBLISH_SQL = """
+    INSERT INTO player_baselines
+        (player_name, venue_type, venue_identifier, league, phase, role,
+         avg_runs, avg_strike_rate, avg_balls_faced, boundary_percentage, dot_percentage,
+         avg_economy, avg_wickets, dot_ball_percentage, avg_overs, strike_rate, average,
+         matches_played, computed_date, data_through_date)
+    SELECT
+        player_name, 'venue_specific', venue, NULL, phase, role,
+        CASE WHEN role = 'batting' THEN ROUND(COALESCE(SUM(sum_runs) / SUM(n_rows), 0), 2) END,
+        CASE WHEN role = 'batting' THEN ROUND(COALESCE(SUM(sum_strike_rate) / SUM(n_rows), 0), 2) END,
+        CASE WHEN role = 'batting' THEN ROUND(COALESCE(SUM(sum_balls_faced) / SUM(n_rows), 0), 2) END,
+        CASE WHEN role = 'batting' THEN ROUND(COALESCE(SUM(sum_boundary_pct) / SUM(n_rows), 0), 2) END,
+        CASE WHEN role = 'batting' THEN ROUND(COALESCE(SUM(sum_dot_pct) / SUM(n_rows), 0), 2) END,
+        CASE WHEN role = 'bowling' THEN ROUND(COALESCE(SUM(sum_economy) / NULLIF(SUM(n_economy), 0), 0), 2) END,
+        CASE WHEN role = 'bowling' THEN ROUND(COALESCE(SUM(sum_wickets) / SUM(n_rows), 0), 2) END,
+        CASE WHEN role = 'bowling' THEN ROUND(COALESCE(SUM(sum_dot_ball_pct) / SUM(n_rows), 0), 2) END,
+        CASE WHEN role = 'bowling' THEN ROUND(COALESCE(SUM(sum_overs) / SUM(n_rows), 0), 1) END,
+        CASE WHEN role = 'bowling' THEN ROUND(COALESCE(SUM(sum_bowling_strike_rate) / SUM(n_rows), 0), 2) END,
+        CASE WHEN role = 'bowling' THEN ROUND(COALESCE(SUM(sum_average) / SUM(n_rows), 0), 2) END,
+        SUM(matches),
+        :computed_date,
+        :through_date
+    FROM player_baselines_partials
+    GROUP BY player_name, venue, phase, role
+    HAVING SUM(matches) >= 5
+"""
+
+VENUE_RESOURCES_FILL_SQL = f"""
+    INSERT INTO venue_resources_partials
+        (partition_month, venue, innings, over_num, wickets_lost, n_balls, matches,
+         sum_runs_remaining, sum_final_score, sum_runs_at_state)
+    WITH ball_states AS (
+        SELECT
+            {PARTITION_EXPR} AS partition_month,
+            d.match_id,
+            m.venue,
+            d.innings,
+            d.over AS over_num,
+            COUNT(*) FILTER (WHERE d.wicket_type IS NOT NULL) OVER (
+                PARTITION BY d.match_id, d.innings
+                ORDER BY d.over, d.ball
+            ) AS wickets_lost,
+            SUM(d.runs_off_bat + d.extras) OVER (
+                PARTITION BY d.match_id, d.innings
+                ORDER BY d.over, d.ball
+            ) AS runs_at_state,
+            SUM(d.runs_off_bat + d.extras) OVER (
+                PARTITION BY d.match_id, d.innings
+            ) AS final_score
+        FROM deliveries d
+        JOIN matches m ON d.match_id = m.id
+        WHERE {PARTITION_FILTER}
+            AND d.over < 20
+    )
+    SELECT
+        partition_month, venue, innings, over_num, wickets_lost,
+        COUNT(*), COUNT(DISTINCT match_id),
+        SUM(final_score - runs_at_state), SUM(final_score), SUM(runs_at_state)
+    FROM ball_states
+    GROUP BY partition_month, venue, innings, over_num, wickets_lost
+"""
+
+VENUE_RESOURCES_PUBLISH_SQL = """
+    INSERT INTO venue_resources
+        (venue, league, innings, over_num, wickets_lost, resource_percentage,
+         avg_runs_at_state, avg_final_score, sample_size, computed_date, data_through_date)
+    WITH venue_state_averages AS (
+        SELECT
+            venue,
+            innings,
+            over_num,
+            wickets_lost,
+            SUM(sum_runs_remaining) / SUM(n_balls) AS avg_runs_remaining,
+            SUM(sum_final_score) / SUM(n_balls) AS avg_final_score,
+            SUM(sum_runs_at_state) / SUM(n_balls) AS avg_runs_at_state,
+            SUM(matches) AS sample_size
+        FROM venue_resources_partials
+        GROUP BY venue, innings, over_num, wickets_lost
+        HAVING SUM(matches) >= 5
+    ),
+    resource_calculations AS (
+        SELECT
+            venue,
+            innings,
+            over_num,
+            wickets_lost,
+            avg_final_score,
+            avg_runs_at_state,
+            sample_size,
+            CASE
+                WHEN avg_final_score > 0 AND over_num < 20 THEN
+                    LEAST(100.0,
+                        (avg_runs_remaining * 100.0 / NULLIF(avg_final_score, 0)) *
+                        ((20 - over_num) / 20.0) *
+                        ((10 - wickets_lost) / 10.0)
+                    )
+                ELSE 0.0
+            END AS resource_percentage
+        FROM venue_state_averages
+        WHERE avg_final_score > 0
+    )
+    SELECT
+        venue,
+        NULL,
+        innings,
+        over_num,
+        wickets_lost,
+        ROUND(CAST(resource_percentage AS NUMERIC), 2),
+        NULLIF(ROUND(CAST(avg_runs_at_state AS NUMERIC), 2), 0),
+        NULLIF(ROUND(CAST(avg_final_score AS NUMERIC), 2), 0),
+        sample_size,
+        :computed_date,
+        :through_date
+    FROM resource_calculations
+    WHERE resource_percentage >= 0
+        AND sample_size >= 5
+"""
+
+WPA_OUTCOMES_FILL_SQL = f"""
+    INSERT INTO wpa_outcomes_partials
+        (partition_month, venue, league, target_bucket, over_bucket, wickets_lost,
+         runs_range_min, runs_range_max, total_outcomes, successful_chases)
+    WITH chase_data AS (
+        SELECT
+            {PARTITION_EXPR} AS partition_month,
+            d.match_id,
+            m.venue,
+            m.competition AS league,
+            first_innings.total_runs + 1 AS target,
+            d.over AS current_over,
+            COUNT(*) FILTER (WHERE d.wicket_type IS NOT NULL) OVER (
+                PARTITION BY d.match_id, d.innings
+                ORDER BY d.over, d.ball
+            ) AS wickets_lost,
+            SUM(d.runs_off_bat + d.extras) OVER (
+                PARTITION BY d.match_id, d.innings
+                ORDER BY d.over, d.ball
+            ) AS current_runs,
+            CASE WHEN m.winner = d.batting_team THEN 1 ELSE 0 END AS chase_successful
+        FROM deliveries d
+        JOIN matches m ON d.match_id = m.id
+        JOIN (
+            -- Postgres does not push the join key into a grouped subquery, so restrict it to
+            -- the partition's matches here or every partition fill rescans all deliveries.
+            SELECT match_id, SUM(runs_off_bat + extras) AS total_runs
+            FROM deliveries
+            WHERE innings = 1
+                AND match_id IN (SELECT m.id FROM matches m WHERE {PARTITION_FILTER})
+            GROUP BY match_id
+        ) first_innings ON d.match_id = first_innings.match_id
+        WHERE {PARTITION_FILTER}
+            AND d.innings = 2
+            AND d.over < 20
+            AND m.winner IS NOT NULL
+    )
+    SELECT
+        partition_month,
+        venue,
+        league,
+        (target / 10) * 10 AS target_bucket,
+        (current_over / 2) * 2 AS over_bucket,
+        wickets_lost,
+        (current_runs / 20) * 20 AS runs_range_min,
+        ((current_runs / 20) * 20) + 19 AS runs_range_max,
+        COUNT(*),
+        SUM(chase_successful)
+    FROM chase_data
+    WHERE target BETWEEN 100 AND 250
+        AND current_over <= 19
+        AND wickets_lost <= 9
+    GROUP BY partition_month, venue, league, target_bucket, over_bucket, wickets_lost,
+             runs_range_min, runs_range_max
+"""
+
+WPA_OUTCOMES_PUBLISH_SQL = """
+    INSERT INTO wpa_outcomes
+        (venue, league, target_bucket, over_bucket, wickets_lost, runs_range_min, runs_range_max,
+         total_outcomes, successful_chases, win_probability, sample_size,
+         computed_date, data_through_date)
+    SELECT
+        venue,
+        league,
+        target_bucket,
+        over_bucket,
+        wickets_lost,
+        runs_range_min,
+        runs_range_max,
+        SUM(total_outcomes),
+        SUM(successful_chases),
+        ROUND(CAST(SUM(successful_chases) AS NUMERIC) / CAST(SUM(total_outcomes) AS NUMERIC), 3),
+        SUM(total_outcomes),
+        :computed_date,
+        :through_date
+    FROM wpa_outcomes_partials
+    GROUP BY venue, league, target_bucket, over_bucket, wickets_lost, runs_range_min, runs_range_max
+    HAVING SUM(total_outcomes) >= 5
+"""
+
+
+# Published table -> partials model, fill statements (run in order) and publish statement.
+INCREMENTAL_SPECS: Dict[str, Dict] = {
+    "team_phase_stats": {
+        "partials_model": TeamPhaseStatPartial,
+        "fill": [TEAM_PHASE_FILL_SQL],
+        "publish": TEAM_PHASE_PUBLISH_SQL,
+    },
+    "player_baselines": {
+        "partials_model": PlayerBaselinePartial,
+        "fill": [PLAYER_BASELINE_BATTING_FILL_SQL, PLAYER_BASELINE_BOWLING_FILL_SQL],
+        "publish": PLAYER_BASELINE_PUBLISH_SQL,
+    },
+    "venue_resources": {
+        "partials_model": VenueResourcePartial,
+        "fill": [VENUE_RESOURCES_FILL_SQL],
+        "publish": VENUE_RESOURCES_PUBLISH_SQL,
+    },
+    "wpa_outcomes": {
+        "partials_model": WPAOutcomePartial,
+        "fill": [WPA_OUTCOMES_FILL_SQL],
+        "publish": WPA_OUTCOMES_PUBLISH_SQL,
+    },
+}
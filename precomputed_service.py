@@ -10,11 +10,343 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, text
 from precomputed_models import WPAOutcome, VenueResource, PlayerBaseline, TeamPhaseStat, VenueCluster
 from venue_utils import VenueClusterManager
+from services.cache import MemoryBackend, get_cache
 from datetime import date
+import itertools
+import numpy as np
 import logging
+import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# In-memory lookup tensors replace the per-call SQL lookups when enabled. The loaded snapshot is
+# swapped for a new one when a newer computation run for its source tables has completed; the
+# computation_runs check happens at most once per PRECOMPUTED_RELOAD_CHECK_SECONDS.
+PRECOMPUTED_TENSORS_ENABLED = os.getenv("PRECOMPUTED_TENSORS_ENABLED", "true").lower() in {"1", "true", "yes"}
+PRECOMPUTED_RELOAD_CHECK_SECONDS = float(os.getenv("PRECOMPUTED_RELOAD_CHECK_SECONDS", "60"))
+
+# Minimum sample sizes per fallback level (shared with the SQL path below)
+WPA_VENUE_MIN_SAMPLE = 5
+WPA_LEAGUE_MIN_SAMPLE = 10
+WPA_GLOBAL_MIN_SAMPLE = 15
+RESOURCE_MIN_SAMPLE = 3
+
+# Source codes stored alongside each resolved cell
+_SRC_NONE, _SRC_VENUE, _SRC_CLUSTER, _SRC_LEAGUE, _SRC_GLOBAL = range(5)
+_SOURCE_NAMES = {_SRC_VENUE: "venue", _SRC_CLUSTER: "cluster", _SRC_LEAGUE: "league", _SRC_GLOBAL: "global"}
+
+# Axis sizes. WPA targets are bucketed by 10 runs and rebased on the smallest bucket present.
+_WPA_OVER_BUCKETS = 10
+_WPA_WICKETS = 10
+_RESOURCE_INNINGS = 2
+_RESOURCE_OVERS = 20
+_RESOURCE_WICKETS = 10
+_RESOURCE_CELLS = _RESOURCE_INNINGS * _RESOURCE_OVERS * _RESOURCE_WICKETS
+
+# Rows for (venue, league) keys the tables do not hold, resolved on first lookup and keyed by
+# snapshot generation. They are read once per ball, so they stay in process memory whatever
+# CACHE_BACKEND is.
+_SNAPSHOT_GENERATIONS = itertools.count(1)
+_WPA_EXTRA_ROWS = get_cache("precomputed_wpa_extra_rows", ttl_seconds=24 * 3600, max_entries=256,
+                            backend=MemoryBackend())
+_RESOURCE_EXTRA_ROWS = get_cache("precomputed_resource_extra_rows", ttl_seconds=24 * 3600, max_entries=1024,
+                                 backend=MemoryBackend())
+
+
+def _dense_fill(n_groups: int, n_cells: int, groups: np.ndarray, cells: np.ndarray,
+                values: np.ndarray, priority: np.ndarray) -> np.ndarray:
+    """Scatter values into a (n_groups, n_cells) float32 grid; duplicates keep the highest priority."""
+    grid = np.full((n_groups, n_cells), np.nan, dtype=np.float32)
+    if len(groups):
+        order = np.lexsort((priority, cells, groups))
+        groups, cells, values = groups[order], cells[order], values[order]
+        last = np.append((groups[1:] != groups[:-1]) | (cells[1:] != cells[:-1]), True)
+        grid[groups[last], cells[last]] = values[last]
+    return grid
+
+
+def _fill_missing(values: np.ndarray, sources: np.ndarray, fallback: np.ndarray, source: int) -> None:
+    gap = np.isnan(values) & ~np.isnan(fallback)
+    values[gap] = fallback[gap]
+    sources[gap] = source
+
+
+class PrecomputedLookupSnapshot:
+    """
+    Immutable in-memory copy of wpa_outcomes and venue_resources.
+
+    WPA cells are indexed by (target bucket, over bucket, wickets, runs bucket) and resource cells
+    by (innings, over, wickets). Every (venue, league) key present in the tables gets a row with
+    the cluster -> league -> global fallback chain already resolved into each cell; keys not in
+    the tables are resolved on first use and cached (``_WPA_EXTRA_ROWS`` / ``_RESOURCE_EXTRA_ROWS``).
+    """
+
+    def __init__(self, wpa_rows: List[Any], resource_rows: List[Any], venue_manager: VenueClusterManager,
+                 run_id: int = 0):
+        self.run_id = run_id
+        self.generation = next(_SNAPSHOT_GENERATIONS)
+        self.loaded_at = time.time()
+        self.venue_manager = venue_manager
+        self._cluster_cache: Dict[str, List[str]] = {}
+        self._build_wpa(wpa_rows)
+        self._build_resources(resource_rows)
+
+    # -- construction -----------------------------------------------------
+
+    def _build_wpa(self, rows: List[Any]) -> None:
+        rows = [row for row in rows if row.target_bucket is not None and row.runs_range_min is not None]
+        self.wpa_through_date = max((row.data_through_date for row in rows), default=None)
+        self._target_min = min((int(row.target_bucket) // 10 for row in rows), default=0)
+        self._target_buckets = max((int(row.target_bucket) // 10 for row in rows), default=-1) - self._target_min + 1
+        self._run_buckets = max((int(row.runs_range_min) // 20 for row in rows), default=-1) + 1
+        self._wpa_cells = max(0, self._target_buckets) * _WPA_OVER_BUCKETS * _WPA_WICKETS * max(0, self._run_buckets)
+
+        keys: Dict[Tuple[str, Optional[str]], int] = {}
+        leagues: Dict[Optional[str], int] = {}
+        key_ids = np.array([keys.setdefault((row.venue, row.league), len(keys)) for row in rows], dtype=np.int64)
+        league_ids = np.array([leagues.setdefault(row.league, len(leagues)) for row in rows], dtype=np.int64)
+        cells = np.array([
+            self._wpa_cell(int(row.target_bucket), int(row.over_bucket), int(row.wickets_lost), int(row.runs_range_min))
+            for row in rows
+        ], dtype=np.int64)
+        probs = np.array([float(row.win_probability) for row in rows], dtype=np.float32)
+        samples = np.array([row.sample_size or 0 for row in rows], dtype=np.int64)
+        computed = np.array([row.computed_date.timestamp() if row.computed_date else 0.0 for row in rows])
+        on_grid = cells >= 0
+
+        venue_mask = on_grid & (samples >= WPA_VENUE_MIN_SAMPLE)
+        self._wpa_venue = _dense_fill(len(keys), self._wpa_cells, key_ids[venue_mask], cells[venue_mask],
+                                      probs[venue_mask], computed[venue_mask])
+        league_mask = on_grid & (samples >= WPA_LEAGUE_MIN_SAMPLE)
+        self._wpa_league = _dense_fill(len(leagues), self._wpa_cells, league_ids[league_mask], cells[league_mask],
+                                       probs[league_mask], samples[league_mask])
+        global_mask = on_grid & (samples >= WPA_GLOBAL_MIN_SAMPLE)
+        self._wpa_global = _dense_fill(1, self._wpa_cells, np.zeros(int(global_mask.sum()), dtype=np.int64),
+                                       cells[global_mask], probs[global_mask], samples[global_mask])[0]
+        self._wpa_keys = keys
+        self._wpa_leagues = leagues
+        self._wpa_keys_by_venue: Dict[str, List[int]] = {}
+        for (venue, _), idx in keys.items():
+            self._wpa_keys_by_venue.setdefault(venue, []).append(idx)
+
+        # Resolve the fallback chain for every key up front
+        self._wpa_values = np.empty_like(self._wpa_venue)
+        self._wpa_sources = np.empty(self._wpa_venue.shape, dtype=np.int8)
+        for (venue, league), idx in keys.items():
+            self._wpa_values[idx], self._wpa_sources[idx] = self._resolve_wpa_row(venue, league)
+
+    def _build_resources(self, rows: List[Any]) -> None:
+        self.resource_through_date = max((row.data_through_date for row in rows), default=None)
+        keys: Dict[Tuple[str, Optional[str]], int] = {}
+        venues: Dict[str, int] = {}
+        key_ids = np.array([keys.setdefault((row.venue, row.league), len(keys)) for row in rows], dtype=np.int64)
+        venue_ids = np.array([venues.setdefault(row.venue, len(venues)) for row in rows], dtype=np.int64)
+        cells = np.array([
+            self._resource_cell(int(row.innings), int(row.over_num), int(row.wickets_lost)) for row in rows
+        ], dtype=np.int64)
+        values = np.array([float(row.resource_percentage) for row in rows], dtype=np.float32)
+        computed = np.array([row.computed_date.timestamp() if row.computed_date else 0.0 for row in rows])
+        mask = (cells >= 0) & np.array([(row.sample_size or 0) >= RESOURCE_MIN_SAMPLE for row in rows], dtype=bool)
+
+        # Venue rows filtered by league, and venue rows across all leagues (used when no league is
+        # given and for cluster fallback, which never filters on league)
+        self._resource_by_key = _dense_fill(len(keys), _RESOURCE_CELLS, key_ids[mask], cells[mask],
+                                            values[mask], computed[mask])
+        self._resource_by_venue = _dense_fill(len(venues), _RESOURCE_CELLS, venue_ids[mask], cells[mask],
+                                              values[mask], computed[mask])
+        self._resource_keys = keys
+        self._resource_venues = venues
+
+        # Read-only after construction; keys outside the table go through _RESOURCE_EXTRA_ROWS
+        self._resource_rows: Dict[Tuple[str, Optional[str]], Tuple[np.ndarray, np.ndarray]] = {}
+        for venue, league in list(keys) + [(venue, None) for venue in venues]:
+            self._resource_rows[(venue, league)] = self._resolve_resource_row(venue, league)
+
+    def _wpa_cell(self, target_bucket: int, over_bucket: int, wickets: int, runs: int) -> int:
+        t = target_bucket // 10 - self._target_min
+        o = over_bucket // 2
+        r = runs // 20
+        if not (0 <= t < self._target_buckets and 0 <= o < _WPA_OVER_BUCKETS
+                and 0 <= wickets < _WPA_WICKETS and 0 <= r < self._run_buckets):
+            return -1
+        return ((t * _WPA_OVER_BUCKETS + o) * _WPA_WICKETS + wickets) * self._run_buckets + r
+
+    @staticmethod
+    def _resource_cell(innings: int, over: int, wickets: int) -> int:
+        if not (1 <= innings <= _RESOURCE_INNINGS and 0 <= over < _RESOURCE_OVERS and 0 <= wickets < _RESOURCE_WICKETS):
+            return -1
+        return ((innings - 1) * _RESOURCE_OVERS + over) * _RESOURCE_WICKETS + wickets
+
+    def _cluster_venues(self, venue: str) -> List[str]:
+        if venue not in self._cluster_cache:
+            cluster = self.venue_manager.get_venue_cluster(venue) if venue else None
+            self._cluster_cache[venue] = list(self.venue_manager.venue_clusters.get(cluster, [])) if cluster else []
+        return self._cluster_cache[venue]
+
+    def _wpa_venue_keys(self, venue: str, league: Optional[str]) -> List[int]:
+        # Without a league the SQL lookup does not filter on it, so any league's row may match
+        if league:
+            idx = self._wpa_keys.get((venue, league))
+            return [idx] if idx is not None else []
+        return self._wpa_keys_by_venue.get(venue, [])
+
+    def _resolve_wpa_row(self, venue: str, league: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        values = np.full(self._wpa_cells, np.nan, dtype=np.float32)
+        sources = np.zeros(self._wpa_cells, dtype=np.int8)
+        for idx in self._wpa_venue_keys(venue, league):
+            _fill_missing(values, sources, self._wpa_venue[idx], _SRC_VENUE)
+        for cluster_venue in self._cluster_venues(venue):
+            for cluster_idx in self._wpa_venue_keys(cluster_venue, league):
+                _fill_missing(values, sources, self._wpa_venue[cluster_idx], _SRC_CLUSTER)
+        league_idx = self._wpa_leagues.get(league) if league else None
+        if league_idx is not None:
+            _fill_missing(values, sources, self._wpa_league[league_idx], _SRC_LEAGUE)
+        _fill_missing(values, sources, self._wpa_global, _SRC_GLOBAL)
+        return values, sources
+
+    def _resolve_resource_row(self, venue: str, league: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        values = np.full(_RESOURCE_CELLS, np.nan, dtype=np.float32)
+        sources = np.zeros(_RESOURCE_CELLS, dtype=np.int8)
+        if league:
+            idx = self._resource_keys.get((venue, league))
+            venue_row = self._resource_by_key[idx] if idx is not None else None
+        else:
+            idx = self._resource_venues.get(venue)
+            venue_row = self._resource_by_venue[idx] if idx is not None else None
+        if venue_row is not None:
+            _fill_missing(values, sources, venue_row, _SRC_VENUE)
+        for cluster_venue in self._cluster_venues(venue):
+            cluster_idx = self._resource_venues.get(cluster_venue)
+            if cluster_idx is not None:
+                _fill_missing(values, sources, self._resource_by_venue[cluster_idx], _SRC_CLUSTER)
+        return values, sources
+
+    # -- lookups ----------------------------------------------------------
+
+    def win_probability(self, venue: str, league: Optional[str], target_bucket: int, over_bucket: int,
+                        wickets: int, runs: int, match_date: Optional[date]) -> Optional[Tuple[float, str]]:
+        """Resolved (probability, source) for one state, or None when the heuristic applies."""
+        cell = self._wpa_cell(target_bucket, over_bucket, wickets, runs)
+        if cell < 0:
+            return None
+        idx = self._wpa_keys.get((venue, league))
+        if idx is not None:
+            value, source = self._wpa_values[idx, cell], self._wpa_sources[idx, cell]
+        else:
+            row = _WPA_EXTRA_ROWS.get_or_compute(
+                (self.generation, venue, league), lambda: self._resolve_wpa_row(venue, league)
+            )
+            value, source = row[0][cell], row[1][cell]
+        if source == _SRC_NONE:
+            return None
+
+        strict = match_date is None or self.wpa_through_date is None or self.wpa_through_date < match_date
+        # Stored as float32; wpa_outcomes probabilities have three decimals
+        value = round(float(value), 3)
+        if strict:
+            return value, _SOURCE_NAMES[int(source)]
+        # Data newer than the match: the SQL path only retries the venue itself without the
+        # chronological filter; cluster/league/global stay strict.
+        if source == _SRC_VENUE:
+            return value, "venue_relaxed"
+        return None
+
+    def resource_percentage(self, venue: str, league: Optional[str], innings: int, over: int,
+                            wickets: int, match_date: date) -> Optional[Tuple[float, str]]:
+        if self.resource_through_date is None or not self.resource_through_date < match_date:
+            return None
+        cell = self._resource_cell(innings, over, wickets)
+        if cell < 0:
+            return None
+        row = self._resource_rows.get((venue, league or None))
+        if row is None:
+            row = _RESOURCE_EXTRA_ROWS.get_or_compute(
+                (self.generation, venue, league or None),
+                lambda: self._resolve_resource_row(venue, league or None),
+            )
+        if row[1][cell] == _SRC_NONE:
+            return None
+        return round(float(row[0][cell]), 2), _SOURCE_NAMES[int(row[1][cell])]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "loaded_at": self.loaded_at,
+            "wpa_keys": len(self._wpa_keys),
+            "wpa_cells_per_key": self._wpa_cells,
+            "resource_keys": len(self._resource_rows),
+            "nbytes": int(
+                self._wpa_venue.nbytes + self._wpa_values.nbytes + self._wpa_sources.nbytes
+                + self._wpa_league.nbytes + self._wpa_global.nbytes
+                + self._resource_by_key.nbytes + self._resource_by_venue.nbytes
+            ),
+        }
+
+
+class PrecomputedLookupStore:
+    """Process-wide holder of the current PrecomputedLookupSnapshot."""
+
+    SOURCE_TABLES = ("wpa_outcomes", "venue_resources")
+
+    def __init__(self, reload_check_seconds: float = PRECOMPUTED_RELOAD_CHECK_SECONDS):
+        self.reload_check_seconds = reload_check_seconds
+        self._snapshot: Optional[PrecomputedLookupSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, session: Session, venue_manager: VenueClusterManager) -> Optional[PrecomputedLookupSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.reload_check_seconds:
+            return snapshot
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot  # another thread is checking/reloading; keep serving the current one
+        try:
+            self._checked_at = time.monotonic()
+            run_id = self._latest_run_id(session)
+            if self._snapshot is None or run_id != self._snapshot.run_id:
+                self._snapshot = self._load(session, venue_manager, run_id)
+            return self._snapshot
+        except Exception as e:
+            logger.error(f"Error loading precomputed lookup tensors: {e}")
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def invalidate(self) -> None:
+        self._checked_at = 0.0
+
+    def _latest_run_id(self, session: Session) -> int:
+        result = session.execute(text("""
+            SELECT COALESCE(MAX(id), 0) AS run_id
+            FROM computation_runs
+            WHERE status = 'completed' AND table_name = ANY(:tables)
+        """), {"tables": list(self.SOURCE_TABLES)}).fetchone()
+        return int(result.run_id) if result else 0
+
+    def _load(self, session: Session, venue_manager: VenueClusterManager, run_id: int) -> PrecomputedLookupSnapshot:
+        started = time.perf_counter()
+        wpa_rows = session.execute(text("""
+            SELECT venue, league, target_bucket, over_bucket, wickets_lost, runs_range_min,
+                   win_probability, sample_size, computed_date, data_through_date
+            FROM wpa_outcomes
+        """)).fetchall()
+        resource_rows = session.execute(text("""
+            SELECT venue, league, innings, over_num, wickets_lost, resource_percentage,
+                   sample_size, computed_date, data_through_date
+            FROM venue_resources
+        """)).fetchall()
+        snapshot = PrecomputedLookupSnapshot(wpa_rows, resource_rows, venue_manager, run_id=run_id)
+        logger.info(
+            f"Loaded precomputed lookup tensors (run {run_id}): {len(wpa_rows)} WPA rows, "
+            f"{len(resource_rows)} resource rows in {time.perf_counter() - started:.2f}s"
+        )
+        return snapshot
+
+
+_lookup_store = PrecomputedLookupStore()
+
 
 class PrecomputedDataService:
     """
@@ -30,6 +362,7 @@ class PrecomputedDataService:
         # Cache for frequently accessed data
         self._venue_cluster_cache = {}
         self._fallback_cache = {}
+        self.use_tensors = PRECOMPUTED_TENSORS_ENABLED
     
     def get_win_probability(self, session: Session, venue: str, target: int, 
                           over: int, wickets: int, runs: int, 
@@ -56,6 +389,13 @@ class PrecomputedDataService:
         target_bucket = self._get_target_bucket(target)
         over_bucket = self._get_over_bucket(over)
         
+        snapshot = self.get_lookup_snapshot(session)
+        if snapshot is not None:
+            resolved = snapshot.win_probability(venue, league, target_bucket, over_bucket, wickets, runs, match_date)
+            if resolved is not None:
+                return resolved
+            return self._calculate_heuristic_win_probability(target, runs, over, wickets), "heuristic"
+        
         # Try venue-specific data first (with relaxed chronological constraint for development)
         wp = self._query_wpa_outcomes(
             session, venue, target_bucket, over_bucket, wickets, runs, match_date, league, strict_chronological=True
@@ -143,7 +483,7 @@ class PrecomputedDataService:
             # Get the most recent computation
             outcome = query.order_by(WPAOutcome.computed_date.desc()).first()
             
-            if outcome and outcome.sample_size >= 5:  # Minimum sample size
+            if outcome and outcome.sample_size >= WPA_VENUE_MIN_SAMPLE:
                 return float(outcome.win_probability)
             
             return None
@@ -192,7 +532,7 @@ class PrecomputedDataService:
                 WPAOutcome.runs_range_min <= runs,
                 WPAOutcome.runs_range_max >= runs,
                 WPAOutcome.data_through_date < match_date,
-                WPAOutcome.sample_size >= 10  # Higher minimum for league data
+                WPAOutcome.sample_size >= WPA_LEAGUE_MIN_SAMPLE  # Higher minimum for league data
             )
             
             outcome = query.order_by(WPAOutcome.sample_size.desc()).first()
@@ -219,7 +559,7 @@ class PrecomputedDataService:
                 WPAOutcome.runs_range_min <= runs,
                 WPAOutcome.runs_range_max >= runs,
                 WPAOutcome.data_through_date < match_date,
-                WPAOutcome.sample_size >= 15  # Higher minimum for global data
+                WPAOutcome.sample_size >= WPA_GLOBAL_MIN_SAMPLE  # Higher minimum for global data
             )
             
             outcome = query.order_by(WPAOutcome.sample_size.desc()).first()
@@ -294,6 +634,13 @@ class PrecomputedDataService:
         Returns:
             Tuple of (resource_percentage, data_source)
         """
+        snapshot = self.get_lookup_snapshot(session)
+        if snapshot is not None:
+            resolved = snapshot.resource_percentage(venue, league, innings, over, wickets, match_date)
+            if resolved is not None:
+                return resolved
+            return self._heuristic_resource_percentage(over, wickets), "heuristic"
+        
         try:
             # Try venue-specific data first
             query = session.query(VenueResource).filter(
@@ -309,7 +656,7 @@ class PrecomputedDataService:
             
             resource = query.order_by(VenueResource.computed_date.desc()).first()
             
-            if resource and resource.sample_size >= 3:
+            if resource and resource.sample_size >= RESOURCE_MIN_SAMPLE:
                 return float(resource.resource_percentage), "venue"
             
             # Try cluster fallback
@@ -326,22 +673,31 @@ class PrecomputedDataService:
                     )
                     
                     resource = query.order_by(VenueResource.computed_date.desc()).first()
-                    if resource and resource.sample_size >= 3:
+                    if resource and resource.sample_size >= RESOURCE_MIN_SAMPLE:
                         return float(resource.resource_percentage), "cluster"
             
             # Fallback to heuristic
-            overs_remaining = max(0, 20 - over)
-            wickets_remaining = max(1, 10 - wickets)
-            
-            base_resource = (overs_remaining / 20) * 100
-            wicket_factor = wickets_remaining / 10
-            
-            return max(0.0, min(100.0, base_resource * wicket_factor)), "heuristic"
+            return self._heuristic_resource_percentage(over, wickets), "heuristic"
             
         except Exception as e:
             logger.error(f"Error getting venue resource: {e}")
             return 50.0, "error"  # Default 50% resource
     
+    def _heuristic_resource_percentage(self, over: int, wickets: int) -> float:
+        overs_remaining = max(0, 20 - over)
+        wickets_remaining = max(1, 10 - wickets)
+        
+        base_resource = (overs_remaining / 20) * 100
+        wicket_factor = wickets_remaining / 10
+        
+        return max(0.0, min(100.0, base_resource * wicket_factor))
+    
+    def get_lookup_snapshot(self, session: Session) -> Optional[PrecomputedLookupSnapshot]:
+        """Current in-memory lookup tensors, or None to use the SQL lookups."""
+        if not self.use_tensors:
+            return None
+        return _lookup_store.get(session, self.venue_manager)
+    
     def check_precomputed_data_availability(self, session: Session, venue: str, 
                                           match_date: date, league: str = None) -> Dict[str, Any]:
         """
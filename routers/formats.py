@@ -10,7 +10,6 @@ actually exist, so the UI can show Tests as "coming soon" without a separate fea
 
 from __future__ import annotations
 
-import time
 from datetime import date
 from typing import Dict, Optional, Tuple
 
@@ -20,6 +19,7 @@ from sqlalchemy.orm import Session
 
 from database import get_session
 from format_config import Phase, all_formats, effective_over_max
+from services.cache import get_cache
 
 router = APIRouter(prefix="/formats", tags=["formats"])
 
@@ -27,15 +27,15 @@ router = APIRouter(prefix="/formats", tags=["formats"])
 # page load. It expires on a timer rather than living for the process lifetime: a load finishing
 # in the background is exactly when the answer changes, and a cache that never expires would
 # keep reporting a format as unavailable until someone restarted the dyno.
-_coverage_cache: Optional[Dict[Tuple[str, str], Dict]] = None
-_coverage_cached_at: float = 0.0
 COVERAGE_TTL_SECONDS = 300
+_COVERAGE_KEY = "coverage"
+_coverage_cache = get_cache("format_coverage", ttl_seconds=COVERAGE_TTL_SECONDS, max_entries=1)
 
 
 def _load_coverage(db: Session) -> Dict[Tuple[str, str], Dict]:
-    global _coverage_cache, _coverage_cached_at
-    if _coverage_cache is not None and (time.time() - _coverage_cached_at) < COVERAGE_TTL_SECONDS:
-        return _coverage_cache
+    cached = _coverage_cache.get(_COVERAGE_KEY)
+    if cached is not None:
+        return cached
 
     rows = db.execute(
         text(
@@ -50,8 +50,7 @@ def _load_coverage(db: Session) -> Dict[Tuple[str, str], Dict]:
         )
     ).mappings().all()
 
-    _coverage_cached_at = time.time()
-    _coverage_cache = {
+    coverage = {
         (row["format"], row["gender"]): {
             "min_date": row["min_date"],
             "max_date": row["max_date"],
@@ -59,15 +58,14 @@ def _load_coverage(db: Session) -> Dict[Tuple[str, str], Dict]:
         }
         for row in rows
     }
-    return _coverage_cache
+    _coverage_cache.set(_COVERAGE_KEY, coverage)
+    return coverage
 
 
 def reset_coverage_cache() -> None:
     """Force the next request to recount. The TTL handles this on its own; this is for a
     caller that has just loaded data and wants the change visible immediately."""
-    global _coverage_cache, _coverage_cached_at
-    _coverage_cache = None
-    _coverage_cached_at = 0.0
+    _coverage_cache.pop(_COVERAGE_KEY)
 
 
 def _phase_payload(phase: Phase) -> Dict:
@@ -7,10 +7,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text, bindparam
 import logging
-import time
 
 from database import get_session
 from format_config import get_format
+from services.cache import get_cache
 
 router = APIRouter(prefix="/landing", tags=["landing"])
 logger = logging.getLogger(__name__)
@@ -39,11 +39,11 @@ _FULL_MEMBER_TEAMS = {
     'Ireland', 'Zimbabwe',
 }
 
-# Simple in-memory cache with 1-hour TTL
+# Shared bounded cache with 1-hour TTL
 # Keyed by (format, gender): a single global entry would serve whichever format asked first to
 # every other one. Same trap as the query-builder column cache.
-_featured_cache: dict = {}
 CACHE_TTL = 3600
+_featured_cache = get_cache("landing_featured_innings", ttl_seconds=CACHE_TTL, max_entries=32)
 
 
 @router.get("/featured-innings")
@@ -57,10 +57,9 @@ def get_featured_innings(
     Used on the landing page to showcase impressive performances.
     """
     cache_key = (format, gender)
-    now = time.time()
     cached = _featured_cache.get(cache_key)
-    if cached and (now - cached["timestamp"]) < CACHE_TTL:
-        return cached["data"]
+    if cached is not None:
+        return cached
 
     try:
         spec = get_format(format, gender)
@@ -75,7 +74,7 @@ def get_featured_innings(
                 db, days=60, min_runs=30, min_sr=spec.sr_bands[1], fmt=format, gender=gender
             )
 
-        _featured_cache[cache_key] = {"data": result, "timestamp": now}
+        _featured_cache.set(cache_key, result)
 
         return result
 
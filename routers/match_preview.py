@@ -12,6 +12,7 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from database import get_session
+from services.cache import get_cache
 from services.cricinfo_scraper import scrape_match_setup
 from services.match_preview import (
     build_deterministic_preview_sections,
@@ -52,9 +53,10 @@ TEMPERATURE = 0.3
 PREVIEW_ENGINE_VERSION = "v3-narrative"
 DEFAULT_PREVIEW_MODE = "hybrid"
 
-preview_cache: Dict[str, Dict] = {}
-post_toss_cache: Dict[str, Dict[str, Any]] = {}
+PREVIEW_CACHE_TTL_SECONDS = int(os.getenv("PREVIEW_CACHE_TTL_SECONDS", "21600"))
 POST_TOSS_CACHE_TTL_SECONDS = int(os.getenv("POST_TOSS_CACHE_TTL_SECONDS", "21600"))
+preview_cache = get_cache("match_preview", ttl_seconds=PREVIEW_CACHE_TTL_SECONDS, max_entries=256)
+post_toss_cache = get_cache("match_preview_post_toss", ttl_seconds=POST_TOSS_CACHE_TTL_SECONDS, max_entries=256)
 POST_TOSS_BATTING_MIN_BALLS = int(os.getenv("POST_TOSS_BATTING_MIN_BALLS", "40"))
 POST_TOSS_BOWLING_MIN_BALLS = int(os.getenv("POST_TOSS_BOWLING_MIN_BALLS", "30"))
 
@@ -365,71 +367,75 @@ def get_match_preview(
             format,
             gender,
         )
-        if key in preview_cache:
-            cached = preview_cache[key]
+        cached = preview_cache.get(key)
+        if cached is not None:
             return {**cached, "cached": True}
 
-        context = gather_preview_context(
-            venue=venue,
-            team1_identifier=team1_id,
-            team2_identifier=team2_id,
-            db=db,
-            start_date=start_date,
-            end_date=end_date,
-            include_international=include_international,
-            top_teams=top_teams,
-            day_or_night=day_or_night,
-            fmt=format,
-            gender=gender,
-        )
-        try:
-            _inject_form_flags(context, db)
-        except Exception as enrich_exc:
-            logger.warning("Failed to enrich match preview with form flags: %s", enrich_exc)
-        sections = build_deterministic_preview_sections(context)
-        canonical_markdown = serialize_sections_to_markdown(sections)
-        llm_used = False
-        preview_text = canonical_markdown
-
-        if preview_mode == "hybrid":
-            # Build data context for LLM narrative generation
-            data_context = build_narrative_data_context(context)
-            # Try LLM narrative generation first
-            llm_preview, llm_used = _generate_narrative_with_llm(data_context, sections)
-            if llm_used and llm_preview:
-                preview_text = llm_preview
-            # else: keep deterministic canonical_markdown as preview_text
-
-        if not preview_text:
-            preview_text = generate_match_preview_fallback(context)
-        decision_scores = score_preview_lean(context)
-        phase_check = (((context.get("screen_story") or {}).get("phase_wise_strategy") or {}).get("consistency_check")) or {}
-        lineup_selection = context.get("lineup_selection") or {}
-
-        result = {
-            "success": True,
-            "venue": venue,
-            "team1": context["team1"],
-            "team2": context["team2"],
-            "top_ranked_players": context.get("top_ranked_players") or {},
-            "sections": sections,
-            "preview": preview_text,
-            "preview_mode": preview_mode,
-            "preview_version": PREVIEW_ENGINE_VERSION,
-            "llm_model": OPENAI_MODEL,
-            "llm_strategy": "responses" if _is_gpt5_model() else "chat.completions",
-            "llm_used": llm_used,
-            "generated_at": datetime.utcnow().isoformat() + "Z",
-            "cached": False,
-        }
-        if debug:
-            result["debug"] = {
-                "decision_scores": decision_scores,
-                "phase_template_consistency_check": phase_check,
-                "lineup_selection": lineup_selection,
+        # A cold preview runs dozens of queries; concurrent requests for the same fixture wait
+        # for one build instead of each draining the small connection pool.
+        def _build_preview() -> Dict[str, Any]:
+            context = gather_preview_context(
+                venue=venue,
+                team1_identifier=team1_id,
+                team2_identifier=team2_id,
+                db=db,
+                start_date=start_date,
+                end_date=end_date,
+                include_international=include_international,
+                top_teams=top_teams,
+                day_or_night=day_or_night,
+                fmt=format,
+                gender=gender,
+            )
+            try:
+                _inject_form_flags(context, db)
+            except Exception as enrich_exc:
+                logger.warning("Failed to enrich match preview with form flags: %s", enrich_exc)
+            sections = build_deterministic_preview_sections(context)
+            canonical_markdown = serialize_sections_to_markdown(sections)
+            llm_used = False
+            preview_text = canonical_markdown
+
+            if preview_mode == "hybrid":
+                # Build data context for LLM narrative generation
+                data_context = build_narrative_data_context(context)
+                # Try LLM narrative generation first
+                llm_preview, llm_used = _generate_narrative_with_llm(data_context, sections)
+                if llm_used and llm_preview:
+                    preview_text = llm_preview
+                # else: keep deterministic canonical_markdown as preview_text
+
+            if not preview_text:
+                preview_text = generate_match_preview_fallback(context)
+            decision_scores = score_preview_lean(context)
+            phase_check = (((context.get("screen_story") or {}).get("phase_wise_strategy") or {}).get("consistency_check")) or {}
+            lineup_selection = context.get("lineup_selection") or {}
+
+            result = {
+                "success": True,
+                "venue": venue,
+                "team1": context["team1"],
+                "team2": context["team2"],
+                "top_ranked_players": context.get("top_ranked_players") or {},
+                "sections": sections,
+                "preview": preview_text,
+                "preview_mode": preview_mode,
+                "preview_version": PREVIEW_ENGINE_VERSION,
+                "llm_model": OPENAI_MODEL,
+                "llm_strategy": "responses" if _is_gpt5_model() else "chat.completions",
+                "llm_used": llm_used,
+                "generated_at": datetime.utcnow().isoformat() + "Z",
+                "cached": False,
             }
-        preview_cache[key] = result
-        return result
+            if debug:
+                result["debug"] = {
+                    "decision_scores": decision_scores,
+                    "phase_template_consistency_check": phase_check,
+                    "lineup_selection": lineup_selection,
+                }
+            return result
+
+        return preview_cache.fill(key, _build_preview)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate match preview: {str(e)}")
 
@@ -525,21 +531,11 @@ def _post_toss_cache_key(
 
 
 def _get_cached_post_toss(key: str) -> Optional[Dict[str, Any]]:
-    entry = post_toss_cache.get(key)
-    if not entry:
-        return None
-    expires_at = entry.get("expires_at")
-    if not isinstance(expires_at, datetime) or datetime.utcnow() >= expires_at:
-        post_toss_cache.pop(key, None)
-        return None
-    return entry.get("data")
+    return post_toss_cache.get(key)
 
 
 def _set_cached_post_toss(key: str, data: Dict[str, Any]) -> None:
-    post_toss_cache[key] = {
-        "expires_at": datetime.utcnow() + timedelta(seconds=POST_TOSS_CACHE_TTL_SECONDS),
-        "data": data,
-    }
+    post_toss_cache.set(key, data)
 
 
 def _log_post_toss_prediction(
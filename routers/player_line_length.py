@@ -20,6 +20,7 @@ import logging
 import re
 
 from database import get_session
+from services.delivery_snapshot import get_snapshot
 from utils.league_utils import expand_league_abbreviations
 
 router = APIRouter(tags=["Player Line & Length"])
@@ -517,6 +518,137 @@ def _row_to_metrics(row) -> dict:
     }
 
 
+class _SnapshotRow:
+    """Row-like wrapper so snapshot aggregates flow through the same helpers as SQL rows."""
+
+    def __init__(self, mapping: Dict[str, Any]):
+        self._mapping = mapping
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._mapping[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def _snapshot_filter(params: Dict[str, Any], match: Dict[str, List[Any]], not_null: Tuple[str, ...] = ()):
+    """Arrow equivalent of FORMAT_PIN_SQL + year/venue/competition filters + column matches."""
+    import pyarrow.dataset as ds
+
+    expr = (ds.field("format") == "T20") & (ds.field("gender") == "male")
+    if params.get("start_year") is not None:
+        expr &= ds.field("year") >= params["start_year"]
+    if params.get("end_year") is not None:
+        expr &= ds.field("year") <= params["end_year"]
+    if params.get("venue") is not None:
+        expr &= ds.field("ground") == params["venue"]
+
+    # Same params _build_comp_filter populated for the SQL path
+    comp = None
+    if params.get("leagues"):
+        comp = ds.field("competition").isin(params["leagues"])
+    if params.get("top_team_list"):
+        top = params["top_team_list"]
+        international = (
+            (ds.field("competition") == "T20I")
+            & ds.field("team_bat").isin(top)
+            & ds.field("team_bowl").isin(top)
+        )
+        comp = international if comp is None else comp | international
+    if comp is not None:
+        expr &= comp
+
+    for column, values in match.items():
+        expr &= ds.field(column).isin(list(values))
+    for column in not_null:
+        expr &= ds.field(column).is_valid()
+    return expr
+
+
+def _snapshot_ball_flags() -> Dict[str, Any]:
+    """Derived 0/1 columns matching the CASE expressions in the SQL aggregates."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    def flag(mask):
+        return pc.fill_null(mask, False).cast(pa.int64())
+
+    return {
+        "control_ball": lambda t: flag(pc.equal(t["control"], 1)),
+        "boundary_ball": lambda t: flag(pc.greater_equal(t["batruns"], 4)),
+        "dot_ball": lambda t: flag(pc.and_(
+            pc.and_(pc.equal(t["batruns"], 0), pc.equal(pc.fill_null(t["wide"], 0), 0)),
+            pc.equal(pc.fill_null(t["noball"], 0), 0),
+        )),
+        "wicket_ball": lambda t: flag(pc.and_(
+            pc.is_valid(t["dismissal"]), pc.not_equal(pc.cast(t["dismissal"], pa.string()), "")
+        )),
+    }
+
+
+_SNAPSHOT_AGGREGATIONS = {
+    "balls": (None, "count_all"),
+    "runs": ("batruns", "sum"),
+    "control_balls": ("control_ball", "sum"),
+    "boundary_balls": ("boundary_ball", "sum"),
+    "dot_balls": ("dot_ball", "sum"),
+    "wickets": ("wicket_ball", "sum"),
+}
+_SNAPSHOT_INPUT_COLUMNS = ("batruns", "control", "wide", "noball", "dismissal")
+
+
+def _snapshot_aggregate(snapshot, group_cols: Tuple[str, ...], params: Dict[str, Any],
+                        match: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    return snapshot.aggregate(
+        group_by=group_cols,
+        aggregations=_SNAPSHOT_AGGREGATIONS,
+        filter=_snapshot_filter(params, match, not_null=group_cols),
+        columns=_SNAPSHOT_INPUT_COLUMNS,
+        derived=_snapshot_ball_flags(),
+    )
+
+
+def _snapshot_bucket_rows(snapshot, group_col: str, params: Dict[str, Any],
+                          match: Dict[str, List[Any]]) -> Dict[Any, _SnapshotRow]:
+    """Snapshot version of the _aggregate_sql query, keyed by bucket."""
+    rows = {}
+    for rec in _snapshot_aggregate(snapshot, (group_col,), params, match):
+        balls = rec["balls"] or 0
+        runs = rec["runs"]
+
+        def pct(value):
+            return (value * 100.0 / balls) if balls and value is not None else None
+
+        rows[rec[group_col]] = _SnapshotRow({
+            "bucket": rec[group_col],
+            "balls": balls,
+            "runs": runs,
+            "wickets": rec["wickets"],
+            "strike_rate": pct(runs),
+            "control_pct": pct(rec["control_balls"]),
+            "boundary_pct": pct(rec["boundary_balls"]),
+            "dot_pct": pct(rec["dot_balls"]),
+        })
+    return rows
+
+
+def _snapshot_line_length_rows(snapshot, params: Dict[str, Any],
+                               match: Dict[str, List[Any]]) -> List[_SnapshotRow]:
+    """Snapshot version of the _aggregate_line_length_sql query."""
+    return [
+        _SnapshotRow({
+            "line_bucket": rec["line"],
+            "length_bucket": rec["length"],
+            "balls": rec["balls"],
+            "runs": rec["runs"],
+            "control_balls": rec["control_balls"],
+            "boundary_balls": rec["boundary_balls"],
+            "dot_balls": rec["dot_balls"],
+        })
+        for rec in _snapshot_aggregate(snapshot, ("line", "length"), params, match)
+    ]
+
+
 @router.get("/player/{player_name}/line-length-profile")
 def get_player_line_length_profile(
     player_name: str,
@@ -549,18 +681,30 @@ def get_player_line_length_profile(
         player_filter = f"AND dd.{player_col} = ANY(:player_names)"
         player_bat_hand = _fetch_player_bat_hand(db, player_names, base_params, comp_filter) if mode == "batting" else None
 
-        def _fetch(group_col, extra_filter, extra_params=None):
+        # Population-wide baselines are full-table scans; serve them from the columnar snapshot
+        # when one is available and still matches Postgres. `match` mirrors each SQL
+        # extra_filter for that path. The player's own numbers (match=None) stay on Postgres so
+        # they never lag the next export.
+        snapshot = get_snapshot()
+        if snapshot is not None and not snapshot.is_fresh(db):
+            snapshot = None
+
+        def _fetch(group_col, extra_filter, extra_params=None, match=None):
             p = {**base_params}
             if extra_params:
                 p.update(extra_params)
+            if snapshot is not None and match is not None:
+                return _snapshot_bucket_rows(snapshot, group_col, p, match)
             sql = _aggregate_sql(group_col, extra_filter, comp_filter)
             rows = db.execute(text(sql), p).fetchall()
             return {r.bucket: r for r in rows}
 
-        def _fetch_line_length(extra_filter, extra_params=None):
+        def _fetch_line_length(extra_filter, extra_params=None, match=None):
             p = {**base_params}
             if extra_params:
                 p.update(extra_params)
+            if snapshot is not None and match is not None:
+                return _snapshot_line_length_rows(snapshot, p, match)
             sql = _aggregate_line_length_sql(extra_filter, comp_filter)
             return db.execute(text(sql), p).fetchall()
 
@@ -572,10 +716,10 @@ def get_player_line_length_profile(
         )
 
         # 2. Global averages (no player filter)
-        global_length = _fetch("length", "")
-        global_line = _fetch("line", "")
+        global_length = _fetch("length", "", match={})
+        global_line = _fetch("line", "", match={})
         global_line_length_cells = _rows_to_line_length_agg(
-            _fetch_line_length("")
+            _fetch_line_length("", match={})
         )
 
         # 3. Similar players averages
@@ -587,10 +731,11 @@ def get_player_line_length_profile(
             if resolved_similar:
                 sim_filter = f"AND dd.{player_col} = ANY(:similar_list)"
                 sim_extra = {"similar_list": resolved_similar}
-                similar_length = _fetch("length", sim_filter, sim_extra)
-                similar_line = _fetch("line", sim_filter, sim_extra)
+                sim_match = {player_col: resolved_similar}
+                similar_length = _fetch("length", sim_filter, sim_extra, sim_match)
+                similar_line = _fetch("line", sim_filter, sim_extra, sim_match)
                 similar_line_length_cells = _rows_to_line_length_agg(
-                    _fetch_line_length(sim_filter, sim_extra)
+                    _fetch_line_length(sim_filter, sim_extra, sim_match)
                 )
 
         # 4. Bowl-kind / bowl-style averages (bowling mode only)
@@ -616,19 +761,21 @@ def get_player_line_length_profile(
                 }
                 bk_filter = "AND dd.bowl_kind = :bowl_kind"
                 bk_extra = {"bowl_kind": detect_row.bowl_kind}
-                bk_length = _fetch("length", bk_filter, bk_extra)
-                bk_line = _fetch("line", bk_filter, bk_extra)
+                bk_match = {"bowl_kind": [detect_row.bowl_kind]}
+                bk_length = _fetch("length", bk_filter, bk_extra, bk_match)
+                bk_line = _fetch("line", bk_filter, bk_extra, bk_match)
                 bk_line_length_cells = _rows_to_line_length_agg(
-                    _fetch_line_length(bk_filter, bk_extra)
+                    _fetch_line_length(bk_filter, bk_extra, bk_match)
                 )
 
                 if detect_row.bowl_style:
                     bs_filter = "AND dd.bowl_style = :bowl_style"
                     bs_extra = {"bowl_style": detect_row.bowl_style}
-                    bs_length = _fetch("length", bs_filter, bs_extra)
-                    bs_line = _fetch("line", bs_filter, bs_extra)
+                    bs_match = {"bowl_style": [detect_row.bowl_style]}
+                    bs_length = _fetch("length", bs_filter, bs_extra, bs_match)
+                    bs_line = _fetch("line", bs_filter, bs_extra, bs_match)
                     bs_line_length_cells = _rows_to_line_length_agg(
-                        _fetch_line_length(bs_filter, bs_extra)
+                        _fetch_line_length(bs_filter, bs_extra, bs_match)
                     )
 
         # 5. Assemble response
@@ -21,6 +21,7 @@ import os
 import logging
 
 from database import get_session
+from services.cache import get_cache
 from services.player_patterns import detect_batter_patterns, detect_bowler_patterns
 from services.player_aliases import resolve_to_legacy_name
 
@@ -37,8 +38,9 @@ OPENAI_TIMEOUT_SECONDS = float(
 MAX_TOKENS = 500
 TEMPERATURE = 0.3
 
-# In-memory cache (use Redis in production)
-summary_cache = {}
+# Summaries only change when the underlying stats do, and each one costs an LLM call.
+SUMMARY_CACHE_TTL_SECONDS = int(os.getenv("PLAYER_SUMMARY_CACHE_TTL_SECONDS", "86400"))
+summary_cache = get_cache("player_summary", ttl_seconds=SUMMARY_CACHE_TTL_SECONDS, max_entries=1000)
 
 
 # =============================================================================
@@ -392,9 +394,9 @@ async def get_batter_summary(
         
         # Check cache (use resolved_name for cache key)
         cache_key = get_cache_key(resolved_name, "batter", filters)
-        if cache_key in summary_cache:
+        cached_result = summary_cache.get(cache_key)
+        if cached_result is not None:
             logger.info(f"Cache hit for {resolved_name}")
-            cached_result = summary_cache[cache_key]
             return SummaryResponse(
                 success=True,
                 player_name=resolved_name,
@@ -440,10 +442,10 @@ async def get_batter_summary(
         summary = generate_summary_with_llm(patterns, "batter")
         
         # Cache result
-        summary_cache[cache_key] = {
+        summary_cache.set(cache_key, {
             "summary": summary,
             "patterns": patterns
-        }
+        })
         
         logger.info(f"Successfully generated summary for {resolved_name}")
         return SummaryResponse(
@@ -498,9 +500,9 @@ async def get_bowler_summary(
         
         # Check cache (use resolved_name for cache key)
         cache_key = get_cache_key(resolved_name, "bowler", filters)
-        if cache_key in summary_cache:
+        cached_result = summary_cache.get(cache_key)
+        if cached_result is not None:
             logger.info(f"Cache hit for bowler {resolved_name}")
-            cached_result = summary_cache[cache_key]
             return SummaryResponse(
                 success=True,
                 player_name=resolved_name,
@@ -545,10 +547,10 @@ async def get_bowler_summary(
         summary = generate_summary_with_llm(patterns, "bowler")
         
         # Cache result
-        summary_cache[cache_key] = {
+        summary_cache.set(cache_key, {
             "summary": summary,
             "patterns": patterns
-        }
+        })
         
         logger.info(f"Successfully generated bowler summary for {resolved_name}")
         return SummaryResponse(
@@ -573,9 +575,7 @@ async def get_bowler_summary(
 @router.delete("/cache")
 async def clear_summary_cache():
     """Clear the summary cache (admin endpoint)."""
-    global summary_cache
-    count = len(summary_cache)
-    summary_cache = {}
+    count = summary_cache.clear()
     logger.info(f"Cleared {count} cached summaries")
     return {"cleared": count, "message": f"Successfully cleared {count} cached summaries"}
 
@@ -585,5 +585,6 @@ async def get_cache_stats():
     """Get cache statistics."""
     return {
         "total_cached": len(summary_cache),
-        "cache_keys": list(summary_cache.keys())[:10]  # Show first 10 keys
+        "cache_keys": summary_cache.keys(limit=10),  # Show first 10 keys
+        "metrics": summary_cache.stats(),
     }
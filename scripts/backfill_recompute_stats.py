@@ -24,6 +24,9 @@ Only matches whose ball-by-ball data lives in `delivery_details`, because those
 the buggy path wrote. Rows derived from the legacy `deliveries` table by `statsProcessor.py`
 are clean (verified: zero impossible wicket counts before 2015) and are left alone.
 
+Matches are recomputed in batches with the set-based derivation in stats_derivation.py; pass
+--per-match for the original one-player-at-a-time path.
+
 Usage
 -----
     python scripts/backfill_recompute_stats.py --dry-run            # report only, no writes
@@ -110,6 +113,35 @@ def report(session) -> None:
         print(f"  {r.format:8} {r.total:>8} {r.impossible:>10} {str(r.avg_wickets):>8} {r.max_wickets:>6}")
 
 
+def recompute_per_match(session, service, match_ids) -> int:
+    """The original one-match, one-player-at-a-time recompute. Returns matches recomputed."""
+    recomputed = 0
+    for match_id in tqdm(match_ids, desc="Recomputing"):
+        deliveries = service.get_match_deliveries(session, match_id)
+        if not deliveries:
+            continue
+
+        # Replace rather than update: the set of (innings, player) rows can legitimately
+        # change, so stale rows must not survive.
+        session.execute(text("DELETE FROM batting_stats WHERE match_id = :m"), {"m": match_id})
+        session.execute(text("DELETE FROM bowling_stats WHERE match_id = :m"), {"m": match_id})
+
+        for innings in sorted({d["innings"] for d in deliveries}):
+            for batter in sorted({d["batter"] for d in deliveries if d["innings"] == innings}):
+                stats = service.calculate_batting_stats(match_id, innings, batter, deliveries)
+                if stats:
+                    session.add(stats)
+            for bowler in sorted({d["bowler"] for d in deliveries if d["innings"] == innings}):
+                stats = service.calculate_bowling_stats(match_id, innings, bowler, deliveries)
+                if stats:
+                    session.add(stats)
+
+        recomputed += 1
+        if recomputed % 50 == 0:
+            session.commit()
+    return recomputed
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
     parser.add_argument("--format", dest="fmt", default=None,
@@ -118,6 +150,10 @@ def main() -> int:
     parser.add_argument("--match", default=None, help="Recompute a single match id and stop")
     parser.add_argument("--resume-from", default=None,
                         help="Skip match ids below this one, to continue an interrupted run")
+    parser.add_argument("--batch-size", type=int, default=200,
+                        help="Matches derived and written per set-based batch (default: 200)")
+    parser.add_argument("--per-match", action="store_true",
+                        help="Recompute one player at a time instead of set-based per batch")
     parser.add_argument("--dry-run", action="store_true", help="Report only, write nothing")
     parser.add_argument("--confirm", action="store_true", help="Required for a full run")
     args = parser.parse_args()
@@ -147,30 +183,15 @@ def main() -> int:
             print("\nRefusing a full run without --confirm (or use --limit to try a batch).")
             return 1
 
-        recomputed = 0
-        for match_id in tqdm(match_ids, desc="Recomputing"):
-            deliveries = service.get_match_deliveries(session, match_id)
-            if not deliveries:
-                continue
-
-            # Replace rather than update: the set of (innings, player) rows can legitimately
-            # change, so stale rows must not survive.
-            session.execute(text("DELETE FROM batting_stats WHERE match_id = :m"), {"m": match_id})
-            session.execute(text("DELETE FROM bowling_stats WHERE match_id = :m"), {"m": match_id})
-
-            for innings in sorted({d["innings"] for d in deliveries}):
-                for batter in sorted({d["batter"] for d in deliveries if d["innings"] == innings}):
-                    stats = service.calculate_batting_stats(match_id, innings, batter, deliveries)
-                    if stats:
-                        session.add(stats)
-                for bowler in sorted({d["bowler"] for d in deliveries if d["innings"] == innings}):
-                    stats = service.calculate_bowling_stats(match_id, innings, bowler, deliveries)
-                    if stats:
-                        session.add(stats)
-
-            recomputed += 1
-            if recomputed % 50 == 0:
+        if args.per_match:
+            recomputed = recompute_per_match(session, service, match_ids)
+        else:
+            recomputed = 0
+            # All innings, unlike the sync path: Test matches have four.
+            for i in tqdm(range(0, len(match_ids), args.batch_size), desc="Recomputing (batches)"):
+                result = service.process_matches_batch(session, match_ids[i:i + args.batch_size], innings=None)
                 session.commit()
+                recomputed += result["matches"]
 
         session.commit()
         print(f"\nRecomputed {recomputed:,} matches.\n")
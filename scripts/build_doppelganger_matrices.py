@@ -0,0 +1,85 @@
+"""
+Rebuild the doppelganger feature matrices for the default window.
+
+Run after every stats sync, on the host that serves the API: matrices are read from its
+DOPPELGANGER_MATRIX_DIR, so a build elsewhere (such as the load pipeline's runner) is never
+seen. Without it, API workers build each matrix on its first request. Builds the
+matrices the search page asks for without competition filters and the leaderboard's default
+preset (top leagues plus top-10 internationals), then deletes matrices built on older stats.
+Other windows and scopes are still built on first use.
+
+Usage:
+    python scripts/build_doppelganger_matrices.py --db-url "$DATABASE_URL"
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.doppelganger_matrix import get_player_feature_matrix, prune_stale_matrices, stats_fingerprint
+from services.search import (
+    DOPPELGANGER_LEADERBOARD_LEAGUES,
+    DOPPELGANGER_LEADERBOARD_TOP_TEAMS,
+    get_default_params,
+)
+
+
+def get_engine(db_url):
+    if db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql://", 1)
+    return create_engine(db_url)
+
+
+def build_default_matrices(session):
+    """Build (and persist) the default-window matrices; returns (scope label, players) pairs."""
+    defaults = get_default_params()
+    start, end = defaults["start_date"], defaults["end_date"]
+    scopes = [
+        ("all matches", dict(leagues=None, include_international=False, top_teams=None)),
+        ("leaderboard preset", dict(
+            leagues=DOPPELGANGER_LEADERBOARD_LEAGUES,
+            include_international=True,
+            top_teams=DOPPELGANGER_LEADERBOARD_TOP_TEAMS,
+        )),
+    ]
+    built = []
+    for label, scope in scopes:
+        matrix = get_player_feature_matrix(session, start, end, force_refresh=True, **scope)
+        built.append((label, len(matrix)))
+    prune_stale_matrices(fingerprint=stats_fingerprint(session))
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild doppelganger feature matrices')
+    parser.add_argument('--db-url', help='Database URL (or set DATABASE_URL env var)')
+    args = parser.parse_args()
+
+    db_url = args.db_url or os.environ.get('DATABASE_URL')
+    if not db_url:
+        print("ERROR: Database URL required. Use --db-url or set DATABASE_URL environment variable.")
+        sys.exit(1)
+
+    engine = get_engine(db_url)
+    db_display = db_url.split('@')[1] if '@' in db_url else 'localhost'
+    print(f"Connecting to: {db_display}")
+
+    start_time = datetime.now()
+    session = sessionmaker(bind=engine)()
+    try:
+        built = build_default_matrices(session)
+    finally:
+        session.close()
+
+    elapsed = (datetime.now() - start_time).total_seconds()
+    print(f"\n✓ Doppelganger matrices rebuilt in {elapsed:.1f}s")
+    for label, players in built:
+        print(f"  {label}: {players} players")
+
+
+if __name__ == "__main__":
+    main()
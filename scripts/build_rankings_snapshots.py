@@ -0,0 +1,113 @@
+"""
+Build memory-mapped snapshots of the global T20 rankings and make them current.
+
+The delivery_details pipeline runs this after each men's T20 load, once the rankings cube
+is refreshed and the competition weights refitted. Each build is tagged with the data
+version it was computed on and published to Postgres, where API workers pick it up within
+RANKINGS_SNAPSHOT_RECHECK_SECONDS; they never serve a build on older data. By hand:
+    python scripts/build_rankings_snapshots.py --db-url "$DATABASE_URL"
+    python scripts/build_rankings_snapshots.py --history-months 12
+    python scripts/build_rankings_snapshots.py --show-only
+    python scripts/build_rankings_snapshots.py --no-publish    # local build only
+
+    # Using environment variable:
+    python scripts/build_rankings_snapshots.py
+"""
+
+import os
+import sys
+import argparse
+import json
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.competition_weight_fits import current_data_version
+from services.global_t20_rankings import inline_weight_fits, iter_snapshot_rankings
+from services.rankings_snapshot import (
+    RANKINGS_SNAPSHOT_DIR,
+    get_rankings_snapshots,
+    is_available,
+    publish_rankings_snapshot,
+    write_rankings_snapshot,
+)
+
+
+def get_engine(db_url):
+    if db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql://", 1)
+    return create_engine(db_url)
+
+
+def build_snapshots(session, root=RANKINGS_SNAPSHOT_DIR, history_months=36, publish=True):
+    """Build a snapshot on the current data version under ``root`` and publish it; returns the manifest."""
+    # Read before the build, so a load landing meanwhile leaves the build marked as older
+    data_version = current_data_version(session)
+    with inline_weight_fits():
+        manifest = write_rankings_snapshot(
+            iter_snapshot_rankings(session, history_months=history_months),
+            root=root,
+            data_version=data_version,
+        )
+    if publish:
+        publish_rankings_snapshot(session, root, manifest)
+        session.commit()
+    return manifest
+
+
+def show_snapshot(root):
+    snapshot = get_rankings_snapshots(root)
+    if snapshot is None:
+        print(f"No rankings snapshot published under {root}")
+        return
+    print(f"\nCurrent rankings snapshot: {snapshot.path}")
+    summary = {k: v for k, v in snapshot.manifest.items() if k != "artifacts"}
+    summary["rankings"] = len(snapshot.manifest.get("artifacts", []))
+    summary["defaults"] = [
+        f"{a['mode']}/{a['bowl_kind']} {a['start']}..{a['end']} ({a['rows']} rows)"
+        for a in snapshot.manifest.get("artifacts", []) if a.get("default")
+    ]
+    print(json.dumps(summary, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build global T20 rankings snapshots')
+    parser.add_argument('--db-url', help='Database URL (or set DATABASE_URL env var)')
+    parser.add_argument('--root', default=RANKINGS_SNAPSHOT_DIR, help='Snapshot root directory')
+    parser.add_argument('--history-months', type=int, default=36,
+                        help='Month-end windows to include for player trajectories (default: 36)')
+    parser.add_argument('--show-only', action='store_true', help='Only show the current snapshot')
+    parser.add_argument('--no-publish', action='store_true',
+                        help='Keep the build on local disk instead of publishing it to Postgres')
+    args = parser.parse_args()
+
+    if not is_available():
+        print("ERROR: pyarrow is not installed.")
+        sys.exit(1)
+
+    if args.show_only:
+        show_snapshot(args.root)
+        return
+
+    db_url = args.db_url or os.environ.get('DATABASE_URL')
+    if not db_url:
+        print("ERROR: Database URL required. Use --db-url or set DATABASE_URL environment variable.")
+        sys.exit(1)
+
+    engine = get_engine(db_url)
+    db_display = db_url.split('@')[1] if '@' in db_url else 'localhost'
+    print(f"Connecting to: {db_display}")
+
+    session = sessionmaker(bind=engine)()
+    try:
+        manifest = build_snapshots(session, args.root, args.history_months, publish=not args.no_publish)
+    finally:
+        session.close()
+
+    print(f"\n✓ Rankings snapshot {manifest['snapshot_id']}: {len(manifest['artifacts'])} rankings "
+          f"in {manifest['build_seconds']}s (data version {manifest['data_version']})")
+    show_snapshot(args.root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Rebuild the venue feature matrices behind venue similarity.
+
+Run after every delivery_details load, once matches are synced, on the host that serves the
+API: matrices are read from its VENUE_MATRIX_DIR, so a build elsewhere (such as the load
+pipeline's runner) is never seen. Without it, API workers build each matrix on its first
+request. Builds the all-time matrix without competition filters, then one slice
+per batting hand and bowler kind in that data, and deletes matrices built on older data.
+Other windows, scopes and slices are still built on first use.
+
+Usage:
+    python scripts/build_venue_matrices.py --db-url "$DATABASE_URL"
+    python scripts/build_venue_matrices.py --start-date 2023-01-01 --end-date 2025-12-31
+"""
+
+import os
+import sys
+import argparse
+from datetime import date, datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.venue_feature_matrix import (
+    get_venue_feature_matrix,
+    get_venue_slice_matrix,
+    prune_stale_matrices,
+    venue_data_fingerprint,
+)
+
+
+def get_engine(db_url):
+    if db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql://", 1)
+    return create_engine(db_url)
+
+
+def build_default_matrices(session, start_date=None, end_date=None):
+    """Build (and persist) the scope matrix and its hand/kind slices; returns (label, venues) pairs."""
+    matrix = get_venue_feature_matrix(session, start_date, end_date, force_refresh=True)
+    built = [("all venues", len(matrix))]
+    for field in ("bat_hand", "bowl_kind"):
+        for value in matrix.filter_options.get(field, []):
+            get_venue_slice_matrix(session, matrix, start_date, end_date, force_refresh=True, **{field: value})
+            built.append((f"{field}={value}", len(matrix)))
+    prune_stale_matrices(fingerprint=venue_data_fingerprint(session))
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild venue similarity feature matrices')
+    parser.add_argument('--db-url', help='Database URL (or set DATABASE_URL env var)')
+    parser.add_argument('--start-date', type=date.fromisoformat, help='Window start (default: all time)')
+    parser.add_argument('--end-date', type=date.fromisoformat, help='Window end (default: all time)')
+    args = parser.parse_args()
+
+    db_url = args.db_url or os.environ.get('DATABASE_URL')
+    if not db_url:
+        print("ERROR: Database URL required. Use --db-url or set DATABASE_URL environment variable.")
+        sys.exit(1)
+
+    engine = get_engine(db_url)
+    db_display = db_url.split('@')[1] if '@' in db_url else 'localhost'
+    print(f"Connecting to: {db_display}")
+
+    start_time = datetime.now()
+    session = sessionmaker(bind=engine)()
+    try:
+        built = build_default_matrices(session, args.start_date, args.end_date)
+    finally:
+        session.close()
+
+    elapsed = (datetime.now() - start_time).total_seconds()
+    print(f"\n✓ Venue matrices rebuilt in {elapsed:.1f}s")
+    for label, venues in built:
+        print(f"  {label}: {venues} venues")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ import argparse
 from sqlalchemy import create_engine, text
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.player_aliases import refresh_alias_map
 
 
 def get_engine(db_url):
@@ -115,7 +116,9 @@ def delete_invalid_aliases(engine, invalid_aliases, dry_run=False):
             deleted += len(batch)
             print(f"  Deleted {deleted}/{len(ids_to_delete)}...", end='\r')
 
-    print(f"\n✓ Deleted {deleted} invalid aliases")
+        version = refresh_alias_map(conn)
+
+    print(f"\n✓ Deleted {deleted} invalid aliases (player_alias_map refreshed, version {version})")
 
 
 def show_summary(engine):
@@ -0,0 +1,83 @@
+"""
+Export delivery_details to a columnar Parquet snapshot for analytical endpoints.
+
+Run after each delivery_details load, on the host that serves the API: readers memory-map
+the export from DELIVERY_SNAPSHOT_DIR, so it must sit on that host's persistent storage.
+run_delivery_details_refresh.sh does this when pyarrow is installed; the nightly GitHub
+workflow does not, since its runner's disk is discarded. Readers ignore an export that is
+behind Postgres and fall back to it. An export limited with --years that leaves out a year
+present in Postgres is kept under snapshots/ for inspection but never published as CURRENT.
+    python scripts/export_delivery_snapshot.py --db-url "$DATABASE_URL"
+    python scripts/export_delivery_snapshot.py --root /data/delivery_snapshot --years 2024 2025
+    python scripts/export_delivery_snapshot.py --show-only
+
+    # Using environment variable:
+    python scripts/export_delivery_snapshot.py
+"""
+
+import os
+import sys
+import argparse
+import json
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.delivery_snapshot import (
+    DELIVERY_SNAPSHOT_DIR,
+    export_delivery_details,
+    get_snapshot,
+    is_available,
+)
+
+
+def get_engine(db_url):
+    if db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql://", 1)
+    return create_engine(db_url)
+
+
+def show_snapshot(root):
+    snapshot = get_snapshot(root)
+    if snapshot is None:
+        print(f"No snapshot published under {root}")
+        return
+    print(f"\nCurrent snapshot: {snapshot.path}")
+    print(json.dumps({k: v for k, v in snapshot.manifest.items() if k != "columns"}, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export delivery_details to a Parquet snapshot')
+    parser.add_argument('--db-url', help='Database URL (or set DATABASE_URL env var)')
+    parser.add_argument('--root', default=DELIVERY_SNAPSHOT_DIR, help='Snapshot root directory')
+    parser.add_argument('--years', type=int, nargs='+', help='Only export these years (not published unless every year is covered)')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='Rows per fetch / record batch')
+    parser.add_argument('--show-only', action='store_true', help='Only show the current snapshot')
+    args = parser.parse_args()
+
+    if not is_available():
+        print("ERROR: pyarrow is not installed.")
+        sys.exit(1)
+
+    if args.show_only:
+        show_snapshot(args.root)
+        return
+
+    db_url = args.db_url or os.environ.get('DATABASE_URL')
+    if not db_url:
+        print("ERROR: Database URL required. Use --db-url or set DATABASE_URL environment variable.")
+        sys.exit(1)
+
+    engine = get_engine(db_url)
+    db_display = db_url.split('@')[1] if '@' in db_url else 'localhost'
+    print(f"Connecting to: {db_display}")
+
+    manifest = export_delivery_details(engine, root=args.root, years=args.years, chunk_size=args.chunk_size)
+    print(f"\n✓ Snapshot {manifest['snapshot_id']}: {manifest['row_count']:,} rows "
+          f"in {manifest['export_seconds']}s")
+    if not manifest['complete']:
+        print(f"  Partial export ({', '.join(map(str, manifest['years']))}); CURRENT left unchanged")
+    show_snapshot(args.root)
+
+
+if __name__ == "__main__":
+    main()
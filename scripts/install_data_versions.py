@@ -0,0 +1,47 @@
+"""
+Install the data_versions table and its write-counter triggers.
+
+Run once per database (the delivery_details pipeline also runs it before loading). Re-running
+is safe: only tables still missing the trigger get one, so an installed set is left alone.
+
+Usage:
+    python scripts/install_data_versions.py --db-url "$DATABASE_URL"
+
+    # Using environment variable:
+    python scripts/install_data_versions.py
+"""
+
+import os
+import sys
+import argparse
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.data_versions import TRACKED_TABLES, ensure_data_versions
+
+
+def get_engine(db_url):
+    if db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql://", 1)
+    return create_engine(db_url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Install the data_versions write-counter triggers')
+    parser.add_argument('--db-url', help='Database URL (or set DATABASE_URL env var)')
+    args = parser.parse_args()
+
+    db_url = args.db_url or os.environ.get('DATABASE_URL')
+    if not db_url:
+        print("ERROR: Database URL required. Use --db-url or set DATABASE_URL environment variable.")
+        sys.exit(1)
+
+    engine = get_engine(db_url)
+    with engine.begin() as conn:
+        ensure_data_versions(conn)
+
+    print(f"✓ data_versions triggers installed on {', '.join(TRACKED_TABLES)}")
+
+
+if __name__ == "__main__":
+    main()
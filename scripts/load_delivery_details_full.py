@@ -2,6 +2,10 @@
 Load ALL columns from a ball-by-ball CSV into the delivery_details table.
 Handles duplicates by only inserting new rows based on (p_match, inns, over, ball).
 
+Rows are streamed with COPY FROM STDIN into a temp staging table and moved across with
+INSERT ... ON CONFLICT DO NOTHING, so existing keys never have to be held in memory. --workers
+splits the file into byte ranges that load in parallel.
+
 --format and --gender are required: each source file holds exactly one format, and the flag is
 authoritative. Format is never inferred from the data -- `max_balls` is 0 for a third of ODI
 matches, varies within a match, and does not exist at all in the Test feed.
@@ -11,13 +15,20 @@ Usage:
         --format ODI --gender male
     python scripts/load_delivery_details_full.py --csv /path/to/t20_bbb.csv \
         --format T20 --gender male --dry-run
+    python scripts/load_delivery_details_full.py --csv /path/to/t20_bbb.csv \
+        --format T20 --gender male --workers 4
 
 The database URL comes from --db-url or $DATABASE_URL.
 """
 
 import os
+import io
+import csv
 import sys
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 from sqlalchemy import create_engine, text
 
@@ -115,179 +126,305 @@ def get_engine(db_url):
     return create_engine(db_url)
 
 
-def get_existing_keys(engine):
-    """Fetch existing (p_match, inns, over, ball) combinations."""
-    print("Fetching existing delivery keys from database...")
-    
-    query = text("SELECT p_match, inns, over, ball FROM delivery_details")
-    
+def get_integer_columns(engine):
+    """Names of the delivery_details columns typed SMALLINT/INTEGER/BIGINT in the database."""
     with engine.connect() as conn:
-        result = conn.execute(query)
-        existing = set()
-        count = 0
-        for row in result:
-            # Create tuple key: (p_match as string, inns, over, ball)
-            existing.add((str(row[0]), int(row[1]), int(row[2]), int(row[3])))
-            count += 1
-            if count % 500000 == 0:
-                print(f"  Loaded {count:,} existing keys...", end='\r')
-        
-        print(f"  Found {len(existing):,} existing deliveries in database")
-        return existing
-
-
-def load_csv(csv_path, engine, chunk_size=50000, dry_run=False, existing_keys=None,
-             fmt="T20", gender="male"):
-    """Load CSV into delivery_details, skipping duplicates.
+        rows = conn.execute(text("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name = 'delivery_details'
+            AND data_type IN ('smallint', 'integer', 'bigint')
+        """)).fetchall()
+    return {row[0] for row in rows}
+
+
+class OverCapTracker:
+    """Running over-cap guard for one stream of chunks (see transform_chunk)."""
+
+    def __init__(self, over_cap, label, fmt):
+        self.over_cap = over_cap
+        self.label = label
+        self.fmt = fmt
+        self.max_over_seen = -1
+        self.breaches = 0
+        self.rows_seen = 0
+
+    def observe(self, overs):
+        overs_numeric = pd.to_numeric(overs, errors='coerce')
+        chunk_max_over = overs_numeric.max()
+        if pd.notna(chunk_max_over):
+            self.max_over_seen = max(self.max_over_seen, int(chunk_max_over))
+        self.breaches += int((overs_numeric > self.over_cap).sum())
+        self.rows_seen += len(overs)
+
+        breach_share = self.breaches / self.rows_seen if self.rows_seen else 0
+        if breach_share > OVER_CAP_BREACH_LIMIT:
+            raise SystemExit(
+                f"ABORTING: {self.breaches:,} of {self.rows_seen:,} balls "
+                f"({breach_share:.1%}) are past over {self.over_cap}, the maximum for {self.label}. "
+                f"This file does not look like {self.fmt} data — check that --format matches "
+                f"the source before loading."
+            )
+
+
+def transform_chunk(chunk, spec, tracker, integer_columns):
+    """Turn one raw CSV chunk into delivery_details rows, typed for COPY."""
+    from services.competition_normalizer import normalize_competition
+
+    # Rename columns
+    chunk = chunk.rename(columns=COL_MAP)
+
+    # Keep only mapped columns that exist
+    cols_to_keep = [c for c in COL_MAP.values() if c in chunk.columns]
+    df = chunk[cols_to_keep].copy()
+
+    # Convert p_match to string
+    df['p_match'] = df['p_match'].astype(str)
+
+    # Fix over numbering: new dataset is 1-indexed, existing is 0-indexed
+    df['over'] = pd.to_numeric(df['over'], errors='coerce') - 1
+
+    # The one guard the --format flag cannot provide: if the file really is another format
+    # (a rotated Dropbox secret pasted into the wrong slot), the overs give it away.
+    #
+    # Proportional, not absolute. Real data contains rare anomalies -- one 2005 ODI in this
+    # feed has an innings recorded out to 51 overs -- and an absolute check turns 11 balls
+    # in 1.6 million into a hard abort. A genuinely mismatched file would put a large
+    # fraction of its balls past the cap, not a handful.
+    tracker.observe(df['over'])
+
+    # Stamp the format from the flags, not from the data.
+    df['format'] = spec.format
+    df['gender'] = spec.gender
+
+    # Normalise competition to the same bucket the matches table uses. Without this the two
+    # disagree -- matches.competition says 'ODI' while delivery_details keeps the raw series
+    # name or NULL -- and the query builder's league filter, which reads delivery_details,
+    # matches nothing for any format whose feed does not already ship normalised values.
+    # The raw series name is not lost: it stays in the `tournament` column.
+    if 'competition' in df.columns:
+        source_cols = [c for c in ('competition', 'tournament', 'trophy_name') if c in df.columns]
+        triples = df[source_cols].drop_duplicates()
+        mapping = {}
+        for row in triples.itertuples(index=False):
+            values = dict(zip(source_cols, row))
+            mapping[tuple(row)] = normalize_competition(
+                values.get('competition'),
+                values.get('tournament'),
+                values.get('trophy_name'),
+                spec.format,
+            )
+        df['competition'] = [
+            mapping[tuple(r)] for r in df[source_cols].itertuples(index=False)
+        ]
+
+    # Replace "-" with None in all columns (CSV uses "-" for missing numeric values)
+    df = df.replace('-', None)
+
+    # Coerce the integer-typed columns.
+    #
+    # The feed writes these as decimals ("322.0", "1.0"), and pandas widens a column to
+    # float64 as soon as one value in the chunk is missing. Postgres rejects "322.0" for an
+    # INTEGER column -- in COPY for every integer column, not just the INSERT-bound ones this
+    # used to patch up. This bit the old load 97% of the way in: early chunks had no wagon
+    # data at all, so the column arrived as nulls and inserted fine, and only later chunks
+    # carried real values. Nullable Int64 writes ints as "322" and missing values as empty.
+    for column in (integer_columns or INTEGER_COLUMNS):
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').round().astype('Int64')
+
+    return df
+
+
+class _RangeReader(io.RawIOBase):
+    """Byte range [start, end) of a file, readable by pandas as a file object."""
+
+    def __init__(self, path, start, end):
+        self._fh = open(path, 'rb')
+        self._fh.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._fh.read(size)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        self._fh.close()
+        super().close()
+
+
+def split_csv_ranges(csv_path, parts):
+    """
+    Header column names plus ``parts`` byte ranges covering the data rows.
+
+    Boundaries are moved forward to the next newline, so every range holds whole rows.
+    The ball-by-ball feeds have no quoted newlines, which this relies on.
+    """
+    with open(csv_path, 'rb') as fh:
+        header = fh.readline()
+        data_start = fh.tell()
+        size = os.path.getsize(csv_path)
+        bounds = [data_start]
+        for k in range(1, parts):
+            target = data_start + (size - data_start) * k // parts
+            if target <= bounds[-1]:
+                continue
+            fh.seek(target)
+            fh.readline()
+            position = min(fh.tell(), size)
+            if position > bounds[-1]:
+                bounds.append(position)
+        bounds.append(size)
+    columns = next(csv.reader([header.decode('utf-8-sig')]))
+    ranges = [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+    return columns, ranges
+
+
+def _copy_frame(cursor, table, df):
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, na_rep='')
+    buffer.seek(0)
+    columns = ', '.join(f'"{c}"' for c in df.columns)
+    cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _load_range(task):
+    """Stream one byte range of the CSV into delivery_details. Runs in a worker process."""
+    from format_config import effective_over_max, get_format
+
+    spec = get_format(task['fmt'], task['gender'])
+    tracker = OverCapTracker(effective_over_max(spec), spec.label, spec.format)
+    engine = get_engine(task['db_url'])
+    stats = {'total_in_csv': 0, 'total_skipped': 0, 'total_inserted': 0}
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        stage_ready = False
+        reader = pd.read_csv(
+            io.BufferedReader(_RangeReader(task['csv_path'], task['start'], task['end'])),
+            header=None, names=task['columns'], chunksize=task['chunk_size'], low_memory=False,
+        )
+        for i, chunk in enumerate(reader):
+            stats['total_in_csv'] += len(chunk)
+            df = transform_chunk(chunk, spec, tracker, task['integer_columns'])
+            if len(df) == 0:
+                continue
+
+            if not task['dedupe']:
+                if task['dry_run']:
+                    inserted = len(df)
+                else:
+                    _copy_frame(cursor, 'delivery_details', df)
+                    inserted = len(df)
+            else:
+                if not stage_ready:
+                    # Same column types as the target, none of its constraints or defaults
+                    columns = ', '.join(f'"{c}"' for c in df.columns)
+                    cursor.execute(
+                        f"CREATE TEMP TABLE delivery_details_stage AS "
+                        f"SELECT {columns} FROM delivery_details WITH NO DATA"
+                    )
+                    stage_ready = True
+                _copy_frame(cursor, 'delivery_details_stage', df)
+                columns = ', '.join(f'"{c}"' for c in df.columns)
+                if task['dry_run']:
+                    cursor.execute("""
+                        SELECT COUNT(*) FROM delivery_details_stage s
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM delivery_details d
+                            WHERE d.p_match = s.p_match AND d.inns = s.inns
+                            AND d.over = s.over AND d.ball = s.ball
+                        )
+                    """)
+                    inserted = cursor.fetchone()[0]
+                else:
+                    cursor.execute(
+                        f"INSERT INTO delivery_details ({columns}) "
+                        f"SELECT {columns} FROM delivery_details_stage "
+                        f"ON CONFLICT (p_match, inns, over, ball) DO NOTHING"
+                    )
+                    inserted = cursor.rowcount
+                cursor.execute("TRUNCATE delivery_details_stage")
+
+            if task['dry_run']:
+                raw.rollback()
+                stage_ready = False
+            else:
+                raw.commit()
+            stats['total_inserted'] += inserted
+            stats['total_skipped'] += len(df) - inserted
+            print(f"  [range {task['index']}] chunk {i+1}: "
+                  f"{'would insert' if task['dry_run'] else 'inserted'} {inserted:,} of {len(df):,} rows")
+    except BaseException:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+        engine.dispose()
+
+    stats['max_over_seen'] = tracker.max_over_seen
+    stats['over_cap_breaches'] = tracker.breaches
+    return stats
+
+
+def load_csv(csv_path, engine, chunk_size=50000, dry_run=False, fmt="T20", gender="male",
+             workers=1, dedupe=True):
+    """Load CSV into delivery_details with COPY, skipping rows that already exist.
+
+    The file is split into ``workers`` byte ranges that load concurrently. Each worker
+    streams its range through ``transform_chunk`` and ``COPY ... FROM STDIN`` into a temp
+    staging table, then moves it across with ``INSERT ... ON CONFLICT DO NOTHING`` on the
+    (p_match, inns, over, ball) unique key, so duplicates are resolved by the database rather
+    than a key set held in memory. ``dedupe=False`` copies straight into delivery_details.
 
     Every row is stamped with `fmt`/`gender` from the caller's flags rather than anything
     derived from the data. `max_balls` looks like a format signal but is not one: it is 0 for
     a third of ODI matches, varies within a single match, and the Test feed omits it entirely.
     """
     from format_config import effective_over_max, get_format
-    from services.competition_normalizer import normalize_competition
 
     spec = get_format(fmt, gender)
     over_cap = effective_over_max(spec)
 
     print(f"\nLoading from {csv_path} as {spec.label} (format={spec.format}, gender={spec.gender})...")
-    total_in_csv = 0
-    total_skipped = 0
-    total_inserted = 0
-    max_over_seen = -1
-    over_cap_breaches = 0
-    total_rows_seen = 0
-
-    for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunk_size, low_memory=False)):
-        total_in_csv += len(chunk)
-
-        # Rename columns
-        chunk = chunk.rename(columns=COL_MAP)
-
-        # Keep only mapped columns that exist
-        cols_to_keep = [c for c in COL_MAP.values() if c in chunk.columns]
-        df = chunk[cols_to_keep].copy()
-
-        # Convert p_match to string
-        df['p_match'] = df['p_match'].astype(str)
-
-        # Fix over numbering: new dataset is 1-indexed, existing is 0-indexed
-        df['over'] = df['over'] - 1
-
-        # The one guard the --format flag cannot provide: if the file really is another format
-        # (a rotated Dropbox secret pasted into the wrong slot), the overs give it away.
-        #
-        # Proportional, not absolute. Real data contains rare anomalies -- one 2005 ODI in this
-        # feed has an innings recorded out to 51 overs -- and an absolute check turns 11 balls
-        # in 1.6 million into a hard abort. A genuinely mismatched file would put a large
-        # fraction of its balls past the cap, not a handful.
-        overs_numeric = pd.to_numeric(df['over'], errors='coerce')
-        chunk_max_over = overs_numeric.max()
-        if pd.notna(chunk_max_over):
-            max_over_seen = max(max_over_seen, int(chunk_max_over))
-        over_cap_breaches += int((overs_numeric > over_cap).sum())
-        total_rows_seen += len(df)
+    columns, ranges = split_csv_ranges(csv_path, max(1, workers))
+    db_url = engine.url.render_as_string(hide_password=False)
+    integer_columns = get_integer_columns(engine)
+    tasks = [
+        {
+            'index': index, 'csv_path': csv_path, 'start': start, 'end': end, 'columns': columns,
+            'chunk_size': chunk_size, 'db_url': db_url, 'fmt': spec.format, 'gender': spec.gender,
+            'integer_columns': integer_columns, 'dry_run': dry_run, 'dedupe': dedupe,
+        }
+        for index, (start, end) in enumerate(ranges, 1)
+    ]
+    print(f"  {len(tasks)} range(s) across {min(workers, len(tasks)) or 1} worker(s)")
+
+    if len(tasks) <= 1:
+        results = [_load_range(task) for task in tasks]
+    else:
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            results = list(pool.map(_load_range, tasks))
 
-        breach_share = over_cap_breaches / total_rows_seen if total_rows_seen else 0
-        if breach_share > OVER_CAP_BREACH_LIMIT:
-            raise SystemExit(
-                f"ABORTING: {over_cap_breaches:,} of {total_rows_seen:,} balls "
-                f"({breach_share:.1%}) are past over {over_cap}, the maximum for {spec.label}. "
-                f"This file does not look like {spec.format} data — check that --format matches "
-                f"the source before loading."
-            )
+    totals = {key: sum(r[key] for r in results) for key in ('total_in_csv', 'total_skipped', 'total_inserted')}
+    totals['max_over_seen'] = max((r['max_over_seen'] for r in results), default=-1)
+    over_cap_breaches = sum(r['over_cap_breaches'] for r in results)
 
-        # Stamp the format from the flags, not from the data.
-        df['format'] = spec.format
-        df['gender'] = spec.gender
-
-        # Normalise competition to the same bucket the matches table uses. Without this the two
-        # disagree -- matches.competition says 'ODI' while delivery_details keeps the raw series
-        # name or NULL -- and the query builder's league filter, which reads delivery_details,
-        # matches nothing for any format whose feed does not already ship normalised values.
-        # The raw series name is not lost: it stays in the `tournament` column.
-        if 'competition' in df.columns:
-            source_cols = [c for c in ('competition', 'tournament', 'trophy_name') if c in df.columns]
-            triples = df[source_cols].drop_duplicates()
-            mapping = {}
-            for row in triples.itertuples(index=False):
-                values = dict(zip(source_cols, row))
-                mapping[tuple(row)] = normalize_competition(
-                    values.get('competition'),
-                    values.get('tournament'),
-                    values.get('trophy_name'),
-                    spec.format,
-                )
-            df['competition'] = [
-                mapping[tuple(r)] for r in df[source_cols].itertuples(index=False)
-            ]
-        
-        # Filter out existing records if we have existing keys
-        if existing_keys:
-            # Create key column for filtering
-            df['_key'] = list(zip(
-                df['p_match'].astype(str),
-                df['inns'].astype(int),
-                df['over'].astype(int),
-                df['ball'].astype(int)
-            ))
-            
-            before_filter = len(df)
-            df = df[~df['_key'].isin(existing_keys)]
-            df = df.drop(columns=['_key'])
-            
-            skipped = before_filter - len(df)
-            total_skipped += skipped
-        
-        if len(df) == 0:
-            print(f"  Chunk {i+1}: All {chunk_size} rows already exist, skipping...", end='\r')
-            continue
-        
-        # Replace "-" with None in all columns (CSV uses "-" for missing numeric values)
-        df = df.replace('-', None)
-
-        # Handle NaN
-        df = df.where(pd.notnull(df), None)
-
-        # Coerce the integer-typed columns.
-        #
-        # The feed writes these as decimals ("322.0", "1.0"), and pandas widens a column to
-        # float64 as soon as one value in the chunk is missing. Postgres then rejects "322.0"
-        # for an INTEGER column. This bit the load 97% of the way in: early chunks had no wagon
-        # data at all, so the column arrived as nulls and inserted fine, and only later chunks
-        # carried real values.
-        # Build an object-dtype column explicitly. Assigning the result of .apply() is not
-        # enough: pandas re-infers a column of ints and Nones back to float64, so the coercion
-        # silently undoes itself in exactly the chunks that have missing values.
-        for column in INTEGER_COLUMNS:
-            if column in df.columns:
-                numeric = pd.to_numeric(df[column], errors='coerce')
-                df[column] = pd.Series(
-                    [int(value) if pd.notna(value) else None for value in numeric],
-                    index=df.index,
-                    dtype=object,
-                )
-        
-        if dry_run:
-            total_inserted += len(df)
-            print(f"  [DRY RUN] Chunk {i+1}: Would insert {len(df):,} new rows", end='\r')
-        else:
-            # Insert
-            df.to_sql('delivery_details', engine, if_exists='append', index=False, method='multi')
-            total_inserted += len(df)
-            print(f"  Chunk {i+1}: Inserted {len(df):,} new rows (total: {total_inserted:,})", end='\r')
-    
     print(f"\n")
-    print(f"  Highest over seen: {max_over_seen} (cap for {spec.label}: {over_cap})")
+    print(f"  Highest over seen: {totals['max_over_seen']} (cap for {spec.label}: {over_cap})")
     if over_cap_breaches:
         print(f"  NOTE: {over_cap_breaches:,} ball(s) past the cap — below the "
               f"{OVER_CAP_BREACH_LIMIT:.0%} mismatch threshold, so treated as data anomalies.")
-    return {
-        'total_in_csv': total_in_csv,
-        'total_skipped': total_skipped,
-        'total_inserted': total_inserted,
-        'max_over_seen': max_over_seen,
-    }
+    return totals
 
 
 def main():
@@ -299,7 +436,9 @@ def main():
                         help='Gender held in this file')
     parser.add_argument('--db-url', help='Database URL (or set DATABASE_URL env var)')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be inserted without making changes')
-    parser.add_argument('--force', action='store_true', help='Skip duplicate checking (faster but may create duplicates)')
+    parser.add_argument('--force', action='store_true', help='Skip duplicate checking (COPY straight into the table; fails on an existing key)')
+    parser.add_argument('--workers', type=int, default=1, help='File ranges loaded in parallel (default: 1)')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='Rows per COPY batch (default: 50000)')
     args = parser.parse_args()
     
     # Get database URL
@@ -315,16 +454,12 @@ def main():
     if args.dry_run:
         print("\n*** DRY RUN MODE - No changes will be made ***\n")
     
-    # Get existing keys unless --force is used
-    existing_keys = None
-    if not args.force:
-        existing_keys = get_existing_keys(engine)
-    else:
+    if args.force:
         print("WARNING: --force mode - skipping duplicate check!")
     
     # Load CSV
-    results = load_csv(args.csv, engine, dry_run=args.dry_run, existing_keys=existing_keys,
-                       fmt=args.fmt, gender=args.gender)
+    results = load_csv(args.csv, engine, chunk_size=args.chunk_size, dry_run=args.dry_run,
+                       fmt=args.fmt, gender=args.gender, workers=args.workers, dedupe=not args.force)
     
     # Print summary
     print("=" * 60)
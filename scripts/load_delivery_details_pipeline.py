@@ -8,6 +8,8 @@ This script orchestrates the full data loading pipeline:
 3. Populate non_striker and crease_combo columns
 4. Update players table with bat_hand/bowl_style
 5. Refresh query builder metadata
+5b. Refresh the rankings monthly cube and refit competition weights (men's T20 only)
+5c. Build and publish the rankings snapshots (men's T20 only)
 
 Usage:
     # Full pipeline with dry run
@@ -49,6 +51,19 @@ def print_header(title):
     print("=" * 70)
 
 
+def install_data_versions(db_url, dry_run=False):
+    """Install the write-counter triggers that invalidate derived data on in-place corrections, if missing."""
+    if dry_run:
+        print("[DRY RUN] Would install data_versions triggers")
+        return
+
+    from sqlalchemy import create_engine
+    from services.data_versions import ensure_data_versions
+
+    with create_engine(db_url).begin() as conn:
+        ensure_data_versions(conn)
+
+
 def step_validate(csv_path, db_url, dry_run=False):
     """Step 1: Validate the dataset."""
     print_header("STEP 1: VALIDATION")
@@ -81,23 +96,18 @@ def step_validate(csv_path, db_url, dry_run=False):
     return True
 
 
-def step_load(csv_path, db_url, dry_run=False, fmt="T20", gender="male"):
+def step_load(csv_path, db_url, dry_run=False, fmt="T20", gender="male", workers=1):
     """Step 2: Load new rows with duplicate detection."""
     print_header("STEP 2: LOAD DATA")
     
-    from sqlalchemy import create_engine
-    from load_delivery_details_full import get_existing_keys, load_csv, get_engine
+    from load_delivery_details_full import load_csv, get_engine
     
     engine = get_engine(db_url)
     
-    # Get existing keys for duplicate detection
-    existing_keys = get_existing_keys(engine)
-    
-    # Load new data
+    # Load new data (duplicates are skipped by the database via the staging table)
     # fmt/gender must be passed explicitly: load_csv defaults to men's T20, so omitting them
     # would stamp an ODI or Test file as T20.
-    results = load_csv(csv_path, engine, dry_run=dry_run, existing_keys=existing_keys,
-                       fmt=fmt, gender=gender)
+    results = load_csv(csv_path, engine, dry_run=dry_run, fmt=fmt, gender=gender, workers=workers)
     
     print(f"\n✓ Load complete")
     print(f"  - CSV rows: {results['total_in_csv']:,}")
@@ -208,8 +218,77 @@ def step_refresh_metadata(db_url, dry_run=False, fmt="T20", gender="male"):
     print(f"\n✓ Metadata refresh complete")
 
 
-def step_sync_stats(dry_run=False, skip_elo=False):
-    """Step 6: Sync matches and batting/bowling stats from delivery_details."""
+def step_refresh_rankings_cube(db_url, dry_run=False, fmt="T20", gender="male"):
+    """Step 5b: Rebuild the monthly cells cube behind the global T20 rankings and refit weights."""
+    print_header("STEP 5b: REFRESH RANKINGS CUBE & COMPETITION WEIGHTS")
+
+    # The global rankings are pinned to men's T20; other files cannot change the cube
+    if (fmt, gender) != ("T20", "male"):
+        print(f"[SKIPPED] Rankings cover men's T20 only ({fmt}/{gender} loaded)")
+        return
+
+    if dry_run:
+        print("[DRY RUN] Would rebuild rankings_monthly_cells and refit competition weights")
+        return
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from services.global_t20_rankings import refit_competition_weights
+    from services.rankings_cube import refresh_rankings_cube
+
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+        rows = refresh_rankings_cube(conn)
+
+    print(f"\n✓ Rankings cube rebuilt with {rows:,} rows")
+
+    # The load moved the data version, so API workers would otherwise fit every window afresh;
+    # fitting here (from the cube, warm-started) leaves them only stored fits to read.
+    session = sessionmaker(bind=engine)()
+    try:
+        results = refit_competition_weights(session)
+    finally:
+        session.close()
+
+    print(f"✓ Competition weights refitted for {len(results)} windows")
+
+
+def step_build_rankings_snapshots(db_url, dry_run=False, fmt="T20", gender="male"):
+    """Step 5c: Build the rankings snapshots and publish them to Postgres for the API."""
+    print_header("STEP 5c: BUILD RANKINGS SNAPSHOTS")
+
+    if (fmt, gender) != ("T20", "male"):
+        print(f"[SKIPPED] Rankings cover men's T20 only ({fmt}/{gender} loaded)")
+        return
+
+    from services.rankings_snapshot import is_available
+
+    if not is_available():
+        print("[SKIPPED] pyarrow is not installed")
+        return
+
+    if dry_run:
+        print("[DRY RUN] Would build and publish rankings snapshots")
+        return
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from build_rankings_snapshots import build_snapshots
+
+    # Runs after 5b, so every window's competition weights are already stored. Tagged with
+    # the men's T20 data version, which later legs for other formats leave unchanged.
+    session = sessionmaker(bind=create_engine(db_url))()
+    try:
+        manifest = build_snapshots(session)
+    finally:
+        session.close()
+
+    print(f"\n✓ Rankings snapshot {manifest['snapshot_id']} published "
+          f"({len(manifest['artifacts'])} rankings, data version {manifest['data_version']})")
+
+
+def step_sync_stats(db_url, dry_run=False, skip_elo=False):
+    """Step 6: Sync matches and batting/bowling stats."""
     print_header("STEP 6: SYNC MATCHES & STATS")
 
     from run_full_dd_sync import run_sync_pipeline
@@ -222,6 +301,10 @@ def step_sync_stats(dry_run=False, skip_elo=False):
     )
 
     print(f"\n✓ Sync complete")
+
+    # The doppelganger matrices are not rebuilt here: they are .npz files on the local disk of
+    # whoever builds them, and this runner's disk never reaches the API. The sync changes the
+    # stats fingerprint, so API workers rebuild each matrix on its first request.
     return results
 
 
@@ -237,6 +320,8 @@ Steps:
   3. Populate non_striker and crease_combo columns
   4. Update players table with bat_hand/bowl_style
   5. Refresh query builder metadata
+  5b. Refresh the rankings monthly cube and refit competition weights (men's T20 only)
+  5c. Build and publish the rankings snapshots (men's T20 only)
   6. Sync matches & batting/bowling stats from delivery_details
 
 Examples:
@@ -263,8 +348,11 @@ Examples:
     parser.add_argument('--skip-columns', action='store_true', help='Skip the column population step')
     parser.add_argument('--skip-players', action='store_true', help='Skip the players update step')
     parser.add_argument('--skip-metadata', action='store_true', help='Skip the metadata refresh step')
+    parser.add_argument('--skip-rankings-cube', action='store_true', help='Skip the rankings cube refresh and weight refit step')
+    parser.add_argument('--skip-rankings-snapshots', action='store_true', help='Skip the rankings snapshot build')
     parser.add_argument('--skip-sync', action='store_true', help='Skip the matches/stats sync step')
     parser.add_argument('--skip-elo', action='store_true', help='Skip ELO calculation in sync step')
+    parser.add_argument('--workers', type=int, default=1, help='File ranges loaded in parallel in the load step (default: 1)')
     args = parser.parse_args()
     
     # Validate inputs
@@ -291,6 +379,10 @@ Examples:
     start_time = datetime.now()
     
     try:
+        # Every write below bumps data_versions, so derived data built before it is rebuilt.
+        # Only missing triggers are created; an installed set is left untouched.
+        install_data_versions(db_url, dry_run=args.dry_run)
+
         # Step 1: Validate
         if not args.skip_validation:
             step_validate(args.csv, db_url, dry_run=args.dry_run)
@@ -299,7 +391,8 @@ Examples:
         
         # Step 2: Load
         if not args.skip_load:
-            step_load(args.csv, db_url, dry_run=args.dry_run, fmt=args.fmt, gender=args.gender)
+            step_load(args.csv, db_url, dry_run=args.dry_run, fmt=args.fmt, gender=args.gender,
+                      workers=args.workers)
         else:
             print("\n[SKIPPED] Step 2: Load Data")
         
@@ -330,9 +423,21 @@ Examples:
         else:
             print("\n[SKIPPED] Step 5: Refresh Metadata")
 
+        # Step 5b: Refresh rankings cube
+        if not args.skip_rankings_cube:
+            step_refresh_rankings_cube(db_url, dry_run=args.dry_run, fmt=args.fmt, gender=args.gender)
+        else:
+            print("\n[SKIPPED] Step 5b: Refresh Rankings Cube")
+
+        # Step 5c: Build rankings snapshots
+        if not args.skip_rankings_snapshots:
+            step_build_rankings_snapshots(db_url, dry_run=args.dry_run, fmt=args.fmt, gender=args.gender)
+        else:
+            print("\n[SKIPPED] Step 5c: Build Rankings Snapshots")
+
         # Step 6: Sync matches & stats
         if not args.skip_sync:
-            step_sync_stats(dry_run=args.dry_run, skip_elo=args.skip_elo)
+            step_sync_stats(db_url, dry_run=args.dry_run, skip_elo=args.skip_elo)
         else:
             print("\n[SKIPPED] Step 6: Sync Matches & Stats")
 
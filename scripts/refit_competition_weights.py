@@ -0,0 +1,67 @@
+"""
+Fit and store the global T20 rankings' competition weights for the current data version.
+
+Run after every delivery_details load (the load pipeline does this for men's T20 files,
+right after the rankings cube). Each window is warm-started from the nearest stored fit, so
+a refit after a small ingestion converges in a few iterations. API workers never fit: they
+serve stored fits and queue any missing window on a background worker.
+    python scripts/refit_competition_weights.py --db-url "$DATABASE_URL"
+    python scripts/refit_competition_weights.py --history-months 12
+
+    # Refit windows that already have a fit on this data version:
+    python scripts/refit_competition_weights.py --force
+"""
+
+import os
+import sys
+import argparse
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.competition_weight_fits import current_data_version
+from services.global_t20_rankings import refit_competition_weights
+
+
+def get_engine(db_url):
+    if db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql://", 1)
+    return create_engine(db_url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit and store rankings competition weights')
+    parser.add_argument('--db-url', help='Database URL (or set DATABASE_URL env var)')
+    parser.add_argument('--history-months', type=int, default=36,
+                        help='Month-end windows to fit besides the default window (default: 36)')
+    parser.add_argument('--force', action='store_true', help='Refit windows that already have a fit')
+    args = parser.parse_args()
+
+    db_url = args.db_url or os.environ.get('DATABASE_URL')
+    if not db_url:
+        print("ERROR: Database URL required. Use --db-url or set DATABASE_URL environment variable.")
+        sys.exit(1)
+
+    engine = get_engine(db_url)
+    db_display = db_url.split('@')[1] if '@' in db_url else 'localhost'
+    print(f"Connecting to: {db_display}")
+
+    start_time = datetime.now()
+    session = sessionmaker(bind=engine)()
+    try:
+        version = current_data_version(session)
+        results = refit_competition_weights(session, history_months=args.history_months, force=args.force)
+    finally:
+        session.close()
+
+    elapsed = (datetime.now() - start_time).total_seconds()
+    sources = Counter(result["source"] for result in results)
+    print(f"\n✓ Competition weights for {len(results)} windows at data version {version} in {elapsed:.1f}s")
+    for source, count in sources.most_common():
+        print(f"  {source}: {count}")
+
+
+if __name__ == "__main__":
+    main()
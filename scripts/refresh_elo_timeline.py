@@ -0,0 +1,51 @@
+"""
+Create / rebuild the team_elo_timeline table from matches.
+
+Run once to create it, and after editing matches by hand. Every ELO write path
+(elo_calculator, elo_update_service) keeps it current afterwards:
+    python scripts/refresh_elo_timeline.py --db-url "$DATABASE_URL"
+
+    # Using environment variable:
+    python scripts/refresh_elo_timeline.py
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.elo_timeline import rebuild_elo_timeline
+
+
+def get_engine(db_url):
+    if db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql://", 1)
+    return create_engine(db_url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the team_elo_timeline table')
+    parser.add_argument('--db-url', help='Database URL (or set DATABASE_URL env var)')
+    args = parser.parse_args()
+
+    db_url = args.db_url or os.environ.get('DATABASE_URL')
+    if not db_url:
+        print("ERROR: Database URL required. Use --db-url or set DATABASE_URL environment variable.")
+        sys.exit(1)
+
+    engine = get_engine(db_url)
+    db_display = db_url.split('@')[1] if '@' in db_url else 'localhost'
+    print(f"Connecting to: {db_display}")
+
+    start_time = datetime.now()
+    with engine.begin() as conn:
+        rows = rebuild_elo_timeline(conn)
+
+    elapsed = (datetime.now() - start_time).total_seconds()
+    print(f"\n✓ team_elo_timeline rebuilt with {rows:,} rows in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Create / refresh the player_alias_map and player_alias_unambiguous materialised views.
+
+Run once to create them (idempotent), and after any manual edit to player_aliases. The
+alias-writing scripts (update_players_from_new_data.py, cleanup_bad_aliases.py) refresh
+automatically:
+    python scripts/refresh_player_alias_map.py --db-url "$DATABASE_URL"
+
+    # Using environment variable:
+    python scripts/refresh_player_alias_map.py
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.player_aliases import ALIAS_MAP_VIEWS, refresh_alias_map
+
+
+def get_engine(db_url):
+    if db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql://", 1)
+    return create_engine(db_url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh the materialised player alias map')
+    parser.add_argument('--db-url', help='Database URL (or set DATABASE_URL env var)')
+    args = parser.parse_args()
+
+    db_url = args.db_url or os.environ.get('DATABASE_URL')
+    if not db_url:
+        print("ERROR: Database URL required. Use --db-url or set DATABASE_URL environment variable.")
+        sys.exit(1)
+
+    engine = get_engine(db_url)
+    db_display = db_url.split('@')[1] if '@' in db_url else 'localhost'
+    print(f"Connecting to: {db_display}")
+
+    start_time = datetime.now()
+    with engine.begin() as conn:
+        version = refresh_alias_map(conn)
+        for view in ALIAS_MAP_VIEWS:
+            count = conn.execute(text(f"SELECT COUNT(*) FROM {view}")).scalar()
+            print(f"  {view:<28} {count:>8,} rows")
+
+    elapsed = (datetime.now() - start_time).total_seconds()
+    print(f"\n✓ Alias map refreshed to version {version} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Create / rebuild the rankings_monthly_cells cube from delivery_details.
+
+Run after every delivery_details load (the load pipeline does this for men's T20 files).
+Month-aligned rankings windows, player trajectories and the full rankings history are
+summed from the cube instead of scanning delivery_details:
+    python scripts/refresh_rankings_cube.py --db-url "$DATABASE_URL"
+
+    # Only re-derive months from a date on (e.g. after loading recent matches):
+    python scripts/refresh_rankings_cube.py --since 2025-01-01
+
+    # Also precompute the rankings of every month-end window in one pass:
+    python scripts/refresh_rankings_cube.py --history-out rankings_history.jsonl
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import date, datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.global_t20_rankings import (
+    RANKINGS_WINDOW_MONTHS,
+    _add_months,
+    _month_end,
+    inline_weight_fits,
+    iter_monthly_rankings,
+)
+from services.rankings_cube import CUBE_MODES, rankings_cube_span, refresh_rankings_cube
+
+BOWL_KINDS = ("all", "pace", "spin")
+
+
+def get_engine(db_url):
+    if db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql://", 1)
+    return create_engine(db_url)
+
+
+def history_month_ends(first_month, last_month):
+    """Every month end whose trailing window lies inside the cube, oldest first."""
+    month_end = _month_end(_add_months(first_month, RANKINGS_WINDOW_MONTHS - 1))
+    last = _month_end(last_month)
+    month_ends = []
+    while month_end <= last:
+        month_ends.append(month_end)
+        month_end = _month_end(_add_months(month_end.replace(day=1), 1))
+    return month_ends
+
+
+def write_history(session, path):
+    span = rankings_cube_span(session)
+    if span is None:
+        print("Cube is empty; no history to write")
+        return 0
+
+    month_ends = history_month_ends(*span)
+    written = 0
+    with open(path, "w") as out, inline_weight_fits():
+        for mode in CUBE_MODES:
+            for start, end, bowl_kind, payload in iter_monthly_rankings(
+                session, mode, month_ends, bowl_kinds=BOWL_KINDS
+            ):
+                out.write(json.dumps({"mode": mode, **payload}) + "\n")
+                written += 1
+            print(f"  {mode}: {len(month_ends)} windows x {len(BOWL_KINDS)} bowl kinds")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the rankings_monthly_cells cube')
+    parser.add_argument('--db-url', help='Database URL (or set DATABASE_URL env var)')
+    parser.add_argument('--since', type=date.fromisoformat,
+                        help='Only re-derive months from this date on (YYYY-MM-DD)')
+    parser.add_argument('--history-out', help='Also write every month-end ranking to this JSON-lines file')
+    args = parser.parse_args()
+
+    db_url = args.db_url or os.environ.get('DATABASE_URL')
+    if not db_url:
+        print("ERROR: Database URL required. Use --db-url or set DATABASE_URL environment variable.")
+        sys.exit(1)
+
+    engine = get_engine(db_url)
+    db_display = db_url.split('@')[1] if '@' in db_url else 'localhost'
+    print(f"Connecting to: {db_display}")
+
+    start_time = datetime.now()
+    with engine.begin() as conn:
+        rows = refresh_rankings_cube(conn, since=args.since)
+
+    elapsed = (datetime.now() - start_time).total_seconds()
+    print(f"\n✓ rankings_monthly_cells refreshed with {rows:,} rows in {elapsed:.1f}s")
+
+    if args.history_out:
+        start_time = datetime.now()
+        session = sessionmaker(bind=engine)()
+        try:
+            written = write_history(session, args.history_out)
+        finally:
+            session.close()
+        elapsed = (datetime.now() - start_time).total_seconds()
+        print(f"✓ {written:,} rankings written to {args.history_out} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
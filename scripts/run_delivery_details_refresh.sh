@@ -105,3 +105,11 @@ if [[ "${dry_run}" == "true" ]]; then
 fi
 
 python scripts/load_delivery_details_pipeline.py "${pipeline_args[@]}"
+
+# The Parquet snapshot is read from local disk by the API, so this export only helps when
+# this script runs on the API host with DELIVERY_SNAPSHOT_DIR on persistent storage. The
+# API checks the export against Postgres and ignores it once it falls behind.
+if [[ "${dry_run}" != "true" ]] && python -c "import pyarrow" 2>/dev/null; then
+  echo "Exporting delivery_details Parquet snapshot..."
+  python scripts/export_delivery_snapshot.py
+fi
@@ -16,6 +16,7 @@ from collections import defaultdict
 from sqlalchemy import create_engine, text
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.player_aliases import refresh_alias_map
 
 
 def get_engine(db_url):
@@ -322,6 +323,8 @@ def update_players(engine, batters, bowlers, dry_run=False, gender="male"):
                 inserted += len(batch)
                 print(f"    Inserted {inserted:,}/{len(alias_inserts):,}...", end='\r')
             print(f"\n    ✓ Inserted aliases")
+            version = refresh_alias_map(conn)
+            print(f"    ✓ Refreshed player_alias_map (version {version})")
 
     print(f"\n✓ Batch updates complete")
 
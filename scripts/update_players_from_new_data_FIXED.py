@@ -18,6 +18,7 @@ from collections import defaultdict
 from sqlalchemy import create_engine, text
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.player_aliases import refresh_alias_map
 
 
 def get_engine(db_url):
@@ -215,7 +216,10 @@ def update_players(engine, batters, bowlers, dry_run=False):
             if updated % 500 == 0:
                 print(f"  Updated {updated:,}...", end='\r')
 
+        version = refresh_alias_map(conn)
+
     print(f"\n✓ Updated {updated:,} players, added {aliases_added:,} aliases")
+    print(f"✓ Refreshed player_alias_map (version {version})")
 
 
 def print_summary(engine):
@@ -0,0 +1,815 @@
+"""
+Shared bounded cache layer.
+
+Every expensive endpoint used to keep its own module-level dict with a TTL check on read.
+Those dicts never evicted anything that was not read again, so under sustained traffic each
+uvicorn worker grew without limit. This module replaces them with named caches that are:
+
+- bounded: LRU eviction by entry count and by an approximate byte budget per namespace
+- expiring: a default TTL per namespace, overridable per entry
+- observable: hit/miss/set/eviction/expiry counters, exposed through ``cache_stats()``
+- pluggable: entries live in process memory by default, or in a SQLite file / Redis-compatible
+  server shared by every worker on the box (``CACHE_BACKEND=memory|sqlite|redis``)
+- coalescing: ``get_or_compute`` runs one computation per key at a time (single-flight), so a
+  burst of identical cold requests costs one set of queries instead of one per request
+
+Callers get a cache once at import time and use it like a small mapping::
+
+    _preview_cache = get_cache("match_preview", ttl_seconds=1800, max_entries=256)
+    cached = _preview_cache.get(key)
+    ...
+    _preview_cache.set(key, result)
+
+    # or, coalescing concurrent misses on the same key:
+    result = _preview_cache.get_or_compute(key, lambda: build_preview(...))
+
+Per-namespace limits can be overridden without a deploy through
+``CACHE_<NAMESPACE>_MAX_ENTRIES`` / ``CACHE_<NAMESPACE>_MAX_BYTES`` / ``CACHE_<NAMESPACE>_TTL_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+try:
+    import redis
+except Exception:  # pragma: no cover - optional runtime dependency
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").strip().lower()
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "/tmp/cricket_cache.sqlite3")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "cdt")
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("CACHE_DEFAULT_MAX_ENTRIES", "512"))
+DEFAULT_MAX_BYTES = int(os.getenv("CACHE_DEFAULT_MAX_BYTES", str(64 * 1024 * 1024)))
+# A waiter gives up on a stuck leader after this long and computes for itself.
+SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "120"))
+
+_MISS = object()
+_EXPIRED = object()
+
+
+def _now() -> float:
+    return time.time()
+
+
+def _env_override(namespace: str, setting: str, default: Optional[int]) -> Optional[int]:
+    raw = os.getenv(f"CACHE_{namespace.upper()}_{setting}")
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Ignoring non-integer CACHE_%s_%s=%r", namespace.upper(), setting, raw)
+        return default
+
+
+def _key_repr(key: Hashable) -> str:
+    # Shared backends need a stable text form of tuple keys that may hold dates or None.
+    # repr() is stable for everything the call sites use (str, int, bool, date, tuples of those).
+    return repr(key)
+
+
+def _key_digest(key: Hashable) -> str:
+    return hashlib.sha1(_key_repr(key).encode("utf-8")).hexdigest()
+
+
+# Items measured per container when estimating the size of an in-memory value; the rest of
+# the container is extrapolated from them.
+_SIZE_SAMPLE = 8
+_SIZE_DEPTH = 4
+
+
+def _estimate_size(value: Any, depth: int = _SIZE_DEPTH) -> int:
+    """Approximate retained size of a live cached value in bytes.
+
+    Walks a few levels of nested dicts/lists, measuring the first ``_SIZE_SAMPLE`` items of each
+    container and extrapolating to its length, so the cost is bounded regardless of payload
+    size. Buffers that own their data (str, bytes, numpy arrays) report it through
+    ``sys.getsizeof``. Good enough for a byte budget; the shared backends use the exact
+    pickled length instead.
+    """
+    try:
+        size = sys.getsizeof(value)
+    except Exception:
+        return 0
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = value
+    else:
+        return size
+    count = len(items)
+    if not count:
+        return size
+    sampled = 0
+    measured = 0
+    for item in items:
+        if isinstance(value, dict):
+            measured += _estimate_size(item[0], depth - 1) + _estimate_size(item[1], depth - 1)
+        else:
+            measured += _estimate_size(item, depth - 1)
+        sampled += 1
+        if sampled >= _SIZE_SAMPLE:
+            break
+    return size + measured * count // sampled
+
+
+class CacheBackend:
+    """Storage for named caches. Implementations must be safe to call from several threads."""
+
+    name = "base"
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        """Return the stored value, ``_MISS`` or ``_EXPIRED``. A hit refreshes LRU order."""
+        raise NotImplementedError
+
+    def set(
+        self,
+        namespace: str,
+        key: Hashable,
+        value: Any,
+        expires_at: float,
+        max_entries: Optional[int],
+        max_bytes: Optional[int],
+    ) -> int:
+        """Store a value and enforce the namespace bounds. Returns how many entries were evicted."""
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: Hashable) -> bool:
+        raise NotImplementedError
+
+    def clear(self, namespace: str) -> int:
+        raise NotImplementedError
+
+    def keys(self, namespace: str, limit: Optional[int] = None) -> List[Any]:
+        raise NotImplementedError
+
+    def usage(self, namespace: str) -> Tuple[int, int]:
+        """Return ``(entries, approx_bytes)`` for a namespace."""
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU store. Values are kept as live objects, exactly like the old dicts.
+
+    Nothing is serialised: sizes are estimated from the live object, and expired entries are
+    dropped when read or when they reach the LRU head, never by scanning the namespace.
+    """
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        # namespace -> key -> (value, expires_at, size)
+        self._data: Dict[str, "OrderedDict[Hashable, Tuple[Any, float, int]]"] = {}
+        self._bytes: Dict[str, int] = {}
+
+    def _bucket(self, namespace: str) -> "OrderedDict[Hashable, Tuple[Any, float, int]]":
+        bucket = self._data.get(namespace)
+        if bucket is None:
+            bucket = OrderedDict()
+            self._data[namespace] = bucket
+            self._bytes[namespace] = 0
+        return bucket
+
+    def _drop(self, namespace: str, key: Hashable) -> None:
+        bucket = self._bucket(namespace)
+        entry = bucket.pop(key, None)
+        if entry is not None:
+            self._bytes[namespace] -= entry[2]
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        with self._lock:
+            bucket = self._bucket(namespace)
+            entry = bucket.get(key)
+            if entry is None:
+                return _MISS
+            value, expires_at, _ = entry
+            if _now() >= expires_at:
+                self._drop(namespace, key)
+                return _EXPIRED
+            bucket.move_to_end(key)
+            return value
+
+    def set(self, namespace, key, value, expires_at, max_entries, max_bytes) -> int:
+        size = _estimate_size(value)
+        with self._lock:
+            bucket = self._bucket(namespace)
+            self._drop(namespace, key)
+            bucket[key] = (value, expires_at, size)
+            self._bytes[namespace] += size
+            return self._enforce(namespace, max_entries, max_bytes)
+
+    def _enforce(self, namespace: str, max_entries: Optional[int], max_bytes: Optional[int]) -> int:
+        bucket = self._bucket(namespace)
+        evicted = 0
+        now = _now()
+        # Expired entries at the LRU head are free to drop and would otherwise hold budget
+        # until someone happened to read them; anything further in expires lazily on read.
+        while bucket:
+            oldest_key, (_, expires_at, _) = next(iter(bucket.items()))
+            if now < expires_at:
+                break
+            self._drop(namespace, oldest_key)
+            evicted += 1
+        # Always keep the newest entry, even if it alone is over the byte budget.
+        while len(bucket) > 1 and (
+            (max_entries is not None and len(bucket) > max_entries)
+            or (max_bytes is not None and self._bytes[namespace] > max_bytes)
+        ):
+            oldest_key = next(iter(bucket))
+            self._drop(namespace, oldest_key)
+            evicted += 1
+        return evicted
+
+    def delete(self, namespace: str, key: Hashable) -> bool:
+        with self._lock:
+            present = key in self._bucket(namespace)
+            self._drop(namespace, key)
+            return present
+
+    def clear(self, namespace: str) -> int:
+        with self._lock:
+            count = len(self._bucket(namespace))
+            self._data[namespace] = OrderedDict()
+            self._bytes[namespace] = 0
+            return count
+
+    def keys(self, namespace: str, limit: Optional[int] = None) -> List[Any]:
+        with self._lock:
+            keys = list(self._bucket(namespace).keys())
+        return keys if limit is None else keys[:limit]
+
+    def usage(self, namespace: str) -> Tuple[int, int]:
+        with self._lock:
+            return len(self._bucket(namespace)), self._bytes.get(namespace, 0)
+
+
+class SQLiteBackend(CacheBackend):
+    """File-backed store shared by every worker process on one host.
+
+    Values are pickled. Each thread gets its own connection; WAL mode lets readers in other
+    workers proceed while one of them writes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = CACHE_SQLITE_PATH) -> None:
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key_digest TEXT NOT NULL,
+                key_repr TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, key_digest)
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_entries_lru ON cache_entries(namespace, last_access)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        conn = self._conn()
+        digest = _key_digest(key)
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key_digest = ?",
+            (namespace, digest),
+        ).fetchone()
+        if row is None:
+            return _MISS
+        now = _now()
+        if now >= row[1]:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key_digest = ?",
+                (namespace, digest),
+            )
+            return _EXPIRED
+        conn.execute(
+            "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key_digest = ?",
+            (now, namespace, digest),
+        )
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            logger.warning("Dropping undecodable cache entry in namespace %s", namespace)
+            self.delete(namespace, key)
+            return _MISS
+
+    def set(self, namespace, key, value, expires_at, max_entries, max_bytes) -> int:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = _now()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO cache_entries
+                    (namespace, key_digest, key_repr, value, size, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (namespace, _key_digest(key), _key_repr(key), blob, len(blob), expires_at, now),
+            )
+            evicted = conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+                (namespace, now),
+            ).rowcount
+            evicted += self._enforce(conn, namespace, max_entries, max_bytes)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return evicted
+
+    def _enforce(self, conn, namespace, max_entries, max_bytes) -> int:
+        if max_entries is None and max_bytes is None:
+            return 0
+        rows = conn.execute(
+            "SELECT key_digest, size FROM cache_entries WHERE namespace = ? ORDER BY last_access DESC",
+            (namespace,),
+        ).fetchall()
+        kept = 0
+        kept_bytes = 0
+        doomed: List[str] = []
+        for digest, size in rows:
+            over_count = max_entries is not None and kept + 1 > max_entries
+            over_bytes = max_bytes is not None and kept_bytes + size > max_bytes
+            if kept > 0 and (over_count or over_bytes):
+                doomed.append(digest)
+                continue
+            kept += 1
+            kept_bytes += size
+        if doomed:
+            conn.executemany(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key_digest = ?",
+                [(namespace, digest) for digest in doomed],
+            )
+        return len(doomed)
+
+    def delete(self, namespace: str, key: Hashable) -> bool:
+        cur = self._conn().execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key_digest = ?",
+            (namespace, _key_digest(key)),
+        )
+        return cur.rowcount > 0
+
+    def clear(self, namespace: str) -> int:
+        cur = self._conn().execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+        return cur.rowcount
+
+    def keys(self, namespace: str, limit: Optional[int] = None) -> List[Any]:
+        sql = "SELECT key_repr FROM cache_entries WHERE namespace = ? ORDER BY last_access"
+        params: Tuple[Any, ...] = (namespace,)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (namespace, int(limit))
+        return [row[0] for row in self._conn().execute(sql, params).fetchall()]
+
+    def usage(self, namespace: str) -> Tuple[int, int]:
+        row = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+            (namespace,),
+        ).fetchone()
+        return int(row[0]), int(row[1])
+
+
+class RedisBackend(CacheBackend):
+    """Store shared across hosts through any Redis-compatible server.
+
+    Expiry is delegated to the server (``PX``). LRU order per namespace lives in a sorted set
+    scored by last access, and entry sizes in a hash, so the namespace budget is enforced here
+    rather than relying on a server-wide ``maxmemory-policy``.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = CACHE_REDIS_URL, prefix: str = CACHE_KEY_PREFIX) -> None:
+        if redis is None:
+            raise RuntimeError("redis package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self.client.ping()
+        self.prefix = prefix
+
+    def _k(self, namespace: str, suffix: str) -> str:
+        return f"{self.prefix}:{namespace}:{suffix}"
+
+    def _forget(self, namespace: str, digests: List[str]) -> None:
+        if not digests:
+            return
+        pipe = self.client.pipeline()
+        pipe.delete(*[self._k(namespace, d) for d in digests])
+        pipe.zrem(self._k(namespace, "__lru"), *digests)
+        pipe.hdel(self._k(namespace, "__sizes"), *digests)
+        pipe.hdel(self._k(namespace, "__keys"), *digests)
+        pipe.execute()
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        digest = _key_digest(key)
+        blob = self.client.get(self._k(namespace, digest))
+        if blob is None:
+            # Either never stored or expired server-side; tidy the bookkeeping either way.
+            if self.client.zscore(self._k(namespace, "__lru"), digest) is not None:
+                self._forget(namespace, [digest])
+                return _EXPIRED
+            return _MISS
+        self.client.zadd(self._k(namespace, "__lru"), {digest: _now()})
+        try:
+            return pickle.loads(blob)
+        except Exception:
+            logger.warning("Dropping undecodable cache entry in namespace %s", namespace)
+            self._forget(namespace, [digest])
+            return _MISS
+
+    def set(self, namespace, key, value, expires_at, max_entries, max_bytes) -> int:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = _key_digest(key)
+        ttl_ms = max(1, int((expires_at - _now()) * 1000))
+        pipe = self.client.pipeline()
+        pipe.set(self._k(namespace, digest), blob, px=ttl_ms)
+        pipe.zadd(self._k(namespace, "__lru"), {digest: _now()})
+        pipe.hset(self._k(namespace, "__sizes"), digest, len(blob))
+        pipe.hset(self._k(namespace, "__keys"), digest, _key_repr(key))
+        pipe.execute()
+        return self._enforce(namespace, max_entries, max_bytes)
+
+    def _enforce(self, namespace, max_entries, max_bytes) -> int:
+        if max_entries is None and max_bytes is None:
+            return 0
+        ordered = [d.decode() if isinstance(d, bytes) else d for d in self.client.zrevrange(self._k(namespace, "__lru"), 0, -1)]
+        sizes = self.client.hgetall(self._k(namespace, "__sizes"))
+        sizes = {(k.decode() if isinstance(k, bytes) else k): int(v) for k, v in sizes.items()}
+        kept = 0
+        kept_bytes = 0
+        doomed: List[str] = []
+        for digest in ordered:
+            size = sizes.get(digest, 0)
+            over_count = max_entries is not None and kept + 1 > max_entries
+            over_bytes = max_bytes is not None and kept_bytes + size > max_bytes
+            if kept > 0 and (over_count or over_bytes):
+                doomed.append(digest)
+                continue
+            kept += 1
+            kept_bytes += size
+        self._forget(namespace, doomed)
+        return len(doomed)
+
+    def delete(self, namespace: str, key: Hashable) -> bool:
+        digest = _key_digest(key)
+        present = bool(self.client.exists(self._k(namespace, digest)))
+        self._forget(namespace, [digest])
+        return present
+
+    def clear(self, namespace: str) -> int:
+        digests = [d.decode() if isinstance(d, bytes) else d for d in self.client.zrange(self._k(namespace, "__lru"), 0, -1)]
+        self._forget(namespace, digests)
+        return len(digests)
+
+    def keys(self, namespace: str, limit: Optional[int] = None) -> List[Any]:
+        stop = -1 if limit is None else max(0, int(limit) - 1)
+        digests = self.client.zrange(self._k(namespace, "__lru"), 0, stop)
+        if not digests:
+            return []
+        reprs = self.client.hmget(self._k(namespace, "__keys"), digests)
+        return [r.decode() if isinstance(r, bytes) else r for r in reprs if r is not None]
+
+    def usage(self, namespace: str) -> Tuple[int, int]:
+        entries = int(self.client.zcard(self._k(namespace, "__lru")))
+        total = sum(int(v) for v in self.client.hvals(self._k(namespace, "__sizes")))
+        return entries, total
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers that arrive while it is
+    running block until it finishes and receive the same result, or the same exception. Nothing
+    is remembered once the leader returns -- pair it with a cache for that.
+
+    Coalescing is per process. Endpoints here are sync and run on the threadpool, so waiting
+    blocks a worker thread but, crucially, not a database connection: sessions only check a
+    connection out of the pool on their first query.
+    """
+
+    def __init__(self, name: str, wait_timeout: Optional[float] = SINGLE_FLIGHT_WAIT_SECONDS) -> None:
+        self.name = name
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._counters = {"flights": 0, "coalesced": 0, "wait_timeouts": 0, "failed_flights": 0, "max_waiters": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self._counters["flights"] += 1
+            else:
+                flight.waiters += 1
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            if not flight.done.wait(self.wait_timeout):
+                with self._lock:
+                    self._counters["wait_timeouts"] += 1
+                logger.warning("Single-flight wait timed out for %s; computing independently", self.name)
+                return fn()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            with self._lock:
+                self._counters["failed_flights"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                self._counters["max_waiters"] = max(self._counters["max_waiters"], flight.waiters)
+            flight.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "in_flight": len(self._flights)}
+
+
+class TTLCache:
+    """A named, bounded LRU+TTL cache living in the configured backend.
+
+    Counters are per process: with a shared backend, each worker reports its own hit rate
+    against the shared entries.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        backend: CacheBackend,
+        ttl_seconds: float,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expirations": 0, "errors": 0}
+        self.flight = SingleFlight(namespace)
+
+    def _bump(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value = self.backend.get(self.namespace, key)
+        except Exception as exc:
+            # A cache outage must never fail the request; treat it as a miss.
+            logger.warning("Cache get failed for namespace %s: %s", self.namespace, exc)
+            self._bump("errors")
+            value = _MISS
+        if value is _EXPIRED:
+            self._bump("expirations")
+            self._bump("misses")
+            return default
+        if value is _MISS:
+            self._bump("misses")
+            return default
+        self._bump("hits")
+        return value
+
+    def _peek(self, key: Hashable) -> Any:
+        try:
+            value = self.backend.get(self.namespace, key)
+        except Exception:
+            return None
+        return None if value is _MISS or value is _EXPIRED else value
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        ttl_seconds: Optional[float] = None,
+        refresh: bool = False,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Return the cached value for ``key``, computing it at most once across concurrent callers.
+
+        ``refresh`` skips the lookup but still coalesces, so a burst of forced refreshes runs one
+        recomputation. ``cache_if`` decides whether a computed value is stored (default: anything
+        but ``None``); use it to keep "not found" payloads out of the cache.
+        """
+        if not refresh:
+            value = self.get(key)
+            if value is not None:
+                return value
+        return self.fill(key, compute, ttl_seconds=ttl_seconds, refresh=refresh, cache_if=cache_if)
+
+    def fill(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        ttl_seconds: Optional[float] = None,
+        refresh: bool = False,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """The miss half of ``get_or_compute``, for callers that already did their own lookup."""
+
+        def _lead() -> Any:
+            # Another leader may have filled the key between our miss and taking the flight.
+            if not refresh:
+                value = self._peek(key)
+                if value is not None:
+                    return value
+            value = compute()
+            should_cache = cache_if(value) if cache_if is not None else value is not None
+            if should_cache:
+                self.set(key, value, ttl_seconds)
+            return value
+
+        return self.flight.do(key, _lead)
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        try:
+            evicted = self.backend.set(
+                self.namespace,
+                key,
+                value,
+                _now() + ttl,
+                self.max_entries,
+                self.max_bytes,
+            )
+        except Exception as exc:
+            logger.warning("Cache set failed for namespace %s: %s", self.namespace, exc)
+            self._bump("errors")
+            return
+        self._bump("sets")
+        if evicted:
+            self._bump("evictions", evicted)
+
+    def pop(self, key: Hashable) -> bool:
+        try:
+            return self.backend.delete(self.namespace, key)
+        except Exception as exc:
+            logger.warning("Cache delete failed for namespace %s: %s", self.namespace, exc)
+            self._bump("errors")
+            return False
+
+    def clear(self) -> int:
+        try:
+            return self.backend.clear(self.namespace)
+        except Exception as exc:
+            logger.warning("Cache clear failed for namespace %s: %s", self.namespace, exc)
+            self._bump("errors")
+            return 0
+
+    def keys(self, limit: Optional[int] = None) -> List[Any]:
+        try:
+            return self.backend.keys(self.namespace, limit)
+        except Exception:
+            return []
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISS) is not _MISS
+
+    def __len__(self) -> int:
+        try:
+            return self.backend.usage(self.namespace)[0]
+        except Exception:
+            return 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        try:
+            entries, approx_bytes = self.backend.usage(self.namespace)
+        except Exception:
+            entries, approx_bytes = None, None
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "namespace": self.namespace,
+            "backend": self.backend.name,
+            "entries": entries,
+            "approx_bytes": approx_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else None,
+            **counters,
+            "single_flight": self.flight.stats(),
+        }
+
+
+_registry_lock = threading.Lock()
+_registry: Dict[str, TTLCache] = {}
+_backend: Optional[CacheBackend] = None
+
+
+def _build_backend(kind: str) -> CacheBackend:
+    if kind == "sqlite":
+        try:
+            return SQLiteBackend(CACHE_SQLITE_PATH)
+        except Exception as exc:
+            logger.warning("SQLite cache backend unavailable (%s); using in-process memory", exc)
+    elif kind == "redis":
+        try:
+            return RedisBackend(CACHE_REDIS_URL)
+        except Exception as exc:
+            logger.warning("Redis cache backend unavailable (%s); using in-process memory", exc)
+    elif kind != "memory":
+        logger.warning("Unknown CACHE_BACKEND=%r; using in-process memory", kind)
+    return MemoryBackend()
+
+
+def get_backend() -> CacheBackend:
+    global _backend
+    with _registry_lock:
+        if _backend is None:
+            _backend = _build_backend(CACHE_BACKEND)
+        return _backend
+
+
+def get_cache(
+    namespace: str,
+    *,
+    ttl_seconds: float,
+    max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+    max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    backend: Optional[CacheBackend] = None,
+) -> TTLCache:
+    """Return the cache for ``namespace``, creating it on first use.
+
+    ``backend`` pins a namespace to a specific store; by default every namespace shares the
+    process-wide backend chosen by ``CACHE_BACKEND``.
+    """
+    with _registry_lock:
+        existing = _registry.get(namespace)
+        if existing is not None:
+            return existing
+    cache = TTLCache(
+        namespace,
+        backend or get_backend(),
+        ttl_seconds=_env_override(namespace, "TTL_SECONDS", ttl_seconds),
+        max_entries=_env_override(namespace, "MAX_ENTRIES", max_entries),
+        max_bytes=_env_override(namespace, "MAX_BYTES", max_bytes),
+    )
+    with _registry_lock:
+        return _registry.setdefault(namespace, cache)
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters and usage for every registered namespace."""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.namespace: cache.stats() for cache in sorted(caches, key=lambda c: c.namespace)}
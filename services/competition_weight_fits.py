@@ -0,0 +1,171 @@
+"""
+competition_weight_fits: fitted cross-league competition weights, one row per window and data version.
+
+Fitting the weights (statsmodels MixedLM, centred WLS fallback) is the slowest step of a cold
+rankings build, and the result used to live only in a process-local TTL cache, so every
+restart and every new window paid for it again. Fits are now stored:
+
+    window_start, window_end   the rankings window the weights were fitted on
+    data_version               version of the men's T20 data the fit saw (see ``current_data_version``)
+    weights, source, cross_league_samples
+                               the payload ``_get_competition_weights`` returns
+    model_params               MixedLM fixed effects and group variance, used to warm-start
+                               the next fit of a nearby window
+    fitted_at
+
+Request handlers only read this table. Missing fits are fitted by a background worker
+(services.global_t20_rankings) or ahead of time after each ingestion, which also prunes
+each window to its KEEP_VERSIONS_PER_WINDOW latest fits:
+
+    python scripts/refit_competition_weights.py
+"""
+
+import json
+from datetime import date
+from typing import Any, Dict, Optional
+
+from sqlalchemy.sql import text
+
+from services.data_versions import data_versions
+from services.rankings_cube import CUBE_TABLE
+
+FITS_TABLE = "competition_weight_fits"
+# Data versions kept per window; older fits are only ever read as warm starts
+KEEP_VERSIONS_PER_WINDOW = 3
+
+
+def ensure_weight_fits(conn) -> None:
+    """Create the fits table if it does not exist yet."""
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {FITS_TABLE} (
+            window_start DATE NOT NULL,
+            window_end DATE NOT NULL,
+            data_version VARCHAR NOT NULL,
+            weights JSONB NOT NULL,
+            source VARCHAR NOT NULL,
+            cross_league_samples INTEGER NOT NULL DEFAULT 0,
+            model_params JSONB,
+            fitted_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (window_start, window_end, data_version)
+        )
+    """))
+    conn.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS idx_{FITS_TABLE}_version_window
+        ON {FITS_TABLE} (data_version, window_start, window_end)
+    """))
+
+
+def weight_fits_available(db) -> bool:
+    """Whether the fits table exists (reads must not abort the caller's transaction)."""
+    return bool(db.execute(
+        text("SELECT to_regclass(CAST(:table AS TEXT)) IS NOT NULL"), {"table": FITS_TABLE}
+    ).scalar())
+
+
+def current_data_version(db) -> str:
+    """
+    Version of the data the weights are fitted on: "<highest men's T20 delivery_details
+    id>.<rankings cube refresh counter>".
+
+    Both are scoped to the men's T20 slice the weights are fitted on. Loading or backfilling
+    another format (the ODI leg of the nightly refresh runs after the refit) moves neither,
+    so the fits stored by the refit stay current. The id moves with every men's T20 load; the
+    cube counter moves with every refresh_rankings_cube, which the pipeline runs after the
+    men's T20 load and backfill.
+    """
+    max_id = db.execute(text(
+        "SELECT COALESCE(MAX(id), 0) FROM delivery_details WHERE format = 'T20' AND gender = 'male'"
+    )).scalar()
+    return f"{max_id}.{data_versions(db, (CUBE_TABLE,))[CUBE_TABLE]}"
+
+
+def _decode(value: Any) -> Any:
+    # psycopg2 returns JSONB decoded; other drivers may hand back the text
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _fit_from_row(row) -> Dict[str, Any]:
+    r = row._mapping
+    return {
+        "weights": _decode(r["weights"]),
+        "source": r["source"],
+        "cross_league_samples": int(r["cross_league_samples"] or 0),
+        "model_params": _decode(r["model_params"]),
+        "window_start": r["window_start"],
+        "window_end": r["window_end"],
+        "data_version": r["data_version"],
+    }
+
+
+def load_weight_fit(db, start: date, end: date, data_version: str) -> Optional[Dict[str, Any]]:
+    """The stored fit of exactly this window and data version, or None."""
+    row = db.execute(text(f"""
+        SELECT * FROM {FITS_TABLE}
+        WHERE window_start = :start AND window_end = :end AND data_version = :version
+    """), {"start": start, "end": end, "version": data_version}).fetchone()
+    return _fit_from_row(row) if row is not None else None
+
+
+def nearest_weight_fit(db, start: date, end: date, data_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    The stored fit closest to this window: the smallest total distance between window edges,
+    then the same data version, then the most recent fit. Right after an ingestion that is
+    the same window's fit on the previous data, which barely differs.
+    """
+    row = db.execute(text(f"""
+        SELECT * FROM {FITS_TABLE}
+        ORDER BY
+            ABS(window_start - CAST(:start AS DATE)) + ABS(window_end - CAST(:end AS DATE)),
+            (data_version = CAST(:version AS VARCHAR)) IS TRUE DESC,
+            fitted_at DESC
+        LIMIT 1
+    """), {"start": start, "end": end, "version": data_version}).fetchone()
+    return _fit_from_row(row) if row is not None else None
+
+
+def save_weight_fit(db, start: date, end: date, data_version: str, payload: Dict[str, Any],
+                    model_params: Optional[Dict[str, float]] = None) -> None:
+    """Store (or replace) the fit of a window and data version (no commit)."""
+    ensure_weight_fits(db)
+    db.execute(text(f"""
+        INSERT INTO {FITS_TABLE} (
+            window_start, window_end, data_version, weights, source, cross_league_samples,
+            model_params, fitted_at
+        )
+        VALUES (
+            :start, :end, :version, CAST(:weights AS JSONB), :source, :samples,
+            CAST(:model_params AS JSONB), NOW()
+        )
+        ON CONFLICT (window_start, window_end, data_version) DO UPDATE SET
+            weights = EXCLUDED.weights,
+            source = EXCLUDED.source,
+            cross_league_samples = EXCLUDED.cross_league_samples,
+            model_params = EXCLUDED.model_params,
+            fitted_at = EXCLUDED.fitted_at
+    """), {
+        "start": start,
+        "end": end,
+        "version": data_version,
+        "weights": json.dumps(payload["weights"]),
+        "source": payload["source"],
+        "samples": int(payload.get("cross_league_samples", 0)),
+        "model_params": json.dumps(model_params) if model_params is not None else None,
+    })
+
+
+def prune_weight_fits(db, keep: int = KEEP_VERSIONS_PER_WINDOW) -> int:
+    """Delete all but the ``keep`` most recent fits of each window (no commit); returns how many."""
+    result = db.execute(text(f"""
+        DELETE FROM {FITS_TABLE} f
+        USING (
+            SELECT
+                window_start, window_end, data_version,
+                ROW_NUMBER() OVER (PARTITION BY window_start, window_end ORDER BY fitted_at DESC) AS recency
+            FROM {FITS_TABLE}
+        ) ranked
+        WHERE f.window_start = ranked.window_start
+          AND f.window_end = ranked.window_end
+          AND f.data_version = ranked.data_version
+          AND ranked.recency > :keep
+    """), {"keep": keep})
+    return result.rowcount or 0
@@ -0,0 +1,126 @@
+"""
+data_versions: a write counter per source table, bumped by statement-level triggers.
+
+Persisted derived data (doppelganger / venue matrices, competition weight fits, the ML
+feature store) used to be keyed on MAX(id) or row counts of the tables they read. Those only
+move when rows are appended; the backfill scripts correct rows in place (bowler types,
+crease combos, bat_hand / line / length ...) with ``UPDATE deliveries`` / ``UPDATE
+delivery_details``, so derived data built before a correction was served indefinitely.
+
+``ensure_data_versions`` installs a trigger on each table in TRACKED_TABLES that bumps
+
+    data_versions(table_name, version, updated_at)
+
+after every INSERT / UPDATE / DELETE / TRUNCATE statement, including COPY loads and ad-hoc
+scripts that know nothing about derived data. The bump is part of the writing transaction,
+so readers see the new version together with the rows it describes. Fingerprints combine it
+with the old MAX(id) markers, so an install without the triggers keeps the append-only
+behaviour. The delivery_details pipeline calls ``ensure_data_versions`` on every run, which
+only creates triggers that are missing (a no-op once installed); once by hand:
+
+    python scripts/install_data_versions.py
+"""
+
+import logging
+from typing import Dict, Iterable, Set
+
+from sqlalchemy.sql import text
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSIONS_TABLE = "data_versions"
+TRACKED_TABLES = ("deliveries", "delivery_details", "matches", "batting_stats", "bowling_stats")
+
+_TRIGGER_NAME = "trg_bump_data_version"
+_missing_logged = False
+
+
+def _ensure_table(conn) -> None:
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {DATA_VERSIONS_TABLE} (
+            table_name VARCHAR PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """))
+
+
+def bump_data_version(conn, name: str) -> None:
+    """
+    Bump the counter of ``name`` by hand (no commit). For derived tables rebuilt by one job,
+    such as the rankings cube, whose rebuild is itself the version readers key on.
+    """
+    _ensure_table(conn)
+    conn.execute(text(f"""
+        INSERT INTO {DATA_VERSIONS_TABLE} (table_name, version, updated_at)
+        VALUES (:name, 1, NOW())
+        ON CONFLICT (table_name) DO UPDATE SET
+            version = {DATA_VERSIONS_TABLE}.version + 1,
+            updated_at = NOW()
+    """), {"name": name})
+
+
+def _tables_with_trigger(conn) -> Set[str]:
+    rows = conn.execute(text("""
+        SELECT c.relname
+        FROM pg_trigger t
+        JOIN pg_class c ON c.oid = t.tgrelid
+        WHERE t.tgname = :name AND c.relname = ANY(:tables)
+    """), {"name": _TRIGGER_NAME, "tables": list(TRACKED_TABLES)}).fetchall()
+    return {row[0] for row in rows}
+
+
+def ensure_data_versions(conn) -> None:
+    """
+    Create the counter table and install the bump trigger on each tracked table that lacks it.
+
+    Installed triggers are left alone: dropping and recreating them would take an ACCESS
+    EXCLUSIVE lock on every hot table until commit, queueing all reads behind it.
+    """
+    _ensure_table(conn)
+    existing = _tables_with_trigger(conn)
+    missing = [table for table in TRACKED_TABLES if table not in existing]
+    if not missing:
+        return
+    conn.execute(text(f"""
+        CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO {DATA_VERSIONS_TABLE} (table_name, version, updated_at)
+            VALUES (TG_TABLE_NAME, 1, NOW())
+            ON CONFLICT (table_name) DO UPDATE SET
+                version = {DATA_VERSIONS_TABLE}.version + 1,
+                updated_at = NOW();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """))
+    for table in missing:
+        conn.execute(text(f"""
+            CREATE TRIGGER {_TRIGGER_NAME}
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE PROCEDURE bump_data_version()
+        """))
+
+
+def data_versions(db, tables: Iterable[str]) -> Dict[str, int]:
+    """Current write counter of each table; 0 for tables never written since the install."""
+    global _missing_logged
+    versions = {table: 0 for table in tables}
+    installed = db.execute(
+        text("SELECT to_regclass(CAST(:table AS TEXT)) IS NOT NULL"), {"table": DATA_VERSIONS_TABLE}
+    ).scalar()
+    if not installed:
+        if not _missing_logged:
+            logger.warning(
+                f"{DATA_VERSIONS_TABLE} is not installed; in-place corrections will not invalidate "
+                "derived data (run scripts/install_data_versions.py)"
+            )
+            _missing_logged = True
+        return versions
+    rows = db.execute(text(f"""
+        SELECT table_name, version FROM {DATA_VERSIONS_TABLE}
+        WHERE table_name = ANY(:tables)
+    """), {"tables": list(versions)}).fetchall()
+    for row in rows:
+        versions[row.table_name] = int(row.version)
+    return versions
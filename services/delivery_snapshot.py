@@ -0,0 +1,452 @@
+"""
+Columnar snapshots of delivery_details.
+
+Heavy analytical reads (population baselines, league-wide aggregates) scan most of the
+delivery_details table. Running them against a Parquet snapshot keeps those scans off the
+transactional database:
+
+    python scripts/export_delivery_snapshot.py            # after each delivery_details refresh
+
+The exporter writes a Hive-partitioned dataset (year=/competition=) into a new versioned
+directory, then atomically repoints ``<root>/CURRENT`` at it. String columns such as bat, bowl
+and ground are stored dictionary-encoded, so they load as small integer codes plus one copy of
+each distinct name.
+
+Readers call ``get_snapshot()``. It returns None when pyarrow is not installed, snapshots are
+disabled, or nothing has been exported yet; callers then keep using Postgres. Before using a
+snapshot they check ``DeliverySnapshot.is_fresh(db)``: the manifest records the highest
+delivery id and the delivery_details write counter (services.data_versions) at export time, so
+both new loads and in-place backfills make an export stale. Files are memory-mapped, so a
+snapshot costs page cache rather than process heap.
+
+The snapshot is read from local disk, so the export has to run on the host that serves the
+API, with DELIVERY_SNAPSHOT_DIR on storage that outlives a restart. The nightly GitHub
+workflow does not export one: its runner's disk is discarded when the job ends. Where no
+fresh export exists, every reader stays on Postgres.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import secrets
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import text
+
+from services.data_versions import data_versions
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import fs as pafs
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    ds = None
+    pafs = None
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_SNAPSHOT_ENABLED = os.getenv("DELIVERY_SNAPSHOT_ENABLED", "true").lower() in {"1", "true", "yes"}
+DELIVERY_SNAPSHOT_DIR = os.getenv(
+    "DELIVERY_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "delivery_snapshot"),
+)
+# How often readers look at CURRENT for a newer export
+SNAPSHOT_RECHECK_SECONDS = float(os.getenv("DELIVERY_SNAPSHOT_RECHECK_SECONDS", "30"))
+# Exports kept on disk, including the current one (readers may still hold the previous one)
+SNAPSHOTS_TO_KEEP = int(os.getenv("DELIVERY_SNAPSHOT_KEEP", "2"))
+
+PARTITION_COLUMNS = ("year", "competition")
+
+# Low-cardinality / heavily repeated strings stored as dictionary<int32, string>
+DICTIONARY_COLUMNS = {
+    "p_match", "bat", "bowl", "non_striker", "team_bat", "team_bowl", "ground", "country",
+    "winner", "toss", "bat_hand", "bowl_style", "bowl_kind", "outcome", "dismissal", "out",
+    "line", "length", "shot", "format", "gender", "tournament", "season", "daynight",
+    "trophy_name", "bat_out",
+}
+
+# information_schema data_type -> Arrow type
+_PG_TO_ARROW = {
+    "smallint": "int16",
+    "integer": "int32",
+    "bigint": "int64",
+    "real": "float32",
+    "double precision": "float64",
+    "numeric": "float64",
+    "boolean": "bool_",
+    "date": "date32",
+    "character varying": "string",
+    "text": "string",
+    "character": "string",
+}
+
+# Stored as VARCHAR in delivery_details; exported as a real date so range filters work
+DATE_COLUMNS = {"match_date"}
+
+# Small tables the analytical queries join against, written whole next to the deliveries
+# under _tables/ (the leading underscore keeps them out of the partitioned dataset).
+SIDE_TABLES = ("matches", "player_aliases")
+SIDE_TABLES_DIR = "_tables"
+
+
+def is_available() -> bool:
+    """True if pyarrow is importable (an export may still be missing)."""
+    return pa is not None
+
+
+def new_snapshot_id() -> str:
+    """
+    Directory name for a new build: UTC timestamp (to the microsecond) plus pid and a random
+    suffix.
+
+    Two builds started in the same second get different ids; ids still sort by start time,
+    which ``_prune`` relies on.
+    """
+    return f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S.%f')}-{os.getpid()}-{secrets.token_hex(3)}"
+
+
+def _arrow_type(name: str, pg_type: str):
+    if name in DATE_COLUMNS:
+        return pa.date32()
+    if name in DICTIONARY_COLUMNS and name not in PARTITION_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    return getattr(pa, _PG_TO_ARROW.get(pg_type, "string"))()
+
+
+def _table_columns(conn) -> List[Dict[str, str]]:
+    rows = conn.execute(text("""
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_name = 'delivery_details'
+        ORDER BY ordinal_position
+    """)).fetchall()
+    return [{"name": row.column_name, "pg_type": row.data_type} for row in rows]
+
+
+def _select_sql(columns: List[Dict[str, str]]) -> str:
+    parts = []
+    for col in columns:
+        name = col["name"]
+        if name in DATE_COLUMNS:
+            parts.append(f"NULLIF(dd.{name}, '')::date AS {name}")
+        else:
+            parts.append(f'dd."{name}"')
+    return f"SELECT {', '.join(parts)} FROM delivery_details dd WHERE dd.year = :year ORDER BY dd.id"
+
+
+def _record_batches(engine, select_sql: str, years: Sequence[int], schema,
+                    chunk_size: int, counters: Dict[str, int]) -> Iterator[Any]:
+    names = schema.names
+    for year in years:
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(text(select_sql), {"year": year})
+            while True:
+                rows = result.fetchmany(chunk_size)
+                if not rows:
+                    break
+                columns = list(zip(*rows))
+                arrays = [
+                    pa.array(list(values), type=schema.field(name).type)
+                    if not pa.types.is_dictionary(schema.field(name).type)
+                    else pa.array(list(values), type=pa.string()).dictionary_encode()
+                    for name, values in zip(names, columns)
+                ]
+                counters["rows"] += len(rows)
+                yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+        logger.info(f"Exported delivery_details year {year}: {counters['rows']} rows so far")
+
+
+def export_delivery_details(engine, root: str = DELIVERY_SNAPSHOT_DIR,
+                            years: Optional[Iterable[int]] = None,
+                            chunk_size: int = 100_000) -> Dict[str, Any]:
+    """
+    Export delivery_details to a new Parquet snapshot under ``root`` and make it current.
+
+    An export restricted by ``years`` that misses any year present in Postgres is written
+    under ``snapshots/`` but not made current: readers would otherwise answer every query
+    from a subset of the table.
+
+    Args:
+        engine: SQLAlchemy engine for the source database
+        root: Snapshot root directory
+        years: Restrict the export to these years (default: every year present)
+        chunk_size: Rows fetched per round trip / written per record batch
+
+    Returns:
+        The snapshot manifest
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is required to export delivery_details snapshots")
+
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        columns = _table_columns(conn)
+        if not columns:
+            raise RuntimeError("delivery_details table not found")
+        source_years = [row.year for row in conn.execute(text(
+            "SELECT DISTINCT year FROM delivery_details WHERE year IS NOT NULL ORDER BY year"
+        ))]
+        source = source_markers(conn)
+
+    years = sorted(source_years if years is None else years)
+    complete = set(source_years) <= set(years)
+    schema = pa.schema([(col["name"], _arrow_type(col["name"], col["pg_type"])) for col in columns])
+    snapshot_id = new_snapshot_id()
+    target = os.path.join(root, "snapshots", snapshot_id)
+    os.makedirs(target, exist_ok=False)
+
+    counters = {"rows": 0}
+    try:
+        ds.write_dataset(
+            _record_batches(engine, _select_sql(columns), years, schema, chunk_size, counters),
+            target,
+            schema=schema,
+            format="parquet",
+            partitioning=ds.partitioning(
+                pa.schema([(name, schema.field(name).type) for name in PARTITION_COLUMNS]), flavor="hive"
+            ),
+            file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+            max_rows_per_group=chunk_size,
+            existing_data_behavior="error",
+        )
+    except Exception:
+        shutil.rmtree(target, ignore_errors=True)
+        raise
+
+    try:
+        for name in SIDE_TABLES:
+            _export_side_table(engine, name, os.path.join(target, SIDE_TABLES_DIR))
+    except Exception:
+        shutil.rmtree(target, ignore_errors=True)
+        raise
+
+    manifest = {
+        "snapshot_id": snapshot_id,
+        "created_at": datetime.utcnow().isoformat(),
+        "row_count": counters["rows"],
+        "max_delivery_id": source["max_delivery_id"],
+        "delivery_details_version": source["delivery_details_version"],
+        "years": years,
+        "complete": complete,
+        "partitioning": list(PARTITION_COLUMNS),
+        "side_tables": list(SIDE_TABLES),
+        "columns": {field.name: str(field.type) for field in schema},
+        "export_seconds": round(time.perf_counter() - started, 1),
+    }
+    with open(os.path.join(target, "_manifest.json"), "w") as fh:
+        json.dump(manifest, fh, indent=2)
+
+    if not complete:
+        logger.warning(f"delivery_details snapshot {snapshot_id} covers only years {years}; not publishing it")
+        return manifest
+    _publish(root, snapshot_id)
+    _prune(root, keep=SNAPSHOTS_TO_KEEP)
+    logger.info(f"delivery_details snapshot {snapshot_id}: {counters['rows']} rows in {manifest['export_seconds']}s")
+    return manifest
+
+
+def source_markers(db) -> Dict[str, Any]:
+    """Highest delivery_details id and its write counter; an export records both."""
+    return {
+        "max_delivery_id": db.execute(text("SELECT MAX(id) FROM delivery_details")).scalar(),
+        "delivery_details_version": data_versions(db, ("delivery_details",))["delivery_details"],
+    }
+
+
+def is_current(manifest: Dict[str, Any], db) -> bool:
+    """True if the export described by ``manifest`` still matches delivery_details in Postgres."""
+    if not manifest.get("complete"):
+        # A --years export (or one from before the flag existed) holds only part of the table
+        return False
+    source = source_markers(db)
+    exported_max_id = manifest.get("max_delivery_id")
+    if source["max_delivery_id"] is None or exported_max_id is None:
+        return False
+    return (
+        source["max_delivery_id"] <= exported_max_id
+        and manifest.get("delivery_details_version") == source["delivery_details_version"]
+    )
+
+
+def _export_side_table(engine, name: str, directory: str) -> None:
+    """Write a whole (small) table as one Parquet file; JSON columns are stored as text."""
+    import pyarrow.parquet as pq
+
+    with engine.connect() as conn:
+        rows = [dict(row._mapping) for row in conn.execute(text(f"SELECT * FROM {name}"))]
+    for row in rows:
+        for key, value in row.items():
+            if isinstance(value, (dict, list)):
+                row[key] = json.dumps(value)
+    os.makedirs(directory, exist_ok=True)
+    pq.write_table(pa.Table.from_pylist(rows), os.path.join(directory, f"{name}.parquet"), compression="zstd")
+
+
+def _publish(root: str, snapshot_id: str) -> None:
+    pointer = os.path.join(root, "CURRENT")
+    tmp = f"{pointer}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        fh.write(snapshot_id)
+    os.replace(tmp, pointer)
+
+
+def _prune(root: str, keep: int) -> None:
+    snapshots_dir = os.path.join(root, "snapshots")
+    existing = sorted(os.listdir(snapshots_dir))
+    try:
+        with open(os.path.join(root, "CURRENT")) as fh:
+            current = fh.read().strip()
+    except FileNotFoundError:
+        current = None
+    for old in existing[:-keep] if keep > 0 else []:
+        if old == current:
+            continue
+        shutil.rmtree(os.path.join(snapshots_dir, old), ignore_errors=True)
+
+
+class DeliverySnapshot:
+    """Read side of one exported snapshot: a memory-mapped, partition-pruned Arrow dataset."""
+
+    def __init__(self, path: str):
+        if pa is None:
+            raise RuntimeError("pyarrow is required to read delivery_details snapshots")
+        self.path = path
+        with open(os.path.join(path, "_manifest.json")) as fh:
+            self.manifest = json.load(fh)
+        self.snapshot_id = self.manifest["snapshot_id"]
+        self.dataset = ds.dataset(
+            path,
+            format="parquet",
+            partitioning="hive",
+            filesystem=pafs.LocalFileSystem(use_mmap=True),
+        )
+        self._fresh = False
+        self._fresh_checked_at = 0.0
+
+    def is_fresh(self, db) -> bool:
+        """True if this export still matches Postgres (checked every SNAPSHOT_RECHECK_SECONDS)."""
+        if time.monotonic() - self._fresh_checked_at < SNAPSHOT_RECHECK_SECONDS:
+            return self._fresh
+        try:
+            self._fresh = is_current(self.manifest, db)
+        except Exception as e:
+            logger.warning(f"Could not check delivery_details snapshot freshness: {e}")
+            return False
+        self._fresh_checked_at = time.monotonic()
+        if not self._fresh:
+            logger.info(f"delivery_details snapshot {self.snapshot_id} is behind Postgres; not using it")
+        return self._fresh
+
+    @property
+    def row_count(self) -> int:
+        return int(self.manifest.get("row_count") or 0)
+
+    def side_table_path(self, name: str) -> Optional[str]:
+        """Path of an exported side table (matches, player_aliases), if this snapshot has it."""
+        path = os.path.join(self.path, SIDE_TABLES_DIR, f"{name}.parquet")
+        return path if os.path.exists(path) else None
+
+    def scan(self, columns: Sequence[str], filter=None):
+        """Materialise the requested columns for rows matching a pyarrow.dataset expression."""
+        return self.dataset.to_table(columns=list(columns), filter=filter)
+
+    def aggregate(self, group_by: Sequence[str], aggregations: Dict[str, Any], filter=None,
+                  columns: Sequence[str] = (), derived: Optional[Dict[str, Callable]] = None) -> List[Dict[str, Any]]:
+        """
+        GROUP BY over the snapshot.
+
+        Args:
+            group_by: Grouping columns
+            aggregations: output name -> (column, function), e.g. {"runs": ("batruns", "sum")};
+                use (None, "count_all") for COUNT(*)
+            filter: pyarrow.dataset expression applied during the scan
+            columns: Extra columns to scan (inputs of ``derived``)
+            derived: column name -> callable(table) returning an array, added before grouping
+
+        Returns:
+            One dict per group with the grouping columns and the named aggregates
+        """
+        derived = derived or {}
+        needed = set(group_by) | set(columns)
+        needed.update(col for col, _ in aggregations.values() if col and col not in derived)
+        table = self.scan(sorted(needed), filter=filter)
+        for name, build in derived.items():
+            table = table.append_column(name, build(table))
+
+        specs = []
+        for column, func in dict.fromkeys(aggregations.values()):
+            specs.append(([], "count_all") if func == "count_all" else (column, func))
+        grouped = table.group_by(list(group_by)).aggregate(specs)
+
+        # Output columns are named "<column>_<function>" ("count_all" for COUNT(*)); their
+        # position relative to the group keys differs between pyarrow versions.
+        columns_by_name = {name: grouped.column(name).to_pylist() for name in grouped.column_names}
+        sources = {
+            out_name: "count_all" if func == "count_all" else f"{column}_{func}"
+            for out_name, (column, func) in aggregations.items()
+        }
+        results = []
+        for i in range(grouped.num_rows):
+            record = {key: columns_by_name[key][i] for key in group_by}
+            for out_name, source in sources.items():
+                record[out_name] = columns_by_name[source][i]
+            results.append(record)
+        return results
+
+
+class _SnapshotHolder:
+    def __init__(self):
+        self._snapshot: Optional[DeliverySnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, root: str) -> Optional[DeliverySnapshot]:
+        snapshot = self._snapshot
+        if time.monotonic() - self._checked_at < SNAPSHOT_RECHECK_SECONDS:
+            return snapshot
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                with open(os.path.join(root, "CURRENT")) as fh:
+                    snapshot_id = fh.read().strip()
+            except FileNotFoundError:
+                self._snapshot = None
+                return None
+            if self._snapshot is None or self._snapshot.snapshot_id != snapshot_id:
+                try:
+                    self._snapshot = DeliverySnapshot(os.path.join(root, "snapshots", snapshot_id))
+                    logger.info(f"Loaded delivery_details snapshot {snapshot_id} ({self._snapshot.row_count} rows)")
+                except Exception as e:
+                    logger.error(f"Error loading delivery_details snapshot {snapshot_id}: {e}")
+            return self._snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._snapshot = None
+            self._checked_at = 0.0
+
+
+_holders: Dict[str, _SnapshotHolder] = {}
+
+
+def get_snapshot(root: Optional[str] = None) -> Optional[DeliverySnapshot]:
+    """The current delivery_details snapshot, or None to fall back to Postgres."""
+    if pa is None or not DELIVERY_SNAPSHOT_ENABLED:
+        return None
+    root = root or DELIVERY_SNAPSHOT_DIR
+    holder = _holders.get(root)
+    if holder is None:
+        holder = _holders.setdefault(root, _SnapshotHolder())
+    return holder.get(root)
+
+
+def reset_snapshot_cache() -> None:
+    for holder in list(_holders.values()):
+        holder.reset()
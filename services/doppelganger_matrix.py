@@ -0,0 +1,579 @@
+"""
+Precomputed player feature matrices behind the doppelganger search and leaderboard.
+
+Both endpoints used to aggregate batting_stats, bowling_stats and the bowler-type splits of
+deliveries for the whole player population on every call, then z-score and compare players
+in Python loops. The aggregation depends only on the date window and the competition scope,
+so it now happens once per (window, scope) into a ``PlayerFeatureMatrix``:
+
+    names      player names, with a name -> row index
+    values     float64 [players x columns]: innings/match/ball volumes, every batting and
+               bowling metric, and the vs pace/spin and vs bowler-type split metrics with
+               their balls; NaN where a split has too few balls for a metric
+    styles     bowler types that have split columns, in first-seen order
+
+A role's feature space (batter, bowler, all-rounder) is a column subset of the matrix and a
+qualified pool is a row mask, so a request is a handful of array operations.
+
+Matrices are cached in-process and persisted under DOPPELGANGER_MATRIX_DIR as .npz files
+(services.feature_matrix_store) tagged with the stats fingerprint (highest ids of
+batting_stats, bowling_stats and deliveries, plus their services.data_versions write
+counters). A stats refresh or an in-place backfill changes the fingerprint, so stale files
+are ignored and rebuilt on first use. On the API host, the default windows can be rebuilt
+ahead of time after each stats sync with:
+
+    python scripts/build_doppelganger_matrices.py
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+
+from services import feature_matrix_store
+from services.bowler_types import BOWLER_CATEGORY_SQL
+from services.cache import get_cache
+from services.data_versions import data_versions
+from services.feature_matrix_store import cached_fingerprint, cached_matrix, load_arrays, save_arrays
+
+logger = logging.getLogger(__name__)
+
+# Bump when a column's definition changes so persisted matrices are rebuilt.
+MATRIX_VERSION = 1
+
+DOPPELGANGER_MATRIX_DIR = os.getenv(
+    "DOPPELGANGER_MATRIX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "doppelganger_matrix"),
+)
+MATRIX_CACHE_TTL_SECONDS = 6 * 60 * 60  # 6 hours
+FINGERPRINT_TTL_SECONDS = 60  # how soon a stats refresh is noticed
+
+# Batter doppelganger feature expansion settings
+DOPPELGANGER_STYLE_FEATURE_COUNT = 4
+DOPPELGANGER_STYLE_MIN_BALLS = 120
+DOPPELGANGER_KIND_MIN_BALLS_PER_PLAYER = 30
+DOPPELGANGER_STYLE_MIN_BALLS_PER_PLAYER = 25
+
+VOLUME_COLUMNS = (
+    "batting_innings",
+    "batting_matches",
+    "batting_balls",
+    "bowling_innings",
+    "bowling_matches",
+    "bowling_balls",
+    "wickets",
+)
+BATTING_METRICS = (
+    "batting_average",
+    "batting_strike_rate",
+    "batting_dot_percentage",
+    "batting_boundary_percentage",
+    "pp_strike_rate",
+    "middle_strike_rate",
+    "death_strike_rate",
+    "pp_boundary_percentage",
+    "middle_boundary_percentage",
+    "death_boundary_percentage",
+)
+BOWLING_METRICS = (
+    "bowling_economy",
+    "bowling_strike_rate",
+    "bowling_dot_percentage",
+    "pp_economy",
+    "middle_economy",
+    "death_economy",
+    "pp_dot_percentage",
+    "middle_dot_percentage",
+    "death_dot_percentage",
+)
+SPLIT_METRICS = ("average", "strike_rate", "boundary_percentage", "dot_percentage")
+BOWL_KINDS = ("pace", "spin")
+
+_MATRIX_CACHE = get_cache("doppelganger_matrix", ttl_seconds=MATRIX_CACHE_TTL_SECONDS, max_entries=16)
+_FINGERPRINT_CACHE = get_cache("doppelganger_fingerprint", ttl_seconds=FINGERPRINT_TTL_SECONDS, max_entries=1)
+
+
+def _safe_pct(num: float, den: float) -> float:
+    return (num * 100.0 / den) if den else 0.0
+
+
+def _safe_rate_per_100(num: float, den: float) -> float:
+    return (num * 100.0 / den) if den else 0.0
+
+
+def _safe_economy(runs: float, balls: float) -> float:
+    return (runs * 6.0 / balls) if balls else 0.0
+
+
+def _safe_bowling_sr(balls: float, wickets: float) -> float:
+    return (balls / wickets) if wickets else 0.0
+
+
+def _sanitize_style_key(style: str) -> str:
+    cleaned = "".join(ch if ch.isalnum() else "_" for ch in (style or "").strip())
+    while "__" in cleaned:
+        cleaned = cleaned.replace("__", "_")
+    return cleaned.strip("_").lower() or "unknown"
+
+
+def kind_columns(kind: str) -> List[str]:
+    return [f"vs_{kind}_{metric}" for metric in SPLIT_METRICS]
+
+
+def style_columns(style: str) -> List[str]:
+    return [f"vs_style_{_sanitize_style_key(style)}_{metric}" for metric in SPLIT_METRICS]
+
+
+def _balls_column(split: str) -> str:
+    # Split volumes sit next to the metrics under a name no metric key can take
+    return f"{split}:balls"
+
+
+def _build_matches_competition_filter(
+    params: Dict[str, Any],
+    *,
+    leagues: Optional[List[str]] = None,
+    include_international: bool = True,
+    top_teams: Optional[int] = None,
+    match_alias: str = "m",
+) -> str:
+    """
+    Build a competition filter clause for queries joined to `matches`.
+
+    Semantics:
+    - `leagues is None`: no league filter condition emitted unless international condition exists
+    - `leagues == []`: include all league matches
+    - `leagues` non-empty: include only those leagues
+    - `include_international`: include T20Is, optionally restricted to top N teams
+    """
+    from models import INTERNATIONAL_TEAMS_RANKED
+
+    conditions: List[str] = []
+
+    if leagues is not None:
+        if len(leagues) == 0:
+            conditions.append(f"{match_alias}.match_type = 'league'")
+        else:
+            league_param = f"{match_alias}_doppel_leagues"
+            params[league_param] = leagues
+            conditions.append(
+                f"({match_alias}.match_type = 'league' AND {match_alias}.competition = ANY(:{league_param}))"
+            )
+
+    if include_international:
+        if top_teams:
+            top_team_list = INTERNATIONAL_TEAMS_RANKED[:top_teams]
+            top_param = f"{match_alias}_doppel_top_teams"
+            params[top_param] = top_team_list
+            conditions.append(
+                f"({match_alias}.match_type = 'international' AND {match_alias}.team1 = ANY(:{top_param}) AND {match_alias}.team2 = ANY(:{top_param}))"
+            )
+        else:
+            conditions.append(f"{match_alias}.match_type = 'international'")
+
+    if not conditions:
+        return ""
+
+    return "\n        AND (" + "\n            OR ".join(conditions) + "\n        )"
+
+
+def _batting_query(competition_filter: str):
+    return text(f"""
+        SELECT
+            bs.striker AS player_name,
+            COUNT(*) AS batting_innings,
+            COUNT(DISTINCT bs.match_id) AS batting_matches,
+            COALESCE(SUM(bs.runs), 0) AS batting_runs,
+            COALESCE(SUM(bs.balls_faced), 0) AS batting_balls,
+            COALESCE(SUM(bs.dots), 0) AS batting_dots,
+            COALESCE(SUM(bs.fours), 0) AS fours,
+            COALESCE(SUM(bs.sixes), 0) AS sixes,
+            COUNT(CASE WHEN COALESCE(bs.wickets, 0) > 0 THEN 1 END) AS dismissals,
+            COALESCE(SUM(bs.pp_runs), 0) AS pp_runs,
+            COALESCE(SUM(bs.pp_balls), 0) AS pp_balls,
+            COALESCE(SUM(bs.pp_dots), 0) AS pp_dots,
+            COALESCE(SUM(bs.pp_boundaries), 0) AS pp_boundaries,
+            COALESCE(SUM(bs.middle_runs), 0) AS middle_runs,
+            COALESCE(SUM(bs.middle_balls), 0) AS middle_balls,
+            COALESCE(SUM(bs.middle_dots), 0) AS middle_dots,
+            COALESCE(SUM(bs.middle_boundaries), 0) AS middle_boundaries,
+            COALESCE(SUM(bs.death_runs), 0) AS death_runs,
+            COALESCE(SUM(bs.death_balls), 0) AS death_balls,
+            COALESCE(SUM(bs.death_dots), 0) AS death_dots,
+            COALESCE(SUM(bs.death_boundaries), 0) AS death_boundaries
+        FROM batting_stats bs
+        JOIN matches m ON bs.match_id = m.id
+        WHERE m.date >= :start_date AND m.date <= :end_date
+        {competition_filter}
+        GROUP BY bs.striker
+    """)
+
+
+def _overs_to_balls_sql(column: str) -> str:
+    return f"""COALESCE(SUM(
+                CAST(
+                    FLOOR(COALESCE({column}, 0)) * 6 +
+                    ROUND((COALESCE({column}, 0) - FLOOR(COALESCE({column}, 0))) * 10)
+                AS INTEGER)
+            ), 0)"""
+
+
+def _bowling_query(competition_filter: str):
+    return text(f"""
+        SELECT
+            bw.bowler AS player_name,
+            COUNT(*) AS bowling_innings,
+            COUNT(DISTINCT bw.match_id) AS bowling_matches,
+            COALESCE(SUM(bw.runs_conceded), 0) AS runs_conceded,
+            COALESCE(SUM(bw.wickets), 0) AS wickets,
+            COALESCE(SUM(bw.dots), 0) AS bowling_dots,
+            {_overs_to_balls_sql("bw.overs")} AS bowling_balls,
+            COALESCE(SUM(bw.pp_runs), 0) AS pp_runs,
+            COALESCE(SUM(bw.pp_dots), 0) AS pp_dots,
+            {_overs_to_balls_sql("bw.pp_overs")} AS pp_balls,
+            COALESCE(SUM(bw.middle_runs), 0) AS middle_runs,
+            COALESCE(SUM(bw.middle_dots), 0) AS middle_dots,
+            {_overs_to_balls_sql("bw.middle_overs")} AS middle_balls,
+            COALESCE(SUM(bw.death_runs), 0) AS death_runs,
+            COALESCE(SUM(bw.death_dots), 0) AS death_dots,
+            {_overs_to_balls_sql("bw.death_overs")} AS death_balls
+        FROM bowling_stats bw
+        JOIN matches m ON bw.match_id = m.id
+        WHERE m.date >= :start_date AND m.date <= :end_date
+        {competition_filter}
+        GROUP BY bw.bowler
+    """)
+
+
+def _batter_split_query(competition_filter: str):
+    bowler_category = BOWLER_CATEGORY_SQL.replace("bowler_type", "d.bowler_type")
+    split_sums = """
+            COUNT(*) AS balls,
+            COALESCE(SUM(d.runs_off_bat), 0) AS runs,
+            COALESCE(SUM(CASE WHEN COALESCE(d.runs_off_bat, 0) = 0 AND COALESCE(d.extras, 0) = 0 THEN 1 ELSE 0 END), 0) AS dots,
+            COALESCE(SUM(CASE WHEN COALESCE(d.runs_off_bat, 0) IN (4, 6) THEN 1 ELSE 0 END), 0) AS boundaries,
+            COALESCE(SUM(CASE WHEN d.player_dismissed = d.batter THEN 1 ELSE 0 END), 0) AS dismissals"""
+    return text(f"""
+        SELECT
+            d.batter AS player_name,
+            'kind' AS split_type,
+            {bowler_category} AS split_key,{split_sums}
+        FROM deliveries d
+        JOIN matches m ON d.match_id = m.id
+        WHERE m.date >= :start_date AND m.date <= :end_date
+          {competition_filter}
+          AND d.batter IS NOT NULL
+          AND d.bowler_type IS NOT NULL
+          AND {bowler_category} IS NOT NULL
+        GROUP BY d.batter, split_key
+        UNION ALL
+        SELECT
+            d.batter AS player_name,
+            'style' AS split_type,
+            d.bowler_type AS split_key,{split_sums}
+        FROM deliveries d
+        JOIN matches m ON d.match_id = m.id
+        WHERE m.date >= :start_date AND m.date <= :end_date
+          {competition_filter}
+          AND d.batter IS NOT NULL
+          AND d.bowler_type IS NOT NULL
+        GROUP BY d.batter, d.bowler_type
+    """)
+
+
+def _batting_metrics(b: Dict[str, Any]) -> List[float]:
+    runs = float(b.get("batting_runs") or 0)
+    balls = float(b.get("batting_balls") or 0)
+    dots = float(b.get("batting_dots") or 0)
+    boundaries = float((b.get("fours") or 0) + (b.get("sixes") or 0))
+    dismissals = float(b.get("dismissals") or 0)
+    return [
+        round((runs / dismissals) if dismissals else 0.0, 3),
+        round(_safe_rate_per_100(runs, balls), 3),
+        round(_safe_pct(dots, balls), 3),
+        round(_safe_pct(boundaries, balls), 3),
+        round(_safe_rate_per_100(float(b.get("pp_runs") or 0), float(b.get("pp_balls") or 0)), 3),
+        round(_safe_rate_per_100(float(b.get("middle_runs") or 0), float(b.get("middle_balls") or 0)), 3),
+        round(_safe_rate_per_100(float(b.get("death_runs") or 0), float(b.get("death_balls") or 0)), 3),
+        round(_safe_pct(float(b.get("pp_boundaries") or 0), float(b.get("pp_balls") or 0)), 3),
+        round(_safe_pct(float(b.get("middle_boundaries") or 0), float(b.get("middle_balls") or 0)), 3),
+        round(_safe_pct(float(b.get("death_boundaries") or 0), float(b.get("death_balls") or 0)), 3),
+    ]
+
+
+def _bowling_metrics(bw: Dict[str, Any]) -> List[float]:
+    balls = float(bw.get("bowling_balls") or 0)
+    return [
+        round(_safe_economy(float(bw.get("runs_conceded") or 0), balls), 3),
+        round(_safe_bowling_sr(balls, float(bw.get("wickets") or 0)), 3),
+        round(_safe_pct(float(bw.get("bowling_dots") or 0), balls), 3),
+        round(_safe_economy(float(bw.get("pp_runs") or 0), float(bw.get("pp_balls") or 0)), 3),
+        round(_safe_economy(float(bw.get("middle_runs") or 0), float(bw.get("middle_balls") or 0)), 3),
+        round(_safe_economy(float(bw.get("death_runs") or 0), float(bw.get("death_balls") or 0)), 3),
+        round(_safe_pct(float(bw.get("pp_dots") or 0), float(bw.get("pp_balls") or 0)), 3),
+        round(_safe_pct(float(bw.get("middle_dots") or 0), float(bw.get("middle_balls") or 0)), 3),
+        round(_safe_pct(float(bw.get("death_dots") or 0), float(bw.get("death_balls") or 0)), 3),
+    ]
+
+
+def _split_metrics(agg: Optional[Dict[str, float]], min_balls: int) -> List[float]:
+    """average, strike rate, boundary %, dot % against one split; NaN below ``min_balls``."""
+    balls = float((agg or {}).get("balls") or 0)
+    if not agg or balls < min_balls:
+        return [math.nan] * len(SPLIT_METRICS) + [balls]
+    runs = float(agg.get("runs") or 0)
+    dismissals = float(agg.get("dismissals") or 0)
+    return [
+        round((runs / dismissals) if dismissals else 0.0, 3),
+        round(_safe_rate_per_100(runs, balls), 3),
+        round(_safe_pct(float(agg.get("boundaries") or 0), balls), 3),
+        round(_safe_pct(float(agg.get("dots") or 0), balls), 3),
+        balls,
+    ]
+
+
+class PlayerFeatureMatrix:
+    """Per-player volumes and metrics of one (window, scope). Treat as read-only: it is shared."""
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        columns: Sequence[str],
+        values: np.ndarray,
+        styles: Sequence[str],
+        fingerprint: Optional[Dict[str, Any]] = None,
+    ):
+        self.names = [str(name) for name in names]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.columns = [str(column) for column in columns]
+        self._column_index = {column: j for j, column in enumerate(self.columns)}
+        self.values = values
+        self.styles = [str(style) for style in styles]
+        self.fingerprint = fingerprint
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:, self._column_index[name]]
+
+    def block(self, rows: np.ndarray, columns: Sequence[str]) -> np.ndarray:
+        """values[rows, columns] as a new array (``rows`` is an index array)."""
+        return self.values[np.ix_(rows, [self._column_index[c] for c in columns])]
+
+    def metrics(self, row: int, columns: Iterable[str]) -> Dict[str, Optional[float]]:
+        """One player's metrics as the API returns them: floats, None where missing."""
+        out: Dict[str, Optional[float]] = {}
+        for column in columns:
+            value = self.values[row, self._column_index[column]]
+            out[column] = None if np.isnan(value) else float(value)
+        return out
+
+    def top_styles(self, rows: np.ndarray) -> List[str]:
+        """Bowler types these players faced most, as many as become batter features."""
+        if not self.styles:
+            return []
+        totals = self.block(rows, [_balls_column(f"vs_style_{_sanitize_style_key(s)}") for s in self.styles]).sum(axis=0)
+        order = np.argsort(-totals, kind="stable")
+        return [
+            self.styles[i] for i in order if totals[i] >= DOPPELGANGER_STYLE_MIN_BALLS
+        ][:DOPPELGANGER_STYLE_FEATURE_COUNT]
+
+    def split_volume(self, row: int, styles: Sequence[str]) -> Dict[str, Dict[str, int]]:
+        return {
+            "kind": {
+                kind: int(self.values[row, self._column_index[_balls_column(f"vs_{kind}")]])
+                for kind in BOWL_KINDS
+            },
+            "style": {
+                style: int(self.values[row, self._column_index[_balls_column(f"vs_style_{_sanitize_style_key(style)}")]])
+                for style in styles
+            },
+        }
+
+    def save(self, path: str) -> None:
+        save_arrays(
+            path,
+            {
+                "names": np.array(self.names, dtype=str),
+                "columns": np.array(self.columns, dtype=str),
+                "values": self.values,
+                "styles": np.array(self.styles, dtype=str),
+            },
+            {"fingerprint": self.fingerprint},
+        )
+
+    @classmethod
+    def load(cls, path: str, fingerprint: Optional[Dict[str, Any]] = None) -> Optional["PlayerFeatureMatrix"]:
+        """The matrix at ``path``, or None if it is missing, unreadable or built on other stats."""
+        stored = load_arrays(path, fingerprint, "doppelganger matrix")
+        if stored is None:
+            return None
+        arrays, meta = stored
+        return cls(arrays["names"].tolist(), arrays["columns"].tolist(), arrays["values"],
+                   arrays["styles"].tolist(), meta["fingerprint"])
+
+
+def build_player_feature_matrix(
+    db: Session,
+    start: date,
+    end: date,
+    leagues: Optional[List[str]] = None,
+    include_international: bool = False,
+    top_teams: Optional[int] = None,
+    fingerprint: Optional[Dict[str, Any]] = None,
+) -> PlayerFeatureMatrix:
+    """Aggregate every player of the window and scope into one matrix (three grouped queries)."""
+    params: Dict[str, Any] = {"start_date": start, "end_date": end}
+    competition_filter = _build_matches_competition_filter(
+        params,
+        leagues=leagues,
+        include_international=include_international,
+        top_teams=top_teams,
+        match_alias="m",
+    )
+    batting_rows = db.execute(_batting_query(competition_filter), params).fetchall()
+    bowling_rows = db.execute(_bowling_query(competition_filter), params).fetchall()
+    split_rows = db.execute(_batter_split_query(competition_filter), params).fetchall()
+
+    batting: Dict[str, Dict[str, Any]] = {}
+    bowling: Dict[str, Dict[str, Any]] = {}
+    names: List[str] = []
+    for rows, target in ((batting_rows, batting), (bowling_rows, bowling)):
+        for row in rows:
+            if row.player_name not in batting and row.player_name not in bowling:
+                names.append(row.player_name)
+            target[row.player_name] = dict(row._mapping)
+    known = set(names)
+
+    splits: Dict[str, Dict[str, Dict[str, float]]] = {}
+    styles: List[str] = []
+    seen_styles = set()
+    style_keys = set()
+    for row in split_rows:
+        if row.player_name not in known:
+            continue
+        if row.split_type == "style" and row.split_key not in seen_styles:
+            # Two bowler types that sanitise to the same key would share columns; keep the first
+            style_key = _sanitize_style_key(row.split_key)
+            if style_key in style_keys:
+                continue
+            seen_styles.add(row.split_key)
+            style_keys.add(style_key)
+            styles.append(row.split_key)
+        splits.setdefault(row.player_name, {})[f"{row.split_type}:{row.split_key}"] = {
+            "balls": float(row.balls or 0),
+            "runs": float(row.runs or 0),
+            "dots": float(row.dots or 0),
+            "boundaries": float(row.boundaries or 0),
+            "dismissals": float(row.dismissals or 0),
+        }
+
+    columns = list(VOLUME_COLUMNS) + list(BATTING_METRICS) + list(BOWLING_METRICS)
+    for kind in BOWL_KINDS:
+        columns += kind_columns(kind) + [_balls_column(f"vs_{kind}")]
+    for style in styles:
+        columns += style_columns(style) + [_balls_column(f"vs_style_{_sanitize_style_key(style)}")]
+
+    values = np.full((len(names), len(columns)), np.nan)
+    for i, name in enumerate(names):
+        b = batting.get(name, {})
+        bw = bowling.get(name, {})
+        player_splits = splits.get(name, {})
+        row_values = [
+            float(b.get("batting_innings") or 0),
+            float(b.get("batting_matches") or 0),
+            float(b.get("batting_balls") or 0),
+            float(bw.get("bowling_innings") or 0),
+            float(bw.get("bowling_matches") or 0),
+            float(bw.get("bowling_balls") or 0),
+            float(bw.get("wickets") or 0),
+        ]
+        row_values += _batting_metrics(b) + _bowling_metrics(bw)
+        for kind in BOWL_KINDS:
+            row_values += _split_metrics(player_splits.get(f"kind:{kind}"), DOPPELGANGER_KIND_MIN_BALLS_PER_PLAYER)
+        for style in styles:
+            row_values += _split_metrics(player_splits.get(f"style:{style}"), DOPPELGANGER_STYLE_MIN_BALLS_PER_PLAYER)
+        values[i] = row_values
+
+    return PlayerFeatureMatrix(names, columns, values, styles, fingerprint)
+
+
+def stats_fingerprint(db: Session) -> Dict[str, Any]:
+    """
+    Cheap change marker for the stats the matrices are built from: the highest ids catch
+    appended rows, the data_versions counters catch in-place corrections (bowler types,
+    crease combos).
+    """
+    def _compute() -> Dict[str, Any]:
+        row = db.execute(text("""
+            SELECT
+                (SELECT MAX(id) FROM batting_stats),
+                (SELECT MAX(id) FROM bowling_stats),
+                (SELECT MAX(id) FROM deliveries)
+        """)).fetchone()
+        return {
+            "version": MATRIX_VERSION,
+            "batting_stats": int(row[0] or 0),
+            "bowling_stats": int(row[1] or 0),
+            "deliveries": int(row[2] or 0),
+            "data_versions": data_versions(db, ("batting_stats", "bowling_stats", "deliveries")),
+        }
+
+    return cached_fingerprint(_FINGERPRINT_CACHE, ("stats",), _compute)
+
+
+def _scope(leagues: Optional[List[str]], include_international: bool, top_teams: Optional[int]) -> Dict[str, Any]:
+    return {
+        "leagues": sorted(leagues) if leagues is not None else None,
+        "include_international": bool(include_international),
+        # Only internationals are limited to top teams
+        "top_teams": top_teams if include_international and top_teams else None,
+    }
+
+
+def _matrix_path(root: str, start: date, end: date, scope: Dict[str, Any]) -> str:
+    digest = hashlib.sha1(json.dumps(scope, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(root, f"{start.isoformat()}_{end.isoformat()}_{digest}.npz")
+
+
+def get_player_feature_matrix(
+    db: Session,
+    start: date,
+    end: date,
+    leagues: Optional[List[str]] = None,
+    include_international: bool = False,
+    top_teams: Optional[int] = None,
+    force_refresh: bool = False,
+    root: Optional[str] = None,
+) -> PlayerFeatureMatrix:
+    """
+    The feature matrix of a window and competition scope: from the process cache, else the
+    persisted file if it was built on the current stats, else built (and persisted).
+    """
+    root = root or DOPPELGANGER_MATRIX_DIR
+    scope = _scope(leagues, include_international, top_teams)
+    fingerprint = stats_fingerprint(db)
+    key = (start.isoformat(), end.isoformat(), json.dumps(scope, sort_keys=True), json.dumps(fingerprint, sort_keys=True))
+    path = _matrix_path(root, start, end, scope)
+    return cached_matrix(
+        _MATRIX_CACHE,
+        key,
+        path,
+        lambda: PlayerFeatureMatrix.load(path, fingerprint),
+        lambda: build_player_feature_matrix(db, start, end, leagues, include_international, top_teams, fingerprint),
+        force_refresh,
+        "doppelganger matrix",
+    )
+
+
+def prune_stale_matrices(root: Optional[str] = None, fingerprint: Optional[Dict[str, Any]] = None) -> int:
+    """Delete persisted matrices built on other stats than ``fingerprint``; returns how many."""
+    return feature_matrix_store.prune_stale_matrices(root or DOPPELGANGER_MATRIX_DIR, fingerprint)
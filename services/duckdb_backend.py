@@ -0,0 +1,336 @@
+"""
+Embedded DuckDB execution backend for query_builder_v2.
+
+Wide group-bys over delivery_details (no player filter, many years, several grouping columns)
+are the slowest requests we serve: Postgres scans millions of rows on the shared pool. This
+module runs the *same* SQL that query_builder_v2 generates against DuckDB instead, reading either
+
+- a local DuckDB database file (QUERY_BUILDER_DUCKDB_PATH) holding delivery_details, matches,
+  player_aliases and the player_alias_map / player_alias_unambiguous tables, or
+- the Parquet snapshot published by services/delivery_snapshot.py (deliveries plus the
+  matches / player_aliases side tables).
+
+``DuckDBSession`` quacks like the SQLAlchemy session for the calls query_builder_v2 makes
+(``execute(text(sql), params)`` then ``fetchall`` / ``fetchone`` / ``scalar``), so the query
+plan itself is untouched; only a handful of Postgres spellings are translated (see
+``translate_sql``).
+
+``choose_backend`` picks per request. It only routes to DuckDB when the snapshot is as fresh
+as Postgres and the estimated scan is large enough to be worth it. Everything stays on Postgres
+when duckdb is not installed.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from services.delivery_snapshot import SNAPSHOT_RECHECK_SECONDS, get_snapshot, is_current
+from services.player_aliases import ALIAS_MAP_VIEWS
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - optional dependency
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+# auto | postgres | duckdb
+QUERY_BUILDER_BACKEND = os.getenv("QUERY_BUILDER_BACKEND", "auto").lower()
+QUERY_BUILDER_DUCKDB_PATH = os.getenv("QUERY_BUILDER_DUCKDB_PATH")
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", "4"))
+DUCKDB_MEMORY_LIMIT = os.getenv("DUCKDB_MEMORY_LIMIT", "2GB")
+# Estimated delivery rows a request must scan before it is routed to DuckDB
+DUCKDB_MIN_SCAN_ROWS = int(os.getenv("DUCKDB_MIN_SCAN_ROWS", "500000"))
+
+# Rough share of delivery_details left after each filter, used only to rank requests
+# against DUCKDB_MIN_SCAN_ROWS. Player filters hit the (bat)/(bowl) indexes in Postgres and
+# are always cheaper there.
+FILTER_SELECTIVITY = {
+    "players": 0.0005,
+    "batters": 0.0005,
+    "bowlers": 0.0005,
+    "venue_aliases": 0.01,
+    "teams": 0.1,
+    "batting_teams": 0.05,
+    "bowling_teams": 0.05,
+    "leagues": 0.3,
+    "top_teams": 0.05,
+    "innings": 0.5,
+}
+
+# Group-bys that add a window-function CTE over the whole table regardless of filters
+FULL_SCAN_GROUP_BY = {"ball", "ball_in_over", "ball_in_spell", "batting_position"}
+
+_PARAM_RE = re.compile(r"(?<![:\w]):(\w+)")
+_DECIMAL_CAST_RE = re.compile(r"\bAS\s+DECIMAL\s*\)", re.IGNORECASE)
+
+
+def is_available() -> bool:
+    return duckdb is not None
+
+
+def log_backend_status() -> None:
+    """Say once, at startup, whether grouped queries can use the DuckDB fast path."""
+    if QUERY_BUILDER_BACKEND == "postgres":
+        logger.info("Query builder DuckDB backend disabled (QUERY_BUILDER_BACKEND=postgres)")
+    elif duckdb is None:
+        logger.warning("duckdb is not installed; query builder DuckDB fast path disabled, using Postgres")
+    else:
+        logger.info(f"Query builder DuckDB backend available (mode={QUERY_BUILDER_BACKEND})")
+
+
+def create_alias_views(conn) -> None:
+    """Define the materialised alias views from services/player_aliases over player_aliases."""
+    for view, (definition, _key) in ALIAS_MAP_VIEWS.items():
+        conn.execute(f"CREATE OR REPLACE VIEW {view} AS {definition}")
+
+
+def translate_sql(sql: str, params: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Turn a query_builder_v2 statement into DuckDB SQL plus the parameters it references.
+
+    - ``:name`` bind parameters become ``$name`` (``::type`` casts are left alone)
+    - ``CAST(x AS DECIMAL)`` becomes ``CAST(x AS DOUBLE)``: DuckDB's bare DECIMAL is
+      DECIMAL(18,3), which would round the ratios Postgres computes at full precision
+    - DuckDB rejects unused parameters, so only referenced ones are passed through
+
+    ``= ANY(list)``, ``IS NOT DISTINCT FROM``, ``FILTER (WHERE ...)``, ``DISTINCT ON``, row
+    constructors in ``COUNT(DISTINCT (a, b))`` and ``->>`` on JSON text all run unchanged.
+    """
+    params = params or {}
+    names = set(_PARAM_RE.findall(sql))
+    translated = _PARAM_RE.sub(r"$\1", sql)
+    translated = _DECIMAL_CAST_RE.sub("AS DOUBLE)", translated)
+    bound = {}
+    for name in names:
+        value = params[name]
+        bound[name] = list(value) if isinstance(value, (tuple, set)) else value
+    return translated, bound
+
+
+class _Row(tuple):
+    """Tuple row with attribute and ``_mapping`` access, like a SQLAlchemy Row."""
+
+    _fields: Tuple[str, ...] = ()
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[self._fields.index(name)]
+        except ValueError:
+            raise AttributeError(name)
+
+    @property
+    def _mapping(self) -> Dict[str, Any]:
+        return dict(zip(self._fields, self))
+
+
+class _Result:
+    def __init__(self, columns: List[str], rows: List[tuple]):
+        row_type = type("Row", (_Row,), {"_fields": tuple(columns)})
+        self._rows = [row_type(row) for row in rows]
+
+    def fetchall(self) -> List[_Row]:
+        return list(self._rows)
+
+    def fetchone(self) -> Optional[_Row]:
+        return self._rows[0] if self._rows else None
+
+    def scalar(self) -> Any:
+        return self._rows[0][0] if self._rows else None
+
+
+class DuckDBSession:
+    """Session-shaped wrapper around a DuckDB cursor, for one request."""
+
+    backend = "duckdb"
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, statement, params: Optional[Dict[str, Any]] = None) -> _Result:
+        sql, bound = translate_sql(str(statement), params)
+        cursor = self._cursor.execute(sql, bound)
+        columns = [col[0] for col in cursor.description or []]
+        return _Result(columns, cursor.fetchall())
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class DuckDBBackend:
+    """Owns the DuckDB connection and rebuilds its views when a new snapshot is published."""
+
+    def __init__(self, database_path: Optional[str] = QUERY_BUILDER_DUCKDB_PATH,
+                 snapshot_root: Optional[str] = None):
+        self.database_path = database_path
+        self.snapshot_root = snapshot_root
+        self._conn = None
+        self._source_id: Optional[str] = None
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._row_count = 0
+        self._years: List[int] = []
+        self._lock = threading.Lock()
+        self._fresh_checked_at = 0.0
+        self._fresh = False
+
+    @property
+    def row_count(self) -> int:
+        return self._row_count
+
+    @property
+    def years(self) -> List[int]:
+        return self._years
+
+    def _connect(self):
+        """(Re)open the connection if the underlying data changed; None if there is no data."""
+        if self.database_path:
+            if self._conn is None:
+                conn = duckdb.connect(self.database_path, read_only=True)
+                self._configure(conn)
+                self._row_count = conn.execute("SELECT COUNT(*) FROM delivery_details").fetchone()[0]
+                self._years = [r[0] for r in conn.execute(
+                    "SELECT DISTINCT year FROM delivery_details WHERE year IS NOT NULL ORDER BY year"
+                ).fetchall()]
+                self._conn, self._source_id = conn, self.database_path
+            return self._conn
+
+        snapshot = get_snapshot(self.snapshot_root)
+        if snapshot is None:
+            return None
+        if not snapshot.manifest.get("complete"):
+            # A --years export holds only part of delivery_details; never route queries to it
+            logger.info(f"Snapshot {snapshot.snapshot_id} does not cover every year; DuckDB backend off")
+            return None
+        if snapshot.snapshot_id == self._source_id:
+            return self._conn
+
+        matches_path = snapshot.side_table_path("matches")
+        aliases_path = snapshot.side_table_path("player_aliases")
+        if not matches_path or not aliases_path:
+            logger.info(f"Snapshot {snapshot.snapshot_id} has no matches/player_aliases tables; DuckDB backend off")
+            return None
+
+        conn = duckdb.connect(":memory:")
+        self._configure(conn)
+        deliveries_glob = os.path.join(snapshot.path, "*=*", "*=*", "*.parquet")
+        conn.execute(
+            f"CREATE VIEW delivery_details AS SELECT * FROM read_parquet('{deliveries_glob}', hive_partitioning = true)"
+        )
+        conn.execute(f"CREATE VIEW matches AS SELECT * FROM read_parquet('{matches_path}')")
+        conn.execute(f"CREATE VIEW player_aliases AS SELECT * FROM read_parquet('{aliases_path}')")
+        create_alias_views(conn)
+
+        old = self._conn
+        self._conn, self._source_id = conn, snapshot.snapshot_id
+        self._manifest = snapshot.manifest
+        self._row_count = snapshot.row_count
+        self._years = list(snapshot.manifest.get("years") or [])
+        self._fresh_checked_at = 0.0
+        if old is not None:
+            old.close()
+        logger.info(f"DuckDB backend serving snapshot {snapshot.snapshot_id}")
+        return conn
+
+    @staticmethod
+    def _configure(conn) -> None:
+        conn.execute(f"SET threads = {DUCKDB_THREADS}")
+        conn.execute(f"SET memory_limit = '{DUCKDB_MEMORY_LIMIT}'")
+
+    def is_fresh(self, db) -> bool:
+        """
+        True if the snapshot matches Postgres (checked periodically): it holds every delivery
+        and no in-place correction has been written since (the data_versions counter).
+        """
+        if self.database_path or self._manifest is None:
+            return self.database_path is not None
+        if time.monotonic() - self._fresh_checked_at < SNAPSHOT_RECHECK_SECONDS:
+            return self._fresh
+        try:
+            self._fresh = is_current(self._manifest, db)
+        except Exception as e:
+            logger.warning(f"Could not check delivery_details freshness: {e}")
+            return False
+        self._fresh_checked_at = time.monotonic()
+        if not self._fresh:
+            logger.info(f"Snapshot {self._source_id} is behind Postgres; grouped queries stay on Postgres")
+        return self._fresh
+
+    def session(self) -> Optional[DuckDBSession]:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            # DuckDB connections are not safe to share across threads; cursors are.
+            return DuckDBSession(conn.cursor())
+
+
+_backend: Optional[DuckDBBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> Optional[DuckDBBackend]:
+    global _backend
+    if duckdb is None:
+        return None
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = DuckDBBackend()
+    return _backend
+
+
+def estimate_scan_rows(params: Dict[str, Any], group_by: Iterable[str], row_count: int,
+                       years: List[int]) -> int:
+    """Rough number of delivery_details rows a grouped query will aggregate."""
+    if set(group_by) & FULL_SCAN_GROUP_BY:
+        return row_count
+
+    estimate = float(row_count)
+    if years:
+        start = params.get("start_year", years[0])
+        end = params.get("end_year", years[-1])
+        in_range = sum(1 for y in years if start <= y <= end)
+        estimate *= in_range / len(years)
+
+    for key, selectivity in FILTER_SELECTIVITY.items():
+        if params.get(key):
+            estimate *= selectivity
+    return int(estimate)
+
+
+def choose_backend(db, params: Dict[str, Any], group_by: Iterable[str]):
+    """
+    Session to run a grouped delivery_details query on: a DuckDBSession or ``db`` itself.
+
+    QUERY_BUILDER_BACKEND=postgres disables DuckDB; =duckdb uses it whenever a fresh source is
+    available; =auto (default) also requires the estimated scan to reach DUCKDB_MIN_SCAN_ROWS.
+    """
+    group_by = list(group_by or [])
+    if QUERY_BUILDER_BACKEND == "postgres" or not group_by:
+        return db
+    backend = get_backend()
+    if backend is None:
+        return db
+
+    try:
+        session = backend.session()
+    except Exception as e:
+        logger.warning(f"DuckDB backend unavailable: {e}")
+        return db
+    if session is None:
+        return db
+    if not backend.is_fresh(db):
+        session.close()
+        return db
+
+    if QUERY_BUILDER_BACKEND != "duckdb":
+        estimate = estimate_scan_rows(params, group_by, backend.row_count, backend.years)
+        if estimate < DUCKDB_MIN_SCAN_ROWS:
+            session.close()
+            return db
+    return session
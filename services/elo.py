@@ -3,6 +3,7 @@ from fastapi import HTTPException
 from typing import List, Optional, Dict
 from datetime import date
 from models import teams_mapping
+from services.elo_timeline import canonical_team_key, timeline_source
 
 def get_delhi_team_name_variations(team_name: str) -> List[str]:
     """Special handler for Delhi teams to manage the DD->DC transition properly"""
@@ -306,7 +307,7 @@ def get_teams_elo_rankings_service(
         competition_conditions = []
         
         if league:
-            competition_conditions.append("(m.match_type = 'league' AND m.competition = :league)")
+            competition_conditions.append("(t.match_type = 'league' AND t.competition = :league)")
         
         if include_international:
             if top_teams:
@@ -314,91 +315,57 @@ def get_teams_elo_rankings_service(
                 top_team_list = INTERNATIONAL_TEAMS_RANKED[:top_teams]
                 params["top_team_list"] = top_team_list
                 competition_conditions.append(
-                    "(m.match_type = 'international' AND m.team1 = ANY(:top_team_list) AND m.team2 = ANY(:top_team_list))"
+                    "(t.match_type = 'international' AND t.team_name = ANY(:top_team_list) AND t.opponent = ANY(:top_team_list))"
                 )
             else:
-                competition_conditions.append("(m.match_type = 'international')")
+                competition_conditions.append("(t.match_type = 'international')")
         
         if competition_conditions:
             competition_filter = "AND (" + " OR ".join(competition_conditions) + ")"
         else:
             competition_filter = "AND false"
         
+        # One row per team per rated match in team_elo_timeline (services/elo_timeline.py),
+        # keyed by canonical team so name variations share one ranking entry.
+        source, source_params = timeline_source(db)
+        params.update(source_params)
         elo_rankings_query = text(f"""
-            WITH latest_team_elos AS (
-                SELECT DISTINCT ON (team_name)
-                    team_name,
-                    latest_elo,
-                    latest_date,
-                    total_matches,
-                    wins,
-                    losses,
-                    win_percentage,
-                    match_type,
-                    latest_competition
-                FROM (
-                    SELECT 
-                        m.team1 as team_name,
-                        m.team1_elo as latest_elo,
-                        m.date as latest_date,
-                        COUNT(*) OVER (PARTITION BY m.team1) as total_matches,
-                        SUM(CASE WHEN m.winner = m.team1 THEN 1 ELSE 0 END) OVER (PARTITION BY m.team1) as wins,
-                        SUM(CASE WHEN m.winner IS NOT NULL AND m.winner != m.team1 THEN 1 ELSE 0 END) OVER (PARTITION BY m.team1) as losses,
-                        ROUND(
-                            (SUM(CASE WHEN m.winner = m.team1 THEN 1 ELSE 0 END) OVER (PARTITION BY m.team1) * 100.0) / 
-                            NULLIF(COUNT(CASE WHEN m.winner IS NOT NULL THEN 1 END) OVER (PARTITION BY m.team1), 0), 
-                            2
-                        ) as win_percentage,
-                        m.match_type,
-                        m.competition as latest_competition,
-                        ROW_NUMBER() OVER (PARTITION BY m.team1 ORDER BY m.date DESC, m.id DESC) as rn
-                    FROM matches m
-                    WHERE m.team1_elo IS NOT NULL
-                    AND m.format = :fmt AND m.gender = :gender
-                    AND (:start_date IS NULL OR m.date >= :start_date)
-                    AND (:end_date IS NULL OR m.date <= :end_date)
-                    {competition_filter}
-                    
-                    UNION ALL
-                    
-                    SELECT 
-                        m.team2 as team_name,
-                        m.team2_elo as latest_elo,
-                        m.date as latest_date,
-                        COUNT(*) OVER (PARTITION BY m.team2) as total_matches,
-                        SUM(CASE WHEN m.winner = m.team2 THEN 1 ELSE 0 END) OVER (PARTITION BY m.team2) as wins,
-                        SUM(CASE WHEN m.winner IS NOT NULL AND m.winner != m.team2 THEN 1 ELSE 0 END) OVER (PARTITION BY m.team2) as losses,
-                        ROUND(
-                            (SUM(CASE WHEN m.winner = m.team2 THEN 1 ELSE 0 END) OVER (PARTITION BY m.team2) * 100.0) / 
-                            NULLIF(COUNT(CASE WHEN m.winner IS NOT NULL THEN 1 END) OVER (PARTITION BY m.team2), 0), 
-                            2
-                        ) as win_percentage,
-                        m.match_type,
-                        m.competition as latest_competition,
-                        ROW_NUMBER() OVER (PARTITION BY m.team2 ORDER BY m.date DESC, m.id DESC) as rn
-                    FROM matches m
-                    WHERE m.team2_elo IS NOT NULL
-                    AND m.format = :fmt AND m.gender = :gender
-                    AND (:start_date IS NULL OR m.date >= :start_date)
-                    AND (:end_date IS NULL OR m.date <= :end_date)
-                    {competition_filter}
-                ) combined_elos
-                WHERE rn = 1
-                ORDER BY team_name, latest_date DESC
+            WITH scoped AS (
+                SELECT t.*
+                FROM {source} t
+                WHERE t.format = :fmt AND t.gender = :gender
+                AND (CAST(:start_date AS DATE) IS NULL OR t.date >= :start_date)
+                AND (CAST(:end_date AS DATE) IS NULL OR t.date <= :end_date)
+                {competition_filter}
+            ),
+            latest AS (
+                SELECT DISTINCT ON (team_key)
+                    team_key, team_name, elo, date, match_type, competition
+                FROM scoped
+                ORDER BY team_key, date DESC, match_id DESC
+            ),
+            totals AS (
+                SELECT
+                    team_key,
+                    COUNT(*) AS total_matches,
+                    COUNT(*) FILTER (WHERE result = 'W') AS wins,
+                    COUNT(*) FILTER (WHERE result = 'L') AS losses
+                FROM scoped
+                GROUP BY team_key
             )
             SELECT 
-                team_name,
-                latest_elo as current_elo,
-                latest_date,
-                total_matches,
-                wins,
-                losses,
-                COALESCE(win_percentage, 0) as win_percentage,
-                match_type,
-                latest_competition
-            FROM latest_team_elos
-            WHERE latest_elo IS NOT NULL
-            ORDER BY latest_elo DESC, team_name ASC
+                l.team_name,
+                l.elo as current_elo,
+                l.date as latest_date,
+                tt.total_matches,
+                tt.wins,
+                tt.losses,
+                COALESCE(ROUND(tt.wins * 100.0 / NULLIF(tt.wins + tt.losses, 0), 2), 0) as win_percentage,
+                l.match_type,
+                l.competition as latest_competition
+            FROM latest l
+            JOIN totals tt ON tt.team_key = l.team_key
+            ORDER BY l.elo DESC, l.team_name ASC
         """)
         
         results = db.execute(elo_rankings_query, params).fetchall()
@@ -439,63 +406,26 @@ def get_teams_elo_history_service(
         if not teams:
             return {}
         
-        all_team_variations = []
-        team_mapping = {}
-        
+        # Requested name per canonical key; the timeline already folds name variations together
+        requested = {}
         for team in teams:
-            variations = get_all_team_name_variations(team)
-            all_team_variations.extend(variations)
-            for var in variations:
-                team_mapping[var] = team
+            requested.setdefault(canonical_team_key(team), team)
         
         params = {
-            "team_variations": all_team_variations,
+            "team_keys": list(requested),
             "start_date": start_date,
             "end_date": end_date
         }
+        source, source_params = timeline_source(db)
+        params.update(source_params)
         
-        elo_history_query = text("""
-            WITH team_elo_evolution AS (
-                SELECT 
-                    m.team1 as team_name,
-                    m.team1_elo as elo_rating,
-                    m.date,
-                    m.id as match_id,
-                    m.team2 as opponent,
-                    m.winner,
-                    1 as team_position
-                FROM matches m
-                WHERE m.team1 = ANY(:team_variations)
-                AND m.team1_elo IS NOT NULL
-                AND (:start_date IS NULL OR m.date >= :start_date)
-                AND (:end_date IS NULL OR m.date <= :end_date)
-                
-                UNION ALL
-                
-                SELECT 
-                    m.team2 as team_name,
-                    m.team2_elo as elo_rating,
-                    m.date,
-                    m.id as match_id,
-                    m.team1 as opponent,
-                    m.winner,
-                    2 as team_position
-                FROM matches m
-                WHERE m.team2 = ANY(:team_variations)
-                AND m.team2_elo IS NOT NULL
-                AND (:start_date IS NULL OR m.date >= :start_date)
-                AND (:end_date IS NULL OR m.date <= :end_date)
-            )
-            SELECT 
-                team_name,
-                elo_rating,
-                date,
-                match_id,
-                opponent,
-                winner,
-                team_position
-            FROM team_elo_evolution
-            ORDER BY team_name, date ASC, match_id ASC
+        elo_history_query = text(f"""
+            SELECT team_key, elo, date, match_id, opponent, result
+            FROM {source} t
+            WHERE team_key = ANY(:team_keys)
+            AND (CAST(:start_date AS DATE) IS NULL OR date >= :start_date)
+            AND (CAST(:end_date AS DATE) IS NULL OR date <= :end_date)
+            ORDER BY team_key, date ASC, match_id ASC
         """)
         
         results = db.execute(elo_history_query, params).fetchall()
@@ -503,25 +433,14 @@ def get_teams_elo_history_service(
         team_histories = {}
         
         for row in results:
-            std_team_name = team_mapping.get(row.team_name, row.team_name)
-            
-            if std_team_name not in team_histories:
-                team_histories[std_team_name] = []
-            
-            match_result = "NR"
-            if row.winner:
-                winner_variations = get_all_team_name_variations(row.winner)
-                match_result = "W" if row.team_name in winner_variations else "L"
-            
-            elo_point = {
+            std_team_name = requested[row.team_key]
+            team_histories.setdefault(std_team_name, []).append({
                 "date": row.date.isoformat(),
-                "elo": row.elo_rating,
+                "elo": row.elo,
                 "match_id": row.match_id,
                 "opponent": teams_mapping.get(row.opponent, row.opponent),
-                "result": match_result
-            }
-            
-            team_histories[std_team_name].append(elo_point)
+                "result": row.result
+            })
         
         return team_histories
         
@@ -0,0 +1,248 @@
+"""
+team_elo_timeline: one row per team per rated match, keyed by canonical team.
+
+The ELO ranking and history endpoints used to rebuild every team's trajectory from
+``matches`` per request: a UNION over team1/team2 with window functions across the whole
+table, plus team-name variation lists (Delhi Daredevils/Capitals, Kings XI/Punjab Kings...)
+expanded in Python. The timeline stores that expansion once:
+
+    team_key     canonical team (``teams_mapping`` abbreviation, else the stored name)
+    team_name    name as stored on the match
+    match_id, date, format, gender, match_type, competition
+    opponent     opponent name as stored on the match
+    elo          pre-match rating (matches.team1_elo / team2_elo)
+    result       'W' / 'L' / 'NR' from the team's point of view
+
+Indexed on (team_key, format, gender, date) and (format, gender, date), so "rating of a
+team as of D" is one index probe and "top N on D" one DISTINCT ON over the index.
+
+Rows are maintained by ``sync_elo_timeline`` inside the same transaction that writes the
+ratings (elo_replay.write_elo_ratings), so every ELO update path keeps it current; each
+write re-derives the rows that ``stale_timeline_matches`` finds out of date, which also
+picks up a corrected winner on a match whose ratings did not move. The first
+such write creates and fills it (``ensure_elo_timeline``, serialized by an advisory lock);
+until then ``timeline_source`` derives the same rows from ``matches`` per query. Create or
+rebuild it by hand with:
+
+    python scripts/refresh_elo_timeline.py
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.sql import text
+
+from models import teams_mapping
+from services.cache import get_cache
+
+TIMELINE_TABLE = "team_elo_timeline"
+
+# Only "the table exists" is cached, so reads switch over once the first write creates it
+_EXISTS_CACHE = get_cache("elo_timeline_exists", ttl_seconds=3600, max_entries=1)
+
+
+def canonical_team_key(team_name: str) -> str:
+    """Key shared by every name variation of a team (e.g. 'Delhi Daredevils' -> 'DC')."""
+    return teams_mapping.get(team_name, team_name)
+
+
+def _mapping_params() -> Dict[str, List[str]]:
+    names = list(teams_mapping.keys())
+    return {"map_names": names, "map_keys": [teams_mapping[n] for n in names]}
+
+
+def _table_exists(conn) -> bool:
+    return bool(conn.execute(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": TIMELINE_TABLE}
+    ).scalar())
+
+
+def timeline_exists(conn) -> bool:
+    """Whether the timeline table exists; a positive answer is cached per worker."""
+    if _EXISTS_CACHE.get(TIMELINE_TABLE):
+        return True
+    exists = _table_exists(conn)
+    if exists:
+        _EXISTS_CACHE.set(TIMELINE_TABLE, True)
+    return exists
+
+
+def _create_timeline(conn) -> None:
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {TIMELINE_TABLE} (
+            team_key VARCHAR NOT NULL,
+            match_id VARCHAR NOT NULL,
+            team_name VARCHAR NOT NULL,
+            date DATE NOT NULL,
+            format VARCHAR(8) NOT NULL,
+            gender VARCHAR(6) NOT NULL,
+            match_type VARCHAR,
+            competition VARCHAR,
+            opponent VARCHAR,
+            elo INTEGER NOT NULL,
+            result VARCHAR(2) NOT NULL,
+            PRIMARY KEY (match_id, team_key)
+        )
+    """))
+    conn.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS idx_{TIMELINE_TABLE}_team_date
+        ON {TIMELINE_TABLE} (team_key, format, gender, date DESC, match_id DESC)
+    """))
+    conn.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS idx_{TIMELINE_TABLE}_date
+        ON {TIMELINE_TABLE} (format, gender, date DESC)
+    """))
+
+
+def ensure_elo_timeline(conn) -> bool:
+    """
+    Create the timeline table and its indexes if they do not exist yet, filling a newly
+    created table from ``matches`` (no commit).
+
+    Concurrent callers are serialized by a transaction-level advisory lock: the first one
+    creates and fills the table, the others find it in place once that transaction commits.
+
+    Returns:
+        True if the table was created
+    """
+    if _table_exists(conn):
+        return False
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": TIMELINE_TABLE})
+    if _table_exists(conn):
+        return False
+    _create_timeline(conn)
+    conn.execute(text(_insert_sql("")), _mapping_params())
+    return True
+
+
+def _timeline_select(match_filter: str) -> str:
+    return f"""
+        SELECT
+            COALESCE(tk.key, s.team_name) AS team_key,
+            m.id AS match_id, s.team_name, m.date, m.format, m.gender,
+            m.match_type, m.competition, s.opponent, s.elo,
+            CASE
+                WHEN m.winner IS NULL THEN 'NR'
+                WHEN COALESCE(wk.key, m.winner) = COALESCE(tk.key, s.team_name) THEN 'W'
+                ELSE 'L'
+            END AS result
+        FROM matches m
+        CROSS JOIN LATERAL (VALUES
+            (m.team1, m.team2, m.team1_elo),
+            (m.team2, m.team1, m.team2_elo)
+        ) AS s(team_name, opponent, elo)
+        LEFT JOIN unnest(CAST(:map_names AS VARCHAR[]), CAST(:map_keys AS VARCHAR[])) AS tk(name, key)
+            ON tk.name = s.team_name
+        LEFT JOIN unnest(CAST(:map_names AS VARCHAR[]), CAST(:map_keys AS VARCHAR[])) AS wk(name, key)
+            ON wk.name = m.winner
+        WHERE s.elo IS NOT NULL
+        {match_filter}
+    """
+
+
+def _insert_sql(match_filter: str) -> str:
+    return f"""
+        INSERT INTO {TIMELINE_TABLE} (
+            team_key, match_id, team_name, date, format, gender,
+            match_type, competition, opponent, elo, result
+        )
+        {_timeline_select(match_filter)}
+        ON CONFLICT (match_id, team_key) DO NOTHING
+    """
+
+
+def timeline_source(db) -> Tuple[str, Dict[str, List[str]]]:
+    """
+    FROM-clause source and bind params for timeline reads: the table, or the same rows
+    derived from ``matches`` on the fly while the table has not been created yet.
+    """
+    if timeline_exists(db):
+        return TIMELINE_TABLE, {}
+    return f"({_timeline_select('')})", _mapping_params()
+
+
+def stale_timeline_matches(conn, match_ids: Sequence[str]) -> List[str]:
+    """
+    Those of ``match_ids`` whose timeline rows no longer match what ``matches`` derives:
+    a changed rating, but also a corrected winner, team, date or competition.
+    """
+    if not match_ids:
+        return []
+    rows = conn.execute(text(f"""
+        SELECT DISTINCT COALESCE(d.match_id, t.match_id) AS match_id
+        FROM ({_timeline_select("AND m.id = ANY(:ids)")}) d
+        FULL JOIN (SELECT * FROM {TIMELINE_TABLE} WHERE match_id = ANY(:ids)) t
+            ON t.match_id = d.match_id AND t.team_key = d.team_key
+        WHERE (d.team_name, d.date, d.format, d.gender, d.match_type, d.competition,
+               d.opponent, d.elo, d.result)
+            IS DISTINCT FROM
+              (t.team_name, t.date, t.format, t.gender, t.match_type, t.competition,
+               t.opponent, t.elo, t.result)
+    """), {"ids": list(match_ids), **_mapping_params()}).fetchall()
+    return [row.match_id for row in rows]
+
+
+def sync_elo_timeline(conn, match_ids: Sequence[str]) -> int:
+    """
+    Re-derive the timeline rows of these matches from ``matches`` (no commit).
+
+    The caller runs ``ensure_elo_timeline`` first, once per batch of writes.
+
+    Returns:
+        Number of timeline rows written
+    """
+    if not match_ids:
+        return 0
+    ids = list(match_ids)
+    conn.execute(text(f"DELETE FROM {TIMELINE_TABLE} WHERE match_id = ANY(:ids)"), {"ids": ids})
+    result = conn.execute(
+        text(_insert_sql("AND m.id = ANY(:ids)")),
+        {"ids": ids, **_mapping_params()},
+    )
+    return result.rowcount or 0
+
+
+def rebuild_elo_timeline(conn) -> int:
+    """Rebuild the whole timeline from ``matches`` (no commit). Returns rows written."""
+    _create_timeline(conn)
+    conn.execute(text(f"TRUNCATE {TIMELINE_TABLE}"))
+    result = conn.execute(text(_insert_sql("")), _mapping_params())
+    return result.rowcount or 0
+
+
+def clear_elo_timeline(conn) -> None:
+    """Empty the timeline if it exists (no commit), e.g. when every rating is cleared."""
+    if _table_exists(conn):
+        conn.execute(text(f"TRUNCATE {TIMELINE_TABLE}"))
+
+
+def get_team_elo_as_of(db, team_name: str, as_of: date, fmt: str = "T20",
+                       gender: str = "male") -> Optional[int]:
+    """Pre-match rating of the team's last match on or before ``as_of``, or None."""
+    source, source_params = timeline_source(db)
+    return db.execute(text(f"""
+        SELECT elo FROM {source} t
+        WHERE team_key = :team_key AND format = :fmt AND gender = :gender AND date <= :as_of
+        ORDER BY date DESC, match_id DESC
+        LIMIT 1
+    """), {"team_key": canonical_team_key(team_name), "fmt": fmt, "gender": gender,
+           "as_of": as_of, **source_params}).scalar()
+
+
+def get_top_teams_on(db, as_of: date, limit: int = 10, fmt: str = "T20",
+                     gender: str = "male") -> List[Tuple[str, str, int]]:
+    """(team_key, team_name, elo) of the ``limit`` highest-rated teams on ``as_of``."""
+    source, source_params = timeline_source(db)
+    rows = db.execute(text(f"""
+        SELECT team_key, team_name, elo
+        FROM (
+            SELECT DISTINCT ON (team_key) team_key, team_name, elo
+            FROM {source} t
+            WHERE format = :fmt AND gender = :gender AND date <= :as_of
+            ORDER BY team_key, date DESC, match_id DESC
+        ) latest
+        ORDER BY elo DESC, team_name ASC
+        LIMIT :limit
+    """), {"fmt": fmt, "gender": gender, "as_of": as_of, "limit": limit,
+           **source_params}).fetchall()
+    return [(row.team_key, row.team_name, row.elo) for row in rows]
@@ -0,0 +1,145 @@
+"""
+Persistence and caching shared by the precomputed feature matrices.
+
+The doppelganger player matrices (services.doppelganger_matrix) and the venue matrices
+(services.venue_feature_matrix) are both built once per (window, scope), cached in-process
+and persisted as .npz files tagged with a data fingerprint. This module holds that common
+machinery:
+
+- ``save_arrays`` / ``load_arrays``: atomic .npz write, and a read that returns None when the
+  file is missing, unreadable or tagged with another fingerprint
+- ``cached_fingerprint``: a fingerprint query behind a short-TTL cache
+- ``cached_matrix``: process cache -> persisted file -> build (and persist), with concurrent
+  cold requests sharing one build
+- ``prune_stale_matrices``: delete files built on other data
+
+plus the column statistics both similarity searches rank with (``zscore_columns``,
+``percentile_rank``).
+"""
+
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Name of the JSON metadata entry in every matrix file; holds at least the fingerprint
+META_KEY = "meta"
+
+
+def cached_fingerprint(cache: TTLCache, key: Hashable, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """``compute()`` at most once per cache TTL; callers get their own copy."""
+    fingerprint = cache.get(key)
+    if fingerprint is None:
+        fingerprint = compute()
+        cache.set(key, fingerprint)
+    return dict(fingerprint)
+
+
+def save_arrays(path: str, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> None:
+    """Write ``arrays`` and ``meta`` to ``path`` atomically (readers never see a partial file)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        np.savez(fh, **{META_KEY: np.array(json.dumps(meta, sort_keys=True))}, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_arrays(
+    path: str, fingerprint: Optional[Dict[str, Any]] = None, label: str = "feature matrix"
+) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+    """(arrays, meta) stored at ``path``, or None if missing, unreadable or built on other data."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data[META_KEY]))
+            if fingerprint is not None and meta["fingerprint"] != fingerprint:
+                return None
+            return {name: data[name] for name in data.files if name != META_KEY}, meta
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable {label} {path}: {e}")
+        return None
+
+
+def cached_matrix(
+    cache: TTLCache,
+    key: Hashable,
+    path: str,
+    load: Callable[[], Any],
+    build: Callable[[], Any],
+    force_refresh: bool = False,
+    label: str = "feature matrix",
+) -> Any:
+    """
+    The matrix under ``key``: from ``cache``, else ``load()`` (None when the persisted file is
+    stale), else ``build()`` and persist it to ``path``. ``key`` must include the fingerprint.
+    """
+    if not force_refresh:
+        matrix = cache.get(key)
+        if matrix is not None:
+            return matrix
+
+    def _load_or_build() -> Any:
+        matrix = None if force_refresh else load()
+        if matrix is None:
+            matrix = build()
+            try:
+                matrix.save(path)
+            except OSError as e:
+                logger.warning(f"Could not persist {label} {path}: {e}")
+        return matrix
+
+    # Concurrent requests for the same cold window share one build
+    return cache.fill(key, _load_or_build, refresh=force_refresh)
+
+
+def prune_stale_matrices(root: str, fingerprint: Optional[Dict[str, Any]] = None) -> int:
+    """Delete persisted matrices under ``root`` built on other data than ``fingerprint``; returns how many."""
+    if not os.path.isdir(root):
+        return 0
+    removed = 0
+    for file_name in os.listdir(root):
+        if not file_name.endswith(".npz"):
+            continue
+        path = os.path.join(root, file_name)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                stale = json.loads(str(data[META_KEY]))["fingerprint"] != fingerprint
+        except Exception:
+            stale = True
+        if stale:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def zscore_columns(block: np.ndarray) -> np.ndarray:
+    """
+    Z-score each column over its non-missing values (population std, 1 when flat or empty).
+    Missing values come back as 0, i.e. neutral rather than zero-valued.
+    """
+    present = ~np.isnan(block)
+    counts = present.sum(axis=0)
+    filled = np.where(present, block, 0.0)
+    mean = np.divide(filled.sum(axis=0), counts, out=np.zeros(block.shape[1]), where=counts > 0)
+    deviations = np.where(present, block - mean, 0.0)
+    var = np.divide((deviations ** 2).sum(axis=0), counts, out=np.zeros(block.shape[1]), where=counts > 0)
+    std = np.sqrt(var)
+    std[std <= 0] = 1.0
+    return deviations / std
+
+
+def percentile_rank(values: np.ndarray, raw_value: float, higher_is_better: bool) -> float:
+    """Mid-rank percentile of ``raw_value`` among the non-missing ``values``, higher = better."""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return 50.0
+    better = np.count_nonzero(values < raw_value if higher_is_better else values > raw_value)
+    equal = np.count_nonzero(values == raw_value)
+    return round(((better + equal * 0.5) * 100.0) / len(values), 1)
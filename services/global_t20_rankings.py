@@ -7,7 +7,11 @@ Implements:
 - Variation penalty across length buckets
 - Cross-league competition weights (MixedLM with fallback)
 - Logistic squashing to 0-100
-- In-memory TTL caches for rankings, weights, and trajectories
+- Bounded TTL caches (services.cache) for rankings, weights, and trajectories
+- Month-aligned windows summed from the rankings_monthly_cells cube (services.rankings_cube)
+  when it has been built, sliding over consecutive months for trajectories and history
+- Pages and player lookups served from memory-mapped snapshots (services.rankings_snapshot)
+  for every window the last snapshot build covers
 """
 
 from __future__ import annotations
@@ -16,17 +20,22 @@ import calendar
 import copy
 import logging
 import math
+import threading
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date, timedelta
 from statistics import mean, median
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
 
+from services.cache import TTLCache, get_cache
 from services.player_aliases import get_player_names
+from services.rankings_snapshot import RankingArtifact, RankingsSnapshot, get_rankings_snapshots, snapshots_enabled
 
 try:
     import numpy as np
@@ -59,6 +68,9 @@ MIN_CELL_BALLS = 10
 MIN_BALLS_PER_LENGTH_BATTING = 50
 MIN_BALLS_PER_LENGTH_BOWLING = 50
 
+# Trailing window behind every trajectory snapshot and history entry
+RANKINGS_WINDOW_MONTHS = 24
+
 LENGTH_BUCKETS_ALL = ("FULL", "GOOD_LENGTH", "SHORT_OF_GOOD", "SHORT")
 LENGTH_BUCKETS_SPIN_BOWLING = ("FULL", "GOOD_LENGTH", "SHORT_OF_GOOD")
 
@@ -67,6 +79,10 @@ RANKINGS_CACHE_TTL_SECONDS = 60 * 60      # 1 hour
 COMP_WEIGHTS_CACHE_TTL_SECONDS = 24 * 60 * 60  # 24 hours
 TRAJECTORY_CACHE_TTL_SECONDS = 6 * 60 * 60     # 6 hours
 DELIVERY_SCHEMA_CACHE_TTL_SECONDS = 6 * 60 * 60  # 6 hours
+COMP_WEIGHTS_VERSION_TTL_SECONDS = 60  # how soon an ingestion is noticed
+# A failed background fit of a window is retried after this long, doubling per failure
+COMP_WEIGHTS_REFIT_BACKOFF_SECONDS = 60
+COMP_WEIGHTS_REFIT_MAX_BACKOFF_SECONDS = 60 * 60  # 1 hour
 
 
 DEFAULT_COMPETITION_WEIGHTS: Dict[str, float] = {
@@ -83,10 +99,23 @@ DEFAULT_COMPETITION_WEIGHTS: Dict[str, float] = {
 }
 
 
-_RANKINGS_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
-_COMP_WEIGHTS_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
-_TRAJECTORY_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
-_DELIVERY_SCHEMA_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+_RANKINGS_CACHE = get_cache("rankings", ttl_seconds=RANKINGS_CACHE_TTL_SECONDS, max_entries=128)
+_COMP_WEIGHTS_CACHE = get_cache("rankings_comp_weights", ttl_seconds=COMP_WEIGHTS_CACHE_TTL_SECONDS, max_entries=512)
+_TRAJECTORY_CACHE = get_cache("rankings_trajectory", ttl_seconds=TRAJECTORY_CACHE_TTL_SECONDS, max_entries=1024)
+_DELIVERY_SCHEMA_CACHE = get_cache("rankings_delivery_schema", ttl_seconds=DELIVERY_SCHEMA_CACHE_TTL_SECONDS, max_entries=8)
+# (window, data version) -> {"failures", "retry_at"} of background fits that failed
+_REFIT_FAILURES = get_cache(
+    "rankings_comp_weights_refit_failures",
+    ttl_seconds=2 * COMP_WEIGHTS_REFIT_MAX_BACKOFF_SECONDS,
+    max_entries=512,
+)
+
+# Competition weight fits missing from competition_weight_fits are fitted one at a time off the
+# request path; see _get_competition_weights.
+_WEIGHT_FITS = threading.local()
+_REFIT_LOCK = threading.Lock()
+_REFITS_PENDING: set = set()
+_REFIT_EXECUTOR: Optional[ThreadPoolExecutor] = None
 
 
 # These rankings are men's T20 by definition -- the module name says so, and the buckets and
@@ -127,26 +156,17 @@ END
 """
 
 
-def _now() -> float:
-    return time.time()
-
-
-def _cache_get(cache: Dict[Tuple[Any, ...], Dict[str, Any]], key: Tuple[Any, ...], ttl_seconds: int) -> Optional[Any]:
-    entry = cache.get(key)
-    if not entry:
+def _cache_get(cache: TTLCache, key: Tuple[Any, ...]) -> Optional[Any]:
+    # Callers mutate the payloads they get back (pagination, rank annotation), so neither side
+    # may share the cached object.
+    payload = cache.get(key)
+    if payload is None:
         return None
-    age = _now() - entry["ts"]
-    if age > ttl_seconds:
-        cache.pop(key, None)
-        return None
-    return copy.deepcopy(entry["payload"])
+    return copy.deepcopy(payload)
 
 
-def _cache_set(cache: Dict[Tuple[Any, ...], Dict[str, Any]], key: Tuple[Any, ...], payload: Any) -> None:
-    cache[key] = {
-        "ts": _now(),
-        "payload": copy.deepcopy(payload),
-    }
+def _cache_set(cache: TTLCache, key: Tuple[Any, ...], payload: Any) -> None:
+    cache.set(key, copy.deepcopy(payload))
 
 
 def _round(value: Optional[float], digits: int = 4) -> Optional[float]:
@@ -291,9 +311,18 @@ def _coalesced_trim_expr(table_alias: str, columns: Sequence[str]) -> str:
     return f"COALESCE({', '.join(parts)})"
 
 
+def _player_key_sql(player_expr: str) -> str:
+    """
+    Player name of a ball, '' when it has none (``_coalesced_trim_expr`` maps blank names to
+    NULL). The direct cell fetchers drop '' balls from the cells and the rankings cube keeps them
+    as totals-only rows, so both paths count the same balls per player.
+    """
+    return f"COALESCE({player_expr}, '')"
+
+
 def _get_delivery_schema_config(db: Session) -> Dict[str, Any]:
     cache_key = ("delivery_details_schema",)
-    cached = _cache_get(_DELIVERY_SCHEMA_CACHE, cache_key, DELIVERY_SCHEMA_CACHE_TTL_SECONDS)
+    cached = _cache_get(_DELIVERY_SCHEMA_CACHE, cache_key)
     if cached is not None:
         return cached
 
@@ -415,6 +444,47 @@ def _add_months(d: date, months: int) -> date:
     return date(year, month, day)
 
 
+def _trailing_window_start(month_end: date) -> date:
+    # First day of the month RANKINGS_WINDOW_MONTHS - 1 months back, so the window is whole
+    # months. Stepping back from the month end instead (Feb 28 -> Feb 28, +1 day) started the
+    # window on a leap-year Feb 29 and made it one day longer than 24 months.
+    return _add_months(month_end.replace(day=1), -(RANKINGS_WINDOW_MONTHS - 1))
+
+
+def _is_month_window(start: date, end: date) -> bool:
+    return start.day == 1 and end == _month_end(end)
+
+
+def _rankings_cube_ready(db: Session) -> bool:
+    cache_key = ("rankings_cube_available",)
+    if _cache_get(_DELIVERY_SCHEMA_CACHE, cache_key):
+        return True
+    if np is None:
+        return False
+
+    from services.rankings_cube import rankings_cube_available
+
+    available = rankings_cube_available(db)
+    # Only a positive answer is cached, so a cube built after startup is picked up
+    if available:
+        _cache_set(_DELIVERY_SCHEMA_CACHE, cache_key, True)
+    return available
+
+
+CellsAndTotals = Tuple[List[Dict[str, Any]], Dict[Tuple[str, str, str], Dict[str, float]]]
+
+
+def _fetch_window_cells(db: Session, mode: str, start: date, end: date) -> CellsAndTotals:
+    """Cells and baseline totals of one mode, from the monthly cube when the window allows."""
+    if _is_month_window(start, end) and _rankings_cube_ready(db):
+        from services.rankings_cube import load_rankings_cube
+
+        return load_rankings_cube(db, mode, start, end).window(start, end)
+    if mode == "batting":
+        return _fetch_batting_cells(db, start, end), _fetch_batting_totals(db, start, end)
+    return _fetch_bowling_cells(db, start, end), _fetch_bowling_totals(db, start, end)
+
+
 def _fetch_batting_cells(db: Session, start: date, end: date) -> List[Dict[str, Any]]:
     schema_cfg = _get_delivery_schema_config(db)
     date_filter_sql, date_filter_params = _build_delivery_date_filter(schema_cfg, start, end)
@@ -423,7 +493,7 @@ def _fetch_batting_cells(db: Session, start: date, end: date) -> List[Dict[str,
         f"""
         WITH normalized AS (
             SELECT
-                {schema_cfg["batter_expr"]} AS batter_name,
+                {_player_key_sql(schema_cfg["batter_expr"])} AS batter_name,
                 dd.competition,
                 {LENGTH_BUCKET_SQL} AS length_bucket,
                 {BOWL_KIND_BUCKET_SQL} AS bowl_kind_bucket,
@@ -433,7 +503,6 @@ def _fetch_batting_cells(db: Session, start: date, end: date) -> List[Dict[str,
             WHERE {FORMAT_PIN_SQL}
               AND {date_filter_sql}
               AND dd.length IS NOT NULL
-              AND {schema_cfg["batter_expr"]} IS NOT NULL
               AND dd.competition IS NOT NULL
               AND TRIM(dd.competition) <> ''
               AND (dd.wide IS NULL OR dd.wide = 0)
@@ -447,7 +516,8 @@ def _fetch_batting_cells(db: Session, start: date, end: date) -> List[Dict[str,
             SUM(runs_scored)::float AS runs,
             SUM(controlled_ball)::float AS controlled
         FROM normalized
-        WHERE length_bucket IS NOT NULL
+        WHERE batter_name <> ''
+          AND length_bucket IS NOT NULL
           AND bowl_kind_bucket IS NOT NULL
         GROUP BY batter_name, competition, length_bucket, bowl_kind_bucket
         HAVING COUNT(*) >= :min_cell_balls
@@ -533,7 +603,7 @@ def _fetch_bowling_cells(db: Session, start: date, end: date) -> List[Dict[str,
         f"""
         WITH normalized AS (
             SELECT
-                {schema_cfg["bowler_expr"]} AS bowler_name,
+                {_player_key_sql(schema_cfg["bowler_expr"])} AS bowler_name,
                 dd.competition,
                 {LENGTH_BUCKET_SQL} AS length_bucket,
                 {BOWL_KIND_BUCKET_SQL} AS bowl_kind_bucket,
@@ -543,7 +613,6 @@ def _fetch_bowling_cells(db: Session, start: date, end: date) -> List[Dict[str,
             WHERE {FORMAT_PIN_SQL}
               AND {date_filter_sql}
               AND dd.length IS NOT NULL
-              AND {schema_cfg["bowler_expr"]} IS NOT NULL
               AND dd.competition IS NOT NULL
               AND TRIM(dd.competition) <> ''
               AND (dd.wide IS NULL OR dd.wide = 0)
@@ -557,7 +626,8 @@ def _fetch_bowling_cells(db: Session, start: date, end: date) -> List[Dict[str,
             SUM(runs_conceded)::float AS runs,
             SUM(dot_ball)::float AS dots
         FROM normalized
-        WHERE length_bucket IS NOT NULL
+        WHERE bowler_name <> ''
+          AND length_bucket IS NOT NULL
           AND bowl_kind_bucket IS NOT NULL
         GROUP BY bowler_name, competition, length_bucket, bowl_kind_bucket
         HAVING COUNT(*) >= :min_cell_balls
@@ -725,7 +795,26 @@ def _build_comp_weight_rows(
     return rows
 
 
-def _fit_competition_weights_mixedlm(rows: Sequence[Dict[str, Any]]) -> Optional[Dict[str, float]]:
+def _mixedlm_start_params(model: Any, warm_start: Optional[Dict[str, float]]) -> Optional[Any]:
+    # Fixed effects of competitions the earlier fit did not see start at zero; the result is
+    # the same optimum, reached in far fewer iterations when the windows overlap.
+    if not warm_start or "Group Var" not in warm_start:
+        return None
+    from statsmodels.regression.mixed_linear_model import MixedLMParams
+
+    fe_params = np.array([float(warm_start.get(name, 0.0)) for name in model.exog_names])
+    cov_re = np.array([[max(float(warm_start["Group Var"]), 1e-6)]])
+    return MixedLMParams.from_components(fe_params=fe_params, cov_re=cov_re)
+
+
+def _fit_competition_weights_mixedlm(
+    rows: Sequence[Dict[str, Any]],
+    warm_start: Optional[Dict[str, float]] = None,
+) -> Optional[Tuple[Dict[str, float], Dict[str, float]]]:
+    """
+    Returns (normalised weights, raw model params) or None. ``warm_start`` is the raw params
+    of an earlier fit, ideally of a nearby window.
+    """
     if not HAS_STATSMODELS or not rows:
         return None
 
@@ -745,8 +834,15 @@ def _fit_competition_weights_mixedlm(rows: Sequence[Dict[str, Any]]) -> Optional
 
     try:
         model = smf.mixedlm("log_deviation ~ C(competition)", data=df, groups=df["player"])
-        result = model.fit(reml=False, method="lbfgs", maxiter=200, disp=False)
-        params = result.params.to_dict()
+        start_params = None
+        try:
+            start_params = _mixedlm_start_params(model, warm_start)
+        except Exception as exc:  # pragma: no cover - malformed stored params
+            logger.warning("Ignoring MixedLM warm start: %s", exc)
+        result = model.fit(
+            start_params=start_params, reml=False, method="lbfgs", maxiter=200, disp=False
+        )
+        params = {name: float(value) for name, value in result.params.to_dict().items()}
 
         intercept = float(params.get("Intercept", 0.0))
         competitions = sorted(df["competition"].dropna().unique().tolist())
@@ -768,7 +864,7 @@ def _fit_competition_weights_mixedlm(rows: Sequence[Dict[str, Any]]) -> Optional
             comp: _clamp(weight / med, 0.70, 1.40)
             for comp, weight in raw_weights.items()
         }
-        return normalized
+        return normalized, params
 
     except Exception as exc:  # pragma: no cover - data-dependent
         logger.warning("MixedLM competition weights failed, using fallback: %s", exc)
@@ -840,6 +936,154 @@ def _merge_competition_weights(computed: Optional[Dict[str, float]]) -> Dict[str
     return {comp: _round(weight, 3) for comp, weight in sorted(merged.items(), key=lambda kv: kv[0])}
 
 
+@contextmanager
+def inline_weight_fits() -> Iterator[None]:
+    """
+    Fit missing competition weights in the calling thread, and store them, instead of
+    handing them to the background refit worker. For batch jobs only (snapshot builds,
+    history exports, the post-ingestion refit); request handlers never fit synchronously.
+    """
+    previous = getattr(_WEIGHT_FITS, "inline", False)
+    _WEIGHT_FITS.inline = True
+    try:
+        yield
+    finally:
+        _WEIGHT_FITS.inline = previous
+
+
+def _weights_data_version(db: Session) -> str:
+    cache_key = ("weights_data_version",)
+    version = _DELIVERY_SCHEMA_CACHE.get(cache_key)
+    if version is None:
+        from services.competition_weight_fits import current_data_version
+
+        version = current_data_version(db)
+        _DELIVERY_SCHEMA_CACHE.set(cache_key, version, ttl_seconds=COMP_WEIGHTS_VERSION_TTL_SECONDS)
+    return version
+
+
+def _weight_fits_ready(db: Session) -> bool:
+    cache_key = ("competition_weight_fits_available",)
+    if _cache_get(_DELIVERY_SCHEMA_CACHE, cache_key):
+        return True
+
+    from services.competition_weight_fits import weight_fits_available
+
+    available = weight_fits_available(db)
+    # Only a positive answer is cached, so the table's first save is picked up
+    if available:
+        _cache_set(_DELIVERY_SCHEMA_CACHE, cache_key, True)
+    return available
+
+
+def _weights_payload(fit: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "weights": fit["weights"],
+        "source": fit["source"],
+        "cross_league_samples": fit.get("cross_league_samples", 0),
+    }
+
+
+def _stored_competition_weights(db: Session, start: date, end: date, version: str) -> Optional[Dict[str, Any]]:
+    if not _weight_fits_ready(db):
+        return None
+    from services.competition_weight_fits import load_weight_fit
+
+    fit = load_weight_fit(db, start, end, version)
+    return _weights_payload(fit) if fit is not None else None
+
+
+def _provisional_competition_weights(db: Session, start: date, end: date, version: str) -> Dict[str, Any]:
+    """What a request gets while its window is being fitted: the nearest stored fit, else the defaults."""
+    nearest = None
+    if _weight_fits_ready(db):
+        from services.competition_weight_fits import nearest_weight_fit
+
+        nearest = nearest_weight_fit(db, start, end, version)
+    if nearest is None:
+        return {
+            "weights": _merge_competition_weights(None),
+            "source": "provisional_default",
+            "cross_league_samples": 0,
+            "provisional": True,
+        }
+    return {**_weights_payload(nearest), "source": f"provisional_{nearest['source']}", "provisional": True}
+
+
+def _fit_and_store_competition_weights(
+    db: Session,
+    start: date,
+    end: date,
+    version: str,
+    batting_cells: Optional[Sequence[Dict[str, Any]]] = None,
+    batting_totals: Optional[Dict[Tuple[str, str, str], Dict[str, float]]] = None,
+) -> Dict[str, Any]:
+    from services.competition_weight_fits import nearest_weight_fit, save_weight_fit
+
+    nearest = nearest_weight_fit(db, start, end, version) if _weight_fits_ready(db) else None
+    payload, model_params = _fit_competition_weights(
+        db, start, end, batting_cells, batting_totals,
+        warm_start=(nearest or {}).get("model_params"),
+    )
+    save_weight_fit(db, start, end, version, payload, model_params)
+    db.commit()
+    return payload
+
+
+def _refit_backoff_seconds(start: date, end: date, version: str) -> float:
+    """How long until a failed fit of this window may be queued again (0 if it may now)."""
+    failure = _REFIT_FAILURES.get((start.isoformat(), end.isoformat(), version))
+    if failure is None:
+        return 0.0
+    return max(0.0, failure["retry_at"] - time.time())
+
+
+def _record_refit_failure(key: Tuple[str, str, str]) -> float:
+    failures = (_REFIT_FAILURES.get(key) or {}).get("failures", 0) + 1
+    backoff = min(COMP_WEIGHTS_REFIT_BACKOFF_SECONDS * 2 ** (failures - 1), COMP_WEIGHTS_REFIT_MAX_BACKOFF_SECONDS)
+    _REFIT_FAILURES.set(key, {"failures": failures, "retry_at": time.time() + backoff})
+    return backoff
+
+
+def _refit_in_background(bind: Any, start: date, end: date, version: str) -> None:
+    key = (start.isoformat(), end.isoformat(), version)
+    db = Session(bind=bind)
+    try:
+        payload = _fit_and_store_competition_weights(db, start, end, version)
+        _cache_set(_COMP_WEIGHTS_CACHE, key, payload)
+        _REFIT_FAILURES.pop(key)
+        logger.info("Refitted competition weights for %s..%s (%s)", start, end, payload["source"])
+    except Exception as exc:
+        db.rollback()
+        backoff = _record_refit_failure(key)
+        logger.warning(
+            "Background competition weights refit for %s..%s failed, retrying in %ds: %s", start, end, backoff, exc
+        )
+    finally:
+        db.close()
+        with _REFIT_LOCK:
+            _REFITS_PENDING.discard(key)
+
+
+def _schedule_weight_refit(db: Session, start: date, end: date, version: str) -> bool:
+    """Queue a fit of this window on the refit worker; False if one is already queued or backing off."""
+    global _REFIT_EXECUTOR
+
+    key = (start.isoformat(), end.isoformat(), version)
+    if _refit_backoff_seconds(start, end, version) > 0:
+        return False
+    with _REFIT_LOCK:
+        if key in _REFITS_PENDING:
+            return False
+        _REFITS_PENDING.add(key)
+        if _REFIT_EXECUTOR is None:
+            # One worker: fits are CPU-bound and must not crowd out request handling
+            _REFIT_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="comp-weights-refit")
+        executor = _REFIT_EXECUTOR
+    executor.submit(_refit_in_background, db.get_bind(), start, end, version)
+    return True
+
+
 def _get_competition_weights(
     db: Session,
     start: date,
@@ -848,23 +1092,64 @@ def _get_competition_weights(
     batting_cells: Optional[Sequence[Dict[str, Any]]] = None,
     batting_totals: Optional[Dict[Tuple[str, str, str], Dict[str, float]]] = None,
 ) -> Dict[str, Any]:
-    key = (start.isoformat(), end.isoformat())
-    if not force_refresh:
-        cached = _cache_get(_COMP_WEIGHTS_CACHE, key, COMP_WEIGHTS_CACHE_TTL_SECONDS)
-        if cached is not None:
-            return cached
+    """
+    Competition weights of a window: from the process cache, else the stored fit of the
+    current data version. Inside ``inline_weight_fits()`` a missing fit is fitted here
+    (warm-started from the nearest stored one); anywhere else it is queued on the refit worker
+    and the caller gets a payload flagged ``provisional``. ``force_refresh`` refits, inline or
+    queued; a handler keeps serving the current fit meanwhile.
+    """
+    version = _weights_data_version(db)
+    key = (start.isoformat(), end.isoformat(), version)
+    fit_inline = getattr(_WEIGHT_FITS, "inline", False)
+
+    if not (force_refresh and fit_inline):
+        payload = _cache_get(_COMP_WEIGHTS_CACHE, key)
+        if payload is None:
+            payload = _stored_competition_weights(db, start, end, version)
+            if payload is not None:
+                _cache_set(_COMP_WEIGHTS_CACHE, key, payload)
+        if payload is not None:
+            if force_refresh:
+                _schedule_weight_refit(db, start, end, version)
+            return payload
+
+    if fit_inline:
+        # Batting and bowling builds for the same window both need these weights; whichever
+        # gets here second waits for the first fit instead of running its own.
+        payload = _COMP_WEIGHTS_CACHE.fill(
+            key,
+            lambda: _fit_and_store_competition_weights(db, start, end, version, batting_cells, batting_totals),
+            refresh=force_refresh,
+        )
+        return copy.deepcopy(payload)
 
-    cells = list(batting_cells) if batting_cells is not None else _fetch_batting_cells(db, start, end)
-    totals = dict(batting_totals) if batting_totals is not None else _fetch_batting_totals(db, start, end)
+    _schedule_weight_refit(db, start, end, version)
+    return _provisional_competition_weights(db, start, end, version)
 
-    comp_rows = _build_comp_weight_rows(cells, totals)
+
+def _fit_competition_weights(
+    db: Session,
+    start: date,
+    end: date,
+    batting_cells: Optional[Sequence[Dict[str, Any]]],
+    batting_totals: Optional[Dict[Tuple[str, str, str], Dict[str, float]]],
+    warm_start: Optional[Dict[str, float]] = None,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, float]]]:
+    """(weights payload, MixedLM params or None when another fit was used)."""
+    if batting_cells is None or batting_totals is None:
+        batting_cells, batting_totals = _fetch_window_cells(db, "batting", start, end)
+
+    comp_rows = _build_comp_weight_rows(list(batting_cells), dict(batting_totals))
 
     computed: Optional[Dict[str, float]] = None
+    model_params: Optional[Dict[str, float]] = None
     source = "fallback_insufficient_cross_league"
 
     if comp_rows:
-        computed = _fit_competition_weights_mixedlm(comp_rows)
-        if computed:
+        fitted = _fit_competition_weights_mixedlm(comp_rows, warm_start=warm_start)
+        if fitted:
+            computed, model_params = fitted
             source = "mixedlm"
         else:
             centered = _fit_competition_weights_centered_wls(comp_rows)
@@ -882,9 +1167,7 @@ def _get_competition_weights(
         "source": source,
         "cross_league_samples": len(comp_rows),
     }
-
-    _cache_set(_COMP_WEIGHTS_CACHE, key, payload)
-    return payload
+    return payload, model_params
 
 
 def _filter_cells_by_bowl_kind(cells: Sequence[Dict[str, Any]], bowl_kind: str) -> List[Dict[str, Any]]:
@@ -1350,22 +1633,53 @@ def _build_rankings_payload(
     bowl_kind: str,
     force_refresh: bool = False,
     variation_mode: str = "occurrence",
+    window_cells: Optional[Callable[[str], CellsAndTotals]] = None,
 ) -> Dict[str, Any]:
     cache_key = (mode, start.isoformat(), end.isoformat(), bowl_kind, variation_mode)
 
     if not force_refresh:
-        cached = _cache_get(_RANKINGS_CACHE, cache_key, RANKINGS_CACHE_TTL_SECONDS)
+        cached = _cache_get(_RANKINGS_CACHE, cache_key)
         if cached is not None:
             return cached
 
+    # A cold window is the most expensive thing this service does; concurrent requests for the
+    # same window (including every page of the same table) share one build.
+    # A table built on provisional weights is served but not cached; the next request after
+    # the background fit lands rebuilds it on the real ones.
+    payload = _RANKINGS_CACHE.fill(
+        cache_key,
+        lambda: _compute_rankings_payload(db, mode, start, end, bowl_kind, variation_mode, window_cells),
+        refresh=force_refresh,
+        cache_if=lambda built: built is not None and not built.get("competition_weights_provisional"),
+    )
+    if payload is not None and payload.get("competition_weights_provisional"):
+        # The window's fit keeps failing: keep serving this table until its next retry
+        # rather than rebuilding it on every request.
+        backoff = _refit_backoff_seconds(start, end, _weights_data_version(db))
+        if backoff > 0:
+            _RANKINGS_CACHE.set(cache_key, copy.deepcopy(payload), ttl_seconds=backoff)
+    return copy.deepcopy(payload)
+
+
+def _compute_rankings_payload(
+    db: Session,
+    mode: str,
+    start: date,
+    end: date,
+    bowl_kind: str,
+    variation_mode: str,
+    window_cells: Optional[Callable[[str], CellsAndTotals]] = None,
+) -> Dict[str, Any]:
+    if window_cells is None:
+        window_cells = lambda cell_mode: _fetch_window_cells(db, cell_mode, start, end)  # noqa: E731
+
     try:
-        batting_cells = _fetch_batting_cells(db, start, end)
-        batting_totals = _fetch_batting_totals(db, start, end)
+        batting_cells, batting_totals = window_cells("batting")
+        # Fits are keyed by data version, so refreshing a ranking never needs a refit
         comp_weight_payload = _get_competition_weights(
             db,
             start,
             end,
-            force_refresh=force_refresh,
             batting_cells=batting_cells,
             batting_totals=batting_totals,
         )
@@ -1385,8 +1699,7 @@ def _build_rankings_payload(
                 "required_lengths": list(LENGTH_BUCKETS_ALL),
             }
         elif mode == "bowling":
-            bowling_cells = _fetch_bowling_cells(db, start, end)
-            bowling_totals = _fetch_bowling_totals(db, start, end)
+            bowling_cells, bowling_totals = window_cells("bowling")
             rows = _build_bowling_rows(
                 cells=bowling_cells,
                 totals=bowling_totals,
@@ -1413,10 +1726,9 @@ def _build_rankings_payload(
             "competition_weights": comp_weights,
             "competition_weight_source": comp_weight_payload.get("source"),
             "cross_league_samples": comp_weight_payload.get("cross_league_samples", 0),
+            "competition_weights_provisional": comp_weight_payload.get("provisional", False),
             "qualification": qualification,
         }
-
-        _cache_set(_RANKINGS_CACHE, cache_key, payload)
         return payload
 
     except HTTPException:
@@ -1445,6 +1757,32 @@ def _normalize_name(name: str) -> str:
     return " ".join((name or "").strip().lower().split())
 
 
+def _current_snapshots(db: Session) -> Optional[RankingsSnapshot]:
+    """The snapshot build made on the data Postgres holds now, or None."""
+    if not snapshots_enabled():
+        return None
+    # Snapshots are built from the same men's T20 data the competition weights are fitted on
+    return get_rankings_snapshots(data_version=_weights_data_version(db), bind=db.get_bind())
+
+
+def _snapshot_ranking(
+    db: Session,
+    mode: str,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    bowl_kind: str,
+) -> Optional[RankingArtifact]:
+    """The snapshot of this ranking, if the current build has one."""
+    snapshots = _current_snapshots(db)
+    if snapshots is None:
+        return None
+    # No dates means "the current two years": served from the window the build used as default
+    if start_date is None and end_date is None:
+        return snapshots.default(mode, bowl_kind)
+    start, end = _resolve_date_range(start_date, end_date)
+    return snapshots.get(mode, bowl_kind, start, end)
+
+
 def _find_player_row(rankings: Sequence[Dict[str, Any]], candidates: Iterable[str]) -> Optional[Dict[str, Any]]:
     candidate_set = {_normalize_name(c) for c in candidates if c}
     if not candidate_set:
@@ -1468,6 +1806,7 @@ def _build_player_trajectory(
     force_refresh: bool,
 ) -> List[Dict[str, Any]]:
     snapshots = max(1, min(36, int(snapshots)))
+    built = None if force_refresh else _current_snapshots(db)
 
     key = (
         mode,
@@ -1475,32 +1814,36 @@ def _build_player_trajectory(
         end_date.isoformat(),
         bowl_kind,
         snapshots,
+        # A new snapshot build must not be shadowed by trajectories cached from the old one
+        built.snapshot_id if built is not None else None,
     )
 
     if not force_refresh:
-        cached = _cache_get(_TRAJECTORY_CACHE, key, TRAJECTORY_CACHE_TTL_SECONDS)
+        cached = _cache_get(_TRAJECTORY_CACHE, key)
         if cached is not None:
             return cached
 
     timeline: List[Dict[str, Any]] = []
     anchor_end = _month_end(end_date)
-
-    for idx in range(snapshots):
-        month_end = _add_months(anchor_end, -(snapshots - 1 - idx))
-        month_end = _month_end(month_end)
-
-        window_start = _add_months(month_end, -24) + timedelta(days=1)
-
-        payload = _build_rankings_payload(
-            db=db,
-            mode=mode,
-            start=window_start,
-            end=month_end,
-            bowl_kind=bowl_kind,
-            force_refresh=force_refresh,
-        )
-
-        row = _find_player_row(payload.get("rankings", []), player_candidates)
+    month_ends = [_month_end(_add_months(anchor_end, -(snapshots - 1 - idx))) for idx in range(snapshots)]
+
+    rows: Dict[date, Optional[Dict[str, Any]]] = {}
+    if built is not None:
+        for month_end in month_ends:
+            artifact = built.get(mode, bowl_kind, _trailing_window_start(month_end), month_end)
+            if artifact is not None:
+                rows[month_end] = artifact.find(player_candidates)
+
+    missing = [month_end for month_end in month_ends if month_end not in rows]
+    provisional = False
+    for _, month_end, _, payload in iter_monthly_rankings(
+        db, mode, missing, bowl_kinds=(bowl_kind,), force_refresh=force_refresh
+    ):
+        rows[month_end] = _find_player_row(payload.get("rankings", []), player_candidates)
+        provisional = provisional or bool(payload.get("competition_weights_provisional"))
+
+    for month_end in month_ends:
+        row = rows[month_end]
         if row:
             timeline.append(
                 {
@@ -1522,32 +1865,206 @@ def _build_player_trajectory(
                 }
             )
 
-    _cache_set(_TRAJECTORY_CACHE, key, timeline)
+    if not provisional:
+        _cache_set(_TRAJECTORY_CACHE, key, timeline)
     return timeline
 
 
-def get_batting_rankings_service(
+def iter_monthly_rankings(
     db: Session,
+    mode: str,
+    month_ends: Sequence[date],
+    bowl_kinds: Sequence[str] = ("all",),
+    force_refresh: bool = False,
+    variation_mode: str = "occurrence",
+) -> Iterator[Tuple[date, date, str, Dict[str, Any]]]:
+    """
+    Rankings for the trailing RANKINGS_WINDOW_MONTHS window of each month end, oldest first.
+
+    Yields (window_start, month_end, bowl_kind, payload). With the monthly cube built, the
+    cube is read once for the whole span and each window is the previous one plus the entering
+    month minus the leaving one, so N snapshots cost one cube read rather than N scans of
+    delivery_details. Payloads land in the rankings cache under the same keys as a direct
+    request for that window; windows already cached are served without touching the cube.
+    """
+    windows = [(_trailing_window_start(month_end), month_end) for month_end in sorted(month_ends)]
+    if not windows:
+        return
+
+    cubes: Dict[str, Any] = {}
+    use_cube = _rankings_cube_ready(db)
+    span_start, span_end = windows[0][0], windows[-1][1]
+
+    def cube_cells(start: date, end: date) -> Callable[[str], CellsAndTotals]:
+        def window_cells(cell_mode: str) -> CellsAndTotals:
+            # Loaded on first use, so a fully cached trajectory never reads the cube
+            if cell_mode not in cubes:
+                from services.rankings_cube import load_rankings_cube
+
+                cubes[cell_mode] = load_rankings_cube(db, cell_mode, span_start, span_end)
+            return cubes[cell_mode].window(start, end)
+
+        return window_cells
+
+    for start, end in windows:
+        window_cells = cube_cells(start, end) if use_cube else None
+        for bowl_kind in bowl_kinds:
+            payload = _build_rankings_payload(
+                db=db,
+                mode=mode,
+                start=start,
+                end=end,
+                bowl_kind=bowl_kind,
+                force_refresh=force_refresh,
+                variation_mode=variation_mode,
+                window_cells=window_cells,
+            )
+            yield start, end, bowl_kind, payload
+
+
+def _rankings_page(
+    db: Session,
+    mode: str,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    limit: int,
+    offset: int,
+    bowl_kind: str,
+    force_refresh: bool,
+) -> Dict[str, Any]:
+    normalized_bowl_kind = _normalize_bowl_kind(bowl_kind)
+    start, end = _resolve_date_range(start_date, end_date)
+
+    artifact = None if force_refresh else _snapshot_ranking(db, mode, start_date, end_date, normalized_bowl_kind)
+    if artifact is not None:
+        return artifact.page(limit=limit, offset=offset)
+
+    payload = _build_rankings_payload(
+        db=db,
+        mode=mode,
+        start=start,
+        end=end,
+        bowl_kind=normalized_bowl_kind,
+        force_refresh=force_refresh,
+    )
+    return _paginate_rankings(payload, limit=limit, offset=offset)
+
+
+def find_ranked_players(
+    db: Session,
+    mode: str,
+    players: Iterable[str],
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    limit: int = 50,
-    offset: int = 0,
     bowl_kind: str = "all",
     force_refresh: bool = False,
-) -> Dict[str, Any]:
-    start, end = _resolve_date_range(start_date, end_date)
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Ranking rows of these players, keyed by normalised name (lower-cased, single-spaced).
+
+    Served by binary search over the snapshot's player index when one covers the window, so
+    looking up a lineup no longer pages through the whole table. Unranked players are absent.
+    """
     normalized_bowl_kind = _normalize_bowl_kind(bowl_kind)
+    artifact = None if force_refresh else _snapshot_ranking(db, mode, start_date, end_date, normalized_bowl_kind)
+    if artifact is not None:
+        return artifact.lookup(players)
 
+    start, end = _resolve_date_range(start_date, end_date)
     payload = _build_rankings_payload(
         db=db,
-        mode="batting",
+        mode=mode,
         start=start,
         end=end,
         bowl_kind=normalized_bowl_kind,
         force_refresh=force_refresh,
     )
+    wanted = {_normalize_name(name) for name in players if name}
+    found: Dict[str, Dict[str, Any]] = {}
+    for row in payload.get("rankings", []):
+        key = _normalize_name(str(row.get("player")))
+        if key in wanted and key not in found:
+            found[key] = row
+    return found
 
-    return _paginate_rankings(payload, limit=limit, offset=offset)
+
+def _snapshot_windows(history_months: int) -> Tuple[date, date, List[date]]:
+    """The default window as of today and the last ``history_months`` month ends."""
+    start, end = _resolve_date_range(None, None)
+    anchor_end = _month_end(end)
+    return start, end, [_month_end(_add_months(anchor_end, -i)) for i in range(history_months)]
+
+
+def refit_competition_weights(
+    db: Session,
+    history_months: int = 36,
+    force: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Fit and store the competition weights of every window a snapshot build needs, on the
+    current data version. Month-end windows go oldest first and the default window last, so
+    each fit warm-starts from the one before it. Fits already stored are kept unless ``force``;
+    fits of older data versions beyond the latest few per window are deleted.
+    """
+    start, end, month_ends = _snapshot_windows(history_months)
+    windows = [(_trailing_window_start(month_end), month_end) for month_end in sorted(month_ends)]
+    windows.append((start, end))
+
+    results = []
+    with inline_weight_fits():
+        for window_start, window_end in windows:
+            payload = _get_competition_weights(db, window_start, window_end, force_refresh=force)
+            results.append({
+                "start": window_start.isoformat(),
+                "end": window_end.isoformat(),
+                "source": payload.get("source"),
+                "cross_league_samples": payload.get("cross_league_samples", 0),
+            })
+
+    if _weight_fits_ready(db):
+        from services.competition_weight_fits import prune_weight_fits
+
+        removed = prune_weight_fits(db)
+        db.commit()
+        if removed:
+            logger.info("Pruned %d competition weight fits of older data versions", removed)
+    return results
+
+
+def iter_snapshot_rankings(
+    db: Session,
+    history_months: int = 36,
+    bowl_kinds: Sequence[str] = ("all", "pace", "spin"),
+) -> Iterator[Tuple[str, str, date, date, bool, Dict[str, Any]]]:
+    """
+    Every ranking a snapshot build holds, as (mode, bowl_kind, start, end, is_default, payload).
+
+    That is the default window (the trailing two years as of today) plus the trailing window
+    of the last ``history_months`` month ends, which covers every player trajectory. Rankings
+    are recomputed rather than read from the TTL caches. Iterate inside ``inline_weight_fits()``
+    so windows without stored competition weights are fitted, not built on provisional ones.
+    """
+    start, end, month_ends = _snapshot_windows(history_months)
+    for mode in ("batting", "bowling"):
+        for bowl_kind in bowl_kinds:
+            payload = _build_rankings_payload(db, mode, start, end, bowl_kind, force_refresh=True)
+            yield mode, bowl_kind, start, end, True, payload
+        for window_start, month_end, bowl_kind, payload in iter_monthly_rankings(
+            db, mode, month_ends, bowl_kinds=bowl_kinds, force_refresh=True
+        ):
+            yield mode, bowl_kind, window_start, month_end, False, payload
+
+
+def get_batting_rankings_service(
+    db: Session,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 50,
+    offset: int = 0,
+    bowl_kind: str = "all",
+    force_refresh: bool = False,
+) -> Dict[str, Any]:
+    return _rankings_page(db, "batting", start_date, end_date, limit, offset, bowl_kind, force_refresh)
 
 
 def get_bowling_rankings_service(
@@ -1559,19 +2076,33 @@ def get_bowling_rankings_service(
     bowl_kind: str = "all",
     force_refresh: bool = False,
 ) -> Dict[str, Any]:
-    start, end = _resolve_date_range(start_date, end_date)
-    normalized_bowl_kind = _normalize_bowl_kind(bowl_kind)
+    return _rankings_page(db, "bowling", start_date, end_date, limit, offset, bowl_kind, force_refresh)
+
+
+def _ranked_player(
+    db: Session,
+    mode: str,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    bowl_kind: str,
+    player_candidates: Sequence[str],
+    force_refresh: bool,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """(payload without its rows, the player's row) from the snapshot, else from a build."""
+    artifact = None if force_refresh else _snapshot_ranking(db, mode, start_date, end_date, bowl_kind)
+    if artifact is not None:
+        return dict(artifact.meta), artifact.find(player_candidates)
 
+    start, end = _resolve_date_range(start_date, end_date)
     payload = _build_rankings_payload(
         db=db,
-        mode="bowling",
+        mode=mode,
         start=start,
         end=end,
-        bowl_kind=normalized_bowl_kind,
+        bowl_kind=bowl_kind,
         force_refresh=force_refresh,
     )
-
-    return _paginate_rankings(payload, limit=limit, offset=offset)
+    return payload, _find_player_row(payload.get("rankings", []), player_candidates)
 
 
 def get_player_rankings_service(
@@ -1606,15 +2137,9 @@ def get_player_rankings_service(
     bowling_trajectory: List[Dict[str, Any]] = []
 
     if normalized_mode in {"all", "batting"}:
-        batting_payload = _build_rankings_payload(
-            db=db,
-            mode="batting",
-            start=start,
-            end=end,
-            bowl_kind=normalized_bowl_kind,
-            force_refresh=force_refresh,
+        batting_payload, batting_row = _ranked_player(
+            db, "batting", start_date, end_date, normalized_bowl_kind, player_candidates, force_refresh
         )
-        batting_row = _find_player_row(batting_payload.get("rankings", []), player_candidates)
         batting_trajectory = _build_player_trajectory(
             db=db,
             player_candidates=player_candidates,
@@ -1626,15 +2151,9 @@ def get_player_rankings_service(
         )
 
     if normalized_mode in {"all", "bowling"}:
-        bowling_payload = _build_rankings_payload(
-            db=db,
-            mode="bowling",
-            start=start,
-            end=end,
-            bowl_kind=normalized_bowl_kind,
-            force_refresh=force_refresh,
+        bowling_payload, bowling_row = _ranked_player(
+            db, "bowling", start_date, end_date, normalized_bowl_kind, player_candidates, force_refresh
         )
-        bowling_row = _find_player_row(bowling_payload.get("rankings", []), player_candidates)
         bowling_trajectory = _build_player_trajectory(
             db=db,
             player_candidates=player_candidates,
@@ -1691,5 +2210,6 @@ def get_competition_weights_service(
         },
         "source": payload.get("source"),
         "cross_league_samples": payload.get("cross_league_samples", 0),
+        "provisional": payload.get("provisional", False),
         "weights": payload.get("weights", {}),
     }
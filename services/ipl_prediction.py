@@ -15,17 +15,16 @@ category weights into a 0-100 composite score.
 from __future__ import annotations
 
 from datetime import datetime, date, timedelta, timezone
-from difflib import get_close_matches
 from math import sqrt
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
 
 from ipl_rosters import get_all_ipl_teams, get_ipl_roster, get_team_abbrev_from_name
 from services.bowler_types import BOWLER_CATEGORY_SQL
-from services.global_t20_rankings import get_batting_rankings_service, get_bowling_rankings_service
-from services.player_aliases import get_player_names
+from services.global_t20_rankings import find_ranked_players
+from services.player_aliases import resolve_player_names_bulk
 from services.teams import get_all_team_name_variations
 
 
@@ -131,6 +130,8 @@ CATEGORY_METRIC_DEFS = {
 
 GLOBAL_RANK_TOP_BATTERS = 7
 GLOBAL_RANK_TOP_BOWLERS = 6
+# Roster spellings this similar to an aliased player name resolve to that player
+ROSTER_NAME_FUZZY_CUTOFF = 0.9
 
 
 MODEL_EXPLAINER = {
@@ -298,60 +299,23 @@ def _normalize_name_key(value: Optional[str]) -> str:
     return " ".join(value.strip().lower().split())
 
 
-def _fetch_all_global_rank_rows(
-    fetch_fn,
-    page_size: int = 500,
-    max_rows: int = 50000,
-) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    offset = 0
-    while len(rows) < max_rows:
-        payload = fetch_fn(limit=page_size, offset=offset)
-        page = payload.get("rankings", []) if isinstance(payload, dict) else []
-        if not page:
-            break
-        rows.extend(page)
-        if len(page) < page_size:
-            break
-        offset += page_size
-    return rows
-
-
 def _build_global_rankings_lookup(
     db: Session,
     date_range: Tuple[date, date],
+    players: Iterable[str],
     force_refresh: bool = False,
 ) -> Dict[str, Dict[str, Dict[str, float]]]:
     start, end = date_range
+    players = [player for player in players if player]
     try:
-        batting_rows = _fetch_all_global_rank_rows(
-            lambda limit, offset: get_batting_rankings_service(
-                db=db,
-                start_date=start,
-                end_date=end,
-                limit=limit,
-                offset=offset,
-                bowl_kind="all",
-                force_refresh=force_refresh,
-            )
-        )
-        bowling_rows = _fetch_all_global_rank_rows(
-            lambda limit, offset: get_bowling_rankings_service(
-                db=db,
-                start_date=start,
-                end_date=end,
-                limit=limit,
-                offset=offset,
-                bowl_kind="all",
-                force_refresh=force_refresh,
-            )
-        )
+        batting_rows = find_ranked_players(db, "batting", players, start, end, force_refresh=force_refresh)
+        bowling_rows = find_ranked_players(db, "bowling", players, start, end, force_refresh=force_refresh)
     except Exception:
         return {"batting": {}, "bowling": {}}
 
-    def _rows_to_lookup(source_rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    def _rows_to_lookup(source_rows: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
         out: Dict[str, Dict[str, float]] = {}
-        for row in source_rows:
+        for row in source_rows.values():
             player = row.get("player")
             key = _normalize_name_key(player)
             if not key:
@@ -464,80 +428,17 @@ def _aggregate_global_rank_metrics(
     }
 
 
-def _build_bulk_name_index(db: Session) -> Dict[str, Any]:
-    alias_rows = db.execute(
-        text(
-            """
-            SELECT player_name, alias_name
-            FROM player_aliases
-            """
-        )
-    ).fetchall()
-    player_rows = db.execute(
-        text(
-            """
-            SELECT name
-            FROM players
-            """
-        )
-    ).fetchall()
-
-    exact_map: Dict[str, Dict[str, str]] = {}
-    for row in alias_rows:
-        legacy_name = row.player_name
-        details_name = row.alias_name or legacy_name
-        if legacy_name:
-            exact_map.setdefault(
-                _normalize_name_key(legacy_name),
-                {"legacy_name": legacy_name, "details_name": details_name},
-            )
-        if details_name:
-            exact_map.setdefault(
-                _normalize_name_key(details_name),
-                {"legacy_name": legacy_name or details_name, "details_name": details_name},
-            )
-
-    for row in player_rows:
-        legacy_name = row.name
-        if legacy_name:
-            exact_map.setdefault(
-                _normalize_name_key(legacy_name),
-                {"legacy_name": legacy_name, "details_name": legacy_name},
-            )
-
-    return {
-        "exact_map": exact_map,
-        "fuzzy_keys": sorted(exact_map.keys()),
-    }
-
-
-def _resolve_name_with_bulk_index(
-    name: str,
-    index: Dict[str, Any],
-) -> Dict[str, str]:
-    if not name:
-        return {"legacy_name": name, "details_name": name}
-
-    key = _normalize_name_key(name)
-    exact_map = index.get("exact_map", {})
-    if key in exact_map:
-        return dict(exact_map[key])
-
-    fuzzy_keys = index.get("fuzzy_keys", [])
-    matches = get_close_matches(key, fuzzy_keys, n=1, cutoff=0.9)
-    if matches:
-        return dict(exact_map[matches[0]])
-    return {"legacy_name": name, "details_name": name}
-
-
 def _resolve_roster_players(
     team_abbrev: str,
     db: Session,
-    name_cache: Optional[Dict[str, Dict[str, str]]] = None,
-    bulk_name_index: Optional[Dict[str, Any]] = None,
+    resolved_names: Optional[Dict[str, Dict[str, str]]] = None,
 ) -> List[Dict[str, str]]:
     roster = get_ipl_roster(team_abbrev) or {}
     players = roster.get("players", [])
+    if resolved_names is None:
+        resolved_names = resolve_player_names_bulk(
+            [player.get("name") for player in players], db, fuzzy_cutoff=ROSTER_NAME_FUZZY_CUTOFF
+        )
     resolved: Dict[str, Dict[str, str]] = {}
 
     for player in players:
@@ -545,17 +446,7 @@ def _resolve_roster_players(
         if not source_name:
             continue
 
-        if name_cache is not None and source_name in name_cache:
-            names = name_cache[source_name]
-        elif bulk_name_index is not None:
-            names = _resolve_name_with_bulk_index(source_name, bulk_name_index)
-            if name_cache is not None:
-                name_cache[source_name] = names
-        else:
-            names = get_player_names(source_name, db)
-            if name_cache is not None:
-                name_cache[source_name] = names
-
+        names = resolved_names.get(source_name) or {}
         legacy_name = names.get("legacy_name") or source_name
         details_name = names.get("details_name") or source_name
         role = player.get("role", "batter")
@@ -2605,16 +2496,20 @@ def compute_all_predictions(
         if age <= _CACHE_TTL_SECONDS:
             return cached["payload"]
 
-    name_cache: Dict[str, Dict[str, str]] = {}
-    bulk_name_index = _build_bulk_name_index(db)
+    # Every squad's names in one resolver call
+    teams = get_all_ipl_teams()
+    resolved_names = resolve_player_names_bulk(
+        [
+            player.get("name")
+            for team_abbrev in teams
+            for player in (get_ipl_roster(team_abbrev) or {}).get("players", [])
+        ],
+        db,
+        fuzzy_cutoff=ROSTER_NAME_FUZZY_CUTOFF,
+    )
     team_rosters: Dict[str, List[Dict[str, str]]] = {}
-    for team_abbrev in get_all_ipl_teams():
-        team_rosters[team_abbrev] = _resolve_roster_players(
-            team_abbrev,
-            db,
-            name_cache=name_cache,
-            bulk_name_index=bulk_name_index,
-        )
+    for team_abbrev in teams:
+        team_rosters[team_abbrev] = _resolve_roster_players(team_abbrev, db, resolved_names=resolved_names)
 
     all_players = sorted(
         {
@@ -2628,6 +2523,12 @@ def compute_all_predictions(
     global_rankings = _build_global_rankings_lookup(
         db=db,
         date_range=(start, end),
+        players=[
+            name
+            for roster in team_rosters.values()
+            for player in roster
+            for name in (player.get("name"), player.get("display_name"))
+        ],
         force_refresh=force_refresh,
     )
 
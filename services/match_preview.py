@@ -10,7 +10,7 @@ from sqlalchemy.sql import text
 from ipl_rosters import get_team_abbrev_from_name
 from models import teams_mapping
 from services.delivery_data_service import get_match_scores, get_venue_match_stats, get_venue_phase_stats
-from services.global_t20_rankings import get_batting_rankings_service, get_bowling_rankings_service
+from services.global_t20_rankings import find_ranked_players
 from services.matchups import get_all_team_name_variations, get_team_matchups_service
 
 
@@ -496,27 +496,6 @@ def _normalize_player_key(name: Optional[str]) -> str:
     return " ".join(str(name or "").strip().lower().split())
 
 
-def _fetch_all_rank_rows(fetch_fn, page_size: int = 500, max_rows: int = 50000) -> List[Dict[str, Any]]:
-    # Request a large page first to avoid dozens of paginated calls on cold preview builds.
-    payload = fetch_fn(limit=max_rows, offset=0)
-    if isinstance(payload, dict):
-        rankings = payload.get("rankings", []) or []
-        return rankings[:max_rows]
-
-    rows: List[Dict[str, Any]] = []
-    offset = 0
-    while len(rows) < max_rows:
-        payload = fetch_fn(limit=page_size, offset=offset)
-        page = payload.get("rankings", []) if isinstance(payload, dict) else []
-        if not page:
-            break
-        rows.extend(page)
-        if len(page) < page_size:
-            break
-        offset += page_size
-    return rows
-
-
 def _summarize_top_ranked_lineup_players(
     db: Session,
     lineup_players: Dict[str, List[str]],
@@ -527,43 +506,14 @@ def _summarize_top_ranked_lineup_players(
     if not lineup_players:
         return {"available": False, "teams": {}}
 
+    all_players = [player for players in lineup_players.values() for player in players or []]
     try:
-        batting_rows = _fetch_all_rank_rows(
-            lambda limit, offset: get_batting_rankings_service(
-                db=db,
-                start_date=start_date,
-                end_date=end_date,
-                limit=limit,
-                offset=offset,
-                bowl_kind="all",
-                force_refresh=False,
-            )
-        )
-        bowling_rows = _fetch_all_rank_rows(
-            lambda limit, offset: get_bowling_rankings_service(
-                db=db,
-                start_date=start_date,
-                end_date=end_date,
-                limit=limit,
-                offset=offset,
-                bowl_kind="all",
-                force_refresh=False,
-            )
-        )
+        # Keyed by the same normalisation as _normalize_player_key
+        batting_lookup = find_ranked_players(db, "batting", all_players, start_date, end_date)
+        bowling_lookup = find_ranked_players(db, "bowling", all_players, start_date, end_date)
     except Exception:
         return {"available": False, "teams": {}}
 
-    batting_lookup = {
-        _normalize_player_key(row.get("player")): row
-        for row in batting_rows
-        if _normalize_player_key(row.get("player"))
-    }
-    bowling_lookup = {
-        _normalize_player_key(row.get("player")): row
-        for row in bowling_rows
-        if _normalize_player_key(row.get("player"))
-    }
-
     teams_payload: Dict[str, Any] = {}
     has_any = False
 
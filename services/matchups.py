@@ -1,5 +1,4 @@
 import logging
-import time
 from sqlalchemy.sql import text
 from fastapi import HTTPException
 from typing import List, Optional, Dict
@@ -7,14 +6,10 @@ from datetime import date
 from models import teams_mapping
 from services.delivery_data_service import should_use_delivery_details
 from ipl_rosters import get_team_abbrev_from_name
+from services.player_aliases import resolve_player_names_bulk
 
 logger = logging.getLogger(__name__)
 
-# Cache for player_aliases to avoid full table scan on every call
-_ALIAS_CACHE: Dict[str, str] = {}
-_ALIAS_CACHE_TIME: float = 0
-_LEGACY_CACHE: Dict[str, str] = {}
-
 def get_all_team_name_variations(team_name):
     reverse_mapping = {}
     for full_name, abbrev in teams_mapping.items():
@@ -48,56 +43,13 @@ def _dedupe_player_names(players: List[str]) -> List[str]:
 def _is_ipl_team(team_name: str) -> bool:
     return bool(get_team_abbrev_from_name(team_name or ""))
 
-def _get_alias_lookup(db) -> Dict[str, str]:
-    """Return cached alias lookup dict. Refreshes every hour."""
-    global _ALIAS_CACHE, _ALIAS_CACHE_TIME, _LEGACY_CACHE
-    now = time.time()
-    if _ALIAS_CACHE and (now - _ALIAS_CACHE_TIME) < 3600:
-        return _ALIAS_CACHE
-
-    try:
-        alias_rows = db.execute(
-            text(
-                """
-                SELECT player_name, alias_name
-                FROM player_aliases
-                WHERE alias_name IS NOT NULL
-                """
-            )
-        ).fetchall()
-    except Exception:
-        return _ALIAS_CACHE
-
-    alias_lookup: Dict[str, str] = {}
-    legacy_lookup: Dict[str, str] = {}
-    for row in alias_rows:
-        legacy_name = (row[0] or "").strip()
-        canonical_name = (row[1] or "").strip()
-        if not canonical_name:
-            continue
-        alias_lookup[canonical_name.lower()] = canonical_name
-        if legacy_name:
-            alias_lookup[legacy_name.lower()] = canonical_name
-            legacy_lookup[canonical_name.lower()] = legacy_name
-            legacy_lookup[legacy_name.lower()] = legacy_name
-
-    _ALIAS_CACHE = alias_lookup
-    _LEGACY_CACHE = legacy_lookup
-    _ALIAS_CACHE_TIME = now
-    logger.info("Refreshed player alias cache: %d entries", len(alias_lookup))
-    return alias_lookup
-
-
 def _canonicalize_players(players: List[str], db) -> List[str]:
     deduped_players = _dedupe_player_names(players)
     if not deduped_players:
         return []
 
-    alias_lookup = _get_alias_lookup(db)
-    if not alias_lookup:
-        return deduped_players
-
-    canonicalized = [alias_lookup.get(player.lower(), player) for player in deduped_players]
+    resolved = resolve_player_names_bulk(deduped_players, db)
+    canonicalized = [resolved.get(p, {}).get("details_name") or p for p in deduped_players]
     return _dedupe_player_names(canonicalized)
 
 
@@ -106,11 +58,8 @@ def _to_legacy_players(players: List[str], db) -> List[str]:
     if not deduped_players:
         return []
 
-    _get_alias_lookup(db)
-    if not _LEGACY_CACHE:
-        return deduped_players
-
-    return _dedupe_player_names([_LEGACY_CACHE.get(p.lower(), p) for p in deduped_players])
+    resolved = resolve_player_names_bulk(deduped_players, db)
+    return _dedupe_player_names([resolved.get(p, {}).get("legacy_name") or p for p in deduped_players])
 
 # Fantasy point constants (shared with fantasy_planner)
 # Batting points
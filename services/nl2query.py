@@ -5,7 +5,6 @@ for the query builder API.
 """
 import os
 import json
-import time
 import logging
 import re
 import hashlib
@@ -13,6 +12,8 @@ from typing import Dict, Any, Optional, List
 from openai import OpenAI
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+
+from services.cache import get_cache
 try:
     from venue_standardization import VENUE_STANDARDIZATION, CITY_TO_VENUE
 except Exception:  # pragma: no cover - defensive fallback
@@ -23,9 +24,9 @@ _INVALID_VENUE_VALUES = {"home", "away", "neutral", "all", "any"}
 
 logger = logging.getLogger(__name__)
 
-# In-memory cache with TTL
-_cache: Dict[str, Dict[str, Any]] = {}
+# Shared bounded cache with TTL
 CACHE_TTL = 86400  # 24 hours
+_cache = get_cache("nl2query", ttl_seconds=CACHE_TTL, max_entries=2000)
 MODEL_PRIMARY = "gpt-4o"
 MODEL_FALLBACK = "gpt-4o-mini"
 DEFAULT_NL2QUERY_MODEL = MODEL_FALLBACK  # kept for backward compat in tests
@@ -264,27 +265,14 @@ def _get_cache_key(query: str) -> str:
 
 
 def _get_cached(query: str) -> Optional[Dict[str, Any]]:
-    key = _get_cache_key(query)
-    if key in _cache:
-        entry = _cache[key]
-        if time.time() - entry["timestamp"] < CACHE_TTL:
-            return entry["result"]
-        else:
-            del _cache[key]
-    return None
+    return _cache.get(_get_cache_key(query))
 
 
 def _set_cache(query: str, result: Dict[str, Any]):
-    key = _get_cache_key(query)
-    _cache[key] = {"result": result, "timestamp": time.time()}
+    _cache.set(_get_cache_key(query), result)
 
 
 def get_cache_size() -> int:
-    # Clean expired entries
-    now = time.time()
-    expired = [k for k, v in _cache.items() if now - v["timestamp"] >= CACHE_TTL]
-    for k in expired:
-        del _cache[k]
     return len(_cache)
 
 
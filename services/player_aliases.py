@@ -8,15 +8,25 @@ The player_aliases table maps:
 
 Usage:
   from services.player_aliases import resolve_to_legacy_name, search_players_with_aliases
+
+  # Resolving more than one name (a lineup, a squad): one call, not one per player
+  from services.player_aliases import resolve_player_names_bulk
 """
 
 from sqlalchemy.sql import text
 from sqlalchemy.orm import Session
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
+from difflib import get_close_matches
 import logging
+import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# How often a process checks player_alias_map_version for a newer alias set
+ALIAS_INDEX_RECHECK_SECONDS = float(os.getenv("ALIAS_INDEX_RECHECK_SECONDS", "60"))
+
 
 def resolve_to_legacy_name(name: str, db: Session) -> str:
     """
@@ -34,6 +44,11 @@ def resolve_to_legacy_name(name: str, db: Session) -> str:
     """
     if not name:
         return name
+
+    index = get_alias_index(db)
+    if index is not None:
+        pair = index.by_details_name(name)
+        return pair[0] if pair else name
     
     try:
         # Check if input is a NEW name (alias_name) -> get OLD name (player_name)
@@ -73,6 +88,11 @@ def resolve_to_details_name(name: str, db: Session) -> str:
     """
     if not name:
         return name
+
+    index = get_alias_index(db)
+    if index is not None:
+        pair = index.by_legacy_name(name)
+        return pair[1] if pair else name
     
     try:
         # Check if input is an OLD name (player_name) -> get NEW name (alias_name)
@@ -110,6 +130,13 @@ def get_player_names(name: str, db: Session) -> Dict[str, str]:
     """
     if not name:
         return {"legacy_name": name, "details_name": name}
+
+    index = get_alias_index(db)
+    if index is not None:
+        pair = index.by_details_name(name) or index.by_legacy_name(name)
+        if pair:
+            return {"legacy_name": pair[0], "details_name": pair[1]}
+        return {"legacy_name": name, "details_name": name}
     
     try:
         # First try: input is a NEW name (alias_name)
@@ -144,6 +171,82 @@ def get_player_names(name: str, db: Session) -> Dict[str, str]:
         return {"legacy_name": name, "details_name": name}
 
 
+def resolve_player_names_bulk(names: List[str], db: Session,
+                              fuzzy_cutoff: Optional[float] = None) -> Dict[str, Dict[str, str]]:
+    """
+    Resolve many player names at once.
+
+    Same answers as get_player_names (plus the grouping canonical name), for a whole lineup in
+    a single call: served from the in-process alias index, or one query when it is unavailable.
+
+    Args:
+        names: Player names in any format; blanks are skipped
+        db: Database session
+        fuzzy_cutoff: If set, a name with no exact alias takes the pair of the most similar
+            aliased name at least this similar (difflib ratio). Needs the alias index; the
+            query fallback only matches exactly.
+
+    Returns:
+        {input_name: {"legacy_name": ..., "details_name": ..., "canonical_name": ...}}
+    """
+    names = [n for n in dict.fromkeys(names or []) if n]
+    if not names:
+        return {}
+
+    index = get_alias_index(db)
+    if index is not None:
+        resolved = {}
+        for name in names:
+            pair = index.by_details_name(name) or index.by_legacy_name(name)
+            canonical = index.canonical_name(name)
+            if pair is None and fuzzy_cutoff is not None:
+                pair = index.closest_pair(name, fuzzy_cutoff)
+                if pair is not None:
+                    canonical = index.canonical_name(pair[1])
+            legacy, details = pair if pair else (name, name)
+            resolved[name] = {
+                "legacy_name": legacy,
+                "details_name": details,
+                "canonical_name": canonical,
+            }
+        return resolved
+
+    by_details: Dict[str, Tuple[str, str]] = {}
+    by_legacy: Dict[str, Tuple[str, str]] = {}
+    canonical: Dict[str, str] = {}
+    try:
+        keys = [n.lower() for n in names]
+        rows = db.execute(text(f"""
+            SELECT player_name, alias_name, NULL AS name_key, NULL AS canonical_name
+            FROM player_aliases
+            WHERE LOWER(alias_name) = ANY(:keys) OR LOWER(player_name) = ANY(:keys)
+            UNION ALL
+            SELECT NULL, NULL, am.name_key, am.canonical_name
+            FROM ({ALIAS_MAP_SQL}) am
+            WHERE am.name_key = ANY(:keys)
+            ORDER BY 1, 2
+        """), {"keys": keys}).fetchall()
+        for row in rows:
+            if row.player_name and row.alias_name:
+                by_details.setdefault(row.alias_name.lower(), (row.player_name, row.alias_name))
+                by_legacy.setdefault(row.player_name.lower(), (row.player_name, row.alias_name))
+            if row.name_key:
+                canonical[row.name_key] = row.canonical_name
+    except Exception as e:
+        logger.warning(f"Error resolving player names in bulk: {e}")
+
+    resolved = {}
+    for name in names:
+        key = name.lower()
+        legacy, details = by_details.get(key) or by_legacy.get(key) or (name, name)
+        resolved[name] = {
+            "legacy_name": legacy,
+            "details_name": details,
+            "canonical_name": canonical.get(key, name),
+        }
+    return resolved
+
+
 def search_players_with_aliases(
     query: str, 
     db: Session, 
@@ -372,6 +475,113 @@ def load_aliases_map(db: Session) -> Dict[str, str]:
         return {}
 
 
+# =========================================================================================
+# In-process alias index
+# =========================================================================================
+# The single-name resolvers above used to cost a round trip each. player_aliases is a few
+# thousand rows, so every process keeps a copy keyed by lower-cased name and reloads it when
+# refresh_alias_map bumps player_alias_map_version (polled at most every
+# ALIAS_INDEX_RECHECK_SECONDS).
+
+class AliasIndex:
+    """Immutable lookup tables built from one read of player_aliases and player_alias_map."""
+
+    def __init__(self, pairs: List[Tuple[str, str]], canonical: List[Tuple[str, str]],
+                 version: Optional[int] = None):
+        self.version = version
+        self._by_details: Dict[str, Tuple[str, str]] = {}
+        self._by_legacy: Dict[str, Tuple[str, str]] = {}
+        # Sorted so a name with several aliases always resolves the same way
+        for player_name, alias_name in sorted(p for p in pairs if p[0] and p[1]):
+            self._by_details.setdefault(alias_name.lower(), (player_name, alias_name))
+            self._by_legacy.setdefault(player_name.lower(), (player_name, alias_name))
+        self._canonical: Dict[str, str] = dict(canonical)
+        self._fuzzy_keys: List[str] = sorted(set(self._by_details) | set(self._by_legacy))
+
+    def by_details_name(self, name: str) -> Optional[Tuple[str, str]]:
+        """(legacy, details) pair for a delivery_details-style name, if aliased."""
+        return self._by_details.get(name.lower()) if name else None
+
+    def by_legacy_name(self, name: str) -> Optional[Tuple[str, str]]:
+        """(legacy, details) pair for a legacy-style name, if aliased."""
+        return self._by_legacy.get(name.lower()) if name else None
+
+    def closest_pair(self, name: str, cutoff: float) -> Optional[Tuple[str, str]]:
+        """(legacy, details) pair of the most similar aliased name, if one reaches ``cutoff``."""
+        if not name:
+            return None
+        matches = get_close_matches(" ".join(name.lower().split()), self._fuzzy_keys, n=1, cutoff=cutoff)
+        if not matches:
+            return None
+        return self._by_details.get(matches[0]) or self._by_legacy.get(matches[0])
+
+    def canonical_name(self, name: str) -> str:
+        """Same answer as canonical_name_sql: the player_alias_map entry, else the name itself."""
+        if not name:
+            return name
+        return self._canonical.get(name.lower(), name)
+
+
+def _relation_exists(db: Session, name: str) -> bool:
+    return bool(db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar())
+
+
+def _alias_map_version(db: Session) -> Optional[int]:
+    if not _relation_exists(db, "player_alias_map_version"):
+        return None
+    return db.execute(text("SELECT version FROM player_alias_map_version WHERE id = 1")).scalar()
+
+
+def _load_alias_index(db: Session, version: Optional[int]) -> AliasIndex:
+    pairs = db.execute(text("SELECT player_name, alias_name FROM player_aliases")).fetchall()
+    # Before the materialised view exists, compute the same mapping inline
+    source = "player_alias_map" if _relation_exists(db, "player_alias_map") else f"({ALIAS_MAP_SQL}) m"
+    canonical = db.execute(text(f"SELECT name_key, canonical_name FROM {source}")).fetchall()
+    return AliasIndex([tuple(r) for r in pairs], [tuple(r) for r in canonical], version)
+
+
+class _AliasIndexHolder:
+    def __init__(self):
+        self.index: Optional[AliasIndex] = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+
+_alias_index = _AliasIndexHolder()
+
+
+def get_alias_index(db: Session) -> Optional[AliasIndex]:
+    """
+    The process-wide alias index, reloaded when the alias version changes.
+
+    Returns None if it cannot be loaded; callers then fall back to querying player_aliases.
+    """
+    holder = _alias_index
+    if holder.index is not None and time.monotonic() - holder.checked_at < ALIAS_INDEX_RECHECK_SECONDS:
+        return holder.index
+    with holder.lock:
+        if holder.index is not None and time.monotonic() - holder.checked_at < ALIAS_INDEX_RECHECK_SECONDS:
+            return holder.index
+        try:
+            version = _alias_map_version(db)
+            # Without a version table there is nothing to compare, so reload on every recheck
+            if holder.index is None or version is None or version != holder.index.version:
+                holder.index = _load_alias_index(db, version)
+                logger.info(f"Loaded player alias index (version {version})")
+        except Exception as e:
+            logger.warning(f"Error loading player alias index: {e}")
+            return holder.index
+        holder.checked_at = time.monotonic()
+        return holder.index
+
+
+def invalidate_alias_index() -> None:
+    """Drop this process's alias index; the next lookup reloads it."""
+    with _alias_index.lock:
+        _alias_index.index = None
+        _alias_index.checked_at = 0.0
+
+
 # =========================================================================================
 # Canonical-name SQL, for grouping
 # =========================================================================================
@@ -381,58 +591,109 @@ def load_aliases_map(db: Session) -> Dict[str, str]:
 # splits a player in two. This CTE maps either spelling onto one canonical name so the
 # aggregation merges in SQL, where it can actually sum, rather than being relabelled afterwards.
 
-ALIAS_MAP_CTE = """
-    alias_map AS (
-        SELECT DISTINCT ON (name_key) name_key, canonical_name
-        FROM (
-            -- A canonical name maps to itself. Priority 0 so that if a name is BOTH somebody's
-            -- canonical name and somebody else's legacy form, being canonical wins.
-            SELECT LOWER(alias_name) AS name_key, alias_name AS canonical_name, 0 AS priority
+# The mapping itself. Materialised as player_alias_map (see refresh_alias_map) so queries join a
+# small indexed table instead of re-running the DISTINCT ON / GROUP BY over player_aliases
+# every time.
+ALIAS_MAP_SQL = """
+    SELECT DISTINCT ON (name_key) name_key, canonical_name
+    FROM (
+        -- A canonical name maps to itself. Priority 0 so that if a name is BOTH somebody's
+        -- canonical name and somebody else's legacy form, being canonical wins.
+        SELECT LOWER(alias_name) AS name_key, alias_name AS canonical_name, 0 AS priority
+        FROM player_aliases
+        WHERE alias_name IS NOT NULL
+
+        UNION ALL
+
+        -- Legacy form maps to the canonical name, but only where the mapping is
+        -- unambiguous. 39 legacy names map to several full names and some of those are
+        -- genuinely different people -- "A Shukla" is both Arpit and Ayush Shukla -- so
+        -- collapsing them would merge two careers into one. Those are left unmapped, which
+        -- keeps them split exactly as they are today rather than confidently wrong.
+        SELECT LOWER(pa.player_name) AS name_key, pa.alias_name AS canonical_name, 1 AS priority
+        FROM player_aliases pa
+        JOIN (
+            SELECT player_name
             FROM player_aliases
-            WHERE alias_name IS NOT NULL
+            WHERE player_name IS NOT NULL AND alias_name IS NOT NULL
+            GROUP BY player_name
+            HAVING COUNT(DISTINCT alias_name) = 1
+        ) unambiguous ON unambiguous.player_name = pa.player_name
+        WHERE pa.player_name IS NOT NULL AND pa.alias_name IS NOT NULL
+    ) mapped
+    -- DISTINCT ON without ORDER BY returns an arbitrary row, which would make results vary
+    -- between runs for no reason. Order so the choice is deterministic.
+    ORDER BY name_key, priority, canonical_name
+"""
 
-            UNION ALL
+# Unambiguous legacy -> canonical pairs, for the older call sites that already reference
+# `<alias>.alias_name` and only need the fan-out removed. `player_aliases` has no uniqueness on
+# either column, so joining it directly multiplies rows -- and therefore double-counts every
+# aggregate -- for the 39 legacy names that map to several full names. Those same names are
+# excluded here rather than arbitrarily collapsed, for the reason given in ALIAS_MAP_SQL.
+# DISTINCT because the same pair can be stored under more than one source.
+UNAMBIGUOUS_ALIASES_SQL = """
+    SELECT DISTINCT pa.player_name, pa.alias_name
+    FROM player_aliases pa
+    JOIN (
+        SELECT player_name
+        FROM player_aliases
+        WHERE player_name IS NOT NULL AND alias_name IS NOT NULL
+        GROUP BY player_name
+        HAVING COUNT(DISTINCT alias_name) = 1
+    ) unambiguous ON unambiguous.player_name = pa.player_name
+"""
 
-            -- Legacy form maps to the canonical name, but only where the mapping is
-            -- unambiguous. 39 legacy names map to several full names and some of those are
-            -- genuinely different people -- "A Shukla" is both Arpit and Ayush Shukla -- so
-            -- collapsing them would merge two careers into one. Those are left unmapped, which
-            -- keeps them split exactly as they are today rather than confidently wrong.
-            SELECT LOWER(pa.player_name) AS name_key, pa.alias_name AS canonical_name, 1 AS priority
-            FROM player_aliases pa
-            JOIN (
-                SELECT player_name
-                FROM player_aliases
-                WHERE player_name IS NOT NULL AND alias_name IS NOT NULL
-                GROUP BY player_name
-                HAVING COUNT(DISTINCT alias_name) = 1
-            ) unambiguous ON unambiguous.player_name = pa.player_name
-            WHERE pa.player_name IS NOT NULL AND pa.alias_name IS NOT NULL
-        ) mapped
-        -- DISTINCT ON without ORDER BY returns an arbitrary row, which would make results vary
-        -- between runs for no reason. Order so the choice is deterministic.
-        ORDER BY name_key, priority, canonical_name
+# Materialised views -> (definition, unique key). The unique indexes are what allow
+# REFRESH ... CONCURRENTLY, so readers are never blocked by a refresh.
+ALIAS_MAP_VIEWS = {
+    "player_alias_map": (ALIAS_MAP_SQL, "name_key"),
+    "player_alias_unambiguous": (UNAMBIGUOUS_ALIASES_SQL, "player_name"),
+}
+
+ALIAS_MAP_CTE = """
+    alias_map AS (
+        SELECT name_key, canonical_name FROM player_alias_map
     )
 """
 
+UNAMBIGUOUS_ALIASES = "player_alias_unambiguous"
+
+
+def ensure_alias_map(conn) -> None:
+    """Create the alias materialised views and their version row if they do not exist yet."""
+    for view, (definition, key) in ALIAS_MAP_VIEWS.items():
+        conn.execute(text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view} AS {definition}"))
+        conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {view}_{key}_key ON {view} ({key})"))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS player_alias_map_version (
+            id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+            version BIGINT NOT NULL DEFAULT 1,
+            refreshed_at TIMESTAMP DEFAULT NOW()
+        )
+    """))
+    conn.execute(text("INSERT INTO player_alias_map_version (id) VALUES (1) ON CONFLICT (id) DO NOTHING"))
+
 
-# A join-able source of unambiguous legacy -> canonical pairs, for the older call sites that
-# already reference `<alias>.alias_name` and only need the fan-out removed. `player_aliases` has
-# no uniqueness on either column, so joining it directly multiplies rows -- and therefore
-# double-counts every aggregate -- for the 39 legacy names that map to several full names.
-# Those same names are excluded here rather than arbitrarily collapsed, for the reason given
-# in ALIAS_MAP_CTE.
-UNAMBIGUOUS_ALIASES = """(
-            SELECT pa.player_name, pa.alias_name
-            FROM player_aliases pa
-            JOIN (
-                SELECT player_name
-                FROM player_aliases
-                WHERE player_name IS NOT NULL AND alias_name IS NOT NULL
-                GROUP BY player_name
-                HAVING COUNT(DISTINCT alias_name) = 1
-            ) unambiguous ON unambiguous.player_name = pa.player_name
-        )"""
+def refresh_alias_map(conn) -> int:
+    """
+    Rebuild the alias materialised views after player_aliases changes, and bump the version
+    that in-process mirrors (get_alias_index) poll.
+
+    Returns:
+        The new version number
+    """
+    ensure_alias_map(conn)
+    for view in ALIAS_MAP_VIEWS:
+        conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+    version = conn.execute(text("""
+        UPDATE player_alias_map_version
+        SET version = version + 1, refreshed_at = NOW()
+        WHERE id = 1
+        RETURNING version
+    """)).scalar()
+    invalidate_alias_index()
+    return version
 
 
 def canonical_name_sql(name_column: str, alias: str = "am") -> str:
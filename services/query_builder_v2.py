@@ -18,6 +18,7 @@ from services.player_aliases import (
     canonical_name_sql,
 )
 from services.bowler_types import PACE_TYPES as ALL_KNOWN_PACE_TYPES, SPIN_TYPES as ALL_KNOWN_SPIN_TYPES
+from services.duckdb_backend import choose_backend
 import logging
 
 logger = logging.getLogger(__name__)
@@ -2208,6 +2209,7 @@ def query_deliveries_service(
 
         has_batter_filters = bool(batters) or bool(players)
         data_sources = []
+        data_backend = "postgres"
         
         # =====================================================================
         # QUERY NEW TABLE (delivery_details) - 2015+
@@ -2268,27 +2270,42 @@ def query_deliveries_service(
             new_join_clause = "JOIN matches m ON m.id = dd.p_match" if join_new_matches else ""
             total_balls_query = f"SELECT COUNT(*) FROM delivery_details dd {new_join_clause} {new_where_clause}"
             total_balls_params = {k: v for k, v in new_params.items() if k not in ['limit', 'offset', 'min_balls', 'max_balls', 'min_runs', 'max_runs', 'min_wickets', 'max_wickets']}
-            new_total_balls = db.execute(text(total_balls_query), total_balls_params).scalar() or 0
             total_innings_query = f"SELECT COUNT(DISTINCT (dd.p_match, dd.inns)) FROM delivery_details dd {new_join_clause} {new_where_clause}"
-            new_total_innings = db.execute(text(total_innings_query), total_balls_params).scalar() or 0
-            
-            if not group_by or len(group_by) == 0:
-                # Ungrouped query
-                result = handle_ungrouped_query(
-                    new_where_clause, new_params, limit, offset, db, filters_applied, join_matches=join_new_matches
-                )
-                new_results = result['data']
-                new_total_count = result['metadata']['total_matching_rows']
-            else:
+
+            def _run_new_table(session):
+                total_balls = session.execute(text(total_balls_query), total_balls_params).scalar() or 0
+                total_innings = session.execute(text(total_innings_query), total_balls_params).scalar() or 0
+                if not group_by or len(group_by) == 0:
+                    # Ungrouped query
+                    result = handle_ungrouped_query(
+                        new_where_clause, new_params, limit, offset, session, filters_applied, join_matches=join_new_matches
+                    )
+                    return total_balls, total_innings, result
                 # Grouped query - get raw results for potential merging
                 result = handle_grouped_query(
-                    new_where_clause, new_params, group_by, min_balls, max_balls,
-                    min_runs, max_runs, limit, offset, db, filters_applied,
+                    new_where_clause, dict(new_params), group_by, min_balls, max_balls,
+                    min_runs, max_runs, limit, offset, session, filters_applied,
                     has_batter_filters, show_summary_rows, join_matches=join_new_matches,
                     min_wickets=min_wickets, max_wickets=max_wickets,
                     ball_aggregation=ball_aggregation,
                     fmt=fmt, gender=gender,
                 )
+                return total_balls, total_innings, result
+
+            # Wide group-bys may run on the embedded DuckDB copy of delivery_details; the
+            # generated SQL is the same.
+            analytics_db = choose_backend(db, new_params, group_by)
+            if analytics_db is db:
+                new_total_balls, new_total_innings, result = _run_new_table(db)
+            else:
+                (new_total_balls, new_total_innings, result), data_backend = _run_with_postgres_fallback(
+                    _run_new_table, analytics_db, db
+                )
+
+            if not group_by or len(group_by) == 0:
+                new_results = result['data']
+                new_total_count = result['metadata']['total_matching_rows']
+            else:
                 new_results = result['data']
                 new_total_count = result['metadata']['total_groups']
                 new_total_innings = result.get("metadata", {}).get("total_innings_in_query", new_total_innings)
@@ -2483,6 +2500,7 @@ def query_deliveries_service(
                     "data_source": data_source_label,
                     "warnings": delivery_warnings,
                     "ball_aggregation": ball_aggregation,
+                    "query_backend": data_backend,
                     "recommended_chart": recommend_chart_for_group_by(group_by, ball_aggregation),
                     "note": "Grouped data with cricket aggregations" + (" (merged from multiple sources)" if len(data_sources) > 1 else "")
                 }
@@ -2497,6 +2515,23 @@ def query_deliveries_service(
         raise HTTPException(status_code=500, detail=f"Database query failed: {str(e)}")
 
 
+def _run_with_postgres_fallback(run, analytics_db, db) -> Tuple[Any, str]:
+    """
+    Run ``run`` on the DuckDB session, rerunning it on Postgres if anything on that path fails
+    (engine errors, SQL translation gaps, result conversion bugs).
+
+    Returns:
+        (result, backend name)
+    """
+    try:
+        return run(analytics_db), "duckdb"
+    except Exception as e:
+        logger.warning(f"DuckDB backend failed ({type(e).__name__}), rerunning on Postgres: {e}")
+        return run(db), "postgres"
+    finally:
+        analytics_db.close()
+
+
 def build_where_clause(
     venue, start_date, end_date, leagues, teams, batting_teams, bowling_teams,
     players, batters, bowlers, bat_hand, bowl_style, bowl_kind, crease_combo,
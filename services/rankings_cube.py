@@ -0,0 +1,329 @@
+"""
+rankings_monthly_cells: the global T20 rankings inputs pre-aggregated per calendar month.
+
+A rankings build needs, for one date window, every (player, competition, length_bucket,
+bowl_kind) cell with its balls / runs / controlled (batting) or dots (bowling), plus the same
+sums per (competition, length_bucket, bowl_kind) for the leave-one-out baselines. Fetching
+those straight from delivery_details scans two years of balls per window, and a 36-snapshot
+trajectory did that 36 times over mostly the same months. The cube stores each cell once per
+month:
+
+    mode            'batting' (player = batter) / 'bowling' (player = bowler)
+    player          '' for balls without a player name -- they only count toward the totals
+    competition, length_bucket, bowl_kind
+    month           first day of the month; NULL for rows that only carry a year
+    year            set only when month is NULL (delivery_details rows without a date)
+    balls, runs, controlled, dots
+
+The same filters and buckets as ``_fetch_batting_cells`` / ``_fetch_bowling_cells`` apply, so
+any month-aligned window summed from the cube equals the direct query, including the
+``MIN_CELL_BALLS`` gate (applied to the window sum, not per month). ``MonthlyCellCube`` holds
+one span in memory and slides a window over it by adding the entering months and
+subtracting the leaving ones.
+
+Create or rebuild it after each delivery_details load with:
+
+    python scripts/refresh_rankings_cube.py
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.sql import text
+
+from services.data_versions import bump_data_version
+from services.global_t20_rankings import (
+    BOWL_KIND_BUCKET_SQL,
+    FORMAT_PIN_SQL,
+    LENGTH_BUCKET_SQL,
+    MIN_CELL_BALLS,
+    _get_delivery_schema_config,
+    _player_key_sql,
+)
+
+CUBE_TABLE = "rankings_monthly_cells"
+CUBE_MODES = ("batting", "bowling")
+
+# The third per-cell sum each mode's builder reads next to balls and runs
+CUBE_METRIC = {"batting": "controlled", "bowling": "dots"}
+
+CellKey = Tuple[str, str, str, str]
+
+
+def _month_ordinal(d: date) -> int:
+    return d.year * 12 + d.month - 1
+
+
+def ensure_rankings_cube(conn) -> None:
+    """Create the cube table and its index if they do not exist yet."""
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {CUBE_TABLE} (
+            mode VARCHAR(8) NOT NULL,
+            player VARCHAR NOT NULL,
+            competition VARCHAR NOT NULL,
+            length_bucket VARCHAR(16) NOT NULL,
+            bowl_kind VARCHAR(8) NOT NULL,
+            month DATE,
+            year INTEGER,
+            balls INTEGER NOT NULL,
+            runs DOUBLE PRECISION NOT NULL,
+            controlled DOUBLE PRECISION NOT NULL,
+            dots DOUBLE PRECISION NOT NULL
+        )
+    """))
+    conn.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS idx_{CUBE_TABLE}_mode_month
+        ON {CUBE_TABLE} (mode, month)
+    """))
+
+
+def _insert_sql(conn, mode: str, since_filter: str) -> str:
+    schema_cfg = _get_delivery_schema_config(conn)
+    player_expr = schema_cfg["batter_expr"] if mode == "batting" else schema_cfg["bowler_expr"]
+    date_expr = schema_cfg.get("date_expr")
+    has_year = bool(schema_cfg.get("has_year"))
+
+    # Mirrors _build_delivery_date_filter: dated rows are windowed by date, undated rows by year
+    month_expr = f"DATE_TRUNC('month', {date_expr})::date" if date_expr else "NULL::date"
+    if date_expr and has_year:
+        year_expr = f"CASE WHEN {date_expr} IS NULL THEN dd.year END"
+    elif has_year:
+        year_expr = "dd.year"
+    else:
+        year_expr = "NULL::int"
+
+    return f"""
+        INSERT INTO {CUBE_TABLE} (
+            mode, player, competition, length_bucket, bowl_kind, month, year,
+            balls, runs, controlled, dots
+        )
+        WITH normalized AS (
+            SELECT
+                {_player_key_sql(player_expr)} AS player,
+                dd.competition,
+                {LENGTH_BUCKET_SQL} AS length_bucket,
+                {BOWL_KIND_BUCKET_SQL} AS bowl_kind_bucket,
+                {month_expr} AS month,
+                {year_expr} AS year,
+                COALESCE(dd.score, 0)::float AS runs_scored,
+                CASE WHEN COALESCE(dd.control, 0) = 1 THEN 1 ELSE 0 END::float AS controlled_ball,
+                CASE WHEN COALESCE(dd.score, 0) = 0 THEN 1 ELSE 0 END::float AS dot_ball
+            FROM delivery_details dd
+            WHERE {FORMAT_PIN_SQL}
+              AND dd.length IS NOT NULL
+              AND dd.competition IS NOT NULL
+              AND TRIM(dd.competition) <> ''
+              AND (dd.wide IS NULL OR dd.wide = 0)
+        )
+        SELECT
+            '{mode}', player, competition, length_bucket, bowl_kind_bucket, month, year,
+            COUNT(*)::int, SUM(runs_scored), SUM(controlled_ball), SUM(dot_ball)
+        FROM normalized
+        WHERE length_bucket IS NOT NULL
+          AND bowl_kind_bucket IS NOT NULL
+          AND (month IS NOT NULL OR year IS NOT NULL)
+          {since_filter}
+        GROUP BY player, competition, length_bucket, bowl_kind_bucket, month, year
+    """
+
+
+def refresh_rankings_cube(conn, since: Optional[date] = None) -> int:
+    """
+    Re-derive the cube from delivery_details (no commit), and bump its data_versions counter:
+    competition weight fits are keyed on it (services.competition_weight_fits).
+
+    Args:
+        conn: Connection or session
+        since: Only re-derive months from this date's month on (and year-only rows from its
+            year on); None rebuilds the whole cube
+
+    Returns:
+        Number of cube rows written
+    """
+    ensure_rankings_cube(conn)
+    params: Dict[str, Any] = {}
+    if since is None:
+        conn.execute(text(f"TRUNCATE {CUBE_TABLE}"))
+        since_filter = ""
+    else:
+        params = {"since_month": since.replace(day=1), "since_year": since.year}
+        conn.execute(text(f"""
+            DELETE FROM {CUBE_TABLE}
+            WHERE month >= :since_month OR (month IS NULL AND year >= :since_year)
+        """), params)
+        since_filter = "AND (month >= :since_month OR (month IS NULL AND year >= :since_year))"
+
+    written = 0
+    for mode in CUBE_MODES:
+        result = conn.execute(text(_insert_sql(conn, mode, since_filter)), params)
+        written += result.rowcount or 0
+    bump_data_version(conn, CUBE_TABLE)
+    return written
+
+
+def rankings_cube_available(db) -> bool:
+    """Whether the cube table exists and holds rows."""
+    exists = db.execute(text("SELECT to_regclass(CAST(:table AS TEXT)) IS NOT NULL"), {"table": CUBE_TABLE}).scalar()
+    if not exists:
+        return False
+    return bool(db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {CUBE_TABLE})")).scalar())
+
+
+def rankings_cube_span(db) -> Optional[Tuple[date, date]]:
+    """(first, last) month held in the cube, or None when it is empty."""
+    row = db.execute(text(f"SELECT MIN(month), MAX(month) FROM {CUBE_TABLE}")).fetchone()
+    if row is None or row[0] is None:
+        return None
+    return row[0], row[1]
+
+
+def load_rankings_cube(db, mode: str, start: date, end: date) -> "MonthlyCellCube":
+    """Read the cube rows of one mode covering every month from ``start`` to ``end``."""
+    rows = db.execute(text(f"""
+        SELECT player, competition, length_bucket, bowl_kind, month, year,
+               balls, runs, {CUBE_METRIC[mode]} AS metric
+        FROM {CUBE_TABLE}
+        WHERE mode = :mode
+          AND (
+            (month >= :start_month AND month <= :end_month)
+            OR (month IS NULL AND year >= :start_year AND year <= :end_year)
+          )
+    """), {
+        "mode": mode,
+        "start_month": start.replace(day=1),
+        "end_month": end.replace(day=1),
+        "start_year": start.year,
+        "end_year": end.year,
+    }).fetchall()
+    return MonthlyCellCube(mode, (row._mapping for row in rows))
+
+
+class MonthlyCellCube:
+    """
+    One mode's monthly cells held as NumPy arrays, summed over sliding month windows.
+
+    Each distinct (player, competition, length_bucket, bowl_kind) gets an integer key and the
+    month rows are sorted by month, so one month's slice is a contiguous run of the arrays.
+    ``window`` keeps the running sums of the last window it served and moves them to the next
+    one by adding and subtracting whole months, so consecutive trajectory windows cost two
+    month slices each instead of 24.
+    """
+
+    def __init__(self, mode: str, rows: Iterable[Dict[str, Any]]):
+        self.mode = mode
+        self.metric = CUBE_METRIC[mode]
+        self._key_ids: Dict[CellKey, int] = {}
+        self.keys: List[CellKey] = []
+
+        month_rows: Tuple[List[int], List[int], List[float], List[float], List[float]] = ([], [], [], [], [])
+        year_rows: Tuple[List[int], List[int], List[float], List[float], List[float]] = ([], [], [], [], [])
+        for row in rows:
+            key = (row["player"], row["competition"], row["length_bucket"], row["bowl_kind"])
+            key_id = self._key_ids.get(key)
+            if key_id is None:
+                key_id = self._key_ids[key] = len(self.keys)
+                self.keys.append(key)
+            if row["month"] is not None:
+                target, period = month_rows, _month_ordinal(row["month"])
+            else:
+                target, period = year_rows, int(row["year"])
+            target[0].append(key_id)
+            target[1].append(period)
+            target[2].append(float(row["balls"] or 0))
+            target[3].append(float(row["runs"] or 0.0))
+            target[4].append(float(row["metric"] or 0.0))
+
+        order = np.argsort(np.asarray(month_rows[1], dtype=np.int64), kind="stable")
+        self._month_keys = np.asarray(month_rows[0], dtype=np.int64)[order]
+        self._months = np.asarray(month_rows[1], dtype=np.int64)[order]
+        self._month_values = np.asarray(month_rows[2:], dtype=np.float64).reshape(3, -1)[:, order]
+        self._year_keys = np.asarray(year_rows[0], dtype=np.int64)
+        self._years = np.asarray(year_rows[1], dtype=np.int64)
+        self._year_values = np.asarray(year_rows[2:], dtype=np.float64).reshape(3, -1)
+
+        # Baseline group of every key: (competition, length_bucket, bowl_kind)
+        group_ids: Dict[Tuple[str, str, str], int] = {}
+        self._groups: List[Tuple[str, str, str]] = []
+        key_groups = []
+        for _, competition, length_bucket, bowl_kind in self.keys:
+            group = (competition, length_bucket, bowl_kind)
+            if group not in group_ids:
+                group_ids[group] = len(self._groups)
+                self._groups.append(group)
+            key_groups.append(group_ids[group])
+        self._key_groups = np.asarray(key_groups, dtype=np.int64)
+        self._has_player = np.asarray([bool(key[0]) for key in self.keys], dtype=bool)
+
+        self._running = np.zeros((3, len(self.keys)), dtype=np.float64)
+        self._lo: Optional[int] = None
+        self._hi: Optional[int] = None
+
+    def _apply(self, first: int, stop: int, sign: float) -> None:
+        """Add (sign=1) or subtract (sign=-1) the months in ordinal range [first, stop)."""
+        if stop <= first or not len(self._months):
+            return
+        i, j = np.searchsorted(self._months, [first, stop])
+        if i == j:
+            return
+        keys = self._month_keys[i:j]
+        for index in range(3):
+            self._running[index] += sign * np.bincount(
+                keys, weights=self._month_values[index, i:j], minlength=len(self.keys)
+            )
+
+    def _slide_to(self, first: int, stop: int) -> None:
+        if self._lo is None or first < self._lo or stop < self._hi or first >= self._hi:
+            self._running[:] = 0.0
+            self._lo = self._hi = first
+        self._apply(self._hi, stop, 1.0)
+        self._apply(self._lo, first, -1.0)
+        self._lo, self._hi = first, stop
+
+    def window_sums(self, start: date, end: date) -> np.ndarray:
+        """(balls, runs, metric) per key summed over the months of [start, end]."""
+        self._slide_to(_month_ordinal(start), _month_ordinal(end) + 1)
+        sums = self._running.copy()
+        if len(self._years):
+            mask = (self._years >= start.year) & (self._years <= end.year)
+            for index in range(3):
+                sums[index] += np.bincount(
+                    self._year_keys[mask], weights=self._year_values[index, mask], minlength=len(self.keys)
+                )
+        # Subtraction leaves float dust on cells that went back to zero
+        return np.round(sums, 6)
+
+    def window(self, start: date, end: date) -> Tuple[List[Dict[str, Any]], Dict[Tuple[str, str, str], Dict[str, float]]]:
+        """
+        Cells and baseline totals for a month-aligned window, shaped like
+        ``_fetch_*_cells`` / ``_fetch_*_totals`` return them.
+        """
+        balls, runs, metric = self.window_sums(start, end)
+
+        cells: List[Dict[str, Any]] = []
+        for key_id in np.flatnonzero(self._has_player & (balls >= MIN_CELL_BALLS)).tolist():
+            player, competition, length_bucket, bowl_kind = self.keys[key_id]
+            cells.append({
+                "player": player,
+                "competition": competition,
+                "length_bucket": length_bucket,
+                "bowl_kind": bowl_kind,
+                "balls": int(balls[key_id]),
+                "runs": float(runs[key_id]),
+                self.metric: float(metric[key_id]),
+            })
+
+        totals: Dict[Tuple[str, str, str], Dict[str, float]] = {}
+        if len(self.keys):
+            group_sums = [
+                np.bincount(self._key_groups, weights=values, minlength=len(self._groups))
+                for values in (balls, runs, metric)
+            ]
+            for group_id in np.flatnonzero(group_sums[0] > 0).tolist():
+                totals[self._groups[group_id]] = {
+                    "balls": float(group_sums[0][group_id]),
+                    "runs": float(group_sums[1][group_id]),
+                    self.metric: float(group_sums[2][group_id]),
+                }
+        return cells, totals
+
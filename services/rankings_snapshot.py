@@ -0,0 +1,459 @@
+"""
+Versioned, memory-mapped snapshots of the global T20 rankings tables.
+
+A cold rankings request builds the whole table for its window, and callers that only need a
+few players (match previews, IPL predictions) used to page through up to 50,000 rows of it.
+The snapshot builder writes each (mode, bowl_kind, window) ranking once per data refresh:
+
+    python scripts/build_rankings_snapshots.py         # after each delivery_details refresh
+
+Each ranking is one uncompressed Arrow IPC file holding the rows in rank order (scalar
+columns plus the full row as JSON) and a player-name index: the normalised names sorted,
+with the row each one points at. Readers memory-map the file, so a page decodes only its own
+rows and a player lookup is a binary search over the index.
+
+A build goes into a new versioned directory with a manifest, then ``<root>/CURRENT`` is
+atomically repointed at it. The manifest records the data version the build saw
+(services.competition_weight_fits.current_data_version).
+
+Builds run in the delivery_details pipeline, whose disk the API never sees, so the builder
+also publishes each build to Postgres (``publish_rankings_snapshot``): the manifest in
+rankings_snapshot_builds and every artifact, zlib-compressed, in rankings_snapshot_files.
+API workers pick up the build of the current data version from there, write its manifest to
+their local root and download each artifact the first time it is opened.
+
+Readers call ``get_rankings_snapshots()``, which returns None when pyarrow is not installed,
+snapshots are disabled, or no build matches the data version they pass; the rankings service
+then computes as before. A build on older data is never served.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.sql import text
+
+from services.delivery_snapshot import _prune, _publish, new_snapshot_id
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+RANKINGS_SNAPSHOT_ENABLED = os.getenv("RANKINGS_SNAPSHOT_ENABLED", "true").lower() in {"1", "true", "yes"}
+RANKINGS_SNAPSHOT_DIR = os.getenv(
+    "RANKINGS_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "rankings_snapshot"),
+)
+# How often readers look at CURRENT for a newer build
+SNAPSHOT_RECHECK_SECONDS = float(os.getenv("RANKINGS_SNAPSHOT_RECHECK_SECONDS", "30"))
+# Builds kept on disk and in Postgres, including the current one (readers may still hold the
+# previous one)
+SNAPSHOTS_TO_KEEP = int(os.getenv("RANKINGS_SNAPSHOT_KEEP", "2"))
+
+BUILDS_TABLE = "rankings_snapshot_builds"
+FILES_TABLE = "rankings_snapshot_files"
+
+# Row fields stored as their own columns; everything else is only in row_json
+_SCALAR_FIELDS = (
+    ("rank", "int32"),
+    ("quality_score", "float64"),
+    ("strike_factor", "float64"),
+    ("control_factor", "float64"),
+    ("total_balls", "int32"),
+)
+
+
+def is_available() -> bool:
+    """True if pyarrow is importable (a build may still be missing)."""
+    return pa is not None
+
+
+def snapshots_enabled() -> bool:
+    """True if readers may use snapshots at all (pyarrow installed and not switched off)."""
+    return pa is not None and RANKINGS_SNAPSHOT_ENABLED
+
+
+def player_key(name: Optional[str]) -> str:
+    """Lower-cased, whitespace-collapsed name; the key every rankings lookup matches on."""
+    return " ".join(str(name or "").strip().lower().split())
+
+
+def _artifact_name(mode: str, bowl_kind: str, start: date, end: date) -> str:
+    return f"{mode}_{bowl_kind}_{start.isoformat()}_{end.isoformat()}.arrow"
+
+
+def write_ranking_artifact(path: str, payload: Dict[str, Any]) -> int:
+    """Write one rankings payload (as _build_rankings_payload returns it) to ``path``."""
+    rows = payload.get("rankings", []) or []
+    keys = [player_key(row.get("player")) for row in rows]
+    index_order = sorted(range(len(rows)), key=lambda i: (keys[i], i))
+
+    columns = {
+        "player": pa.array([row.get("player") for row in rows], type=pa.string()),
+        "row_json": pa.array([json.dumps(row).encode() for row in rows], type=pa.binary()),
+        "index_key": pa.array([keys[i] for i in index_order], type=pa.string()),
+        "index_row": pa.array(index_order, type=pa.int32()),
+    }
+    for field, arrow_type in _SCALAR_FIELDS:
+        columns[field] = pa.array([row.get(field) for row in rows], type=getattr(pa, arrow_type)())
+
+    meta = {key: value for key, value in payload.items() if key != "rankings"}
+    table = pa.table(columns).replace_schema_metadata({"payload": json.dumps(meta)})
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return len(rows)
+
+
+class RankingArtifact:
+    """One memory-mapped ranking table."""
+
+    def __init__(self, path: str):
+        if pa is None:
+            raise RuntimeError("pyarrow is required to read rankings snapshots")
+        self.path = path
+        self.table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        self.meta = json.loads(self.table.schema.metadata[b"payload"])
+        self._rows = self.table.column("row_json")
+        self._index_key = self.table.column("index_key")
+        self._index_row = self.table.column("index_row")
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def _row(self, i: int) -> Dict[str, Any]:
+        return json.loads(self._rows[i].as_py())
+
+    def page(self, limit: int, offset: int) -> Dict[str, Any]:
+        """The payload with only rows [offset, offset + limit) decoded, like _paginate_rankings."""
+        offset = max(offset, 0)
+        limit = max(limit, 0)
+        stop = min(offset + limit, len(self)) if limit else len(self)
+        return {**self.meta, "rankings": [self._row(i) for i in range(offset, stop)]}
+
+    def _rows_for_key(self, key: str) -> List[int]:
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._index_key[mid].as_py() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = []
+        while lo < len(self) and self._index_key[lo].as_py() == key:
+            found.append(self._index_row[lo].as_py())
+            lo += 1
+        return found
+
+    def find(self, candidates: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Best-ranked row whose player matches any candidate name, or None."""
+        matches = [i for key in {player_key(c) for c in candidates if c} for i in self._rows_for_key(key)]
+        return self._row(min(matches)) if matches else None
+
+    def lookup(self, names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Rows of these players keyed by normalised name; unranked players are left out."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for key in {player_key(name) for name in names if name}:
+            rows = self._rows_for_key(key)
+            if rows:
+                out[key] = self._row(min(rows))
+        return out
+
+
+class RankingsSnapshot:
+    """
+    Read side of one build: the manifest plus lazily opened artifacts. With ``bind``, an
+    artifact missing from local disk is downloaded from the published build first.
+    """
+
+    def __init__(self, path: str, bind: Any = None):
+        self.path = path
+        self.bind = bind
+        with open(os.path.join(path, "_manifest.json")) as fh:
+            self.manifest = json.load(fh)
+        self.snapshot_id = self.manifest["snapshot_id"]
+        self.data_version = self.manifest.get("data_version")
+        self._entries: Dict[Tuple[str, str, str, str], str] = {}
+        self._defaults: Dict[Tuple[str, str], str] = {}
+        for entry in self.manifest.get("artifacts", []):
+            self._entries[(entry["mode"], entry["bowl_kind"], entry["start"], entry["end"])] = entry["file"]
+            if entry.get("default"):
+                self._defaults[(entry["mode"], entry["bowl_kind"])] = entry["file"]
+        self._open: Dict[str, RankingArtifact] = {}
+        self._lock = threading.Lock()
+
+    def _artifact(self, file_name: Optional[str]) -> Optional[RankingArtifact]:
+        if file_name is None:
+            return None
+        artifact = self._open.get(file_name)
+        if artifact is None:
+            with self._lock:
+                artifact = self._open.get(file_name)
+                if artifact is None:
+                    path = os.path.join(self.path, file_name)
+                    if not os.path.exists(path) and self.bind is not None:
+                        _download_artifact(self.bind, self.snapshot_id, file_name, path)
+                    artifact = self._open[file_name] = RankingArtifact(path)
+        return artifact
+
+    def get(self, mode: str, bowl_kind: str, start: date, end: date) -> Optional[RankingArtifact]:
+        """The ranking built for exactly this window, if the build has it."""
+        return self._artifact(self._entries.get((mode, bowl_kind, start.isoformat(), end.isoformat())))
+
+    def default(self, mode: str, bowl_kind: str) -> Optional[RankingArtifact]:
+        """The ranking built for the default (trailing two-year) window at build time."""
+        return self._artifact(self._defaults.get((mode, bowl_kind)))
+
+
+def write_rankings_snapshot(
+    entries: Iterable[Tuple[str, str, date, date, bool, Dict[str, Any]]],
+    root: str = RANKINGS_SNAPSHOT_DIR,
+    data_version: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Write a new snapshot build under ``root`` and make it current.
+
+    Args:
+        entries: (mode, bowl_kind, start, end, is_default, payload) per ranking
+        root: Snapshot root directory
+        data_version: Data version the rankings were computed on, read before the build
+
+    Returns:
+        The build manifest
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is required to build rankings snapshots")
+
+    started = time.perf_counter()
+    snapshot_id = new_snapshot_id()
+    target = os.path.join(root, "snapshots", snapshot_id)
+    os.makedirs(target, exist_ok=False)
+
+    artifacts = []
+    try:
+        for mode, bowl_kind, start, end, is_default, payload in entries:
+            file_name = _artifact_name(mode, bowl_kind, start, end)
+            rows = write_ranking_artifact(os.path.join(target, file_name), payload)
+            artifacts.append({
+                "mode": mode,
+                "bowl_kind": bowl_kind,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "default": bool(is_default),
+                "file": file_name,
+                "rows": rows,
+            })
+    except Exception:
+        shutil.rmtree(target, ignore_errors=True)
+        raise
+
+    manifest = {
+        "snapshot_id": snapshot_id,
+        "data_version": data_version,
+        "created_at": datetime.utcnow().isoformat(),
+        "artifacts": artifacts,
+        "build_seconds": round(time.perf_counter() - started, 1),
+    }
+    with open(os.path.join(target, "_manifest.json"), "w") as fh:
+        json.dump(manifest, fh, indent=2)
+
+    _publish(root, snapshot_id)
+    _prune(root, keep=SNAPSHOTS_TO_KEEP)
+    logger.info(f"Rankings snapshot {snapshot_id}: {len(artifacts)} rankings in {manifest['build_seconds']}s")
+    return manifest
+
+
+def ensure_snapshot_tables(conn) -> None:
+    """Create the published-build tables if they do not exist yet."""
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {BUILDS_TABLE} (
+            snapshot_id VARCHAR PRIMARY KEY,
+            data_version VARCHAR NOT NULL,
+            manifest JSONB NOT NULL,
+            published_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """))
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {FILES_TABLE} (
+            snapshot_id VARCHAR NOT NULL REFERENCES {BUILDS_TABLE} (snapshot_id) ON DELETE CASCADE,
+            file_name VARCHAR NOT NULL,
+            content BYTEA NOT NULL,
+            PRIMARY KEY (snapshot_id, file_name)
+        )
+    """))
+    conn.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS idx_{BUILDS_TABLE}_version
+        ON {BUILDS_TABLE} (data_version, published_at)
+    """))
+
+
+def publish_rankings_snapshot(db, root: str, manifest: Dict[str, Any]) -> None:
+    """
+    Store a local build (as ``write_rankings_snapshot`` returned it) in Postgres for the API
+    workers, and drop published builds beyond SNAPSHOTS_TO_KEEP (no commit).
+    """
+    if manifest.get("data_version") is None:
+        raise ValueError("Only builds tagged with a data version can be published")
+    ensure_snapshot_tables(db)
+    snapshot_id = manifest["snapshot_id"]
+    target = os.path.join(root, "snapshots", snapshot_id)
+    db.execute(text(f"""
+        INSERT INTO {BUILDS_TABLE} (snapshot_id, data_version, manifest, published_at)
+        VALUES (:snapshot_id, :version, CAST(:manifest AS JSONB), NOW())
+    """), {"snapshot_id": snapshot_id, "version": manifest["data_version"], "manifest": json.dumps(manifest)})
+    for entry in manifest.get("artifacts", []):
+        with open(os.path.join(target, entry["file"]), "rb") as fh:
+            content = zlib.compress(fh.read())
+        db.execute(text(f"""
+            INSERT INTO {FILES_TABLE} (snapshot_id, file_name, content)
+            VALUES (:snapshot_id, :file_name, :content)
+        """), {"snapshot_id": snapshot_id, "file_name": entry["file"], "content": content})
+    db.execute(text(f"""
+        DELETE FROM {BUILDS_TABLE}
+        WHERE snapshot_id NOT IN (
+            SELECT snapshot_id FROM {BUILDS_TABLE} ORDER BY published_at DESC LIMIT :keep
+        )
+    """), {"keep": max(SNAPSHOTS_TO_KEEP, 1)})
+
+
+def _published_manifest(bind: Any, data_version: str) -> Optional[Dict[str, Any]]:
+    """Manifest of the latest build published for ``data_version``, or None."""
+    with bind.connect() as conn:
+        installed = conn.execute(
+            text("SELECT to_regclass(CAST(:table AS TEXT)) IS NOT NULL"), {"table": BUILDS_TABLE}
+        ).scalar()
+        if not installed:
+            return None
+        manifest = conn.execute(text(f"""
+            SELECT manifest FROM {BUILDS_TABLE}
+            WHERE data_version = :version
+            ORDER BY published_at DESC
+            LIMIT 1
+        """), {"version": data_version}).scalar()
+    # psycopg2 returns JSONB decoded; other drivers may hand back the text
+    return json.loads(manifest) if isinstance(manifest, str) else manifest
+
+
+def _download_artifact(bind: Any, snapshot_id: str, file_name: str, path: str) -> None:
+    with bind.connect() as conn:
+        content = conn.execute(text(f"""
+            SELECT content FROM {FILES_TABLE}
+            WHERE snapshot_id = :snapshot_id AND file_name = :file_name
+        """), {"snapshot_id": snapshot_id, "file_name": file_name}).scalar()
+    if content is None:
+        raise FileNotFoundError(f"Rankings snapshot {snapshot_id} has no published {file_name}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(zlib.decompress(bytes(content)))
+    os.replace(tmp, path)
+
+
+def _adopt_published_build(bind: Any, root: str, data_version: str) -> Optional[str]:
+    """Write the manifest of the build published for ``data_version`` locally and make it current."""
+    manifest = _published_manifest(bind, data_version)
+    if manifest is None:
+        return None
+    snapshot_id = manifest["snapshot_id"]
+    target = os.path.join(root, "snapshots", snapshot_id)
+    os.makedirs(target, exist_ok=True)
+    path = os.path.join(target, "_manifest.json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(tmp, path)
+    _publish(root, snapshot_id)
+    _prune(root, keep=SNAPSHOTS_TO_KEEP)
+    return snapshot_id
+
+
+class _SnapshotHolder:
+    def __init__(self):
+        self._snapshot: Optional[RankingsSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, root: str, data_version: Optional[str] = None, bind: Any = None) -> Optional[RankingsSnapshot]:
+        if time.monotonic() - self._checked_at >= SNAPSHOT_RECHECK_SECONDS:
+            with self._lock:
+                if time.monotonic() - self._checked_at >= SNAPSHOT_RECHECK_SECONDS:
+                    self._refresh(root, data_version, bind)
+                    self._checked_at = time.monotonic()
+        snapshot = self._snapshot
+        # A build on other data than the caller's is no snapshot at all
+        if data_version is not None and (snapshot is None or snapshot.data_version != data_version):
+            return None
+        return snapshot
+
+    def _refresh(self, root: str, data_version: Optional[str], bind: Any) -> None:
+        self._load_current(root, bind)
+        snapshot = self._snapshot
+        if data_version is None or bind is None or (snapshot is not None and snapshot.data_version == data_version):
+            return
+        try:
+            if _adopt_published_build(bind, root, data_version) is not None:
+                self._load_current(root, bind)
+        except Exception as e:
+            logger.warning(f"Could not fetch the published rankings snapshot for data version {data_version}: {e}")
+
+    def _load_current(self, root: str, bind: Any) -> None:
+        try:
+            with open(os.path.join(root, "CURRENT")) as fh:
+                snapshot_id = fh.read().strip()
+        except FileNotFoundError:
+            self._snapshot = None
+            return
+        if self._snapshot is None or self._snapshot.snapshot_id != snapshot_id:
+            try:
+                self._snapshot = RankingsSnapshot(os.path.join(root, "snapshots", snapshot_id), bind=bind)
+                logger.info(f"Loaded rankings snapshot {snapshot_id} "
+                            f"({len(self._snapshot.manifest.get('artifacts', []))} rankings)")
+            except Exception as e:
+                logger.error(f"Error loading rankings snapshot {snapshot_id}: {e}")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._snapshot = None
+            self._checked_at = 0.0
+
+
+_holders: Dict[str, _SnapshotHolder] = {}
+
+
+def get_rankings_snapshots(
+    root: Optional[str] = None,
+    data_version: Optional[str] = None,
+    bind: Any = None,
+) -> Optional[RankingsSnapshot]:
+    """
+    The current rankings snapshot build, or None to compute rankings on demand.
+
+    Args:
+        root: Snapshot root directory
+        data_version: Only return a build made on this data version (None: any build)
+        bind: Engine to fetch the published build of ``data_version`` from when the local
+            one is missing or older
+    """
+    if not snapshots_enabled():
+        return None
+    root = root or RANKINGS_SNAPSHOT_DIR
+    holder = _holders.get(root)
+    if holder is None:
+        holder = _holders.setdefault(root, _SnapshotHolder())
+    return holder.get(root, data_version, bind)
+
+
+def reset_snapshot_cache() -> None:
+    for holder in list(_holders.values()):
+        holder.reset()
@@ -20,7 +20,7 @@ from services.delivery_data_service import (
     build_competition_filter_delivery_details,
     build_venue_filter_delivery_details,
 )
-from services.player_aliases import get_all_name_variants, get_player_names, resolve_to_legacy_name
+from services.player_aliases import get_all_name_variants, get_player_names, resolve_player_names_bulk
 
 
 BOWLER_WICKET_TYPES = (
@@ -858,34 +858,48 @@ def get_form_flags_for_players(
     window = max(1, int(window or 10))
     limit = max(window * 2, 10)
 
-    for name in player_names:
-        if not name:
-            continue
-        legacy = resolve_to_legacy_name(name, db)
-        query = text(
-            """
-            WITH combined AS (
-                SELECT m.date, bs.fantasy_points
-                FROM batting_stats bs
-                JOIN matches m ON m.id = bs.match_id
-                WHERE bs.striker = :player AND bs.fantasy_points IS NOT NULL
-                  AND bs.format = :fmt AND bs.gender = :gender
-                UNION ALL
-                SELECT m.date, bw.fantasy_points
-                FROM bowling_stats bw
-                JOIN matches m ON m.id = bw.match_id
-                WHERE bw.bowler = :player AND bw.fantasy_points IS NOT NULL
-                  AND bw.format = :fmt AND bw.gender = :gender
-            )
-            SELECT fantasy_points
+    names = [name for name in dict.fromkeys(player_names) if name]
+    if not names:
+        return out
+    resolved = resolve_player_names_bulk(names, db)
+    legacy_by_name = {name: resolved[name]["legacy_name"] or name for name in names}
+
+    # One round trip for the whole list: the latest `limit` fantasy scores per player
+    query = text(
+        """
+        WITH combined AS (
+            SELECT bs.striker AS player, m.date, bs.fantasy_points
+            FROM batting_stats bs
+            JOIN matches m ON m.id = bs.match_id
+            WHERE bs.striker = ANY(:players) AND bs.fantasy_points IS NOT NULL
+              AND bs.format = :fmt AND bs.gender = :gender
+            UNION ALL
+            SELECT bw.bowler AS player, m.date, bw.fantasy_points
+            FROM bowling_stats bw
+            JOIN matches m ON m.id = bw.match_id
+            WHERE bw.bowler = ANY(:players) AND bw.fantasy_points IS NOT NULL
+              AND bw.format = :fmt AND bw.gender = :gender
+        ),
+        ranked AS (
+            SELECT player, fantasy_points,
+                   ROW_NUMBER() OVER (PARTITION BY player ORDER BY date DESC) AS rn
             FROM combined
-            ORDER BY date DESC
-            LIMIT :limit
-            """
         )
-        rows = db.execute(query, {"player": legacy, "limit": limit,
-                                  "fmt": fmt, "gender": gender}).fetchall()
-        values = [float(r[0]) for r in rows if r and r[0] is not None]
+        SELECT player, fantasy_points
+        FROM ranked
+        WHERE rn <= :limit
+        ORDER BY player, rn
+        """
+    )
+    rows = db.execute(query, {"players": sorted(set(legacy_by_name.values())), "limit": limit,
+                              "fmt": fmt, "gender": gender}).fetchall()
+    recent: Dict[str, List[float]] = {}
+    for row in rows:
+        if row and row[1] is not None:
+            recent.setdefault(row[0], []).append(float(row[1]))
+
+    for name in names:
+        values = recent.get(legacy_by_name[name], [])
         out[name] = _derive_recent_form_flag(list(reversed(values)), window)
 
     return out
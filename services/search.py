@@ -6,106 +6,72 @@ import logging
 import random
 import math
 
+import numpy as np
+
 from services.player_aliases import (
     resolve_to_legacy_name,
     get_player_names,
     search_players_with_aliases
 )
-from services.bowler_types import BOWLER_CATEGORY_SQL
+from services.doppelganger_matrix import (
+    BATTING_METRICS,
+    BOWL_KINDS,
+    BOWLING_METRICS,
+    _sanitize_style_key,
+    get_player_feature_matrix,
+)
+from services.feature_matrix_store import percentile_rank, zscore_columns
 
 logger = logging.getLogger(__name__)
 
 
-# Batter doppelganger feature expansion settings
-DOPPELGANGER_STYLE_FEATURE_COUNT = 4
-DOPPELGANGER_STYLE_MIN_BALLS = 120
-DOPPELGANGER_KIND_MIN_BALLS_PER_PLAYER = 30
-DOPPELGANGER_STYLE_MIN_BALLS_PER_PLAYER = 25
-
-
-def _safe_pct(num: float, den: float) -> float:
-    return (num * 100.0 / den) if den else 0.0
-
-
-def _safe_rate_per_100(num: float, den: float) -> float:
-    return (num * 100.0 / den) if den else 0.0
-
-
-def _safe_economy(runs: float, balls: float) -> float:
-    return (runs * 6.0 / balls) if balls else 0.0
-
-
-def _safe_bowling_sr(balls: float, wickets: float) -> float:
-    return (balls / wickets) if wickets else 0.0
-
-
-def _sanitize_style_key(style: str) -> str:
-    cleaned = "".join(ch if ch.isalnum() else "_" for ch in (style or "").strip())
-    while "__" in cleaned:
-        cleaned = cleaned.replace("__", "_")
-    return cleaned.strip("_").lower() or "unknown"
-
-
-def _build_batter_split_metrics(
-    split_rows: List[Any],
-    player_pool_names: set[str],
-    include_style_metrics: bool = True
-) -> tuple[Dict[str, Dict[str, float]], List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+_BATTING_METRIC_DEFS = [
+    {"key": "batting_average", "label": "Bat Avg", "higher_is_better": True},
+    {"key": "batting_strike_rate", "label": "Bat SR", "higher_is_better": True},
+    {"key": "batting_dot_percentage", "label": "Bat Dot%", "higher_is_better": False},
+    {"key": "batting_boundary_percentage", "label": "Bat Bnd%", "higher_is_better": True},
+    {"key": "pp_strike_rate", "label": "PP SR", "higher_is_better": True},
+    {"key": "middle_strike_rate", "label": "Mid SR", "higher_is_better": True},
+    {"key": "death_strike_rate", "label": "Death SR", "higher_is_better": True},
+    {"key": "pp_boundary_percentage", "label": "PP Bnd%", "higher_is_better": True},
+    {"key": "middle_boundary_percentage", "label": "Mid Bnd%", "higher_is_better": True},
+    {"key": "death_boundary_percentage", "label": "Death Bnd%", "higher_is_better": True},
+]
+_BOWLING_METRIC_DEFS = [
+    {"key": "bowling_economy", "label": "Econ", "higher_is_better": False},
+    {"key": "bowling_strike_rate", "label": "Bowl SR", "higher_is_better": False},
+    {"key": "bowling_dot_percentage", "label": "Bowl Dot%", "higher_is_better": True},
+    {"key": "pp_economy", "label": "PP Econ", "higher_is_better": False},
+    {"key": "middle_economy", "label": "Mid Econ", "higher_is_better": False},
+    {"key": "death_economy", "label": "Death Econ", "higher_is_better": False},
+    {"key": "pp_dot_percentage", "label": "PP Dot%", "higher_is_better": True},
+    {"key": "middle_dot_percentage", "label": "Mid Dot%", "higher_is_better": True},
+    {"key": "death_dot_percentage", "label": "Death Dot%", "higher_is_better": True},
+]
+_SPLIT_METRIC_TEMPLATES = [
+    ("average", "Avg", True),
+    ("strike_rate", "SR", True),
+    ("boundary_percentage", "Bnd%", True),
+    ("dot_percentage", "Dot%", False),
+]
+
+# Default leaderboard preset: top franchise leagues plus internationals between top-10 teams
+DOPPELGANGER_LEADERBOARD_LEAGUES = ["IPL", "BBL", "PSL", "CPL", "SA20"]
+DOPPELGANGER_LEADERBOARD_TOP_TEAMS = 10
+
+
+def _split_metric_defs(top_styles: List[str]) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
-    Build batter split metrics (pace/spin + top bowler styles) from delivery-level rows.
+    Batter split features: vs pace/spin plus the given bowler types.
 
-    Returns:
-    - per_player_metrics additions
-    - distance metric defs (extra features)
-    - radar metric defs (subset, excludes style metrics to keep radar readable)
-    - per_player_split_volume metadata
+    Returns (distance metric defs, radar metric defs); the radar leaves the bowler types out
+    to stay readable.
     """
-    by_player: Dict[str, Dict[str, Dict[str, float]]] = {}
-    style_totals: Dict[str, float] = {}
-    player_split_volume: Dict[str, Dict[str, Any]] = {}
-
-    for row in split_rows:
-        player_name = row.player_name
-        if player_pool_names and player_name not in player_pool_names:
-            continue
-
-        split_key = row.split_key
-        split_type = row.split_type  # 'kind' or 'style'
-        balls = float(row.balls or 0)
-        runs = float(row.runs or 0)
-        dots = float(row.dots or 0)
-        boundaries = float(row.boundaries or 0)
-        dismissals = float(row.dismissals or 0)
-
-        by_player.setdefault(player_name, {})
-        by_player[player_name][f"{split_type}:{split_key}"] = {
-            "balls": balls,
-            "runs": runs,
-            "dots": dots,
-            "boundaries": boundaries,
-            "dismissals": dismissals,
-        }
-
-        if split_type == "style":
-            style_totals[split_key] = style_totals.get(split_key, 0.0) + balls
-
-    top_styles = [
-        style for style, total_balls in sorted(style_totals.items(), key=lambda x: x[1], reverse=True)
-        if total_balls >= DOPPELGANGER_STYLE_MIN_BALLS
-    ][:DOPPELGANGER_STYLE_FEATURE_COUNT]
-
     extra_metric_defs: List[Dict[str, Any]] = []
     radar_metric_defs: List[Dict[str, Any]] = []
 
-    split_def_templates = [
-        ("average", "Avg", True),
-        ("strike_rate", "SR", True),
-        ("boundary_percentage", "Bnd%", True),
-        ("dot_percentage", "Dot%", False),
-    ]
-
-    for kind in ["pace", "spin"]:
-        for metric_key, metric_label, higher_is_better in split_def_templates:
+    for kind in BOWL_KINDS:
+        for metric_key, metric_label, higher_is_better in _SPLIT_METRIC_TEMPLATES:
             extra_metric_defs.append({
                 "key": f"vs_{kind}_{metric_key}",
                 "label": f"vs {kind.title()} {metric_label}",
@@ -113,77 +79,40 @@ def _build_batter_split_metrics(
             })
             radar_metric_defs.append(extra_metric_defs[-1])
 
-    if include_style_metrics:
-        for style in top_styles:
-            style_key = _sanitize_style_key(style)
-            for metric_key, metric_label, higher_is_better in split_def_templates:
-                extra_metric_defs.append({
-                    "key": f"vs_style_{style_key}_{metric_key}",
-                    "label": f"{style} {metric_label}",
-                    "higher_is_better": higher_is_better,
-                })
+    for style in top_styles:
+        style_key = _sanitize_style_key(style)
+        for metric_key, metric_label, higher_is_better in _SPLIT_METRIC_TEMPLATES:
+            extra_metric_defs.append({
+                "key": f"vs_style_{style_key}_{metric_key}",
+                "label": f"{style} {metric_label}",
+                "higher_is_better": higher_is_better,
+            })
 
-    def _metrics_from_agg(agg: Optional[Dict[str, float]], min_balls_for_metrics: int = 1) -> Dict[str, Any]:
-        if not agg:
-            return {
-                "average": None,
-                "strike_rate": None,
-                "boundary_percentage": None,
-                "dot_percentage": None,
-                "balls": 0.0,
-            }
-        balls = float(agg.get("balls") or 0)
-        runs = float(agg.get("runs") or 0)
-        dismissals = float(agg.get("dismissals") or 0)
-        if balls < min_balls_for_metrics:
-            return {
-                "average": None,
-                "strike_rate": None,
-                "boundary_percentage": None,
-                "dot_percentage": None,
-                "balls": balls,
-            }
-        return {
-            "average": round((runs / dismissals) if dismissals else 0.0, 3),
-            "strike_rate": round(_safe_rate_per_100(runs, balls), 3),
-            "boundary_percentage": round(_safe_pct(float(agg.get("boundaries") or 0), balls), 3),
-            "dot_percentage": round(_safe_pct(float(agg.get("dots") or 0), balls), 3),
-            "balls": balls,
-        }
+    return extra_metric_defs, radar_metric_defs
 
-    per_player_metrics: Dict[str, Dict[str, float]] = {}
-    for player_name in player_pool_names:
-        player_splits = by_player.get(player_name, {})
-        additions: Dict[str, float] = {}
-        split_volume: Dict[str, Any] = {"kind": {}, "style": {}}
 
-        for kind in ["pace", "spin"]:
-            m = _metrics_from_agg(
-                player_splits.get(f"kind:{kind}"),
-                min_balls_for_metrics=DOPPELGANGER_KIND_MIN_BALLS_PER_PLAYER,
-            )
-            split_volume["kind"][kind] = int(m["balls"])
-            additions[f"vs_{kind}_average"] = m["average"]
-            additions[f"vs_{kind}_strike_rate"] = m["strike_rate"]
-            additions[f"vs_{kind}_boundary_percentage"] = m["boundary_percentage"]
-            additions[f"vs_{kind}_dot_percentage"] = m["dot_percentage"]
-
-        for style in top_styles:
-            m = _metrics_from_agg(
-                player_splits.get(f"style:{style}"),
-                min_balls_for_metrics=DOPPELGANGER_STYLE_MIN_BALLS_PER_PLAYER,
-            )
-            style_key = _sanitize_style_key(style)
-            split_volume["style"][style] = int(m["balls"])
-            additions[f"vs_style_{style_key}_average"] = m["average"]
-            additions[f"vs_style_{style_key}_strike_rate"] = m["strike_rate"]
-            additions[f"vs_style_{style_key}_boundary_percentage"] = m["boundary_percentage"]
-            additions[f"vs_style_{style_key}_dot_percentage"] = m["dot_percentage"]
+def _classify_roles(batting_matches: np.ndarray, bowling_matches: np.ndarray) -> np.ndarray:
+    total_matches = np.maximum(batting_matches, bowling_matches)
+    return np.select(
+        [
+            (total_matches > 0) & (bowling_matches >= 8)
+            & (batting_matches >= 0.4 * total_matches) & (bowling_matches >= 0.4 * total_matches),
+            (bowling_matches >= batting_matches) & (bowling_matches >= 8),
+            (batting_matches >= 2 * bowling_matches) | (bowling_matches < 8),
+        ],
+        ["all_rounder", "bowler", "batter"],
+        default="all_rounder",
+    )
 
-        per_player_metrics[player_name] = additions
-        player_split_volume[player_name] = split_volume
 
-    return per_player_metrics, extra_metric_defs, radar_metric_defs, player_split_volume
+def _column_means(block: np.ndarray) -> List[float]:
+    """Mean of each column's non-missing values, rounded like every league average (0.0 if none)."""
+    means = []
+    for j in range(block.shape[1]):
+        vals = block[:, j][~np.isnan(block[:, j])]
+        means.append(round(float(vals.sum()) / len(vals), 3) if len(vals) else 0.0)
+    return means
+
 
 # Default parameters for searches
 def get_default_params():
@@ -197,54 +126,6 @@ def get_default_params():
     }
 
 
-def _build_matches_competition_filter(
-    params: Dict[str, Any],
-    *,
-    leagues: Optional[List[str]] = None,
-    include_international: bool = True,
-    top_teams: Optional[int] = None,
-    match_alias: str = "m",
-) -> str:
-    """
-    Build a competition filter clause for queries joined to `matches`.
-
-    Semantics:
-    - `leagues is None`: no league filter condition emitted unless international condition exists
-    - `leagues == []`: include all league matches
-    - `leagues` non-empty: include only those leagues
-    - `include_international`: include T20Is, optionally restricted to top N teams
-    """
-    from models import INTERNATIONAL_TEAMS_RANKED
-
-    conditions: List[str] = []
-
-    if leagues is not None:
-        if len(leagues) == 0:
-            conditions.append(f"{match_alias}.match_type = 'league'")
-        else:
-            league_param = f"{match_alias}_doppel_leagues"
-            params[league_param] = leagues
-            conditions.append(
-                f"({match_alias}.match_type = 'league' AND {match_alias}.competition = ANY(:{league_param}))"
-            )
-
-    if include_international:
-        if top_teams:
-            top_team_list = INTERNATIONAL_TEAMS_RANKED[:top_teams]
-            top_param = f"{match_alias}_doppel_top_teams"
-            params[top_param] = top_team_list
-            conditions.append(
-                f"({match_alias}.match_type = 'international' AND {match_alias}.team1 = ANY(:{top_param}) AND {match_alias}.team2 = ANY(:{top_param}))"
-            )
-        else:
-            conditions.append(f"{match_alias}.match_type = 'international'")
-
-    if not conditions:
-        return ""
-
-    return "\n        AND (" + "\n            OR ".join(conditions) + "\n        )"
-
-
 def search_entities(query: str, db: Session, limit: int = 10) -> List[Dict]:
     """
     Unified search across players, teams, and venues.
@@ -632,444 +513,140 @@ def get_player_doppelgangers(
             "error": f"Invalid role '{role}'. Expected one of: batter, bowler, all_rounder"
         }
 
-    params = {"start_date": start, "end_date": end}
     apply_competition_filter = (
         leagues is not None or include_international is not None or top_teams is not None
     )
-    competition_filter = _build_matches_competition_filter(
-        params,
+    matrix = get_player_feature_matrix(
+        db,
+        start,
+        end,
         leagues=leagues if apply_competition_filter else None,
         include_international=(include_international if include_international is not None else False) if apply_competition_filter else False,
         top_teams=top_teams,
-        match_alias="m",
     )
 
-    batting_query = text(f"""
-        SELECT
-            bs.striker AS player_name,
-            COUNT(DISTINCT bs.match_id) AS batting_matches,
-            COALESCE(SUM(bs.runs), 0) AS batting_runs,
-            COALESCE(SUM(bs.balls_faced), 0) AS batting_balls,
-            COALESCE(SUM(bs.dots), 0) AS batting_dots,
-            COALESCE(SUM(bs.fours), 0) AS fours,
-            COALESCE(SUM(bs.sixes), 0) AS sixes,
-            COUNT(CASE WHEN COALESCE(bs.wickets, 0) > 0 THEN 1 END) AS dismissals,
-            COALESCE(SUM(bs.pp_runs), 0) AS pp_runs,
-            COALESCE(SUM(bs.pp_balls), 0) AS pp_balls,
-            COALESCE(SUM(bs.pp_dots), 0) AS pp_dots,
-            COALESCE(SUM(bs.pp_boundaries), 0) AS pp_boundaries,
-            COALESCE(SUM(bs.middle_runs), 0) AS middle_runs,
-            COALESCE(SUM(bs.middle_balls), 0) AS middle_balls,
-            COALESCE(SUM(bs.middle_dots), 0) AS middle_dots,
-            COALESCE(SUM(bs.middle_boundaries), 0) AS middle_boundaries,
-            COALESCE(SUM(bs.death_runs), 0) AS death_runs,
-            COALESCE(SUM(bs.death_balls), 0) AS death_balls,
-            COALESCE(SUM(bs.death_dots), 0) AS death_dots,
-            COALESCE(SUM(bs.death_boundaries), 0) AS death_boundaries
-        FROM batting_stats bs
-        JOIN matches m ON bs.match_id = m.id
-        WHERE m.date >= :start_date AND m.date <= :end_date
-        {competition_filter}
-        GROUP BY bs.striker
-    """)
-
-    bowling_query = text(f"""
-        SELECT
-            bw.bowler AS player_name,
-            COUNT(DISTINCT bw.match_id) AS bowling_matches,
-            COALESCE(SUM(bw.runs_conceded), 0) AS runs_conceded,
-            COALESCE(SUM(bw.wickets), 0) AS wickets,
-            COALESCE(SUM(bw.dots), 0) AS bowling_dots,
-            COALESCE(SUM(
-                CAST(
-                    FLOOR(COALESCE(bw.overs, 0)) * 6 +
-                    ROUND((COALESCE(bw.overs, 0) - FLOOR(COALESCE(bw.overs, 0))) * 10)
-                AS INTEGER)
-            ), 0) AS bowling_balls,
-            COALESCE(SUM(bw.pp_runs), 0) AS pp_runs,
-            COALESCE(SUM(bw.pp_dots), 0) AS pp_dots,
-            COALESCE(SUM(
-                CAST(
-                    FLOOR(COALESCE(bw.pp_overs, 0)) * 6 +
-                    ROUND((COALESCE(bw.pp_overs, 0) - FLOOR(COALESCE(bw.pp_overs, 0))) * 10)
-                AS INTEGER)
-            ), 0) AS pp_balls,
-            COALESCE(SUM(bw.middle_runs), 0) AS middle_runs,
-            COALESCE(SUM(bw.middle_dots), 0) AS middle_dots,
-            COALESCE(SUM(
-                CAST(
-                    FLOOR(COALESCE(bw.middle_overs, 0)) * 6 +
-                    ROUND((COALESCE(bw.middle_overs, 0) - FLOOR(COALESCE(bw.middle_overs, 0))) * 10)
-                AS INTEGER)
-            ), 0) AS middle_balls,
-            COALESCE(SUM(bw.death_runs), 0) AS death_runs,
-            COALESCE(SUM(bw.death_dots), 0) AS death_dots,
-            COALESCE(SUM(
-                CAST(
-                    FLOOR(COALESCE(bw.death_overs, 0)) * 6 +
-                    ROUND((COALESCE(bw.death_overs, 0) - FLOOR(COALESCE(bw.death_overs, 0))) * 10)
-                AS INTEGER)
-            ), 0) AS death_balls
-        FROM bowling_stats bw
-        JOIN matches m ON bw.match_id = m.id
-        WHERE m.date >= :start_date AND m.date <= :end_date
-        {competition_filter}
-        GROUP BY bw.bowler
-    """)
-
-    batter_split_query = text(f"""
-        SELECT
-            d.batter AS player_name,
-            'kind' AS split_type,
-            {BOWLER_CATEGORY_SQL.replace("bowler_type", "d.bowler_type")} AS split_key,
-            COUNT(*) AS balls,
-            COALESCE(SUM(d.runs_off_bat), 0) AS runs,
-            COALESCE(SUM(CASE WHEN COALESCE(d.runs_off_bat, 0) = 0 AND COALESCE(d.extras, 0) = 0 THEN 1 ELSE 0 END), 0) AS dots,
-            COALESCE(SUM(CASE WHEN COALESCE(d.runs_off_bat, 0) IN (4, 6) THEN 1 ELSE 0 END), 0) AS boundaries,
-            COALESCE(SUM(CASE WHEN d.player_dismissed = d.batter THEN 1 ELSE 0 END), 0) AS dismissals
-        FROM deliveries d
-        JOIN matches m ON d.match_id = m.id
-        WHERE m.date >= :start_date AND m.date <= :end_date
-          {competition_filter}
-          AND d.batter IS NOT NULL
-          AND d.bowler_type IS NOT NULL
-          AND {BOWLER_CATEGORY_SQL.replace("bowler_type", "d.bowler_type")} IS NOT NULL
-        GROUP BY d.batter, split_key
-        UNION ALL
-        SELECT
-            d.batter AS player_name,
-            'style' AS split_type,
-            d.bowler_type AS split_key,
-            COUNT(*) AS balls,
-            COALESCE(SUM(d.runs_off_bat), 0) AS runs,
-            COALESCE(SUM(CASE WHEN COALESCE(d.runs_off_bat, 0) = 0 AND COALESCE(d.extras, 0) = 0 THEN 1 ELSE 0 END), 0) AS dots,
-            COALESCE(SUM(CASE WHEN COALESCE(d.runs_off_bat, 0) IN (4, 6) THEN 1 ELSE 0 END), 0) AS boundaries,
-            COALESCE(SUM(CASE WHEN d.player_dismissed = d.batter THEN 1 ELSE 0 END), 0) AS dismissals
-        FROM deliveries d
-        JOIN matches m ON d.match_id = m.id
-        WHERE m.date >= :start_date AND m.date <= :end_date
-          {competition_filter}
-          AND d.batter IS NOT NULL
-          AND d.bowler_type IS NOT NULL
-        GROUP BY d.batter, d.bowler_type
-    """)
-
-    batting_rows = db.execute(batting_query, params).fetchall()
-    bowling_rows = db.execute(bowling_query, params).fetchall()
-    batter_split_rows = db.execute(batter_split_query, params).fetchall()
-
-    player_map: Dict[str, Dict[str, Any]] = {}
-
-    def _get_player_record(name: str) -> Dict[str, Any]:
-        if name not in player_map:
-            player_map[name] = {
-                "player_name": name,
-                "batting": {},
-                "bowling": {}
-            }
-        return player_map[name]
-
-    for row in batting_rows:
-        rec = _get_player_record(row.player_name)
-        rec["batting"] = dict(row._mapping)
-
-    for row in bowling_rows:
-        rec = _get_player_record(row.player_name)
-        rec["bowling"] = dict(row._mapping)
-
-    batting_metric_defs = [
-        {"key": "batting_average", "label": "Bat Avg", "higher_is_better": True},
-        {"key": "batting_strike_rate", "label": "Bat SR", "higher_is_better": True},
-        {"key": "batting_dot_percentage", "label": "Bat Dot%", "higher_is_better": False},
-        {"key": "batting_boundary_percentage", "label": "Bat Bnd%", "higher_is_better": True},
-        {"key": "pp_strike_rate", "label": "PP SR", "higher_is_better": True},
-        {"key": "middle_strike_rate", "label": "Mid SR", "higher_is_better": True},
-        {"key": "death_strike_rate", "label": "Death SR", "higher_is_better": True},
-        {"key": "pp_boundary_percentage", "label": "PP Bnd%", "higher_is_better": True},
-        {"key": "middle_boundary_percentage", "label": "Mid Bnd%", "higher_is_better": True},
-        {"key": "death_boundary_percentage", "label": "Death Bnd%", "higher_is_better": True},
-    ]
-    bowling_metric_defs = [
-        {"key": "bowling_economy", "label": "Econ", "higher_is_better": False},
-        {"key": "bowling_strike_rate", "label": "Bowl SR", "higher_is_better": False},
-        {"key": "bowling_dot_percentage", "label": "Bowl Dot%", "higher_is_better": True},
-        {"key": "pp_economy", "label": "PP Econ", "higher_is_better": False},
-        {"key": "middle_economy", "label": "Mid Econ", "higher_is_better": False},
-        {"key": "death_economy", "label": "Death Econ", "higher_is_better": False},
-        {"key": "pp_dot_percentage", "label": "PP Dot%", "higher_is_better": True},
-        {"key": "middle_dot_percentage", "label": "Mid Dot%", "higher_is_better": True},
-        {"key": "death_dot_percentage", "label": "Death Dot%", "higher_is_better": True},
-    ]
-
-    def _batting_metrics(b: Dict[str, Any]) -> Dict[str, float]:
-        runs = float(b.get("batting_runs") or 0)
-        balls = float(b.get("batting_balls") or 0)
-        dots = float(b.get("batting_dots") or 0)
-        boundaries = float((b.get("fours") or 0) + (b.get("sixes") or 0))
-        dismissals = float(b.get("dismissals") or 0)
-        pp_runs = float(b.get("pp_runs") or 0)
-        pp_balls = float(b.get("pp_balls") or 0)
-        pp_boundaries = float(b.get("pp_boundaries") or 0)
-        middle_runs = float(b.get("middle_runs") or 0)
-        middle_balls = float(b.get("middle_balls") or 0)
-        middle_boundaries = float(b.get("middle_boundaries") or 0)
-        death_runs = float(b.get("death_runs") or 0)
-        death_balls = float(b.get("death_balls") or 0)
-        death_boundaries = float(b.get("death_boundaries") or 0)
-
-        return {
-            "batting_average": round((runs / dismissals) if dismissals else 0.0, 3),
-            "batting_strike_rate": round(_safe_rate_per_100(runs, balls), 3),
-            "batting_dot_percentage": round(_safe_pct(dots, balls), 3),
-            "batting_boundary_percentage": round(_safe_pct(boundaries, balls), 3),
-            "pp_strike_rate": round(_safe_rate_per_100(pp_runs, pp_balls), 3),
-            "middle_strike_rate": round(_safe_rate_per_100(middle_runs, middle_balls), 3),
-            "death_strike_rate": round(_safe_rate_per_100(death_runs, death_balls), 3),
-            "pp_boundary_percentage": round(_safe_pct(pp_boundaries, pp_balls), 3),
-            "middle_boundary_percentage": round(_safe_pct(middle_boundaries, middle_balls), 3),
-            "death_boundary_percentage": round(_safe_pct(death_boundaries, death_balls), 3),
-        }
-
-    def _bowling_metrics(bw: Dict[str, Any]) -> Dict[str, float]:
-        runs = float(bw.get("runs_conceded") or 0)
-        wickets = float(bw.get("wickets") or 0)
-        balls = float(bw.get("bowling_balls") or 0)
-        dots = float(bw.get("bowling_dots") or 0)
-        pp_runs = float(bw.get("pp_runs") or 0)
-        pp_balls = float(bw.get("pp_balls") or 0)
-        pp_dots = float(bw.get("pp_dots") or 0)
-        middle_runs = float(bw.get("middle_runs") or 0)
-        middle_balls = float(bw.get("middle_balls") or 0)
-        middle_dots = float(bw.get("middle_dots") or 0)
-        death_runs = float(bw.get("death_runs") or 0)
-        death_balls = float(bw.get("death_balls") or 0)
-        death_dots = float(bw.get("death_dots") or 0)
-
-        return {
-            "bowling_economy": round(_safe_economy(runs, balls), 3),
-            "bowling_strike_rate": round(_safe_bowling_sr(balls, wickets), 3),
-            "bowling_dot_percentage": round(_safe_pct(dots, balls), 3),
-            "pp_economy": round(_safe_economy(pp_runs, pp_balls), 3),
-            "middle_economy": round(_safe_economy(middle_runs, middle_balls), 3),
-            "death_economy": round(_safe_economy(death_runs, death_balls), 3),
-            "pp_dot_percentage": round(_safe_pct(pp_dots, pp_balls), 3),
-            "middle_dot_percentage": round(_safe_pct(middle_dots, middle_balls), 3),
-            "death_dot_percentage": round(_safe_pct(death_dots, death_balls), 3),
-        }
+    batting_matches = matrix.column("batting_matches")
+    bowling_matches = matrix.column("bowling_matches")
+    total_matches = np.maximum(batting_matches, bowling_matches)
+    player_roles = _classify_roles(batting_matches, bowling_matches)
+    players = np.flatnonzero(total_matches > 0)
 
-    def _classify_role(batting_matches: int, bowling_matches: int) -> str:
-        total_matches = max(batting_matches, bowling_matches)
-        if total_matches > 0 and bowling_matches >= 8:
-            if batting_matches >= 0.4 * total_matches and bowling_matches >= 0.4 * total_matches:
-                return "all_rounder"
-        if bowling_matches >= batting_matches and bowling_matches >= 8:
-            return "bowler"
-        if batting_matches >= (2 * bowling_matches) or bowling_matches < 8:
-            return "batter"
-        return "all_rounder"
-
-    players = []
-    for name, rec in player_map.items():
-        batting = rec.get("batting") or {}
-        bowling = rec.get("bowling") or {}
-        batting_matches = int(batting.get("batting_matches") or 0)
-        bowling_matches = int(bowling.get("bowling_matches") or 0)
-        total_matches = max(batting_matches, bowling_matches)
-        if total_matches == 0:
-            continue
-
-        player_role = _classify_role(batting_matches, bowling_matches)
-        batting_metrics = _batting_metrics(batting)
-        bowling_metrics = _bowling_metrics(bowling)
-        combined_metrics = {**batting_metrics, **bowling_metrics}
-
-        players.append({
-            "player_name": name,
-            "batting_matches": batting_matches,
-            "bowling_matches": bowling_matches,
-            "matches": total_matches,
-            "player_role": player_role,
-            "batting_metrics": batting_metrics,
-            "bowling_metrics": bowling_metrics,
-            "all_rounder_metrics": combined_metrics,
-        })
-
-    target_any = next((p for p in players if p["player_name"] == resolved_name), None)
-    if not target_any:
+    target_row = matrix.index.get(resolved_name)
+    if target_row is None or total_matches[target_row] == 0:
         return {
             "found": False,
             "error": f"Player '{player_name}' not found in player pool for selected date range",
             "player_pool_size": len(players)
         }
+    target_role = str(player_roles[target_row])
 
-    comparison_role = requested_role or target_any["player_role"]
+    comparison_role = requested_role or target_role
 
     # Enrich batter metrics with delivery-level pace/spin + bowler-style splits.
-    batter_player_names = {p["player_name"] for p in players}
-    split_metric_additions, split_metric_defs, split_radar_metric_defs, split_volume = _build_batter_split_metrics(
-        batter_split_rows,
-        batter_player_names,
-        include_style_metrics=True,
-    )
-    if split_metric_defs:
-        batting_metric_defs = batting_metric_defs + split_metric_defs
-        for p in players:
-            p["batting_metrics"].update(split_metric_additions.get(p["player_name"], {}))
-            p["all_rounder_metrics"].update(split_metric_additions.get(p["player_name"], {}))
-            p["batting_split_volume"] = split_volume.get(p["player_name"], {"kind": {}, "style": {}})
-    else:
-        for p in players:
-            p["batting_split_volume"] = {"kind": {}, "style": {}}
-
-    def _qualifies_for_pool(p: Dict[str, Any], pool_role: str) -> bool:
-        if pool_role == "batter":
-            # Batter-mode comparisons should include pure batters and all-rounders
-            # if they have enough batting sample size.
-            return p["batting_matches"] >= min_matches
-        if pool_role == "bowler":
-            # Bowler-mode comparisons should include pure bowlers and all-rounders
-            # if they have enough bowling sample size.
-            return p["bowling_matches"] >= min_matches
-        # All-rounder-mode remains role-strict and requires volume on both sides.
-        if p["player_role"] != "all_rounder":
-            return False
-        return p["matches"] >= min_matches and p["bowling_matches"] >= 8 and p["batting_matches"] >= max(1, int(math.ceil(0.4 * p["matches"])))
+    top_styles = matrix.top_styles(players)
+    split_metric_defs, _ = _split_metric_defs(top_styles)
+    batting_metric_defs = _BATTING_METRIC_DEFS + split_metric_defs
+    bowling_metric_defs = _BOWLING_METRIC_DEFS
+    split_keys = [m["key"] for m in split_metric_defs]
 
     role_metric_defs = {
         "batter": batting_metric_defs,
         "bowler": bowling_metric_defs,
         "all_rounder": batting_metric_defs + bowling_metric_defs,
     }
-    metric_key_to_def = {m["key"]: m for m in role_metric_defs[comparison_role]}
     radar_metric_defs_by_role = {
         "batter": [m for m in batting_metric_defs if not m["key"].startswith("vs_style_")] ,
         "bowler": bowling_metric_defs,
         "all_rounder": ([m for m in batting_metric_defs if not m["key"].startswith("vs_style_")] + bowling_metric_defs),
     }
-
-    role_metric_field = {
-        "batter": "batting_metrics",
-        "bowler": "bowling_metrics",
-        "all_rounder": "all_rounder_metrics",
+    # Keys in the order each role's metrics dict has always listed them
+    role_metric_keys = {
+        "batter": list(BATTING_METRICS) + split_keys,
+        "bowler": list(BOWLING_METRICS),
+        "all_rounder": list(BATTING_METRICS) + list(BOWLING_METRICS) + split_keys,
     }[comparison_role]
 
-    candidate_pool = [p for p in players if _qualifies_for_pool(p, comparison_role)]
-    target = next((p for p in candidate_pool if p["player_name"] == resolved_name), None)
-    if not target:
+    if comparison_role == "batter":
+        # Batter-mode comparisons should include pure batters and all-rounders
+        # if they have enough batting sample size.
+        qualified = batting_matches >= min_matches
+    elif comparison_role == "bowler":
+        # Bowler-mode comparisons should include pure bowlers and all-rounders
+        # if they have enough bowling sample size.
+        qualified = bowling_matches >= min_matches
+    else:
+        # All-rounder-mode remains role-strict and requires volume on both sides.
+        qualified = (
+            (player_roles == "all_rounder")
+            & (total_matches >= min_matches)
+            & (bowling_matches >= 8)
+            & (batting_matches >= np.maximum(1, np.ceil(0.4 * total_matches)))
+        )
+    candidate_pool = np.flatnonzero(qualified & (total_matches > 0))
+
+    if not qualified[target_row]:
         return {
             "found": False,
             "error": f"Player '{player_name}' not found in qualified {comparison_role} pool",
-            "player_role": target_any["player_role"],
+            "player_role": target_role,
             "comparison_role": comparison_role,
             "qualified_players": len(candidate_pool)
         }
 
     feature_names = [m["key"] for m in role_metric_defs[comparison_role]]
-    zscore_stats = {}
-    percentile_stats = {}
-    for feature in feature_names:
-        vals = [
-            float(p[role_metric_field][feature])
-            for p in candidate_pool
-            if p[role_metric_field].get(feature) is not None
-        ]
-        if not vals:
-            zscore_stats[feature] = {"mean": 0.0, "std": 1.0}
-            percentile_stats[feature] = {"values": [], "mean": 0.0}
-            continue
-        mean = sum(vals) / len(vals)
-        variance = sum((v - mean) ** 2 for v in vals) / len(vals)
-        std = math.sqrt(variance)
-        zscore_stats[feature] = {"mean": mean, "std": std if std > 0 else 1.0}
-        percentile_stats[feature] = {
-            "values": vals,
-            "mean": round(mean, 3)
-        }
+    pool_values = matrix.block(candidate_pool, feature_names)
+    feature_column = {feature: j for j, feature in enumerate(feature_names)}
+    league_means = dict(zip(feature_names, _column_means(pool_values)))
 
-    all_rounder_weight = math.sqrt(0.5)
+    zscores = zscore_columns(pool_values)
+    if comparison_role == "all_rounder":
+        zscores *= math.sqrt(0.5)
 
-    def _zscore_vector(player_record: Dict[str, Any]) -> List[float]:
-        vec = []
-        for f in feature_names:
-            raw_val = player_record[role_metric_field].get(f)
-            if raw_val is None:
-                # Missing split metrics are treated as neutral (mean) instead of zero.
-                z = 0.0
-            else:
-                raw = float(raw_val)
-                z = (raw - zscore_stats[f]["mean"]) / zscore_stats[f]["std"]
-            if comparison_role == "all_rounder":
-                z *= all_rounder_weight
-            vec.append(z)
-        return vec
-
-    def _percentile(feature: str, raw_value: float) -> float:
-        vals = percentile_stats[feature]["values"]
-        if not vals:
-            return 50.0
-        metric_def = metric_key_to_def[feature]
-        better_count = 0
-        equal_count = 0
-        for v in vals:
-            if metric_def["higher_is_better"]:
-                if v < raw_value:
-                    better_count += 1
-                elif v == raw_value:
-                    equal_count += 1
-            else:
-                if v > raw_value:
-                    better_count += 1
-                elif v == raw_value:
-                    equal_count += 1
-        # Mid-rank percentile where higher is always better after direction adjustment
-        return round(((better_count + (equal_count * 0.5)) * 100.0) / max(len(vals), 1), 1)
-
-    def _build_radar_metrics(player_record: Dict[str, Any]) -> List[Dict[str, Any]]:
-        metrics = player_record[role_metric_field]
+    target_pos = int(np.searchsorted(candidate_pool, target_row))
+    distances = np.round(np.sqrt(((zscores - zscores[target_pos]) ** 2).sum(axis=1)), 4)
+    others = np.delete(np.arange(len(candidate_pool)), target_pos)
+    ranked = others[np.argsort(distances[others], kind="stable")]
+
+    def _build_radar_metrics(pos: int) -> List[Dict[str, Any]]:
         radar_items = []
         for metric_def in radar_metric_defs_by_role[comparison_role]:
-            raw_val = metrics.get(metric_def["key"])
-            if raw_val is None:
+            j = feature_column[metric_def["key"]]
+            raw_val = pool_values[pos, j]
+            if np.isnan(raw_val):
                 continue
             radar_items.append(
                 {
                     "metric": metric_def["label"],
                     "key": metric_def["key"],
-                    "percentile": _percentile(metric_def["key"], float(raw_val)),
+                    "percentile": percentile_rank(pool_values[:, j], float(raw_val), metric_def["higher_is_better"]),
                     "raw_value": round(float(raw_val), 3),
-                    "league_avg": percentile_stats[metric_def["key"]]["mean"],
+                    "league_avg": league_means[metric_def["key"]],
                     "higher_is_better": metric_def["higher_is_better"],
                 }
             )
         return radar_items
 
-    target_vec = _zscore_vector(target)
-    scored = []
-    for p in candidate_pool:
-        if p["player_name"] == resolved_name:
-            continue
-        vec = _zscore_vector(p)
-        distance = math.sqrt(sum((a - b) ** 2 for a, b in zip(target_vec, vec)))
-        scored.append({
-            "player_name": p["player_name"],
-            "distance": round(distance, 4),
-            "matches": p["matches"],
-            "batting_matches": p["batting_matches"],
-            "bowling_matches": p["bowling_matches"],
-            "player_role": p["player_role"],
-            "metrics": p[role_metric_field],
-            "radar_metrics": _build_radar_metrics(p),
-            "batting_split_volume": p.get("batting_split_volume"),
-        })
-
-    scored.sort(key=lambda x: x["distance"])
-    similar = scored[:top_n]
-    dissimilar = list(reversed(scored[-top_n:])) if scored else []
+    def _scored(pos: int) -> Dict[str, Any]:
+        row = candidate_pool[pos]
+        return {
+            "player_name": matrix.names[row],
+            "distance": float(distances[pos]),
+            "matches": int(total_matches[row]),
+            "batting_matches": int(batting_matches[row]),
+            "bowling_matches": int(bowling_matches[row]),
+            "player_role": str(player_roles[row]),
+            "metrics": matrix.metrics(row, role_metric_keys),
+            "radar_metrics": _build_radar_metrics(pos),
+            "batting_split_volume": matrix.split_volume(row, top_styles),
+        }
+
+    similar = [_scored(pos) for pos in ranked[:top_n]]
+    dissimilar = [_scored(pos) for pos in ranked[::-1][:top_n]]
 
     league_averages = {
         metric_def["key"]: {
             "label": metric_def["label"],
-            "value": percentile_stats[metric_def["key"]]["mean"],
+            "value": league_means[metric_def["key"]],
             "higher_is_better": metric_def["higher_is_better"],
         }
         for metric_def in role_metric_defs[comparison_role]
@@ -1081,7 +658,7 @@ def get_player_doppelgangers(
         "display_name": names["details_name"],
         "date_range": {"start_date": start.isoformat(), "end_date": end.isoformat()},
         "min_matches": min_matches,
-        "player_role": target_any["player_role"],
+        "player_role": target_role,
         "comparison_role": comparison_role,
         "role_overridden": bool(requested_role),
         "feature_space": feature_names,
@@ -1091,8 +668,8 @@ def get_player_doppelgangers(
             "uses_expanded_batter_splits": comparison_role in {"batter", "all_rounder"},
         },
         "qualified_players": len(candidate_pool),
-        "target_metrics": target[role_metric_field],
-        "target_radar_metrics": _build_radar_metrics(target),
+        "target_metrics": matrix.metrics(target_row, role_metric_keys),
+        "target_radar_metrics": _build_radar_metrics(target_pos),
         "league_averages": league_averages,
         "most_similar": similar,
         "most_dissimilar": dissimilar
@@ -1123,8 +700,8 @@ def get_doppelganger_leaderboard(
     start = start_date or defaults["start_date"]
     end = end_date or defaults["end_date"]
 
-    default_top_leagues = ["IPL", "BBL", "PSL", "CPL", "SA20"]
-    default_top_teams_count = 10
+    default_top_leagues = DOPPELGANGER_LEADERBOARD_LEAGUES
+    default_top_teams_count = DOPPELGANGER_LEADERBOARD_TOP_TEAMS
     if batter_metric_level not in {"basic", "pace_spin", "bowling_type"}:
         raise ValueError("batter_metric_level must be one of: basic, pace_spin, bowling_type")
 
@@ -1137,305 +714,52 @@ def get_doppelganger_leaderboard(
         top_teams if top_teams is not None else default_top_teams_count
     ) if effective_include_international else None
 
-    params = {
-        "start_date": start,
-        "end_date": end,
-    }
-    competition_filter = _build_matches_competition_filter(
-        params,
+    if effective_leagues is None and not effective_include_international:
+        raise ValueError("At least one competition source must be selected (league and/or international)")
+
+    matrix = get_player_feature_matrix(
+        db,
+        start,
+        end,
         leagues=effective_leagues,
         include_international=effective_include_international,
         top_teams=effective_top_teams,
-        match_alias="m",
     )
 
-    if not competition_filter:
-        raise ValueError("At least one competition source must be selected (league and/or international)")
-
-    batting_query = text(f"""
-        SELECT
-            bs.striker AS player_name,
-            COUNT(*) AS batting_innings,
-            COUNT(DISTINCT bs.match_id) AS batting_matches,
-            COALESCE(SUM(bs.runs), 0) AS batting_runs,
-            COALESCE(SUM(bs.balls_faced), 0) AS batting_balls,
-            COALESCE(SUM(bs.dots), 0) AS batting_dots,
-            COALESCE(SUM(bs.fours), 0) AS fours,
-            COALESCE(SUM(bs.sixes), 0) AS sixes,
-            COUNT(CASE WHEN COALESCE(bs.wickets, 0) > 0 THEN 1 END) AS dismissals,
-            COALESCE(SUM(bs.pp_runs), 0) AS pp_runs,
-            COALESCE(SUM(bs.pp_balls), 0) AS pp_balls,
-            COALESCE(SUM(bs.pp_dots), 0) AS pp_dots,
-            COALESCE(SUM(bs.pp_boundaries), 0) AS pp_boundaries,
-            COALESCE(SUM(bs.middle_runs), 0) AS middle_runs,
-            COALESCE(SUM(bs.middle_balls), 0) AS middle_balls,
-            COALESCE(SUM(bs.middle_dots), 0) AS middle_dots,
-            COALESCE(SUM(bs.middle_boundaries), 0) AS middle_boundaries,
-            COALESCE(SUM(bs.death_runs), 0) AS death_runs,
-            COALESCE(SUM(bs.death_balls), 0) AS death_balls,
-            COALESCE(SUM(bs.death_dots), 0) AS death_dots,
-            COALESCE(SUM(bs.death_boundaries), 0) AS death_boundaries
-        FROM batting_stats bs
-        JOIN matches m ON bs.match_id = m.id
-        WHERE m.date >= :start_date AND m.date <= :end_date
-        {competition_filter}
-        GROUP BY bs.striker
-    """)
-
-    bowling_query = text(f"""
-        SELECT
-            bw.bowler AS player_name,
-            COUNT(*) AS bowling_innings,
-            COUNT(DISTINCT bw.match_id) AS bowling_matches,
-            COALESCE(SUM(bw.runs_conceded), 0) AS runs_conceded,
-            COALESCE(SUM(bw.wickets), 0) AS wickets,
-            COALESCE(SUM(bw.dots), 0) AS bowling_dots,
-            COALESCE(SUM(
-                CAST(
-                    FLOOR(COALESCE(bw.overs, 0)) * 6 +
-                    ROUND((COALESCE(bw.overs, 0) - FLOOR(COALESCE(bw.overs, 0))) * 10)
-                AS INTEGER)
-            ), 0) AS bowling_balls,
-            COALESCE(SUM(bw.pp_runs), 0) AS pp_runs,
-            COALESCE(SUM(bw.pp_dots), 0) AS pp_dots,
-            COALESCE(SUM(
-                CAST(
-                    FLOOR(COALESCE(bw.pp_overs, 0)) * 6 +
-                    ROUND((COALESCE(bw.pp_overs, 0) - FLOOR(COALESCE(bw.pp_overs, 0))) * 10)
-                AS INTEGER)
-            ), 0) AS pp_balls,
-            COALESCE(SUM(bw.middle_runs), 0) AS middle_runs,
-            COALESCE(SUM(bw.middle_dots), 0) AS middle_dots,
-            COALESCE(SUM(
-                CAST(
-                    FLOOR(COALESCE(bw.middle_overs, 0)) * 6 +
-                    ROUND((COALESCE(bw.middle_overs, 0) - FLOOR(COALESCE(bw.middle_overs, 0))) * 10)
-                AS INTEGER)
-            ), 0) AS middle_balls,
-            COALESCE(SUM(bw.death_runs), 0) AS death_runs,
-            COALESCE(SUM(bw.death_dots), 0) AS death_dots,
-            COALESCE(SUM(
-                CAST(
-                    FLOOR(COALESCE(bw.death_overs, 0)) * 6 +
-                    ROUND((COALESCE(bw.death_overs, 0) - FLOOR(COALESCE(bw.death_overs, 0))) * 10)
-                AS INTEGER)
-            ), 0) AS death_balls
-        FROM bowling_stats bw
-        JOIN matches m ON bw.match_id = m.id
-        WHERE m.date >= :start_date AND m.date <= :end_date
-        {competition_filter}
-        GROUP BY bw.bowler
-    """)
-
-    batter_split_query = text(f"""
-        SELECT
-            d.batter AS player_name,
-            'kind' AS split_type,
-            {BOWLER_CATEGORY_SQL.replace("bowler_type", "d.bowler_type")} AS split_key,
-            COUNT(*) AS balls,
-            COALESCE(SUM(d.runs_off_bat), 0) AS runs,
-            COALESCE(SUM(CASE WHEN COALESCE(d.runs_off_bat, 0) = 0 AND COALESCE(d.extras, 0) = 0 THEN 1 ELSE 0 END), 0) AS dots,
-            COALESCE(SUM(CASE WHEN COALESCE(d.runs_off_bat, 0) IN (4, 6) THEN 1 ELSE 0 END), 0) AS boundaries,
-            COALESCE(SUM(CASE WHEN d.player_dismissed = d.batter THEN 1 ELSE 0 END), 0) AS dismissals
-        FROM deliveries d
-        JOIN matches m ON d.match_id = m.id
-        WHERE m.date >= :start_date AND m.date <= :end_date
-          {competition_filter}
-          AND d.batter IS NOT NULL
-          AND d.bowler_type IS NOT NULL
-          AND {BOWLER_CATEGORY_SQL.replace("bowler_type", "d.bowler_type")} IS NOT NULL
-        GROUP BY d.batter, split_key
-        UNION ALL
-        SELECT
-            d.batter AS player_name,
-            'style' AS split_type,
-            d.bowler_type AS split_key,
-            COUNT(*) AS balls,
-            COALESCE(SUM(d.runs_off_bat), 0) AS runs,
-            COALESCE(SUM(CASE WHEN COALESCE(d.runs_off_bat, 0) = 0 AND COALESCE(d.extras, 0) = 0 THEN 1 ELSE 0 END), 0) AS dots,
-            COALESCE(SUM(CASE WHEN COALESCE(d.runs_off_bat, 0) IN (4, 6) THEN 1 ELSE 0 END), 0) AS boundaries,
-            COALESCE(SUM(CASE WHEN d.player_dismissed = d.batter THEN 1 ELSE 0 END), 0) AS dismissals
-        FROM deliveries d
-        JOIN matches m ON d.match_id = m.id
-        WHERE m.date >= :start_date AND m.date <= :end_date
-          {competition_filter}
-          AND d.batter IS NOT NULL
-          AND d.bowler_type IS NOT NULL
-        GROUP BY d.batter, d.bowler_type
-    """)
-
-    batting_rows = db.execute(batting_query, params).fetchall()
-    bowling_rows = db.execute(bowling_query, params).fetchall()
-    batter_split_rows = db.execute(batter_split_query, params).fetchall()
-
-    base_batting_metric_defs = [
-        "batting_average",
-        "batting_strike_rate",
-        "batting_dot_percentage",
-        "batting_boundary_percentage",
-        "pp_strike_rate",
-        "middle_strike_rate",
-        "death_strike_rate",
-        "pp_boundary_percentage",
-        "middle_boundary_percentage",
-        "death_boundary_percentage",
-    ]
-    bowling_metric_defs = [
-        "bowling_economy",
-        "bowling_strike_rate",
-        "bowling_dot_percentage",
-        "pp_economy",
-        "middle_economy",
-        "death_economy",
-        "pp_dot_percentage",
-        "middle_dot_percentage",
-        "death_dot_percentage",
-    ]
-
-    batters: List[Dict[str, Any]] = []
-    for row in batting_rows:
-        innings = int(row.batting_innings or 0)
-        if innings < min_batting_innings:
-            continue
-        runs = float(row.batting_runs or 0)
-        balls = float(row.batting_balls or 0)
-        dots = float(row.batting_dots or 0)
-        boundaries = float((row.fours or 0) + (row.sixes or 0))
-        dismissals = float(row.dismissals or 0)
-        metrics = {
-            "batting_average": round((runs / dismissals) if dismissals else 0.0, 3),
-            "batting_strike_rate": round(_safe_rate_per_100(runs, balls), 3),
-            "batting_dot_percentage": round(_safe_pct(dots, balls), 3),
-            "batting_boundary_percentage": round(_safe_pct(boundaries, balls), 3),
-            "pp_strike_rate": round(_safe_rate_per_100(float(row.pp_runs or 0), float(row.pp_balls or 0)), 3),
-            "middle_strike_rate": round(_safe_rate_per_100(float(row.middle_runs or 0), float(row.middle_balls or 0)), 3),
-            "death_strike_rate": round(_safe_rate_per_100(float(row.death_runs or 0), float(row.death_balls or 0)), 3),
-            "pp_boundary_percentage": round(_safe_pct(float(row.pp_boundaries or 0), float(row.pp_balls or 0)), 3),
-            "middle_boundary_percentage": round(_safe_pct(float(row.middle_boundaries or 0), float(row.middle_balls or 0)), 3),
-            "death_boundary_percentage": round(_safe_pct(float(row.death_boundaries or 0), float(row.death_balls or 0)), 3),
-        }
-        batters.append({
-            "player_name": row.player_name,
-            "innings": innings,
-            "matches": int(row.batting_matches or 0),
-            "balls": int(row.batting_balls or 0),
-            "metrics": metrics,
-        })
-
-    bowlers: List[Dict[str, Any]] = []
-    for row in bowling_rows:
-        balls = int(row.bowling_balls or 0)
-        if balls < min_bowling_balls:
-            continue
-        wickets = float(row.wickets or 0)
-        metrics = {
-            "bowling_economy": round(_safe_economy(float(row.runs_conceded or 0), float(balls)), 3),
-            "bowling_strike_rate": round(_safe_bowling_sr(float(balls), wickets), 3),
-            "bowling_dot_percentage": round(_safe_pct(float(row.bowling_dots or 0), float(balls)), 3),
-            "pp_economy": round(_safe_economy(float(row.pp_runs or 0), float(row.pp_balls or 0)), 3),
-            "middle_economy": round(_safe_economy(float(row.middle_runs or 0), float(row.middle_balls or 0)), 3),
-            "death_economy": round(_safe_economy(float(row.death_runs or 0), float(row.death_balls or 0)), 3),
-            "pp_dot_percentage": round(_safe_pct(float(row.pp_dots or 0), float(row.pp_balls or 0)), 3),
-            "middle_dot_percentage": round(_safe_pct(float(row.middle_dots or 0), float(row.middle_balls or 0)), 3),
-            "death_dot_percentage": round(_safe_pct(float(row.death_dots or 0), float(row.death_balls or 0)), 3),
-        }
-        bowlers.append({
-            "player_name": row.player_name,
-            "innings": int(row.bowling_innings or 0),
-            "matches": int(row.bowling_matches or 0),
-            "balls": balls,
-            "wickets": int(row.wickets or 0),
-            "metrics": metrics,
-        })
-
-    batter_names = {p["player_name"] for p in batters}
-    split_additions, split_metric_defs, split_radar_metric_defs, split_volume = _build_batter_split_metrics(
-        batter_split_rows,
-        batter_names,
-        include_style_metrics=True,
+    batting_innings = matrix.column("batting_innings")
+    batters = np.flatnonzero((batting_innings > 0) & (batting_innings >= min_batting_innings))
+    bowlers = np.flatnonzero(
+        (matrix.column("bowling_innings") > 0) & (matrix.column("bowling_balls") >= min_bowling_balls)
     )
-    if split_metric_defs:
-        all_batting_feature_names = base_batting_metric_defs + [m["key"] for m in split_metric_defs]
-        batter_metric_def_map = {m["key"]: m for m in (
-            [{"key": "batting_average", "label": "Bat Avg", "higher_is_better": True},
-             {"key": "batting_strike_rate", "label": "Bat SR", "higher_is_better": True},
-             {"key": "batting_dot_percentage", "label": "Bat Dot%", "higher_is_better": False},
-             {"key": "batting_boundary_percentage", "label": "Bat Bnd%", "higher_is_better": True},
-             {"key": "pp_strike_rate", "label": "PP SR", "higher_is_better": True},
-             {"key": "middle_strike_rate", "label": "Mid SR", "higher_is_better": True},
-             {"key": "death_strike_rate", "label": "Death SR", "higher_is_better": True},
-             {"key": "pp_boundary_percentage", "label": "PP Bnd%", "higher_is_better": True},
-             {"key": "middle_boundary_percentage", "label": "Mid Bnd%", "higher_is_better": True},
-             {"key": "death_boundary_percentage", "label": "Death Bnd%", "higher_is_better": True}] + split_metric_defs
-        )}
-        batter_radar_metric_defs = [
-            {"key": "batting_average", "label": "Bat Avg", "higher_is_better": True},
-            {"key": "batting_strike_rate", "label": "Bat SR", "higher_is_better": True},
-            {"key": "batting_dot_percentage", "label": "Bat Dot%", "higher_is_better": False},
-            {"key": "batting_boundary_percentage", "label": "Bat Bnd%", "higher_is_better": True},
-        ] + split_radar_metric_defs
-        for p in batters:
-            p["metrics"].update(split_additions.get(p["player_name"], {}))
-            p["batting_split_volume"] = split_volume.get(p["player_name"], {"kind": {}, "style": {}})
-    else:
-        all_batting_feature_names = list(base_batting_metric_defs)
-        batter_metric_def_map = {
-            "batting_average": {"key": "batting_average", "label": "Bat Avg", "higher_is_better": True},
-            "batting_strike_rate": {"key": "batting_strike_rate", "label": "Bat SR", "higher_is_better": True},
-            "batting_dot_percentage": {"key": "batting_dot_percentage", "label": "Bat Dot%", "higher_is_better": False},
-            "batting_boundary_percentage": {"key": "batting_boundary_percentage", "label": "Bat Bnd%", "higher_is_better": True},
-            "pp_strike_rate": {"key": "pp_strike_rate", "label": "PP SR", "higher_is_better": True},
-            "middle_strike_rate": {"key": "middle_strike_rate", "label": "Mid SR", "higher_is_better": True},
-            "death_strike_rate": {"key": "death_strike_rate", "label": "Death SR", "higher_is_better": True},
-            "pp_boundary_percentage": {"key": "pp_boundary_percentage", "label": "PP Bnd%", "higher_is_better": True},
-            "middle_boundary_percentage": {"key": "middle_boundary_percentage", "label": "Mid Bnd%", "higher_is_better": True},
-            "death_boundary_percentage": {"key": "death_boundary_percentage", "label": "Death Bnd%", "higher_is_better": True},
-        }
-        batter_radar_metric_defs = list(batter_metric_def_map.values())
-        for p in batters:
-            p["batting_split_volume"] = {"kind": {}, "style": {}}
 
-    pace_spin_feature_keys = [
-        "vs_pace_average", "vs_pace_strike_rate", "vs_pace_boundary_percentage", "vs_pace_dot_percentage",
-        "vs_spin_average", "vs_spin_strike_rate", "vs_spin_boundary_percentage", "vs_spin_dot_percentage",
-    ]
-    style_feature_keys = [k for k in all_batting_feature_names if k.startswith("vs_style_")]
+    top_styles = matrix.top_styles(batters)
+    split_metric_defs, split_radar_metric_defs = _split_metric_defs(top_styles)
+    batter_radar_metric_defs = _BATTING_METRIC_DEFS[:4] + split_radar_metric_defs
+
+    base_batting_metric_defs = list(BATTING_METRICS)
+    pace_spin_feature_keys = [m["key"] for m in split_radar_metric_defs]
+    style_feature_keys = [m["key"] for m in split_metric_defs if m["key"].startswith("vs_style_")]
 
     if batter_metric_level == "basic":
         batting_metric_defs = list(base_batting_metric_defs)
         required_batter_keys = []
     elif batter_metric_level == "pace_spin":
-        batting_metric_defs = list(base_batting_metric_defs) + [k for k in pace_spin_feature_keys if k in all_batting_feature_names]
-        required_batter_keys = [k for k in pace_spin_feature_keys if k in all_batting_feature_names]
+        batting_metric_defs = list(base_batting_metric_defs) + pace_spin_feature_keys
+        required_batter_keys = list(pace_spin_feature_keys)
     else:
-        batting_metric_defs = list(base_batting_metric_defs) + [k for k in pace_spin_feature_keys if k in all_batting_feature_names] + style_feature_keys
-        required_batter_keys = [k for k in pace_spin_feature_keys if k in all_batting_feature_names] + style_feature_keys
+        batting_metric_defs = list(base_batting_metric_defs) + pace_spin_feature_keys + style_feature_keys
+        required_batter_keys = pace_spin_feature_keys + style_feature_keys
 
     if required_batter_keys:
-        filtered_batters = []
-        for p in batters:
-            if all(p["metrics"].get(k) is not None for k in required_batter_keys):
-                filtered_batters.append(p)
-        batters = filtered_batters
-
-    bowler_metric_def_map = {
-        "bowling_economy": {"key": "bowling_economy", "label": "Econ", "higher_is_better": False},
-        "bowling_strike_rate": {"key": "bowling_strike_rate", "label": "Bowl SR", "higher_is_better": False},
-        "bowling_dot_percentage": {"key": "bowling_dot_percentage", "label": "Bowl Dot%", "higher_is_better": True},
-        "pp_economy": {"key": "pp_economy", "label": "PP Econ", "higher_is_better": False},
-        "middle_economy": {"key": "middle_economy", "label": "Mid Econ", "higher_is_better": False},
-        "death_economy": {"key": "death_economy", "label": "Death Econ", "higher_is_better": False},
-        "pp_dot_percentage": {"key": "pp_dot_percentage", "label": "PP Dot%", "higher_is_better": True},
-        "middle_dot_percentage": {"key": "middle_dot_percentage", "label": "Mid Dot%", "higher_is_better": True},
-        "death_dot_percentage": {"key": "death_dot_percentage", "label": "Death Dot%", "higher_is_better": True},
-    }
+        complete = ~np.isnan(matrix.block(batters, required_batter_keys)).any(axis=1)
+        batters = batters[complete]
 
     def _build_pair_leaderboard(
-        pool: List[Dict[str, Any]],
+        pool: np.ndarray,
         feature_names: List[str],
         role_label: str,
-        metric_def_map: Dict[str, Dict[str, Any]],
-        radar_metric_defs: List[Dict[str, Any]]
+        radar_metric_defs: List[Dict[str, Any]],
+        volume_prefix: str,
     ) -> Dict[str, Any]:
         if len(pool) < 2:
             return {
@@ -1447,102 +771,69 @@ def get_doppelganger_leaderboard(
                 "warning": "Not enough qualified players"
             }
 
+        matches = matrix.column(f"{volume_prefix}_matches")
+        innings = matrix.column(f"{volume_prefix}_innings")
+        balls = matrix.column(f"{volume_prefix}_balls")
+
         # Keep computation bounded on very broad ranges/cutoffs.
         if len(pool) > max_players_per_role:
-            pool = sorted(pool, key=lambda p: (p["matches"], p["balls"]), reverse=True)[:max_players_per_role]
+            by_volume = np.lexsort((-balls[pool], -matches[pool]))
+            pool = pool[by_volume[:max_players_per_role]]
             warning = f"Capped pool to top {max_players_per_role} players by volume for performance"
         else:
             warning = None
 
-        stats = {}
-        for feature in feature_names:
-            vals = [
-                float(p["metrics"][feature])
-                for p in pool
-                if p["metrics"].get(feature) is not None
-            ]
-            if not vals:
-                stats[feature] = {"mean": 0.0, "std": 1.0}
-                continue
-            mean = sum(vals) / len(vals)
-            variance = sum((v - mean) ** 2 for v in vals) / len(vals)
-            std = math.sqrt(variance)
-            stats[feature] = {"mean": mean, "std": std if std > 0 else 1.0}
-
-        vectors = {}
-        for p in pool:
-            vectors[p["player_name"]] = [
-                0.0 if p["metrics"].get(f) is None else ((float(p["metrics"][f]) - stats[f]["mean"]) / stats[f]["std"])
-                for f in feature_names
-            ]
-
-        percentile_stats = {
-            f: [float(p["metrics"][f]) for p in pool if p["metrics"].get(f) is not None]
-            for f in feature_names
-        }
+        # Radar metrics outside the distance features still get percentiles within the pool
+        value_keys = feature_names + [d["key"] for d in radar_metric_defs if d["key"] not in feature_names]
+        pool_values = matrix.block(pool, value_keys)
+        value_column = {key: j for j, key in enumerate(value_keys)}
+        league_means = dict(zip(value_keys, _column_means(pool_values)))
 
-        def _percentile(feature: str, raw_value: float) -> float:
-            vals = percentile_stats[feature]
-            if not vals:
-                return 50.0
-            metric_def = metric_def_map[feature]
-            better_count = 0
-            equal_count = 0
-            for v in vals:
-                if metric_def["higher_is_better"]:
-                    if v < raw_value:
-                        better_count += 1
-                    elif v == raw_value:
-                        equal_count += 1
-                else:
-                    if v > raw_value:
-                        better_count += 1
-                    elif v == raw_value:
-                        equal_count += 1
-            return round(((better_count + equal_count * 0.5) * 100.0) / max(len(vals), 1), 1)
-
-        def _radar_for_player(player_record: Dict[str, Any]) -> List[Dict[str, Any]]:
-            return [
-                {
+        zscores = zscore_columns(pool_values[:, :len(feature_names)])
+        first, second = np.triu_indices(len(pool), k=1)
+        distances = np.round(np.sqrt(((zscores[first] - zscores[second]) ** 2).sum(axis=1)), 4)
+        ranked = np.argsort(distances, kind="stable")
+
+        def _pair(k: int) -> Dict[str, Any]:
+            row1, row2 = pool[first[k]], pool[second[k]]
+            return {
+                "player1": matrix.names[row1],
+                "player2": matrix.names[row2],
+                "distance": float(distances[k]),
+                "player1_matches": int(matches[row1]),
+                "player2_matches": int(matches[row2]),
+                "player1_innings": int(innings[row1]),
+                "player2_innings": int(innings[row2]),
+                "player1_balls": int(balls[row1]),
+                "player2_balls": int(balls[row2]),
+            }
+
+        def _radar_for_player(pos: int) -> List[Dict[str, Any]]:
+            radar_items = []
+            for d in radar_metric_defs:
+                j = value_column[d["key"]]
+                raw_val = pool_values[pos, j]
+                if np.isnan(raw_val):
+                    continue
+                radar_items.append({
                     "metric": d["label"],
                     "key": d["key"],
-                    "percentile": _percentile(d["key"], float(player_record["metrics"][d["key"]])),
-                    "raw_value": round(float(player_record["metrics"][d["key"]]), 3),
-                    "league_avg": round(sum(percentile_stats[d["key"]]) / len(percentile_stats[d["key"]]), 3),
+                    "percentile": percentile_rank(pool_values[:, j], float(raw_val), d["higher_is_better"]),
+                    "raw_value": round(float(raw_val), 3),
+                    "league_avg": league_means[d["key"]],
                     "higher_is_better": d["higher_is_better"],
-                }
-                for d in radar_metric_defs
-                if d["key"] in player_record["metrics"] and player_record["metrics"].get(d["key"]) is not None
-            ]
-
-        indexed = {p["player_name"]: p for p in pool}
-        pairs = []
-        for i in range(len(pool)):
-            p1 = pool[i]
-            v1 = vectors[p1["player_name"]]
-            for j in range(i + 1, len(pool)):
-                p2 = pool[j]
-                v2 = vectors[p2["player_name"]]
-                dist = math.sqrt(sum((a - b) ** 2 for a, b in zip(v1, v2)))
-                pairs.append({
-                    "player1": p1["player_name"],
-                    "player2": p2["player_name"],
-                    "distance": round(dist, 4),
-                    "player1_matches": p1["matches"],
-                    "player2_matches": p2["matches"],
-                    "player1_innings": p1["innings"],
-                    "player2_innings": p2["innings"],
-                    "player1_balls": p1["balls"],
-                    "player2_balls": p2["balls"],
                 })
+            return radar_items
 
-        pairs.sort(key=lambda x: x["distance"])
-        displayed_pairs = pairs[:top_n_pairs] + list(reversed(pairs[-top_n_pairs:]))
-        displayed_names = {pair["player1"] for pair in displayed_pairs} | {pair["player2"] for pair in displayed_pairs}
+        most_similar = [_pair(k) for k in ranked[:top_n_pairs]]
+        most_dissimilar = [_pair(k) for k in ranked[::-1][:top_n_pairs]]
+        displayed_pos = {
+            int(pos) for k in list(ranked[:top_n_pairs]) + list(ranked[::-1][:top_n_pairs])
+            for pos in (first[k], second[k])
+        }
         player_radar_metrics = {
-            name: _radar_for_player(indexed[name])
-            for name in displayed_names
-            if name in indexed
+            matrix.names[pool[pos]]: _radar_for_player(pos)
+            for pos in displayed_pos
         }
         return {
             "role": role_label,
@@ -1552,8 +843,8 @@ def get_doppelganger_leaderboard(
                 "method": "euclidean_distance_on_z_scores",
                 "summary": "Lower distance means more similar. Features are z-score normalized within the qualified pool, then Euclidean distance is computed.",
             },
-            "most_similar": pairs[:top_n_pairs],
-            "most_dissimilar": list(reversed(pairs[-top_n_pairs:])),
+            "most_similar": most_similar,
+            "most_dissimilar": most_dissimilar,
             "player_radar_metrics": player_radar_metrics,
             "warning": warning,
         }
@@ -1562,15 +853,15 @@ def get_doppelganger_leaderboard(
         batters,
         batting_metric_defs,
         "batter",
-        batter_metric_def_map,
         batter_radar_metric_defs,
+        "batting",
     )
     bowler_board = _build_pair_leaderboard(
         bowlers,
-        bowling_metric_defs,
+        list(BOWLING_METRICS),
         "bowler",
-        bowler_metric_def_map,
-        list(bowler_metric_def_map.values()),
+        _BOWLING_METRIC_DEFS,
+        "bowling",
     )
 
     return {
@@ -13,7 +13,7 @@ from datetime import date, timedelta
 import logging
 
 from services.teams import get_all_team_name_variations
-from services.player_aliases import get_player_names
+from services.player_aliases import resolve_player_names_bulk
 
 logger = logging.getLogger(__name__)
 
@@ -148,8 +148,9 @@ def get_team_roster_service(
         # Merge static roster players not already in match data (alias-aware dedup)
         if static_players:
             match_names_lower = {p["name"].lower() for p in players}
+            static_names = resolve_player_names_bulk([sp["name"] for sp in static_players], db)
             for sp in static_players:
-                names = get_player_names(sp["name"], db)
+                names = static_names.get(sp["name"], {})
                 legacy_lower = (names.get("legacy_name") or "").lower()
                 details_lower = (names.get("details_name") or "").lower()
                 sp_lower = sp["name"].lower()
@@ -173,12 +174,14 @@ def get_team_roster_service(
         }
 
     # Resolve display names
+    resolved = resolve_player_names_bulk([p["name"] for p in players], db)
     enriched = []
     for p in players:
-        names = get_player_names(p["name"], db)
+        # Blank names are not resolved; keep them as-is like the per-name lookup did
+        names = resolved.get(p["name"], {})
         enriched.append({
-            "name": names["legacy_name"],
-            "display_name": names["details_name"],
+            "name": names.get("legacy_name") or p["name"],
+            "display_name": names.get("details_name") or p["name"],
             "role": p["role"],
         })
 
@@ -8,7 +8,6 @@ from __future__ import annotations
 
 import logging
 import math
-import time
 from collections import defaultdict
 from datetime import date
 from typing import Any, Dict, List, Optional, Tuple
@@ -16,6 +15,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
 
+from services.cache import get_cache
 from services.delivery_data_service import (
     build_competition_filter_delivery_details,
     get_venue_aliases,
@@ -28,7 +28,7 @@ logger = logging.getLogger(__name__)
 CENTER_X = 180.0
 CENTER_Y = 180.0
 _CACHE_TTL_SECONDS = 1800  # 30 minutes
-_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+_CACHE = get_cache("venue_boundary_shape", ttl_seconds=_CACHE_TTL_SECONDS, max_entries=256)
 
 
 def _safe_round(value: Optional[float], digits: int = 3) -> Optional[float]:
@@ -325,8 +325,8 @@ def get_venue_boundary_shape_data(
         angle_bin_size=angle_bin_size,
     )
     cached = _CACHE.get(cache_key)
-    if cached and (time.time() - cached["ts"] < _CACHE_TTL_SECONDS):
-        return cached["data"]
+    if cached is not None:
+        return cached
 
     params: Dict[str, Any] = {"venue": venue}
     conditions = ["dd.score = 4"]
@@ -484,5 +484,5 @@ def get_venue_boundary_shape_data(
         "diagnostics": diagnostics,
     }
 
-    _CACHE[cache_key] = {"ts": time.time(), "data": result}
+    _CACHE.set(cache_key, result)
     return result
@@ -0,0 +1,888 @@
+"""
+Precomputed venue feature matrices behind venue similarity.
+
+An uncached similar-venues call used to run seven delivery_details aggregations over every
+venue (matches, phases, wagon zones twice, zone filter options, bowler styles, phase x kind),
+then line/length, before z-scoring and ranking venues in Python loops. None of that depends
+on the requested venue, so it is batch-built once per date window and competition scope into
+a ``VenueFeatureMatrix`` with one row per canonical venue:
+
+    features       float64 [venues x FEATURE_SPACE], NaN where a feature has no data
+    total_matches  [venues]
+    phase_raw      [venues x PHASE_TOTALS]: phase, pace/spin and length totals
+    style_totals   [venues x styles x STYLE_TOTALS]
+    phase_kind     [venues x PHASES x KINDS x (balls, runs)]
+    zones          [venues x 8 wagon zones x ZONE_TOTALS]
+    line_length    [venues x LINE_GROUP_ORDER x LENGTH_GROUP_ORDER x LINE_LENGTH_TOTALS]
+
+Only the zone and line/length outputs follow the bat_hand / bowl_kind / bowl_style filters,
+so a filtered request also loads a slice matrix holding just those two arrays (two
+aggregations); the unfiltered ones come with the scope matrix.
+
+Matrices are cached in-process and persisted under VENUE_MATRIX_DIR as .npz files
+(services.feature_matrix_store) tagged with a data fingerprint (highest delivery_details
+id, matches count, and the services.data_versions write counters of both), so a load or an
+in-place backfill makes the files stale and they are rebuilt on first use. On the API host,
+the all-time matrices can be rebuilt ahead of time after each load with:
+
+    python scripts/build_venue_matrices.py
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+
+from services import feature_matrix_store
+from services.cache import get_cache
+from services.data_versions import data_versions
+from services.delivery_data_service import build_competition_filter_delivery_details
+from services.feature_matrix_store import cached_fingerprint, cached_matrix, load_arrays, save_arrays
+
+try:
+    from venue_standardization import VENUE_STANDARDIZATION
+except Exception:  # pragma: no cover - defensive import fallback
+    VENUE_STANDARDIZATION = {}
+
+logger = logging.getLogger(__name__)
+
+# Bump when an array's definition changes so persisted matrices are rebuilt.
+MATRIX_VERSION = 1
+
+VENUE_MATRIX_DIR = os.getenv(
+    "VENUE_MATRIX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "venue_matrix"),
+)
+MATRIX_CACHE_TTL_SECONDS = 6 * 60 * 60  # 6 hours
+FINGERPRINT_TTL_SECONDS = 60  # how soon a load is noticed
+
+PACE_KIND_CONDITION = """
+(
+    LOWER(COALESCE(dd.bowl_kind, '')) LIKE '%pace%'
+    OR LOWER(COALESCE(dd.bowl_kind, '')) LIKE '%fast%'
+    OR LOWER(COALESCE(dd.bowl_kind, '')) LIKE '%seam%'
+    OR LOWER(COALESCE(dd.bowl_kind, '')) LIKE '%medium%'
+)
+""".strip()
+
+SPIN_KIND_CONDITION = """
+(
+    LOWER(COALESCE(dd.bowl_kind, '')) LIKE '%spin%'
+    OR LOWER(COALESCE(dd.bowl_kind, '')) LIKE '%slow%'
+)
+""".strip()
+
+WICKET_CONDITION = "LOWER(COALESCE(dd.out::text, '')) = 'true'"
+
+SHORT_LENGTH_CONDITION = """
+(
+    UPPER(COALESCE(dd.length, '')) IN ('SHORT', 'SHORT_OF_A_GOOD_LENGTH', 'SHORT_OF_GOOD_LENGTH')
+)
+""".strip()
+GOOD_LENGTH_CONDITION = "UPPER(COALESCE(dd.length, '')) = 'GOOD_LENGTH'"
+FULL_LENGTH_CONDITION = """
+(
+    UPPER(COALESCE(dd.length, '')) IN ('FULL', 'YORKER', 'FULL_TOSS')
+)
+""".strip()
+
+FEATURE_SPACE: List[str] = [
+    "bat_first_win_pct",
+    "avg_first_innings_score",
+    "avg_second_innings_score",
+    "avg_winning_score",
+    "avg_chasing_score",
+    "pp_run_rate",
+    "middle_run_rate",
+    "death_run_rate",
+    "pp_wicket_rate",
+    "middle_wicket_rate",
+    "death_wicket_rate",
+    "pp_boundary_pct",
+    "death_boundary_pct",
+    "pace_economy",
+    "spin_economy",
+    "pace_wicket_rate",
+    "spin_wicket_rate",
+    "pace_dot_pct",
+    "spin_dot_pct",
+    "short_pct",
+    "good_length_pct",
+    "full_pct",
+    "short_sr",
+    "good_length_sr",
+] + [f"zone_{z}_run_pct" for z in range(1, 9)] + [f"zone_{z}_boundary_pct" for z in range(1, 9)]
+
+LINE_GROUP_ORDER = ["OFF", "MIDDLE", "LEG"]
+LENGTH_GROUP_ORDER = ["YORKER", "FULL", "GOOD", "BOAL", "SHORT"]
+
+
+def _normalize_axis_token(value: Optional[str]) -> str:
+    if value is None:
+        return ""
+    return str(value).strip().upper().replace("-", "_").replace(" ", "_")
+
+
+def _map_line_group(value: Optional[str]) -> Optional[str]:
+    token = _normalize_axis_token(value)
+    if not token:
+        return None
+
+    if any(marker in token for marker in ["DOWN_LEG", "LEGSTUMP", "LEG_STUMP", "OUTSIDE_LEG", "WIDE_DOWN_LEG"]):
+        return "LEG"
+    if any(marker in token for marker in ["OUTSIDE_OFF", "OFFSTUMP", "OFF_STUMP", "WIDE_OUTSIDE_OFF", "OFFSIDE"]):
+        return "OFF"
+    if any(marker in token for marker in ["MIDDLE", "ON_THE_STUMPS", "ON_STUMPS", "ON_THE_STUMP", "ON_STUMP", "STUMPS"]):
+        return "MIDDLE"
+    if token in {"OFF", "OFF_STUMP"}:
+        return "OFF"
+    if token in {"LEG", "LEG_SIDE"}:
+        return "LEG"
+    return None
+
+
+def _map_length_group(value: Optional[str]) -> Optional[str]:
+    token = _normalize_axis_token(value)
+    if not token:
+        return None
+
+    if "YORKER" in token:
+        return "YORKER"
+    if any(
+        marker in token
+        for marker in [
+            "BACK_OF_A_LENGTH",
+            "BACK_OF_LENGTH",
+            "SHORT_OF_A_GOOD_LENGTH",
+            "SHORT_OF_GOOD_LENGTH",
+            "SHORT_OF_A_LENGTH",
+            "SHORT_OF_LENGTH",
+            "BOAL",
+        ]
+    ):
+        return "BOAL"
+    if token in {"SHORT", "BOUNCER"} or token.startswith("SHORT_"):
+        return "SHORT"
+    if token in {"GOOD", "GOOD_LENGTH"} or ("GOOD" in token and "SHORT_OF" not in token):
+        return "GOOD"
+    if token in {"FULL", "FULL_TOSS"} or token.startswith("FULL_"):
+        return "FULL"
+    return None
+
+
+def _safe_div(numerator: float, denominator: float) -> Optional[float]:
+    if denominator in (None, 0):
+        return None
+    return float(numerator) / float(denominator)
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    if not values:
+        return None
+    return sum(values) / len(values)
+
+
+def _canonicalize_venue(venue: Optional[str]) -> Optional[str]:
+    if not venue:
+        return venue
+    canonical = VENUE_STANDARDIZATION.get(venue, venue)
+    if isinstance(canonical, str):
+        return canonical.strip()
+    return venue
+
+
+def _build_delivery_details_filters(
+    start_date: Optional[date],
+    end_date: Optional[date],
+    leagues: Optional[List[str]],
+    include_international: Optional[bool],
+    top_teams: Optional[int],
+) -> Tuple[str, Dict[str, Any]]:
+    params: Dict[str, Any] = {}
+    clauses: List[str] = []
+
+    if start_date:
+        clauses.append("dd.match_date >= :start_date_str")
+        params["start_date_str"] = start_date.isoformat()
+    if end_date:
+        clauses.append("dd.match_date <= :end_date_str")
+        params["end_date_str"] = end_date.isoformat()
+
+    where_sql = ""
+    if clauses:
+        where_sql += " AND " + " AND ".join(clauses)
+
+    apply_competition_filter = (
+        leagues is not None or include_international is not None or top_teams is not None
+    )
+    if apply_competition_filter:
+        competition_filter = build_competition_filter_delivery_details(
+            leagues=leagues or [],
+            include_international=include_international if include_international is not None else False,
+            top_teams=top_teams,
+            params=params,
+        )
+        where_sql += f" {competition_filter}"
+
+    return where_sql, params
+
+
+def _build_zone_output_filter_sql(
+    bat_hand: Optional[str],
+    bowl_kind: Optional[str],
+    bowl_style: Optional[str],
+    param_prefix: str = "zone",
+) -> Tuple[str, Dict[str, Any]]:
+    clauses: List[str] = []
+    params: Dict[str, Any] = {}
+
+    if bat_hand:
+        key = f"{param_prefix}_bat_hand"
+        clauses.append(f"dd.bat_hand = :{key}")
+        params[key] = bat_hand
+    if bowl_kind:
+        key = f"{param_prefix}_bowl_kind"
+        clauses.append(f"dd.bowl_kind = :{key}")
+        params[key] = bowl_kind
+    if bowl_style:
+        key = f"{param_prefix}_bowl_style"
+        clauses.append(f"dd.bowl_style = :{key}")
+        params[key] = bowl_style
+
+    if not clauses:
+        return "", params
+    return " AND " + " AND ".join(clauses), params
+
+
+def _safe_sort_value(value: Optional[str]) -> str:
+    if value is None:
+        return ""
+    return str(value).strip().lower()
+
+
+def _empty_match_agg() -> Dict[str, Any]:
+    return {
+        "total_matches": 0,
+        "bat_first_wins": 0,
+        "sum_first_innings": 0.0,
+        "sum_second_innings": 0.0,
+        "winning_scores": [],
+        "chasing_scores": [],
+    }
+
+
+def _empty_phase_agg() -> Dict[str, float]:
+    return {
+        "total_balls": 0.0,
+        "pp_runs": 0.0,
+        "pp_balls": 0.0,
+        "pp_wickets": 0.0,
+        "pp_boundaries": 0.0,
+        "pp_innings": 0.0,
+        "middle_runs": 0.0,
+        "middle_balls": 0.0,
+        "middle_wickets": 0.0,
+        "middle_boundaries": 0.0,
+        "middle_innings": 0.0,
+        "death_runs": 0.0,
+        "death_balls": 0.0,
+        "death_wickets": 0.0,
+        "death_boundaries": 0.0,
+        "death_innings": 0.0,
+        "pace_runs": 0.0,
+        "pace_balls": 0.0,
+        "pace_wickets": 0.0,
+        "pace_dots": 0.0,
+        "spin_runs": 0.0,
+        "spin_balls": 0.0,
+        "spin_wickets": 0.0,
+        "spin_dots": 0.0,
+        "short_balls": 0.0,
+        "short_runs": 0.0,
+        "good_balls": 0.0,
+        "good_runs": 0.0,
+        "full_balls": 0.0,
+    }
+
+
+def _derive_phase_metrics(raw: Dict[str, float]) -> Dict[str, Optional[float]]:
+    return {
+        "pp_run_rate": _safe_div(raw["pp_runs"] * 6.0, raw["pp_balls"]),
+        "middle_run_rate": _safe_div(raw["middle_runs"] * 6.0, raw["middle_balls"]),
+        "death_run_rate": _safe_div(raw["death_runs"] * 6.0, raw["death_balls"]),
+        "pp_wicket_rate": _safe_div(raw["pp_wickets"], raw["pp_innings"]),
+        "middle_wicket_rate": _safe_div(raw["middle_wickets"], raw["middle_innings"]),
+        "death_wicket_rate": _safe_div(raw["death_wickets"], raw["death_innings"]),
+        "pp_boundary_pct": _safe_div(raw["pp_boundaries"] * 100.0, raw["pp_balls"]),
+        "death_boundary_pct": _safe_div(raw["death_boundaries"] * 100.0, raw["death_balls"]),
+        "pace_economy": _safe_div(raw["pace_runs"] * 6.0, raw["pace_balls"]),
+        "spin_economy": _safe_div(raw["spin_runs"] * 6.0, raw["spin_balls"]),
+        "pace_wicket_rate": _safe_div(raw["pace_wickets"] * 6.0, raw["pace_balls"]),
+        "spin_wicket_rate": _safe_div(raw["spin_wickets"] * 6.0, raw["spin_balls"]),
+        "pace_dot_pct": _safe_div(raw["pace_dots"] * 100.0, raw["pace_balls"]),
+        "spin_dot_pct": _safe_div(raw["spin_dots"] * 100.0, raw["spin_balls"]),
+        "short_pct": _safe_div(raw["short_balls"] * 100.0, raw["total_balls"]),
+        "good_length_pct": _safe_div(raw["good_balls"] * 100.0, raw["total_balls"]),
+        "full_pct": _safe_div(raw["full_balls"] * 100.0, raw["total_balls"]),
+        "short_sr": _safe_div(raw["short_runs"] * 100.0, raw["short_balls"]),
+        "good_length_sr": _safe_div(raw["good_runs"] * 100.0, raw["good_balls"]),
+    }
+
+
+PHASE_TOTALS: Tuple[str, ...] = tuple(_empty_phase_agg().keys())
+STYLE_TOTALS = ("balls", "runs", "wickets", "dots", "matches")
+ZONE_TOTALS = ("balls", "runs", "boundaries")
+LINE_LENGTH_TOTALS = ("balls", "runs", "boundaries", "dots", "wickets")
+PHASES = ("powerplay", "middle", "death")
+KINDS = ("pace", "spin")
+_MATCH_FEATURES = (
+    "bat_first_win_pct",
+    "avg_first_innings_score",
+    "avg_second_innings_score",
+    "avg_winning_score",
+    "avg_chasing_score",
+)
+_SLICE_ARRAYS = ("zones", "line_length")
+
+_MATRIX_CACHE = get_cache("venue_matrix", ttl_seconds=MATRIX_CACHE_TTL_SECONDS, max_entries=32)
+_FINGERPRINT_CACHE = get_cache("venue_matrix_fingerprint", ttl_seconds=FINGERPRINT_TTL_SECONDS, max_entries=1)
+
+
+def _match_query(where_sql: str):
+    return text(f"""
+        SELECT
+            dd.ground AS venue,
+            dd.p_match AS match_id,
+            SUM(CASE WHEN dd.inns = 1 THEN dd.score ELSE 0 END) AS first_innings_runs,
+            SUM(CASE WHEN dd.inns = 2 THEN dd.score ELSE 0 END) AS second_innings_runs,
+            MAX(CASE WHEN COALESCE(m.won_batting_first, false) THEN 1 ELSE 0 END) AS won_batting_first,
+            MAX(CASE WHEN COALESCE(m.won_fielding_first, false) THEN 1 ELSE 0 END) AS won_fielding_first
+        FROM delivery_details dd
+        JOIN matches m ON dd.p_match = m.id
+        WHERE 1=1
+            {where_sql}
+        GROUP BY dd.ground, dd.p_match
+    """)
+
+
+def _phase_query(where_sql: str):
+    return text(f"""
+        SELECT
+            dd.ground AS venue,
+            COUNT(*) AS total_balls,
+            SUM(CASE WHEN dd.over BETWEEN 0 AND 5 THEN dd.score ELSE 0 END) AS pp_runs,
+            SUM(CASE WHEN dd.over BETWEEN 0 AND 5 THEN 1 ELSE 0 END) AS pp_balls,
+            SUM(CASE WHEN dd.over BETWEEN 0 AND 5 AND {WICKET_CONDITION} THEN 1 ELSE 0 END) AS pp_wickets,
+            SUM(CASE WHEN dd.over BETWEEN 0 AND 5 AND dd.score IN (4, 6) THEN 1 ELSE 0 END) AS pp_boundaries,
+            COUNT(DISTINCT CASE WHEN dd.over BETWEEN 0 AND 5 THEN dd.p_match::text || '-' || dd.inns::text END) AS pp_innings,
+
+            SUM(CASE WHEN dd.over BETWEEN 6 AND 14 THEN dd.score ELSE 0 END) AS middle_runs,
+            SUM(CASE WHEN dd.over BETWEEN 6 AND 14 THEN 1 ELSE 0 END) AS middle_balls,
+            SUM(CASE WHEN dd.over BETWEEN 6 AND 14 AND {WICKET_CONDITION} THEN 1 ELSE 0 END) AS middle_wickets,
+            SUM(CASE WHEN dd.over BETWEEN 6 AND 14 AND dd.score IN (4, 6) THEN 1 ELSE 0 END) AS middle_boundaries,
+            COUNT(DISTINCT CASE WHEN dd.over BETWEEN 6 AND 14 THEN dd.p_match::text || '-' || dd.inns::text END) AS middle_innings,
+
+            SUM(CASE WHEN dd.over BETWEEN 15 AND 19 THEN dd.score ELSE 0 END) AS death_runs,
+            SUM(CASE WHEN dd.over BETWEEN 15 AND 19 THEN 1 ELSE 0 END) AS death_balls,
+            SUM(CASE WHEN dd.over BETWEEN 15 AND 19 AND {WICKET_CONDITION} THEN 1 ELSE 0 END) AS death_wickets,
+            SUM(CASE WHEN dd.over BETWEEN 15 AND 19 AND dd.score IN (4, 6) THEN 1 ELSE 0 END) AS death_boundaries,
+            COUNT(DISTINCT CASE WHEN dd.over BETWEEN 15 AND 19 THEN dd.p_match::text || '-' || dd.inns::text END) AS death_innings,
+
+            SUM(CASE WHEN {PACE_KIND_CONDITION} THEN dd.score ELSE 0 END) AS pace_runs,
+            SUM(CASE WHEN {PACE_KIND_CONDITION} THEN 1 ELSE 0 END) AS pace_balls,
+            SUM(CASE WHEN {PACE_KIND_CONDITION} AND {WICKET_CONDITION} THEN 1 ELSE 0 END) AS pace_wickets,
+            SUM(CASE WHEN {PACE_KIND_CONDITION} AND dd.score = 0 THEN 1 ELSE 0 END) AS pace_dots,
+
+            SUM(CASE WHEN {SPIN_KIND_CONDITION} THEN dd.score ELSE 0 END) AS spin_runs,
+            SUM(CASE WHEN {SPIN_KIND_CONDITION} THEN 1 ELSE 0 END) AS spin_balls,
+            SUM(CASE WHEN {SPIN_KIND_CONDITION} AND {WICKET_CONDITION} THEN 1 ELSE 0 END) AS spin_wickets,
+            SUM(CASE WHEN {SPIN_KIND_CONDITION} AND dd.score = 0 THEN 1 ELSE 0 END) AS spin_dots,
+
+            SUM(CASE WHEN {SHORT_LENGTH_CONDITION} THEN 1 ELSE 0 END) AS short_balls,
+            SUM(CASE WHEN {SHORT_LENGTH_CONDITION} THEN dd.score ELSE 0 END) AS short_runs,
+            SUM(CASE WHEN {GOOD_LENGTH_CONDITION} THEN 1 ELSE 0 END) AS good_balls,
+            SUM(CASE WHEN {GOOD_LENGTH_CONDITION} THEN dd.score ELSE 0 END) AS good_runs,
+            SUM(CASE WHEN {FULL_LENGTH_CONDITION} THEN 1 ELSE 0 END) AS full_balls
+        FROM delivery_details dd
+        WHERE 1=1
+            {where_sql}
+        GROUP BY dd.ground
+    """)
+
+
+def _zone_query(where_sql: str, slice_sql: str = ""):
+    return text(f"""
+        SELECT
+            dd.ground AS venue,
+            dd.wagon_zone AS wagon_zone,
+            COUNT(*) AS balls,
+            SUM(dd.score) AS runs,
+            SUM(CASE WHEN dd.score IN (4, 6) THEN 1 ELSE 0 END) AS boundaries
+        FROM delivery_details dd
+        WHERE 1=1
+            {where_sql}
+            {slice_sql}
+            AND dd.wagon_zone BETWEEN 1 AND 8
+        GROUP BY dd.ground, dd.wagon_zone
+    """)
+
+
+def _filter_option_query(where_sql: str):
+    return text(f"""
+        SELECT DISTINCT
+            NULLIF(TRIM(dd.bat_hand), '') AS bat_hand,
+            NULLIF(TRIM(dd.bowl_kind), '') AS bowl_kind,
+            NULLIF(TRIM(dd.bowl_style), '') AS bowl_style
+        FROM delivery_details dd
+        WHERE 1=1
+            {where_sql}
+            AND dd.wagon_zone BETWEEN 1 AND 8
+    """)
+
+
+def _style_query(where_sql: str):
+    return text(f"""
+        SELECT
+            dd.ground AS venue,
+            COALESCE(NULLIF(dd.bowl_style, ''), 'Unknown') AS bowl_style,
+            COUNT(*) AS balls,
+            SUM(dd.score) AS runs,
+            SUM(CASE WHEN {WICKET_CONDITION} THEN 1 ELSE 0 END) AS wickets,
+            SUM(CASE WHEN dd.score = 0 THEN 1 ELSE 0 END) AS dots,
+            COUNT(DISTINCT dd.p_match) AS matches
+        FROM delivery_details dd
+        WHERE 1=1
+            {where_sql}
+            AND dd.bowl_style IS NOT NULL
+        GROUP BY dd.ground, COALESCE(NULLIF(dd.bowl_style, ''), 'Unknown')
+    """)
+
+
+def _phase_kind_query(where_sql: str):
+    return text(f"""
+        SELECT
+            dd.ground AS venue,
+            CASE
+                WHEN dd.over BETWEEN 0 AND 5 THEN 'powerplay'
+                WHEN dd.over BETWEEN 6 AND 14 THEN 'middle'
+                ELSE 'death'
+            END AS phase,
+            CASE
+                WHEN {PACE_KIND_CONDITION} THEN 'pace'
+                WHEN {SPIN_KIND_CONDITION} THEN 'spin'
+                ELSE NULL
+            END AS kind,
+            COUNT(*) AS balls,
+            SUM(dd.score) AS runs
+        FROM delivery_details dd
+        WHERE 1=1
+            {where_sql}
+            AND ({PACE_KIND_CONDITION} OR {SPIN_KIND_CONDITION})
+        GROUP BY dd.ground, phase, kind
+    """)
+
+
+def _line_length_query(where_sql: str, slice_sql: str = ""):
+    return text(f"""
+        SELECT
+            dd.ground AS venue,
+            dd.line AS line,
+            dd.length AS length,
+            COUNT(*) AS balls,
+            SUM(dd.score) AS runs,
+            SUM(CASE WHEN dd.score IN (4, 6) THEN 1 ELSE 0 END) AS boundaries,
+            SUM(CASE WHEN dd.score = 0 THEN 1 ELSE 0 END) AS dots,
+            SUM(CASE WHEN {WICKET_CONDITION} THEN 1 ELSE 0 END) AS wickets
+        FROM delivery_details dd
+        WHERE 1=1
+            {where_sql}
+            {slice_sql}
+            AND dd.line IS NOT NULL
+            AND dd.length IS NOT NULL
+        GROUP BY dd.ground, dd.line, dd.length
+    """)
+
+
+def _row_values(row, fields: Sequence[str]) -> List[float]:
+    return [float(row._mapping.get(field) or 0.0) for field in fields]
+
+
+def _zone_totals(rows: List[Any], index: Dict[str, int]) -> np.ndarray:
+    zones = np.zeros((len(index), 8, len(ZONE_TOTALS)))
+    for row in rows:
+        i = index.get(_canonicalize_venue(row._mapping["venue"]))
+        zone = row._mapping.get("wagon_zone")
+        if i is None or zone is None or not 1 <= int(zone) <= 8:
+            continue
+        zones[i, int(zone) - 1] += _row_values(row, ZONE_TOTALS)
+    return zones
+
+
+def _line_length_totals(rows: List[Any], index: Dict[str, int]) -> np.ndarray:
+    grid = np.zeros((len(index), len(LINE_GROUP_ORDER), len(LENGTH_GROUP_ORDER), len(LINE_LENGTH_TOTALS)))
+    for row in rows:
+        i = index.get(_canonicalize_venue(row._mapping.get("venue")))
+        line_group = _map_line_group(row._mapping.get("line"))
+        length_group = _map_length_group(row._mapping.get("length"))
+        if i is None or not line_group or not length_group:
+            continue
+        grid[i, LINE_GROUP_ORDER.index(line_group), LENGTH_GROUP_ORDER.index(length_group)] += _row_values(
+            row, LINE_LENGTH_TOTALS
+        )
+    return grid
+
+
+def zone_features(zones: np.ndarray) -> np.ndarray:
+    """zone_{z}_run_pct then zone_{z}_boundary_pct for each venue row of ``zones`` (NaN if none)."""
+    totals = zones[:, :, 1:].sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.where(totals > 0, zones[:, :, 1:] * 100.0 / totals, np.nan)
+    return np.concatenate([shares[:, :, 0], shares[:, :, 1]], axis=1)
+
+
+class VenueFeatureMatrix:
+    """Per-venue arrays of one (window, scope[, slice]). Treat as read-only: it is shared."""
+
+    def __init__(
+        self,
+        venues: Sequence[str],
+        arrays: Dict[str, np.ndarray],
+        styles: Sequence[str] = (),
+        filter_options: Optional[Dict[str, List[str]]] = None,
+        fingerprint: Optional[Dict[str, Any]] = None,
+    ):
+        self.venues = [str(venue) for venue in venues]
+        self.index = {venue: i for i, venue in enumerate(self.venues)}
+        self.arrays = arrays
+        self.styles = [str(style) for style in styles]
+        self.filter_options = filter_options or {"bat_hand": [], "bowl_kind": [], "bowl_style": []}
+        self.fingerprint = fingerprint
+
+    def __len__(self) -> int:
+        return len(self.venues)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def metrics(self, row: int) -> Dict[str, Optional[float]]:
+        """One venue's feature values as the API returns them: floats, None where missing."""
+        return {
+            feature: None if np.isnan(value) else float(value)
+            for feature, value in zip(FEATURE_SPACE, self.arrays["features"][row])
+        }
+
+    def save(self, path: str) -> None:
+        save_arrays(
+            path,
+            {"venues": np.array(self.venues, dtype=str), "styles": np.array(self.styles, dtype=str), **self.arrays},
+            {"filter_options": self.filter_options, "fingerprint": self.fingerprint},
+        )
+
+    @classmethod
+    def load(cls, path: str, fingerprint: Optional[Dict[str, Any]] = None) -> Optional["VenueFeatureMatrix"]:
+        """The matrix at ``path``, or None if it is missing, unreadable or built on other data."""
+        stored = load_arrays(path, fingerprint, "venue matrix")
+        if stored is None:
+            return None
+        arrays, meta = stored
+        venues, styles = arrays.pop("venues"), arrays.pop("styles")
+        return cls(venues.tolist(), arrays, styles.tolist(), meta["filter_options"], meta["fingerprint"])
+
+
+def build_venue_feature_matrix(
+    db: Session,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    leagues: Optional[List[str]] = None,
+    include_international: Optional[bool] = None,
+    top_teams: Optional[int] = None,
+    fingerprint: Optional[Dict[str, Any]] = None,
+) -> VenueFeatureMatrix:
+    """Aggregate every venue of the window and scope into one matrix (seven grouped queries)."""
+    where_sql, params = _build_delivery_details_filters(
+        start_date=start_date,
+        end_date=end_date,
+        leagues=leagues,
+        include_international=include_international,
+        top_teams=top_teams,
+    )
+    match_rows = db.execute(_match_query(where_sql), params).fetchall()
+    phase_rows = db.execute(_phase_query(where_sql), params).fetchall()
+    zone_rows = db.execute(_zone_query(where_sql), params).fetchall()
+    filter_option_rows = db.execute(_filter_option_query(where_sql), params).fetchall()
+    style_rows = db.execute(_style_query(where_sql), params).fetchall()
+    phase_kind_rows = db.execute(_phase_kind_query(where_sql), params).fetchall()
+    line_length_rows = db.execute(_line_length_query(where_sql), params).fetchall()
+
+    match_map: Dict[str, Dict[str, Any]] = defaultdict(_empty_match_agg)
+    for row in match_rows:
+        canonical_venue = _canonicalize_venue(row._mapping["venue"])
+        if not canonical_venue:
+            continue
+        rec = match_map[canonical_venue]
+        first_runs = float(row._mapping.get("first_innings_runs") or 0.0)
+        second_runs = float(row._mapping.get("second_innings_runs") or 0.0)
+        won_batting_first = int(row._mapping.get("won_batting_first") or 0)
+        won_fielding_first = int(row._mapping.get("won_fielding_first") or 0)
+
+        rec["total_matches"] += 1
+        rec["sum_first_innings"] += first_runs
+        rec["sum_second_innings"] += second_runs
+        rec["bat_first_wins"] += won_batting_first
+        if won_batting_first:
+            rec["winning_scores"].append(first_runs)
+        if won_fielding_first:
+            rec["chasing_scores"].append(first_runs)
+
+    # Venues with match, phase or zone data, as the similarity pool always was
+    venues = sorted(
+        set(match_map)
+        | ({_canonicalize_venue(row._mapping["venue"]) for row in phase_rows + zone_rows} - {None, ""})
+    )
+    index = {venue: i for i, venue in enumerate(venues)}
+
+    phase_raw = np.zeros((len(venues), len(PHASE_TOTALS)))
+    for row in phase_rows:
+        i = index.get(_canonicalize_venue(row._mapping["venue"]))
+        if i is not None:
+            phase_raw[i] += _row_values(row, PHASE_TOTALS)
+
+    zones = _zone_totals(zone_rows, index)
+
+    features = np.full((len(venues), len(FEATURE_SPACE)), np.nan)
+    total_matches = np.zeros(len(venues))
+    feature_column = {feature: j for j, feature in enumerate(FEATURE_SPACE)}
+    for venue_name, raw in match_map.items():
+        i = index[venue_name]
+        matches = int(raw["total_matches"])
+        total_matches[i] = matches
+        match_metrics = {
+            "bat_first_win_pct": _safe_div(raw["bat_first_wins"] * 100.0, matches),
+            "avg_first_innings_score": _safe_div(raw["sum_first_innings"], matches),
+            "avg_second_innings_score": _safe_div(raw["sum_second_innings"], matches),
+            "avg_winning_score": _mean(raw["winning_scores"]),
+            "avg_chasing_score": _mean(raw["chasing_scores"]),
+        }
+        for feature in _MATCH_FEATURES:
+            if match_metrics[feature] is not None:
+                features[i, feature_column[feature]] = match_metrics[feature]
+    for i in range(len(venues)):
+        for feature, value in _derive_phase_metrics(dict(zip(PHASE_TOTALS, phase_raw[i]))).items():
+            if value is not None:
+                features[i, feature_column[feature]] = value
+    first_zone_column = feature_column["zone_1_run_pct"]
+    features[:, first_zone_column:first_zone_column + 16] = zone_features(zones)
+
+    styles: List[str] = []
+    style_index: Dict[str, int] = {}
+    for row in style_rows:
+        style = row._mapping.get("bowl_style") or "Unknown"
+        if style not in style_index:
+            style_index[style] = len(styles)
+            styles.append(style)
+    style_totals = np.zeros((len(venues), len(styles), len(STYLE_TOTALS)))
+    for row in style_rows:
+        i = index.get(_canonicalize_venue(row._mapping["venue"]))
+        if i is not None:
+            style_totals[i, style_index[row._mapping.get("bowl_style") or "Unknown"]] += _row_values(row, STYLE_TOTALS)
+
+    phase_kind = np.zeros((len(venues), len(PHASES), len(KINDS), 2))
+    for row in phase_kind_rows:
+        i = index.get(_canonicalize_venue(row._mapping["venue"]))
+        phase = row._mapping.get("phase")
+        kind = row._mapping.get("kind")
+        if i is None or phase not in PHASES or kind not in KINDS:
+            continue
+        phase_kind[i, PHASES.index(phase), KINDS.index(kind)] += _row_values(row, ("balls", "runs"))
+
+    filter_options = {
+        field: sorted(
+            {row._mapping.get(field) for row in filter_option_rows if row._mapping.get(field)},
+            key=_safe_sort_value,
+        )
+        for field in ("bat_hand", "bowl_kind", "bowl_style")
+    }
+
+    arrays = {
+        "features": features,
+        "total_matches": total_matches,
+        "phase_raw": phase_raw,
+        "style_totals": style_totals,
+        "phase_kind": phase_kind,
+        "zones": zones,
+        "line_length": _line_length_totals(line_length_rows, index),
+    }
+    return VenueFeatureMatrix(venues, arrays, styles, filter_options, fingerprint)
+
+
+def build_venue_slice_matrix(
+    db: Session,
+    matrix: VenueFeatureMatrix,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    leagues: Optional[List[str]] = None,
+    include_international: Optional[bool] = None,
+    top_teams: Optional[int] = None,
+    bat_hand: Optional[str] = None,
+    bowl_kind: Optional[str] = None,
+    bowl_style: Optional[str] = None,
+) -> VenueFeatureMatrix:
+    """Zone and line/length totals of one bat_hand / bowl_kind / bowl_style slice, rows as ``matrix``."""
+    where_sql, params = _build_delivery_details_filters(
+        start_date=start_date,
+        end_date=end_date,
+        leagues=leagues,
+        include_international=include_international,
+        top_teams=top_teams,
+    )
+    slice_sql, slice_params = _build_zone_output_filter_sql(
+        bat_hand=bat_hand,
+        bowl_kind=bowl_kind,
+        bowl_style=bowl_style,
+    )
+    params = {**params, **slice_params}
+    zone_rows = db.execute(_zone_query(where_sql, slice_sql), params).fetchall()
+    line_length_rows = db.execute(_line_length_query(where_sql, slice_sql), params).fetchall()
+    arrays = {
+        "zones": _zone_totals(zone_rows, matrix.index),
+        "line_length": _line_length_totals(line_length_rows, matrix.index),
+    }
+    return VenueFeatureMatrix(matrix.venues, arrays, fingerprint=matrix.fingerprint)
+
+
+def venue_data_fingerprint(db: Session) -> Dict[str, Any]:
+    """
+    Cheap change marker for the data the matrices are built from: the highest id and match
+    count catch loads, the data_versions counters catch in-place corrections (bat_hand,
+    bowl_kind, line, length).
+    """
+    def _compute() -> Dict[str, Any]:
+        row = db.execute(text("""
+            SELECT
+                (SELECT MAX(id) FROM delivery_details),
+                (SELECT COUNT(*) FROM matches)
+        """)).fetchone()
+        return {
+            "version": MATRIX_VERSION,
+            "delivery_details": int(row[0] or 0),
+            "matches": int(row[1] or 0),
+            "data_versions": data_versions(db, ("delivery_details", "matches")),
+        }
+
+    return cached_fingerprint(_FINGERPRINT_CACHE, ("venue_data",), _compute)
+
+
+def _scope(
+    leagues: Optional[List[str]],
+    include_international: Optional[bool],
+    top_teams: Optional[int],
+) -> Optional[Dict[str, Any]]:
+    # Mirrors _build_delivery_details_filters: no competition filter unless one is given
+    if leagues is None and include_international is None and top_teams is None:
+        return None
+    return {
+        "leagues": sorted(leagues or []),
+        "include_international": bool(include_international),
+        "top_teams": top_teams,
+    }
+
+
+def _matrix_key(
+    start_date: Optional[date],
+    end_date: Optional[date],
+    scope: Optional[Dict[str, Any]],
+    venue_slice: Optional[Dict[str, Optional[str]]] = None,
+) -> Tuple[str, str, str]:
+    window = f"{start_date.isoformat() if start_date else 'all'}_{end_date.isoformat() if end_date else 'all'}"
+    return window, json.dumps(scope, sort_keys=True), json.dumps(venue_slice, sort_keys=True)
+
+
+def _matrix_path(root: str, key: Tuple[str, str, str]) -> str:
+    window, scope, venue_slice = key
+    digest = hashlib.sha1(f"{scope}|{venue_slice}".encode("utf-8")).hexdigest()[:12]
+    return os.path.join(root, f"{window}_{digest}.npz")
+
+
+def _cached_matrix(db: Session, key: Tuple[str, str, str], build, force_refresh: bool, root: Optional[str]):
+    fingerprint = venue_data_fingerprint(db)
+    path = _matrix_path(root or VENUE_MATRIX_DIR, key)
+    return cached_matrix(
+        _MATRIX_CACHE,
+        key + (json.dumps(fingerprint, sort_keys=True),),
+        path,
+        lambda: VenueFeatureMatrix.load(path, fingerprint),
+        lambda: build(fingerprint),
+        force_refresh,
+        "venue matrix",
+    )
+
+
+def get_venue_feature_matrix(
+    db: Session,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    leagues: Optional[List[str]] = None,
+    include_international: Optional[bool] = None,
+    top_teams: Optional[int] = None,
+    force_refresh: bool = False,
+    root: Optional[str] = None,
+) -> VenueFeatureMatrix:
+    """
+    The venue matrix of a window and competition scope: from the process cache, else the
+    persisted file if it was built on the current data, else built (and persisted).
+    """
+    key = _matrix_key(start_date, end_date, _scope(leagues, include_international, top_teams))
+    return _cached_matrix(
+        db,
+        key,
+        lambda fingerprint: build_venue_feature_matrix(
+            db, start_date, end_date, leagues, include_international, top_teams, fingerprint
+        ),
+        force_refresh,
+        root,
+    )
+
+
+def get_venue_slice_matrix(
+    db: Session,
+    matrix: VenueFeatureMatrix,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    leagues: Optional[List[str]] = None,
+    include_international: Optional[bool] = None,
+    top_teams: Optional[int] = None,
+    bat_hand: Optional[str] = None,
+    bowl_kind: Optional[str] = None,
+    bowl_style: Optional[str] = None,
+    force_refresh: bool = False,
+    root: Optional[str] = None,
+) -> VenueFeatureMatrix:
+    """Zone and line/length arrays for a filter slice; ``matrix`` itself when nothing is filtered."""
+    if not (bat_hand or bowl_kind or bowl_style):
+        return matrix
+    venue_slice = {"bat_hand": bat_hand, "bowl_kind": bowl_kind, "bowl_style": bowl_style}
+    key = _matrix_key(start_date, end_date, _scope(leagues, include_international, top_teams), venue_slice)
+    return _cached_matrix(
+        db,
+        key,
+        lambda fingerprint: build_venue_slice_matrix(
+            db, matrix, start_date, end_date, leagues, include_international, top_teams,
+            bat_hand, bowl_kind, bowl_style,
+        ),
+        force_refresh,
+        root,
+    )
+
+
+def prune_stale_matrices(root: Optional[str] = None, fingerprint: Optional[Dict[str, Any]] = None) -> int:
+    """Delete persisted matrices built on other data than ``fingerprint``; returns how many."""
+    return feature_matrix_store.prune_stale_matrices(root or VENUE_MATRIX_DIR, fingerprint)
@@ -21,6 +21,7 @@ from datetime import datetime
 from run_elo_migration import run_elo_migration
 from elo_calculator import calculate_historical_elos, verify_elo_calculation
 from database import get_session
+from services.elo_timeline import clear_elo_timeline
 from sqlalchemy import text
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -80,12 +81,12 @@ def check_database_status():
         session.close()
 
 def clear_elo_data(dry_run: bool = False):
-    """Clear all existing ELO data from matches table"""
+    """Clear all existing ELO data from matches table and team_elo_timeline"""
     session = next(get_session())
     
     try:
         if dry_run:
-            logger.info("Would clear all ELO data from matches table (dry run)")
+            logger.info("Would clear all ELO data from matches table and team_elo_timeline (dry run)")
             return
         
         logger.info("Clearing existing ELO data...")
@@ -98,6 +99,8 @@ def clear_elo_data(dry_run: bool = False):
         """))
         
         rows_updated = result.rowcount
+        # The timeline mirrors the cleared ratings; the recalculation refills it
+        clear_elo_timeline(session)
         session.commit()
         
         logger.info(f"Cleared ELO data from {rows_updated} matches")
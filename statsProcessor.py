@@ -1,12 +1,16 @@
-from sqlalchemy import create_engine, func
+from sqlalchemy import create_engine, func, text
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 from datetime import datetime
+import pandas as pd
 from models import Match, Delivery, BattingStats, BowlingStats, teams_mapping
 import logging
 from tqdm import tqdm
 from database import get_database_connection
 from fantasy_points_v2 import FantasyPointsCalculator
+from stats_derivation import add_fantasy_points, derive_batting_stats, derive_bowling_stats, replace_match_stats
+
+BOWLER_WICKETS = ['bowled', 'caught', 'lbw', 'caught and bowled', 'stumped', 'hit wicket']
 
 class StatsProcessor:
     def __init__(self, session: Session):
@@ -14,12 +18,17 @@ class StatsProcessor:
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
     
-    def process_all_statistics(self, incremental: bool = True, force_update: bool = False, standardize_teams: bool = True):
+    def process_all_statistics(self, incremental: bool = True, force_update: bool = False, standardize_teams: bool = True,
+                               set_based: bool = True, batch_size: int = 200):
         """
         Process statistics for matches in the database.
         Args:
             incremental: If True, only process matches without existing stats
-            force_update: If True, recalculate all stats even if they exist
+            force_update: If True, recalculate all stats even if they exist; otherwise matches
+                that already have batting and bowling stats are left as they are
+            set_based: If True, derive each batch of matches in one vectorised pass
+                (process_matches_batch) instead of one player at a time
+            batch_size: Matches per set-based batch
         """
         try:
             # Get matches that need processing
@@ -42,9 +51,21 @@ class StatsProcessor:
             total_matches = len(matches)
             self.logger.info(f"Processing statistics for {total_matches} matches")
             
-            # Process each match with a progress bar
-            for match in tqdm(matches, desc="Processing matches"):
-                self.process_match_statistics(match.id, force_update, standardize_teams)
+            if set_based:
+                match_ids = [match.id for match in matches]
+                for i in tqdm(range(0, total_matches, batch_size), desc="Processing match batches"):
+                    batch = match_ids[i:i + batch_size]
+                    if not force_update:
+                        # Same rule as process_match_statistics: matches with stats are kept
+                        processed = self.matches_with_stats(batch)
+                        batch = [match_id for match_id in batch if match_id not in processed]
+                    if batch:
+                        self.process_matches_batch(batch, standardize_teams)
+                    self.session.commit()
+            else:
+                # Process each match with a progress bar
+                for match in tqdm(matches, desc="Processing matches"):
+                    self.process_match_statistics(match.id, force_update, standardize_teams)
                 
             self.session.commit()
             self.logger.info("Successfully processed match statistics")
@@ -97,6 +118,84 @@ class StatsProcessor:
             self.logger.error(f"Error processing match {match_id}: {str(e)}")
             raise
     
+    def get_batch_deliveries(self, match_ids: Sequence[str]) -> pd.DataFrame:
+        """First- and second-innings deliveries of a batch of matches in one query."""
+        result = self.session.execute(text("""
+            SELECT match_id, innings, over, ball, batter, bowler, batting_team, bowling_team,
+                   runs_off_bat, extras, wicket_type, player_dismissed
+            FROM deliveries
+            WHERE match_id = ANY(:match_ids) AND innings IN (1, 2)
+            ORDER BY match_id, innings, over, ball
+        """), {"match_ids": list(match_ids)})
+        return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+    def matches_with_stats(self, match_ids: Sequence[str]) -> set:
+        """Matches of the batch that already have both batting and bowling stats rows."""
+        rows = self.session.execute(text("""
+            SELECT match_id FROM batting_stats WHERE match_id = ANY(:match_ids)
+            INTERSECT
+            SELECT match_id FROM bowling_stats WHERE match_id = ANY(:match_ids)
+        """), {"match_ids": list(match_ids)}).fetchall()
+        return {row[0] for row in rows}
+
+    @staticmethod
+    def delivery_frame(deliveries: pd.DataFrame) -> pd.DataFrame:
+        """Normalise legacy deliveries into the per-ball frame of stats_derivation.
+
+        Encodes the rules of _calculate_batting_stats / _calculate_bowling_stats: every
+        delivery is a ball faced and a legal ball, and the legacy table is men's T20.
+        """
+        runs = pd.to_numeric(deliveries['runs_off_bat'], errors='coerce').fillna(0)
+        extras = pd.to_numeric(deliveries['extras'], errors='coerce').fillna(0)
+
+        frame = deliveries[['match_id', 'innings', 'over', 'ball', 'batter', 'bowler',
+                            'batting_team', 'bowling_team']].copy()
+        frame['format'] = 'T20'
+        frame['gender'] = 'male'
+        frame['bat_runs'] = runs
+        frame['team_runs'] = runs
+        frame['faced'] = True
+        frame['batter_out'] = deliveries['player_dismissed'].notna() & (deliveries['player_dismissed'] == deliveries['batter'])
+        frame['conceded'] = runs + extras
+        frame['legal'] = True
+        frame['bowler_wicket'] = deliveries['wicket_type'].isin(BOWLER_WICKETS)
+        frame['bowler_dot'] = (runs == 0) & (extras == 0)
+        frame['hit'] = runs
+        frame['extras_conceded'] = extras
+        return frame
+
+    @staticmethod
+    def standard_team_names() -> Dict[str, str]:
+        """Team name -> the first name of its teams_mapping group, as _standardize_team_names uses."""
+        standard = {}
+        for team_name, abbrev in teams_mapping.items():
+            standard.setdefault(abbrev, team_name)
+        return {team_name: standard[abbrev] for team_name, abbrev in teams_mapping.items()}
+
+    def process_matches_batch(self, match_ids: Sequence[str], standardize_teams: bool = True) -> Dict[str, int]:
+        """Replace the stats of a batch of matches with set-based derived rows (no commit)."""
+        deliveries = self.get_batch_deliveries(match_ids)
+        if deliveries.empty:
+            self.logger.warning(f"No deliveries found for {len(match_ids)} matches")
+            return {'batting': 0, 'bowling': 0}
+
+        frame = self.delivery_frame(deliveries)
+        calculator = FantasyPointsCalculator()
+        batting = add_fantasy_points(derive_batting_stats(frame, zero_rate_diffs=True), 'batting',
+                                     lambda fmt, gender: calculator)
+        bowling = add_fantasy_points(derive_bowling_stats(frame, zero_rate_diffs=True), 'bowling',
+                                     lambda fmt, gender: calculator)
+
+        if standardize_teams:
+            standard = self.standard_team_names()
+            batting['batting_team'] = batting['batting_team'].map(lambda team: standard.get(team, team))
+            bowling['bowling_team'] = bowling['bowling_team'].map(lambda team: standard.get(team, team))
+
+        batting_count, bowling_count = replace_match_stats(
+            self.session, deliveries['match_id'].unique().tolist(), batting, bowling
+        )
+        return {'batting': batting_count, 'bowling': bowling_count}
+
     def _process_batting_stats(self, match_id: str, deliveries: List[Delivery]):
         """Process batting statistics for all batters in a match"""
         for innings in [1, 2]:
@@ -0,0 +1,288 @@
+"""
+Set-based derivation of batting_stats / bowling_stats rows.
+
+StatsProcessor (legacy ``deliveries``) and StatsFromDeliveryDetails (``delivery_details``)
+build these rows one player at a time, re-filtering the match's deliveries in Python for every
+batter and bowler. This module derives every row for a batch of matches in one vectorised
+pandas pass and writes them back with one DELETE and one multi-row INSERT per table.
+
+The two sources disagree on what counts as a ball faced, a wicket or a run conceded, so each
+normalises its deliveries into a common per-ball frame first:
+
+    match_id, innings, over, ball, batter, bowler, batting_team, bowling_team, format, gender
+    bat_runs          runs credited to the striker
+    team_runs         runs used for the entry score and the team comparison
+    faced             counts as a ball faced
+    batter_out        the striker was dismissed
+    conceded          runs charged to the bowler
+    legal             counts toward the bowler's overs
+    bowler_wicket     a wicket credited to the bowler
+    bowler_dot        a dot ball for the bowler
+    hit               runs compared against 4 / 6 for boundaries conceded
+    extras_conceded   extras charged to the bowler
+
+Fantasy points still come from the per-format calculators, applied row by row to the derived
+stats, so the scoring rules stay single-sourced in fantasy_points_v2.py.
+"""
+
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Integer, insert, text
+
+from models import BattingStats, BowlingStats
+
+PHASE_PREFIXES = ('pp', 'middle', 'death')
+FRAME_COLUMNS = (
+    'match_id', 'innings', 'over', 'ball', 'batter', 'bowler', 'batting_team', 'bowling_team',
+    'format', 'gender', 'bat_runs', 'team_runs', 'faced', 'batter_out', 'conceded', 'legal',
+    'bowler_wicket', 'bowler_dot', 'hit', 'extras_conceded',
+)
+
+_BATTING_KEYS = ['match_id', 'innings', 'batter']
+_BOWLING_KEYS = ['match_id', 'innings', 'bowler']
+_INNINGS_KEYS = ['match_id', 'innings']
+
+
+def phase_ranges(fmt: Optional[str], gender: Optional[str]) -> List[Tuple[str, int, int]]:
+    """Phase boundaries for a format, as (column_prefix, start, end_exclusive).
+
+    The pp_/middle_/death_ columns are positional phase 1/2/3 rather than literally
+    powerplay/middle/death -- format_config supplies the over ranges and the display labels
+    (see MULTI_FORMAT_PLAN.md decision D3). For men's T20 this reproduces the previously
+    hardcoded [(0, 6), (6, 15), (15, 99)] exactly.
+    """
+    from services.analytics_common import phase_bounds
+
+    phases = phase_bounds(fmt or 'T20', gender or 'male')
+    ranges = []
+    for index, phase in enumerate(phases):
+        # The final phase stays unbounded, as the old literal 99 was: Test innings have no
+        # fixed length, and an over beyond the nominal end must still be counted somewhere.
+        is_last = index == len(phases) - 1
+        end = 10_000 if is_last or phase.end_over is None else phase.end_over + 1
+        ranges.append((PHASE_PREFIXES[index], phase.start_over, end))
+    return ranges
+
+
+def _prepare(frame: pd.DataFrame) -> pd.DataFrame:
+    """Order the frame, tag each ball with its phase, and add running innings totals."""
+    df = frame.loc[:, list(FRAME_COLUMNS)].copy()
+    df['format'] = df['format'].fillna('T20')
+    df['gender'] = df['gender'].fillna('male')
+    df = df.sort_values(['match_id', 'innings', 'over', 'ball'], kind='stable').reset_index(drop=True)
+
+    # Each match is stamped with the format of its first ball, as the per-match path does
+    first = df.drop_duplicates('match_id').set_index('match_id')
+    df['format'] = df['match_id'].map(first['format'])
+    df['gender'] = df['match_id'].map(first['gender'])
+
+    df['phase'] = None
+    for (fmt, gender), index in df.groupby(['format', 'gender'], sort=False).groups.items():
+        overs = df.loc[index, 'over']
+        for prefix, start, end in phase_ranges(fmt, gender):
+            df.loc[overs[(overs >= start) & (overs < end)].index, 'phase'] = prefix
+
+    # Team runs and balls faced strictly before each ball of the innings
+    innings = df.groupby(_INNINGS_KEYS, sort=False)
+    df['runs_before'] = innings['team_runs'].cumsum() - df['team_runs']
+    df['faced_before'] = innings['faced'].cumsum() - df['faced']
+    df['seq'] = np.arange(len(df))
+    return df
+
+
+def _phases_defined(stats: pd.DataFrame) -> Dict[str, pd.Series]:
+    """Per prefix, whether the row's format has that phase (undefined phases stay NULL)."""
+    defined = {prefix: pd.Series(False, index=stats.index) for prefix in PHASE_PREFIXES}
+    for (fmt, gender), index in stats.groupby(['format', 'gender'], sort=False).groups.items():
+        for prefix, _, _ in phase_ranges(fmt, gender):
+            defined[prefix].loc[index] = True
+    return defined
+
+
+def _phase_column(phase: pd.DataFrame, column: str, prefix: str, index: pd.Index) -> pd.Series:
+    """One phase aggregate aligned to the stats rows; players with no balls in the phase get 0."""
+    if (column, prefix) not in phase.columns:
+        return pd.Series(0, index=index)
+    return phase[(column, prefix)].reindex(index).fillna(0).astype(int)
+
+
+def _rate(numerator: pd.Series, denominator: pd.Series, scale: float = 1.0) -> pd.Series:
+    return (numerator * scale / denominator.where(denominator > 0)).astype(float)
+
+
+def _rate_diff(rate: pd.Series, team_rate: pd.Series, zero_rate_diffs: bool) -> pd.Series:
+    # The delivery_details path only takes the difference when the player's rate is truthy;
+    # the legacy path takes it whenever the team rate exists.
+    usable = rate.notna() if zero_rate_diffs else rate.notna() & (rate != 0)
+    return (rate - team_rate).where(usable & team_rate.notna())
+
+
+def derive_batting_stats(frame: pd.DataFrame, zero_rate_diffs: bool = False) -> pd.DataFrame:
+    """One batting_stats row per (match, innings, batter) in the frame, without fantasy points."""
+    df = _prepare(frame)
+    bat = df[df['batter'].notna()].copy()
+    bat['dot'] = (bat['bat_runs'] == 0) & bat['faced']
+    bat['boundary'] = bat['bat_runs'].isin([4, 6])
+    for runs, name in ((1, 'ones'), (2, 'twos'), (3, 'threes'), (4, 'fours'), (6, 'sixes')):
+        bat[name] = bat['bat_runs'] == runs
+
+    grouped = bat.groupby(_BATTING_KEYS, sort=False)
+    stats = grouped.agg(
+        batting_team=('batting_team', 'first'),
+        format=('format', 'first'),
+        gender=('gender', 'first'),
+        runs=('bat_runs', 'sum'),
+        balls_faced=('faced', 'sum'),
+        wickets=('batter_out', 'sum'),
+        dots=('dot', 'sum'),
+        ones=('ones', 'sum'),
+        twos=('twos', 'sum'),
+        threes=('threes', 'sum'),
+        fours=('fours', 'sum'),
+        sixes=('sixes', 'sum'),
+        own_team_runs=('team_runs', 'sum'),
+        first_seq=('seq', 'min'),
+    )
+    stats['strike_rate'] = _rate(stats['runs'], stats['balls_faced'], 100.0)
+
+    phase = bat[bat['phase'].notna()].groupby(_BATTING_KEYS + ['phase'], sort=False).agg(
+        runs=('bat_runs', 'sum'),
+        balls=('faced', 'sum'),
+        dots=('dot', 'sum'),
+        wickets=('batter_out', 'sum'),
+        boundaries=('boundary', 'sum'),
+    ).unstack('phase')
+    defined = _phases_defined(stats)
+    for prefix in PHASE_PREFIXES:
+        for column in ('runs', 'balls', 'dots', 'wickets', 'boundaries'):
+            stats[f'{prefix}_{column}'] = _phase_column(phase, column, prefix, stats.index).where(defined[prefix])
+        stats[f'{prefix}_strike_rate'] = _rate(stats[f'{prefix}_runs'], stats[f'{prefix}_balls'], 100.0)
+
+    # Entry point and batting position, read off the batter's first ball
+    first = df.loc[stats['first_seq']]
+    stats['entry_overs'] = (first['over'] + first['ball'] / 6.0).to_numpy()
+    stats['entry_runs'] = first['runs_before'].to_numpy()
+    stats['entry_balls'] = first['faced_before'].to_numpy()
+    stats['batting_position'] = stats.groupby(level=['match_id', 'innings'])['first_seq'].rank(method='first').astype(int)
+
+    # Team comparison: innings totals minus the batter's own balls
+    totals = df.groupby(_INNINGS_KEYS, sort=False).agg(team_runs=('team_runs', 'sum'), team_faced=('faced', 'sum'))
+    innings_index = stats.index.droplevel('batter')
+    stats['team_runs_excl_batter'] = totals['team_runs'].reindex(innings_index).to_numpy() - stats['own_team_runs']
+    stats['team_balls_excl_batter'] = totals['team_faced'].reindex(innings_index).to_numpy() - stats['balls_faced']
+    stats['team_sr_excl_batter'] = _rate(stats['team_runs_excl_batter'], stats['team_balls_excl_batter'], 100.0)
+    stats['sr_diff'] = _rate_diff(stats['strike_rate'], stats['team_sr_excl_batter'], zero_rate_diffs)
+
+    stats = stats.drop(columns=['own_team_runs', 'first_seq']).reset_index().rename(columns={'batter': 'striker'})
+    return stats
+
+
+def derive_bowling_stats(frame: pd.DataFrame, zero_rate_diffs: bool = False) -> pd.DataFrame:
+    """One bowling_stats row per (match, innings, bowler) in the frame, without fantasy points."""
+    df = _prepare(frame)
+    bowl = df[df['bowler'].notna()].copy()
+    bowl['boundary'] = bowl['hit'].isin([4, 6])
+    bowl['four'] = bowl['hit'] == 4
+    bowl['six'] = bowl['hit'] == 6
+
+    grouped = bowl.groupby(_BOWLING_KEYS, sort=False)
+    stats = grouped.agg(
+        bowling_team=('bowling_team', 'first'),
+        format=('format', 'first'),
+        gender=('gender', 'first'),
+        legal=('legal', 'sum'),
+        runs_conceded=('conceded', 'sum'),
+        wickets=('bowler_wicket', 'sum'),
+        dots=('bowler_dot', 'sum'),
+        fours_conceded=('four', 'sum'),
+        sixes_conceded=('six', 'sum'),
+        extras=('extras_conceded', 'sum'),
+    )
+    stats['overs'] = stats['legal'] / 6
+    stats['economy'] = _rate(stats['runs_conceded'], stats['overs'])
+
+    phase = bowl[bowl['phase'].notna()].groupby(_BOWLING_KEYS + ['phase'], sort=False).agg(
+        legal=('legal', 'sum'),
+        runs=('conceded', 'sum'),
+        wickets=('bowler_wicket', 'sum'),
+        dots=('bowler_dot', 'sum'),
+        boundaries=('boundary', 'sum'),
+    ).unstack('phase')
+    defined = _phases_defined(stats)
+    for prefix in PHASE_PREFIXES:
+        columns = {}
+        for column in ('legal', 'runs', 'wickets', 'dots', 'boundaries'):
+            columns[column] = _phase_column(phase, column, prefix, stats.index).where(defined[prefix])
+        stats[f'{prefix}_overs'] = columns['legal'] / 6
+        for column in ('runs', 'wickets', 'dots', 'boundaries'):
+            stats[f'{prefix}_{column}'] = columns[column]
+        stats[f'{prefix}_economy'] = _rate(stats[f'{prefix}_runs'], stats[f'{prefix}_overs'])
+
+    totals = df.groupby(_INNINGS_KEYS, sort=False).agg(team_runs=('conceded', 'sum'), team_legal=('legal', 'sum'))
+    innings_index = stats.index.droplevel('bowler')
+    stats['team_runs_excl_bowler'] = totals['team_runs'].reindex(innings_index).to_numpy() - stats['runs_conceded']
+    stats['team_overs_excl_bowler'] = (totals['team_legal'].reindex(innings_index).to_numpy() - stats['legal']) / 6
+    stats['team_economy_excl_bowler'] = _rate(stats['team_runs_excl_bowler'], stats['team_overs_excl_bowler'])
+    stats['economy_diff'] = _rate_diff(stats['economy'], stats['team_economy_excl_bowler'], zero_rate_diffs)
+
+    return stats.drop(columns=['legal']).reset_index()
+
+
+def add_fantasy_points(stats: pd.DataFrame, kind: str,
+                       calculator_for: Callable[[str, str], Optional[object]]) -> pd.DataFrame:
+    """
+    Fill ``fantasy_points`` from the calculator for each row's format.
+
+    ``kind`` is 'batting' or 'bowling'. ``calculator_for(fmt, gender)`` returns the calculator,
+    or None where no ruleset is implemented -- those rows keep a NULL rather than a wrong value.
+    """
+    stats['fantasy_points'] = None
+    if stats.empty:
+        return stats
+    for (fmt, gender), index in stats.groupby(['format', 'gender'], sort=False).groups.items():
+        calculator = calculator_for(fmt, gender)
+        if calculator is None:
+            continue
+        score = calculator.calculate_batting_points if kind == 'batting' else calculator.calculate_bowling_points
+        rows = stats.loc[index].astype(object).where(stats.loc[index].notna(), None)
+        stats.loc[index, 'fantasy_points'] = [
+            score(SimpleNamespace(**row)) for row in rows.to_dict('records')
+        ]
+    return stats
+
+
+def _records(stats: pd.DataFrame, table) -> List[Dict]:
+    columns = [c for c in stats.columns if c in table.columns and c != 'id']
+    frame = stats[columns].copy()
+    for column in columns:
+        # Phase counts turn float where a format leaves a phase NULL; write them back as ints
+        if isinstance(table.columns[column].type, Integer):
+            frame[column] = pd.to_numeric(frame[column]).round().astype('Int64')
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None).to_dict('records')
+
+
+def replace_match_stats(session, match_ids: Sequence[str], batting: pd.DataFrame,
+                        bowling: pd.DataFrame) -> Tuple[int, int]:
+    """
+    Replace the stats rows of these matches with the derived ones (no commit).
+
+    Replace rather than update: the set of (innings, player) rows can legitimately change, so
+    stale rows must not survive. Returns (batting rows, bowling rows) written.
+    """
+    ids = list(match_ids)
+    if not ids:
+        return 0, 0
+    session.execute(text("DELETE FROM batting_stats WHERE match_id = ANY(:ids)"), {"ids": ids})
+    session.execute(text("DELETE FROM bowling_stats WHERE match_id = ANY(:ids)"), {"ids": ids})
+
+    batting_rows = _records(batting, BattingStats.__table__)
+    bowling_rows = _records(bowling, BowlingStats.__table__)
+    if batting_rows:
+        session.execute(insert(BattingStats.__table__), batting_rows)
+    if bowling_rows:
+        session.execute(insert(BowlingStats.__table__), bowling_rows)
+    return len(batting_rows), len(bowling_rows)
@@ -7,16 +7,24 @@ COLUMN MAPPING:
     team_bat -> batting_team, team_bowl -> bowling_team
 
 FILTERS OUT: Incomplete matches (where innings 1 doesn't start at over 0)
+
+By default matches are processed in batches with the set-based derivation in
+stats_derivation.py: one query per batch, one vectorised pass, one bulk write.
+--per-match keeps the original one-player-at-a-time path.
 """
 
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+import pandas as pd
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 from tqdm import tqdm
 from database import get_database_connection
 from models import BattingStats, BowlingStats
 from fantasy_points_v2 import FantasyPointsCalculator
+from stats_derivation import (
+    add_fantasy_points, derive_batting_stats, derive_bowling_stats, phase_ranges, replace_match_stats,
+)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -70,29 +78,19 @@ class StatsFromDeliveryDetails:
         return [dict(zip(columns, row)) for row in result.fetchall()]
     
     @staticmethod
-    def _phase_ranges(deliveries: List[Dict]):
+    def _match_format(deliveries: List[Dict]) -> Tuple[str, str]:
+        """(format, gender) of a match, read off its first delivery."""
+        fmt = (deliveries[0].get('format') if deliveries else None) or 'T20'
+        gender = (deliveries[0].get('gender') if deliveries else None) or 'male'
+        return fmt, gender
+
+    @classmethod
+    def _phase_ranges(cls, deliveries: List[Dict]):
         """Phase boundaries for this match's format, as (column_prefix, start, end_exclusive).
 
-        The pp_/middle_/death_ columns are positional phase 1/2/3 rather than literally
-        powerplay/middle/death -- format_config supplies the over ranges and the display labels
-        (see MULTI_FORMAT_PLAN.md decision D3). For men's T20 this reproduces the previously
-        hardcoded [(0, 6), (6, 15), (15, 99)] exactly.
+        See stats_derivation.phase_ranges.
         """
-        from services.analytics_common import phase_bounds
-
-        fmt = (deliveries[0].get('format') if deliveries else None) or 'T20'
-        gender = (deliveries[0].get('gender') if deliveries else None) or 'male'
-        phases = phase_bounds(fmt, gender)
-
-        column_prefixes = ['pp', 'middle', 'death']
-        ranges = []
-        for index, phase in enumerate(phases):
-            # The final phase stays unbounded, as the old literal 99 was: Test innings have no
-            # fixed length, and an over beyond the nominal end must still be counted somewhere.
-            is_last = index == len(phases) - 1
-            end = 10_000 if is_last or phase.end_over is None else phase.end_over + 1
-            ranges.append((column_prefixes[index], phase.start_over, end))
-        return ranges
+        return phase_ranges(*cls._match_format(deliveries))
 
     def calculate_batting_stats(self, match_id: str, innings: int, batter: str, deliveries: List[Dict]) -> BattingStats:
         batter_dels = [d for d in deliveries if d['innings'] == innings and d['batter'] == batter]
@@ -218,10 +216,11 @@ class StatsFromDeliveryDetails:
         row, which is how an ODI innings would have been scored on T20 bands -- 25 a wicket
         instead of 30, a dot worth a point instead of a third of one.
         """
+        return self._calculator_for_format(*self._match_format(deliveries))
+
+    def _calculator_for_format(self, fmt: str, gender: str):
         from fantasy_points_odi import get_calculator
 
-        fmt = (deliveries[0].get('format') if deliveries else None) or 'T20'
-        gender = (deliveries[0].get('gender') if deliveries else None) or 'male'
         key = (fmt.upper(), gender)
         if not hasattr(self, '_calculator_cache'):
             self._calculator_cache = {}
@@ -238,12 +237,19 @@ class StatsFromDeliveryDetails:
         inflates every number; applied to a Test it is meaningless. Where no implemented ruleset
         matches, the column is left NULL rather than filled with a plausible-looking wrong value.
         """
+        return cls._fantasy_applies_to(*cls._match_format(deliveries))
+
+    @classmethod
+    def _fantasy_applies_to(cls, fmt: str, gender: str) -> bool:
         from format_config import get_format
 
-        fmt = (deliveries[0].get('format') if deliveries else None) or 'T20'
-        gender = (deliveries[0].get('gender') if deliveries else None) or 'male'
-        ruleset = get_format(fmt, gender).fantasy_ruleset
-        return ruleset in cls.IMPLEMENTED_FANTASY_RULESETS
+        return get_format(fmt, gender).fantasy_ruleset in cls.IMPLEMENTED_FANTASY_RULESETS
+
+    def fantasy_calculator_for(self, fmt: str, gender: str):
+        """Calculator for a format, or None where fantasy points are left NULL."""
+        if not self._fantasy_applies_to(fmt, gender):
+            return None
+        return self._calculator_for_format(fmt, gender)
 
     def calculate_bowling_stats(self, match_id: str, innings: int, bowler: str, deliveries: List[Dict]) -> BowlingStats:
         bowler_dels = [d for d in deliveries if d['innings'] == innings and d['bowler'] == bowler]
@@ -343,7 +349,87 @@ class StatsFromDeliveryDetails:
         return {'batting': batting_count, 'bowling': bowling_count}
 
 
-def create_stats_from_delivery_details(limit: Optional[int] = None, batch_size: int = 50) -> Dict:
+    # ------------------------------------------------------------------
+    # Set-based derivation
+    # ------------------------------------------------------------------
+
+    def get_batch_deliveries(self, session: Session, match_ids: Sequence[str],
+                             innings: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """Deliveries of a batch of matches in one query, as a DataFrame."""
+        query = """
+            SELECT p_match as match_id, inns as innings, over, ball,
+                   bat as batter, bowl as bowler,
+                   team_bat as batting_team, team_bowl as bowling_team,
+                   score, batruns, outcome, out, bat_out, dismissal, noball, wide, byes, legbyes,
+                   format, gender
+            FROM delivery_details
+            WHERE p_match = ANY(:match_ids)
+        """
+        params = {'match_ids': list(match_ids)}
+        if innings:
+            query += " AND inns = ANY(:innings)"
+            params['innings'] = list(innings)
+        query += " ORDER BY p_match, inns, over, ball"
+        result = session.execute(text(query), params)
+        return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+    @classmethod
+    def _truthy_series(cls, values: pd.Series) -> pd.Series:
+        """Vectorised _truthy."""
+        return values.notna() & values.astype(str).str.strip().str.lower().eq('true')
+
+    @classmethod
+    def delivery_frame(cls, deliveries: pd.DataFrame) -> pd.DataFrame:
+        """Normalise delivery_details rows into the per-ball frame of stats_derivation.
+
+        Encodes the same rules as calculate_batting_stats / calculate_bowling_stats: wides are
+        not balls faced, wides and no-balls are not legal deliveries, and a dismissal needs
+        both `out` and `bat_out` (see _batter_dismissed).
+        """
+        numeric = lambda column: pd.to_numeric(deliveries[column], errors='coerce').fillna(0)
+        score, batruns = numeric('score'), numeric('batruns')
+        wide, noball = numeric('wide'), numeric('noball')
+        out = cls._truthy_series(deliveries['out'])
+        bowler_wickets = {w.lower() for w in cls.BOWLER_WICKETS}
+
+        frame = deliveries[['match_id', 'innings', 'over', 'ball', 'batter', 'bowler',
+                            'batting_team', 'bowling_team', 'format', 'gender']].copy()
+        frame['bat_runs'] = batruns
+        frame['team_runs'] = score
+        frame['faced'] = wide == 0
+        frame['batter_out'] = out & cls._truthy_series(deliveries['bat_out'])
+        frame['conceded'] = score + wide + noball
+        frame['legal'] = (wide == 0) & (noball == 0)
+        frame['bowler_wicket'] = out & deliveries['dismissal'].str.lower().isin(bowler_wickets).fillna(False)
+        frame['bowler_dot'] = (score == 0) & frame['legal']
+        frame['hit'] = score
+        frame['extras_conceded'] = wide + noball
+        return frame
+
+    def derive_stats(self, deliveries: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """All batting and bowling stats rows for these deliveries, with fantasy points."""
+        frame = self.delivery_frame(deliveries)
+        batting = add_fantasy_points(derive_batting_stats(frame), 'batting', self.fantasy_calculator_for)
+        bowling = add_fantasy_points(derive_bowling_stats(frame), 'bowling', self.fantasy_calculator_for)
+        return batting, bowling
+
+    def process_matches_batch(self, session: Session, match_ids: Sequence[str],
+                              innings: Optional[Sequence[int]] = (1, 2)) -> Dict:
+        """Replace the stats of a batch of matches with set-based derived rows (no commit).
+
+        ``innings`` defaults to the first two, as process_match_stats does; pass None for all.
+        """
+        deliveries = self.get_batch_deliveries(session, match_ids, innings)
+        if deliveries.empty:
+            return {'batting': 0, 'bowling': 0, 'matches': 0}
+        batting, bowling = self.derive_stats(deliveries)
+        found = deliveries['match_id'].unique().tolist()
+        batting_count, bowling_count = replace_match_stats(session, found, batting, bowling)
+        return {'batting': batting_count, 'bowling': bowling_count, 'matches': len(found)}
+
+
+def create_stats_from_delivery_details(limit: Optional[int] = None, batch_size: int = 50,
+                                       set_based: bool = True) -> Dict:
     processor = StatsFromDeliveryDetails()
     session = processor.SessionLocal()
     stats = {'matches_processed': 0, 'batting_created': 0, 'bowling_created': 0, 'errors': 0}
@@ -352,30 +438,55 @@ def create_stats_from_delivery_details(limit: Optional[int] = None, batch_size:
         match_ids = processor.get_matches_needing_stats(session, limit)
         logger.info(f"Found {len(match_ids)} complete matches needing stats")
         
-        for i, match_id in enumerate(tqdm(match_ids, desc="Processing stats")):
-            try:
-                result = processor.process_match_stats(session, match_id)
-                stats['batting_created'] += result['batting']
-                stats['bowling_created'] += result['bowling']
-                stats['matches_processed'] += 1
-                if (i + 1) % batch_size == 0:
+        if set_based:
+            batches = [match_ids[i:i + batch_size] for i in range(0, len(match_ids), batch_size)]
+            for batch in tqdm(batches, desc="Processing stats (batches)"):
+                try:
+                    result = processor.process_matches_batch(session, batch)
                     session.commit()
-            except Exception as e:
-                logger.error(f"Error {match_id}: {e}")
-                stats['errors'] += 1
-                session.rollback()
+                    stats['batting_created'] += result['batting']
+                    stats['bowling_created'] += result['bowling']
+                    stats['matches_processed'] += len(batch)
+                except Exception as e:
+                    # Fall back to one match at a time so a bad match only fails itself
+                    session.rollback()
+                    logger.warning(f"Batch of {len(batch)} failed ({e}); processing it match by match")
+                    _process_one_by_one(processor, session, batch, stats)
+            return stats
         
-        session.commit()
+        _process_one_by_one(processor, session, match_ids, stats, batch_size)
         return stats
     finally:
         session.close()
 
 
+def _process_one_by_one(processor: StatsFromDeliveryDetails, session: Session, match_ids: List[str],
+                        stats: Dict, batch_size: int = 50) -> None:
+    for i, match_id in enumerate(tqdm(match_ids, desc="Processing stats")):
+        try:
+            result = processor.process_match_stats(session, match_id)
+            stats['batting_created'] += result['batting']
+            stats['bowling_created'] += result['bowling']
+            stats['matches_processed'] += 1
+            if (i + 1) % batch_size == 0:
+                session.commit()
+        except Exception as e:
+            logger.error(f"Error {match_id}: {e}")
+            stats['errors'] += 1
+            session.rollback()
+    
+    session.commit()
+
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument('--limit', type=int)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--per-match', action='store_true',
+                        help='Derive stats one player at a time instead of set-based per batch')
     args = parser.parse_args()
     
-    result = create_stats_from_delivery_details(limit=args.limit)
+    result = create_stats_from_delivery_details(limit=args.limit, batch_size=args.batch_size,
+                                                set_based=not args.per_match)
     print(f"\n✅ Done! Batting: {result['batting_created']}, Bowling: {result['bowling_created']}")
@@ -0,0 +1,69 @@
+from datetime import date
+
+import pytest
+
+from batch_processor import PrecomputationPipeline, resolve_step_order
+
+
+def test_resolve_step_order_puts_dependencies_first():
+    order = resolve_step_order({
+        "wpa_outcomes": ("venue_resources",),
+        "venue_resources": (),
+        "team_phase_stats": (),
+    })
+    assert order.index("venue_resources") < order.index("wpa_outcomes")
+    assert set(order) == {"wpa_outcomes", "venue_resources", "team_phase_stats"}
+
+
+def test_resolve_step_order_rejects_cycles_and_unknown_steps():
+    with pytest.raises(ValueError, match="cycle"):
+        resolve_step_order({"a": ("b",), "b": ("a",)})
+    with pytest.raises(ValueError, match="Unknown"):
+        resolve_step_order({"a": ("missing",)})
+
+
+def test_default_dependencies_cover_every_step():
+    pipeline = PrecomputationPipeline()
+    assert set(pipeline.step_dependencies) == {name for name, _ in pipeline.pipeline_steps}
+    resolve_step_order(pipeline.step_dependencies)
+
+
+def test_sharded_step_filters_by_venue_and_skips_truncate(mock_db):
+    pipeline = PrecomputationPipeline()
+    pipeline.session = mock_db
+    pipeline._shard = (3, 8)
+
+    pipeline._rebuild_venue_resources(date(2025, 1, 1))
+
+    statements = [str(call.args[0]) for call in mock_db.execute.call_args_list]
+    assert not any("TRUNCATE" in sql for sql in statements)
+    assert "hashtext(COALESCE(m.venue, ''))" in statements[0]
+    assert mock_db.execute.call_args_list[0].args[1] == {
+        "through_date": date(2025, 1, 1),
+        "shard_index": 3,
+        "shard_count": 8,
+    }
+
+
+def test_unsharded_step_keeps_serial_behaviour(mock_db):
+    pipeline = PrecomputationPipeline()
+    pipeline.session = mock_db
+
+    pipeline._rebuild_team_stats(date(2025, 1, 1))
+
+    statements = [str(call.args[0]) for call in mock_db.execute.call_args_list]
+    assert statements[0] == "TRUNCATE TABLE team_phase_stats"
+    assert "hashtext" not in statements[1]
+
+
+def test_sharded_wpa_step_scopes_first_innings_totals_to_the_shard(mock_db):
+    pipeline = PrecomputationPipeline()
+    pipeline.session = mock_db
+    pipeline._shard = (1, 4)
+    mock_db.execute.return_value.fetchall.return_value = []
+
+    pipeline._rebuild_wpa_outcomes(date(2025, 1, 1))
+
+    wpa_sql = str(mock_db.execute.call_args_list[0].args[0])
+    first_innings = wpa_sql[wpa_sql.index("WHERE innings = 1"):wpa_sql.index(") first_innings")]
+    assert "hashtext(COALESCE(m.venue, ''))" in first_innings
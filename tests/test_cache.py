@@ -0,0 +1,165 @@
+import threading
+from datetime import date
+
+import pytest
+
+from services import cache as cache_module
+from services.cache import MemoryBackend, SQLiteBackend, TTLCache
+
+
+def _cache(backend=None, **kwargs):
+    kwargs.setdefault("ttl_seconds", 60)
+    return TTLCache("test_ns", backend or MemoryBackend(), **kwargs)
+
+
+def test_lru_eviction_by_entry_count_keeps_recently_read_keys():
+    c = _cache(max_entries=2, max_bytes=None)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1  # "a" is now most recently used
+    c.set("c", 3)
+
+    assert c.get("b") is None
+    assert c.get("a") == 1
+    assert c.get("c") == 3
+    stats = c.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+
+
+def test_byte_budget_evicts_oldest_but_keeps_newest_entry():
+    c = _cache(max_entries=None, max_bytes=3000)
+    c.set("small", "x" * 1000)
+    c.set("big", "y" * 2500)
+
+    assert c.get("small") is None
+    assert c.get("big") == "y" * 2500
+
+    c.set("huge", "z" * 10000)
+    assert c.get("huge") == "z" * 10000
+    assert len(c) == 1
+
+
+def test_ttl_expiry_counts_as_miss(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module, "_now", lambda: clock[0])
+    c = _cache(ttl_seconds=10)
+    c.set(("venue", date(2025, 1, 1)), {"score": 180})
+    c.set("short", "v", ttl_seconds=1)
+
+    clock[0] += 5
+    assert c.get(("venue", date(2025, 1, 1))) == {"score": 180}
+    assert c.get("short") is None
+
+    clock[0] += 10
+    assert c.get(("venue", date(2025, 1, 1))) is None
+    stats = c.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["expirations"] == 2
+
+
+def test_memory_backend_keeps_live_values_without_pickling(monkeypatch):
+    monkeypatch.setattr(cache_module.pickle, "dumps", lambda *a, **k: pytest.fail("pickled on set"))
+    c = _cache(max_entries=None, max_bytes=50_000)
+    payload = {"rows": [{"batter": f"player {i}", "runs": i} for i in range(1000)]}
+    c.set("big", payload)
+
+    assert c.get("big") is payload
+    # The sampled estimate extrapolates to all 1000 rows, so the entry is over budget and goes
+    # as soon as a newer one arrives
+    assert c.stats()["approx_bytes"] > 50_000
+    c.set("small", "x")
+    assert c.get("big") is None
+
+
+def test_expired_entries_at_the_lru_head_are_dropped_on_set(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module, "_now", lambda: clock[0])
+    c = _cache(ttl_seconds=10, max_entries=100)
+    c.set("old", 1, ttl_seconds=1)
+    c.set("long_lived", 2, ttl_seconds=100)
+
+    clock[0] += 5
+    c.set("new", 3)
+
+    assert c.stats()["entries"] == 2
+    assert c.stats()["evictions"] == 1
+
+
+def test_clear_and_contains():
+    c = _cache()
+    c.set("a", 1)
+    assert "a" in c
+    assert c.clear() == 1
+    assert "a" not in c
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    writer = _cache(backend=SQLiteBackend(path), max_entries=2)
+    reader = _cache(backend=SQLiteBackend(path), max_entries=2)
+
+    writer.set(("rankings", date(2025, 1, 1), "pace"), {"rows": [1, 2, 3]})
+    assert reader.get(("rankings", date(2025, 1, 1), "pace")) == {"rows": [1, 2, 3]}
+
+    writer.set("b", 2)
+    writer.set("c", 3)
+    assert len(reader) == 2
+    assert reader.get("b") == 2
+
+
+def test_get_cache_returns_same_namespace_instance():
+    first = cache_module.get_cache("test_registry_ns", ttl_seconds=5, backend=MemoryBackend())
+    second = cache_module.get_cache("test_registry_ns", ttl_seconds=99)
+    assert first is second
+    assert "test_registry_ns" in cache_module.cache_stats()
+
+
+def test_get_or_compute_coalesces_concurrent_misses():
+    c = _cache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"rows": 42}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(c.get_or_compute("k", compute)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(c.get_or_compute("k", compute))) for _ in range(4)]
+    for t in followers:
+        t.start()
+    while c.flight.stats()["coalesced"] < 4:
+        pass
+    release.set()
+    for t in [leader, *followers]:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert results == [{"rows": 42}] * 5
+    flight_stats = c.stats()["single_flight"]
+    assert flight_stats["coalesced"] == 4
+    assert flight_stats["max_waiters"] == 4
+    assert flight_stats["in_flight"] == 0
+
+
+def test_get_or_compute_shares_errors_and_respects_cache_if():
+    c = _cache()
+
+    def boom():
+        raise ValueError("db down")
+
+    with pytest.raises(ValueError):
+        c.get_or_compute("k", boom)
+    assert c.stats()["single_flight"]["failed_flights"] == 1
+
+    assert c.get_or_compute("nf", lambda: {"found": False}, cache_if=lambda r: r["found"]) == {"found": False}
+    assert c.get("nf") is None
+    assert c.get_or_compute("ok", lambda: {"found": True}, cache_if=lambda r: r["found"]) == {"found": True}
+    assert c.get("ok") == {"found": True}
@@ -0,0 +1,146 @@
+import random
+import re
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import global_t20_rankings as rankings
+from services.competition_weight_fits import current_data_version, prune_weight_fits
+
+START, END = date(2023, 1, 1), date(2024, 12, 31)
+EFFECTS = {"Indian Premier League": 0.25, "Big Bash League": 0.1, "Vitality Blast": 0.0, "SA20": -0.05}
+
+
+def _comp_rows(n_players=60, seed=11):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_players):
+        skill = rng.gauss(0.0, 0.3)
+        for comp in rng.sample(sorted(EFFECTS), 2):
+            rows.append({
+                "player": f"P{i}",
+                "competition": comp,
+                "log_deviation": skill - EFFECTS[comp] + rng.gauss(0.0, 0.05),
+                "balls": rng.randint(60, 400),
+            })
+    return rows
+
+
+@pytest.fixture(autouse=True)
+def _clean_caches():
+    rankings._COMP_WEIGHTS_CACHE.clear()
+    rankings._REFIT_FAILURES.clear()
+    with patch.object(rankings, "_weights_data_version", return_value="7"):
+        yield
+    rankings._COMP_WEIGHTS_CACHE.clear()
+    rankings._REFIT_FAILURES.clear()
+
+
+@pytest.mark.skipif(not rankings.HAS_STATSMODELS, reason="statsmodels not installed")
+def test_warm_started_fit_matches_a_cold_fit():
+    rows = _comp_rows()
+    cold_weights, params = rankings._fit_competition_weights_mixedlm(rows)
+    # Start from a neighbouring window's fit, as the refit worker does
+    nearby = {name: value * 0.9 for name, value in params.items()}
+    warm_weights, _ = rankings._fit_competition_weights_mixedlm(rows, warm_start=nearby)
+
+    assert "Group Var" in params
+    assert warm_weights == pytest.approx(cold_weights, abs=1e-3)
+
+
+def test_handlers_get_provisional_weights_and_queue_a_refit(mock_db):
+    with patch.object(rankings, "_weight_fits_ready", return_value=False), \
+            patch.object(rankings, "_fit_competition_weights", side_effect=AssertionError("fitted")), \
+            patch.object(rankings, "_schedule_weight_refit") as schedule:
+        payload = rankings._get_competition_weights(mock_db, START, END)
+
+    assert payload["provisional"] is True
+    assert payload["source"] == "provisional_default"
+    assert payload["weights"] == rankings._merge_competition_weights(None)
+    schedule.assert_called_once_with(mock_db, START, END, "7")
+    assert rankings._COMP_WEIGHTS_CACHE.get((START.isoformat(), END.isoformat(), "7")) is None
+
+
+def test_stored_fits_are_served_and_missing_ones_fitted_inline_from_the_nearest(mock_db):
+    stored = {"weights": {"SA20": 1.1}, "source": "mixedlm", "cross_league_samples": 40}
+    nearest = {**stored, "model_params": {"Intercept": 0.1, "Group Var": 0.2}}
+    fitted = ({"weights": {"SA20": 1.05}, "source": "mixedlm", "cross_league_samples": 41}, {"Group Var": 0.2})
+
+    with patch.object(rankings, "_weight_fits_ready", return_value=True), \
+            patch("services.competition_weight_fits.load_weight_fit",
+                  side_effect=lambda db, start, end, version: stored if start == START else None), \
+            patch("services.competition_weight_fits.nearest_weight_fit", return_value=nearest), \
+            patch("services.competition_weight_fits.save_weight_fit") as save, \
+            patch.object(rankings, "_fit_competition_weights", return_value=fitted) as fit, \
+            patch.object(rankings, "_schedule_weight_refit") as schedule:
+        assert rankings._get_competition_weights(mock_db, START, END) == stored
+
+        other_start = date(2023, 2, 1)
+        with rankings.inline_weight_fits():
+            payload = rankings._get_competition_weights(mock_db, other_start, END)
+
+    assert payload == fitted[0]
+    assert fit.call_args.kwargs["warm_start"] == nearest["model_params"]
+    save.assert_called_once_with(mock_db, other_start, END, "7", fitted[0], fitted[1])
+    schedule.assert_not_called()
+
+
+def test_failing_refits_back_off_instead_of_requeueing_every_request(mock_db):
+    key = (START.isoformat(), END.isoformat(), "7")
+    with patch.object(rankings, "_fit_and_store_competition_weights", side_effect=RuntimeError("db down")), \
+            patch.object(rankings, "Session"):
+        rankings._REFITS_PENDING.add(key)
+        rankings._refit_in_background(None, START, END, "7")
+        first = rankings._refit_backoff_seconds(START, END, "7")
+        rankings._refit_in_background(None, START, END, "7")
+        second = rankings._refit_backoff_seconds(START, END, "7")
+
+    assert key not in rankings._REFITS_PENDING
+    assert 0 < first <= rankings.COMP_WEIGHTS_REFIT_BACKOFF_SECONDS < second
+    with patch.object(rankings, "ThreadPoolExecutor") as executor:
+        assert rankings._schedule_weight_refit(mock_db, START, END, "7") is False
+    executor.assert_not_called()
+
+    # Once the fit lands the window is no longer backed off
+    with patch.object(rankings, "_fit_and_store_competition_weights", return_value={"source": "mixedlm"}), \
+            patch.object(rankings, "Session"):
+        rankings._refit_in_background(None, START, END, "7")
+    assert rankings._refit_backoff_seconds(START, END, "7") == 0.0
+
+
+def test_data_version_follows_the_mens_t20_slice_and_the_cube(mock_db):
+    def _version(counter):
+        max_id, installed, counters = MagicMock(), MagicMock(), MagicMock()
+        max_id.scalar.return_value = 900
+        installed.scalar.return_value = True
+        counters.fetchall.return_value = [MagicMock(table_name="rankings_monthly_cells", version=counter)]
+        mock_db.execute.side_effect = [max_id, installed, counters]
+        return current_data_version(mock_db)
+
+    # A cube refresh after a men's T20 backfill invalidates stored fits, even with MAX(id) unchanged
+    assert _version(3) == "900.3"
+    assert _version(4) != _version(3)
+    # Loads and backfills of other formats move neither marker
+    assert "format = 'T20' AND gender = 'male'" in str(mock_db.execute.call_args_list[0].args[0])
+
+
+def test_prune_keeps_the_latest_fits_of_each_window():
+    duckdb = pytest.importorskip("duckdb")
+    conn = duckdb.connect(":memory:")
+    conn.execute("""CREATE TABLE competition_weight_fits
+                    (window_start DATE, window_end DATE, data_version VARCHAR, fitted_at TIMESTAMP)""")
+    conn.executemany(
+        "INSERT INTO competition_weight_fits VALUES (?, ?, ?, ?)",
+        [(date(2024, month, 1), END, f"{version}.0", f"2025-01-01 00:0{version}:00")
+         for month in (1, 2) for version in range(5)],
+    )
+
+    class _DuckSession:
+        def execute(self, statement, params):
+            rows = conn.execute(re.sub(r"(?<!:):(\w+)", r"$\1", str(statement)), params).fetchall()
+            return MagicMock(rowcount=rows[0][0])
+
+    assert prune_weight_fits(_DuckSession(), keep=2) == 6
+    kept = conn.execute("SELECT window_start, data_version FROM competition_weight_fits ORDER BY 1, 2").fetchall()
+    assert kept == [(date(2024, month, 1), version) for month in (1, 2) for version in ("3.0", "4.0")]
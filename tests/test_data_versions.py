@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock
+
+from services.data_versions import TRACKED_TABLES, data_versions, ensure_data_versions
+
+
+class _Row:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def test_versions_default_to_zero_until_the_triggers_are_installed(mock_db):
+    mock_db.execute.return_value.scalar.return_value = False
+
+    assert data_versions(mock_db, ("deliveries", "matches")) == {"deliveries": 0, "matches": 0}
+    assert mock_db.execute.call_count == 1
+
+
+def test_versions_read_the_counters_of_the_requested_tables(mock_db):
+    installed = MagicMock()
+    installed.scalar.return_value = True
+    counters = MagicMock()
+    counters.fetchall.return_value = [_Row(table_name="deliveries", version=7)]
+    mock_db.execute.side_effect = [installed, counters]
+
+    assert data_versions(mock_db, ("deliveries", "delivery_details")) == {"deliveries": 7, "delivery_details": 0}
+    assert mock_db.execute.call_args.args[1] == {"tables": ["deliveries", "delivery_details"]}
+
+
+def test_install_puts_a_statement_trigger_on_every_tracked_table(mock_db):
+    mock_db.execute.return_value.fetchall.return_value = []
+    ensure_data_versions(mock_db)
+
+    statements = [str(call.args[0]) for call in mock_db.execute.call_args_list]
+    triggers = [sql for sql in statements if "CREATE TRIGGER" in sql]
+    assert len(triggers) == len(TRACKED_TABLES)
+    for table, sql in zip(TRACKED_TABLES, triggers):
+        assert f"TRUNCATE ON {table}" in sql and "FOR EACH STATEMENT" in sql
+
+
+def test_install_leaves_existing_triggers_alone(mock_db):
+    mock_db.execute.return_value.fetchall.return_value = [("deliveries",), ("matches",)]
+    ensure_data_versions(mock_db)
+
+    statements = [str(call.args[0]) for call in mock_db.execute.call_args_list]
+    assert not any("DROP TRIGGER" in sql for sql in statements)
+    created = [sql for sql in statements if "CREATE TRIGGER" in sql]
+    assert len(created) == len(TRACKED_TABLES) - 2
+    assert not any("ON deliveries" in sql or "ON matches" in sql for sql in created)
+
+    mock_db.reset_mock()
+    mock_db.execute.return_value.fetchall.return_value = [(table,) for table in TRACKED_TABLES]
+    ensure_data_versions(mock_db)
+    statements = [str(call.args[0]) for call in mock_db.execute.call_args_list]
+    assert not any("TRIGGER" in sql for sql in statements)
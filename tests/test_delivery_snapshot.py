@@ -0,0 +1,204 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+ds = pytest.importorskip("pyarrow.dataset")
+
+from routers.player_line_length import (
+    _snapshot_bucket_rows,
+    _snapshot_filter,
+    _snapshot_line_length_rows,
+)
+from services.delivery_snapshot import (
+    DeliverySnapshot,
+    export_delivery_details,
+    get_snapshot,
+    is_current,
+    new_snapshot_id,
+    reset_snapshot_cache,
+)
+
+
+def _dict(values):
+    return pa.array(values, type=pa.string()).dictionary_encode()
+
+
+@pytest.fixture
+def snapshot_root(tmp_path):
+    table = pa.table({
+        "bat": _dict(["Kohli", "Kohli", "Kohli", "Rohit", "Kohli", "Kohli"]),
+        "team_bat": _dict(["RCB", "RCB", "India", "MI", "RCB", "RCB"]),
+        "team_bowl": _dict(["MI", "MI", "Australia", "RCB", "MI", "MI"]),
+        "ground": _dict(["Chinnaswamy"] * 6),
+        "format": _dict(["T20", "T20", "T20", "T20", "ODI", "T20"]),
+        "gender": _dict(["male"] * 6),
+        "line": _dict(["OUTSIDE_OFFSTUMP", "OUTSIDE_OFFSTUMP", "ON_THE_STUMPS", "ON_THE_STUMPS",
+                       "OUTSIDE_OFFSTUMP", None]),
+        "length": _dict(["GOOD_LENGTH", "FULL", "GOOD_LENGTH", "FULL", "FULL", "FULL"]),
+        "batruns": pa.array([4, 0, 1, 6, 2, 1], type=pa.int32()),
+        "control": pa.array([1, 0, 1, 1, 1, None], type=pa.int32()),
+        "wide": pa.array([0, 0, None, 0, 0, 0], type=pa.int32()),
+        "noball": pa.array([0, None, 0, 0, 0, 0], type=pa.int32()),
+        "dismissal": _dict([None, "caught", "", None, None, None]),
+        "year": pa.array([2024, 2024, 2024, 2024, 2024, 2023], type=pa.int32()),
+        "competition": pa.array(["IPL", "IPL", "T20I", "IPL", "IPL", "IPL"]),
+    })
+    root = tmp_path / "snap"
+    target = root / "snapshots" / "20250101T000000"
+    ds.write_dataset(table, str(target), format="parquet",
+                     partitioning=["year", "competition"], partitioning_flavor="hive")
+    (target / "_manifest.json").write_text(json.dumps({"snapshot_id": "20250101T000000", "row_count": 6}))
+    (root / "CURRENT").write_text("20250101T000000")
+    reset_snapshot_cache()
+    yield str(root)
+    reset_snapshot_cache()
+
+
+def _params(**overrides):
+    params = {"start_year": None, "end_year": None, "venue": None}
+    params.update(overrides)
+    return params
+
+
+def test_get_snapshot_reads_current_pointer(snapshot_root, tmp_path):
+    snapshot = get_snapshot(snapshot_root)
+    assert snapshot.snapshot_id == "20250101T000000"
+    assert snapshot.row_count == 6
+    assert get_snapshot(str(tmp_path / "missing")) is None
+
+
+def test_snapshot_ids_started_in_the_same_second_differ():
+    ids = [new_snapshot_id() for _ in range(20)]
+    assert len(set(ids)) == 20
+    assert sorted(ids) == ids
+
+
+def test_bucket_rows_match_sql_semantics(snapshot_root):
+    snapshot = get_snapshot(snapshot_root)
+    rows = _snapshot_bucket_rows(snapshot, "length", _params(), {"bat": ["Kohli"]})
+
+    # The ODI ball is excluded by the format pin
+    assert set(rows) == {"GOOD_LENGTH", "FULL"}
+    full = rows["FULL"]
+    assert full.balls == 2 and full.runs == 1 and full.wickets == 1
+    assert full.strike_rate == 50.0
+    assert full.dot_pct == 50.0  # NULL noball counts as legal
+    assert rows["GOOD_LENGTH"].wickets == 0  # '' dismissal is not a wicket
+    assert rows["GOOD_LENGTH"].boundary_pct == 50.0
+
+
+def test_line_length_rows_skip_null_buckets_and_apply_competition_filter(snapshot_root):
+    snapshot = get_snapshot(snapshot_root)
+    params = _params(leagues=["IPL"], top_team_list=["India", "Australia"])
+    cells = {
+        (row.line_bucket, row.length_bucket): row._mapping
+        for row in _snapshot_line_length_rows(snapshot, params, {})
+    }
+    assert cells[("ON_THE_STUMPS", "GOOD_LENGTH")]["balls"] == 1  # T20I between top teams
+    assert cells[("OUTSIDE_OFFSTUMP", "FULL")]["balls"] == 1
+    assert sum(c["balls"] for c in cells.values()) == 4
+
+
+def test_snapshot_filter_year_and_venue():
+    expr = _snapshot_filter(_params(start_year=2024, venue="Chinnaswamy"), {"bowl_kind": ["pace bowler"]},
+                            not_null=("line",))
+    text = str(expr)
+    assert "year" in text and "ground" in text and "bowl_kind" in text and "is_valid" in text
+
+
+def test_profile_keeps_player_aggregates_on_postgres(snapshot_root, monkeypatch, mock_db):
+    from routers import player_line_length as pll
+
+    monkeypatch.setattr(pll, "get_snapshot", lambda: get_snapshot(snapshot_root))
+    monkeypatch.setattr(DeliverySnapshot, "is_fresh", lambda self, db: True)
+    monkeypatch.setattr(pll, "_resolve_player_names_for_delivery_details", lambda db, name, col: [name])
+    monkeypatch.setattr(pll, "_fetch_player_bat_hand", lambda *args: None)
+    mock_db.execute.return_value.fetchall.return_value = []
+
+    pll.get_player_line_length_profile(
+        "Kohli", mode="batting", start_date=None, end_date=None, leagues=[],
+        include_international=False, top_teams=None, venue=None, similar_players=[], db=mock_db,
+    )
+
+    # Length, line, line x length and coverage for the player itself; the global baselines
+    # come from the snapshot
+    statements = [str(call.args[0]) for call in mock_db.execute.call_args_list]
+    assert len(statements) == 4
+    assert all("ANY(:player_names)" in sql for sql in statements)
+
+
+def test_profile_ignores_a_stale_snapshot(snapshot_root, monkeypatch, mock_db):
+    from routers import player_line_length as pll
+
+    monkeypatch.setattr(pll, "get_snapshot", lambda: get_snapshot(snapshot_root))
+    monkeypatch.setattr(DeliverySnapshot, "is_fresh", lambda self, db: False)
+    monkeypatch.setattr(pll, "_resolve_player_names_for_delivery_details", lambda db, name, col: [name])
+    monkeypatch.setattr(pll, "_fetch_player_bat_hand", lambda *args: None)
+    mock_db.execute.return_value.fetchall.return_value = []
+
+    pll.get_player_line_length_profile(
+        "Kohli", mode="batting", start_date=None, end_date=None, leagues=[],
+        include_international=False, top_teams=None, venue=None, similar_players=[], db=mock_db,
+    )
+
+    # The global baselines went to Postgres as well
+    statements = [str(call.args[0]) for call in mock_db.execute.call_args_list]
+    assert any("ANY(:player_names)" not in sql for sql in statements)
+
+
+def test_exports_go_stale_on_new_rows_and_in_place_corrections(monkeypatch, mock_db):
+    from services import delivery_snapshot
+
+    manifest = {"max_delivery_id": 900, "delivery_details_version": 3, "complete": True}
+
+    def _current(max_id, version):
+        monkeypatch.setattr(delivery_snapshot, "source_markers",
+                            lambda db: {"max_delivery_id": max_id, "delivery_details_version": version})
+        return is_current(manifest, mock_db)
+
+    assert _current(900, 3)
+    assert not _current(901, 3)
+    # A backfill UPDATE leaves MAX(id) alone but moves the write counter
+    assert not _current(900, 4)
+    assert not is_current({"max_delivery_id": 900, "complete": True}, mock_db)
+
+
+def test_partial_year_exports_are_never_served_as_current(tmp_path, monkeypatch, mock_db):
+    from services import delivery_snapshot
+
+    source = {"max_delivery_id": 900, "delivery_details_version": 3}
+    monkeypatch.setattr(delivery_snapshot, "source_markers", lambda db: source)
+    monkeypatch.setattr(delivery_snapshot, "_table_columns", lambda conn: [
+        {"name": "id", "pg_type": "integer"},
+        {"name": "year", "pg_type": "integer"},
+        {"name": "competition", "pg_type": "text"},
+    ])
+
+    def _batches(engine, select_sql, years, schema, chunk_size, counters):
+        for year in years:
+            counters["rows"] += 1
+            yield pa.RecordBatch.from_pylist([{"id": year, "year": year, "competition": "IPL"}], schema=schema)
+
+    monkeypatch.setattr(delivery_snapshot, "_record_batches", _batches)
+    monkeypatch.setattr(delivery_snapshot, "_export_side_table", lambda engine, name, directory: None)
+    engine = MagicMock()
+    engine.connect.return_value.__enter__.return_value.execute.return_value = [
+        SimpleNamespace(year=2023), SimpleNamespace(year=2024),
+    ]
+    root = str(tmp_path / "snap")
+
+    partial = export_delivery_details(engine, root=root, years=[2024])
+    assert partial["years"] == [2024] and not partial["complete"]
+    assert not is_current(partial, mock_db)
+    reset_snapshot_cache()
+    assert get_snapshot(root) is None
+
+    full = export_delivery_details(engine, root=root)
+    assert full["years"] == [2023, 2024] and full["complete"]
+    assert is_current(full, mock_db)
+    reset_snapshot_cache()
+    assert get_snapshot(root).snapshot_id == full["snapshot_id"]
+    reset_snapshot_cache()
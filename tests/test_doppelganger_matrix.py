@@ -0,0 +1,160 @@
+import math
+import random
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from services import search
+from services.doppelganger_matrix import (
+    BATTING_METRICS,
+    BOWLING_METRICS,
+    VOLUME_COLUMNS,
+    PlayerFeatureMatrix,
+    _FINGERPRINT_CACHE,
+    build_player_feature_matrix,
+    kind_columns,
+    stats_fingerprint,
+)
+
+START, END = date(2024, 1, 1), date(2024, 12, 31)
+
+
+class _Row:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+        self._mapping = fields
+
+
+def _result(rows):
+    result = MagicMock()
+    result.fetchall.return_value = rows
+    return result
+
+
+def test_build_aggregates_each_player_once_and_leaves_thin_splits_missing(mock_db):
+    batting = [_Row(player_name="A", batting_innings=12, batting_matches=12, batting_runs=300,
+                    batting_balls=200, batting_dots=60, fours=30, sixes=10, dismissals=10)]
+    bowling = [_Row(player_name="A", bowling_innings=10, bowling_matches=10, runs_conceded=240,
+                    wickets=12, bowling_dots=90, bowling_balls=180),
+               _Row(player_name="B", bowling_innings=20, bowling_matches=20, runs_conceded=400,
+                    wickets=0, bowling_dots=200, bowling_balls=480)]
+    splits = [_Row(player_name="A", split_type="kind", split_key="pace", balls=150, runs=210,
+                   dots=40, boundaries=30, dismissals=5),
+              _Row(player_name="A", split_type="kind", split_key="spin", balls=10, runs=12,
+                   dots=3, boundaries=1, dismissals=0),
+              _Row(player_name="A", split_type="style", split_key="RFM", balls=150, runs=210,
+                   dots=40, boundaries=30, dismissals=5)]
+    mock_db.execute.side_effect = [_result(batting), _result(bowling), _result(splits)]
+
+    matrix = build_player_feature_matrix(mock_db, START, END)
+
+    assert matrix.names == ["A", "B"] and matrix.styles == ["RFM"]
+    a, b = matrix.index["A"], matrix.index["B"]
+    assert matrix.metrics(a, ["batting_average", "batting_strike_rate", "bowling_economy"]) == {
+        "batting_average": 30.0, "batting_strike_rate": 150.0, "bowling_economy": 8.0,
+    }
+    # B never batted and took no wickets: zero-valued, not missing, as before
+    assert matrix.metrics(b, ["batting_strike_rate", "bowling_strike_rate"]) == {
+        "batting_strike_rate": 0.0, "bowling_strike_rate": 0.0,
+    }
+    assert matrix.metrics(a, kind_columns("pace"))["vs_pace_strike_rate"] == 140.0
+    assert set(matrix.metrics(a, kind_columns("spin")).values()) == {None}
+    assert matrix.split_volume(a, ["RFM"]) == {"kind": {"pace": 150, "spin": 10}, "style": {"RFM": 150}}
+
+
+def test_saved_matrices_load_only_on_the_same_stats(tmp_path):
+    fingerprint = {"version": 1, "batting_stats": 5, "bowling_stats": 5, "deliveries": 9}
+    matrix = PlayerFeatureMatrix(["A", "B"], ["x", "y"], np.array([[1.0, np.nan], [2.0, 3.0]]), ["OB"], fingerprint)
+    path = str(tmp_path / "m.npz")
+    matrix.save(path)
+
+    loaded = PlayerFeatureMatrix.load(path, fingerprint)
+    assert loaded.names == ["A", "B"] and loaded.styles == ["OB"] and loaded.index["B"] == 1
+    np.testing.assert_array_equal(loaded.values, matrix.values)
+    assert PlayerFeatureMatrix.load(path, {**fingerprint, "deliveries": 10}) is None
+
+
+def _fingerprint_results(deliveries_version):
+    ids = MagicMock()
+    ids.fetchone.return_value = (5, 5, 9)
+    installed = MagicMock()
+    installed.scalar.return_value = True
+    versions = _result([_Row(table_name="deliveries", version=deliveries_version)])
+    return [ids, installed, versions]
+
+
+def test_stats_fingerprint_changes_on_in_place_corrections(mock_db):
+    # An UPDATE deliveries backfill leaves every MAX(id) alone but bumps the write counter
+    _FINGERPRINT_CACHE.clear()
+    mock_db.execute.side_effect = _fingerprint_results(3) + _fingerprint_results(4)
+    before = stats_fingerprint(mock_db)
+    _FINGERPRINT_CACHE.clear()
+    after = stats_fingerprint(mock_db)
+    _FINGERPRINT_CACHE.clear()
+
+    assert before["deliveries"] == after["deliveries"] == 9
+    assert before["data_versions"] == {"batting_stats": 0, "bowling_stats": 0, "deliveries": 3}
+    assert after != before
+
+
+def _random_matrix(n_players=40, seed=3):
+    rng = random.Random(seed)
+    columns = list(VOLUME_COLUMNS) + list(BATTING_METRICS) + list(BOWLING_METRICS)
+    for kind in ("pace", "spin"):
+        columns += kind_columns(kind) + [f"vs_{kind}:balls"]
+    rows = []
+    for i in range(n_players):
+        bat_matches = rng.randint(5, 40)
+        bowl_matches = rng.choice([0, rng.randint(5, 40)])
+        row = [bat_matches, bat_matches, rng.randint(100, 900), bowl_matches, bowl_matches,
+               bowl_matches * 20, bowl_matches]
+        row += [round(rng.uniform(5, 200), 3) for _ in BATTING_METRICS + BOWLING_METRICS]
+        for _ in ("pace", "spin"):
+            balls = rng.randint(0, 200)
+            row += ([round(rng.uniform(10, 160), 3) for _ in range(4)] if balls >= 30 else [math.nan] * 4) + [balls]
+        rows.append(row)
+    return PlayerFeatureMatrix([f"P{i}" for i in range(n_players)], columns, np.array(rows, dtype=float), [])
+
+
+def _brute_force_distances(vectors):
+    """The per-player loop the endpoints used to run: population z-scores, missing = neutral."""
+    n_features = len(next(iter(vectors.values())))
+    zs = {name: [] for name in vectors}
+    for j in range(n_features):
+        vals = [v[j] for v in vectors.values() if not math.isnan(v[j])]
+        mean = sum(vals) / len(vals) if vals else 0.0
+        std = math.sqrt(sum((x - mean) ** 2 for x in vals) / len(vals)) if vals else 1.0
+        for name, v in vectors.items():
+            zs[name].append(0.0 if math.isnan(v[j]) else (v[j] - mean) / (std or 1.0))
+    return lambda a, b: round(math.sqrt(sum((x - y) ** 2 for x, y in zip(zs[a], zs[b]))), 4)
+
+
+def test_vectorised_search_and_leaderboard_match_the_pairwise_loop(mock_db):
+    matrix = _random_matrix()
+    names = {"legacy_name": "P0", "details_name": "P0"}
+    with patch.object(search, "get_player_feature_matrix", return_value=matrix), \
+            patch.object(search, "get_player_names", return_value=names):
+        result = search.get_player_doppelgangers("P0", mock_db, START, END, min_matches=5, top_n=3, role="batter")
+        board = search.get_doppelganger_leaderboard(
+            mock_db, START, END, min_batting_innings=5, top_n_pairs=4, batter_metric_level="basic"
+        )
+
+    features = list(BATTING_METRICS) + [k for kind in ("pace", "spin") for k in kind_columns(kind)]
+    assert result["feature_space"] == features
+    vectors = {name: [matrix.values[i, matrix.columns.index(f)] for f in features]
+               for i, name in enumerate(matrix.names)}
+    distance = _brute_force_distances(vectors)
+    expected = sorted((distance("P0", name), name) for name in matrix.names if name != "P0")
+    assert [(p["distance"], p["player_name"]) for p in result["most_similar"]] == expected[:3]
+    assert [p["distance"] for p in result["most_dissimilar"]] == [d for d, _ in expected[::-1][:3]]
+
+    batters = board["batters"]
+    basic = {name: vectors[name][:len(BATTING_METRICS)] for name in matrix.names}
+    pair_distance = _brute_force_distances(basic)
+    pairs = sorted(pair_distance(a, b) for i, a in enumerate(matrix.names) for b in matrix.names[i + 1:])
+    assert [p["distance"] for p in batters["most_similar"]] == pairs[:4]
+    assert [p["distance"] for p in batters["most_dissimilar"]] == pairs[::-1][:4]
+    # Radar keys outside the basic feature space (pace/spin) still get percentiles
+    radar_keys = {m["key"] for radars in batters["player_radar_metrics"].values() for m in radars}
+    assert "vs_pace_strike_rate" in radar_keys
@@ -0,0 +1,113 @@
+import random
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from elo_calculator import ELOCalculator
+from elo_replay import EloReplay, load_ratings_before, replay_elos_from, write_elo_ratings
+
+LEAGUE = ["Chennai Super Kings", "Mumbai Indians", "Kings XI Punjab", "Punjab Kings", "Royal Challengers Bangalore"]
+INTERNATIONAL = ["India", "Ireland", "Nepal", "Italy", "Australia"]
+
+
+def _matches(n=600, seed=11):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        pool, match_type = (LEAGUE, "league") if rng.random() < 0.5 else (INTERNATIONAL, "international")
+        team1, team2 = rng.sample(pool, 2)
+        winner = rng.choice([team1, team2, team1, team2, None, "-"])
+        rows.append((f"m{i:04d}", team1, team2, winner, match_type))
+    return rows
+
+
+def test_replay_matches_the_sequential_calculator():
+    rows = _matches()
+    calculator = ELOCalculator()
+    expected = [calculator.update_ratings(t1, t2, winner, match_type)[:2] for _, t1, t2, winner, match_type in rows]
+
+    engine = EloReplay()
+    result = engine.replay(rows)
+
+    assert result.match_ids == [row[0] for row in rows]
+    assert list(zip(result.team1_elo.tolist(), result.team2_elo.tolist())) == expected
+    # Kings XI Punjab / Punjab Kings share one rating
+    assert engine.team_ratings == calculator.team_ratings
+    assert len(EloReplay().replay([])) == 0
+
+
+def test_replay_continues_from_seeded_ratings():
+    rows = _matches()
+    full = EloReplay().replay(rows)
+
+    head = EloReplay()
+    head.replay(rows[:250])
+    tail = EloReplay(ratings=head.team_ratings).replay(rows[250:])
+
+    assert tail.team1_elo.tolist() == full.team1_elo[250:].tolist()
+    assert tail.team2_new.tolist() == full.team2_new[250:].tolist()
+
+
+def test_seeded_ratings_score_results_like_the_replay(mock_db):
+    # "Abandoned" matches neither team: a tie in the replay, so also when seeding from stored ratings
+    rows = [("m1", "India", "Nepal", "Abandoned", "international"),
+            ("m2", "Ireland", "Italy", "Italy", "international")]
+    replay = EloReplay()
+    result = replay.replay(rows)
+    mock_db.execute.return_value.fetchall.return_value = [
+        SimpleNamespace(team=t, opponent=o, team_elo=int(te), opponent_elo=int(oe), winner=row[3])
+        for row, t1e, t2e in zip(rows, result.team1_elo, result.team2_elo)
+        for t, o, te, oe in ((row[1], row[2], t1e, t2e), (row[2], row[1], t2e, t1e))
+    ]
+
+    assert load_ratings_before(mock_db, "2024-01-01") == replay.team_ratings
+
+
+def test_write_back_is_one_update_per_chunk(mock_db):
+    def execute(statement, params=None):
+        sql = str(statement)
+        if "to_regclass" in sql:
+            return SimpleNamespace(scalar=lambda: True)
+        if "UPDATE matches" in sql:
+            # Only "b" had a stale rating in the first chunk
+            changed = [i for i in params["ids"] if i != "a"]
+            return SimpleNamespace(fetchall=lambda: [SimpleNamespace(id=i) for i in changed])
+        if "FULL JOIN (SELECT * FROM team_elo_timeline" in sql:
+            # "a" kept its ratings but had its winner corrected, so its timeline rows are stale too
+            stale = list(params["ids"])
+            return SimpleNamespace(fetchall=lambda: [SimpleNamespace(match_id=i) for i in stale])
+        return SimpleNamespace(rowcount=2)
+
+    mock_db.execute.side_effect = execute
+
+    updated = write_elo_ratings(mock_db, ["a", "b", "c"], [1500, 1510, 1490], [1500, 1490, 1520], chunk_size=2)
+
+    assert updated == 2
+    statements = [str(c.args[0]) for c in mock_db.execute.call_args_list]
+    updates = [c.args for c in mock_db.execute.call_args_list if "UPDATE matches" in str(c.args[0])]
+    assert len(updates) == 2
+    sql, params = str(updates[0][0]), updates[0][1]
+    assert "FROM unnest(" in sql and "IS DISTINCT FROM" in sql and "RETURNING m.id" in sql
+    assert params == {"ids": ["a", "b"], "t1": [1500, 1510], "t2": [1500, 1490]}
+    # The timeline table is checked once per write, not per chunk
+    assert sum("to_regclass" in sql for sql in statements) == 1
+    assert not any("CREATE TABLE" in sql for sql in statements)
+    # Out-of-date timeline rows are re-derived in the same transaction, including those of
+    # "a", whose ratings did not move
+    deletes = [c.args[1] for c in mock_db.execute.call_args_list if "DELETE FROM team_elo_timeline" in str(c.args[0])]
+    assert deletes == [{"ids": ["a", "b"]}, {"ids": ["c"]}]
+    mock_db.commit.assert_called_once()
+
+
+def test_replay_without_a_format_keeps_each_stream_separate(mock_db):
+    streams = {("ODI", "male"): _matches(40, seed=1), ("T20", "male"): _matches(60, seed=2)}
+    mock_db.execute.return_value.fetchall.return_value = [tuple(stream) for stream in streams]
+
+    with patch("elo_replay.stream_matches", side_effect=lambda db, since, fmt, gender: streams[(fmt, gender)]), \
+            patch("elo_replay.write_elo_ratings", return_value=0):
+        engine, stats = replay_elos_from(mock_db, None)
+
+    # The T20 stream was replayed from fresh ratings, untouched by the ODI results before it
+    t20 = EloReplay()
+    t20.replay(streams[("T20", "male")])
+    assert engine.team_ratings == t20.team_ratings
+    assert stats["processed"] == 100
@@ -0,0 +1,85 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from services import elo_timeline
+from services.elo import get_teams_elo_history_service, get_teams_elo_rankings_service
+from services.elo_timeline import canonical_team_key, ensure_elo_timeline, timeline_exists
+
+
+@pytest.fixture(autouse=True)
+def _clear_exists_cache():
+    elo_timeline._EXISTS_CACHE.clear()
+    yield
+    elo_timeline._EXISTS_CACHE.clear()
+
+
+def test_canonical_key_folds_name_variations():
+    assert canonical_team_key("Delhi Daredevils") == canonical_team_key("Delhi Capitals") == "DC"
+    assert canonical_team_key("Kings XI Punjab") == canonical_team_key("PBKS") == "PBKS"
+    assert canonical_team_key("Nepal") == "Nepal"
+
+
+def test_history_reads_the_timeline_by_canonical_key(mock_db):
+    mock_db.execute.return_value.fetchall.return_value = [
+        SimpleNamespace(team_key="DC", elo=1510, date=date(2017, 4, 8), match_id="m1",
+                        opponent="Kings XI Punjab", result="W"),
+        SimpleNamespace(team_key="DC", elo=1526, date=date(2019, 3, 24), match_id="m2",
+                        opponent="Mumbai Indians", result="NR"),
+    ]
+
+    histories = get_teams_elo_history_service(["Delhi Capitals", "Delhi Daredevils"], db=mock_db)
+
+    sql, params = str(mock_db.execute.call_args.args[0]), mock_db.execute.call_args.args[1]
+    assert "FROM team_elo_timeline" in sql and "FROM matches" not in sql
+    assert params["team_keys"] == ["DC"]
+    assert [p["opponent"] for p in histories["Delhi Capitals"]] == ["PBKS", "MI"]
+    assert [p["result"] for p in histories["Delhi Capitals"]] == ["W", "NR"]
+
+
+def test_rankings_take_latest_rating_per_canonical_team(mock_db):
+    mock_db.execute.return_value.fetchall.return_value = [
+        SimpleNamespace(team_name="Punjab Kings", current_elo=1560, latest_date=date(2025, 5, 1),
+                        total_matches=30, wins=18, losses=11, win_percentage=62.07,
+                        match_type="league", latest_competition="Indian Premier League"),
+    ]
+
+    rankings = get_teams_elo_rankings_service(league="Indian Premier League", include_international=False,
+                                              end_date=date(2025, 6, 1), db=mock_db)
+
+    sql, params = str(mock_db.execute.call_args.args[0]), mock_db.execute.call_args.args[1]
+    assert "DISTINCT ON (team_key)" in sql and "t.competition = :league" in sql
+    assert params["end_date"] == date(2025, 6, 1)
+    assert rankings[0]["team_abbreviation"] == "PBKS" and rankings[0]["rank"] == 1
+
+
+def test_history_derives_the_timeline_from_matches_until_the_table_exists(mock_db):
+    mock_db.execute.return_value.scalar.return_value = False
+    mock_db.execute.return_value.fetchall.return_value = []
+
+    get_teams_elo_history_service(["Delhi Capitals"], db=mock_db)
+
+    sql, params = str(mock_db.execute.call_args.args[0]), mock_db.execute.call_args.args[1]
+    assert "FROM matches m" in sql and "FROM team_elo_timeline" not in sql
+    assert params["team_keys"] == ["DC"]
+    assert "Delhi Daredevils" in params["map_names"]
+
+
+def test_only_an_existing_table_is_cached(mock_db):
+    mock_db.execute.return_value.scalar.side_effect = [False, True, False]
+
+    assert not timeline_exists(mock_db)
+    assert timeline_exists(mock_db)
+    assert timeline_exists(mock_db)
+    assert mock_db.execute.call_count == 2
+
+
+def test_ensure_rechecks_under_the_advisory_lock(mock_db):
+    # Another writer created the table while this one waited for the lock
+    mock_db.execute.return_value.scalar.side_effect = [False, True]
+
+    assert ensure_elo_timeline(mock_db) is False
+    statements = [str(c.args[0]) for c in mock_db.execute.call_args_list]
+    assert "pg_advisory_xact_lock" in statements[1]
+    assert not any("CREATE TABLE" in sql for sql in statements)
@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+import enhanced_loadMatches
+from enhanced_loadMatches import (
+    DELIVERY_COPY_COLUMNS,
+    MATCH_COPY_COLUMNS,
+    EnhancedMatchLoader,
+    copy_parsed_matches,
+    parse_match_file,
+)
+
+PLAYER_CACHE = {
+    "Player A": {"batter_type": "RHB", "bowler_type": "RF"},
+    "Player B": {"batter_type": "LHB", "bowler_type": "RM"},
+    "Player C": {"batter_type": "RHB", "bowler_type": "RO"},
+}
+
+
+def _match_json(seed):
+    balls = [
+        {"batter": "Player A", "non_striker": "Player B", "bowler": "Player C", "runs": {"batter": seed % 7, "extras": 0}},
+        {"batter": "Player B", "non_striker": "Player A", "bowler": "New Bowler", "runs": {"batter": 0, "extras": 1},
+         "extras": {"wides": 1}},
+        {"batter": "Player A", "non_striker": "Player B", "bowler": "Player C", "runs": {"batter": 0, "extras": 0},
+         "wickets": [{"kind": "caught", "player_out": "Player A", "fielders": [{"name": "Fielder, Jr"}]}]},
+    ]
+    return {
+        "info": {
+            "dates": ["2024-04-0%d" % (seed % 9 + 1)],
+            "teams": ["Team A", "Team B"],
+            "venue": "Test Stadium",
+            "toss": {"winner": "Team B", "decision": "field"},
+            "outcome": {"winner": "Team A", "by": {"runs": seed}},
+            "event": {"name": "Indian Premier League", "match_number": seed},
+        },
+        "innings": [{"team": "Team A", "overs": [{"over": 0, "deliveries": balls}]}],
+    }
+
+
+@pytest.fixture
+def match_files(tmp_path):
+    paths = []
+    for seed in range(6):
+        path = tmp_path / f"{1000 + seed}.json"
+        path.write_text(json.dumps(_match_json(seed)))
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def loader():
+    with patch("enhanced_loadMatches.get_database_connection", return_value=(MagicMock(), Mock())), \
+         patch("enhanced_loadMatches.PlayerDiscoveryService"):
+        loader = EnhancedMatchLoader(batch_size=4, calculate_elo=True)
+    loader.player_cache = dict(PLAYER_CACHE)
+    return loader
+
+
+def test_parsed_buffers_match_the_orm_delivery_path(loader, match_files):
+    parsed = parse_match_file(str(match_files[0]), PLAYER_CACHE)
+    columns = parsed["deliveries"]
+
+    rows = [dict(zip(DELIVERY_COPY_COLUMNS, values)) for values in zip(*columns.values())]
+    data = _match_json(0)
+    for ball_num, (row, ball) in enumerate(zip(rows, data["innings"][0]["overs"][0]["deliveries"]), 1):
+        context = {"match_id": "1000", "innings": 1, "over": 0, "ball": ball_num,
+                   "batting_team": "Team A", "bowling_team": "Team B"}
+        orm = loader.create_enhanced_delivery(ball, context)
+        assert row == {column: getattr(orm, column) for column in DELIVERY_COPY_COLUMNS}
+
+    assert columns["crease_combo"] == ["lhb_rhb"] * 3
+    assert columns["ball_direction"] == ["intoBatter", "unknown", "intoBatter"]
+    assert parsed["match"]["bat_first"] == "Team A" and parsed["match"]["won_batting_first"] is True
+    assert "New Bowler" in parsed["players"]
+
+
+def test_worker_pool_yields_files_in_order(loader, match_files, tmp_path):
+    broken = tmp_path / "broken.json"
+    broken.write_text("{")
+    files = match_files[:3] + [broken] + match_files[3:]
+
+    loader.workers = 2
+    pooled = list(loader.iter_parsed_files(files))
+    loader.workers = 1
+    serial = list(loader.iter_parsed_files(files))
+
+    assert [item["file"] for item in pooled] == [str(path) for path in files]
+    assert "error" in pooled[3] and "error" in serial[3]
+    for got, want in zip(pooled, serial):
+        assert got.get("deliveries") == want.get("deliveries")
+        assert got.get("match") == want.get("match")
+
+
+def test_copy_writes_matches_before_deliveries(match_files):
+    parsed = [parse_match_file(str(path), PLAYER_CACHE) for path in match_files[1:3]]
+    cursor = MagicMock()
+    copied = []
+    cursor.copy_expert.side_effect = lambda sql, buffer: copied.append((sql, buffer.getvalue()))
+
+    assert copy_parsed_matches(cursor, parsed) == 6
+
+    (match_sql, match_csv), (delivery_sql, delivery_csv) = copied
+    assert match_sql.startswith('COPY matches ("id", "date"') and "FORMAT csv" in match_sql
+    assert delivery_sql.startswith('COPY deliveries ("match_id", "innings", "over"')
+    match_rows = list(csv.reader(io.StringIO(match_csv)))
+    assert [row[:2] for row in match_rows] == [["1001", "2024-04-02"], ["1002", "2024-04-03"]]
+    assert json.loads(match_rows[0][MATCH_COPY_COLUMNS.index("outcome")])["by"] == {"runs": 1}
+    delivery_rows = list(csv.reader(io.StringIO(delivery_csv)))
+    assert len(delivery_rows) == 6
+    # NULLs are unquoted empty fields; the comma in a name stays inside one field
+    assert delivery_rows[0][DELIVERY_COPY_COLUMNS.index("wicket_type")] == ""
+    assert delivery_rows[2][DELIVERY_COPY_COLUMNS.index("fielder")] == "Fielder, Jr"
+
+
+def test_pipeline_copies_in_batches_and_creates_new_players_once(loader, match_files):
+    loader.player_discovery.create_placeholder_players.return_value = 1
+    stats = {"processed": 0, "errors": 0}
+
+    with patch.object(enhanced_loadMatches, "copy_parsed_matches") as copy:
+        errors = loader.load_files_pipelined(match_files, stats)
+
+    assert errors == []
+    assert [len(call.args[1]) for call in copy.call_args_list] == [4, 2]
+    assert stats == {"processed": 6, "errors": 0, "new_players_created": 1}
+    created = loader.player_discovery.create_placeholder_players.call_args_list
+    assert len(created) == 1 and list(created[0].args[0]) == ["New Bowler"]
+    assert loader.newly_loaded_matches == [path.stem for path in match_files]
+    assert len(loader.newly_loaded_groups) == 6
+
+
+def test_rejected_batch_falls_back_to_loading_files_one_by_one(loader, match_files):
+    raw = loader.engine.raw_connection.return_value
+    stats = {"processed": 0, "errors": 0}
+
+    with patch.object(enhanced_loadMatches, "copy_parsed_matches", side_effect=RuntimeError("bad row")), \
+         patch.object(loader, "process_matches_batch", return_value=[(str(match_files[1]), "bad row")]) as fallback:
+        errors = loader.load_files_pipelined(match_files[:3], stats)
+
+    raw.rollback.assert_called_once()
+    assert [path.name for path in fallback.call_args.args[0]] == [path.name for path in match_files[:3]]
+    assert errors == [(str(match_files[1]), "bad row")]
+    assert stats["processed"] == 2 and stats["errors"] == 1
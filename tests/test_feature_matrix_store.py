@@ -0,0 +1,56 @@
+import numpy as np
+
+from services.cache import get_cache
+from services.feature_matrix_store import (
+    cached_matrix,
+    load_arrays,
+    prune_stale_matrices,
+    save_arrays,
+    zscore_columns,
+)
+
+
+class _Matrix:
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+
+    def save(self, path):
+        save_arrays(path, {"values": np.arange(3.0)}, {"fingerprint": self.fingerprint})
+
+
+def test_prune_keeps_only_matrices_built_on_the_given_fingerprint(tmp_path):
+    save_arrays(str(tmp_path / "current.npz"), {"values": np.ones(2)}, {"fingerprint": {"v": 2}})
+    save_arrays(str(tmp_path / "old.npz"), {"values": np.ones(2)}, {"fingerprint": {"v": 1}})
+    (tmp_path / "broken.npz").write_bytes(b"not a zip")
+
+    assert prune_stale_matrices(str(tmp_path), {"v": 2}) == 2
+    arrays, meta = load_arrays(str(tmp_path / "current.npz"), {"v": 2})
+    np.testing.assert_array_equal(arrays["values"], np.ones(2))
+    assert load_arrays(str(tmp_path / "current.npz"), {"v": 3}) is None
+
+
+def test_cached_matrix_loads_before_building_and_persists_builds(tmp_path):
+    cache = get_cache("test_feature_matrix_store", ttl_seconds=60, max_entries=4)
+    cache.clear()
+    path = str(tmp_path / "m.npz")
+    built = []
+
+    def _build():
+        built.append(1)
+        return _Matrix({"v": 1})
+
+    first = cached_matrix(cache, ("k", 1), path, lambda: None, _build)
+    assert built == [1] and load_arrays(path, {"v": 1}) is not None
+    assert cached_matrix(cache, ("k", 1), path, lambda: None, _build) is first
+
+    cache.clear()
+    loaded = _Matrix({"v": 1})
+    assert cached_matrix(cache, ("k", 1), path, lambda: loaded, _build) is loaded
+    assert built == [1]
+
+
+def test_zscore_columns_treats_missing_values_as_neutral():
+    block = np.array([[1.0, np.nan], [3.0, 5.0], [5.0, 5.0]])
+    z = zscore_columns(block)
+    np.testing.assert_allclose(z[:, 0], [-1.224745, 0.0, 1.224745], atol=1e-6)
+    np.testing.assert_array_equal(z[:, 1], [0.0, 0.0, 0.0])
@@ -0,0 +1,125 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from ml import config
+from ml.feature_engineering import FeatureEngineer, _prepare_delivery_frame
+import ml.feature_store as feature_store
+from ml.feature_store import LEAGUE_SCOPE, VENUE_SCOPE, FeatureStore, delivery_fingerprint
+
+
+def _delivery(match_id, match_date, ground, bat_team, bowl_team, batter, score, **extra):
+    row = {
+        "match_id": match_id, "match_date": match_date, "ground": ground, "competition": "IPL",
+        "batting_team": bat_team, "bowling_team": bowl_team, "batter": batter,
+        "bowl_kind": "spin bowler", "bowl_style": "OB", "bat_hand": "RHB", "crease_combo": "RHB_RHB",
+        "wagon_zone": 1, "line": None, "length": "GOOD_LENGTH", "over": 2, "score": score,
+        "noball": 0, "wide": 0, "byes": 0, "legbyes": 0, "out": "false", "control": 1,
+    }
+    row.update(extra)
+    return row
+
+
+def _frame():
+    return _prepare_delivery_frame(pd.DataFrame([
+        _delivery("m1", "2024-04-01", "Eden", "KKR", "MI", "A", 4),
+        _delivery("m1", "2024-04-01", "Eden", "KKR", "MI", "B", 0, bat_hand="LHB", control=0),
+        _delivery("m2", "2024-04-05", "Eden", "MI", "KKR", "C", 6, bowl_kind="pace bowler"),
+        _delivery("m3", "2024-04-09", "Eden", "KKR", "CSK", "A", 1, out="true"),
+        _delivery("m4", "2024-04-09", "Chepauk", "KKR", "CSK", "D", 2, competition="BBL"),
+    ]))
+
+
+@pytest.fixture
+def engineer(mock_db):
+    dd = _frame()
+    fe = FeatureEngineer(mock_db)
+    fe._feature_store = FeatureStore.build(dd, dd[dd["competition"] == "IPL"])
+    return fe
+
+
+def test_as_of_reads_only_deliveries_strictly_before_the_date(engineer):
+    store = engineer._feature_store
+    assert store.as_of("venue_pace_spin", "Eden", "2024-04-01").empty
+
+    spin = store.as_of("venue_pace_spin", "Eden", "2024-04-09").set_index("bowl_group").loc["spin"]
+    assert (spin["balls"], spin["runs"], spin["matches"], spin["dots"]) == (2, 4, 1, 1)
+
+    spin = store.as_of("venue_pace_spin", "Eden", "2025-01-01").set_index("bowl_group").loc["spin"]
+    assert (spin["balls"], spin["matches"], spin["wickets"]) == (3, 2, 1)
+
+
+def test_features_match_the_direct_aggregation(engineer):
+    venue = engineer._compute_venue_pace_spin_features("Eden", "2024-04-06")
+    assert venue["venue_spin_economy"] == pytest.approx(12.0)
+    assert venue["venue_pace_boundary_pct"] == 1.0
+
+    granular = engineer._compute_team_venue_granular_features("KKR", "Eden", "2024-04-06")
+    assert granular == {"control_pct_at_venue": 0.5, "boundary_pct_at_venue": 0.5, "dot_pct_at_venue": 0.5}
+
+    # League scope excludes the BBL delivery; batter A is counted once across matches
+    hands = engineer._compute_team_hand_combo_features("KKR", "2025-01-01")
+    assert hands["rhb_count"] == 1.0 and hands["lhb_count"] == 1.0
+    attack = engineer._compute_team_bowling_attack_features("CSK", "2025-01-01")
+    assert attack["spin_overs_pct"] == 1.0
+
+    assert engineer._compute_team_hand_combo_features("KKR", "2024-04-01") == {
+        "lhb_count": None, "rhb_count": None, "crease_combo_diversity": None,
+    }
+
+
+def test_persisted_scopes_are_reused_only_for_the_same_fingerprint(tmp_path):
+    dd = _frame()
+    fingerprint = {"version": 1, "rows": 5, "max_match_date": "2024-04-09"}
+    FeatureStore.build(dd).save(tmp_path, ["IPL"], fingerprint)
+
+    loaded = FeatureStore.load(tmp_path, ["IPL"], fingerprint)
+    assert loaded.scopes == {VENUE_SCOPE, LEAGUE_SCOPE}
+    assert loaded.as_of("team_bowling_attack", "CSK", "2025-01-01")["balls"].sum() == 2
+
+    # Another league scope, or newer deliveries, force a rebuild of the affected scopes
+    assert FeatureStore.load(tmp_path, ["BBL"], fingerprint).scopes == {VENUE_SCOPE}
+    assert FeatureStore.load(tmp_path, ["IPL"], {**fingerprint, "rows": 6}).scopes == set()
+
+
+def test_fingerprint_changes_on_in_place_corrections(mock_db, monkeypatch):
+    # Same row count, latest date and max id: only the write counter tells the versions apart
+    mock_db.execute.return_value.fetchone.return_value = (5, "2024-04-09", 42)
+    versions = iter([3, 4])
+    monkeypatch.setattr(
+        feature_store, "data_versions", lambda db, tables: {"delivery_details": next(versions)}
+    )
+
+    before = delivery_fingerprint(mock_db)
+    after = delivery_fingerprint(mock_db)
+    assert before["max_id"] == 42 and before["data_version"] == 3
+    assert before != after
+
+
+def test_fingerprint_and_preload_work_on_the_local_sqlite_cache(tmp_path, monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    deliveries = pd.DataFrame([
+        _delivery("m1", "2024-04-01", "Eden", "KKR", "MI", "A", 4),
+        _delivery("m2", "2024-04-05", "Eden", "MI", "KKR", "C", 6, bowl_kind="pace bowler"),
+        _delivery("m3", "2024-04-09", "Chepauk", "KKR", "CSK", "D", 2, competition="BBL"),
+    ])
+    deliveries.insert(0, "id", range(1, len(deliveries) + 1))
+    deliveries.to_sql("delivery_details", engine, index=False)
+    pd.DataFrame([{"key": "last_refresh_timestamp", "value": "2024-04-10T00:00:00"}]).to_sql(
+        "_cache_metadata", engine, index=False
+    )
+    monkeypatch.setattr(config, "FEATURE_STORE_DIR", tmp_path)
+
+    with Session(engine) as session:
+        fingerprint = delivery_fingerprint(session)
+        assert fingerprint["rows"] == 3 and fingerprint["max_id"] == 3
+        assert fingerprint["local_cache_refresh"] == "2024-04-10T00:00:00"
+        assert "data_version" not in fingerprint
+
+        fe = FeatureEngineer(session)
+        fe._league_competitions = ["IPL"]
+        fe._preload_feature_store()
+        assert fe._feature_store.scopes == {VENUE_SCOPE, LEAGUE_SCOPE}
+        assert fe._feature_store.as_of("venue_pace_spin", "Eden", "2025-01-01")["balls"].sum() == 2
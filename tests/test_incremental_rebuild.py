@@ -0,0 +1,223 @@
+import random
+import re
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from batch_processor import PrecomputationPipeline
+from models import BattingStats, BowlingStats
+from precomputed_models import PrecomputePartition
+from precomputed_partials import INCREMENTAL_SPECS
+
+
+JAN, FEB, MAR, APR, MAY = (date(2024, month, 1) for month in range(1, 6))
+
+
+def _fingerprints(by_month):
+    return {month: {"match_count": 3, "fingerprint": fp} for month, fp in by_month.items()}
+
+
+def _pipeline_with_manifest(mock_db, recorded):
+    """A pipeline whose precompute_partitions manifest holds ``recorded`` (month -> fingerprint)."""
+    manifest = MagicMock()
+    manifest.__iter__.return_value = iter([
+        SimpleNamespace(partition_month=month, fingerprint=fp) for month, fp in recorded.items()
+    ])
+    mock_db.query.return_value.filter.return_value = manifest
+    mock_db.execute.return_value.rowcount = 0
+    pipeline = PrecomputationPipeline()
+    pipeline.session = mock_db
+    return pipeline, manifest
+
+
+def _executed(mock_db):
+    return [(str(call.args[0]), call.args[1] if len(call.args) > 1 else None)
+            for call in mock_db.execute.call_args_list]
+
+
+def test_incremental_refresh_recomputes_dirty_and_drops_vanished_partitions(mock_db):
+    pipeline, manifest = _pipeline_with_manifest(mock_db, {JAN: "a", FEB: "b", MAR: "c-old", APR: "d"})
+    current = _fingerprints({JAN: "a", FEB: "b", MAR: "c", MAY: "e"})
+
+    result = pipeline._incremental_refresh("team_phase_stats", date(2024, 6, 1), current, forced_from=None)
+
+    assert result["partitions_recomputed"] == [MAR.isoformat(), MAY.isoformat()]
+    assert result["partitions_removed"] == [APR.isoformat()]
+
+    statements = _executed(mock_db)
+    delete_sql, delete_params = statements[0]
+    assert delete_sql.startswith("DELETE FROM team_phase_stats_partials")
+    assert delete_params == {"months": [MAR, MAY, APR]}
+    manifest.delete.assert_called_once()
+
+    fill_params = statements[1][1]
+    assert fill_params["months"] == [MAR, MAY]
+    assert fill_params["range_start"] == MAR
+    assert fill_params["range_end"] == date(2024, 6, 1)
+
+    model, rows = mock_db.bulk_insert_mappings.call_args.args
+    assert model is PrecomputePartition
+    assert [(row["partition_month"], row["fingerprint"]) for row in rows] == [(MAR, "c"), (MAY, "e")]
+
+    # The published table is always re-derived, even from unchanged partials
+    assert statements[-2][0] == "DELETE FROM team_phase_stats"
+    assert "INSERT INTO team_phase_stats" in statements[-1][0]
+
+
+def test_incremental_refresh_forces_partitions_from_recompute_date(mock_db):
+    pipeline, _ = _pipeline_with_manifest(mock_db, {JAN: "a", FEB: "b", MAR: "c"})
+    current = _fingerprints({JAN: "a", FEB: "b", MAR: "c"})
+
+    result = pipeline._incremental_refresh("venue_resources", date(2024, 4, 1), current, forced_from=FEB)
+
+    assert result["partitions_recomputed"] == [FEB.isoformat(), MAR.isoformat()]
+    assert result["partitions_removed"] == []
+    assert _executed(mock_db)[1][1]["months"] == [FEB, MAR]
+
+
+def test_incremental_refresh_skips_fill_when_nothing_changed(mock_db):
+    pipeline, manifest = _pipeline_with_manifest(mock_db, {JAN: "a", FEB: "b"})
+    current = _fingerprints({JAN: "a", FEB: "b"})
+
+    result = pipeline._incremental_refresh("wpa_outcomes", date(2024, 3, 1), current, forced_from=None)
+
+    assert result["partitions_recomputed"] == []
+    statements = [sql for sql, _ in _executed(mock_db)]
+    manifest.delete.assert_not_called()
+    mock_db.bulk_insert_mappings.assert_not_called()
+    # Only the publish swap runs: no partials are deleted or refilled
+    assert len(statements) == 2
+    assert statements[0] == "DELETE FROM wpa_outcomes"
+    assert "FROM wpa_outcomes_partials" in statements[1]
+
+
+# --- Partition-scoped fills against a real SQL engine -------------------------------------
+
+THROUGH_DATE = date(2024, 4, 1)
+MONTHS = [JAN, FEB, MAR]
+
+
+def _create_table(conn, table, skip=()):
+    columns = ", ".join(
+        f"{column.name} {column.type}" for column in table.columns
+        if not column.primary_key and column.name not in skip
+    )
+    conn.execute(f"CREATE TABLE {table.name} ({columns})")
+
+
+def _seed(conn):
+    """Three months of small T20 matches across two venues, with both innings ball by ball."""
+    rng = random.Random(7)
+    conn.execute("CREATE TABLE matches (id VARCHAR, date DATE, venue VARCHAR, competition VARCHAR, winner VARCHAR)")
+    conn.execute("""
+        CREATE TABLE deliveries (match_id VARCHAR, innings INTEGER, over INTEGER, ball INTEGER,
+                                 runs_off_bat INTEGER, extras INTEGER, wicket_type VARCHAR,
+                                 batting_team VARCHAR)
+    """)
+    _create_table(conn, BattingStats.__table__)
+    _create_table(conn, BowlingStats.__table__)
+
+    matches, deliveries, batting, bowling = [], [], [], []
+    for n in range(18):
+        match_id = f"m{n}"
+        teams = ("X", "Y") if n % 4 < 2 else ("Y", "Z")
+        matches.append([match_id, date(2024, 1 + n % 3, 1 + n),
+                        "Ground A" if n % 2 else "Ground B", teams[n % 2]])
+        for innings, team in enumerate(teams, start=1):
+            for over in range(20):
+                for ball in range(1, 7):
+                    wicket = "bowled" if rng.random() < 0.04 else None
+                    deliveries.append([match_id, innings, over, ball, rng.choice([0, 0, 1, 1, 2, 4, 6]),
+                                       int(rng.random() < 0.05), wicket, team])
+            for slot in range(3):
+                phase = [rng.randint(0, 30) for _ in range(12)]
+                batting.append([match_id, innings, f"{team}-bat{slot}", team,
+                                sum(phase[0:12:4]), sum(phase[1:12:4]) + 1, 2, 1, 5,
+                                *phase[0:4], *phase[4:8], *phase[8:12]])
+                overs = [float(rng.randint(0, 2)) for _ in range(3)]
+                bowling.append([match_id, innings, f"{team}-bowl{slot}", team, sum(overs) or 1.0, 27,
+                                rng.randint(0, 3), overs[0], rng.randint(0, 1), overs[1],
+                                rng.randint(0, 1), overs[2], rng.randint(0, 1)])
+
+    conn.executemany("INSERT INTO matches VALUES (?, ?, ?, 'IPL', ?)", matches)
+    conn.executemany("INSERT INTO deliveries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", deliveries)
+    conn.executemany(
+        """INSERT INTO batting_stats (match_id, innings, striker, batting_team,
+               runs, balls_faced, fours, sixes, dots, wickets,
+               pp_runs, pp_balls, pp_wickets, pp_dots, pp_boundaries,
+               middle_runs, middle_balls, middle_wickets, middle_dots, middle_boundaries,
+               death_runs, death_balls, death_wickets, death_dots, death_boundaries)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?, 0, ?, ?, ?, ?, 0, ?, ?, ?, ?, 0, ?, ?)""",
+        batting,
+    )
+    conn.executemany(
+        """INSERT INTO bowling_stats (match_id, innings, bowler, bowling_team,
+               overs, runs_conceded, wickets, dots, economy,
+               pp_overs, pp_runs, pp_wickets, pp_dots, pp_economy,
+               middle_overs, middle_runs, middle_wickets, middle_dots, middle_economy,
+               death_overs, death_runs, death_wickets, death_dots, death_economy)
+           VALUES (?, ?, ?, ?, ?, ?, ?, 4, 7.5, ?, 8, ?, 3, 8.0, ?, 7, ?, 2, 7.0, ?, 12, ?, 1, 12.0)""",
+        bowling,
+    )
+
+    for spec in INCREMENTAL_SPECS.values():
+        _create_table(conn, spec["partials_model"].__table__)
+
+
+def _run(conn, sql, params):
+    # Postgres-style :name binds -> DuckDB $name binds (leaving ::casts alone).
+    sql = re.sub(r"(?<!:):(\w+)", r"$\1", sql)
+    used = set(re.findall(r"\$(\w+)", sql))
+    conn.execute(sql, {key: value for key, value in params.items() if key in used})
+
+
+def _fill(conn, spec, months):
+    params = {
+        "through_date": THROUGH_DATE,
+        "months": months,
+        "range_start": months[0],
+        "range_end": PrecomputationPipeline._next_month(months[-1]),
+    }
+    for fill_sql in spec["fill"]:
+        _run(conn, fill_sql, params)
+
+
+def _partial_rows(conn, table_name):
+    return sorted(
+        conn.execute(f"SELECT * FROM {table_name}").fetchall(),
+        key=lambda row: tuple((value is None, str(value)) for value in row),
+    )
+
+
+@pytest.fixture(scope="module")
+def seeded_conn():
+    duckdb = pytest.importorskip("duckdb")
+    conn = duckdb.connect(":memory:")
+    _seed(conn)
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("table_name", sorted(INCREMENTAL_SPECS))
+def test_partition_scoped_fills_match_full_fill(seeded_conn, table_name):
+    conn = seeded_conn
+    spec = INCREMENTAL_SPECS[table_name]
+    partials_table = spec["partials_model"].__tablename__
+
+    _fill(conn, spec, MONTHS)
+    full = _partial_rows(conn, partials_table)
+    assert full, f"seed data produced no {partials_table} rows"
+    assert {row[0] for row in full} == set(MONTHS)
+
+    # Rebuild every partition on its own, the way dirty partitions are refreshed
+    conn.execute(f"DELETE FROM {partials_table}")
+    for month in MONTHS:
+        _fill(conn, spec, [month])
+    assert _partial_rows(conn, partials_table) == full
+
+    # Refreshing one dirty partition in place leaves the others untouched
+    conn.execute(f"DELETE FROM {partials_table} WHERE partition_month = ?", [FEB])
+    _fill(conn, spec, [FEB])
+    assert _partial_rows(conn, partials_table) == full
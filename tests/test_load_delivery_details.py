@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from format_config import get_format
+from load_delivery_details_full import OverCapTracker, split_csv_ranges, transform_chunk
+
+
+def _write_csv(path, rows):
+    lines = ["p_match,inns,over,ball,wagon_x,wagon_zone,bat"]
+    lines += [f"{i},1,{i % 20 + 1},{i % 6 + 1},{'' if i % 3 else '12.0'},4.0,Player {i}" for i in range(rows)]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_ranges_cover_every_row_once_and_split_on_newlines(tmp_path):
+    path = tmp_path / "bbb.csv"
+    _write_csv(path, 1000)
+    data = path.read_bytes()
+
+    columns, ranges = split_csv_ranges(str(path), 7)
+
+    assert columns == ["p_match", "inns", "over", "ball", "wagon_x", "wagon_zone", "bat"]
+    assert len(ranges) == 7
+    assert ranges[0][0] == data.index(b"\n") + 1 and ranges[-1][1] == len(data)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert all(data[end - 1:end] == b"\n" for _, end in ranges)
+    assert split_csv_ranges(str(path), 5000)[1][-1][1] == len(data)
+
+
+def test_transform_writes_integer_columns_without_decimals():
+    spec = get_format("T20", "male")
+    tracker = OverCapTracker(20, spec.label, spec.format)
+    chunk = pd.DataFrame({
+        "p_match": [101, 101], "inns": [1, 1], "over": [1, 20], "ball": [1, 2],
+        "wagon_x": [None, 322.0], "wagon_zone": ["-", "4.0"], "bat": ["A", "-"],
+    })
+
+    df = transform_chunk(chunk, spec, tracker, {"inns", "over", "ball", "wagon_x", "wagon_zone"})
+
+    rows = df[["p_match", "over", "wagon_x", "wagon_zone", "bat", "format"]].to_csv(
+        index=False, header=False, na_rep="").splitlines()
+    assert rows == ["101,0,,,A,T20", "101,19,322,4,,T20"]
+    assert tracker.max_over_seen == 19
+
+
+def test_over_cap_breaches_abort_a_mismatched_file():
+    spec = get_format("T20", "male")
+    tracker = OverCapTracker(19, spec.label, spec.format)
+    chunk = pd.DataFrame({"p_match": ["1"] * 4, "inns": [1] * 4, "over": [45, 48, 50, 50], "ball": [1, 2, 3, 4]})
+    with pytest.raises(SystemExit):
+        transform_chunk(chunk, spec, tracker, set())
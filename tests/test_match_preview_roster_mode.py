@@ -10,6 +10,7 @@ def _load_match_preview_module():
     fake_rankings = types.ModuleType("services.global_t20_rankings")
     fake_rankings.get_batting_rankings_service = lambda *args, **kwargs: {"rankings": []}
     fake_rankings.get_bowling_rankings_service = lambda *args, **kwargs: {"rankings": []}
+    fake_rankings.find_ranked_players = lambda *args, **kwargs: {}
     sys.modules["services.global_t20_rankings"] = fake_rankings
 
     import services.match_preview as match_preview_module
@@ -0,0 +1,77 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression, LogisticRegression
+
+from ml.model_registry import ModelRegistry
+from ml.predict import score_fixtures
+
+FEATURES = ["elo_delta", "venue_avg_1st_innings_score"]
+
+
+def _write_version(league_dir, version, offset=0.0):
+    rng = np.random.default_rng(7)
+    X = pd.DataFrame(rng.normal(size=(40, 2)), columns=FEATURES)
+    y = (X["elo_delta"] > 0).astype(int)
+    league_dir.mkdir(parents=True, exist_ok=True)
+    joblib.dump({"model": LogisticRegression().fit(X, y), "feature_columns": FEATURES},
+                league_dir / f"match_winner_{version}.joblib")
+    for name in ("score_1st_innings", "score_2nd_innings"):
+        reg = LinearRegression().fit(X, 160 + 10 * X["venue_avg_1st_innings_score"] + offset)
+        joblib.dump({"model": reg, "feature_columns": FEATURES}, league_dir / f"{name}_{version}.joblib")
+    with open(league_dir / f"training_metadata_{version}.json", "w") as f:
+        json.dump({"promotion_gates": {"passes": 4, "gates": [1, 2, 3, 4, 5]}}, f)
+
+
+def test_registry_keeps_models_resident_and_swaps_in_new_versions(tmp_path):
+    league_dir = tmp_path / "ipl"
+    _write_version(league_dir, "v20250101_000000")
+    registry = ModelRegistry(model_dir=tmp_path, recheck_seconds=0)
+
+    assert registry.preload() == ["ipl/v20250101_000000"]
+    first = registry.get_dir(league_dir)
+    assert registry.get_dir(league_dir) is first
+
+    # A metadata file without its artifacts is not a promoted version yet
+    (league_dir / "training_metadata_v20250201_000000.json").write_text("{}")
+    assert registry.get_dir(league_dir) is first
+
+    _write_version(league_dir, "v20250201_000000", offset=5.0)
+    assert registry.get_dir(league_dir)["version"] == "v20250201_000000"
+    assert first["version"] == "v20250101_000000"
+    assert registry.get_dir(tmp_path / "missing") is None
+
+
+def test_registry_rechecks_only_after_the_interval(tmp_path):
+    league_dir = tmp_path / "bbl"
+    _write_version(league_dir, "v20250101_000000")
+    registry = ModelRegistry(model_dir=tmp_path, recheck_seconds=3600)
+    registry.get_dir(league_dir)
+
+    _write_version(league_dir, "v20250201_000000")
+    assert registry.get_dir(league_dir)["version"] == "v20250101_000000"
+
+
+def test_batch_scoring_matches_one_fixture_at_a_time(tmp_path):
+    _write_version(tmp_path, "v1")
+    models = ModelRegistry(model_dir=tmp_path).get_dir(tmp_path)
+    rows = [
+        {"elo_delta": 1.2, "venue_avg_1st_innings_score": 0.3},
+        {"elo_delta": -0.8, "venue_avg_1st_innings_score": None},
+        {"elo_delta": 0.1},
+    ]
+
+    batch = score_fixtures(models, rows)
+    singles = [score_fixtures(models, [row])[0] for row in rows]
+
+    assert len(batch) == 3
+    for got, want in zip(batch, singles):
+        assert got["team1_win_prob"] == pytest.approx(want["team1_win_prob"])
+        assert got["team1_win_prob"] + got["team2_win_prob"] == pytest.approx(1.0)
+        assert got["predicted_1st"] == pytest.approx(want["predicted_1st"])
+        assert list(got["X_winner"].columns) == FEATURES
+    assert batch[0]["team1_win_prob"] > 0.5 > batch[1]["team1_win_prob"]
+    assert score_fixtures(models, []) == []
@@ -0,0 +1,128 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from services import player_aliases
+from services.player_aliases import (
+    AliasIndex,
+    get_alias_index,
+    get_player_names,
+    resolve_player_names_bulk,
+    resolve_to_legacy_name,
+)
+
+
+class _Result:
+    def __init__(self, value=None, rows=()):
+        self._value = value
+        self._rows = list(rows)
+
+    def scalar(self):
+        return self._value
+
+    def fetchall(self):
+        return self._rows
+
+
+def _alias_db(version_box, pairs):
+    """Session stub serving the version table, player_aliases and player_alias_map."""
+    db = MagicMock()
+
+    def execute(statement, params=None):
+        sql = str(statement)
+        if "to_regclass" in sql:
+            return _Result(True)
+        if "player_alias_map_version" in sql:
+            return _Result(version_box[0])
+        if "FROM player_aliases" in sql:
+            return _Result(rows=pairs)
+        if "FROM player_alias_map" in sql:
+            return _Result(rows=[(alias.lower(), alias) for _, alias in pairs])
+        raise AssertionError(sql)
+
+    db.execute.side_effect = execute
+    return db
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index(monkeypatch):
+    monkeypatch.setattr(player_aliases, "ALIAS_INDEX_RECHECK_SECONDS", 0)
+    player_aliases.invalidate_alias_index()
+    yield
+    player_aliases.invalidate_alias_index()
+
+
+def test_alias_index_lookups_are_case_insensitive_and_deterministic():
+    index = AliasIndex(
+        [("V Kohli", "Virat Kohli"), ("A Shukla", "Ayush Shukla"), ("A Shukla", "Arpit Shukla")],
+        [("v kohli", "Virat Kohli"), ("virat kohli", "Virat Kohli")],
+    )
+    assert index.by_details_name("virat KOHLI") == ("V Kohli", "Virat Kohli")
+    assert index.by_legacy_name("a shukla") == ("A Shukla", "Arpit Shukla")
+    assert index.canonical_name("V KOHLI") == "Virat Kohli"
+    assert index.canonical_name("A Shukla") == "A Shukla"
+
+
+def test_resolvers_use_index_and_reload_on_version_bump():
+    version = [1]
+    pairs = [("V Kohli", "Virat Kohli")]
+    db = _alias_db(version, pairs)
+
+    assert resolve_to_legacy_name("Virat Kohli", db) == "V Kohli"
+    assert get_player_names("V Kohli", db) == {"legacy_name": "V Kohli", "details_name": "Virat Kohli"}
+    assert get_player_names("Unknown", db) == {"legacy_name": "Unknown", "details_name": "Unknown"}
+    first = get_alias_index(db)
+
+    # Same version: the index is reused, player_aliases is not read again
+    assert get_alias_index(db) is first
+
+    pairs.append(("RG Sharma", "Rohit Sharma"))
+    version[0] = 2
+    assert resolve_to_legacy_name("Rohit Sharma", db) == "RG Sharma"
+    assert get_alias_index(db) is not first
+
+
+def test_bulk_resolution_from_index_is_one_load():
+    db = _alias_db([1], [("V Kohli", "Virat Kohli"), ("RG Sharma", "Rohit Sharma")])
+
+    resolved = resolve_player_names_bulk(["Virat Kohli", "RG Sharma", "Unknown", "", "Virat Kohli"], db)
+
+    assert list(resolved) == ["Virat Kohli", "RG Sharma", "Unknown"]
+    assert resolved["Virat Kohli"] == {
+        "legacy_name": "V Kohli", "details_name": "Virat Kohli", "canonical_name": "Virat Kohli",
+    }
+    assert resolved["RG Sharma"]["details_name"] == "Rohit Sharma"
+    assert resolved["Unknown"] == {"legacy_name": "Unknown", "details_name": "Unknown", "canonical_name": "Unknown"}
+    assert resolve_player_names_bulk([], db) == {}
+
+
+def test_bulk_resolution_can_match_close_spellings():
+    db = _alias_db([1], [("V Kohli", "Virat Kohli"), ("RG Sharma", "Rohit Sharma")])
+
+    resolved = resolve_player_names_bulk(["Virat  Kohlii", "Rohit Sharma", "Someone Else"], db, fuzzy_cutoff=0.9)
+
+    assert resolved["Virat  Kohlii"] == {
+        "legacy_name": "V Kohli", "details_name": "Virat Kohli", "canonical_name": "Virat Kohli",
+    }
+    assert resolved["Rohit Sharma"]["legacy_name"] == "RG Sharma"
+    assert resolved["Someone Else"]["legacy_name"] == "Someone Else"
+    # Exact matching only unless asked
+    assert resolve_player_names_bulk(["Virat  Kohlii"], db)["Virat  Kohlii"]["legacy_name"] == "Virat  Kohlii"
+
+
+def test_bulk_resolution_falls_back_to_a_single_query(monkeypatch):
+    monkeypatch.setattr(player_aliases, "get_alias_index", lambda db: None)
+    db = MagicMock()
+    db.execute.return_value = _Result(rows=[
+        MagicMock(player_name="V Kohli", alias_name="Virat Kohli", name_key=None, canonical_name=None),
+        MagicMock(player_name=None, alias_name=None, name_key="v kohli", canonical_name="Virat Kohli"),
+    ])
+
+    resolved = resolve_player_names_bulk(["V Kohli", "Someone"], db)
+
+    assert db.execute.call_count == 1
+    assert db.execute.call_args.args[1] == {"keys": ["v kohli", "someone"]}
+    assert resolved["V Kohli"] == {
+        "legacy_name": "V Kohli", "details_name": "Virat Kohli", "canonical_name": "Virat Kohli",
+    }
+    assert resolved["Someone"]["legacy_name"] == "Someone"
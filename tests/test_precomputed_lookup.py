@@ -0,0 +1,97 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import precomputed_service
+from precomputed_service import PrecomputedLookupSnapshot, PrecomputedLookupStore
+from venue_utils import VenueClusterManager
+
+THROUGH = date(2025, 1, 1)
+AFTER = date(2025, 6, 1)
+
+
+def _wpa(venue, league, target_bucket, over_bucket, wickets, runs_min, prob, sample=20):
+    return SimpleNamespace(
+        venue=venue, league=league, target_bucket=target_bucket, over_bucket=over_bucket,
+        wickets_lost=wickets, runs_range_min=runs_min, win_probability=prob, sample_size=sample,
+        computed_date=datetime(2025, 1, 1), data_through_date=THROUGH,
+    )
+
+
+def _resource(venue, innings, over, wickets, pct, league=None, sample=10):
+    return SimpleNamespace(
+        venue=venue, league=league, innings=innings, over_num=over, wickets_lost=wickets,
+        resource_percentage=pct, sample_size=sample, computed_date=datetime(2025, 1, 1),
+        data_through_date=THROUGH,
+    )
+
+
+def _snapshot():
+    wpa_rows = [
+        _wpa("Eden Gardens", "IPL", 160, 4, 2, 40, 0.55),
+        _wpa("Eden Gardens", "IPL", 160, 4, 3, 40, 0.45, sample=3),   # below venue minimum
+        _wpa("Wankhede Stadium, Mumbai", "IPL", 160, 4, 3, 40, 0.40),
+        _wpa("Somewhere Else", "IPL", 160, 6, 2, 40, 0.35, sample=12),
+        _wpa("Far Away", "BBL", 160, 8, 2, 40, 0.25, sample=30),
+    ]
+    resource_rows = [_resource("Eden Gardens", 1, 5, 1, 62.5)]
+    return PrecomputedLookupSnapshot(wpa_rows, resource_rows, VenueClusterManager(), run_id=7)
+
+
+def test_wpa_fallback_chain_is_resolved_per_cell():
+    snap = _snapshot()
+
+    assert snap.win_probability("Eden Gardens", "IPL", 160, 4, 2, 45, AFTER) == (0.55, "venue")
+    # Below the venue minimum sample; falls through to a venue in the same cluster
+    assert snap.win_probability("Eden Gardens", "IPL", 160, 4, 3, 45, AFTER)[1] == "cluster"
+    assert snap.win_probability("Eden Gardens", "IPL", 160, 6, 2, 45, AFTER)[1] == "league"
+    assert snap.win_probability("Eden Gardens", "IPL", 160, 8, 2, 45, AFTER)[1] == "global"
+    # Unknown venue resolves lazily through league/global
+    assert snap.win_probability("New Ground", "IPL", 160, 6, 2, 45, AFTER)[1] == "league"
+    # Nothing anywhere: caller uses the heuristic
+    assert snap.win_probability("Eden Gardens", "IPL", 200, 0, 0, 0, AFTER) is None
+
+
+def test_unknown_keys_are_resolved_once_into_the_bounded_cache(monkeypatch):
+    snap = _snapshot()
+    calls = []
+    resolve = snap._resolve_wpa_row
+    monkeypatch.setattr(snap, "_resolve_wpa_row", lambda venue, league: calls.append(venue) or resolve(venue, league))
+
+    for _ in range(3):
+        assert snap.win_probability("New Ground", "IPL", 160, 6, 2, 45, AFTER)[1] == "league"
+    assert calls == ["New Ground"]
+    assert (snap.generation, "New Ground", "IPL") in precomputed_service._WPA_EXTRA_ROWS
+    assert precomputed_service._WPA_EXTRA_ROWS.max_entries is not None
+    # A reloaded snapshot never reads rows resolved against the previous one
+    assert _snapshot().generation != snap.generation
+
+
+def test_wpa_chronology_only_relaxes_the_venue_level():
+    snap = _snapshot()
+    assert snap.win_probability("Eden Gardens", "IPL", 160, 4, 2, 45, THROUGH)[1] == "venue_relaxed"
+    assert snap.win_probability("Eden Gardens", "IPL", 160, 6, 2, 45, THROUGH) is None
+
+
+def test_resource_lookup_uses_venue_then_cluster():
+    snap = _snapshot()
+    assert snap.resource_percentage("Eden Gardens", None, 1, 5, 1, AFTER) == (62.5, "venue")
+    # venue_resources rows carry no league, so a league-filtered lookup reaches the cluster level
+    assert snap.resource_percentage("Eden Gardens", "IPL", 1, 5, 1, AFTER) == (62.5, "cluster")
+    assert snap.resource_percentage("Eden Gardens", None, 2, 5, 1, AFTER) is None
+    assert snap.resource_percentage("Eden Gardens", None, 1, 5, 1, THROUGH) is None
+
+
+def test_store_reloads_only_when_a_newer_run_completes(monkeypatch):
+    store = PrecomputedLookupStore(reload_check_seconds=0)
+    run_ids = [1, 1, 2]
+    loads = []
+    monkeypatch.setattr(store, "_latest_run_id", lambda session: run_ids.pop(0))
+    monkeypatch.setattr(
+        store, "_load",
+        lambda session, venue_manager, run_id: loads.append(run_id) or SimpleNamespace(run_id=run_id),
+    )
+
+    first = store.get(None, None)
+    assert store.get(None, None) is first
+    assert store.get(None, None).run_id == 2
+    assert loads == [1, 2]
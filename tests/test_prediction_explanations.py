@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+xgboost = pytest.importorskip("xgboost")
+
+from ml import predict
+from ml.predict import explain_fixtures
+
+FEATURES = ["elo_delta", "team1_recent_form", "venue_bat_first_win_pct"]
+
+
+def _matrix(rows=60, seed=3):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(rows, len(FEATURES))), columns=FEATURES)
+    y = (X["elo_delta"] + 0.3 * X["team1_recent_form"] > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    predict._explanation_cache.clear()
+    yield
+    predict._explanation_cache.clear()
+
+
+def test_batched_contributions_sum_to_the_margin_and_are_cached(monkeypatch):
+    X, y = _matrix()
+    model = xgboost.XGBClassifier(n_estimators=20, max_depth=3).fit(X, y)
+    model_dict = {"model": model, "feature_columns": FEATURES}
+    fixtures = X.iloc[:5]
+
+    explanations = explain_fixtures(model_dict, fixtures, "v1", "IPL", n=3)
+    margins = model.get_booster().predict(xgboost.DMatrix(fixtures), output_margin=True)
+    bias = model.get_booster().predict(xgboost.DMatrix(fixtures), pred_contribs=True)[:, -1]
+    for row, margin, b in zip(explanations, margins, bias):
+        assert len(row) == 3
+        sizes = [abs(f["contribution"]) for f in row]
+        assert sizes == sorted(sizes, reverse=True)
+        assert sum(f["contribution"] for f in row) + b == pytest.approx(margin, abs=1e-4)
+        assert all(f["direction"] == ("positive" if f["contribution"] > 0 else "negative") for f in row)
+
+    # The same fixtures under the same version are served without touching the booster
+    monkeypatch.setattr(xgboost.Booster, "predict", lambda *a, **k: pytest.fail("recomputed"))
+    assert explain_fixtures(model_dict, fixtures, "v1", "IPL", n=3) == explanations
+
+
+def test_cache_is_not_shared_across_leagues_with_the_same_version():
+    X, y = _matrix()
+    fixtures = X.iloc[:3]
+    ipl = {"model": xgboost.XGBClassifier(n_estimators=10, max_depth=2).fit(X, y), "feature_columns": FEATURES}
+    bbl = {"model": xgboost.XGBClassifier(n_estimators=10, max_depth=2).fit(X, 1 - y),
+           "feature_columns": FEATURES}
+
+    ipl_explanations = explain_fixtures(ipl, fixtures, "v1", "IPL", n=3)
+    bbl_explanations = explain_fixtures(bbl, fixtures, "v1", "BBL", n=3)
+
+    assert [[f["direction"] for f in row] for row in bbl_explanations] != \
+        [[f["direction"] for f in row] for row in ipl_explanations]
+
+
+def test_non_tree_models_fall_back_to_importances():
+    X, y = _matrix()
+    model_dict = {"model": LogisticRegression().fit(X, y), "feature_columns": FEATURES}
+    assert explain_fixtures(model_dict, X.iloc[:2], "v1", "IPL") == [[], []]
+    assert explain_fixtures(model_dict, X.iloc[:0], "v1", "IPL") == []
@@ -1,5 +1,7 @@
 """Contract/safety tests for query builder v2 mode + match-context extensions."""
 
+from types import SimpleNamespace
+
 
 def _assert_not_500(response, label=""):
     assert response.status_code != 500, (
@@ -147,3 +149,165 @@ class TestQueryBuilderV2Contracts:
         assert "JOIN stage2_source s ON s.partnership IS NOT DISTINCT FROM q.partnership" in combined_sql
         assert "LEFT JOIN player_aliases pa_bat" in fallback_sql
         assert "LEFT JOIN player_aliases pa_ns" in fallback_sql
+
+
+def _duckdb_fixture_session():
+    """In-memory DuckDB holding a two-innings delivery_details sample plus its side tables."""
+    import pytest
+
+    duckdb = pytest.importorskip("duckdb")
+    from services.duckdb_backend import DuckDBSession, create_alias_views
+
+    conn = duckdb.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE delivery_details AS SELECT * FROM (VALUES
+            (1, 'm1', 1, 0, 1, 'V Kohli',  'JJ Bumrah', 'F du Plessis', 4, 4, 0, 0, 1, NULL,     'RCB', 'MI', 'IPL', 2024, 'T20', 'male'),
+            (2, 'm1', 1, 0, 2, 'V Kohli',  'JJ Bumrah', 'F du Plessis', 0, 1, 1, 0, 0, NULL,     'RCB', 'MI', 'IPL', 2024, 'T20', 'male'),
+            (3, 'm1', 1, 0, 3, 'V Kohli',  'JJ Bumrah', 'F du Plessis', 0, 0, 0, 0, 1, 'caught', 'RCB', 'MI', 'IPL', 2024, 'T20', 'male'),
+            (4, 'm1', 1, 0, 4, 'F du Plessis', 'JJ Bumrah', 'Virat Kohli', 6, 6, 0, 0, NULL, NULL, 'RCB', 'MI', 'IPL', 2024, 'T20', 'male'),
+            (5, 'm1', 2, 0, 1, 'RG Sharma', 'Siraj',    'Ishan Kishan', 1, 1, 0, 0, 1, NULL,     'MI', 'RCB', 'IPL', 2024, 'T20', 'male'),
+            (6, 'm1', 2, 1, 1, 'Ishan Kishan', 'Siraj', 'RG Sharma', 2, 2, 0, 0, 0, NULL,     'MI', 'RCB', 'IPL', 2024, 'T20', 'male'),
+            (7, 'm2', 1, 0, 1, 'V Kohli', 'Siraj', 'F du Plessis', 4, 4, 0, 0, 1, NULL,       'RCB', 'MI', 'IPL', 2023, 'ODI', 'male')
+        ) v(id, p_match, inns, over, ball, bat, bowl, non_striker, batruns, score, wide, noball, control,
+            dismissal, team_bat, team_bowl, competition, year, format, gender)
+    """)
+    conn.execute("""
+        CREATE TABLE matches AS SELECT * FROM (VALUES
+            ('m1', 'Royal Challengers Bengaluru', '{"result": "win"}', 'field', 'Mumbai Indians')
+        ) v(id, winner, outcome, toss_decision, toss_winner)
+    """)
+    conn.execute("""
+        CREATE TABLE player_aliases AS SELECT * FROM (VALUES
+            ('V Kohli', 'Virat Kohli'), ('F du Plessis', 'Faf du Plessis')
+        ) v(player_name, alias_name)
+    """)
+    create_alias_views(conn)
+    return DuckDBSession(conn.cursor())
+
+
+def _grouped(db, group_by, **overrides):
+    from services.query_builder_v2 import handle_grouped_query
+
+    kwargs = dict(
+        where_clause="WHERE 1=1 AND dd.format = 'T20' AND dd.gender = 'male' AND dd.competition = ANY(:leagues)",
+        params={"limit": 10, "offset": 0, "leagues": ["IPL"]},
+        group_by=group_by, min_balls=None, max_balls=None, min_runs=None, max_runs=None,
+        limit=10, offset=0, db=db, filters_applied={}, has_batter_filters=False,
+        show_summary_rows=False, join_matches=False, min_wickets=None, max_wickets=None,
+    )
+    kwargs.update(overrides)
+    return handle_grouped_query(**kwargs)
+
+
+class TestQueryBuilderV2DuckDBBackend:
+    """The generated Postgres plan runs unchanged on DuckDB and yields the Postgres numbers."""
+
+    def test_translate_sql_binds_only_referenced_params(self):
+        from services.duckdb_backend import translate_sql
+
+        sql, params = translate_sql(
+            "SELECT NULL::bigint, CAST(x AS DECIMAL) FROM t WHERE a = ANY(:names) LIMIT :limit",
+            {"names": ("a", "b"), "limit": 5, "unused": 1},
+        )
+        assert sql == "SELECT NULL::bigint, CAST(x AS DOUBLE) FROM t WHERE a = ANY($names) LIMIT $limit"
+        assert params == {"names": ["a", "b"], "limit": 5}
+
+    def test_grouped_batter_metrics(self):
+        result = _grouped(_duckdb_fixture_session(), ["batter"], has_batter_filters=True)
+        rows = {r["batter"]: r for r in result["data"]}
+
+        kohli = rows["V Kohli"]
+        assert (kohli["balls"], kohli["runs"], kohli["wickets"], kohli["dots"]) == (3, 4, 1, 1)
+        assert kohli["strike_rate"] == 4 * 100.0 / 3
+        assert kohli["control_percentage"] == 2 * 100.0 / 3
+        assert kohli["percent_balls"] == 50.0
+        assert result["metadata"]["total_balls_in_query"] == 6
+        # Summed over groups, as on Postgres: one innings for each of the four batters
+        assert result["metadata"]["total_innings_in_query"] == 4
+        assert rows["F du Plessis"]["control_percentage"] is None
+
+    def test_partnership_and_batting_position_plans_run(self):
+        session = _duckdb_fixture_session()
+        partnerships = {r["partnership"]: r["balls"] for r in _grouped(session, ["partnership"])["data"]}
+        assert partnerships["Faf du Plessis & Virat Kohli"] == 4
+
+        positions = _grouped(session, ["innings", "batting_position"])["data"]
+        assert {(r["innings"], r["batting_position"]): r["balls"] for r in positions} == {
+            (1, 1): 3, (1, 2): 1, (2, 1): 1, (2, 2): 1,
+        }
+
+    def test_cumulative_ball_plan_and_empty_fallback(self):
+        session = _duckdb_fixture_session()
+        cumulative = _grouped(session, ["ball"], ball_aggregation="cumulative", has_batter_filters=True)
+        by_ball = {r["ball"]: r for r in cumulative["data"]}
+        # Legal ball 1 of each innings: Kohli's four and Sharma's single
+        assert by_ball[1]["runs"] == 4 + 1
+        # Legal ball 2 of innings 1 follows the wide, so it carries the dismissal
+        assert by_ball[2]["wickets"] == 1
+
+        empty = _grouped(session, ["batter"], min_runs=1000)
+        assert empty["data"] == []
+        assert empty["metadata"]["total_balls_in_query"] == 6
+        assert empty["metadata"]["total_groups"] == 0
+
+    def test_choose_backend_keeps_selective_queries_on_postgres(self, monkeypatch):
+        from services import duckdb_backend
+
+        db = object()
+        session = SimpleNamespace(close=lambda: None)
+        backend = SimpleNamespace(session=lambda: session, is_fresh=lambda _db: True,
+                                  row_count=10_000_000, years=list(range(2015, 2025)))
+        monkeypatch.setattr(duckdb_backend, "get_backend", lambda: backend)
+        monkeypatch.setattr(duckdb_backend, "QUERY_BUILDER_BACKEND", "auto")
+
+        assert duckdb_backend.choose_backend(db, {"start_year": 2015, "end_year": 2024}, ["venue", "year"]) is session
+        assert duckdb_backend.choose_backend(db, {"batters": ["V Kohli"]}, ["bowler"]) is db
+        assert duckdb_backend.choose_backend(db, {"start_year": 2024, "end_year": 2024}, ["venue"]) is session
+        assert duckdb_backend.choose_backend(db, {"start_year": 2024, "venue_aliases": ["x"]}, ["batter"]) is db
+        assert duckdb_backend.choose_backend(db, {}, []) is db
+
+        monkeypatch.setattr(duckdb_backend, "QUERY_BUILDER_BACKEND", "postgres")
+        assert duckdb_backend.choose_backend(db, {}, ["venue"]) is db
+
+    def test_choose_backend_closes_the_session_of_a_stale_snapshot(self, monkeypatch):
+        from services import duckdb_backend
+
+        db = object()
+        closed = []
+        session = SimpleNamespace(close=lambda: closed.append(True))
+        backend = SimpleNamespace(session=lambda: session, is_fresh=lambda _db: False,
+                                  row_count=10_000_000, years=list(range(2015, 2025)))
+        monkeypatch.setattr(duckdb_backend, "get_backend", lambda: backend)
+        monkeypatch.setattr(duckdb_backend, "QUERY_BUILDER_BACKEND", "duckdb")
+
+        assert duckdb_backend.choose_backend(db, {}, ["venue"]) is db
+        assert closed == [True]
+
+    def test_choose_backend_never_routes_to_a_partial_snapshot(self, monkeypatch):
+        from services import duckdb_backend
+
+        db = object()
+        partial = SimpleNamespace(snapshot_id="20250101T000000", manifest={"years": [2024], "complete": False})
+        monkeypatch.setattr(duckdb_backend, "get_snapshot", lambda _root: partial)
+        backend = duckdb_backend.DuckDBBackend(database_path=None, snapshot_root="unused")
+        monkeypatch.setattr(duckdb_backend, "get_backend", lambda: backend)
+        monkeypatch.setattr(duckdb_backend, "QUERY_BUILDER_BACKEND", "duckdb")
+
+        assert backend.session() is None
+        assert duckdb_backend.choose_backend(db, {}, ["venue"]) is db
+
+    def test_any_duckdb_failure_reruns_on_postgres(self):
+        from services.query_builder_v2 import _run_with_postgres_fallback
+
+        closed = []
+        analytics_db = SimpleNamespace(close=lambda: closed.append(True))
+        postgres = object()
+
+        def run(session):
+            if session is analytics_db:
+                raise KeyError("unexpected column")  # not a duckdb.Error
+            return "rows"
+
+        assert _run_with_postgres_fallback(run, analytics_db, postgres) == ("rows", "postgres")
+        assert _run_with_postgres_fallback(lambda session: "fast", analytics_db, postgres) == ("fast", "duckdb")
+        assert closed == [True, True]
@@ -0,0 +1,182 @@
+import random
+import re
+from collections import defaultdict
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from services import global_t20_rankings as rankings
+from services.rankings_cube import MonthlyCellCube, load_rankings_cube, refresh_rankings_cube
+
+COMPETITIONS = ["Indian Premier League", "Big Bash League", "Vitality Blast"]
+LENGTHS = ["FULL", "GOOD_LENGTH", "SHORT_OF_GOOD", "SHORT"]
+
+
+def _balls(n=6000, seed=4):
+    rng = random.Random(seed)
+    balls = []
+    for _ in range(n):
+        dated = rng.random() > 0.03
+        balls.append({
+            "player": rng.choice([f"P{i}" for i in range(12)] + [""]),
+            "competition": rng.choice(COMPETITIONS),
+            "length_bucket": rng.choice(LENGTHS),
+            "bowl_kind": rng.choice(["pace", "spin"]),
+            "month": date(rng.randint(2019, 2023), rng.randint(1, 12), 1) if dated else None,
+            "year": None if dated else rng.randint(2019, 2023),
+            "runs": rng.choice([0, 0, 1, 1, 2, 4, 6]),
+            "controlled": rng.random() < 0.8,
+        })
+    return balls
+
+
+def _cube_rows(balls):
+    grouped = defaultdict(lambda: {"balls": 0, "runs": 0.0, "metric": 0.0})
+    for ball in balls:
+        key = (ball["player"], ball["competition"], ball["length_bucket"], ball["bowl_kind"], ball["month"], ball["year"])
+        grouped[key]["balls"] += 1
+        grouped[key]["runs"] += ball["runs"]
+        grouped[key]["metric"] += ball["controlled"]
+    return [
+        dict(zip(("player", "competition", "length_bucket", "bowl_kind", "month", "year"), key), **sums)
+        for key, sums in grouped.items()
+    ]
+
+
+def _direct(balls, start, end):
+    """What _fetch_batting_cells / _fetch_batting_totals return for the window."""
+    def in_window(ball):
+        if ball["month"] is not None:
+            return start <= ball["month"] <= end
+        return start.year <= ball["year"] <= end.year
+
+    cells = defaultdict(lambda: [0, 0.0, 0.0])
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for ball in filter(in_window, balls):
+        group = (ball["competition"], ball["length_bucket"], ball["bowl_kind"])
+        for target in ([cells[(ball["player"],) + group]] if ball["player"] else []) + [totals[group]]:
+            target[0] += 1
+            target[1] += ball["runs"]
+            target[2] += ball["controlled"]
+    return (
+        {key: tuple(v) for key, v in cells.items() if v[0] >= rankings.MIN_CELL_BALLS},
+        {key: tuple(v) for key, v in totals.items()},
+    )
+
+
+def test_sliding_windows_equal_the_direct_aggregation():
+    balls = _balls()
+    cube = MonthlyCellCube("batting", _cube_rows(balls))
+    month_ends = [rankings._month_end(date(2021, m, 1)) for m in range(1, 13)] + [date(2023, 12, 31)]
+    # Consecutive windows slide; the last jump and the step back force a reset
+    windows = [(rankings._trailing_window_start(e), e) for e in month_ends] + [(date(2020, 1, 1), date(2020, 6, 30))]
+
+    for start, end in windows:
+        cells, totals = cube.window(start, end)
+        want_cells, want_totals = _direct(balls, start, end)
+        got_cells = {
+            (c["player"], c["competition"], c["length_bucket"], c["bowl_kind"]): (c["balls"], c["runs"], c["controlled"])
+            for c in cells
+        }
+        assert got_cells == want_cells
+        assert {k: (v["balls"], v["runs"], v["controlled"]) for k, v in totals.items()} == want_totals
+
+
+def test_trailing_windows_are_whole_months():
+    assert rankings._trailing_window_start(date(2026, 2, 28)) == date(2024, 3, 1)
+    assert rankings._trailing_window_start(date(2024, 12, 31)) == date(2023, 1, 1)
+    assert rankings._is_month_window(date(2024, 3, 1), date(2026, 2, 28))
+    assert not rankings._is_month_window(date(2024, 2, 29), date(2026, 2, 28))
+
+
+def test_trajectory_reads_the_cube_once_per_mode(mock_db):
+    cube_rows = _cube_rows(_balls())
+    payload = {"rankings": [{"player": "P1", "rank": 1, "quality_score": 70.0}], "competition_weights": {}}
+    windows_seen = []
+
+    def compute(db, mode, start, end, bowl_kind, variation_mode, window_cells):
+        batting, bowling = window_cells("batting"), window_cells("bowling")
+        windows_seen.append((start, end, len(batting[0]), len(bowling[1])))
+        return payload
+
+    rankings._RANKINGS_CACHE.clear()
+    with patch.object(rankings, "_rankings_cube_ready", return_value=True), \
+            patch("services.rankings_cube.load_rankings_cube",
+                  side_effect=lambda db, mode, start, end: MonthlyCellCube(mode, cube_rows)) as load, \
+            patch.object(rankings, "_compute_rankings_payload", side_effect=compute):
+        timeline = rankings._build_player_trajectory(
+            mock_db, ["P1"], "bowling", date(2023, 12, 31), "all", snapshots=12, force_refresh=True
+        )
+    rankings._RANKINGS_CACHE.clear()
+
+    assert [row["date"] for row in timeline][-1] == "2023-12-31"
+    assert all(row["rank"] == 1 for row in timeline)
+    assert len(windows_seen) == 12
+    assert sorted(call.args[1] for call in load.call_args_list) == ["batting", "bowling"]
+    assert load.call_args_list[0].args[2:] == (date(2021, 2, 1), date(2023, 12, 31))
+
+
+class _DuckSession:
+    """Just enough of a Session to run the rankings SQL on DuckDB."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, statement, params=None):
+        cursor = self.conn.execute(re.sub(r"(?<!:):(\w+)", r"$\1", str(statement)), params or {})
+        names = [column[0] for column in cursor.description or []]
+        rows = [SimpleNamespace(_mapping=dict(zip(names, row))) for row in cursor.fetchall()]
+        return SimpleNamespace(fetchall=lambda: rows, rowcount=len(rows))
+
+
+def test_cube_windows_equal_the_direct_queries():
+    duckdb = pytest.importorskip("duckdb")
+    conn = duckdb.connect(":memory:")
+    conn.execute("""CREATE TABLE delivery_details (
+        format VARCHAR, gender VARCHAR, match_date DATE, year INTEGER, competition VARCHAR,
+        length VARCHAR, bowl_kind VARCHAR, wide INTEGER, score INTEGER, control INTEGER,
+        batter VARCHAR, bowler VARCHAR)""")
+    rng = random.Random(9)
+    # Blank, whitespace-only and missing names only count toward the totals on both paths
+    names = ["P1", " P2 ", "P3", "", "  ", None]
+    rows = []
+    for _ in range(4000):
+        dated = rng.random() > 0.05
+        rows.append((
+            "T20", "male",
+            date(rng.randint(2021, 2023), rng.randint(1, 12), rng.randint(1, 28)) if dated else None,
+            rng.randint(2021, 2023),
+            rng.choice(COMPETITIONS), rng.choice(LENGTHS + ["BEAMER"]), rng.choice(["pace bowler", "spin bowler"]),
+            rng.choice([0, 0, 0, 1]), rng.choice([0, 0, 1, 4, 6]), rng.choice([0, 1, 1]),
+            rng.choice(names), rng.choice(names),
+        ))
+    conn.executemany(f"INSERT INTO delivery_details VALUES ({', '.join('?' * 12)})", rows)
+    db = _DuckSession(conn)
+    schema = {
+        "batter_expr": rankings._coalesced_trim_expr("dd", ["batter"]),
+        "bowler_expr": rankings._coalesced_trim_expr("dd", ["bowler"]),
+        "date_expr": "dd.match_date",
+        "has_year": True,
+    }
+    start, end = date(2022, 1, 1), date(2023, 6, 30)
+
+    with patch.object(rankings, "_get_delivery_schema_config", return_value=schema), \
+            patch("services.rankings_cube._get_delivery_schema_config", return_value=schema), \
+            patch("services.rankings_cube.bump_data_version") as bump:
+        refresh_rankings_cube(db)
+        bump.assert_called_once_with(db, "rankings_monthly_cells")
+        for mode, fetch_cells, fetch_totals in (
+            ("batting", rankings._fetch_batting_cells, rankings._fetch_batting_totals),
+            ("bowling", rankings._fetch_bowling_cells, rankings._fetch_bowling_totals),
+        ):
+            cells, totals = load_rankings_cube(db, mode, start, end).window(start, end)
+            direct = fetch_cells(db, start, end)
+
+            def _key(cell):
+                return cell["player"], cell["competition"], cell["length_bucket"], cell["bowl_kind"]
+
+            assert {c["player"] for c in direct} == {"P1", "P2", "P3"}
+            assert sorted(cells, key=_key) == sorted(direct, key=_key)
+            assert totals == fetch_totals(db, start, end)
@@ -0,0 +1,109 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from services import global_t20_rankings as rankings
+from services import rankings_snapshot
+from services.rankings_snapshot import get_rankings_snapshots, reset_snapshot_cache, write_rankings_snapshot
+
+START, END = date(2024, 1, 1), date(2025, 12, 31)
+
+
+def _payload(players, mode="batting"):
+    rows = [
+        {"player": name, "rank": i + 1, "quality_score": 90.0 - i, "strike_factor": 50.0, "control_factor": None,
+         "total_balls": 400 + i, "per_competition": {"Indian Premier League": {"balls": 100 + i}}}
+        for i, name in enumerate(players)
+    ]
+    return {"rankings": rows, "total": len(rows), "date_range": {"start": START.isoformat(), "end": END.isoformat()},
+            "bowl_kind": "all", "competition_weights": {"Indian Premier League": 1.21}, "mode_hint": mode}
+
+
+@pytest.fixture
+def snapshot_root(tmp_path, monkeypatch):
+    # Builds below run back to back, well inside one second
+    monkeypatch.setattr(rankings_snapshot, "SNAPSHOT_RECHECK_SECONDS", 0.0)
+    root = str(tmp_path / "rankings")
+    reset_snapshot_cache()
+    yield root
+    reset_snapshot_cache()
+
+
+def test_pages_and_lookups_come_from_the_index(snapshot_root):
+    players = ["Virat Kohli", "Jos Buttler", "Rashid Khan", "Virat  kohli", "Andre Russell"]
+    write_rankings_snapshot([
+        ("batting", "all", START, END, True, _payload(players)),
+        ("bowling", "all", START, END, True, _payload(["Rashid Khan"], mode="bowling")),
+    ], root=snapshot_root)
+
+    artifact = get_rankings_snapshots(snapshot_root).get("batting", "all", START, END)
+    page = artifact.page(limit=2, offset=1)
+    assert [row["player"] for row in page["rankings"]] == ["Jos Buttler", "Rashid Khan"]
+    assert page["total"] == 5 and page["competition_weights"] == {"Indian Premier League": 1.21}
+    assert page["rankings"][0]["per_competition"] == {"Indian Premier League": {"balls": 101}}
+
+    # Both spellings normalise to one key; the better-ranked row wins, as in _find_player_row
+    assert artifact.find([" VIRAT kohli ", "nobody"])["rank"] == 1
+    assert artifact.find(["nobody"]) is None
+    assert set(artifact.lookup(["andre russell", "Jos Buttler", "Unknown"])) == {"andre russell", "jos buttler"}
+    assert get_rankings_snapshots(snapshot_root).default("bowling", "all").find(["rashid khan"])["rank"] == 1
+    assert get_rankings_snapshots(snapshot_root).get("batting", "spin", START, END) is None
+
+
+@pytest.fixture
+def served_root(snapshot_root, monkeypatch):
+    monkeypatch.setattr(rankings_snapshot, "RANKINGS_SNAPSHOT_DIR", snapshot_root)
+    monkeypatch.setattr(rankings, "_weights_data_version", lambda db: "900.3")
+    return snapshot_root
+
+
+def test_service_serves_snapshots_and_switches_builds(served_root, mock_db, monkeypatch):
+    monkeypatch.setattr(rankings, "_build_rankings_payload", lambda *a, **k: pytest.fail("computed"))
+
+    write_rankings_snapshot([("batting", "all", START, END, True, _payload(["A", "B", "C"]))],
+                            root=served_root, data_version="900.3")
+    page = rankings.get_batting_rankings_service(mock_db, limit=2, offset=0)
+    assert [row["player"] for row in page["rankings"]] == ["A", "B"]
+    assert rankings.get_batting_rankings_service(mock_db, START, END, limit=5)["total"] == 3
+    assert rankings.find_ranked_players(mock_db, "batting", ["c", "zz"], START, END)["c"]["rank"] == 3
+
+    write_rankings_snapshot([("batting", "all", START, END, True, _payload(["C", "A"]))],
+                            root=served_root, data_version="900.3")
+    assert rankings.find_ranked_players(mock_db, "batting", ["c"])["c"]["rank"] == 1
+    mock_db.execute.assert_not_called()
+
+
+def test_builds_on_older_data_are_not_served(served_root, mock_db, monkeypatch):
+    computed = _payload(["New Player"])
+    monkeypatch.setattr(rankings, "_build_rankings_payload", lambda *a, **k: computed)
+    monkeypatch.setattr(rankings_snapshot, "_published_manifest", lambda bind, version: None)
+
+    write_rankings_snapshot([("batting", "all", START, END, True, _payload(["A", "B"]))],
+                            root=served_root, data_version="800.2")
+    assert rankings.find_ranked_players(mock_db, "batting", ["new player", "a"]) == {
+        "new player": computed["rankings"][0]
+    }
+
+
+def test_workers_fetch_the_published_build_of_the_current_data(served_root, tmp_path, mock_db, monkeypatch):
+    # The pipeline builds on its own disk; the worker only sees what was published
+    build_root = str(tmp_path / "pipeline")
+    manifest = write_rankings_snapshot([("batting", "all", START, END, True, _payload(["A", "B"]))],
+                                       root=build_root, data_version="900.3")
+    downloaded = []
+
+    def _download(bind, snapshot_id, file_name, path):
+        downloaded.append(file_name)
+        with open(f"{build_root}/snapshots/{snapshot_id}/{file_name}", "rb") as src, open(path, "wb") as dst:
+            dst.write(src.read())
+
+    monkeypatch.setattr(rankings_snapshot, "_published_manifest",
+                        lambda bind, version: manifest if version == "900.3" else None)
+    monkeypatch.setattr(rankings_snapshot, "_download_artifact", _download)
+    monkeypatch.setattr(rankings, "_build_rankings_payload", lambda *a, **k: pytest.fail("computed"))
+
+    assert rankings.find_ranked_players(mock_db, "batting", ["b"])["b"]["rank"] == 2
+    assert rankings.find_ranked_players(mock_db, "batting", ["a"])["a"]["rank"] == 1
+    assert downloaded == [manifest["artifacts"][0]["file"]]
@@ -0,0 +1,152 @@
+import math
+import random
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+import statsProcessor
+import sync_stats_from_dd
+from models import BattingStats, BowlingStats
+from stats_derivation import derive_batting_stats, replace_match_stats
+
+NOT_COMPARED = {"id", "match_id", "innings", "striker", "bowler", "batting_team", "bowling_team",
+                "format", "gender", "batting_points", "bowling_points", "fielding_points"}
+
+
+def _assert_same(orm_row, derived, table):
+    for column in (c.name for c in table.columns if c.name not in NOT_COMPARED):
+        want, got = getattr(orm_row, column, None), derived[column]
+        if isinstance(got, float) and math.isnan(got):
+            got = None
+        if want is None or got is None:
+            assert want is None and got is None, column
+        else:
+            assert float(got) == pytest.approx(float(want)), column
+
+
+def _dd_rows(seed=5):
+    rng = random.Random(seed)
+    rows = []
+    for match_index, fmt in enumerate(["T20", "ODI", "TEST"]):
+        for innings in (1, 2):
+            batters = [f"B{innings}{i}" for i in range(11)]
+            current = 0
+            for over in range(rng.randint(5, 22)):
+                for ball in range(1, 8):
+                    wide = rng.choice([0] * 9 + [1])
+                    noball = rng.choice([0] * 15 + [1])
+                    runs = rng.choice([0, 0, 0, 1, 1, 2, 3, 4, 6])
+                    out = rng.random() < 0.05
+                    rows.append(dict(
+                        match_id=f"m{match_index}", innings=innings, over=over, ball=ball,
+                        batter=batters[min(current + rng.randint(0, 1), 10)], bowler=f"W{innings}{over % 6}",
+                        batting_team=f"T{innings}", bowling_team=f"T{3 - innings}",
+                        score=runs + (wide or noball), batruns=None if rng.random() < 0.02 else (0 if wide else runs),
+                        outcome=None, out="true" if out else rng.choice(["false", None]),
+                        bat_out=rng.choice(["true", "false", "True"]),
+                        dismissal=rng.choice(["caught", "run out", "Bowled", None]),
+                        noball=noball, wide=wide, byes=0, legbyes=0, format=fmt, gender="male",
+                    ))
+                    current = min(current + out, 9)
+    return rows
+
+
+@pytest.fixture
+def dd_service():
+    with patch.object(sync_stats_from_dd, "get_database_connection", return_value=(MagicMock(), MagicMock())):
+        return sync_stats_from_dd.StatsFromDeliveryDetails()
+
+
+def test_delivery_details_rows_match_the_per_player_path(dd_service):
+    rows = _dd_rows()
+    batting, bowling = dd_service.derive_stats(pd.DataFrame(rows))
+
+    compared = 0
+    for match_id in ("m0", "m1", "m2"):
+        deliveries = [row for row in rows if row["match_id"] == match_id]
+        for innings in (1, 2):
+            for batter in {d["batter"] for d in deliveries if d["innings"] == innings}:
+                derived = batting.set_index(["match_id", "innings", "striker"]).loc[(match_id, innings, batter)]
+                orm_row = dd_service.calculate_batting_stats(match_id, innings, batter, deliveries)
+                _assert_same(orm_row, derived, BattingStats.__table__)
+                assert derived["format"] == orm_row.format
+                compared += 1
+            for bowler in {d["bowler"] for d in deliveries if d["innings"] == innings}:
+                derived = bowling.set_index(["match_id", "innings", "bowler"]).loc[(match_id, innings, bowler)]
+                _assert_same(dd_service.calculate_bowling_stats(match_id, innings, bowler, deliveries),
+                             derived, BowlingStats.__table__)
+                compared += 1
+    assert compared == len(batting) + len(bowling)
+    # Test matches have no implemented fantasy ruleset
+    assert batting.loc[batting["format"] == "TEST", "fantasy_points"].isna().all()
+
+
+def test_legacy_deliveries_rows_match_the_per_player_path():
+    rng = random.Random(9)
+    rows = []
+    for innings in (1, 2):
+        current = 0
+        for over in range(20):
+            for ball in range(1, 7):
+                wicket = rng.choice([None] * 18 + ["caught", "run out"])
+                batter = f"B{innings}{min(current + rng.randint(0, 1), 10)}"
+                rows.append(dict(
+                    match_id="m1", innings=innings, over=over, ball=ball, batter=batter, bowler=f"W{over % 5}",
+                    batting_team="Delhi Daredevils", bowling_team="Kings XI Punjab",
+                    runs_off_bat=rng.choice([0, 0, 0, 1, 1, 2, 3, 4, 6]), extras=rng.choice([0] * 8 + [1, 5]),
+                    wicket_type=wicket, player_dismissed=(batter if wicket and rng.random() < 0.8 else None),
+                ))
+                current = min(current + bool(wicket), 9)
+
+    processor = statsProcessor.StatsProcessor(MagicMock())
+    processor.get_batch_deliveries = lambda match_ids: pd.DataFrame(rows)
+    with patch.object(statsProcessor, "replace_match_stats", return_value=(0, 0)) as replace:
+        processor.process_matches_batch(["m1"])
+    _, match_ids, batting, bowling = replace.call_args.args
+
+    assert match_ids == ["m1"]
+    for innings in (1, 2):
+        deliveries = [SimpleNamespace(**row) for row in rows if row["innings"] == innings]
+        for batter in {d.batter for d in deliveries}:
+            derived = batting.set_index(["innings", "striker"]).loc[(innings, batter)]
+            _assert_same(processor._calculate_batting_stats("m1", innings, batter, deliveries),
+                         derived, BattingStats.__table__)
+        for bowler in {d.bowler for d in deliveries}:
+            derived = bowling.set_index(["innings", "bowler"]).loc[(innings, bowler)]
+            _assert_same(processor._calculate_bowling_stats("m1", innings, bowler, deliveries),
+                         derived, BowlingStats.__table__)
+    standard = processor.standard_team_names()
+    assert set(batting["batting_team"]) == {standard["Delhi Daredevils"]}
+
+
+def test_set_based_reprocessing_keeps_existing_stats_unless_forced(mock_db):
+    mock_db.query.return_value.all.return_value = [SimpleNamespace(id="m1"), SimpleNamespace(id="m2")]
+    mock_db.execute.return_value.fetchall.return_value = [("m1",)]
+    processor = statsProcessor.StatsProcessor(mock_db)
+    processor.process_matches_batch = MagicMock()
+
+    processor.process_all_statistics(incremental=False)
+    processor.process_all_statistics(incremental=False, force_update=True)
+
+    assert [c.args[0] for c in processor.process_matches_batch.call_args_list] == [["m2"], ["m1", "m2"]]
+    assert mock_db.execute.call_count == 1
+
+
+def test_replace_deletes_the_batch_and_inserts_plain_python_values(mock_db, dd_service):
+    frame = dd_service.delivery_frame(pd.DataFrame(_dd_rows()[:30]))
+    batting = derive_batting_stats(frame)
+
+    written = replace_match_stats(mock_db, ["m0"], batting, batting.iloc[:0].rename(columns={"striker": "bowler"}))
+
+    assert written == (len(batting), 0)
+    calls = mock_db.execute.call_args_list
+    assert "DELETE FROM batting_stats WHERE match_id = ANY(:ids)" in str(calls[0].args[0])
+    assert calls[1].args[1] == {"ids": ["m0"]}
+    records = calls[2].args[1]
+    assert len(calls) == 3 and len(records) == len(batting)
+    for record in records:
+        assert type(record["runs"]) is int and type(record["innings"]) is int
+        assert record["strike_rate"] is None or type(record["strike_rate"]) is float
+        assert "phase" not in record and "id" not in record
@@ -0,0 +1,26 @@
+from services import team_roster
+
+
+LEGACY = {"Virat Kohli": "V Kohli", "Phil Salt": "PD Salt"}
+
+
+def _fake_bulk(names, db):
+    # Mirrors resolve_player_names_bulk: empty names are skipped
+    return {n: {"legacy_name": LEGACY.get(n, n), "details_name": n} for n in names if n}
+
+
+def test_roster_keeps_blank_names_instead_of_failing(monkeypatch):
+    monkeypatch.setattr(team_roster, "resolve_player_names_bulk", _fake_bulk)
+    monkeypatch.setattr(team_roster, "_discover_roster_from_matches",
+                        lambda **kwargs: [{"name": "Virat Kohli", "role": "batter"},
+                                          {"name": "", "role": "bowler"}])
+    monkeypatch.setattr(team_roster, "_get_static_roster",
+                        lambda team: [{"name": " ", "role": "all-rounder"},
+                                      {"name": "Phil Salt", "role": "batter"}])
+
+    roster = team_roster.get_team_roster_service("RCB", db=object())
+
+    assert roster["source"] == "match_data_plus_roster"
+    assert [(p["name"], p["display_name"]) for p in roster["players"]] == [
+        ("V Kohli", "Virat Kohli"), ("", ""), (" ", " "), ("PD Salt", "Phil Salt"),
+    ]
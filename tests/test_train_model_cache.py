@@ -0,0 +1,139 @@
+import os
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from ml import config
+from ml import train_model
+
+
+def _match_frame(n=130, shift=0):
+    return pd.DataFrame({
+        "match_id": [f"m{i}" for i in range(n)],
+        "match_date": pd.date_range("2024-01-01", periods=n).date,
+        "elo_delta": [float(i + shift) for i in range(n)],
+        "winner_label": [i % 2 for i in range(n)],
+    })
+
+
+def _fitted():
+    score = {"model": SimpleNamespace(), "feature_columns": ["elo_delta"], "cv": {}, "rows": 1,
+             "features": 1, "features_pruned": 0}
+    return {
+        "winner": {"model": SimpleNamespace(), "meta": {"cv": {}}, "features": ["elo_delta"]},
+        "score_1st": score,
+        "score_2nd": dict(score),
+        "gates": [],
+        "passes": 6,
+        "player": None,
+    }
+
+
+@pytest.fixture
+def league_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ARTIFACT_CACHE_DIR", tmp_path / "cache")
+    frames = {"match": _match_frame()}
+    fits = []
+    builds = []
+
+    class _Engineer:
+        def __init__(self, session, fast_mode=False):
+            pass
+
+        def build_match_training_frame(self, **kwargs):
+            builds.append(kwargs["competitions"])
+            return frames["match"]
+
+    monkeypatch.setattr(train_model, "FeatureEngineer", _Engineer)
+    monkeypatch.setattr(train_model, "_fit_league_models",
+                        lambda match_df, player_df, fast_mode: fits.append(len(match_df)) or _fitted())
+
+    def train(version, **overrides):
+        kwargs = dict(
+            session=None, competitions=["IPL"], model_version=version, mode="fast", fast_mode=True,
+            gate_threshold=4, force_save=False, skip_player_model=True, limit_matches=None,
+            start_date=None, end_date=None, output_dir=tmp_path / "models",
+        )
+        kwargs.update(overrides)
+        return train_model._train_single_league(**kwargs)
+
+    return SimpleNamespace(frames=frames, fits=fits, builds=builds, train=train, models=tmp_path / "models")
+
+
+def test_unchanged_league_reuses_cached_fit(league_env):
+    first = league_env.train("v1")
+    second = league_env.train("v2")
+
+    assert league_env.fits == [130]
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["status"] == "PROMOTED"
+    # Artifacts are still written under the new version for predict.py to pick up
+    assert (league_env.models / "match_winner_v2.joblib").exists()
+
+
+def test_changed_frame_or_disabled_cache_retrains(league_env):
+    league_env.train("v1")
+    league_env.frames["match"] = _match_frame(shift=1)
+    league_env.train("v2")
+    league_env.train("v3", use_artifact_cache=False)
+    assert len(league_env.fits) == 3
+
+
+def test_cache_key_ignores_thread_count(monkeypatch):
+    frame = _match_frame()
+    before = train_model._artifact_cache_key(frame, None, train_model._hyperparameter_fingerprint("fast"))
+    monkeypatch.setitem(config.MATCH_WINNER_PARAMS, "n_jobs", 1)
+    assert train_model._artifact_cache_key(frame, None, train_model._hyperparameter_fingerprint("fast")) == before
+    monkeypatch.setitem(config.MATCH_WINNER_PARAMS, "max_depth", 3)
+    assert train_model._artifact_cache_key(frame, None, train_model._hyperparameter_fingerprint("fast")) != before
+
+
+def test_unchanged_source_data_skips_feature_extraction(league_env, monkeypatch):
+    marker = {"data_versions": {"matches": 3}}
+    monkeypatch.setattr(train_model, "_source_data_marker", lambda session: dict(marker))
+
+    league_env.train("v1")
+    second = league_env.train("v2")
+    assert league_env.builds == [["IPL"]] and league_env.fits == [130]
+    assert (second["cached"], second["matches"]) == (True, 130)
+
+    # New data (or other arguments) extract features again; an identical frame still hits the fit
+    marker["data_versions"] = {"matches": 4}
+    league_env.train("v3")
+    league_env.train("v4", competitions=["BBL"])
+    assert len(league_env.builds) == 3 and league_env.fits == [130]
+
+
+def test_marker_moves_when_precomputed_tables_are_rebuilt(mock_db, monkeypatch):
+    monkeypatch.setattr(train_model, "data_versions", lambda session, tables: {"matches": 3})
+    mock_db.bind.dialect.name = "postgresql"
+    computed = {"team_phase_stats": "2024-04-01 00:00:00", "player_baselines": "2024-04-01 00:00:00"}
+
+    def execute(statement, params=None):
+        sql = str(statement)
+        if "to_regclass" in sql:
+            return SimpleNamespace(scalar=lambda: True)
+        table = sql.rsplit("FROM ", 1)[1].strip()
+        return SimpleNamespace(fetchone=lambda: (10, computed[table]))
+
+    mock_db.execute.side_effect = execute
+    before = train_model._source_data_marker(mock_db)
+    assert before["precomputed"]["player_baselines"] == [10, "2024-04-01 00:00:00"]
+
+    # A baseline rebuild leaves every data_versions counter alone
+    computed["player_baselines"] = "2024-04-02 00:00:00"
+    assert train_model._source_data_marker(mock_db) != before
+
+
+def test_cache_keeps_only_the_most_recently_used_fits(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ARTIFACT_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(config, "ARTIFACT_CACHE_MAX_ENTRIES", 2)
+    train_model._store_cached_fit("a", _fitted())
+    train_model._store_cached_fit("b", _fitted())
+    os.utime(tmp_path / "a.joblib", (1, 1))
+    os.utime(tmp_path / "b.joblib", (2, 2))
+
+    assert train_model._load_cached_fit("a") is not None  # a is now the most recently used
+    train_model._store_cached_fit("c", _fitted())
+    assert sorted(p.name for p in tmp_path.glob("*.joblib")) == ["a.joblib", "c.joblib"]
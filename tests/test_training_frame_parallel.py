@@ -0,0 +1,43 @@
+from datetime import date, timedelta
+
+import pandas as pd
+
+from ml import config
+from ml.feature_engineering import FeatureEngineer
+
+
+def _engineer(mock_db, n_matches):
+    matches = pd.DataFrame([
+        {
+            "id": f"m{i}", "date": date(2024, 1, 1) + timedelta(days=i), "venue": "Eden",
+            "competition": "IPL", "team1": "KKR", "team2": "MI", "toss_winner": "KKR",
+            "toss_decision": "bat", "winner": "KKR" if i % 3 else "MI", "team1_elo": 1500 + i, "team2_elo": 1500,
+        }
+        for i in range(n_matches)
+    ])
+    fe = FeatureEngineer(mock_db, fast_mode=True)
+    fe.list_completed_matches = lambda **kwargs: matches
+    fe._preload_batch_caches = lambda competitions=None: None
+    fe._ping_db = lambda: None
+    fe.extract_match_features = lambda match: {"elo_delta": float(match["team1_elo"] - match["team2_elo"])}
+    fe._get_match_scores = lambda match_id: (int(match_id[1:]) + 100, 90)
+    return fe
+
+
+def test_parallel_build_matches_serial_build(mock_db, monkeypatch):
+    monkeypatch.setattr(config, "FEATURE_CHUNK_SIZE", 3)
+    fe = _engineer(mock_db, 11)
+
+    serial = fe.build_match_training_frame(verbose=False, workers=1)
+    parallel = fe.build_match_training_frame(verbose=False, workers=3)
+
+    assert list(parallel["match_id"]) == [f"m{i}" for i in range(11)]
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_small_frames_stay_serial(mock_db, monkeypatch):
+    fe = _engineer(mock_db, 2)
+    monkeypatch.setattr(fe, "_extract_rows_parallel", lambda *args: (_ for _ in ()).throw(AssertionError))
+
+    out = fe.build_match_training_frame(verbose=False, workers=4)
+    assert list(out["score_1st_actual"]) == [100, 101]
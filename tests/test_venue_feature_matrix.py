@@ -0,0 +1,171 @@
+import math
+import random
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from services import venue_similarity
+from services.venue_feature_matrix import (
+    FEATURE_SPACE,
+    LENGTH_GROUP_ORDER,
+    LINE_GROUP_ORDER,
+    PHASE_TOTALS,
+    _FINGERPRINT_CACHE,
+    VenueFeatureMatrix,
+    build_venue_feature_matrix,
+    venue_data_fingerprint,
+)
+
+
+class _Row:
+    def __init__(self, **fields):
+        self._mapping = fields
+
+
+def _result(rows):
+    result = MagicMock()
+    result.fetchall.return_value = rows
+    return result
+
+
+@pytest.fixture(autouse=True)
+def _clear_similarity_cache():
+    venue_similarity._similarity_cache.clear()
+    yield
+    venue_similarity._similarity_cache.clear()
+
+
+def test_build_folds_aliases_into_one_row_per_canonical_venue(mock_db):
+    matches = [
+        _Row(venue="Eden", match_id="m1", first_innings_runs=180, second_innings_runs=170,
+             won_batting_first=1, won_fielding_first=0),
+        _Row(venue="Eden", match_id="m2", first_innings_runs=150, second_innings_runs=151,
+             won_batting_first=0, won_fielding_first=1),
+    ]
+    phases = [_Row(venue="Eden", total_balls=480, pp_runs=90, pp_balls=72, pace_runs=300, pace_balls=240)]
+    zones = [_Row(venue="Eden", wagon_zone=1, balls=20, runs=30, boundaries=3),
+             _Row(venue="Eden", wagon_zone=4, balls=20, runs=10, boundaries=1),
+             _Row(venue="Eden", wagon_zone=9, balls=5, runs=5, boundaries=0)]
+    options = [_Row(bat_hand="RHB", bowl_kind="pace bowler", bowl_style="RF"),
+               _Row(bat_hand="LHB", bowl_kind=None, bowl_style="OB")]
+    styles = [_Row(venue="Eden", bowl_style="RF", balls=120, runs=150, wickets=6, dots=50, matches=2)]
+    phase_kind = [_Row(venue="Eden", phase="powerplay", kind="pace", balls=60, runs=80)]
+    line_length = [_Row(venue="Eden", line="OUTSIDE_OFFSTUMP", length="GOOD_LENGTH", balls=40, runs=30,
+                        boundaries=2, dots=20, wickets=1)]
+    mock_db.execute.side_effect = [
+        _result(rows) for rows in (matches, phases, zones, options, styles, phase_kind, line_length)
+    ]
+
+    with patch("services.venue_feature_matrix.VENUE_STANDARDIZATION", {"Eden": "Eden Gardens"}):
+        matrix = build_venue_feature_matrix(mock_db)
+
+    assert matrix.venues == ["Eden Gardens"]
+    assert matrix["total_matches"].tolist() == [2]
+    metrics = matrix.metrics(0)
+    assert metrics["bat_first_win_pct"] == 50.0
+    assert metrics["avg_winning_score"] == 180.0 and metrics["avg_chasing_score"] == 150.0
+    assert metrics["pp_run_rate"] == 7.5 and metrics["spin_economy"] is None
+    # Zone 9 is out of range; shares are of zones 1-8 only
+    assert metrics["zone_1_run_pct"] == 75.0 and metrics["zone_4_boundary_pct"] == 25.0
+    assert matrix["phase_raw"][0, PHASE_TOTALS.index("pace_balls")] == 240
+    assert matrix.styles == ["RF"] and matrix["style_totals"][0, 0].tolist() == [120, 150, 6, 50, 2]
+    cell = matrix["line_length"][0, LINE_GROUP_ORDER.index("OFF"), LENGTH_GROUP_ORDER.index("GOOD")]
+    assert cell.tolist() == [40, 30, 2, 20, 1]
+    assert matrix.filter_options == {"bat_hand": ["LHB", "RHB"], "bowl_kind": ["pace bowler"], "bowl_style": ["OB", "RF"]}
+
+
+def test_saved_matrices_load_only_on_the_same_data(tmp_path):
+    fingerprint = {"version": 1, "delivery_details": 10, "matches": 2}
+    matrix = VenueFeatureMatrix(["A"], {"features": np.array([[1.0, np.nan]])}, ["OB"],
+                                {"bat_hand": ["RHB"], "bowl_kind": [], "bowl_style": []}, fingerprint)
+    path = str(tmp_path / "v.npz")
+    matrix.save(path)
+
+    loaded = VenueFeatureMatrix.load(path, fingerprint)
+    assert loaded.venues == ["A"] and loaded.styles == ["OB"] and loaded.filter_options["bat_hand"] == ["RHB"]
+    np.testing.assert_array_equal(loaded["features"], matrix["features"])
+    assert VenueFeatureMatrix.load(path, {**fingerprint, "matches": 3}) is None
+
+
+def test_venue_fingerprint_changes_when_deliveries_are_corrected_in_place(mock_db):
+    def _results(version):
+        ids = MagicMock()
+        ids.fetchone.return_value = (100, 4)
+        installed = MagicMock()
+        installed.scalar.return_value = True
+        counters = _result([MagicMock(table_name="delivery_details", version=version)])
+        return [ids, installed, counters]
+
+    # A line/length backfill: same MAX(id) and match count, one more write
+    _FINGERPRINT_CACHE.clear()
+    mock_db.execute.side_effect = _results(1) + _results(2)
+    before = venue_data_fingerprint(mock_db)
+    _FINGERPRINT_CACHE.clear()
+    after = venue_data_fingerprint(mock_db)
+    _FINGERPRINT_CACHE.clear()
+
+    assert (before["delivery_details"], before["matches"]) == (after["delivery_details"], after["matches"])
+    assert before["data_versions"] == {"delivery_details": 1, "matches": 0}
+    assert after != before
+
+
+def _random_matrix(n_venues=25, seed=5):
+    rng = random.Random(seed)
+    features = np.array([
+        [rng.uniform(1, 200) if rng.random() > 0.1 else math.nan for _ in FEATURE_SPACE]
+        for _ in range(n_venues)
+    ])
+    arrays = {
+        "features": features,
+        "total_matches": np.array([rng.randint(1, 60) for _ in range(n_venues)], dtype=float),
+        "phase_raw": np.random.default_rng(seed).integers(0, 500, (n_venues, len(PHASE_TOTALS))).astype(float),
+        "style_totals": np.ones((n_venues, 1, 5)),
+        "phase_kind": np.ones((n_venues, 3, 2, 2)),
+        "zones": np.ones((n_venues, 8, 3)),
+        "line_length": np.ones((n_venues, len(LINE_GROUP_ORDER), len(LENGTH_GROUP_ORDER), 5)),
+    }
+    return VenueFeatureMatrix([f"V{i:02d}" for i in range(n_venues)], arrays, ["OB"])
+
+
+def _brute_force_ranking(matrix, qualified, target_vector_of):
+    """The per-venue loop the service used to run: population z-scores, missing = neutral."""
+    stats = []
+    for j in range(len(FEATURE_SPACE)):
+        vals = [matrix["features"][i, j] for i in qualified if not math.isnan(matrix["features"][i, j])]
+        mean = sum(vals) / len(vals) if vals else 0.0
+        std = math.sqrt(sum((v - mean) ** 2 for v in vals) / len(vals)) if vals else 1.0
+        stats.append((mean, std or 1.0))
+
+    def vector(values):
+        return [0.0 if v is None or math.isnan(v) else (v - m) / s for v, (m, s) in zip(values, stats)]
+
+    target = vector(target_vector_of(stats))
+    return sorted(
+        (round(math.sqrt(sum((a - b) ** 2 for a, b in zip(target, vector(matrix["features"][i])))), 4), matrix.venues[i])
+        for i in qualified
+    )
+
+
+def test_vectorised_similarity_matches_the_per_venue_loop(mock_db):
+    matrix = _random_matrix()
+    qualified = [i for i in range(len(matrix)) if matrix["total_matches"][i] >= 10]
+    target = qualified[0]
+    with patch.object(venue_similarity, "get_venue_feature_matrix", return_value=matrix), \
+            patch.object(venue_similarity, "get_venue_aliases", return_value=[]):
+        single = venue_similarity.get_similar_venues(matrix.venues[target], mock_db, min_matches=10, top_n=4)
+        overall = venue_similarity.get_similar_venues("All Venues", mock_db, min_matches=10, top_n=4)
+
+    # The target's own z-scores come from the whole pool, including itself
+    expected = _brute_force_ranking(matrix, qualified, lambda stats: list(matrix["features"][target]))
+    expected = [pair for pair in expected if pair[1] != matrix.venues[target]]
+    assert [(v["distance"], v["venue"]) for v in single["most_similar"]] == expected[:4]
+    assert [v["venue"] for v in single["most_dissimilar"]] == [name for _, name in expected[::-1][:4]]
+    assert single["qualified_venues"] == len(qualified)
+
+    # "All Venues" compares against the pool average, i.e. the origin in z-space
+    expected_overall = _brute_force_ranking(matrix, qualified, lambda stats: [m for m, _ in stats])
+    assert [(v["distance"], v["venue"]) for v in overall["most_similar"]] == expected_overall[:4]
+    assert overall["target_metrics"]["avg_first_innings_score"] == pytest.approx(
+        np.nanmean(matrix["features"][qualified, FEATURE_SPACE.index("avg_first_innings_score")]), abs=1e-3
+    )
@@ -0,0 +1,69 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+
+from wpa_engine import BatchWPAEngine, WPALookupTable
+
+
+def _outcome(venue, league, target_bucket, over_bucket, wickets, runs_min, prob, sample=20):
+    return SimpleNamespace(
+        venue=venue, league=league, target_bucket=target_bucket, over_bucket=over_bucket,
+        wickets_lost=wickets, runs_range_min=runs_min, win_probability=prob,
+        sample_size=sample, computed_date=datetime(2025, 1, 1),
+    )
+
+
+def _deliveries(rows):
+    keys = ["delivery_id", "match_id", "over", "ball", "batter", "bowler", "runs", "wicket", "venue", "league", "target"]
+    columns = {key: [row[i] for row in rows] for i, key in enumerate(keys)}
+    return {
+        key: np.array(values, dtype=object if key in ("match_id", "batter", "bowler", "venue", "league") else np.int64)
+        for key, values in columns.items()
+    }
+
+
+def test_cumulative_state_resets_per_match_and_uses_fallback_order():
+    lookup = WPALookupTable([
+        # Venue-level cells for match m1 (target 150 -> bucket 150, over 0 -> bucket 0)
+        _outcome("Ground A", "IPL", 150, 0, 0, 0, 0.50),
+        # Only league-level data for the state after m1's second ball (4 runs, 1 wicket)
+        _outcome("Other Ground", "IPL", 150, 0, 1, 0, 0.30, sample=12),
+        # Global data (sample >= 15) for match m2
+        _outcome("Elsewhere", "BBL", 120, 0, 0, 0, 0.70, sample=40),
+    ])
+    deliveries = _deliveries([
+        (1, "m1", 0, 1, "A", "X", 4, 0, "Ground A", "IPL", 150),
+        (2, "m1", 0, 2, "B", "X", 0, 1, "Ground A", "IPL", 150),
+        (3, "m2", 0, 1, "C", "Y", 1, 0, "Ground B", "T20I", 120),
+    ])
+
+    result = BatchWPAEngine().calculate_from_arrays(deliveries, lookup)
+    cols = result.columns
+
+    # m1 ball 1: venue 0.50 before and after (0->4 runs stays in the 0-19 bucket)
+    assert cols["before_wp"][0] == 0.50 and cols["after_wp"][0] == 0.50
+    # m1 ball 2: wicket moves the state into the league-only cell
+    assert cols["before_wp"][1] == 0.50
+    assert cols["after_wp"][1] == 0.30
+    assert cols["wpa_batter"][1] == -0.2 and cols["wpa_bowler"][1] == 0.2
+    # m2 starts from a fresh 0/0 state and resolves globally
+    assert cols["before_wp"][2] == 0.70
+    assert result.source_counts() == {"venue": 2, "global": 1}
+
+    bowlers = result.player_totals("bowler")
+    assert bowlers[0] == {"player": "X", "total_wpa": 0.2, "balls": 2, "matches": 1}
+
+
+def test_decided_states_and_heuristic():
+    deliveries = _deliveries([
+        (1, "m1", 19, 5, "A", "X", 6, 0, "Nowhere", "T20I", 6),
+        (2, "m1", 19, 6, "A", "X", 0, 0, "Nowhere", "T20I", 6),
+    ])
+    result = BatchWPAEngine().calculate_from_arrays(deliveries, WPALookupTable([]))
+    cols = result.columns
+
+    # Six off the 119th ball wins a chase of 6: heuristic before, decided after
+    assert 0.0 < cols["before_wp"][0] < 1.0
+    assert cols["after_wp"][0] == 1.0
+    assert cols["before_source"][1] == 0  # decided_win
@@ -9,8 +9,11 @@ from typing import Dict, List, Optional, Tuple, Any
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from models import Match, Delivery
-from precomputed_service import PrecomputedDataService
+from precomputed_service import (
+    PrecomputedDataService, WPA_GLOBAL_MIN_SAMPLE, WPA_LEAGUE_MIN_SAMPLE, WPA_VENUE_MIN_SAMPLE
+)
 from datetime import date, datetime
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
@@ -54,6 +57,7 @@ class OptimizedWPAEngine:
         self.precomputed_service = PrecomputedDataService()
         self._match_cache = {}
         self._stats = {"total": 0, "precomputed_hits": 0, "fallback": 0}
+        self._batch_engine: Optional["BatchWPAEngine"] = None
     
     def get_match_info(self, session: Session, match_id: str) -> Optional[Dict]:
         """Get match info with caching"""
@@ -290,9 +294,485 @@ class OptimizedWPAEngine:
             "performance_mode": "OPTIMIZED" if precomputed > 0 else "NEEDS_PRECOMPUTED_DATA"
         }
     
+    def calculate_batch_wpa(self, session: Session, match_ids: Optional[List[str]] = None,
+                            competition: Optional[str] = None, start_date: Optional[date] = None,
+                            end_date: Optional[date] = None) -> "BatchWPAResult":
+        """WPA for whole matches/seasons in one pass (see BatchWPAEngine)."""
+        if self._batch_engine is None:
+            self._batch_engine = BatchWPAEngine(self.precomputed_service)
+        return self._batch_engine.calculate(
+            session, match_ids=match_ids, competition=competition,
+            start_date=start_date, end_date=end_date
+        )
+    
     def clear_cache(self):
         """Clear caches"""
         self._match_cache.clear()
+        if self._batch_engine is not None:
+            self._batch_engine.clear_cache()
+
+
+# ---------------------------------------------------------------------------
+# Batch engine
+#
+# The per-delivery engine above costs one state query plus up to five lookup queries per ball.
+# The batch engine loads every second-innings delivery for a set of matches in one query,
+# derives before/after states with cumulative sums, and resolves win probabilities against an
+# in-memory copy of wpa_outcomes using the same fallback order (venue -> cluster -> league ->
+# global -> heuristic).
+# ---------------------------------------------------------------------------
+
+# Grid sizes for the lookup cell code. Targets/scores outside the grid simply miss and fall back.
+_TARGET_BUCKETS = 40   # target_bucket // 10  -> targets up to 399
+_OVER_BUCKETS = 10     # over_bucket // 2     -> overs 0-19
+_WICKETS = 10          # wickets_lost 0-9
+_RUN_BUCKETS = 30      # runs_range_min // 20 -> scores up to 599
+_CELLS_PER_GROUP = _TARGET_BUCKETS * _OVER_BUCKETS * _WICKETS * _RUN_BUCKETS
+
+
+WPA_SOURCES = ["decided_win", "decided_loss", "venue", "cluster", "league", "global", "heuristic"]
+_SOURCE_CODE = {name: code for code, name in enumerate(WPA_SOURCES)}
+
+
+def _cell_codes(targets: np.ndarray, overs: np.ndarray, wickets: np.ndarray,
+                runs: np.ndarray) -> np.ndarray:
+    """Flatten (target bucket, over bucket, wickets, runs bucket) into one int64 cell id (-1 = off grid)."""
+    t = targets // 10
+    o = overs // 2
+    r = runs // 20
+    valid = (
+        (t >= 0) & (t < _TARGET_BUCKETS) & (o >= 0) & (o < _OVER_BUCKETS)
+        & (wickets >= 0) & (wickets < _WICKETS) & (r >= 0) & (r < _RUN_BUCKETS)
+    )
+    codes = ((t * _OVER_BUCKETS + o) * _WICKETS + wickets) * _RUN_BUCKETS + r
+    return np.where(valid, codes, -1).astype(np.int64)
+
+
+class _SortedIndex:
+    """Sorted int64 keys -> float values, probed with searchsorted."""
+
+    def __init__(self, keys: np.ndarray, values: np.ndarray, priority: np.ndarray):
+        if len(keys) == 0:
+            self.keys = np.empty(0, dtype=np.int64)
+            self.values = np.empty(0, dtype=np.float64)
+            return
+        # Duplicate keys keep the row with the highest priority
+        order = np.lexsort((priority, keys))
+        keys, values = keys[order], values[order]
+        last_of_run = np.append(keys[1:] != keys[:-1], True)
+        self.keys = keys[last_of_run]
+        self.values = values[last_of_run]
+
+    def probe(self, query: np.ndarray) -> np.ndarray:
+        result = np.full(len(query), np.nan)
+        if len(self.keys) == 0 or len(query) == 0:
+            return result
+        pos = np.minimum(np.searchsorted(self.keys, query), len(self.keys) - 1)
+        found = (self.keys[pos] == query) & (query >= 0)
+        result[found] = self.values[pos[found]]
+        return result
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class WPALookupTable:
+    """
+    In-memory copy of wpa_outcomes indexed by (group, target bucket, over bucket, wickets, runs bucket).
+
+    Groups are (venue, league) for venue-level lookups, league for the league fallback and a
+    single global group.
+    """
+
+    def __init__(self, rows: List[Any]):
+        self.row_count = len(rows)
+        self._venue_groups: Dict[Tuple[str, Optional[str]], int] = {}
+        self._league_groups: Dict[Optional[str], int] = {}
+
+        venue_ids = np.empty(len(rows), dtype=np.int64)
+        league_ids = np.empty(len(rows), dtype=np.int64)
+        for i, row in enumerate(rows):
+            venue_ids[i] = self._venue_groups.setdefault((row.venue, row.league), len(self._venue_groups))
+            league_ids[i] = self._league_groups.setdefault(row.league, len(self._league_groups))
+
+        cells = _cell_codes(
+            np.array([row.target_bucket for row in rows], dtype=np.int64),
+            np.array([row.over_bucket for row in rows], dtype=np.int64),
+            np.array([row.wickets_lost for row in rows], dtype=np.int64),
+            np.array([row.runs_range_min for row in rows], dtype=np.int64),
+        )
+        probs = np.array([float(row.win_probability) for row in rows], dtype=np.float64)
+        samples = np.array([row.sample_size or 0 for row in rows], dtype=np.int64)
+        computed = np.array(
+            [row.computed_date.timestamp() if row.computed_date else 0.0 for row in rows], dtype=np.float64
+        )
+        on_grid = cells >= 0
+
+        venue_rows = on_grid & (samples >= WPA_VENUE_MIN_SAMPLE)
+        self._venue_index = _SortedIndex(
+            venue_ids[venue_rows] * _CELLS_PER_GROUP + cells[venue_rows], probs[venue_rows], computed[venue_rows]
+        )
+        league_rows = on_grid & (samples >= WPA_LEAGUE_MIN_SAMPLE)
+        self._league_index = _SortedIndex(
+            league_ids[league_rows] * _CELLS_PER_GROUP + cells[league_rows], probs[league_rows], samples[league_rows]
+        )
+        global_rows = on_grid & (samples >= WPA_GLOBAL_MIN_SAMPLE)
+        self._global_index = _SortedIndex(cells[global_rows], probs[global_rows], samples[global_rows])
+
+    @classmethod
+    def from_session(cls, session: Session) -> "WPALookupTable":
+        rows = session.execute(text("""
+            SELECT venue, league, target_bucket, over_bucket, wickets_lost, runs_range_min,
+                   win_probability, sample_size, computed_date
+            FROM wpa_outcomes
+        """)).fetchall()
+        logger.info(f"Loaded {len(rows)} wpa_outcomes rows into batch lookup table")
+        return cls(rows)
+
+    def lookup_venue(self, venues: np.ndarray, leagues: np.ndarray, cells: np.ndarray) -> np.ndarray:
+        groups = np.array(
+            [self._venue_groups.get((venue, league), -1) for venue, league in zip(venues, leagues)],
+            dtype=np.int64,
+        )
+        return self._probe_groups(self._venue_index, groups, cells)
+
+    def lookup_league(self, leagues: np.ndarray, cells: np.ndarray) -> np.ndarray:
+        groups = np.array([self._league_groups.get(league, -1) for league in leagues], dtype=np.int64)
+        return self._probe_groups(self._league_index, groups, cells)
+
+    def lookup_global(self, cells: np.ndarray) -> np.ndarray:
+        return self._global_index.probe(cells)
+
+    @staticmethod
+    def _probe_groups(index: _SortedIndex, groups: np.ndarray, cells: np.ndarray) -> np.ndarray:
+        keys = np.where((groups >= 0) & (cells >= 0), groups * _CELLS_PER_GROUP + cells, -1)
+        return index.probe(keys)
+
+
+class BatchWPAResult:
+    """Per-delivery WPA arrays for a batch of matches, with per-player roll-ups."""
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["delivery_id"])
+
+    @property
+    def match_count(self) -> int:
+        return len(np.unique(self.columns["match_id"])) if len(self) else 0
+
+    def source_counts(self) -> Dict[str, int]:
+        codes, counts = np.unique(self.columns["before_source"], return_counts=True)
+        return {WPA_SOURCES[code]: int(count) for code, count in zip(codes, counts)}
+
+    def delivery_records(self) -> List[Dict[str, Any]]:
+        cols = self.columns
+        return [
+            {
+                "delivery_id": int(cols["delivery_id"][i]),
+                "match_id": cols["match_id"][i],
+                "over": int(cols["over"][i]),
+                "ball": int(cols["ball"][i]),
+                "batter": cols["batter"][i],
+                "bowler": cols["bowler"][i],
+                "before_wp": round(float(cols["before_wp"][i]), 3),
+                "after_wp": round(float(cols["after_wp"][i]), 3),
+                "wpa_batter": float(cols["wpa_batter"][i]),
+                "wpa_bowler": float(cols["wpa_bowler"][i]),
+                "data_source": WPA_SOURCES[cols["before_source"][i]],
+            }
+            for i in range(len(self))
+        ]
+
+    def player_totals(self, role: str = "batter") -> List[Dict[str, Any]]:
+        """Total WPA per batter or bowler, highest first."""
+        if role not in ("batter", "bowler"):
+            raise ValueError("role must be 'batter' or 'bowler'")
+        if not len(self):
+            return []
+        names, inverse = np.unique(self.columns[role].astype(str), return_inverse=True)
+        totals = np.bincount(inverse, weights=self.columns[f"wpa_{role}"], minlength=len(names))
+        balls = np.bincount(inverse, minlength=len(names))
+        matches = {
+            name: len(ids) for name, ids in self._matches_per_player(names, inverse).items()
+        }
+        order = np.argsort(-totals, kind="stable")
+        return [
+            {
+                "player": names[i],
+                "total_wpa": round(float(totals[i]), 3),
+                "balls": int(balls[i]),
+                "matches": matches[names[i]],
+            }
+            for i in order
+        ]
+
+    def _matches_per_player(self, names: np.ndarray, inverse: np.ndarray) -> Dict[str, set]:
+        per_player: Dict[str, set] = {name: set() for name in names}
+        for player_idx, match_id in set(zip(inverse.tolist(), self.columns["match_id"].tolist())):
+            per_player[names[player_idx]].add(match_id)
+        return per_player
+
+
+class BatchWPAEngine:
+    """
+    One-pass WPA for whole matches, competitions or seasons.
+
+    Chronology: wpa_outcomes is rebuilt wholesale, so every row shares one data_through_date.
+    The per-delivery engine falls back from the strict to the relaxed chronological lookup in
+    that case anyway, so the batch lookup ignores data_through_date.
+    """
+
+    def __init__(self, precomputed_service: Optional[PrecomputedDataService] = None):
+        self.precomputed_service = precomputed_service or PrecomputedDataService()
+        self._lookup: Optional[WPALookupTable] = None
+        self._cluster_cache: Dict[str, List[str]] = {}
+
+    def get_lookup(self, session: Session) -> WPALookupTable:
+        if self._lookup is None:
+            self._lookup = WPALookupTable.from_session(session)
+        return self._lookup
+
+    def clear_cache(self):
+        self._lookup = None
+        self._cluster_cache.clear()
+
+    def load_deliveries(self, session: Session, match_ids: Optional[List[str]] = None,
+                        competition: Optional[str] = None, start_date: Optional[date] = None,
+                        end_date: Optional[date] = None) -> Dict[str, np.ndarray]:
+        """Load every second-innings delivery for the selected matches, ordered by ball."""
+        filters = []
+        params: Dict[str, Any] = {}
+        if match_ids is not None:
+            filters.append("m.id = ANY(:match_ids)")
+            params["match_ids"] = list(match_ids)
+        if competition:
+            filters.append("m.competition = :competition")
+            params["competition"] = competition
+        if start_date:
+            filters.append("m.date >= :start_date")
+            params["start_date"] = start_date
+        if end_date:
+            filters.append("m.date <= :end_date")
+            params["end_date"] = end_date
+        where = " AND ".join(filters) if filters else "TRUE"
+
+        rows = session.execute(text(f"""
+            WITH selected AS (
+                SELECT m.id, m.venue, m.competition
+                FROM matches m
+                WHERE {where}
+            ),
+            first_innings AS (
+                SELECT d.match_id, SUM(d.runs_off_bat + COALESCE(d.extras, 0)) AS total
+                FROM deliveries d
+                JOIN selected s ON s.id = d.match_id
+                WHERE d.innings = 1
+                GROUP BY d.match_id
+            )
+            SELECT
+                d.id, d.match_id, d.over, d.ball, d.batter, d.bowler,
+                COALESCE(d.runs_off_bat, 0) + COALESCE(d.extras, 0) AS runs,
+                CASE WHEN d.wicket_type IS NOT NULL THEN 1 ELSE 0 END AS wicket,
+                s.venue, s.competition,
+                COALESCE(fi.total, 0) AS first_innings_total
+            FROM deliveries d
+            JOIN selected s ON s.id = d.match_id
+            LEFT JOIN first_innings fi ON fi.match_id = d.match_id
+            WHERE d.innings = 2
+            ORDER BY d.match_id, d.over, d.ball, d.id
+        """), params).fetchall()
+        logger.info(f"Loaded {len(rows)} second-innings deliveries for batch WPA")
+
+        return {
+            "delivery_id": np.array([row.id for row in rows], dtype=np.int64),
+            "match_id": np.array([row.match_id for row in rows], dtype=object),
+            "over": np.array([row.over or 0 for row in rows], dtype=np.int64),
+            "ball": np.array([row.ball or 0 for row in rows], dtype=np.int64),
+            "batter": np.array([row.batter for row in rows], dtype=object),
+            "bowler": np.array([row.bowler for row in rows], dtype=object),
+            "runs": np.array([row.runs for row in rows], dtype=np.int64),
+            "wicket": np.array([row.wicket for row in rows], dtype=np.int64),
+            "venue": np.array([row.venue for row in rows], dtype=object),
+            "league": np.array([row.competition for row in rows], dtype=object),
+            "target": np.array([int(row.first_innings_total) + 1 for row in rows], dtype=np.int64),
+        }
+
+    def calculate(self, session: Session, match_ids: Optional[List[str]] = None,
+                  competition: Optional[str] = None, start_date: Optional[date] = None,
+                  end_date: Optional[date] = None) -> BatchWPAResult:
+        """Load, compute and return per-delivery WPA for the selected matches."""
+        deliveries = self.load_deliveries(session, match_ids, competition, start_date, end_date)
+        return self.calculate_from_arrays(deliveries, self.get_lookup(session))
+
+    def calculate_from_arrays(self, deliveries: Dict[str, np.ndarray],
+                              lookup: WPALookupTable) -> BatchWPAResult:
+        """Compute WPA from delivery arrays sorted by (match_id, over, ball)."""
+        runs = deliveries["runs"]
+        wickets = deliveries["wicket"]
+        match_ids = deliveries["match_id"]
+
+        # Running totals per match: global cumsum minus the total before each match's first ball
+        cum_runs = np.cumsum(runs)
+        cum_wickets = np.cumsum(wickets)
+        is_first = np.ones(len(runs), dtype=bool)
+        if len(runs) > 1:
+            is_first[1:] = match_ids[1:] != match_ids[:-1]
+        first_idx = np.maximum.accumulate(np.where(is_first, np.arange(len(runs)), 0))
+        runs_after = cum_runs - cum_runs[first_idx] + runs[first_idx]
+        wickets_after = cum_wickets - cum_wickets[first_idx] + wickets[first_idx]
+
+        balls_after = np.clip(deliveries["over"] * 6 + deliveries["ball"], 0, 120)
+        balls_before = np.clip(balls_after - 1, 0, 120)
+
+        before_wp, before_source = self._win_probabilities(
+            lookup, deliveries, runs_after - runs, wickets_after - wickets, balls_before
+        )
+        after_wp, _ = self._win_probabilities(
+            lookup, deliveries, runs_after, wickets_after, balls_after
+        )
+
+        wpa = after_wp - before_wp
+        wpa[np.abs(wpa) < 0.001] = 0.0
+        wpa_batter = np.round(wpa, 3)
+
+        return BatchWPAResult({
+            "delivery_id": deliveries["delivery_id"],
+            "match_id": match_ids,
+            "over": deliveries["over"],
+            "ball": deliveries["ball"],
+            "batter": deliveries["batter"],
+            "bowler": deliveries["bowler"],
+            "before_wp": before_wp,
+            "after_wp": after_wp,
+            "before_source": before_source,
+            "wpa_batter": wpa_batter,
+            "wpa_bowler": -wpa_batter,
+        })
+
+    def _win_probabilities(self, lookup: WPALookupTable, deliveries: Dict[str, np.ndarray],
+                           score: np.ndarray, wickets_lost: np.ndarray,
+                           balls: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorised OptimizedWPAEngine.calculate_win_probability for many states at once."""
+        target = deliveries["target"]
+        n = len(target)
+        wp = np.full(n, np.nan)
+        source = np.full(n, _SOURCE_CODE["heuristic"], dtype=np.int64)
+
+        runs_needed = target - score
+        balls_remaining = 120 - balls
+        decided_win = runs_needed <= 0
+        decided_loss = ~decided_win & ((balls_remaining <= 0) | (wickets_lost >= 10))
+        wp[decided_win] = 1.0
+        source[decided_win] = _SOURCE_CODE["decided_win"]
+        wp[decided_loss] = 0.0
+        source[decided_loss] = _SOURCE_CODE["decided_loss"]
+
+        over = balls // 6
+        cells = _cell_codes(target, over, wickets_lost, score)
+
+        def fill(mask: np.ndarray, values: np.ndarray, name: str):
+            hit = mask & ~np.isnan(values)
+            wp[hit] = values[hit]
+            source[hit] = _SOURCE_CODE[name]
+
+        open_rows = np.isnan(wp)
+        fill(open_rows, lookup.lookup_venue(deliveries["venue"], deliveries["league"], cells), "venue")
+
+        open_rows = np.isnan(wp)
+        if open_rows.any():
+            fill(open_rows, self._cluster_lookup(lookup, deliveries, cells, open_rows), "cluster")
+
+        open_rows = np.isnan(wp)
+        if open_rows.any():
+            fill(open_rows, lookup.lookup_league(deliveries["league"], cells), "league")
+
+        open_rows = np.isnan(wp)
+        if open_rows.any():
+            fill(open_rows, lookup.lookup_global(cells), "global")
+
+        open_rows = np.isnan(wp)
+        if open_rows.any():
+            wp[open_rows] = self._heuristic(runs_needed[open_rows], over[open_rows], wickets_lost[open_rows])
+
+        return np.clip(wp, 0.0, 1.0), source
+
+    def _cluster_lookup(self, lookup: WPALookupTable, deliveries: Dict[str, np.ndarray],
+                        cells: np.ndarray, open_rows: np.ndarray) -> np.ndarray:
+        result = np.full(len(cells), np.nan)
+        venues = deliveries["venue"]
+        for venue in set(venues[open_rows].tolist()):
+            rows = np.flatnonzero(open_rows & (venues == venue))
+            for cluster_venue in self._cluster_venues(venue):
+                pending = rows[np.isnan(result[rows])]
+                if len(pending) == 0:
+                    break
+                found = lookup.lookup_venue(
+                    np.full(len(pending), cluster_venue, dtype=object),
+                    deliveries["league"][pending],
+                    cells[pending],
+                )
+                result[pending] = np.where(np.isnan(found), result[pending], found)
+        return result
+
+    def _cluster_venues(self, venue: Optional[str]) -> List[str]:
+        if not venue:
+            return []
+        if venue not in self._cluster_cache:
+            venue_manager = self.precomputed_service.venue_manager
+            cluster = venue_manager.get_venue_cluster(venue)
+            self._cluster_cache[venue] = list(venue_manager.venue_clusters.get(cluster, [])) if cluster else []
+        return self._cluster_cache[venue]
+
+    @staticmethod
+    def _heuristic(runs_needed: np.ndarray, over: np.ndarray, wickets_lost: np.ndarray) -> np.ndarray:
+        """Vectorised PrecomputedDataService._calculate_heuristic_win_probability."""
+        overs_remaining = 20 - over
+        wickets_remaining = 10 - wickets_lost
+        balls_remaining = np.maximum(overs_remaining * 6, 1)
+        required_rr = runs_needed * 6 / balls_remaining
+        base = np.select(
+            [required_rr <= 6, required_rr <= 9, required_rr <= 12], [0.8, 0.6, 0.3], default=0.1
+        )
+        prob = base * (wickets_remaining / 10)
+        prob = np.where(runs_needed <= 0, 1.0, prob)
+        prob = np.where((overs_remaining <= 0) | (wickets_remaining <= 0), 0.0, prob)
+        return np.clip(prob, 0.0, 1.0)
+
+    def store(self, session: Session, result: BatchWPAResult, chunk_size: int = 50000) -> int:
+        """Write wpa_batter/wpa_bowler back to deliveries with set-based UPDATEs."""
+        cols = result.columns
+        computed = datetime.utcnow()
+        updated = 0
+        try:
+            for start in range(0, len(result), chunk_size):
+                end = start + chunk_size
+                session.execute(text("""
+                    UPDATE deliveries d
+                    SET wpa_batter = v.wpa_batter,
+                        wpa_bowler = v.wpa_bowler,
+                        wpa_computed_date = :computed
+                    FROM (
+                        SELECT UNNEST(CAST(:ids AS INTEGER[])) AS id,
+                               UNNEST(CAST(:batter AS NUMERIC[])) AS wpa_batter,
+                               UNNEST(CAST(:bowler AS NUMERIC[])) AS wpa_bowler
+                    ) v
+                    WHERE d.id = v.id
+                """), {
+                    "ids": cols["delivery_id"][start:end].tolist(),
+                    "batter": cols["wpa_batter"][start:end].tolist(),
+                    "bowler": cols["wpa_bowler"][start:end].tolist(),
+                    "computed": computed,
+                })
+                updated += len(cols["delivery_id"][start:end])
+            session.commit()
+        except Exception as e:
+            logger.error(f"Error storing batch WPA: {e}")
+            session.rollback()
+            raise
+        logger.info(f"Stored batch WPA for {updated} deliveries")
+        return updated
 
 
 # Backward compatibility alias